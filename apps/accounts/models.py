@@ -146,16 +146,17 @@ class BrokerAccount(TimeStampedModel):
         Returns:
             Decimal: Today's P&L
         """
-        from datetime import date
+        from apps.core.utils import local_day_range
         from apps.positions.models import Position
 
-        today = date.today()
+        start, end = local_day_range()
 
         # Realized P&L from positions closed today
         realized_today = Position.objects.filter(
             account=self,
             status='CLOSED',
-            exit_time__date=today
+            exit_time__gte=start,
+            exit_time__lt=end
         ).aggregate(
             total=models.Sum('realized_pnl')
         )['total'] or Decimal('0')
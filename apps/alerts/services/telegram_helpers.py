@@ -9,6 +9,8 @@ from django.utils import timezone
 from django.db.models import Sum
 from asgiref.sync import sync_to_async
 
+from apps.core.utils import local_day_range
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,9 +58,11 @@ def get_pnl_data(today=None):
     if today is None:
         today = timezone.now().date()
 
+    start, end = local_day_range(today)
     today_positions = Position.objects.filter(
         status='CLOSED',
-        exit_time__date=today
+        exit_time__gte=start,
+        exit_time__lt=end
     )
 
     if not today_positions.exists():
@@ -82,8 +86,8 @@ def get_week_pnl_data():
 
     week_positions = Position.objects.filter(
         status='CLOSED',
-        exit_time__date__gte=week_start,
-        exit_time__date__lte=today
+        exit_time__gte=local_day_range(week_start)[0],
+        exit_time__lt=local_day_range(today)[1]
     )
 
     if not week_positions.exists():
@@ -115,7 +115,7 @@ class TelegramTradeNotifier:
         message += (
             f"<b>🏭 SECTOR ANALYSIS</b>\n"
             f"  Verdict: {sector_verdict}\n"
-            f"  3D: {sector_perf.get('3d', 0):.2f}%\n"
+            f"  {sector_analysis.get('short_term_days', 3)}D: {sector_perf.get('3d', 0):.2f}%\n"
             f"  7D: {sector_perf.get('7d', 0):.2f}%\n"
             f"  21D: {sector_perf.get('21d', 0):.2f}%\n\n"
         )
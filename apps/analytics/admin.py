@@ -4,6 +4,7 @@ from .models import (
     Performance,
     LearningSession,
     TradePerformance,
+    TradeOutcomeAggregate,
     LearningPattern,
     ParameterAdjustment,
     PerformanceMetric,
@@ -77,7 +78,7 @@ class TradePerformanceAdmin(admin.ModelAdmin):
             'fields': ('what_worked', 'what_failed', 'lessons_learned')
         }),
         ('Pattern Matching', {
-            'fields': ('similar_patterns_count', 'pattern_success_rate')
+            'fields': ('similar_patterns_count', 'pattern_success_rate', 'is_aggregated')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -86,6 +87,14 @@ class TradePerformanceAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(TradeOutcomeAggregate)
+class TradeOutcomeAggregateAdmin(admin.ModelAdmin):
+    list_display = ['dimension', 'bucket', 'trades', 'wins', 'losses', 'pnl_sum', 'updated_at']
+    list_filter = ['dimension']
+    ordering = ['dimension', 'bucket_order']
+    readonly_fields = ['created_at', 'updated_at']
+
+
 @admin.register(LearningPattern)
 class LearningPatternAdmin(admin.ModelAdmin):
     list_display = ['name', 'pattern_type', 'success_rate', 'confidence_score', 'occurrences', 'is_actionable', 'validation_status']
@@ -0,0 +1,170 @@
+"""
+Management command to backtest strategies on stored historical data
+
+Replays HistoricalPrice candles (and stored option prices) through the Kotak
+strangle or ICICI futures rules. With --sweep, every combination of the given
+values is backtested over a process pool; --record stores the results as
+LearningPattern / ParameterAdjustment rows in a new learning session.
+
+Usage:
+    python manage.py run_backtest --strategy strangle --symbol NIFTY --days 365
+    python manage.py run_backtest --set strike_method=delta --set stop_loss_pct=80
+    python manage.py run_backtest --sweep base_delta_pct=0.4,0.5,0.6 --sweep stop_loss_pct=80,100 --record
+    python manage.py run_backtest --strategy futures --symbol RELIANCE --product futures --json
+"""
+
+import json
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.analytics.services.backtest import (
+    FUTURES_DEFAULTS,
+    STRANGLE_DEFAULTS,
+    load_market_data,
+    record_sweep,
+    run_backtest,
+    run_parameter_sweep,
+)
+
+
+def _parse_value(name, raw, defaults):
+    """Convert a command-line value to the type of the parameter's default."""
+    default = defaults.get(name)
+    if default is None:
+        raise CommandError(f"Unknown parameter: {name}")
+    if isinstance(default, bool):
+        return raw.lower() in ('1', 'true', 'yes')
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def _parse_date(raw):
+    try:
+        return datetime.strptime(raw, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date (expected YYYY-MM-DD): {raw}")
+
+
+class Command(BaseCommand):
+    help = 'Backtest the strangle or futures strategy on stored historical data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strategy', choices=['strangle', 'futures'], default='strangle')
+        parser.add_argument('--symbol', default='NIFTY', help='Underlying stock code in HistoricalPrice')
+        parser.add_argument('--product', default='cash', help='HistoricalPrice product type of the underlying')
+        parser.add_argument('--start', help='First day (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day (YYYY-MM-DD, default today)')
+        parser.add_argument('--days', type=int, default=365, help='Days back from --end when --start is not given')
+        parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                            help='Override a strategy parameter (repeatable)')
+        parser.add_argument('--sweep', action='append', default=[], metavar='NAME=V1,V2',
+                            help='Sweep a parameter over values (repeatable)')
+        parser.add_argument('--workers', type=int, help='Sweep worker processes (default: one per CPU)')
+        parser.add_argument('--record', action='store_true',
+                            help='Store sweep results as learning patterns and suggestions')
+        parser.add_argument('--trades', action='store_true', help='Print every trade')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        strategy = options['strategy']
+        defaults = STRANGLE_DEFAULTS if strategy == 'strangle' else FUTURES_DEFAULTS
+
+        end = _parse_date(options['end']) if options['end'] else date.today()
+        start = _parse_date(options['start']) if options['start'] else end - timedelta(days=options['days'])
+
+        params = {}
+        for item in options['set']:
+            name, _, raw = item.partition('=')
+            params[name] = _parse_value(name, raw, defaults)
+
+        grid = {}
+        for item in options['sweep']:
+            name, _, raw = item.partition('=')
+            grid[name] = [_parse_value(name, value, defaults) for value in raw.split(',') if value]
+
+        data = load_market_data(
+            options['symbol'], start, end,
+            expiry_kind='weekly' if strategy == 'strangle' else 'monthly',
+            product_type=options['product'],
+        )
+        if len(data) < 2:
+            raise CommandError(f"No daily candles for {options['symbol']} between {start} and {end}")
+
+        if grid:
+            self._sweep(strategy, data, grid, params, options)
+        else:
+            self._single(strategy, data, params, options)
+
+    def _single(self, strategy, data, params, options):
+        result = run_backtest(strategy, data, params)
+
+        if options['json']:
+            payload = {'summary': result.summary, 'params': result.params}
+            if options['trades']:
+                payload['trades'] = result.trade_list()
+            self.stdout.write(json.dumps(payload, indent=2, default=str))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== {strategy.title()} Backtest: {data.symbol} {data.dates[0]} to {data.dates[-1]} ==="
+        ))
+        if options['trades']:
+            for trade in result.trade_list():
+                self.stdout.write(
+                    f"{trade['entry_date']} -> {trade['exit_date']}  {trade['exit_reason']:<10}"
+                    f"{trade['pnl']:>12,.2f}  ({trade['pnl_pct']:+.2f}%)"
+                )
+            self.stdout.write('')
+        for key, value in result.summary.items():
+            self.stdout.write(f"{key:<16}{value}")
+
+    def _sweep(self, strategy, data, grid, params, options):
+        sweep = run_parameter_sweep(strategy, data, grid, base_params=params, workers=options['workers'])
+
+        recorded = None
+        if options['record']:
+            from apps.analytics.models import LearningSession
+
+            session = LearningSession.objects.create(
+                name=f"Backtest sweep {strategy} {data.symbol} {timezone.now():%Y-%m-%d %H:%M}",
+                status='COMPLETED',
+                started_at=timezone.now(),
+                stopped_at=timezone.now(),
+            )
+            recorded = record_sweep(session, sweep)
+            recorded['session_id'] = session.id
+
+        if options['json']:
+            self.stdout.write(json.dumps({**sweep, 'recorded': recorded}, indent=2, default=str))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== {strategy.title()} Sweep: {data.symbol} {sweep['period'][0]} to {sweep['period'][1]} ==="
+        ))
+        self.stdout.write(
+            f"{len(sweep['results'])} combinations, {sweep['trades_simulated']} trades "
+            f"in {sweep['elapsed_seconds']}s\n"
+        )
+        header = f"{'Parameters':<50}{'Trades':>8}{'Win %':>8}{'Total P&L':>14}{'Max DD':>12}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        rows = [('baseline', sweep['baseline']['summary'])] + [
+            (', '.join(f"{name}={result['params'][name]}" for name in sorted(grid)), result['summary'])
+            for result in sweep['results']
+        ]
+        for label, summary in rows:
+            self.stdout.write(
+                f"{label:<50}{summary['trades']:>8}{summary['win_rate']:>8}"
+                f"{summary['total_pnl']:>14,.0f}{summary['max_drawdown']:>12,.0f}"
+            )
+
+        if recorded:
+            self.stdout.write(self.style.SUCCESS(
+                f"\nRecorded {recorded['patterns']} patterns and {recorded['adjustments']} "
+                f"suggestions in learning session {recorded['session_id']}"
+            ))
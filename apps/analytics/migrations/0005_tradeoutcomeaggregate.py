@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:54
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_alter_dailypnl_id_alter_learningpattern_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tradeperformance',
+            name='is_aggregated',
+            field=models.BooleanField(db_index=True, default=False, help_text='Counted in TradeOutcomeAggregate'),
+        ),
+        migrations.CreateModel(
+            name='TradeOutcomeAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('dimension', models.CharField(choices=[('ENTRY_HOUR', 'Entry Hour'), ('VIX', 'VIX at Entry'), ('STRIKE_DISTANCE', 'Strike Distance'), ('EXIT_DAY', 'Exit Day')], max_length=30)),
+                ('bucket', models.CharField(help_text="Bucket label, e.g. '9' or '15-18'", max_length=30)),
+                ('bucket_order', models.IntegerField(default=0, help_text='Sort key of the bucket within its dimension')),
+                ('trades', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0, help_text='Trades with P&L <= 0')),
+                ('pnl_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20)),
+                ('win_pnl_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20)),
+                ('loss_pnl_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20)),
+                ('pnl_sq_sum', models.FloatField(default=0.0, help_text='Sum of squared P&L (for the variance)')),
+            ],
+            options={
+                'db_table': 'trade_outcome_aggregates',
+                'ordering': ['dimension', 'bucket_order'],
+                'unique_together': {('dimension', 'bucket')},
+            },
+        ),
+    ]
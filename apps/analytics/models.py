@@ -232,6 +232,12 @@ class TradePerformance(TimeStampedModel):
         help_text="Success rate of this pattern"
     )
 
+    is_aggregated = models.BooleanField(
+        default=False,
+        db_index=True,
+        help_text="Counted in TradeOutcomeAggregate"
+    )
+
     class Meta:
         db_table = 'trade_performance'
         ordering = ['-created_at']
@@ -241,7 +247,43 @@ class TradePerformance(TimeStampedModel):
         ]
 
     def __str__(self):
-        return f"Performance: {self.position.symbol} - Score: {self.entry_score}"
+        return f"Performance: {self.position.instrument} - Score: {self.entry_score}"
+
+
+class TradeOutcomeAggregate(TimeStampedModel):
+    """
+    Running outcome totals of analyzed trades per bucket (entry hour, VIX,
+    strike distance, exit day). Updated as each trade is analyzed, so
+    pattern discovery reads a few rows instead of every trade.
+    """
+
+    DIMENSION_CHOICES = [
+        ('ENTRY_HOUR', 'Entry Hour'),
+        ('VIX', 'VIX at Entry'),
+        ('STRIKE_DISTANCE', 'Strike Distance'),
+        ('EXIT_DAY', 'Exit Day'),
+    ]
+
+    dimension = models.CharField(max_length=30, choices=DIMENSION_CHOICES)
+    bucket = models.CharField(max_length=30, help_text="Bucket label, e.g. '9' or '15-18'")
+    bucket_order = models.IntegerField(default=0, help_text="Sort key of the bucket within its dimension")
+
+    trades = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0, help_text="Trades with P&L <= 0")
+
+    pnl_sum = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
+    win_pnl_sum = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
+    loss_pnl_sum = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
+    pnl_sq_sum = models.FloatField(default=0.0, help_text="Sum of squared P&L (for the variance)")
+
+    class Meta:
+        db_table = 'trade_outcome_aggregates'
+        unique_together = ['dimension', 'bucket']
+        ordering = ['dimension', 'bucket_order']
+
+    def __str__(self):
+        return f"{self.dimension} {self.bucket}: {self.wins}/{self.trades} wins"
 
 
 class LearningPattern(TimeStampedModel):
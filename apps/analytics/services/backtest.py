@@ -0,0 +1,1086 @@
+"""
+Vectorized Backtest Engine for mCube Trading System
+
+Replays stored market data through the live strategy rules:
+
+1. Kotak Strangle - strikes from kotak_strangle.calculate_strikes (or
+   StrangleDeltaAlgorithm), the replayable entry filters (VIX, Nifty 1/3-day
+   move, Bollinger extremes, major events) and the exit rules (stop loss,
+   target, EOD exit on exit day above min profit, mandatory exit on expiry)
+2. ICICI Futures - stop loss, target and averaging from ICICI_FUTURES_PARAMS
+
+Daily candles come from HistoricalPrice and are held as NumPy arrays. Every
+candidate entry day becomes one row of an (entries x days) matrix, so all
+entries are priced and checked against the exit rules at once; a year of daily
+strangles evaluates in milliseconds. Option marks use stored option candles or
+OptionChain snapshots where available and Black-Scholes (VIX as IV) otherwise.
+
+Parameter sweeps fan out over a process pool and are recorded as
+LearningPattern / ParameterAdjustment rows for the learning dashboard.
+
+Usage:
+    from apps.analytics.services.backtest import (
+        load_market_data, run_backtest, run_parameter_sweep, record_sweep
+    )
+
+    data = load_market_data('NIFTY', start, end)
+    result = run_backtest('strangle', data, {'base_delta_pct': 0.6})
+    sweep = run_parameter_sweep('strangle', data, {'base_delta_pct': [0.4, 0.5, 0.6]})
+    record_sweep(session, sweep)
+"""
+
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from apps.core.constants import (
+    BACKTEST_CONFIDENCE_PER_TRADE,
+    BACKTEST_DEFAULT_VIX,
+    BACKTEST_MIN_TRADES,
+    BACKTEST_RISK_FREE_RATE,
+    BACKTEST_VIX_SYMBOL,
+    FILTER_PARAMS,
+    ICICI_FUTURES_PARAMS,
+    KOTAK_STRANGLE_PARAMS,
+)
+from apps.core.utils.option_math import black_scholes_d1_d2, norm_cdf
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY']
+
+STRANGLE_DEFAULTS = {
+    'strike_method': 'kotak',  # 'kotak' (kotak_strangle) or 'delta' (StrangleDeltaAlgorithm)
+    'base_delta_pct': float(KOTAK_STRANGLE_PARAMS['base_delta_pct']),
+    'short_expiry_delta_pct': 0.75,  # StrangleDeltaAlgorithm base delta for DTE <= 2
+    'min_days_to_expiry': KOTAK_STRANGLE_PARAMS['min_days_to_expiry'],
+    'target_profit_pct': float(KOTAK_STRANGLE_PARAMS['target_profit_pct']),
+    'stop_loss_pct': float(KOTAK_STRANGLE_PARAMS['stop_loss_pct']),
+    'min_profit_pct_to_exit': float(KOTAK_STRANGLE_PARAMS['min_profit_pct_to_exit']),
+    'exit_day': KOTAK_STRANGLE_PARAMS['exit_day'],
+    'use_filters': True,
+    'vix_max': float(FILTER_PARAMS['vix_max_threshold']),
+    'max_1day_change_pct': float(FILTER_PARAMS['nifty_1day_max_change_pct']),
+    'max_3day_change_pct': float(FILTER_PARAMS['nifty_3day_max_change_pct']),
+    'event_days_ahead': FILTER_PARAMS['min_days_before_major_event'],
+    'bollinger_period': 20,
+    'bollinger_std': 2.0,
+    'bollinger_buffer_pct': 0.5,
+    'lot_size': 50,
+    'lots': 1,
+    'overlapping': False,  # True: every eligible day opens a trade
+}
+
+FUTURES_DEFAULTS = {
+    'min_days_to_expiry': ICICI_FUTURES_PARAMS['min_days_to_expiry'],
+    'stop_loss_pct': float(ICICI_FUTURES_PARAMS['default_stop_loss_pct']),
+    'target_pct': float(ICICI_FUTURES_PARAMS['default_target_pct']),
+    'allow_averaging': ICICI_FUTURES_PARAMS['allow_averaging'],
+    'max_average_attempts': ICICI_FUTURES_PARAMS['max_average_attempts'],
+    'average_trigger_loss_pct': float(ICICI_FUTURES_PARAMS['average_trigger_loss_pct']),
+    'averaging_stop_loss_pct': float(ICICI_FUTURES_PARAMS['averaging_stop_loss_pct']),
+    'trend_period': 20,
+    'lot_size': 1,
+    'overlapping': False,
+}
+
+# Parameter category for ParameterAdjustment rows
+PARAMETER_CATEGORIES = {
+    'strike_method': 'strategy',
+    'base_delta_pct': 'strategy',
+    'short_expiry_delta_pct': 'strategy',
+    'min_days_to_expiry': 'entry',
+    'vix_max': 'entry',
+    'max_1day_change_pct': 'entry',
+    'max_3day_change_pct': 'entry',
+    'event_days_ahead': 'entry',
+    'bollinger_period': 'entry',
+    'bollinger_std': 'entry',
+    'bollinger_buffer_pct': 'entry',
+    'trend_period': 'entry',
+    'target_profit_pct': 'exit',
+    'target_pct': 'exit',
+    'min_profit_pct_to_exit': 'exit',
+    'exit_day': 'exit',
+    'stop_loss_pct': 'risk',
+    'allow_averaging': 'risk',
+    'max_average_attempts': 'risk',
+    'average_trigger_loss_pct': 'risk',
+    'averaging_stop_loss_pct': 'risk',
+}
+
+STRIKE_PARAMETERS = {'strike_method', 'base_delta_pct', 'short_expiry_delta_pct'}
+
+
+# ========== Market data ==========
+
+@dataclass
+class MarketData:
+    """
+    Daily candles and derivative data for one underlying as NumPy arrays.
+
+    Attributes:
+        symbol: Underlying (e.g. NIFTY)
+        dates: datetime64[D] trading days, ascending
+        open/high/low/close: float64 prices aligned to dates
+        vix: India VIX close aligned to dates
+        expiries: datetime64[D] contract expiries, ascending
+        event_dates: datetime64[D] HIGH/CRITICAL economic event dates
+        option_closes: {(expiry 'YYYY-MM-DD', strike, 'CE'/'PE'): closes aligned
+            to dates, NaN where no price was stored}
+    """
+    symbol: str
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    vix: np.ndarray
+    expiries: np.ndarray
+    event_dates: np.ndarray = field(default_factory=lambda: np.array([], dtype='datetime64[D]'))
+    option_closes: Dict[Tuple[str, int, str], np.ndarray] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def from_arrays(cls, symbol, dates, open, high, low, close, vix=None, expiries=None,
+                    event_dates=None, option_closes=None) -> 'MarketData':
+        """Build from plain sequences (dates as date objects or ISO strings)."""
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        close = np.asarray(close, dtype=float)
+        if vix is None:
+            vix = np.full(len(close), BACKTEST_DEFAULT_VIX)
+        return cls(
+            symbol=symbol,
+            dates=dates,
+            open=np.asarray(open, dtype=float),
+            high=np.asarray(high, dtype=float),
+            low=np.asarray(low, dtype=float),
+            close=close,
+            vix=np.asarray(vix, dtype=float),
+            expiries=np.sort(np.asarray(expiries if expiries is not None else [], dtype='datetime64[D]')),
+            event_dates=np.asarray(event_dates if event_dates is not None else [], dtype='datetime64[D]'),
+            option_closes=dict(option_closes or {}),
+        )
+
+    def option_close(self, expiry: np.datetime64, strike: float, option_type: str) -> Optional[np.ndarray]:
+        """Stored closes for one contract, or None."""
+        return self.option_closes.get((str(expiry), int(round(strike)), option_type))
+
+
+def _local_date(moment) -> date:
+    """Trading day of a stored timestamp (IST for timezone-aware values)."""
+    from django.utils import timezone
+
+    return timezone.localtime(moment).date() if timezone.is_aware(moment) else moment.date()
+
+
+def _daily_bars(rows) -> Tuple[np.ndarray, ...]:
+    """
+    Collapse (datetime, open, high, low, close) rows ordered by time into
+    daily bars.
+    """
+    if not rows:
+        empty = np.array([], dtype=float)
+        return np.array([], dtype='datetime64[D]'), empty, empty, empty, empty
+
+    days = np.array([_local_date(row[0]) for row in rows], dtype='datetime64[D]')
+    prices = np.array([[float(value) for value in row[1:5]] for row in rows])
+    dates, first = np.unique(days, return_index=True)
+    last = np.append(first[1:], len(days)) - 1
+    return (
+        dates,
+        prices[first, 0],
+        np.maximum.reduceat(prices[:, 1], first),
+        np.minimum.reduceat(prices[:, 2], first),
+        prices[last, 3],
+    )
+
+
+def _align(dates: np.ndarray, source_dates: np.ndarray, values: np.ndarray, default: float) -> np.ndarray:
+    """Values of source_dates on each of dates, carried forward over gaps."""
+    if not len(source_dates):
+        return np.full(len(dates), default)
+    index = np.searchsorted(source_dates, dates, side='right') - 1
+    aligned = values[np.clip(index, 0, None)]
+    return np.where(index >= 0, aligned, default)
+
+
+def load_market_data(
+    symbol: str,
+    start: date,
+    end: date,
+    expiry_kind: str = 'weekly',
+    product_type: str = 'cash',
+) -> MarketData:
+    """
+    Load daily candles, VIX, expiries, events and option prices from the database.
+
+    Args:
+        symbol: Underlying stock code as stored in HistoricalPrice (e.g. NIFTY)
+        start: First day (inclusive)
+        end: Last day (inclusive)
+        expiry_kind: 'weekly' or 'monthly' contracts
+        product_type: HistoricalPrice product type of the underlying candles
+
+    Returns:
+        MarketData
+    """
+    from apps.brokers.models import HistoricalPrice
+    from apps.core.services.trading_calendar import TradingCalendar, load_market_holidays
+    from apps.data.models import Event, OptionChain
+
+    started = time.monotonic()
+    candle_fields = ('datetime', 'open', 'high', 'low', 'close')
+
+    rows = list(
+        HistoricalPrice.objects.filter(
+            stock_code=symbol, product_type=product_type,
+            datetime__date__gte=start, datetime__date__lte=end,
+        ).order_by('datetime').values_list(*candle_fields)
+    )
+    dates, opens, highs, lows, closes = _daily_bars(rows)
+
+    vix_rows = list(
+        HistoricalPrice.objects.filter(
+            stock_code=BACKTEST_VIX_SYMBOL,
+            datetime__date__gte=start - timedelta(days=10), datetime__date__lte=end,
+        ).order_by('datetime').values_list(*candle_fields)
+    )
+    vix_dates, _, _, _, vix_closes = _daily_bars(vix_rows)
+    vix = _align(dates, vix_dates, vix_closes, BACKTEST_DEFAULT_VIX)
+
+    # Option prices: daily option candles first, OptionChain snapshots fill the gaps
+    option_closes: Dict[Tuple[str, int, str], np.ndarray] = {}
+
+    def store(day, expiry, strike, option_type, price):
+        index = np.searchsorted(dates, np.datetime64(day, 'D'))
+        if index >= len(dates) or dates[index] != np.datetime64(day, 'D'):
+            return
+        key = (expiry.isoformat(), int(round(float(strike))), option_type)
+        series = option_closes.get(key)
+        if series is None:
+            series = option_closes[key] = np.full(len(dates), np.nan)
+        series[index] = float(price)
+
+    option_rows = HistoricalPrice.objects.filter(
+        stock_code=symbol, product_type='options', expiry_date__isnull=False,
+        datetime__date__gte=start, datetime__date__lte=end,
+    ).order_by('datetime').values_list('datetime', 'expiry_date', 'strike_price', 'right', 'close')
+    listed_expiries = set()
+    for moment, expiry, strike, right, price in option_rows.iterator():
+        option_type = 'CE' if right.lower().startswith('c') else 'PE'
+        store(_local_date(moment), expiry, strike, option_type, price)
+        listed_expiries.add(expiry)
+
+    snapshots = OptionChain.objects.filter(
+        underlying=symbol, snapshot_time__date__gte=start, snapshot_time__date__lte=end,
+    ).order_by('snapshot_time').values_list('snapshot_time', 'expiry_date', 'strike', 'option_type', 'ltp')
+    for moment, expiry, strike, option_type, price in snapshots.iterator():
+        key = (expiry.isoformat(), int(round(float(strike))), option_type)
+        index = np.searchsorted(dates, np.datetime64(_local_date(moment), 'D'))
+        if key in option_closes and index < len(dates) and not np.isnan(option_closes[key][index]):
+            continue
+        store(_local_date(moment), expiry, strike, option_type, price)
+        listed_expiries.add(expiry)
+
+    # Expiries: listed contracts when stored, otherwise the trading calendar rules
+    if listed_expiries and expiry_kind == 'weekly':
+        expiries = sorted(listed_expiries)
+    else:
+        calendar = TradingCalendar(
+            holidays=load_market_holidays(), start=start,
+            horizon_days=(end - start).days + 120, built_for=start,
+        )
+        expiries = calendar.expiries(symbol, kind=expiry_kind, from_date=start)
+
+    event_dates = list(
+        Event.objects.filter(
+            event_date__gte=start, event_date__lte=end + timedelta(days=30),
+            importance__in=['HIGH', 'CRITICAL'],
+        ).values_list('event_date', flat=True)
+    )
+
+    data = MarketData(
+        symbol=symbol,
+        dates=dates,
+        open=opens,
+        high=highs,
+        low=lows,
+        close=closes,
+        vix=vix,
+        expiries=np.array(sorted(expiries), dtype='datetime64[D]'),
+        event_dates=np.array(sorted(event_dates), dtype='datetime64[D]'),
+        option_closes=option_closes,
+    )
+    logger.info(
+        f"Loaded {len(data)} days of {symbol} ({start} to {end}), {len(option_closes)} option "
+        f"series, {len(data.expiries)} expiries in {time.monotonic() - started:.2f}s"
+    )
+    return data
+
+
+# ========== Pricing ==========
+
+def black_scholes_prices(spot, strike, years, volatility,
+                         rate: float = BACKTEST_RISK_FREE_RATE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized Black-Scholes call and put prices; intrinsic value once expired.
+
+    Args:
+        spot, strike, years, volatility: Broadcastable arrays (years to expiry,
+            annualized volatility as a fraction)
+        rate: Annualized risk-free rate
+
+    Returns:
+        tuple: (call prices, put prices)
+    """
+    spot, strike, years, volatility = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (spot, strike, years, volatility))
+    )
+    live_years = np.maximum(years, 1e-8)
+    d1, d2 = black_scholes_d1_d2(spot, strike, live_years, np.maximum(volatility, 1e-4), rate)
+    discounted = strike * np.exp(-rate * live_years)
+
+    call = spot * norm_cdf(d1) - discounted * norm_cdf(d2)
+    put = discounted * norm_cdf(-d2) - spot * norm_cdf(-d1)
+
+    expired = years <= 0
+    call = np.where(expired, np.maximum(spot - strike, 0.0), call)
+    put = np.where(expired, np.maximum(strike - spot, 0.0), put)
+    return call, put
+
+
+# ========== Strike selection ==========
+
+def kotak_strikes(spot, days_to_expiry, vix, base_delta_pct: float = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized kotak_strangle.calculate_strikes.
+
+    strike_distance = spot x (adjusted_delta / 100) x days_to_expiry, with the
+    delta widened 10% above the normal VIX threshold and 20% above the elevated
+    one; strikes rounded to 100.
+    """
+    spot = np.asarray(spot, dtype=float)
+    vix = np.asarray(vix, dtype=float)
+    if base_delta_pct is None:
+        base_delta_pct = float(KOTAK_STRANGLE_PARAMS['base_delta_pct'])
+
+    multiplier = np.where(
+        vix > KOTAK_STRANGLE_PARAMS['vix_elevated_threshold'],
+        float(KOTAK_STRANGLE_PARAMS['vix_high_multiplier']),
+        np.where(
+            vix > KOTAK_STRANGLE_PARAMS['vix_normal_threshold'],
+            float(KOTAK_STRANGLE_PARAMS['vix_elevated_multiplier']),
+            1.0,
+        ),
+    )
+    distance = spot * (base_delta_pct * multiplier / 100) * np.asarray(days_to_expiry, dtype=float)
+    return np.round((spot + distance) / 100) * 100, np.round((spot - distance) / 100) * 100
+
+
+def delta_algorithm_strikes(spot, days_to_expiry, vix, base_delta_pct: float = 0.5,
+                            short_expiry_delta_pct: float = 0.75) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized StrangleDeltaAlgorithm.calculate_strikes without market conditions.
+
+    Base delta is short_expiry_delta_pct for DTE <= 2, scaled by the VIX
+    multiplier (0.9 / 1.0 / 1.5 / 1.8 / 2.0); strikes rounded to 50.
+    """
+    spot = np.asarray(spot, dtype=float)
+    vix = np.asarray(vix, dtype=float)
+    days_to_expiry = np.asarray(days_to_expiry, dtype=float)
+
+    base_delta = np.where(days_to_expiry <= 2, short_expiry_delta_pct, base_delta_pct)
+    multiplier = np.select(
+        [vix < 10, vix < 12.5, vix < 14, vix < 18],
+        [0.9, 1.0, 1.5, 1.8],
+        default=2.0,
+    )
+    distance = spot * (base_delta * multiplier / 100) * days_to_expiry
+    return np.round((spot + distance) / 50) * 50, np.round((spot - distance) / 50) * 50
+
+
+# ========== Entry filters ==========
+
+def _rolling_bollinger(close: np.ndarray, period: int, std_dev: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Upper and lower bands over the last `period` closes (NaN until warmed up)."""
+    upper = np.full(len(close), np.nan)
+    lower = np.full(len(close), np.nan)
+    if len(close) < period:
+        return upper, lower
+    windows = np.lib.stride_tricks.sliding_window_view(close, period)
+    middle = windows.mean(axis=1)
+    spread = windows.std(axis=1, ddof=1) * std_dev  # statistics.stdev, as the live filter
+    upper[period - 1:] = middle + spread
+    lower[period - 1:] = middle - spread
+    return upper, lower
+
+
+def strangle_entry_mask(data: MarketData, params: Dict) -> np.ndarray:
+    """
+    Days on which the replayable strangle entry filters pass.
+
+    Mirrors apps.strategies.filters: VIX threshold, Nifty 1-day and 3-day move,
+    Bollinger band extremes (0.5% buffer) and major events ahead. Global
+    market filters (SGX Nifty, US markets) have no stored history and are
+    skipped.
+    """
+    close = data.close
+    mask = np.ones(len(data), dtype=bool)
+    if not params['use_filters']:
+        return mask
+
+    mask &= data.vix <= params['vix_max']
+
+    for days, limit in ((1, params['max_1day_change_pct']), (3, params['max_3day_change_pct'])):
+        change = np.full(len(close), np.nan)
+        change[days:] = (close[days:] / close[:-days] - 1) * 100
+        mask &= np.nan_to_num(np.abs(change), nan=0.0) <= limit
+
+    upper, lower = _rolling_bollinger(close, int(params['bollinger_period']), params['bollinger_std'])
+    buffer = params['bollinger_buffer_pct'] / 100
+    mask &= ~(close >= upper * (1 - buffer)) & ~(close <= lower * (1 + buffer))
+
+    if len(data.event_dates):
+        # Any HIGH/CRITICAL event in [day, day + N] blocks entry
+        first = np.searchsorted(data.event_dates, data.dates, side='left')
+        last = np.searchsorted(
+            data.event_dates, data.dates + np.timedelta64(int(params['event_days_ahead']), 'D'), side='right'
+        )
+        mask &= last == first
+
+    return mask
+
+
+# ========== Simulation helpers ==========
+
+def _entry_expiries(data: MarketData, min_days: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Nearest expiry at least min_days away for every day.
+
+    Returns:
+        tuple: (expiry per day, days to expiry, index of the last bar on or
+            before the expiry; -1 where the contract outlives the data)
+    """
+    if not len(data.expiries):
+        raise ValueError(f"No expiries available for {data.symbol}")
+    position = np.searchsorted(data.expiries, data.dates + np.timedelta64(int(min_days), 'D'))
+    has_expiry = position < len(data.expiries)
+    expiry = data.expiries[np.minimum(position, len(data.expiries) - 1)]
+    days_to_expiry = (expiry - data.dates).astype(int)
+
+    exit_index = np.searchsorted(data.dates, expiry, side='right') - 1
+    complete = has_expiry & (expiry <= data.dates[-1])
+    return expiry, days_to_expiry, np.where(complete, exit_index, -1)
+
+
+def _path_matrix(entries: np.ndarray, exit_index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bar indices following each entry up to its expiry bar.
+
+    Returns:
+        tuple: (index matrix (entries x horizon), valid mask)
+    """
+    horizon = max(int((exit_index - entries).max()), 1)
+    index = entries[:, None] + np.arange(1, horizon + 1)[None, :]
+    valid = index <= exit_index[:, None]
+    return np.minimum(index, exit_index[:, None]), valid
+
+
+def _first_exit(exit_mask: np.ndarray) -> np.ndarray:
+    """Column of the first exit per row (rows always exit on their last valid bar)."""
+    return exit_mask.argmax(axis=1)
+
+
+def _select_sequential(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """Rows taken when only one position is open at a time."""
+    taken = np.zeros(len(entries), dtype=bool)
+    free_after = -1
+    for row in range(len(entries)):
+        if entries[row] > free_after:
+            taken[row] = True
+            free_after = exits[row]
+    return taken
+
+
+def summarize_trades(pnl: np.ndarray, exit_order: Optional[np.ndarray] = None,
+                     reasons: Optional[np.ndarray] = None) -> Dict:
+    """
+    Performance statistics for an array of trade P&Ls.
+
+    Returns:
+        dict: trades, wins, losses, win_rate, total_pnl, avg_profit, avg_loss,
+            expectancy, profit_factor, max_drawdown, exit_reasons
+    """
+    pnl = np.asarray(pnl, dtype=float)
+    if exit_order is not None:
+        pnl = pnl[np.argsort(exit_order, kind='stable')]
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl <= 0]
+    equity = np.cumsum(pnl)
+    drawdown = np.maximum.accumulate(np.append(0.0, equity))[1:] - equity if len(pnl) else np.zeros(0)
+    gross_loss = float(-losses.sum())
+
+    summary = {
+        'trades': int(len(pnl)),
+        'wins': int(len(wins)),
+        'losses': int(len(losses)),
+        'win_rate': round(len(wins) / len(pnl) * 100, 2) if len(pnl) else 0.0,
+        'total_pnl': round(float(pnl.sum()), 2),
+        'avg_profit': round(float(wins.mean()), 2) if len(wins) else 0.0,
+        'avg_loss': round(float(losses.mean()), 2) if len(losses) else 0.0,
+        'expectancy': round(float(pnl.mean()), 2) if len(pnl) else 0.0,
+        'profit_factor': round(float(wins.sum()) / gross_loss, 2) if gross_loss > 0 else None,
+        'max_drawdown': round(float(drawdown.max()), 2) if len(drawdown) else 0.0,
+    }
+    if reasons is not None:
+        names, counts = np.unique(reasons, return_counts=True)
+        summary['exit_reasons'] = {str(name): int(count) for name, count in zip(names, counts)}
+    return summary
+
+
+@dataclass
+class BacktestResult:
+    """Trades (column arrays) and summary of one backtest run."""
+    strategy: str
+    params: Dict
+    trades: Dict[str, np.ndarray]
+    summary: Dict
+
+    def trade_list(self) -> List[Dict]:
+        """Trades as JSON-friendly dicts."""
+        columns = list(self.trades)
+        rows = []
+        for values in zip(*(self.trades[name] for name in columns)):
+            row = {}
+            for name, value in zip(columns, values):
+                if isinstance(value, np.datetime64):
+                    value = str(value)
+                elif isinstance(value, np.generic):
+                    value = value.item()
+                row[name] = value
+            rows.append(row)
+        return rows
+
+
+def _empty_result(strategy: str, params: Dict) -> BacktestResult:
+    return BacktestResult(strategy, params, {}, summarize_trades(np.zeros(0), reasons=np.array([])))
+
+
+# ========== Kotak Strangle ==========
+
+def _strangle_values(spot, call_strike, put_strike, years, volatility) -> np.ndarray:
+    """Model value of the short call plus the short put."""
+    call = black_scholes_prices(spot, call_strike, years, volatility)[0]
+    put = black_scholes_prices(spot, put_strike, years, volatility)[1]
+    return call + put
+
+
+def backtest_strangle(data: MarketData, params: Optional[Dict] = None) -> BacktestResult:
+    """
+    Replay short strangles on daily bars.
+
+    Entries are at the close of each eligible day with the strike selection of
+    params['strike_method']. On every following bar the position is checked
+    for the stop loss (worst intraday mark, fills at the stop or a worse open),
+    the target and the EOD exit-day rule (close marks), and is closed at the
+    close of expiry day otherwise.
+
+    Args:
+        data: MarketData
+        params: Overrides of STRANGLE_DEFAULTS
+
+    Returns:
+        BacktestResult (P&L in rupees for params['lots'] x params['lot_size'])
+    """
+    params = {**STRANGLE_DEFAULTS, **(params or {})}
+    if len(data) < 2:
+        return _empty_result('strangle', params)
+
+    expiry, days_to_expiry, exit_index = _entry_expiries(data, params['min_days_to_expiry'])
+    eligible = strangle_entry_mask(data, params) & (exit_index > np.arange(len(data)))
+    entries = np.flatnonzero(eligible)
+    if not len(entries):
+        return _empty_result('strangle', params)
+
+    spot = data.close[entries]
+    vix = data.vix[entries]
+    dte = days_to_expiry[entries]
+    if params['strike_method'] == 'delta':
+        call_strike, put_strike = delta_algorithm_strikes(
+            spot, dte, vix, params['base_delta_pct'], params['short_expiry_delta_pct']
+        )
+    else:
+        call_strike, put_strike = kotak_strikes(spot, dte, vix, params['base_delta_pct'])
+
+    row_expiry = expiry[entries]
+    row_exit = exit_index[entries]
+
+    entry_premium = _strangle_values(spot, call_strike, put_strike, dte / 365.0, vix / 100)
+
+    # Bar matrices: one row per entry, one column per following day
+    index, valid = _path_matrix(entries, row_exit)
+    strikes = (call_strike[:, None], put_strike[:, None])
+    years = (row_expiry[:, None] - data.dates[index]).astype(float) / 365.0
+    volatility = data.vix[index] / 100
+
+    close_value = _strangle_values(data.close[index], *strikes, years, volatility)
+    open_value = _strangle_values(data.open[index], *strikes, years + 0.25 / 365, volatility)
+    worst_value = np.maximum(
+        _strangle_values(data.high[index], *strikes, years, volatility),
+        _strangle_values(data.low[index], *strikes, years, volatility),
+    )
+
+    # Stored option prices replace model marks
+    for row in range(len(entries)):
+        for leg, strike, option_type in ((0, call_strike[row], 'CE'), (1, put_strike[row], 'PE')):
+            stored = data.option_close(row_expiry[row], strike, option_type)
+            if stored is None:
+                continue
+            model_call, model_put = black_scholes_prices(
+                data.close[index[row]], strike, years[row], volatility[row]
+            )
+            observed = stored[index[row]]
+            correction = np.where(np.isnan(observed), 0.0, observed - (model_call if leg == 0 else model_put))
+            close_value[row] += correction
+            if not np.isnan(stored[entries[row]]):
+                model_entry = black_scholes_prices(spot[row], strike, dte[row] / 365.0, vix[row] / 100)[leg]
+                entry_premium[row] += stored[entries[row]] - model_entry
+
+    entry_premium = np.maximum(entry_premium, 0.05)  # One tick; far OTM model prices round to zero
+    premium = entry_premium[:, None]
+    stop_value = premium * (1 + params['stop_loss_pct'] / 100)
+    profit_pct = (premium - close_value) / premium * 100
+
+    exit_weekday = WEEKDAYS.index(str(params['exit_day']).upper())
+    weekday = (data.dates[index].astype('datetime64[D]').view('int64') - 4) % 7  # 1970-01-01 was a Thursday
+
+    stop_hit = valid & (worst_value >= stop_value)
+    target_hit = valid & (profit_pct >= params['target_profit_pct'])
+    eod_exit = valid & (weekday == exit_weekday) & (profit_pct >= params['min_profit_pct_to_exit'])
+    expiry_exit = valid & (index == row_exit[:, None])
+
+    column = _first_exit(stop_hit | target_hit | eod_exit | expiry_exit)
+    rows = np.arange(len(entries))
+    stopped = stop_hit[rows, column]
+    exit_value = np.where(
+        stopped,
+        np.maximum(stop_value[:, 0], open_value[rows, column]),
+        close_value[rows, column],
+    )
+    reason = np.select(
+        [stopped, target_hit[rows, column], eod_exit[rows, column]],
+        ['STOP_LOSS', 'TARGET', 'EOD_EXIT'],
+        default='EXPIRY',
+    )
+    exit_bar = index[rows, column]
+
+    taken = np.ones(len(entries), dtype=bool) if params['overlapping'] else _select_sequential(entries, exit_bar)
+    quantity = params['lot_size'] * params['lots']
+    pnl_points = entry_premium - exit_value
+
+    trades = {
+        'entry_date': data.dates[entries][taken],
+        'exit_date': data.dates[exit_bar][taken],
+        'expiry': row_expiry[taken],
+        'days_to_expiry': dte[taken],
+        'spot': spot[taken],
+        'vix': vix[taken],
+        'call_strike': call_strike[taken],
+        'put_strike': put_strike[taken],
+        'entry_premium': np.round(entry_premium[taken], 2),
+        'exit_value': np.round(exit_value[taken], 2),
+        'pnl_pct': np.round((pnl_points / entry_premium * 100)[taken], 2),
+        'pnl': np.round(pnl_points[taken] * quantity, 2),
+        'exit_reason': reason[taken],
+    }
+    summary = summarize_trades(trades['pnl'], exit_bar[taken], trades['exit_reason'])
+    summary['eligible_days'] = int(len(entries))
+    return BacktestResult('strangle', params, trades, summary)
+
+
+# ========== ICICI Futures ==========
+
+def futures_signals(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Trend direction per day: +1 long, -1 short, 0 flat.
+
+    Long when the close is above a rising simple moving average, short when
+    below a falling one.
+    """
+    signal = np.zeros(len(close), dtype=int)
+    if len(close) <= period:
+        return signal
+    sma = np.full(len(close), np.nan)
+    sma[period - 1:] = np.convolve(close, np.ones(period) / period, mode='valid')
+    rising = np.zeros(len(close), dtype=bool)
+    falling = np.zeros(len(close), dtype=bool)
+    rising[1:] = sma[1:] > sma[:-1]
+    falling[1:] = sma[1:] < sma[:-1]
+    signal[(close > sma) & rising] = 1
+    signal[(close < sma) & falling] = -1
+    return signal
+
+
+def backtest_futures(data: MarketData, params: Optional[Dict] = None) -> BacktestResult:
+    """
+    Replay ICICI futures trades on daily bars.
+
+    Direction comes from futures_signals (the live OI/LLM screen has no stored
+    history). Entries are at the close on signal days; the stop loss and
+    target are checked against each bar's low/high, averaging adds one unit
+    at the trigger loss (up to max_average_attempts) when it sits inside the
+    stop, and open positions close at the expiry-day close.
+
+    Args:
+        data: MarketData (monthly expiries)
+        params: Overrides of FUTURES_DEFAULTS
+
+    Returns:
+        BacktestResult (P&L in rupees per params['lot_size'] units)
+    """
+    params = {**FUTURES_DEFAULTS, **(params or {})}
+    if len(data) < 2:
+        return _empty_result('futures', params)
+
+    expiry, _, exit_index = _entry_expiries(data, params['min_days_to_expiry'])
+    signal = futures_signals(data.close, int(params['trend_period']))
+    entries = np.flatnonzero((signal != 0) & (exit_index > np.arange(len(data))))
+    if not len(entries):
+        return _empty_result('futures', params)
+
+    direction = signal[entries].astype(float)
+    row_exit = exit_index[entries]
+    index, valid = _path_matrix(entries, row_exit)
+    rows = np.arange(len(entries))
+
+    worst = np.where(direction[:, None] > 0, data.low[index], data.high[index])
+    best = np.where(direction[:, None] > 0, data.high[index], data.low[index])
+
+    average = data.close[entries].copy()
+    units = np.ones(len(entries))
+    stop_pct = np.full(len(entries), params['stop_loss_pct'])
+    averages_left = np.full(
+        len(entries), params['max_average_attempts'] if params['allow_averaging'] else 0
+    )
+    start_column = np.zeros(len(entries), dtype=int)
+    open_rows = np.ones(len(entries), dtype=bool)
+    exit_price = np.zeros(len(entries))
+    exit_column = np.zeros(len(entries), dtype=int)
+    reason = np.full(len(entries), 'EXPIRY', dtype=object)
+
+    # Each pass resolves the next event of every open row: exit or averaging
+    for _ in range(int(params['max_average_attempts']) + 2):
+        if not open_rows.any():
+            break
+        live = valid & (np.arange(index.shape[1])[None, :] >= start_column[:, None])
+        adverse = direction[:, None] * (average[:, None] - worst) / average[:, None] * 100
+        favourable = direction[:, None] * (best - average[:, None]) / average[:, None] * 100
+
+        stop_hit = live & (adverse >= stop_pct[:, None])
+        target_hit = live & (favourable >= params['target_pct'])
+        average_hit = live & (averages_left[:, None] > 0) & \
+            (adverse >= params['average_trigger_loss_pct']) & \
+            (params['average_trigger_loss_pct'] < stop_pct[:, None])
+        expiry_hit = live & (index == row_exit[:, None])
+
+        column = _first_exit(stop_hit | target_hit | average_hit | expiry_hit)
+        averaged = open_rows & average_hit[rows, column]
+        closing = open_rows & ~averaged
+
+        stopped = stop_hit[rows, column]
+        targeted = target_hit[rows, column]
+        exit_price = np.where(closing & stopped, average * (1 - direction * stop_pct / 100), exit_price)
+        exit_price = np.where(
+            closing & ~stopped & targeted, average * (1 + direction * params['target_pct'] / 100), exit_price
+        )
+        exit_price = np.where(closing & ~stopped & ~targeted, data.close[index[rows, column]], exit_price)
+        reason = np.where(closing, np.select([stopped, targeted], ['STOP_LOSS', 'TARGET'], 'EXPIRY'), reason)
+        exit_column = np.where(closing, column, exit_column)
+        open_rows &= ~closing
+
+        # Averaging: add one unit at the trigger price, re-check from the same bar
+        fill = average * (1 - direction * params['average_trigger_loss_pct'] / 100)
+        average = np.where(averaged, (average * units + fill) / (units + 1), average)
+        units = np.where(averaged, units + 1, units)
+        stop_pct = np.where(averaged, params['averaging_stop_loss_pct'], stop_pct)
+        averages_left = np.where(averaged, averages_left - 1, averages_left)
+        start_column = np.where(averaged, column, start_column)
+
+    exit_bar = index[rows, exit_column]
+    taken = np.ones(len(entries), dtype=bool) if params['overlapping'] else _select_sequential(entries, exit_bar)
+    pnl_per_unit = direction * (exit_price - average)
+
+    trades = {
+        'entry_date': data.dates[entries][taken],
+        'exit_date': data.dates[exit_bar][taken],
+        'expiry': expiry[entries][taken],
+        'direction': np.where(direction > 0, 'LONG', 'SHORT')[taken],
+        'entry_price': np.round(data.close[entries][taken], 2),
+        'average_price': np.round(average[taken], 2),
+        'units': units[taken].astype(int),
+        'exit_price': np.round(exit_price[taken], 2),
+        'pnl_pct': np.round((pnl_per_unit / average * 100)[taken], 2),
+        'pnl': np.round((pnl_per_unit * units * params['lot_size'])[taken], 2),
+        'exit_reason': reason[taken].astype(str),
+    }
+    summary = summarize_trades(trades['pnl'], exit_bar[taken], trades['exit_reason'])
+    summary['signal_days'] = int(len(entries))
+    return BacktestResult('futures', params, trades, summary)
+
+
+BACKTESTS = {
+    'strangle': backtest_strangle,
+    'futures': backtest_futures,
+}
+
+
+def run_backtest(strategy: str, data: MarketData, params: Optional[Dict] = None) -> BacktestResult:
+    """Run one backtest ('strangle' or 'futures')."""
+    if strategy not in BACKTESTS:
+        raise ValueError(f"Unknown backtest strategy: {strategy}")
+    return BACKTESTS[strategy](data, params)
+
+
+# ========== Parameter sweeps ==========
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    """Every combination of the grid values, in a stable order."""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+_worker_data: Optional[MarketData] = None
+
+
+def _init_worker(data: MarketData):
+    global _worker_data
+    _worker_data = data
+
+
+def _evaluate(strategy: str, data: MarketData, params: Dict) -> Dict:
+    result = run_backtest(strategy, data, params)
+    return {'params': params, 'summary': result.summary}
+
+
+def _evaluate_in_worker(job: Tuple[str, Dict]) -> Dict:
+    strategy, params = job
+    return _evaluate(strategy, _worker_data, params)
+
+
+def run_parameter_sweep(
+    strategy: str,
+    data: MarketData,
+    grid: Dict[str, List],
+    base_params: Optional[Dict] = None,
+    workers: Optional[int] = None,
+) -> Dict:
+    """
+    Backtest every combination of grid values.
+
+    The market data is sent to each worker process once (pool initializer);
+    jobs only carry the parameter dicts.
+
+    Args:
+        strategy: 'strangle' or 'futures'
+        data: MarketData
+        grid: {parameter: [values]}
+        base_params: Parameters shared by every combination
+        workers: Worker processes (None = one per CPU, 1 = run in-process)
+
+    Returns:
+        dict: {
+            'strategy', 'grid', 'period', 'baseline': {'params', 'summary'},
+            'results': [{'params', 'summary'}] sorted by total P&L,
+            'trades_simulated', 'elapsed_seconds'
+        }
+    """
+    if strategy not in BACKTESTS:
+        raise ValueError(f"Unknown backtest strategy: {strategy}")
+    base_params = dict(base_params or {})
+    combinations = [{**base_params, **combo} for combo in expand_grid(grid)]
+    started = time.monotonic()
+
+    if workers == 1 or len(combinations) <= 1:
+        results = [_evaluate(strategy, data, params) for params in combinations]
+    else:
+        jobs = [(strategy, params) for params in combinations]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+            chunk = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(_evaluate_in_worker, jobs, chunksize=chunk))
+
+    baseline = _evaluate(strategy, data, base_params)
+    results.sort(key=lambda result: result['summary']['total_pnl'], reverse=True)
+    elapsed = time.monotonic() - started
+
+    trades_simulated = sum(result['summary']['trades'] for result in results)
+    logger.info(
+        f"{strategy} sweep: {len(combinations)} combinations, {trades_simulated} trades "
+        f"in {elapsed:.2f}s"
+    )
+    return {
+        'strategy': strategy,
+        'symbol': data.symbol,
+        'grid': grid,
+        'period': [str(data.dates[0]), str(data.dates[-1])] if len(data) else [],
+        'baseline': baseline,
+        'results': results,
+        'trades_simulated': trades_simulated,
+        'elapsed_seconds': round(elapsed, 3),
+    }
+
+
+# ========== Learning records ==========
+
+def _defaults_for(strategy: str) -> Dict:
+    return STRANGLE_DEFAULTS if strategy == 'strangle' else FUTURES_DEFAULTS
+
+
+def _format_params(params: Dict) -> str:
+    return ', '.join(f"{name}={value}" for name, value in sorted(params.items()))
+
+
+def _pattern_type(grid: Dict) -> str:
+    if set(grid) & STRIKE_PARAMETERS:
+        return 'STRIKE_SELECTION'
+    if any(PARAMETER_CATEGORIES.get(name) in ('exit', 'risk') for name in grid):
+        return 'EXIT_TIMING'
+    return 'ENTRY_TIMING'
+
+
+def record_sweep(session, sweep: Dict, min_trades: int = BACKTEST_MIN_TRADES) -> Dict:
+    """
+    Store a parameter sweep as learning patterns and parameter suggestions.
+
+    One LearningPattern per combination (updated in place when the sweep is
+    re-run in the same session). When the best combination with at least
+    min_trades simulated trades beats the baseline, each swept parameter that
+    differs becomes a SUGGESTED ParameterAdjustment (refreshed, not duplicated,
+    when the sweep is re-run).
+
+    Args:
+        session: LearningSession
+        sweep: Result of run_parameter_sweep
+        min_trades: Trades a combination needs to be actionable
+
+    Returns:
+        dict: {'patterns': int, 'adjustments': int}
+    """
+    from django.db import transaction
+    from apps.analytics.models import LearningPattern, ParameterAdjustment
+
+    strategy = sweep['strategy']
+    grid = sweep['grid']
+    pattern_type = _pattern_type(grid)
+    baseline = sweep['baseline']['summary']
+    defaults = {**_defaults_for(strategy), **sweep['baseline']['params']}
+
+    patterns = 0
+    adjustments = 0
+    with transaction.atomic():
+        for result in sweep['results']:
+            summary = result['summary']
+            swept = {name: result['params'][name] for name in grid}
+            trades = summary['trades']
+            confidence = min(100.0, trades * BACKTEST_CONFIDENCE_PER_TRADE)
+            is_actionable = trades >= min_trades and summary['total_pnl'] > baseline['total_pnl']
+
+            LearningPattern.objects.update_or_create(
+                session=session,
+                pattern_type=pattern_type,
+                name=f"Backtest {strategy}: {_format_params(swept)}"[:200],
+                defaults={
+                    'description': (
+                        f"{trades} simulated {strategy} trades on {sweep['symbol']} "
+                        f"({' to '.join(sweep['period'])}), total P&L ₹{summary['total_pnl']:,.0f} "
+                        f"vs baseline ₹{baseline['total_pnl']:,.0f}"
+                    ),
+                    'conditions': {
+                        'source': 'backtest',
+                        'strategy': strategy,
+                        'symbol': sweep['symbol'],
+                        'period': sweep['period'],
+                        'parameters': swept,
+                        'summary': summary,
+                    },
+                    'occurrences': trades,
+                    'profitable_occurrences': summary['wins'],
+                    'unprofitable_occurrences': summary['losses'],
+                    'success_rate': Decimal(str(summary['win_rate'])),
+                    'avg_profit': Decimal(str(summary['avg_profit'])),
+                    'avg_loss': Decimal(str(summary['avg_loss'])),
+                    'confidence_score': Decimal(str(confidence)),
+                    'is_actionable': is_actionable,
+                    'recommendation': (
+                        f"Consider {_format_params(swept)}" if is_actionable else ''
+                    ),
+                    'validation_status': 'TESTING',
+                },
+            )
+            patterns += 1
+
+        best = next(
+            (result for result in sweep['results'] if result['summary']['trades'] >= min_trades), None
+        )
+        if best and best['summary']['total_pnl'] > baseline['total_pnl']:
+            summary = best['summary']
+            improvement = (
+                (summary['total_pnl'] - baseline['total_pnl']) / abs(baseline['total_pnl']) * 100
+                if baseline['total_pnl'] else 100.0
+            )
+            riskier = (
+                summary['max_drawdown'] > baseline['max_drawdown']
+                or summary['win_rate'] < baseline['win_rate']
+            )
+            for name in grid:
+                current, suggested = defaults.get(name), best['params'][name]
+                if str(current) == str(suggested):
+                    continue
+                # A re-run refreshes the open suggestion instead of adding another
+                ParameterAdjustment.objects.update_or_create(
+                    session=session,
+                    parameter_name=name,
+                    status='SUGGESTED',
+                    defaults={
+                        'parameter_category': PARAMETER_CATEGORIES.get(name, 'strategy'),
+                        'current_value': str(current),
+                        'suggested_value': str(suggested),
+                        'reason': (
+                            f"Backtest of {summary['trades']} {strategy} trades: {name}={suggested} "
+                            f"made ₹{summary['total_pnl']:,.0f} ({summary['win_rate']}% wins) vs "
+                            f"₹{baseline['total_pnl']:,.0f} ({baseline['win_rate']}% wins) with {name}={current}"
+                        ),
+                        'supporting_data': {
+                            'source': 'backtest',
+                            'strategy': strategy,
+                            'period': sweep['period'],
+                            'best_parameters': {key: best['params'][key] for key in grid},
+                            'best': summary,
+                            'baseline': baseline,
+                            'combinations': len(sweep['results']),
+                            'trades_simulated': sweep['trades_simulated'],
+                        },
+                        'expected_improvement_pct': Decimal(str(round(min(improvement, 999999.0), 4))),
+                        'confidence': Decimal(str(min(100.0, summary['trades'] * BACKTEST_CONFIDENCE_PER_TRADE))),
+                        'risk_level': 'MEDIUM' if riskier else 'LOW',
+                    },
+                )
+                adjustments += 1
+
+        session.trades_analyzed += sweep['trades_simulated']
+        session.patterns_discovered += patterns
+        session.parameters_adjusted += adjustments
+        session.save(update_fields=['trades_analyzed', 'patterns_discovered', 'parameters_adjusted', 'updated_at'])
+
+    logger.info(f"Recorded backtest sweep: {patterns} patterns, {adjustments} adjustments")
+    return {'patterns': patterns, 'adjustments': adjustments}
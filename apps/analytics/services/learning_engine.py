@@ -15,6 +15,7 @@ Key Features:
 import logging
 from decimal import Decimal
 from datetime import datetime, timedelta
+from django.db import transaction
 from django.utils import timezone
 from django.db.models import Avg, Sum, Count, Q
 
@@ -25,6 +26,7 @@ from apps.analytics.models import (
     ParameterAdjustment,
     PerformanceMetric,
 )
+from apps.analytics.services.trade_aggregates import record_trade, strike_distance_pct
 from apps.positions.models import Position
 
 logger = logging.getLogger(__name__)
@@ -138,7 +140,7 @@ class LearningEngine:
         positions = Position.objects.filter(
             status='CLOSED',
             performance_analysis__isnull=True
-        ).select_related('account', 'strategy')
+        ).select_related('account')
 
         if not positions.exists():
             logger.info("No new trades to analyze")
@@ -159,6 +161,23 @@ class LearningEngine:
         logger.info(f"✅ Analyzed {analyzed_count} trades")
         return analyzed_count
 
+    def analyze_closed_trade(self, position):
+        """
+        Analyze a trade as it closes (never raises, so closing a position
+        cannot fail because of the learning system).
+
+        Returns:
+            TradePerformance or None
+        """
+        if TradePerformance.objects.filter(position=position).exists():
+            return None
+        try:
+            with transaction.atomic():
+                return self._analyze_single_trade(position)
+        except Exception as e:
+            logger.error(f"Error analyzing closed trade {position.id}: {e}")
+            return None
+
     def _analyze_single_trade(self, position):
         """
         Analyze a single trade in detail.
@@ -202,7 +221,10 @@ class LearningEngine:
             lessons_learned=self._generate_lessons(position),
         )
 
-        logger.debug(f"Created performance analysis for {position.symbol}")
+        # Fold the outcome into the per-bucket aggregates used by pattern discovery
+        record_trade(performance)
+
+        logger.debug(f"Created performance analysis for {position.instrument}")
         return performance
 
     def _calculate_entry_score(self, position):
@@ -267,14 +289,30 @@ class LearningEngine:
     def _extract_entry_conditions(self, position):
         """Extract market conditions at entry time."""
         # TODO: Fetch actual market data from entry time
-        return {
+        conditions = {
             'entry_time': position.entry_time.isoformat() if position.entry_time else None,
             'entry_price': float(position.entry_price),
-            'strategy': position.strategy.name if position.strategy else 'Unknown',
+            'strategy': position.strategy_type or 'Unknown',
             'account': position.account.broker,
-            # Add more conditions: VIX, trend, indicators, etc.
+            # Add more conditions: trend, indicators, etc.
         }
 
+        # India VIX at the open of the entry day
+        if position.entry_time:
+            from apps.strategies.models import MarketOpeningState
+
+            vix = MarketOpeningState.objects.filter(
+                trading_date=timezone.localtime(position.entry_time).date()
+            ).values_list('vix_9_15', flat=True).first()
+            if vix is not None:
+                conditions['vix'] = float(vix)
+
+        distance = strike_distance_pct(position)
+        if distance is not None:
+            conditions['strike_distance_pct'] = round(distance, 4)
+
+        return conditions
+
     def _extract_exit_conditions(self, position):
         """Extract market conditions at exit time."""
         if not position.exit_time:
@@ -397,18 +435,26 @@ class LearningEngine:
             cutoff = timezone.now() - timedelta(days=30)
             positions = positions.filter(exit_time__gte=cutoff)
 
-        if not positions.exists():
+        # All counts and sums in one query
+        totals = positions.aggregate(
+            total_trades=Count('id'),
+            winning_trades=Count('id', filter=Q(realized_pnl__gt=0)),
+            losing_trades=Count('id', filter=Q(realized_pnl__lt=0)),
+            total_profit=Sum('realized_pnl', filter=Q(realized_pnl__gt=0)),
+            total_loss=Sum('realized_pnl', filter=Q(realized_pnl__lt=0)),
+        )
+
+        total_trades = totals['total_trades']
+        if not total_trades:
             return {}
 
-        # Calculate metrics
-        total_trades = positions.count()
-        winning_trades = positions.filter(realized_pnl__gt=0).count()
-        losing_trades = positions.filter(realized_pnl__lt=0).count()
+        winning_trades = totals['winning_trades']
+        losing_trades = totals['losing_trades']
 
         win_rate = (Decimal(winning_trades) / Decimal(total_trades)) * 100 if total_trades > 0 else Decimal('0.00')
 
-        total_profit = positions.filter(realized_pnl__gt=0).aggregate(Sum('realized_pnl'))['realized_pnl__sum'] or Decimal('0.00')
-        total_loss = abs(positions.filter(realized_pnl__lt=0).aggregate(Sum('realized_pnl'))['realized_pnl__sum'] or Decimal('0.00'))
+        total_profit = totals['total_profit'] or Decimal('0.00')
+        total_loss = abs(totals['total_loss'] or Decimal('0.00'))
 
         profit_factor = total_profit / total_loss if total_loss > 0 else Decimal('0.00')
 
@@ -14,12 +14,9 @@ Pattern Types:
 
 import logging
 from decimal import Decimal
-from datetime import timedelta
-from django.db.models import Avg, Count, Q
-from django.utils import timezone
 
-from apps.analytics.models import TradePerformance, LearningPattern
-from apps.positions.models import Position
+from apps.analytics.models import LearningPattern
+from apps.analytics.services.trade_aggregates import bucket_stats, sync_aggregates
 
 logger = logging.getLogger(__name__)
 
@@ -70,63 +67,16 @@ class PatternRecognizer:
         """
         logger.info("🕐 Discovering entry timing patterns...")
 
-        patterns_found = 0
-
-        # Analyze by hour of day
-        performances = TradePerformance.objects.select_related('position').all()
-
-        hour_stats = {}
-        for perf in performances:
-            if not perf.position.entry_time:
-                continue
-
-            hour = perf.position.entry_time.hour
-            if hour not in hour_stats:
-                hour_stats[hour] = {'profitable': 0, 'unprofitable': 0, 'total': 0}
-
-            hour_stats[hour]['total'] += 1
-            if perf.position.realized_pnl > 0:
-                hour_stats[hour]['profitable'] += 1
-            else:
-                hour_stats[hour]['unprofitable'] += 1
+        def describe(stats):
+            hour = int(stats.bucket)
+            return {
+                'name': f"Entry at {hour}:00-{hour+1}:00",
+                'description': f"Trades entered between {hour}:00 and {hour+1}:00",
+                'conditions': {'hour_range': [hour, hour+1]},
+                'recommendation': self._generate_timing_recommendation(hour, stats.win_rate),
+            }
 
-        # Create patterns for significant hours
-        for hour, stats in hour_stats.items():
-            if stats['total'] < self.min_occurrences:
-                continue
-
-            success_rate = (stats['profitable'] / stats['total']) * 100
-            confidence = min(100.0, stats['total'] * 10)  # More data = more confidence
-
-            # Only create pattern if statistically interesting (>60% or <40%)
-            if success_rate > 60 or success_rate < 40:
-                is_actionable = success_rate > 65  # High success rate = actionable
-
-                recommendation = self._generate_timing_recommendation(hour, success_rate)
-
-                pattern, created = LearningPattern.objects.update_or_create(
-                    session=self.session,
-                    pattern_type='ENTRY_TIMING',
-                    name=f"Entry at {hour}:00-{hour+1}:00",
-                    defaults={
-                        'description': f"Trades entered between {hour}:00 and {hour+1}:00",
-                        'conditions': {'hour_range': [hour, hour+1]},
-                        'occurrences': stats['total'],
-                        'profitable_occurrences': stats['profitable'],
-                        'unprofitable_occurrences': stats['unprofitable'],
-                        'success_rate': Decimal(str(success_rate)),
-                        'confidence_score': Decimal(str(confidence)),
-                        'is_actionable': is_actionable,
-                        'recommendation': recommendation,
-                        'validation_status': 'ACTIVE' if is_actionable else 'TESTING',
-                    }
-                )
-
-                if created:
-                    patterns_found += 1
-                    logger.info(f"  Found pattern: {pattern.name} ({success_rate:.1f}% success)")
-
-        return patterns_found
+        return self._discover_bucket_patterns('ENTRY_HOUR', 'ENTRY_TIMING', describe)
 
     def discover_strike_selection_patterns(self):
         """
@@ -137,12 +87,16 @@ class PatternRecognizer:
         - Strikes ATM have 50% success
         """
         logger.info("🎯 Discovering strike selection patterns...")
-        patterns_found = 0
 
-        # TODO: Implement strike selection pattern discovery
-        # This requires analyzing option positions and their strikes relative to spot
+        def describe(stats):
+            return {
+                'name': f"Strangle width {stats.bucket}%",
+                'description': f"Strangles with strikes {stats.bucket}% from the mid strike",
+                'conditions': {'strike_distance_pct': stats.bucket},
+                'recommendation': f"{'Favor' if stats.win_rate > 60 else 'Avoid'} strikes {stats.bucket}% away",
+            }
 
-        return patterns_found
+        return self._discover_bucket_patterns('STRIKE_DISTANCE', 'STRIKE_SELECTION', describe)
 
     def discover_market_condition_patterns(self):
         """
@@ -153,12 +107,16 @@ class PatternRecognizer:
         - When Nifty trending up, long positions have 80% success
         """
         logger.info("📊 Discovering market condition patterns...")
-        patterns_found = 0
 
-        # TODO: Implement market condition pattern discovery
-        # This requires market data (VIX, trends, etc.) to be stored with trades
+        def describe(stats):
+            return {
+                'name': f"VIX {stats.bucket} at entry",
+                'description': f"Trades entered with India VIX {stats.bucket}",
+                'conditions': {'vix_range': stats.bucket},
+                'recommendation': f"{'Favor' if stats.win_rate > 60 else 'Avoid'} entries when VIX is {stats.bucket}",
+            }
 
-        return patterns_found
+        return self._discover_bucket_patterns('VIX', 'VIX_PATTERN', describe)
 
     def discover_exit_timing_patterns(self):
         """
@@ -169,58 +127,62 @@ class PatternRecognizer:
         - Holding for 2+ days reduces success to 50%
         """
         logger.info("🚪 Discovering exit timing patterns...")
-        patterns_found = 0
 
-        # Analyze by day of week
-        performances = TradePerformance.objects.select_related('position').all()
+        def describe(stats):
+            day = stats.bucket
+            return {
+                'name': f"Exit on {day}",
+                'description': f"Positions exited on {day}",
+                'conditions': {'exit_day': day},
+                'recommendation': f"{'Favor' if stats.win_rate > 60 else 'Avoid'} exits on {day}",
+            }
 
-        day_stats = {}
-        for perf in performances:
-            if not perf.position.exit_time:
-                continue
+        return self._discover_bucket_patterns('EXIT_DAY', 'EXIT_TIMING', describe)
 
-            day = perf.position.exit_time.strftime('%A')  # Monday, Tuesday, etc.
-            if day not in day_stats:
-                day_stats[day] = {'profitable': 0, 'unprofitable': 0, 'total': 0}
+    def _discover_bucket_patterns(self, dimension, pattern_type, describe):
+        """
+        Create or update patterns for the significant buckets of one dimension.
 
-            day_stats[day]['total'] += 1
-            if perf.position.realized_pnl > 0:
-                day_stats[day]['profitable'] += 1
-            else:
-                day_stats[day]['unprofitable'] += 1
+        Reads the running aggregates (apps.analytics.services.trade_aggregates),
+        so the cost does not grow with the number of trades.
+        """
+        sync_aggregates()
+        patterns_found = 0
 
-        # Create patterns for significant days
-        for day, stats in day_stats.items():
-            if stats['total'] < self.min_occurrences:
+        for stats in bucket_stats(dimension, min_trades=self.min_occurrences):
+            success_rate = stats.win_rate
+
+            # Only create pattern if statistically interesting (>60% or <40%)
+            if not (success_rate > 60 or success_rate < 40):
                 continue
 
-            success_rate = (stats['profitable'] / stats['total']) * 100
-            confidence = min(100.0, stats['total'] * 10)
-
-            if success_rate > 60 or success_rate < 40:
-                is_actionable = success_rate > 65
-
-                pattern, created = LearningPattern.objects.update_or_create(
-                    session=self.session,
-                    pattern_type='EXIT_TIMING',
-                    name=f"Exit on {day}",
-                    defaults={
-                        'description': f"Positions exited on {day}",
-                        'conditions': {'exit_day': day},
-                        'occurrences': stats['total'],
-                        'profitable_occurrences': stats['profitable'],
-                        'unprofitable_occurrences': stats['unprofitable'],
-                        'success_rate': Decimal(str(success_rate)),
-                        'confidence_score': Decimal(str(confidence)),
-                        'is_actionable': is_actionable,
-                        'recommendation': f"{'Favor' if success_rate > 60 else 'Avoid'} exits on {day}",
-                        'validation_status': 'ACTIVE' if is_actionable else 'TESTING',
-                    }
-                )
-
-                if created:
-                    patterns_found += 1
-                    logger.info(f"  Found pattern: {pattern.name} ({success_rate:.1f}% success)")
+            is_actionable = success_rate > 65  # High success rate = actionable
+            details = describe(stats)
+
+            pattern, created = LearningPattern.objects.update_or_create(
+                session=self.session,
+                pattern_type=pattern_type,
+                name=details['name'],
+                defaults={
+                    'description': (f"{details['description']} (win rate 95% CI "
+                                    f"{stats.win_rate_low:.0f}-{stats.win_rate_high:.0f}%)"),
+                    'conditions': details['conditions'],
+                    'occurrences': stats.trades,
+                    'profitable_occurrences': stats.wins,
+                    'unprofitable_occurrences': stats.losses,
+                    'success_rate': Decimal(f"{success_rate:.2f}"),
+                    'avg_profit': Decimal(f"{stats.avg_profit:.2f}"),
+                    'avg_loss': Decimal(f"{stats.avg_loss:.2f}"),
+                    'confidence_score': Decimal(f"{stats.confidence:.2f}"),
+                    'is_actionable': is_actionable,
+                    'recommendation': details['recommendation'],
+                    'validation_status': 'ACTIVE' if is_actionable else 'TESTING',
+                }
+            )
+
+            if created:
+                patterns_found += 1
+                logger.info(f"  Found pattern: {pattern.name} ({success_rate:.1f}% success)")
 
         return patterns_found
 
@@ -0,0 +1,339 @@
+"""
+Reporting Queries and P&L Rollups for mCube Trading System
+
+Per-account and per-strategy metrics for a period come from ONE grouped
+query over Position with conditional aggregates (closed-in-period counts and
+sums next to open-position totals); account and overall totals are rolled up
+from those rows in Python. Drawdown needs the trade sequence, which is read
+with one more ordered query for all accounts at once.
+
+The results are written to the DailyPnL / Performance rollup tables, so the
+Telegram reports and the P&L dashboards (apps.core.utils.pnl_aggregator)
+read precomputed rows instead of re-aggregating positions.
+
+Usage:
+    from apps.analytics.services.reporting import period_metrics, update_daily_pnl, update_performance
+
+    report = period_metrics(start, end)          # {'accounts': {...}, 'totals': {...}}
+    update_daily_pnl(today)                      # DailyPnL per account
+    update_performance('WEEKLY', week_start, today)
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from apps.accounts.models import BrokerAccount
+from apps.analytics.models import DailyPnL, Performance
+from apps.core.constants import POSITION_STATUS_ACTIVE, POSITION_STATUS_CLOSED
+from apps.positions.models import Position
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+# Summed when strategy rows are rolled up to accounts and to the overall total
+ADDITIVE_FIELDS = (
+    'trades', 'winning_trades', 'losing_trades', 'breakeven_trades',
+    'realized_pnl', 'gross_profit', 'gross_loss',
+    'active_positions', 'unrealized_pnl', 'capital_deployed',
+)
+
+
+def _metric_aggregates(start: date, end: date) -> Dict:
+    """Conditional aggregates of one (account, strategy) group."""
+    closed = Q(status=POSITION_STATUS_CLOSED, exit_time__date__gte=start, exit_time__date__lte=end)
+    active = Q(status=POSITION_STATUS_ACTIVE)
+    return {
+        'trades': Count('id', filter=closed),
+        'winning_trades': Count('id', filter=closed & Q(realized_pnl__gt=0)),
+        'losing_trades': Count('id', filter=closed & Q(realized_pnl__lt=0)),
+        'breakeven_trades': Count('id', filter=closed & Q(realized_pnl=0)),
+        # Aliases must not clash with the Position fields being summed
+        'closed_pnl': Sum('realized_pnl', filter=closed),
+        'gross_profit': Sum('realized_pnl', filter=closed & Q(realized_pnl__gt=0)),
+        'gross_loss': Sum('realized_pnl', filter=closed & Q(realized_pnl__lt=0)),
+        'best_trade': Max('realized_pnl', filter=closed),
+        'worst_trade': Min('realized_pnl', filter=closed),
+        'active_positions': Count('id', filter=active),
+        'open_pnl': Sum('unrealized_pnl', filter=active),
+        'capital_deployed': Sum('margin_used', filter=active),
+    }
+
+
+def _finish(row: Dict) -> Dict:
+    """Fill None sums with zero and add the derived ratios."""
+    for field in ADDITIVE_FIELDS:
+        row[field] = row.get(field) or (0 if field.endswith(('trades', 'positions')) else ZERO)
+
+    trades = row['trades']
+    row['win_rate'] = (Decimal(row['winning_trades']) / Decimal(trades) * 100) if trades else ZERO
+    row['profit_factor'] = (row['gross_profit'] / abs(row['gross_loss'])) if row['gross_loss'] else ZERO
+    row['avg_winner'] = row['gross_profit'] / row['winning_trades'] if row['winning_trades'] else ZERO
+    row['avg_loser'] = row['gross_loss'] / row['losing_trades'] if row['losing_trades'] else ZERO
+    row['total_pnl'] = row['realized_pnl'] + row['unrealized_pnl']
+    return row
+
+
+def _roll_up(rows: Iterable[Dict]) -> Dict:
+    total = {field: 0 if field.endswith(('trades', 'positions')) else ZERO for field in ADDITIVE_FIELDS}
+    best, worst = [], []
+    for row in rows:
+        for field in ADDITIVE_FIELDS:
+            total[field] += row[field]
+        if row.get('best_trade') is not None:
+            best.append(row['best_trade'])
+        if row.get('worst_trade') is not None:
+            worst.append(row['worst_trade'])
+    total['best_trade'] = max(best) if best else None
+    total['worst_trade'] = min(worst) if worst else None
+    return _finish(total)
+
+
+def _max_drawdowns(start: date, end: date, account_ids=None) -> Dict[int, Decimal]:
+    """
+    Peak-to-trough fall of cumulative realized P&L over the period's trades,
+    per account (rupees).
+    """
+    trades = Position.objects.filter(
+        status=POSITION_STATUS_CLOSED, exit_time__date__gte=start, exit_time__date__lte=end,
+    )
+    if account_ids is not None:
+        trades = trades.filter(account_id__in=account_ids)
+
+    drawdowns, cumulative, peak = {}, {}, {}
+    for account_id, pnl in trades.order_by('account_id', 'exit_time', 'id').values_list('account_id', 'realized_pnl'):
+        cumulative[account_id] = cumulative.get(account_id, ZERO) + pnl
+        peak[account_id] = max(peak.get(account_id, ZERO), cumulative[account_id])
+        drawdowns[account_id] = max(drawdowns.get(account_id, ZERO), peak[account_id] - cumulative[account_id])
+    return drawdowns
+
+
+def period_metrics(start: date, end: date, accounts=None) -> Dict:
+    """
+    Per-account and per-strategy trading metrics of a period.
+
+    Trade counts and realized P&L cover positions closed between start and
+    end (local dates, inclusive); unrealized P&L and deployed capital are the
+    currently open positions.
+
+    Args:
+        start: First day of the period
+        end: Last day of the period
+        accounts: Optional BrokerAccount queryset / ids (default: all)
+
+    Returns:
+        dict: {
+            'accounts': {account_id: {metrics..., 'account': BrokerAccount,
+                                      'max_drawdown': Decimal, 'strategies': {strategy_type: metrics}}},
+            'totals': metrics over all accounts,
+        }
+    """
+    positions = Position.objects.filter(
+        Q(status=POSITION_STATUS_ACTIVE)
+        | Q(status=POSITION_STATUS_CLOSED, exit_time__date__gte=start, exit_time__date__lte=end)
+    )
+    account_ids = None
+    if accounts is not None:
+        account_ids = [getattr(account, 'pk', account) for account in accounts]
+        positions = positions.filter(account_id__in=account_ids)
+
+    strategy_rows = defaultdict(dict)
+    for row in positions.values('account_id', 'strategy_type').annotate(**_metric_aggregates(start, end)):
+        row['realized_pnl'], row['unrealized_pnl'] = row.pop('closed_pnl'), row.pop('open_pnl')
+        strategy_rows[row.pop('account_id')][row.pop('strategy_type')] = _finish(row)
+
+    accounts_by_id = BrokerAccount.objects.in_bulk(list(strategy_rows))
+    drawdowns = _max_drawdowns(start, end, account_ids)
+
+    result = {}
+    for account_id, strategies in strategy_rows.items():
+        metrics = _roll_up(strategies.values())
+        metrics.update({
+            'account': accounts_by_id[account_id],
+            'strategies': strategies,
+            'max_drawdown': drawdowns.get(account_id, ZERO),
+        })
+        result[account_id] = metrics
+
+    totals = _roll_up(result.values())
+    totals['max_drawdown'] = max(drawdowns.values(), default=ZERO)
+    return {'accounts': result, 'totals': totals}
+
+
+def _drawdown_pct(amount: Decimal, capital: Decimal) -> Decimal:
+    """Drawdown as % of capital (the rollup tables store percentages)."""
+    if not capital:
+        return ZERO
+    return (amount / capital * 100).quantize(Decimal('0.0001'))
+
+
+def _strategy_summary(strategies: Dict[str, Dict]) -> Dict[str, Dict]:
+    return {
+        strategy: {
+            'pnl': float(row['realized_pnl']),
+            'trades': row['trades'],
+            'winning_trades': row['winning_trades'],
+            'losing_trades': row['losing_trades'],
+            'win_rate': float(row['win_rate']),
+        }
+        for strategy, row in strategies.items()
+        if row['trades']
+    }
+
+
+def update_daily_pnl(day: Optional[date] = None, report: Optional[Dict] = None) -> Dict:
+    """
+    Write the DailyPnL rollup of every account with trades or open positions.
+
+    Args:
+        day: Trading day (default: today)
+        report: period_metrics(day, day) if already computed
+
+    Returns:
+        dict: The period_metrics report, each account with its 'rollup' row
+    """
+    day = day or timezone.localdate()
+    report = report or period_metrics(day, day)
+    accounts = report['accounts']
+
+    # Starting capital is the previous day's closing capital, else the allocation
+    previous = {}
+    for row in (DailyPnL.objects.filter(account_id__in=list(accounts), date__lt=day)
+                .order_by('account_id', '-date').values('account_id', 'ending_capital')):
+        previous.setdefault(row['account_id'], row['ending_capital'])
+
+    from apps.risk.models import RiskLimit
+    breaches = dict(
+        RiskLimit.objects.filter(account_id__in=list(accounts), is_breached=True, breach_timestamp__date=day)
+        .values_list('account_id').annotate(count=Count('id')).values_list('account_id', 'count')
+    )
+
+    existing = {row.account_id: row for row in DailyPnL.objects.filter(account_id__in=list(accounts), date=day)}
+    to_create, to_update = [], []
+    for account_id, metrics in accounts.items():
+        account = metrics['account']
+        starting_capital = previous.get(account_id, account.allocated_capital)
+        values = {
+            'realized_pnl': metrics['realized_pnl'],
+            'unrealized_pnl': metrics['unrealized_pnl'],
+            'total_pnl': metrics['total_pnl'],
+            'trades_count': metrics['trades'],
+            'winning_trades': metrics['winning_trades'],
+            'losing_trades': metrics['losing_trades'],
+            'starting_capital': starting_capital,
+            'ending_capital': starting_capital + metrics['realized_pnl'],
+            'max_capital_deployed': metrics['capital_deployed'],
+            'max_drawdown': _drawdown_pct(metrics['max_drawdown'], starting_capital),
+            'risk_limits_breached': breaches.get(account_id, 0),
+        }
+        row = existing.get(account_id)
+        if row is None:
+            row = DailyPnL(account=account, date=day, **values)
+            to_create.append(row)
+        else:
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.updated_at = timezone.now()
+            to_update.append(row)
+        metrics['rollup'] = row
+
+    with transaction.atomic():
+        DailyPnL.objects.bulk_create(to_create)
+        if to_update:
+            DailyPnL.objects.bulk_update(to_update, [*values, 'updated_at'])
+
+    logger.info(f"DailyPnL {day}: {len(to_create)} created, {len(to_update)} updated")
+    return report
+
+
+def period_bounds(period_type: str, day: date):
+    """(start, end) of the WEEKLY / MONTHLY / YEARLY period containing day."""
+    if period_type == 'WEEKLY':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period_type == 'MONTHLY':
+        start = day.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    if period_type == 'YEARLY':
+        return day.replace(month=1, day=1), day.replace(month=12, day=31)
+    raise ValueError(f"Unknown period type: {period_type}")
+
+
+def update_performance(period_type: str, start: date, end: date, report: Optional[Dict] = None) -> Dict:
+    """
+    Write the Performance rollup (one row per account) of a period so far.
+
+    Args:
+        period_type: WEEKLY, MONTHLY or YEARLY
+        start: First day of the period
+        end: Last day included (e.g. today for the current period)
+        report: period_metrics(start, end) if already computed
+
+    Returns:
+        dict: The period_metrics report, each account with its 'rollup' row
+    """
+    report = report or period_metrics(start, end)
+    accounts = report['accounts']
+    _, period_end = period_bounds(period_type, start)
+
+    deployed = dict(
+        DailyPnL.objects.filter(account_id__in=list(accounts), date__gte=start, date__lte=end)
+        .values('account_id').annotate(avg=Avg('max_capital_deployed'))
+        .values_list('account_id', 'avg')
+    )
+
+    existing = {
+        row.account_id: row
+        for row in Performance.objects.filter(account_id__in=list(accounts), period_type=period_type, period_start=start)
+    }
+    to_create, to_update = [], []
+    for account_id, metrics in accounts.items():
+        account = metrics['account']
+        values = {
+            'period_end': period_end,
+            'total_pnl': metrics['realized_pnl'],
+            'total_trades': metrics['trades'],
+            'winning_trades': metrics['winning_trades'],
+            'losing_trades': metrics['losing_trades'],
+            'win_rate': metrics['win_rate'].quantize(Decimal('0.01')),
+            'profit_factor': metrics['profit_factor'].quantize(Decimal('0.0001')),
+            'avg_capital_deployed': (deployed.get(account_id) or metrics['capital_deployed']).quantize(Decimal('0.01')),
+            'max_drawdown': _drawdown_pct(metrics['max_drawdown'], account.allocated_capital),
+            'strategy_performance': _strategy_summary(metrics['strategies']),
+        }
+        row = existing.get(account_id)
+        if row is None:
+            row = Performance(account=account, period_type=period_type, period_start=start, **values)
+            to_create.append(row)
+        else:
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.updated_at = timezone.now()
+            to_update.append(row)
+        metrics['rollup'] = row
+
+    with transaction.atomic():
+        Performance.objects.bulk_create(to_create)
+        if to_update:
+            Performance.objects.bulk_update(to_update, [*values, 'updated_at'])
+
+    logger.info(f"Performance {period_type} {start}: {len(to_create)} created, {len(to_update)} updated")
+    return report
+
+
+def top_trades(start: date, end: date, limit: int = 3) -> Dict[str, List[Position]]:
+    """Best and worst closed trades of a period."""
+    closed = Position.objects.filter(
+        status=POSITION_STATUS_CLOSED, exit_time__date__gte=start, exit_time__date__lte=end,
+    )
+    return {
+        'winners': list(closed.filter(realized_pnl__gt=0).order_by('-realized_pnl')[:limit]),
+        'losers': list(closed.filter(realized_pnl__lt=0).order_by('realized_pnl')[:limit]),
+    }
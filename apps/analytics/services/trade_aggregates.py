@@ -0,0 +1,307 @@
+"""
+Incremental Trade Outcome Aggregates for the Learning Engine
+
+Pattern discovery used to load every TradePerformance (and its position) on
+each run. Instead, each analyzed trade is folded into running totals per
+bucket (TradeOutcomeAggregate): trade / win counts, P&L sum and sum of
+squares. Win rates, average P&L and their confidence intervals are derived
+from those totals, so a discovery run costs O(buckets), not O(trades).
+
+Dimensions:
+- ENTRY_HOUR: hour of entry (local time)
+- VIX: India VIX at entry (entry_conditions['vix']), LEARNING_VIX_BUCKET_EDGES
+- STRIKE_DISTANCE: strangle half-width as % of the mid strike, LEARNING_STRIKE_DISTANCE_EDGES
+- EXIT_DAY: weekday of exit
+
+record_trade() updates the totals when a trade is analyzed. rebuild_aggregates()
+recomputes them with one GROUP BY query per dimension (after changing bucket
+edges, or when many trades are pending).
+
+Usage:
+    from apps.analytics.services.trade_aggregates import bucket_stats, sync_aggregates
+
+    sync_aggregates()
+    for stats in bucket_stats('ENTRY_HOUR', min_trades=5):
+        print(stats.bucket, stats.win_rate, stats.win_rate_low, stats.win_rate_high)
+"""
+
+import calendar
+import logging
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Q, Sum, Value, When
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, ExtractHour, ExtractIsoWeekDay
+from django.utils import timezone
+
+from apps.analytics.models import TradeOutcomeAggregate, TradePerformance
+from apps.core.constants import (
+    LEARNING_AGGREGATE_REBUILD_THRESHOLD,
+    LEARNING_CONFIDENCE_Z,
+    LEARNING_STRIKE_DISTANCE_EDGES,
+    LEARNING_VIX_BUCKET_EDGES,
+)
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = [choice for choice, _ in TradeOutcomeAggregate.DIMENSION_CHOICES]
+
+
+# =============================================================================
+# BUCKETS
+# =============================================================================
+
+def _edge_label(index: int, edges: Sequence) -> str:
+    if index == 0:
+        return f"<{edges[0]}"
+    if index == len(edges):
+        return f"{edges[-1]}+"
+    return f"{edges[index - 1]}-{edges[index]}"
+
+
+def _edge_bucket(value: float, edges: Sequence) -> Tuple[str, int]:
+    index = bisect_right(edges, value)
+    return _edge_label(index, edges), index
+
+
+def _edge_case(expression, edges: Sequence):
+    """SQL CASE giving the same bucket index as _edge_bucket."""
+    return Case(
+        *(When(**{f'{expression}__lt': edge}, then=Value(index)) for index, edge in enumerate(edges)),
+        default=Value(len(edges)),
+    )
+
+
+def strike_distance_pct(position) -> Optional[float]:
+    """Strangle half-width as % of the mid strike (None without both strikes)."""
+    if not position.call_strike or not position.put_strike:
+        return None
+    call, put = float(position.call_strike), float(position.put_strike)
+    return (call - put) * 100 / (call + put)
+
+
+def trade_buckets(position, entry_conditions: Dict) -> Dict[str, Tuple[str, int]]:
+    """(bucket, order) of a closed trade in each dimension it can be placed in."""
+    buckets = {}
+    if position.entry_time:
+        hour = timezone.localtime(position.entry_time).hour
+        buckets['ENTRY_HOUR'] = (str(hour), hour)
+    vix = (entry_conditions or {}).get('vix')
+    if vix is not None:
+        buckets['VIX'] = _edge_bucket(float(vix), LEARNING_VIX_BUCKET_EDGES)
+    distance = strike_distance_pct(position)
+    if distance is not None:
+        buckets['STRIKE_DISTANCE'] = _edge_bucket(distance, LEARNING_STRIKE_DISTANCE_EDGES)
+    if position.exit_time:
+        weekday = timezone.localtime(position.exit_time).isoweekday()
+        buckets['EXIT_DAY'] = (calendar.day_name[weekday - 1], weekday)
+    return buckets
+
+
+# =============================================================================
+# UPDATES
+# =============================================================================
+
+def record_trade(performance: TradePerformance) -> bool:
+    """
+    Add one analyzed trade to the aggregates.
+
+    Returns False if the trade was already counted.
+    """
+    with transaction.atomic():
+        claimed = TradePerformance.objects.filter(pk=performance.pk, is_aggregated=False).update(is_aggregated=True)
+        if not claimed:
+            return False
+
+        position = performance.position
+        pnl = position.realized_pnl or Decimal('0.00')
+        win = pnl > 0
+        for dimension, (bucket, order) in trade_buckets(position, performance.entry_conditions).items():
+            aggregate, _ = TradeOutcomeAggregate.objects.get_or_create(
+                dimension=dimension, bucket=bucket, defaults={'bucket_order': order}
+            )
+            TradeOutcomeAggregate.objects.filter(pk=aggregate.pk).update(
+                trades=F('trades') + 1,
+                wins=F('wins') + int(win),
+                losses=F('losses') + int(not win),
+                pnl_sum=F('pnl_sum') + pnl,
+                win_pnl_sum=F('win_pnl_sum') + (pnl if win else 0),
+                loss_pnl_sum=F('loss_pnl_sum') + (0 if win else pnl),
+                pnl_sq_sum=F('pnl_sq_sum') + float(pnl) ** 2,
+                updated_at=timezone.now(),
+            )
+    performance.is_aggregated = True
+    return True
+
+
+def _grouped_totals(queryset, bucket_expression):
+    pnl = F('position__realized_pnl')
+    is_win = Q(position__realized_pnl__gt=0)
+    return (
+        queryset
+        .annotate(bucket_key=bucket_expression)
+        .values('bucket_key')
+        .annotate(
+            trades=Count('id'),
+            wins=Count('id', filter=is_win),
+            pnl_sum=Sum(pnl),
+            win_pnl_sum=Sum(pnl, filter=is_win),
+            loss_pnl_sum=Sum(pnl, filter=~is_win),
+            pnl_sq_sum=Sum(ExpressionWrapper(pnl * pnl, output_field=FloatField())),
+        )
+    )
+
+
+def rebuild_aggregates() -> int:
+    """
+    Recompute every aggregate from TradePerformance with GROUP BY queries.
+
+    Returns:
+        int: Number of buckets written
+    """
+    performances = TradePerformance.objects.all()
+    vix = Cast(KeyTextTransform('vix', 'entry_conditions'), FloatField())
+    distance = ExpressionWrapper(
+        (F('position__call_strike') - F('position__put_strike')) * 100
+        / (F('position__call_strike') + F('position__put_strike')),
+        output_field=FloatField(),
+    )
+
+    groups = {
+        'ENTRY_HOUR': (
+            _grouped_totals(performances.filter(position__entry_time__isnull=False),
+                            ExtractHour('position__entry_time')),
+            lambda key: (str(key), key),
+        ),
+        'VIX': (
+            _grouped_totals(performances.annotate(vix_value=vix).filter(vix_value__isnull=False),
+                            _edge_case('vix_value', LEARNING_VIX_BUCKET_EDGES)),
+            lambda key: (_edge_label(key, LEARNING_VIX_BUCKET_EDGES), key),
+        ),
+        'STRIKE_DISTANCE': (
+            _grouped_totals(performances.filter(position__call_strike__gt=0, position__put_strike__gt=0)
+                            .annotate(distance=distance),
+                            _edge_case('distance', LEARNING_STRIKE_DISTANCE_EDGES)),
+            lambda key: (_edge_label(key, LEARNING_STRIKE_DISTANCE_EDGES), key),
+        ),
+        'EXIT_DAY': (
+            _grouped_totals(performances.filter(position__exit_time__isnull=False),
+                            ExtractIsoWeekDay('position__exit_time')),
+            lambda key: (calendar.day_name[key - 1], key),
+        ),
+    }
+
+    aggregates = []
+    for dimension, (rows, label) in groups.items():
+        for row in rows:
+            bucket, order = label(row['bucket_key'])
+            aggregates.append(TradeOutcomeAggregate(
+                dimension=dimension,
+                bucket=bucket,
+                bucket_order=order,
+                trades=row['trades'],
+                wins=row['wins'],
+                losses=row['trades'] - row['wins'],
+                pnl_sum=row['pnl_sum'] or Decimal('0.00'),
+                win_pnl_sum=row['win_pnl_sum'] or Decimal('0.00'),
+                loss_pnl_sum=row['loss_pnl_sum'] or Decimal('0.00'),
+                pnl_sq_sum=row['pnl_sq_sum'] or 0.0,
+            ))
+
+    with transaction.atomic():
+        TradeOutcomeAggregate.objects.all().delete()
+        TradeOutcomeAggregate.objects.bulk_create(aggregates)
+        performances.filter(is_aggregated=False).update(is_aggregated=True)
+
+    logger.info(f"Rebuilt {len(aggregates)} trade outcome buckets")
+    return len(aggregates)
+
+
+def sync_aggregates() -> int:
+    """
+    Count trades analyzed since the last update (e.g. created outside the
+    learning engine). Many pending trades are folded in with a rebuild.
+
+    Returns:
+        int: Number of trades added
+    """
+    pending = TradePerformance.objects.filter(is_aggregated=False)
+    count = pending.count()
+    if count > LEARNING_AGGREGATE_REBUILD_THRESHOLD:
+        rebuild_aggregates()
+        return count
+    return sum(record_trade(performance) for performance in pending.select_related('position'))
+
+
+# =============================================================================
+# STATISTICS
+# =============================================================================
+
+@dataclass
+class BucketStats:
+    """Outcome statistics of one bucket, with confidence intervals."""
+    dimension: str
+    bucket: str
+    trades: int
+    wins: int
+    losses: int
+    win_rate: float  # %
+    win_rate_low: float  # % (Wilson interval)
+    win_rate_high: float
+    avg_pnl: float
+    avg_pnl_low: float  # normal-approximation interval of the mean
+    avg_pnl_high: float
+    avg_profit: float  # average P&L of winning trades
+    avg_loss: float  # average P&L of losing trades (<= 0)
+
+    @property
+    def confidence(self) -> float:
+        """0-100, higher as the win-rate interval narrows."""
+        return max(0.0, 100.0 - (self.win_rate_high - self.win_rate_low))
+
+
+def wilson_interval(wins: int, trades: int, z: float = LEARNING_CONFIDENCE_Z) -> Tuple[float, float]:
+    """Wilson score interval of a win rate, as fractions."""
+    if trades == 0:
+        return 0.0, 1.0
+    p = wins / trades
+    denominator = 1 + z * z / trades
+    centre = (p + z * z / (2 * trades)) / denominator
+    half = z * math.sqrt(p * (1 - p) / trades + z * z / (4 * trades * trades)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _stats(aggregate: TradeOutcomeAggregate, z: float) -> BucketStats:
+    n = aggregate.trades
+    mean = float(aggregate.pnl_sum) / n
+    variance = max(aggregate.pnl_sq_sum - n * mean * mean, 0.0) / (n - 1) if n > 1 else 0.0
+    half = z * math.sqrt(variance / n)
+    low, high = wilson_interval(aggregate.wins, n, z)
+    return BucketStats(
+        dimension=aggregate.dimension,
+        bucket=aggregate.bucket,
+        trades=n,
+        wins=aggregate.wins,
+        losses=aggregate.losses,
+        win_rate=aggregate.wins * 100 / n,
+        win_rate_low=low * 100,
+        win_rate_high=high * 100,
+        avg_pnl=mean,
+        avg_pnl_low=mean - half,
+        avg_pnl_high=mean + half,
+        avg_profit=float(aggregate.win_pnl_sum) / aggregate.wins if aggregate.wins else 0.0,
+        avg_loss=float(aggregate.loss_pnl_sum) / aggregate.losses if aggregate.losses else 0.0,
+    )
+
+
+def bucket_stats(dimension: str, min_trades: int = 1, z: float = LEARNING_CONFIDENCE_Z) -> List[BucketStats]:
+    """Statistics of every bucket of a dimension with at least min_trades trades."""
+    aggregates = TradeOutcomeAggregate.objects.filter(
+        dimension=dimension, trades__gte=max(min_trades, 1)
+    ).order_by('bucket_order')
+    return [_stats(aggregate, z) for aggregate in aggregates]
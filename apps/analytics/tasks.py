@@ -4,9 +4,10 @@ Background tasks for analytics and learning system
 These tasks run in the background using Celery and django-background-tasks.
 
 Celery Tasks (Scheduled):
-- generate_daily_pnl_report: Daily P&L report (4:00 PM)
+- generate_daily_pnl_report: Daily P&L report and DailyPnL / Performance rollups (4:00 PM)
 - update_learning_patterns: Update learning patterns (5:00 PM)
 - send_weekly_summary: Weekly summary report (Friday 6:00 PM)
+- rebuild_trade_aggregates: Recompute learning aggregates (on demand)
 
 Background Tasks (On-demand):
 - run_learning_analysis: Analyze learning sessions
@@ -21,12 +22,9 @@ from datetime import datetime, timedelta
 from background_task import background
 from celery import shared_task
 from django.utils import timezone
-from django.db.models import Sum, Avg, Count, Q
 
-from apps.analytics.models import LearningSession, LearningPattern, PerformanceAnalysis
+from apps.analytics.models import LearningSession, LearningPattern
 from apps.analytics.services.learning_engine import LearningEngine
-from apps.positions.models import Position
-from apps.accounts.models import BrokerAccount
 from apps.alerts.services.telegram_client import send_telegram_notification
 
 logger = logging.getLogger(__name__)
@@ -44,26 +42,31 @@ def generate_daily_pnl_report():
     Scheduled: Daily @ 4:00 PM (Mon-Fri)
 
     Workflow:
-    1. Get all accounts and calculate daily P&L
-    2. Get all positions closed today
-    3. Calculate win rate, average P&L
-    4. Generate summary report
-    5. Send via Telegram
+    1. Compute per-account / per-strategy metrics of today in one grouped query
+    2. Write the DailyPnL rollups and refresh this week's / month's Performance
+    3. Generate summary report
+    4. Send via Telegram
 
     Returns:
         dict: Task execution summary
     """
+    from apps.analytics.services.reporting import (
+        period_bounds, period_metrics, update_daily_pnl, update_performance,
+    )
+
     logger.info("=" * 80)
     logger.info("CELERY TASK: Daily P&L Report Generation")
     logger.info("=" * 80)
 
     try:
-        today = timezone.now().date()
+        today = timezone.localdate()
 
-        # Get all broker accounts
-        all_accounts = BrokerAccount.objects.all()
+        report = update_daily_pnl(today)
+        for period_type in ('WEEKLY', 'MONTHLY'):
+            period_start, _ = period_bounds(period_type, today)
+            update_performance(period_type, period_start, today, period_metrics(period_start, today))
 
-        if not all_accounts.exists():
+        if not report['accounts']:
             logger.info("ℹ️ No accounts to report on")
             return {'success': True, 'accounts_reported': 0}
 
@@ -71,65 +74,37 @@ def generate_daily_pnl_report():
         report_lines.append(f"Date: {today.strftime('%Y-%m-%d (%A)')}\n")
         report_lines.append("=" * 40 + "\n\n")
 
-        total_daily_pnl = Decimal('0.00')
-        total_positions_closed = 0
-        total_winners = 0
-        total_losers = 0
-
-        for account in all_accounts:
-            try:
-                # Get positions closed today
-                positions_closed_today = Position.objects.filter(
-                    account=account,
-                    status='CLOSED',
-                    exit_timestamp__date=today
-                )
-
-                if not positions_closed_today.exists():
-                    continue
-
-                # Calculate daily P&L for this account
-                daily_pnl = positions_closed_today.aggregate(
-                    total=Sum('realized_pnl')
-                )['total'] or Decimal('0.00')
-
-                # Count winners and losers
-                winners = positions_closed_today.filter(realized_pnl__gt=0).count()
-                losers = positions_closed_today.filter(realized_pnl__lt=0).count()
-                breakeven = positions_closed_today.filter(realized_pnl=0).count()
-
-                # Win rate
-                total_trades = positions_closed_today.count()
-                win_rate = (winners / total_trades * 100) if total_trades > 0 else 0
+        for metrics in sorted(report['accounts'].values(), key=lambda m: m['account'].account_name):
+            if not metrics['trades']:
+                continue
+            account = metrics['account']
+            daily_pnl = metrics['realized_pnl']
 
-                # Account summary
-                pnl_icon = "📈" if daily_pnl > 0 else "📉" if daily_pnl < 0 else "➖"
+            # Account summary
+            pnl_icon = "📈" if daily_pnl > 0 else "📉" if daily_pnl < 0 else "➖"
 
-                report_lines.append(f"{pnl_icon} {account.account_name} ({account.broker})\n")
-                report_lines.append(f"  Daily P&L: ₹{daily_pnl:,.0f}\n")
-                report_lines.append(f"  Trades: {total_trades} ({winners}W/{losers}L/{breakeven}BE)\n")
-                report_lines.append(f"  Win Rate: {win_rate:.1f}%\n\n")
-
-                # Update totals
-                total_daily_pnl += daily_pnl
-                total_positions_closed += total_trades
-                total_winners += winners
-                total_losers += losers
-
-            except Exception as e:
-                logger.error(f"Error processing account {account.account_name}: {e}")
-                report_lines.append(f"❌ Error for {account.account_name}\n\n")
+            report_lines.append(f"{pnl_icon} {account.account_name} ({account.broker})\n")
+            report_lines.append(f"  Daily P&L: ₹{daily_pnl:,.0f}\n")
+            report_lines.append(
+                f"  Trades: {metrics['trades']} ({metrics['winning_trades']}W/"
+                f"{metrics['losing_trades']}L/{metrics['breakeven_trades']}BE)\n"
+            )
+            report_lines.append(f"  Win Rate: {metrics['win_rate']:.1f}%\n")
+            if metrics['max_drawdown']:
+                report_lines.append(f"  Max Drawdown: ₹{metrics['max_drawdown']:,.0f}\n")
+            report_lines.append("\n")
 
         # Overall summary
-        overall_win_rate = (total_winners / total_positions_closed * 100) if total_positions_closed > 0 else 0
+        totals = report['totals']
+        total_daily_pnl = totals['realized_pnl']
         overall_icon = "📈" if total_daily_pnl > 0 else "📉" if total_daily_pnl < 0 else "➖"
 
         report_lines.append("=" * 40 + "\n")
         report_lines.append(f"{overall_icon} OVERALL SUMMARY\n")
         report_lines.append(f"Total P&L: ₹{total_daily_pnl:,.0f}\n")
-        report_lines.append(f"Total Trades: {total_positions_closed}\n")
-        report_lines.append(f"Winners: {total_winners} | Losers: {total_losers}\n")
-        report_lines.append(f"Win Rate: {overall_win_rate:.1f}%\n")
+        report_lines.append(f"Total Trades: {totals['trades']}\n")
+        report_lines.append(f"Winners: {totals['winning_trades']} | Losers: {totals['losing_trades']}\n")
+        report_lines.append(f"Win Rate: {totals['win_rate']:.1f}%\n")
 
         # Send report
         report_text = "".join(report_lines)
@@ -138,14 +113,14 @@ def generate_daily_pnl_report():
             notification_type='INFO'
         )
 
-        logger.info(f"✅ Daily P&L report generated: ₹{total_daily_pnl:,.0f}, {total_positions_closed} trades")
+        logger.info(f"✅ Daily P&L report generated: ₹{total_daily_pnl:,.0f}, {totals['trades']} trades")
         logger.info("=" * 80)
 
         return {
             'success': True,
             'total_pnl': float(total_daily_pnl),
-            'total_trades': total_positions_closed,
-            'win_rate': float(overall_win_rate)
+            'total_trades': totals['trades'],
+            'win_rate': float(totals['win_rate'])
         }
 
     except Exception as e:
@@ -259,23 +234,25 @@ def send_weekly_summary():
     Scheduled: Friday @ 6:00 PM
 
     Workflow:
-    1. Get all trades from this week
+    1. Compute this week's metrics in one grouped query (and store the
+       WEEKLY Performance rollup)
     2. Calculate weekly P&L, win rate
     3. Show top performers and worst trades
-    4. Learning insights and pattern effectiveness
-    5. Risk metrics and limit utilization
-    6. Send comprehensive report via Telegram
+    4. Strategy breakdown
+    5. Send comprehensive report via Telegram
 
     Returns:
         dict: Task execution summary
     """
+    from apps.analytics.services.reporting import top_trades, update_performance
+
     logger.info("=" * 80)
     logger.info("CELERY TASK: Weekly Summary Report")
     logger.info("=" * 80)
 
     try:
         # Get Monday of current week
-        today = timezone.now().date()
+        today = timezone.localdate()
         week_start = today - timedelta(days=today.weekday())
         week_end = today
 
@@ -283,32 +260,17 @@ def send_weekly_summary():
         report_lines.append(f"Week: {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}\n")
         report_lines.append("=" * 40 + "\n\n")
 
-        # Get all positions closed this week
-        weekly_positions = Position.objects.filter(
-            status='CLOSED',
-            exit_timestamp__date__gte=week_start,
-            exit_timestamp__date__lte=week_end
-        )
+        report = update_performance('WEEKLY', week_start, week_end)
+        totals = report['totals']
 
-        if not weekly_positions.exists():
+        if not totals['trades']:
             report_text = "".join(report_lines) + "ℹ️ No trades this week"
             send_telegram_notification(report_text, notification_type='INFO')
             return {'success': True, 'trades_count': 0}
 
-        # Calculate weekly metrics
-        total_trades = weekly_positions.count()
-        total_pnl = weekly_positions.aggregate(Sum('realized_pnl'))['realized_pnl__sum'] or Decimal('0.00')
-        winners = weekly_positions.filter(realized_pnl__gt=0).count()
-        losers = weekly_positions.filter(realized_pnl__lt=0).count()
-        win_rate = (winners / total_trades * 100) if total_trades > 0 else 0
-
-        # Average P&L
-        avg_winner = weekly_positions.filter(realized_pnl__gt=0).aggregate(
-            Avg('realized_pnl')
-        )['realized_pnl__avg'] or Decimal('0.00')
-        avg_loser = weekly_positions.filter(realized_pnl__lt=0).aggregate(
-            Avg('realized_pnl')
-        )['realized_pnl__avg'] or Decimal('0.00')
+        total_trades = totals['trades']
+        total_pnl = totals['realized_pnl']
+        win_rate = totals['win_rate']
 
         # Overall summary
         pnl_icon = "📈" if total_pnl > 0 else "📉" if total_pnl < 0 else "➖"
@@ -316,16 +278,18 @@ def send_weekly_summary():
         report_lines.append(f"{pnl_icon} WEEKLY PERFORMANCE\n")
         report_lines.append(f"Total P&L: ₹{total_pnl:,.0f}\n")
         report_lines.append(f"Total Trades: {total_trades}\n")
-        report_lines.append(f"Winners: {winners} ({win_rate:.1f}%)\n")
-        report_lines.append(f"Losers: {losers}\n")
-        report_lines.append(f"Avg Winner: ₹{avg_winner:,.0f}\n")
-        report_lines.append(f"Avg Loser: ₹{avg_loser:,.0f}\n\n")
+        report_lines.append(f"Winners: {totals['winning_trades']} ({win_rate:.1f}%)\n")
+        report_lines.append(f"Losers: {totals['losing_trades']}\n")
+        report_lines.append(f"Avg Winner: ₹{totals['avg_winner']:,.0f}\n")
+        report_lines.append(f"Avg Loser: ₹{totals['avg_loser']:,.0f}\n")
+        report_lines.append(f"Max Drawdown: ₹{totals['max_drawdown']:,.0f}\n\n")
+
+        trades = top_trades(week_start, week_end)
 
         # Top 3 winners
-        top_winners = weekly_positions.filter(realized_pnl__gt=0).order_by('-realized_pnl')[:3]
-        if top_winners.exists():
+        if trades['winners']:
             report_lines.append("🏆 TOP WINNERS:\n")
-            for i, pos in enumerate(top_winners, 1):
+            for i, pos in enumerate(trades['winners'], 1):
                 report_lines.append(
                     f"{i}. {pos.instrument} - ₹{pos.realized_pnl:,.0f} "
                     f"({pos.strategy_type})\n"
@@ -333,29 +297,31 @@ def send_weekly_summary():
             report_lines.append("\n")
 
         # Top 3 losers
-        top_losers = weekly_positions.filter(realized_pnl__lt=0).order_by('realized_pnl')[:3]
-        if top_losers.exists():
+        if trades['losers']:
             report_lines.append("📉 TOP LOSERS:\n")
-            for i, pos in enumerate(top_losers, 1):
+            for i, pos in enumerate(trades['losers'], 1):
                 report_lines.append(
                     f"{i}. {pos.instrument} - ₹{pos.realized_pnl:,.0f} "
                     f"({pos.strategy_type})\n"
                 )
             report_lines.append("\n")
 
-        # Strategy performance breakdown
+        # Strategy performance breakdown (across accounts)
         report_lines.append("📊 STRATEGY BREAKDOWN:\n")
-        strategy_stats = weekly_positions.values('strategy_type').annotate(
-            count=Count('id'),
-            total_pnl=Sum('realized_pnl')
-        ).order_by('-total_pnl')
-
-        for stat in strategy_stats:
-            strategy_pnl = stat['total_pnl'] or Decimal('0.00')
-            strategy_icon = "✅" if strategy_pnl > 0 else "❌"
+        strategy_stats = {}
+        for metrics in report['accounts'].values():
+            for strategy_type, row in metrics['strategies'].items():
+                stat = strategy_stats.setdefault(strategy_type, {'count': 0, 'total_pnl': Decimal('0.00')})
+                stat['count'] += row['trades']
+                stat['total_pnl'] += row['realized_pnl']
+
+        for strategy_type, stat in sorted(strategy_stats.items(), key=lambda item: -item[1]['total_pnl']):
+            if not stat['count']:
+                continue
+            strategy_icon = "✅" if stat['total_pnl'] > 0 else "❌"
             report_lines.append(
-                f"{strategy_icon} {stat['strategy_type']}: "
-                f"₹{strategy_pnl:,.0f} ({stat['count']} trades)\n"
+                f"{strategy_icon} {strategy_type}: "
+                f"₹{stat['total_pnl']:,.0f} ({stat['count']} trades)\n"
             )
 
         # Send report
@@ -387,6 +353,28 @@ def send_weekly_summary():
         return {'success': False, 'message': str(e)}
 
 
+@shared_task(name='apps.analytics.tasks.rebuild_trade_aggregates')
+def rebuild_trade_aggregates():
+    """
+    Recompute the per-bucket trade outcome aggregates with GROUP BY queries
+
+    Needed only after changing bucket edges; trades are otherwise added as
+    they are analyzed.
+
+    Returns:
+        dict: Task execution summary
+    """
+    from apps.analytics.services.trade_aggregates import rebuild_aggregates
+
+    try:
+        buckets = rebuild_aggregates()
+        logger.info(f"✅ Trade aggregates rebuilt: {buckets} buckets")
+        return {'success': True, 'buckets': buckets}
+    except Exception as e:
+        logger.error(f"Error rebuilding trade aggregates: {e}", exc_info=True)
+        return {'success': False, 'message': str(e)}
+
+
 # =============================================================================
 # BACKGROUND TASKS (On-demand, using django-background-tasks)
 # =============================================================================
@@ -413,31 +401,31 @@ def run_learning_analysis(session_id):
             logger.warning(f"Session {session.name} is not active, skipping analysis")
             return
 
-        logger.info(f"=� Starting learning analysis for session: {session.name}")
+        logger.info(f"🚀 Starting learning analysis for session: {session.name}")
 
         engine = LearningEngine()
 
         # Step 1: Analyze trades
         logger.info("Step 1: Analyzing trades...")
         trades_analyzed = engine.analyze_trades(session)
-        logger.info(f"   Analyzed {trades_analyzed} trades")
+        logger.info(f"  ✅ Analyzed {trades_analyzed} trades")
 
         # Step 2: Discover patterns
         logger.info("Step 2: Discovering patterns...")
         patterns_found = engine.discover_patterns(session)
-        logger.info(f"   Discovered {patterns_found} patterns")
+        logger.info(f"  ✅ Discovered {patterns_found} patterns")
 
         # Step 3: Generate suggestions
         logger.info("Step 3: Generating parameter suggestions...")
         suggestions_count = engine.suggest_improvements(session)
-        logger.info(f"   Created {suggestions_count} suggestions")
+        logger.info(f"  ✅ Created {suggestions_count} suggestions")
 
         # Step 4: Calculate metrics
         logger.info("Step 4: Calculating performance metrics...")
         metrics = engine.calculate_metrics(session, time_period='all')
-        logger.info(f"   Calculated metrics: {metrics}")
+        logger.info(f"  ✅ Calculated metrics: {metrics}")
 
-        logger.info(f" Learning analysis complete for session: {session.name}")
+        logger.info(f"✅ Learning analysis complete for session: {session.name}")
 
         # Schedule next analysis if session is still running
         if session.is_active():
@@ -463,7 +451,7 @@ def schedule_next_learning_analysis(session_id, schedule=3600):
         session = LearningSession.objects.get(id=session_id)
 
         if session.is_active():
-            logger.info(f"=� Scheduling next analysis for {session.name} in {schedule} seconds")
+            logger.info(f"📅 Scheduling next analysis for {session.name} in {schedule} seconds")
             run_learning_analysis(session_id, schedule=schedule)
         else:
             logger.info(f"Session {session.name} is no longer active, stopping scheduled analysis")
@@ -491,12 +479,12 @@ def analyze_single_trade(position_id):
             logger.info(f"Position {position_id} already has performance analysis")
             return
 
-        logger.info(f"= Analyzing position: {position.symbol}")
+        logger.info(f"🔍 Analyzing position: {position.instrument}")
 
         engine = LearningEngine()
         performance = engine._analyze_single_trade(position)
 
-        logger.info(f" Created performance analysis for {position.symbol}: Score {performance.entry_score}")
+        logger.info(f"✅ Created performance analysis for {position.instrument}: Score {performance.entry_score}")
 
     except Exception as e:
         logger.error(f"Error analyzing position {position_id}: {e}", exc_info=True)
@@ -519,7 +507,7 @@ def calculate_session_metrics(session_id, time_period='all'):
         engine = LearningEngine()
         metrics = engine.calculate_metrics(session, time_period=time_period)
 
-        logger.info(f" Metrics calculated: {metrics}")
+        logger.info(f"✅ Metrics calculated: {metrics}")
 
     except LearningSession.DoesNotExist:
         logger.error(f"Learning session {session_id} not found")
@@ -555,7 +543,7 @@ def validate_patterns(session_id):
                 pattern.save()
                 validated_count += 1
 
-        logger.info(f" Validated {validated_count} patterns")
+        logger.info(f"✅ Validated {validated_count} patterns")
 
     except LearningSession.DoesNotExist:
         logger.error(f"Learning session {session_id} not found")
@@ -578,7 +566,7 @@ def start_continuous_learning(session_id):
     # Run initial analysis immediately
     run_learning_analysis(session_id, schedule=0)
 
-    logger.info(f" Continuous learning started for session {session_id}")
+    logger.info(f"✅ Continuous learning started for session {session_id}")
 
 
 # Utility function to stop continuous learning
@@ -591,9 +579,9 @@ def stop_continuous_learning(session_id):
     Args:
         session_id: ID of the LearningSession
     """
-    logger.info(f"� Stopping continuous learning for session {session_id}")
+    logger.info(f"⏹️ Stopping continuous learning for session {session_id}")
 
     # The session's is_active() status will be checked in the next task run
     # and will prevent further scheduling
 
-    logger.info(f" Continuous learning stopped for session {session_id}")
+    logger.info(f"✅ Continuous learning stopped for session {session_id}")
@@ -0,0 +1,432 @@
+"""
+Analytics App Tests - Backtest Engine
+
+Tests for:
+1. Vectorized pricing and strike selection parity with the live code
+2. Strangle and futures replays (entry filters, exit rules, stored prices)
+3. Parameter sweeps and learning records
+4. Incremental trade outcome aggregates and pattern discovery
+5. Grouped reporting queries and DailyPnL / Performance rollups
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.algo_test.services import OptionsAlgorithmCalculator
+from apps.accounts.models import BrokerAccount
+from apps.analytics.models import (
+    DailyPnL, LearningPattern, LearningSession, ParameterAdjustment, Performance, TradeOutcomeAggregate,
+    TradePerformance,
+)
+from apps.analytics.services.pattern_recognition import PatternRecognizer
+from apps.analytics.services.reporting import period_metrics, update_daily_pnl, update_performance
+from apps.analytics.services.trade_aggregates import (
+    bucket_stats, rebuild_aggregates, sync_aggregates, wilson_interval,
+)
+from apps.analytics.services.backtest import (
+    MarketData,
+    black_scholes_prices,
+    delta_algorithm_strikes,
+    kotak_strikes,
+    load_market_data,
+    record_sweep,
+    run_backtest,
+    run_parameter_sweep,
+    strangle_entry_mask,
+    STRANGLE_DEFAULTS,
+)
+from apps.analytics.services.parameter_optimizer import ParameterOptimizer
+from apps.brokers.models import HistoricalPrice
+from apps.strategies.services.greeks_calculator import black_scholes_call_price, black_scholes_put_price
+from apps.strategies.services.strangle_delta_algorithm import StrangleDeltaAlgorithm
+
+
+def trading_days(start, count):
+    days, day = [], start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def make_data(closes, vix=12.0, expiry_weekday=3, spread=0.002, **kwargs):
+    """Daily bars around the given closes with weekly expiries."""
+    closes = np.asarray(closes, dtype=float)
+    days = trading_days(date(2024, 1, 1), len(closes))
+    expiries = [day for day in days if day.weekday() == expiry_weekday]
+    return MarketData.from_arrays(
+        'NIFTY', days, closes, closes * (1 + spread), closes * (1 - spread), closes,
+        vix=np.full(len(closes), vix), expiries=expiries, **kwargs
+    )
+
+
+class PricingAndStrikeTests(TestCase):
+    """Test vectorized pricing and strike parity with the live algorithms"""
+
+    def test_black_scholes_matches_greeks_calculator(self):
+        call, put = black_scholes_prices(24000, np.array([23500, 24000, 24500]), 7 / 365, 0.14, rate=0.065)
+
+        for index, strike in enumerate([23500, 24000, 24500]):
+            self.assertAlmostEqual(call[index], black_scholes_call_price(24000, strike, 7 / 365, 0.065, 0.14), 3)
+            self.assertAlmostEqual(put[index], black_scholes_put_price(24000, strike, 7 / 365, 0.065, 0.14), 3)
+
+    def test_expired_options_are_intrinsic(self):
+        call, put = black_scholes_prices(24100, 24000, 0, 0.14)
+
+        self.assertEqual((float(call), float(put)), (100.0, 0.0))
+
+    def test_kotak_strikes_match_live_calculation(self):
+        for spot, vix, days in [(24000, 14, 4), (23870, 16.5, 3), (25210, 19, 6), (22440, 11, 1)]:
+            call, put = kotak_strikes(spot, days, vix)
+            expected_call, expected_put, _ = OptionsAlgorithmCalculator.calculate_strikes(
+                Decimal(str(spot)), Decimal(str(vix)), days
+            )
+            self.assertEqual((int(call), int(put)), (expected_call, expected_put))
+
+    def test_delta_strikes_match_strangle_delta_algorithm(self):
+        spots = np.array([24013.0, 23870.0, 25210.0, 22440.0, 24480.0])
+        vixes = np.array([9.5, 12.0, 13.2, 16.0, 21.0])
+        days = np.array([1, 2, 4, 6, 3])
+
+        calls, puts = delta_algorithm_strikes(spots, days, vixes)
+
+        for spot, vix, dte, call, put in zip(spots, vixes, days, calls, puts):
+            expected = StrangleDeltaAlgorithm(Decimal(str(spot)), int(dte), Decimal(str(vix))).calculate_strikes()
+            self.assertEqual((int(call), int(put)), (expected['call_strike'], expected['put_strike']))
+
+
+class StrangleBacktestTests(TestCase):
+    """Test strangle replay, entry filters and exit rules"""
+
+    def test_quiet_market_collects_premium(self):
+        closes = 24000 + 40 * np.sin(np.arange(60))
+        result = run_backtest('strangle', make_data(closes))
+
+        self.assertGreater(result.summary['trades'], 5)
+        self.assertEqual(result.summary['win_rate'], 100.0)
+        self.assertTrue(set(result.summary['exit_reasons']) <= {'TARGET', 'EOD_EXIT', 'EXPIRY'})
+
+    def test_trending_market_hits_stop_loss(self):
+        closes = 24000 * 1.02 ** np.arange(60)
+        result = run_backtest('strangle', make_data(closes), {'use_filters': False})
+
+        self.assertIn('STOP_LOSS', result.summary['exit_reasons'])
+        self.assertLess(result.summary['total_pnl'], 0)
+
+    def test_positions_do_not_overlap_unless_asked(self):
+        data = make_data(np.full(60, 24000.0))
+        sequential = run_backtest('strangle', data)
+        overlapping = run_backtest('strangle', data, {'overlapping': True})
+
+        entries = sequential.trades['entry_date']
+        exits = sequential.trades['exit_date']
+        self.assertTrue(np.all(entries[1:] > exits[:-1]))
+        self.assertEqual(overlapping.summary['trades'], overlapping.summary['eligible_days'])
+
+    def test_entry_filters_block_high_vix_and_events(self):
+        data = make_data(np.full(40, 24000.0))
+        data.vix[10] = 25
+        data.event_dates = np.array(['2024-01-31'], dtype='datetime64[D]')
+
+        mask = strangle_entry_mask(data, STRANGLE_DEFAULTS)
+
+        self.assertFalse(mask[10])
+        blocked = data.dates[~mask]
+        self.assertIn(np.datetime64('2024-01-29'), blocked)
+        self.assertNotIn(np.datetime64('2024-01-23'), blocked)
+
+    def test_stored_option_prices_replace_model(self):
+        data = make_data(np.full(30, 24000.0))
+        first = run_backtest('strangle', data, {'use_filters': False}).trade_list()[0]
+        expiry = first['expiry']
+        for strike, option_type in ((first['call_strike'], 'CE'), (first['put_strike'], 'PE')):
+            series = np.full(len(data), np.nan)
+            series[0] = 60.0
+            data.option_closes[(expiry, int(strike), option_type)] = series
+
+        trade = run_backtest('strangle', data, {'use_filters': False}).trade_list()[0]
+
+        self.assertAlmostEqual(trade['entry_premium'], 120.0, 2)
+
+
+class FuturesBacktestTests(TestCase):
+    """Test futures replay with stop loss, target and averaging"""
+
+    def make_monthly(self, closes, spread=0.002):
+        data = make_data(closes, spread=spread)
+        days = data.dates.astype(object)
+        monthly = {}
+        for day in days:
+            if day.weekday() == 3:
+                monthly[(day.year, day.month)] = day
+        data.expiries = np.array(sorted(monthly.values()), dtype='datetime64[D]')
+        return data
+
+    def test_uptrend_goes_long_and_hits_target(self):
+        closes = 1000 * 1.004 ** np.arange(120)
+        result = run_backtest('futures', self.make_monthly(closes))
+
+        self.assertGreater(result.summary['trades'], 0)
+        self.assertTrue(np.all(result.trades['direction'] == 'LONG'))
+        self.assertIn('TARGET', result.summary['exit_reasons'])
+
+    def test_averaging_inside_wide_stop(self):
+        closes = np.concatenate([1000 * 1.004 ** np.arange(40), np.full(80, 1000 * 1.004 ** 39 * 0.97)])
+        params = {'stop_loss_pct': 5.0, 'averaging_stop_loss_pct': 5.0, 'overlapping': True}
+
+        result = run_backtest('futures', self.make_monthly(closes), params)
+
+        averaged = result.trades['units'] > 1
+        self.assertTrue(averaged.any())
+        self.assertTrue(np.all(result.trades['units'] <= 3))
+
+
+class SweepAndRecordTests(TestCase):
+    """Test parameter sweeps and their learning records"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        closes = 24000 * np.exp(np.cumsum(rng.normal(0, 0.006, 120)))
+        self.data = make_data(closes, vix=13.0, spread=0.004)
+        self.grid = {'base_delta_pct': [0.3, 0.5, 0.8], 'stop_loss_pct': [80.0, 150.0]}
+
+    def test_process_pool_matches_serial(self):
+        serial = run_parameter_sweep('strangle', self.data, self.grid, workers=1)
+        pooled = run_parameter_sweep('strangle', self.data, self.grid, workers=2)
+
+        self.assertEqual(len(serial['results']), 6)
+        self.assertEqual(
+            [(r['params'], r['summary']) for r in serial['results']],
+            [(r['params'], r['summary']) for r in pooled['results']],
+        )
+
+    def test_record_sweep_creates_patterns_and_suggestions(self):
+        session = LearningSession.objects.create(name='Backtest')
+        sweep = run_parameter_sweep(
+            'strangle', self.data, self.grid, base_params={'overlapping': True}, workers=1
+        )
+
+        recorded = record_sweep(session, sweep, min_trades=10)
+        record_sweep(session, sweep, min_trades=10)  # re-run updates patterns in place
+
+        self.assertEqual(LearningPattern.objects.filter(session=session).count(), 6)
+        pattern = LearningPattern.objects.filter(session=session).first()
+        self.assertEqual(pattern.pattern_type, 'STRIKE_SELECTION')
+        self.assertEqual(pattern.conditions['source'], 'backtest')
+
+        # Best combination (base_delta_pct=0.3, stop_loss_pct=150) beats the defaults
+        self.assertEqual(recorded['adjustments'], 2)
+        adjustment = ParameterAdjustment.objects.get(session=session, parameter_name='base_delta_pct')
+        self.assertEqual((adjustment.current_value, adjustment.suggested_value), ('0.5', '0.3'))
+        self.assertEqual(adjustment.supporting_data['source'], 'backtest')
+        self.assertEqual(ParameterAdjustment.objects.filter(session=session).count(), 2)
+
+    def test_optimizer_suggests_base_delta_from_backtest_pattern(self):
+        session = LearningSession.objects.create(name='Backtest')
+        LearningPattern.objects.create(
+            session=session, pattern_type='STRIKE_SELECTION', name='Backtest strangle: base_delta_pct=0.6',
+            description='', conditions={'source': 'backtest', 'parameters': {'base_delta_pct': 0.6}},
+            occurrences=120, success_rate=Decimal('81.00'), confidence_score=Decimal('100.00'),
+            is_actionable=True,
+        )
+
+        created = ParameterOptimizer(session).suggest_strike_adjustments()
+        ParameterOptimizer(session).suggest_strike_adjustments()
+
+        self.assertEqual(created, 1)
+        adjustment = ParameterAdjustment.objects.get(session=session, parameter_name='base_delta_pct')
+        self.assertEqual(adjustment.suggested_value, '0.6')
+
+
+class MarketDataLoadTests(TestCase):
+    """Test loading HistoricalPrice candles into arrays"""
+
+    def add_candle(self, stock_code, moment, close, **kwargs):
+        price = Decimal(str(close))
+        HistoricalPrice.objects.create(
+            datetime=timezone.make_aware(moment), stock_code=stock_code, exchange_code='NSE',
+            product_type=kwargs.pop('product_type', 'cash'), open=price, high=price + 10,
+            low=price - 10, close=price, **kwargs
+        )
+
+    def test_intraday_candles_become_daily_bars_with_vix(self):
+        for day in trading_days(date(2024, 3, 4), 5):
+            self.add_candle('NIFTY', datetime.combine(day, datetime.min.time()) + timedelta(hours=10), 22000)
+            self.add_candle('NIFTY', datetime.combine(day, datetime.min.time()) + timedelta(hours=15), 22100)
+            self.add_candle('INDVIX', datetime.combine(day, datetime.min.time()) + timedelta(hours=15), 14)
+
+        data = load_market_data('NIFTY', date(2024, 3, 4), date(2024, 3, 8))
+
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data.open[0], 22000)
+        self.assertEqual(data.close[0], 22100)
+        self.assertEqual(data.high[0], 22110)
+        self.assertTrue(np.all(data.vix == 14))
+        self.assertGreater(len(data.expiries), 0)
+
+
+class TradeAggregateTests(TestCase):
+    """Test the incremental learning aggregates"""
+
+    def setUp(self):
+        from apps.positions.models import Position
+        from apps.strategies.models import MarketOpeningState
+
+        self.account = BrokerAccount.objects.create(
+            broker='KOTAK', account_number='AGG001', account_name='Aggregates',
+            allocated_capital=Decimal('5000000'), max_daily_loss=Decimal('100000'),
+            max_weekly_loss=Decimal('250000'),
+        )
+        entry_day = timezone.make_aware(datetime(2025, 1, 6, 9, 30))  # Monday
+        MarketOpeningState.objects.create(
+            trading_date=entry_day.date(), prev_close=24000, nifty_open=24000, nifty_9_15_price=24000,
+            gap_points=0, gap_percent=0, gap_type='FLAT', vix_9_15=Decimal('13.5'),
+        )
+        # 9:30 entries mostly win, 14:30 entries mostly lose
+        for index, (hour, exit_price) in enumerate([(9, 5), (9, 6), (9, 4), (9, 30), (9, 8),
+                                                    (14, 30), (14, 28), (14, 5), (14, 35), (14, 40)]):
+            position = Position.objects.create(
+                account=self.account, strategy_type='WEEKLY_NIFTY_STRANGLE', instrument=f"NIFTY-{index}",
+                direction='NEUTRAL', quantity=1, lot_size=75, entry_price=Decimal('20'),
+                current_price=Decimal('20'), stop_loss=Decimal('40'), target=Decimal('5'),
+                call_strike=Decimal('25000'), put_strike=Decimal('23000'), premium_collected=Decimal('20'),
+                expiry_date=date(2025, 1, 9), margin_used=Decimal('150000'), entry_value=Decimal('1500'),
+            )
+            Position.objects.filter(pk=position.pk).update(entry_time=entry_day.replace(hour=hour))
+            position.refresh_from_db()
+            position.close_position(Decimal(exit_price))
+
+    def aggregate_rows(self):
+        return list(TradeOutcomeAggregate.objects.order_by('dimension', 'bucket_order').values(
+            'dimension', 'bucket', 'trades', 'wins', 'losses', 'pnl_sum', 'win_pnl_sum', 'loss_pnl_sum'))
+
+    def test_closing_a_position_updates_aggregates(self):
+        self.assertEqual(TradePerformance.objects.filter(is_aggregated=True).count(), 10)
+
+        hours = {row.bucket: row for row in TradeOutcomeAggregate.objects.filter(dimension='ENTRY_HOUR')}
+        self.assertEqual((hours['9'].trades, hours['9'].wins), (5, 4))
+        self.assertEqual((hours['14'].trades, hours['14'].wins), (5, 1))
+        self.assertEqual(hours['9'].pnl_sum, Decimal('75') * (15 + 14 + 16 - 10 + 12))
+        self.assertEqual(TradeOutcomeAggregate.objects.get(dimension='VIX').bucket, '12-15')
+        self.assertEqual(TradeOutcomeAggregate.objects.get(dimension='STRIKE_DISTANCE').bucket, '4-5')
+
+    def test_rebuild_matches_incremental_totals(self):
+        incremental = self.aggregate_rows()
+        self.assertEqual(rebuild_aggregates(), len(incremental))
+        self.assertEqual(self.aggregate_rows(), incremental)
+
+        # Trades analyzed elsewhere are picked up by the next sync
+        TradePerformance.objects.update(is_aggregated=False)
+        TradeOutcomeAggregate.objects.all().delete()
+        self.assertEqual(sync_aggregates(), 10)
+        self.assertEqual(self.aggregate_rows(), incremental)
+
+    def test_bucket_stats_and_patterns(self):
+        stats = {row.bucket: row for row in bucket_stats('ENTRY_HOUR', min_trades=5)}
+        self.assertAlmostEqual(stats['9'].win_rate, 80.0)
+        low, high = wilson_interval(4, 5)
+        self.assertAlmostEqual(stats['9'].win_rate_low, low * 100)
+        self.assertLess(stats['9'].win_rate_low, 80)
+        self.assertGreater(stats['9'].win_rate_high, 80)
+        self.assertLess(stats['9'].avg_pnl_low, stats['9'].avg_pnl)
+        self.assertEqual(stats['9'].avg_loss, -750.0)
+
+        session = LearningSession.objects.create(name='Aggregates')
+        found = PatternRecognizer(session).discover_all_patterns()
+
+        patterns = {p.name: p for p in LearningPattern.objects.filter(session=session)}
+        self.assertEqual(found, len(patterns))
+        self.assertTrue(patterns['Entry at 9:00-10:00'].is_actionable)
+        self.assertEqual(patterns['Entry at 14:00-15:00'].success_rate, Decimal('20.00'))
+        self.assertIn('95% CI', patterns['Entry at 9:00-10:00'].description)
+        self.assertNotIn('VIX 12-15 at entry', patterns)  # 50% win rate is not a pattern
+
+
+class ReportingTests(TestCase):
+    """Test the grouped reporting query and the P&L rollups"""
+
+    day = date(2025, 1, 8)  # Wednesday
+
+    def setUp(self):
+        from apps.positions.models import Position
+
+        self.account = BrokerAccount.objects.create(
+            broker='KOTAK', account_number='REP001', account_name='Reporting',
+            allocated_capital=Decimal('1000000'), max_daily_loss=Decimal('50000'),
+            max_weekly_loss=Decimal('100000'),
+        )
+        closed = [
+            ('WEEKLY_NIFTY_STRANGLE', 10, Decimal('100')),
+            ('WEEKLY_NIFTY_STRANGLE', 11, Decimal('-300')),
+            ('LLM_VALIDATED_FUTURES', 12, Decimal('50')),
+            ('LLM_VALIDATED_FUTURES', 13, Decimal('0')),
+        ]
+        for index, (strategy, hour, pnl) in enumerate(closed):
+            self.make_position(
+                Position, strategy, status='CLOSED', realized_pnl=pnl,
+                exit_time=timezone.make_aware(datetime.combine(self.day, datetime.min.time()).replace(hour=hour)),
+            )
+        # Closed the day before: outside the daily report, inside the week
+        self.make_position(Position, 'WEEKLY_NIFTY_STRANGLE', status='CLOSED', realized_pnl=Decimal('400'),
+                           exit_time=timezone.make_aware(datetime(2025, 1, 7, 14)))
+        self.make_position(Position, 'WEEKLY_NIFTY_STRANGLE', status='ACTIVE',
+                           unrealized_pnl=Decimal('25'), margin_used=Decimal('200000'))
+
+    def make_position(self, Position, strategy_type, margin_used=Decimal('0'), **fields):
+        return Position.objects.create(
+            account=self.account, strategy_type=strategy_type, instrument='NIFTY', direction='NEUTRAL',
+            quantity=1, lot_size=75, entry_price=Decimal('20'), current_price=Decimal('20'),
+            stop_loss=Decimal('40'), target=Decimal('5'), expiry_date=date(2025, 1, 9),
+            entry_value=Decimal('1500'), margin_used=margin_used, **fields,
+        )
+
+    def test_period_metrics_groups_by_account_and_strategy(self):
+        with self.assertNumQueries(3):
+            report = period_metrics(self.day, self.day)
+
+        metrics = report['accounts'][self.account.pk]
+        self.assertEqual((metrics['trades'], metrics['winning_trades'], metrics['losing_trades'],
+                          metrics['breakeven_trades']), (4, 2, 1, 1))
+        self.assertEqual(metrics['realized_pnl'], Decimal('-150'))
+        self.assertEqual(metrics['unrealized_pnl'], Decimal('25'))
+        self.assertEqual(metrics['capital_deployed'], Decimal('200000'))
+        self.assertEqual(metrics['win_rate'], Decimal('50'))
+        self.assertEqual(metrics['max_drawdown'], Decimal('300'))  # +100 -> -200
+
+        strangle = metrics['strategies']['WEEKLY_NIFTY_STRANGLE']
+        self.assertEqual((strangle['trades'], strangle['active_positions']), (2, 1))
+        self.assertEqual(strangle['worst_trade'], Decimal('-300'))
+        self.assertEqual(report['totals']['trades'], 4)
+
+    def test_daily_rollup_is_written_once_per_day(self):
+        update_daily_pnl(self.day)
+        update_daily_pnl(self.day)
+
+        row = DailyPnL.objects.get(account=self.account, date=self.day)
+        self.assertEqual(row.trades_count, 4)
+        self.assertEqual(row.realized_pnl, Decimal('-150'))
+        self.assertEqual(row.total_pnl, Decimal('-125'))
+        self.assertEqual(row.starting_capital, Decimal('1000000'))
+        self.assertEqual(row.ending_capital, Decimal('999850'))
+        self.assertEqual(row.max_drawdown, Decimal('0.0300'))
+
+        # The next day starts from the previous close
+        update_daily_pnl(self.day + timedelta(days=1))
+        next_day = DailyPnL.objects.get(account=self.account, date=self.day + timedelta(days=1))
+        self.assertEqual(next_day.starting_capital, Decimal('999850'))
+
+    def test_weekly_performance_rollup(self):
+        week_start = self.day - timedelta(days=self.day.weekday())
+        update_performance('WEEKLY', week_start, self.day)
+
+        row = Performance.objects.get(account=self.account, period_type='WEEKLY', period_start=week_start)
+        self.assertEqual(row.period_end, week_start + timedelta(days=6))
+        self.assertEqual((row.total_trades, row.winning_trades, row.losing_trades), (5, 3, 1))
+        self.assertEqual(row.total_pnl, Decimal('250'))
+        self.assertEqual(row.profit_factor, Decimal('1.8333'))
+        self.assertEqual(row.strategy_performance['WEEKLY_NIFTY_STRANGLE']['trades'], 3)
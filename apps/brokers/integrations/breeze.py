@@ -12,15 +12,11 @@ This module provides integration with ICICI Breeze broker API for:
 
 import logging
 import re
-import requests
-import json
 import hashlib
-import calendar
 from datetime import datetime, timezone as dt_timezone, timedelta, date
 from typing import List, Optional, Dict
 from django.core.cache import cache
 
-from breeze_connect import BreezeConnect
 from django.utils import timezone as dj_timezone
 from decimal import Decimal
 
@@ -43,10 +39,6 @@ from apps.brokers.utils.api_patterns import (
 
 logger = logging.getLogger(__name__)
 
-NSE_BASE = "https://www.nseindia.com"
-NSE_OC_URL = "https://www.nseindia.com/api/option-chain-indices?symbol=NIFTY"
-
-
 class BreezeAPI:
     """
     Simplified Breeze API wrapper for login and account queries.
@@ -288,116 +280,48 @@ class BreezeAPIClient:
 
 def get_all_nifty_expiry_dates(max_expiries: int = 10, timeout: int = 15) -> List[str]:
     """
-    Fetch all available NIFTY options expiry dates from NSE.
+    Get upcoming NIFTY options expiry dates from the trading calendar.
 
-    IMPORTANT: This function ONLY fetches the LIST OF EXPIRY DATES from NSE.
+    IMPORTANT: This function ONLY provides the LIST OF EXPIRY DATES.
     The actual option chain data (LTP, OI, volume, etc.) is ALWAYS fetched from Breeze API.
 
-    This fetches real contract expiry dates which properly handle holidays.
-    NSE adjusts expiry dates when Thursday is a trading holiday.
-
-    NOTE: NSE may block automated API access (403 errors). If this fails,
-    the caller should fallback to generating Thursday dates.
+    The calendar holds listed contract expiries (SecurityMaster / NSE, refreshed
+    daily) and holiday-adjusted weekday rules beyond them, so this never hits
+    the network.
 
     Args:
         max_expiries: Maximum number of expiries to return (default 10)
-        timeout: Per-request timeout in seconds
+        timeout: Unused, kept for backward compatibility
 
     Returns:
         List[str]: List of expiry dates in 'DD-MMM-YYYY' format (e.g., ['21-NOV-2024', '28-NOV-2024', ...])
-
-    Raises:
-        RuntimeError: If data fetch/parsing fails or NSE blocks access
     """
-    sess = requests.Session()
-
-    # Enhanced headers to avoid 403 errors
-    sess.headers.update({
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
-                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Cache-Control": "max-age=0",
-    })
-
-    try:
-        # First, visit NSE homepage to get cookies
-        logger.info("Fetching NSE homepage to establish session...")
-        resp_home = sess.get(NSE_BASE, timeout=timeout)
-        if not resp_home.ok:
-            logger.warning(f"NSE homepage returned {resp_home.status_code}, continuing anyway...")
-
-        # Small delay to mimic human behavior
-        import time
-        time.sleep(1)
-
-        # Update headers for API request
-        sess.headers.update({
-            "Accept": "application/json, text/plain, */*",
-            "Referer": "https://www.nseindia.com/option-chain",
-        })
-
-        # Fetch the option chain JSON
-        logger.info("Fetching NIFTY option chain from NSE API...")
-        resp = sess.get(NSE_OC_URL, timeout=timeout)
-
-        if not resp.ok:
-            logger.error(f"NSE API request failed with status {resp.status_code}")
-            raise RuntimeError(f"NSE option chain request failed: {resp.status_code}")
-
-        data = resp.json()
-        expiry_list: List[str] = data["records"]["expiryDates"]
-
-        if not expiry_list:
-            raise RuntimeError("Expiry list is empty from NSE")
-
-        # Parse, sort, and return dates in proper format
-        def parse_dt(s: str) -> datetime:
-            return datetime.strptime(s, "%d-%b-%Y")
-
-        unique_dates = sorted({parse_dt(s) for s in expiry_list})
-
-        # Format as 'DD-MMM-YYYY' with uppercase month and limit to max_expiries
-        result = [dt.strftime("%d-%b-%Y").upper() for dt in unique_dates[:max_expiries]]
-
-        logger.info(f"Successfully fetched {len(result)} NIFTY expiry dates from NSE: {result[:5]}...")
-        return result
+    from apps.core.services.trading_calendar import get_trading_calendar
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Network error fetching NSE data: {e}")
-        raise RuntimeError(f"Failed to fetch NSE option chain data: {e}") from e
-    except (KeyError, ValueError, json.JSONDecodeError) as e:
-        logger.error(f"Failed to parse NSE response: {e}")
-        raise RuntimeError(f"Failed to parse NSE response: {e}") from e
+    expiries = get_trading_calendar().expiries('NIFTY', count=max_expiries)
+    return [expiry.strftime('%d-%b-%Y').upper() for expiry in expiries]
 
 
 def get_next_nifty_expiry(next_expiry: bool = False, timeout: int = 10) -> str:
     """
-    Fetch the nearest (or next) NIFTY options expiry date from NSE.
+    Get the nearest (or next) NIFTY options expiry date from the trading calendar.
 
     Args:
         next_expiry: If True, returns the next expiry after the closest one
-        timeout: Per-request timeout in seconds
+        timeout: Unused, kept for backward compatibility
 
     Returns:
         str: Expiry date in 'DD-MMM-YYYY' format (e.g., '02-SEP-2025')
 
     Raises:
-        RuntimeError: If data fetch/parsing fails
+        RuntimeError: If no expiry is available
     """
+    from apps.core.services.trading_calendar import get_trading_calendar
+
     try:
-        expiries = get_all_nifty_expiry_dates(max_expiries=5, timeout=timeout)
-        index = 1 if next_expiry else 0
-        if index >= len(expiries):
-            raise IndexError("Requested next expiry but only one expiry was found")
-        return expiries[index]
-    except Exception as e:
+        expiry = get_trading_calendar().next_expiry('NIFTY', skip=1 if next_expiry else 0)
+        return expiry.strftime('%d-%b-%Y').upper()
+    except ValueError as e:
         raise RuntimeError(f"Failed to get NIFTY expiry: {e}") from e
 
 
@@ -454,6 +378,11 @@ def get_breeze_client():
     Raises:
         BreezeAuthenticationError: If credentials not found or authentication fails
     """
+    from apps.brokers.integrations.simulator import get_simulated_breeze_client, is_simulator_enabled
+    from apps.core.services.telemetry import instrument_client
+    if is_simulator_enabled():
+        return instrument_client('breeze', get_simulated_breeze_client())
+
     try:
         # Use centralized credential loading
         creds = get_credentials('breeze')
@@ -466,6 +395,10 @@ def get_breeze_client():
         logger.info(f"Attempting Breeze authentication with token from {creds.last_session_update}")
         logger.info(f"Using API Key: {creds.api_key[:10]}... Session Token: {creds.session_token[:20]}...")
 
+        # Imported here: breeze_connect is slow to import and only the
+        # processes that talk to ICICI need it
+        from breeze_connect import BreezeConnect
+
         breeze = BreezeConnect(api_key=creds.api_key)
         breeze.generate_session(
             api_secret=creds.api_secret,
@@ -473,7 +406,7 @@ def get_breeze_client():
         )
 
         logger.info("✅ Breeze authentication successful")
-        return breeze
+        return instrument_client('breeze', breeze)
     except BreezeAuthenticationError:
         raise
     except Exception as e:
@@ -741,28 +674,15 @@ def fetch_and_save_breeze_data():
 
 def get_next_monthly_expiry():
     """
-    Calculate next monthly expiry (last Thursday of month).
+    Get the next monthly expiry (last Tuesday of month, holiday-adjusted).
 
     Returns:
         str: Expiry date in 'DD-MMM-YYYY' format
     """
-    today = date.today()
-    month = today.month
-    year = today.year
-    last_day = calendar.monthrange(year, month)[1]
-    last_date = date(year, month, last_day)
-    last_thursday = last_date
-    while last_thursday.weekday() != 3:
-        last_thursday -= timedelta(days=1)
-    if last_thursday <= today:
-        month = (month % 12) + 1
-        year = year + (1 if month == 1 else 0)
-        last_day = calendar.monthrange(year, month)[1]
-        last_date = date(year, month, last_day)
-        last_thursday = last_date
-        while last_thursday.weekday() != 3:
-            last_thursday -= timedelta(days=1)
-    return last_thursday.strftime('%d-%b-%Y').upper()
+    from apps.core.services.trading_calendar import get_trading_calendar
+
+    expiry = get_trading_calendar().next_expiry('NIFTY', kind='monthly', include_today=False)
+    return expiry.strftime('%d-%b-%Y').upper()
 
 
 def get_and_save_option_chain_quotes(stock_code, expiry_date=None, product_type="futures"):
@@ -838,6 +758,23 @@ def get_and_save_option_chain_quotes(stock_code, expiry_date=None, product_type=
         )
         objs.append(obj)
 
+    if product_type == "options":
+        from apps.data.services.option_chain_store import archive_option_chain
+
+        archive_option_chain(stock_code, expiry_date_obj, [
+            {
+                'strike': q.get('strike_price'),
+                'option_type': q.get('right'),
+                'ltp': q.get('ltp'),
+                'bid': q.get('best_bid_price'),
+                'ask': q.get('best_offer_price'),
+                'volume': q.get('total_quantity_traded'),
+                'oi': q.get('open_interest'),
+                'spot_price': q.get('spot_price'),
+            }
+            for q in quotes
+        ])
+
     logger.info(f"Saved {len(objs)} option chain quotes")
     return objs
 
@@ -891,42 +828,10 @@ def fetch_and_save_nifty_option_chain_all_expiries():
         logger.warning(f"Could not fetch NIFTY spot price: {e}")
         spot_price = Decimal('0.00')
 
-    # STEP 1: Get list of expiry dates
-    # Try NSE first (real contract dates, handles holidays), fallback to generating Thursdays
-    # NOTE: NSE is ONLY used for getting the LIST of dates, NOT the actual option chain data
-    logger.info("Fetching NIFTY expiry dates...")
-
-    expiry_list = []
-
-    # Try to get real expiry dates from NSE first (may fail due to 403 blocking)
-    try:
-        expiry_list = get_all_nifty_expiry_dates(max_expiries=10, timeout=15)
-        logger.info(f"✓ Got {len(expiry_list)} real expiry dates from NSE (handles holidays): {expiry_list[:3]}...")
-    except Exception as nse_error:
-        logger.warning(f"NSE expiry fetch failed (this is normal if NSE blocks API): {nse_error}")
-        logger.info("Falling back to generating Tuesday expiry dates...")
-
-        # Fallback: Generate NIFTY expiry dates (weekly expiries - Tuesdays as of 2025)
-        # Note: NIFTY changed from Thursday to Tuesday expiries in 2025
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
-
-        current_date = today
-
-        # Find next 4 Tuesdays
-        for _ in range(30):  # Look ahead 30 days to find Tuesdays
-            if current_date.weekday() == 1:  # Tuesday = 1
-                if current_date >= today:
-                    expiry_str = current_date.strftime("%d-%b-%Y")  # Keep original case (not uppercase)
-                    expiry_list.append(expiry_str)
-                    if len(expiry_list) >= 4:  # Get 4 expiries
-                        break
-            current_date += timedelta(days=1)
-
-        if expiry_list:
-            logger.info(f"Generated {len(expiry_list)} fallback expiries: {expiry_list}")
-        else:
-            raise RuntimeError("Could not fetch or generate expiry dates")
+    # STEP 1: Get list of expiry dates from the trading calendar
+    # (listed contract dates refreshed daily, holiday-adjusted rules beyond them)
+    # NOTE: the calendar only provides the LIST of dates, NOT the actual option chain data
+    expiry_list = get_all_nifty_expiry_dates(max_expiries=10)
 
     logger.info(f"Using {len(expiry_list)} expiry dates for NIFTY option chain fetch (spot: ₹{spot_price})")
 
@@ -1044,6 +949,26 @@ def fetch_and_save_nifty_option_chain_all_expiries():
         # Bulk create all new records
         OptionChain.objects.bulk_create(new_records, batch_size=500)
         logger.info(f"Bulk created {total_saved} new NIFTY option chain records across {len(expiry_list)} expiries")
+
+        # Keep every snapshot in the history store (the table above only holds the latest chain)
+        from apps.data.services.option_chain_store import archive_option_chain
+
+        snapshot_time = dj_timezone.now()
+        by_expiry = {}
+        for record in new_records:
+            by_expiry.setdefault(record.expiry_date, []).append({
+                'strike': record.strike,
+                'option_type': record.option_type,
+                'ltp': record.ltp,
+                'bid': record.bid,
+                'ask': record.ask,
+                'volume': record.volume,
+                'oi': record.oi,
+                'oi_change': record.oi_change,
+                'spot_price': record.spot_price,
+            })
+        for expiry, rows in by_expiry.items():
+            archive_option_chain('NIFTY', expiry, rows, snapshot_time)
     else:
         logger.warning("No new records to save, keeping existing data intact")
 
@@ -6,8 +6,6 @@ This module provides authentication and client management for ICICI Breeze broke
 
 import logging
 
-from breeze_connect import BreezeConnect
-
 from apps.brokers.exceptions import BreezeAuthenticationError
 from apps.brokers.utils.auth_manager import (
     get_credentials,
@@ -71,6 +69,11 @@ def get_breeze_client():
     Raises:
         BreezeAuthenticationError: If credentials not found or authentication fails
     """
+    from apps.brokers.integrations.simulator import get_simulated_breeze_client, is_simulator_enabled
+    from apps.core.services.telemetry import instrument_client
+    if is_simulator_enabled():
+        return instrument_client('breeze', get_simulated_breeze_client())
+
     try:
         # Use centralized credential loading
         creds = get_credentials('breeze')
@@ -83,6 +86,8 @@ def get_breeze_client():
         logger.info(f"Attempting Breeze authentication with token from {creds.last_session_update}")
         logger.info(f"Using API Key: {creds.api_key[:10]}... Session Token: {creds.session_token[:20]}...")
 
+        from breeze_connect import BreezeConnect  # slow import, only needed to log in
+
         breeze = BreezeConnect(api_key=creds.api_key)
         breeze.generate_session(
             api_secret=creds.api_secret,
@@ -90,7 +95,7 @@ def get_breeze_client():
         )
 
         logger.info("Breeze authentication successful")
-        return breeze
+        return instrument_client('breeze', breeze)
     except BreezeAuthenticationError:
         raise
     except Exception as e:
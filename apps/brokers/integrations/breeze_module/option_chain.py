@@ -5,7 +5,7 @@ This module provides functions to fetch and save option chain data.
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from decimal import Decimal
 
 from apps.brokers.models import OptionChainQuote
@@ -136,37 +136,10 @@ def fetch_and_save_nifty_option_chain_all_expiries():
         logger.warning(f"Could not fetch NIFTY spot price: {e}")
         spot_price = Decimal('0.00')
 
-    # STEP 1: Get list of expiry dates
-    logger.info("Fetching NIFTY expiry dates...")
-
-    expiry_list = []
-
-    # Try to get real expiry dates from NSE first
-    try:
-        expiry_list = get_all_nifty_expiry_dates(max_expiries=10, timeout=15)
-        logger.info(f"Got {len(expiry_list)} real expiry dates from NSE: {expiry_list[:3]}...")
-    except Exception as nse_error:
-        logger.warning(f"NSE expiry fetch failed: {nse_error}")
-        logger.info("Falling back to generating Tuesday expiry dates...")
-
-        # Fallback: Generate NIFTY expiry dates (weekly expiries - Tuesdays as of 2025)
-        today = datetime.now().date()
-        current_date = today
-
-        # Find next 4 Tuesdays
-        for _ in range(30):
-            if current_date.weekday() == 1:  # Tuesday = 1
-                if current_date >= today:
-                    expiry_str = current_date.strftime("%d-%b-%Y")
-                    expiry_list.append(expiry_str)
-                    if len(expiry_list) >= 4:
-                        break
-            current_date += timedelta(days=1)
-
-        if expiry_list:
-            logger.info(f"Generated {len(expiry_list)} fallback expiries: {expiry_list}")
-        else:
-            raise RuntimeError("Could not fetch or generate expiry dates")
+    # STEP 1: Get list of expiry dates from the trading calendar
+    # (listed contract dates refreshed daily, holiday-adjusted rules beyond them)
+    # NOTE: the calendar only provides the LIST of dates, NOT the actual option chain data
+    expiry_list = get_all_nifty_expiry_dates(max_expiries=10)
 
     logger.info(f"Using {len(expiry_list)} expiry dates for NIFTY option chain fetch (spot: {spot_price})")
 
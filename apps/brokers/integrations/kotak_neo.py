@@ -12,7 +12,6 @@ import re
 import jwt
 from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
-from neo_api_client import NeoAPI
 from django.utils import timezone
 from django.core.cache import cache
 from apps.core.models import CredentialStore
@@ -55,6 +54,8 @@ def _get_authenticated_client():
     try:
         from tools.neo import NeoAPI as NeoAPIWrapper
 
+        from apps.core.services.telemetry import instrument_client
+
         logger.info("Using NeoAPI wrapper from tools.neo for authentication")
 
         # Create NeoAPI wrapper instance (loads creds from database automatically)
@@ -66,7 +67,7 @@ def _get_authenticated_client():
 
         if login_result and neo_wrapper.session_active:
             logger.info("Neo API authentication successful via tools.neo wrapper")
-            return neo_wrapper.neo
+            return instrument_client('kotakneo', neo_wrapper.neo)
         else:
             # Get detailed error from the wrapper
             last_error = neo_wrapper.get_last_error() or "Unknown authentication error"
@@ -302,6 +303,9 @@ def auto_login_kotak_neo():
 
     # No valid token, perform fresh login with OTP
     logger.info("Performing fresh Kotak Neo login for auto_login")
+    # neo_api_client loads pandas and its whole API surface on import
+    from neo_api_client import NeoAPI
+
     client = NeoAPI(
         consumer_key=creds.api_key,
         consumer_secret=creds.api_secret,
@@ -631,7 +635,6 @@ def map_neo_symbol_to_breeze(neo_symbol: str) -> dict:
     """
     import re
     from datetime import date
-    import calendar
 
     try:
         # Parse Neo futures symbol: NIFTY26JANFUT or BANKNIFTY25DECFUT
@@ -673,20 +676,16 @@ def map_neo_symbol_to_breeze(neo_symbol: str) -> dict:
                 'exchange_code': 'NFO'
             }
 
-        # Calculate last trading Thursday of the month (standard F&O expiry)
-        # Note: F&O contracts expire on the last Thursday, but if that Thursday
-        # is a holiday, the expiry moves to the previous trading day
-        last_day = calendar.monthrange(year, month)[1]
-        last_date = date(year, month, last_day)
-
-        # Find last Thursday
-        last_thursday = last_date
-        while last_thursday.weekday() != 3:  # 3 = Thursday
-            last_thursday = date(year, month, last_thursday.day - 1)
+        # Monthly F&O expiry for that month from the trading calendar
+        # (last Tuesday, moved to the previous trading day on holidays)
+        from apps.core.services.trading_calendar import get_trading_calendar
+        monthly_expiry = get_trading_calendar().next_expiry(
+            stock_code, kind='monthly', from_date=date(year, month, 1)
+        )
 
         # Format expiry date as DD-Mon-YYYY (Breeze format with title case month)
         # Example: 27-Jan-2026, NOT 27-JAN-2026
-        expiry_date = last_thursday.strftime('%d-%b-%Y')
+        expiry_date = monthly_expiry.strftime('%d-%b-%Y')
 
         logger.info(f"[NEO→BREEZE MAPPING] {neo_symbol} → stock_code={stock_code}, expiry={expiry_date}")
 
@@ -1186,734 +1185,10 @@ def map_breeze_symbol_to_neo(breeze_symbol: str, expiry_date=None, client=None)
         }
 
 
-def place_strangle_orders_in_batches(
-    call_symbol: str,
-    put_symbol: str,
-    total_lots: int,
-    batch_size: int = 20,
-    delay_seconds: int = 20,
-    product: str = 'NRML'
-):
-    """
-    Place strangle orders (Call SELL + Put SELL) in batches with delays.
-
-    This function places orders in batches to avoid overwhelming the broker API
-    and to provide better execution monitoring.
-
-    Args:
-        call_symbol (str): Call option trading symbol (e.g., 'NIFTY25NOV24500CE')
-        put_symbol (str): Put option trading symbol (e.g., 'NIFTY25NOV24000PE')
-        total_lots (int): Total number of lots to trade
-        batch_size (int): Maximum lots per order (default: 20, Neo API limit)
-        delay_seconds (int): Delay between orders in seconds (default: 20)
-        product (str): Product type - 'NRML', 'MIS' (default: 'NRML')
-
-    Returns:
-        dict: Batch execution results
-            {
-                'success': True/False,
-                'total_lots': int,
-                'batches_completed': int,
-                'call_orders': [list of order results],
-                'put_orders': [list of order results],
-                'summary': {
-                    'call_success_count': int,
-                    'put_success_count': int,
-                    'call_failed_count': int,
-                    'put_failed_count': int
-                },
-                'error': str (if failed)
-            }
-
-    Example:
-        >>> # For 167 lots: Places 9 orders (8×20 lots + 1×7 lots) with 20s delays
-        >>> result = place_strangle_orders_in_batches(
-        ...     call_symbol='NIFTY25NOV24500CE',
-        ...     put_symbol='NIFTY25NOV24000PE',
-        ...     total_lots=167,
-        ...     batch_size=20,
-        ...     delay_seconds=20
-        ... )
-        >>> print(result['summary'])
-        >>> # Result: 9 call orders + 9 put orders = 18 total orders
-        {'call_success_count': 9, 'put_success_count': 9, 'total_orders_placed': 18}
-    """
-    import time
-    import threading
-
-    logger.info(f"Starting batch order placement: {total_lots} lots in batches of {batch_size}")
-
-    # Get single authenticated session for all orders (optimization)
-    try:
-        client = _get_authenticated_client()
-        logger.info("✅ Single Neo API session established for all orders")
-    except Exception as e:
-        logger.error(f"Failed to establish Neo session: {e}")
-        return {
-            'success': False,
-            'error': f'Authentication failed: {str(e)}',
-            'call_orders': [],
-            'put_orders': []
-        }
-
-    # Get lot size dynamically from Neo API (using same client)
-    lot_size = get_lot_size_from_neo(call_symbol, client=client)
-    logger.info(f"Using lot size: {lot_size} for {call_symbol}")
-
-    call_orders = []
-    put_orders = []
-    batches_completed = 0
-
-    # Calculate number of batches
-    num_batches = (total_lots + batch_size - 1) // batch_size  # Ceiling division
-
-    try:
-        for batch_num in range(1, num_batches + 1):
-            # Calculate lots for this batch
-            remaining_lots = total_lots - (batch_num - 1) * batch_size
-            current_batch_lots = min(batch_size, remaining_lots)
-            current_batch_quantity = current_batch_lots * lot_size
-
-            logger.info(f"Batch {batch_num}/{num_batches}: Placing {current_batch_lots} lots ({current_batch_quantity} qty)")
-
-            # Optimization: Place CALL and PUT orders in parallel using threads
-            call_result = {}
-            put_result = {}
-
-            def place_call_order():
-                nonlocal call_result
-                call_result = place_option_order(
-                    trading_symbol=call_symbol,
-                    transaction_type='S',  # SELL
-                    quantity=current_batch_quantity,
-                    product=product,
-                    order_type='MKT',
-                    client=client  # Reuse session
-                )
-
-            def place_put_order():
-                nonlocal put_result
-                put_result = place_option_order(
-                    trading_symbol=put_symbol,
-                    transaction_type='S',  # SELL
-                    quantity=current_batch_quantity,
-                    product=product,
-                    order_type='MKT',
-                    client=client  # Reuse session
-                )
-
-            # Start both orders in parallel
-            call_thread = threading.Thread(target=place_call_order)
-            put_thread = threading.Thread(target=place_put_order)
-
-            logger.info(f"⚡ Placing CALL and PUT orders in parallel...")
-            call_thread.start()
-            put_thread.start()
-
-            # Wait for both to complete
-            call_thread.join()
-            put_thread.join()
-
-            # Record results
-            call_orders.append({
-                'batch': batch_num,
-                'lots': current_batch_lots,
-                'quantity': current_batch_quantity,
-                'result': call_result
-            })
-
-            put_orders.append({
-                'batch': batch_num,
-                'lots': current_batch_lots,
-                'quantity': current_batch_quantity,
-                'result': put_result
-            })
-
-            if call_result.get('success'):
-                logger.info(f"✅ CALL SELL batch {batch_num}: Order ID {call_result['order_id']}")
-            else:
-                logger.error(f"❌ CALL SELL batch {batch_num} failed: {call_result.get('error', 'Unknown error')}")
-
-            if put_result.get('success'):
-                logger.info(f"✅ PUT SELL batch {batch_num}: Order ID {put_result['order_id']}")
-            else:
-                logger.error(f"❌ PUT SELL batch {batch_num} failed: {put_result.get('error', 'Unknown error')}")
-
-            batches_completed += 1
-
-            # Delay before next batch (except for last batch)
-            # We only wait between batches, not between CALL and PUT
-            if batch_num < num_batches:
-                logger.info(f"⏱️  Waiting {delay_seconds} seconds before next batch...")
-                time.sleep(delay_seconds)
-
-        # Calculate summary
-        call_success_count = sum(1 for order in call_orders if order['result']['success'])
-        put_success_count = sum(1 for order in put_orders if order['result']['success'])
-        call_failed_count = len(call_orders) - call_success_count
-        put_failed_count = len(put_orders) - put_success_count
-
-        success = (call_failed_count == 0 and put_failed_count == 0)
-
-        logger.info(f"Batch execution complete: {batches_completed}/{num_batches} batches processed")
-        logger.info(f"Summary: Call {call_success_count}/{len(call_orders)} success, Put {put_success_count}/{len(put_orders)} success")
-
-        return {
-            'success': success,
-            'total_lots': total_lots,
-            'batches_completed': batches_completed,
-            'total_batches': num_batches,
-            'call_orders': call_orders,
-            'put_orders': put_orders,
-            'summary': {
-                'call_success_count': call_success_count,
-                'put_success_count': put_success_count,
-                'call_failed_count': call_failed_count,
-                'put_failed_count': put_failed_count,
-                'total_orders_placed': len(call_orders) + len(put_orders)
-            }
-        }
-
-    except Exception as e:
-        logger.exception(f"Error in batch order placement: {e}")
-        return {
-            'success': False,
-            'error': str(e),
-            'total_lots': total_lots,
-            'batches_completed': batches_completed,
-            'call_orders': call_orders,
-            'put_orders': put_orders
-        }
-
-
-def close_position_in_batches(
-    trading_symbol: str,
-    total_quantity: int,
-    transaction_type: str,  # 'B' (BUY to close SHORT) or 'S' (SELL to close LONG)
-    product: str = 'NRML',
-    batch_size: int = 20,
-    delay_seconds: int = 20,
-    position_type: str = 'OPTION',  # 'OPTION' or 'FUTURE'
-    cancellation_key: str = None,  # Cache key to check for cancellation between batches
-    progress_key: str = None  # Cache key for progress tracking
-):
-    """
-    Close a position (futures or options) in batches with delays.
-
-    This function places exit orders in batches to avoid overwhelming the broker API
-    and to provide better execution monitoring.
-
-    Args:
-        trading_symbol (str): Trading symbol (e.g., 'NIFTY25DECFUT', 'NIFTY25NOV24500CE')
-        total_quantity (int): Total quantity to close (in shares/contracts)
-        transaction_type (str): 'B' to close SHORT position, 'S' to close LONG position
-        product (str): Product type - 'NRML', 'MIS' (default: 'NRML')
-        batch_size (int): Maximum lots per order (default: 20, Neo API limit)
-        delay_seconds (int): Delay between orders in seconds (default: 20)
-        position_type (str): 'OPTION' or 'FUTURE' (default: 'OPTION')
-
-    Returns:
-        dict: Batch execution results
-            {
-                'success': True/False,
-                'total_quantity': int,
-                'batches_completed': int,
-                'orders': [list of order results],
-                'summary': {
-                    'success_count': int,
-                    'failed_count': int,
-                    'total_orders_placed': int
-                },
-                'error': str (if failed)
-            }
-
-    Example:
-        >>> # Close 3350 shares (167 lots) LONG position
-        >>> result = close_position_in_batches(
-        ...     trading_symbol='NIFTY25DECFUT',
-        ...     total_quantity=3350,
-        ...     transaction_type='S',  # SELL to close LONG
-        ...     batch_size=20,
-        ...     delay_seconds=20,
-        ...     position_type='FUTURE'
-        ... )
-    """
-    import time
-    import threading
-
-    logger.info(f"Starting batch position closing: {total_quantity} qty in batches")
-
-    # Get single authenticated session for all orders
-    try:
-        client = _get_authenticated_client()
-        logger.info("✅ Single Neo API session established for closing position")
-    except Exception as e:
-        logger.error(f"Failed to establish Neo session: {e}")
-        return {
-            'success': False,
-            'error': f'Authentication failed: {str(e)}',
-            'orders': []
-        }
-
-    # Get lot size dynamically from Neo API
-    lot_size = get_lot_size_from_neo(trading_symbol, client=client)
-    logger.info(f"Using lot size: {lot_size} for {trading_symbol}")
-
-    # Calculate total lots
-    total_lots = total_quantity // lot_size if lot_size > 0 else 0
-    logger.info(f"Total quantity: {total_quantity} shares = {total_lots} lots")
-
-    orders = []
-    batches_completed = 0
-
-    # Calculate number of batches
-    num_batches = (total_lots + batch_size - 1) // batch_size  # Ceiling division
-
-    # Initialize progress
-    if progress_key:
-        cache.set(progress_key, {
-            'batches_completed': 0,
-            'total_batches': num_batches,
-            'current_batch': None,
-            'is_cancelled': False,
-            'is_complete': False,
-            'is_success': False,
-            'last_log_message': f'Calculated {num_batches} batches for {total_lots} lots',
-            'last_log_type': 'info'
-        }, 600)
-
-    try:
-        for batch_num in range(1, num_batches + 1):
-            # Check for cancellation before processing batch
-            if cancellation_key and cache.get(cancellation_key):
-                logger.warning(f"⚠️ Order placement cancelled by user at batch {batch_num}/{num_batches}")
-
-                # Update progress
-                if progress_key:
-                    cache.set(progress_key, {
-                        'batches_completed': batches_completed,
-                        'total_batches': num_batches,
-                        'current_batch': None,
-                        'is_cancelled': True,
-                        'is_complete': True,
-                        'is_success': False,
-                        'last_log_message': f'Cancelled at batch {batch_num}/{num_batches}',
-                        'last_log_type': 'warning'
-                    }, 600)
-
-                success_count = sum(1 for o in orders if o['result'].get('success'))
-                failed_count = len(orders) - success_count
-                return {
-                    'success': True,
-                    'cancelled': True,
-                    'total_quantity': total_quantity,
-                    'batches_completed': batches_completed,
-                    'total_batches': num_batches,
-                    'orders': orders,
-                    'summary': {
-                        'success_count': success_count,
-                        'failed_count': failed_count,
-                        'total_orders_placed': len(orders)
-                    },
-                    'message': f'Order placement stopped by user. Completed {batches_completed}/{num_batches} batches.'
-                }
-
-            # Calculate lots for this batch
-            remaining_lots = total_lots - (batch_num - 1) * batch_size
-            current_batch_lots = min(batch_size, remaining_lots)
-            current_batch_quantity = current_batch_lots * lot_size
-
-            logger.info(f"Batch {batch_num}/{num_batches}: Closing {current_batch_lots} lots ({current_batch_quantity} qty)")
-
-            # Update progress - starting batch
-            if progress_key:
-                cache.set(progress_key, {
-                    'batches_completed': batches_completed,
-                    'total_batches': num_batches,
-                    'current_batch': {
-                        'batch_num': batch_num,
-                        'lots': current_batch_lots,
-                        'quantity': current_batch_quantity
-                    },
-                    'is_cancelled': False,
-                    'is_complete': False,
-                    'is_success': False,
-                    'last_log_message': f'Processing batch {batch_num}/{num_batches}: {current_batch_lots} lots',
-                    'last_log_type': 'info'
-                }, 600)
-
-            # Place exit order
-            order_result = place_option_order(
-                trading_symbol=trading_symbol,
-                transaction_type=transaction_type,
-                quantity=current_batch_quantity,
-                product=product,
-                order_type='MKT',
-                client=client  # Reuse session
-            )
-
-            # Record result
-            orders.append({
-                'batch': batch_num,
-                'lots': current_batch_lots,
-                'quantity': current_batch_quantity,
-                'result': order_result
-            })
-
-            batches_completed += 1
-
-            if order_result.get('success'):
-                logger.info(f"✅ Exit batch {batch_num}: Order ID {order_result['order_id']}")
-                # Update progress - batch succeeded
-                if progress_key:
-                    cache.set(progress_key, {
-                        'batches_completed': batches_completed,
-                        'total_batches': num_batches,
-                        'current_batch': None,
-                        'is_cancelled': False,
-                        'is_complete': False,
-                        'is_success': False,
-                        'last_log_message': f'✅ Batch {batch_num}/{num_batches} completed successfully',
-                        'last_log_type': 'success'
-                    }, 600)
-            else:
-                # Batch failed - STOP immediately
-                error_msg = order_result.get('error', 'Unknown error')
-                logger.error(f"❌ Exit batch {batch_num} failed: {error_msg}")
-
-                # Update progress - batch failed and STOP
-                if progress_key:
-                    cache.set(progress_key, {
-                        'batches_completed': batches_completed,
-                        'total_batches': num_batches,
-                        'current_batch': None,
-                        'is_cancelled': False,
-                        'is_complete': True,
-                        'is_success': False,
-                        'last_log_message': f'❌ Batch {batch_num}/{num_batches} failed. Stopping execution.',
-                        'last_log_type': 'error'
-                    }, 600)
-
-                # Return immediately with failure
-                success_count = sum(1 for o in orders if o['result'].get('success'))
-                failed_count = len(orders) - success_count
-                return {
-                    'success': False,
-                    'error': f'Batch {batch_num} failed: {error_msg}',
-                    'total_quantity': total_quantity,
-                    'total_lots': total_lots,
-                    'batches_completed': batches_completed,
-                    'total_batches': num_batches,
-                    'orders': orders,
-                    'summary': {
-                        'success_count': success_count,
-                        'failed_count': failed_count,
-                        'total_orders_placed': len(orders)
-                    },
-                    'message': f'Stopped at batch {batch_num}/{num_batches} due to failure.'
-                }
-
-            # Check for cancellation after batch completes (success or failure)
-            if cancellation_key and cache.get(cancellation_key):
-                logger.warning(f"⚠️ Order placement cancelled by user after batch {batch_num}/{num_batches}")
-
-                # Update progress
-                if progress_key:
-                    cache.set(progress_key, {
-                        'batches_completed': batches_completed,
-                        'total_batches': num_batches,
-                        'current_batch': None,
-                        'is_cancelled': True,
-                        'is_complete': True,
-                        'is_success': False,
-                        'last_log_message': f'🛑 Cancelled after batch {batch_num}/{num_batches}. Completed {batches_completed} batches.',
-                        'last_log_type': 'warning'
-                    }, 600)
-
-                success_count = sum(1 for o in orders if o['result'].get('success'))
-                failed_count = len(orders) - success_count
-                return {
-                    'success': True,
-                    'cancelled': True,
-                    'total_quantity': total_quantity,
-                    'batches_completed': batches_completed,
-                    'total_batches': num_batches,
-                    'orders': orders,
-                    'summary': {
-                        'success_count': success_count,
-                        'failed_count': failed_count,
-                        'total_orders_placed': len(orders)
-                    },
-                    'message': f'Order placement stopped by user. Completed {batches_completed}/{num_batches} batches.'
-                }
-
-            # Delay before next batch (except for last batch)
-            if batch_num < num_batches:
-                logger.info(f"⏱️  Waiting {delay_seconds} seconds before next batch...")
-                time.sleep(delay_seconds)
-
-                # Check for cancellation after sleep
-                if cancellation_key and cache.get(cancellation_key):
-                    logger.warning(f"⚠️ Order placement cancelled by user during wait after batch {batch_num}/{num_batches}")
-
-                    # Update progress
-                    if progress_key:
-                        cache.set(progress_key, {
-                            'batches_completed': batches_completed,
-                            'total_batches': num_batches,
-                            'current_batch': None,
-                            'is_cancelled': True,
-                            'is_complete': True,
-                            'is_success': False,
-                            'last_log_message': f'🛑 Cancelled during wait after batch {batch_num}/{num_batches}. Completed {batches_completed} batches.',
-                            'last_log_type': 'warning'
-                        }, 600)
-
-                    success_count = sum(1 for o in orders if o['result'].get('success'))
-                    failed_count = len(orders) - success_count
-                    return {
-                        'success': True,
-                        'cancelled': True,
-                        'total_quantity': total_quantity,
-                        'batches_completed': batches_completed,
-                        'total_batches': num_batches,
-                        'orders': orders,
-                        'summary': {
-                            'success_count': success_count,
-                            'failed_count': failed_count,
-                            'total_orders_placed': len(orders)
-                        },
-                        'message': f'Order placement stopped by user. Completed {batches_completed}/{num_batches} batches.'
-                    }
-
-        # Calculate summary
-        success_count = sum(1 for order in orders if order['result']['success'])
-        failed_count = len(orders) - success_count
-
-        success = (failed_count == 0)
-
-        logger.info(f"Batch execution complete: {batches_completed}/{num_batches} batches processed")
-        logger.info(f"Summary: {success_count}/{len(orders)} success")
-
-        # Final progress update
-        if progress_key:
-            cache.set(progress_key, {
-                'batches_completed': batches_completed,
-                'total_batches': num_batches,
-                'current_batch': None,
-                'is_cancelled': False,
-                'is_complete': True,
-                'is_success': success,
-                'last_log_message': f'✅ Completed: {success_count}/{len(orders)} orders successful' if success else f'⚠️ Completed with {failed_count} failures',
-                'last_log_type': 'success' if success else 'warning'
-            }, 600)
-
-        return {
-            'success': success,
-            'total_quantity': total_quantity,
-            'total_lots': total_lots,
-            'batches_completed': batches_completed,
-            'total_batches': num_batches,
-            'orders': orders,
-            'summary': {
-                'success_count': success_count,
-                'failed_count': failed_count,
-                'total_orders_placed': len(orders)
-            }
-        }
-
-    except Exception as e:
-        logger.exception(f"Error in batch position closing: {e}")
-        return {
-            'success': False,
-            'error': str(e),
-            'total_quantity': total_quantity,
-            'batches_completed': batches_completed,
-            'orders': orders
-        }
-
-
-def close_strangle_positions_in_batches(
-    call_symbol: str,
-    put_symbol: str,
-    total_lots: int,
-    batch_size: int = 20,
-    delay_seconds: int = 20,
-    product: str = 'NRML'
-):
-    """
-    Close strangle positions (Call BUY + Put BUY) in batches with delays.
-
-    This function closes strangle positions in batches to avoid overwhelming the broker API.
-    Since strangles are typically sold, closing them requires buying back both legs.
-
-    Args:
-        call_symbol (str): Call option trading symbol (e.g., 'NIFTY25NOV24500CE')
-        put_symbol (str): Put option trading symbol (e.g., 'NIFTY25NOV24000PE')
-        total_lots (int): Total number of lots to close
-        batch_size (int): Maximum lots per order (default: 20, Neo API limit)
-        delay_seconds (int): Delay between orders in seconds (default: 20)
-        product (str): Product type - 'NRML', 'MIS' (default: 'NRML')
-
-    Returns:
-        dict: Batch execution results
-            {
-                'success': True/False,
-                'total_lots': int,
-                'batches_completed': int,
-                'call_orders': [list of order results],
-                'put_orders': [list of order results],
-                'summary': {
-                    'call_success_count': int,
-                    'put_success_count': int,
-                    'call_failed_count': int,
-                    'put_failed_count': int
-                },
-                'error': str (if failed)
-            }
-    """
-    import time
-    import threading
-
-    logger.info(f"Starting batch strangle closing: {total_lots} lots in batches of {batch_size}")
-
-    # Get single authenticated session for all orders
-    try:
-        client = _get_authenticated_client()
-        logger.info("✅ Single Neo API session established for all orders")
-    except Exception as e:
-        logger.error(f"Failed to establish Neo session: {e}")
-        return {
-            'success': False,
-            'error': f'Authentication failed: {str(e)}',
-            'call_orders': [],
-            'put_orders': []
-        }
-
-    # Get lot size dynamically from Neo API
-    lot_size = get_lot_size_from_neo(call_symbol, client=client)
-    logger.info(f"Using lot size: {lot_size} for {call_symbol}")
-
-    call_orders = []
-    put_orders = []
-    batches_completed = 0
-
-    # Calculate number of batches
-    num_batches = (total_lots + batch_size - 1) // batch_size  # Ceiling division
-
-    try:
-        for batch_num in range(1, num_batches + 1):
-            # Calculate lots for this batch
-            remaining_lots = total_lots - (batch_num - 1) * batch_size
-            current_batch_lots = min(batch_size, remaining_lots)
-            current_batch_quantity = current_batch_lots * lot_size
-
-            logger.info(f"Batch {batch_num}/{num_batches}: Closing {current_batch_lots} lots ({current_batch_quantity} qty)")
-
-            # Optimization: Place CALL and PUT exit orders in parallel using threads
-            call_result = {}
-            put_result = {}
-
-            def place_call_exit_order():
-                nonlocal call_result
-                call_result = place_option_order(
-                    trading_symbol=call_symbol,
-                    transaction_type='B',  # BUY to close SELL
-                    quantity=current_batch_quantity,
-                    product=product,
-                    order_type='MKT',
-                    client=client  # Reuse session
-                )
-
-            def place_put_exit_order():
-                nonlocal put_result
-                put_result = place_option_order(
-                    trading_symbol=put_symbol,
-                    transaction_type='B',  # BUY to close SELL
-                    quantity=current_batch_quantity,
-                    product=product,
-                    order_type='MKT',
-                    client=client  # Reuse session
-                )
-
-            # Start both orders in parallel
-            call_thread = threading.Thread(target=place_call_exit_order)
-            put_thread = threading.Thread(target=place_put_exit_order)
-
-            logger.info(f"⚡ Placing CALL and PUT exit orders in parallel...")
-            call_thread.start()
-            put_thread.start()
-
-            # Wait for both to complete
-            call_thread.join()
-            put_thread.join()
-
-            # Record results
-            call_orders.append({
-                'batch': batch_num,
-                'lots': current_batch_lots,
-                'quantity': current_batch_quantity,
-                'result': call_result
-            })
-
-            put_orders.append({
-                'batch': batch_num,
-                'lots': current_batch_lots,
-                'quantity': current_batch_quantity,
-                'result': put_result
-            })
-
-            if call_result.get('success'):
-                logger.info(f"✅ CALL EXIT batch {batch_num}: Order ID {call_result['order_id']}")
-            else:
-                logger.error(f"❌ CALL EXIT batch {batch_num} failed: {call_result.get('error', 'Unknown error')}")
-
-            if put_result.get('success'):
-                logger.info(f"✅ PUT EXIT batch {batch_num}: Order ID {put_result['order_id']}")
-            else:
-                logger.error(f"❌ PUT EXIT batch {batch_num} failed: {put_result.get('error', 'Unknown error')}")
-
-            batches_completed += 1
-
-            # Delay before next batch (except for last batch)
-            if batch_num < num_batches:
-                logger.info(f"⏱️  Waiting {delay_seconds} seconds before next batch...")
-                time.sleep(delay_seconds)
-
-        # Calculate summary
-        call_success_count = sum(1 for order in call_orders if order['result']['success'])
-        put_success_count = sum(1 for order in put_orders if order['result']['success'])
-        call_failed_count = len(call_orders) - call_success_count
-        put_failed_count = len(put_orders) - put_success_count
-
-        success = (call_failed_count == 0 and put_failed_count == 0)
-
-        logger.info(f"Batch strangle closing complete: {batches_completed}/{num_batches} batches processed")
-        logger.info(f"Summary: Call {call_success_count}/{len(call_orders)} success, Put {put_success_count}/{len(put_orders)} success")
-
-        return {
-            'success': success,
-            'total_lots': total_lots,
-            'batches_completed': batches_completed,
-            'total_batches': num_batches,
-            'call_orders': call_orders,
-            'put_orders': put_orders,
-            'summary': {
-                'call_success_count': call_success_count,
-                'put_success_count': put_success_count,
-                'call_failed_count': call_failed_count,
-                'put_failed_count': put_failed_count,
-                'total_orders_placed': len(call_orders) + len(put_orders)
-            }
-        }
-
-    except Exception as e:
-        logger.exception(f"Error in batch strangle closing: {e}")
-        return {
-            'success': False,
-            'error': str(e),
-            'total_lots': total_lots,
-            'batches_completed': batches_completed,
-            'call_orders': call_orders,
-            'put_orders': put_orders
-        }
+# Batch order placement is implemented by the event-driven execution engine
+# in the neo package; re-exported here for existing callers.
+from apps.brokers.integrations.neo.batch_orders import (  # noqa: E402
+    place_strangle_orders_in_batches,
+    close_position_in_batches,
+    close_strangle_positions_in_batches,
+)
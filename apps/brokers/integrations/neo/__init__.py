@@ -51,6 +51,16 @@ from .batch_orders import (
     close_strangle_positions_in_batches,
 )
 
+# Execution Engine
+from .execution_engine import (
+    BatchExecutionEngine,
+    OrderFeedTracker,
+    OrderLeg,
+    AsFastAsAllowedPacing,
+    TWAPPacing,
+    plan_child_lots,
+)
+
 
 # Export all for backward compatibility
 __all__ = [
@@ -75,4 +85,11 @@ __all__ = [
     'place_strangle_orders_in_batches',
     'close_position_in_batches',
     'close_strangle_positions_in_batches',
+    # Execution Engine
+    'BatchExecutionEngine',
+    'OrderFeedTracker',
+    'OrderLeg',
+    'AsFastAsAllowedPacing',
+    'TWAPPacing',
+    'plan_child_lots',
 ]
@@ -6,7 +6,6 @@ This module provides authentication and session management for Kotak Neo broker
 
 import logging
 import jwt
-from neo_api_client import NeoAPI
 
 from apps.brokers.utils.auth_manager import (
     get_credentials,
@@ -30,6 +29,11 @@ def _get_authenticated_client():
     Raises:
         ValueError: If credentials not found or authentication fails
     """
+    from apps.brokers.integrations.simulator import get_simulated_neo_client, is_simulator_enabled
+    from apps.core.services.telemetry import instrument_client
+    if is_simulator_enabled():
+        return instrument_client('kotakneo', get_simulated_neo_client())
+
     try:
         from tools.neo import NeoAPI as NeoAPIWrapper
 
@@ -46,7 +50,7 @@ def _get_authenticated_client():
             logger.info("Neo API authentication successful via tools.neo wrapper")
             # Return the underlying neo_api_client instance
             logger.info(f"Returning Neo client: {neo_wrapper.neo}")
-            return neo_wrapper.neo
+            return instrument_client('kotakneo', neo_wrapper.neo)
         else:
             logger.error(f"Neo API login failed: result={login_result}, session_active={neo_wrapper.session_active}")
             raise ValueError("Neo API login failed via tools.neo wrapper")
@@ -109,6 +113,9 @@ def auto_login_kotak_neo():
 
     # No valid token, perform fresh login with OTP
     logger.info("Performing fresh Kotak Neo login for auto_login")
+    # neo_api_client loads pandas and its whole API surface on import
+    from neo_api_client import NeoAPI
+
     client = NeoAPI(
         consumer_key=creds.api_key,
         consumer_secret=creds.api_secret,
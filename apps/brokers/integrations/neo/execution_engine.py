@@ -0,0 +1,752 @@
+"""
+Kotak Neo Execution Engine - Event-Driven Child Order Execution
+
+This module executes large parent orders (strangle entries, position exits)
+as a sequence of child orders without fixed wall-clock sleeps:
+
+- Child orders are sized by the exchange freeze quantity and the Neo per-order
+  lot cap, so no order is rejected for exceeding freeze limits.
+- Orders are placed from a bounded worker pool, paced by a token bucket that
+  matches the broker's order rate limit.
+- Each wave of child orders (one per leg) advances as soon as the Neo order
+  feed confirms the fills, falling back to order_history polling when the
+  websocket feed is not available.
+- Pacing is pluggable: as-fast-as-allowed (default) or TWAP over a duration.
+- Progress is published as an ordered event stream (ExecutionEventStream)
+  instead of ad-hoc progress dicts in cache.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from apps.core.constants import (
+    EXCHANGE_FREEZE_QUANTITY,
+    NEO_MAX_LOTS_PER_ORDER,
+    NEO_ORDER_RATE_PER_SECOND,
+    NEO_ORDER_WORKERS,
+    ORDER_FILL_TIMEOUT_SECONDS,
+    ORDER_STATUS_PENDING,
+    ORDER_STATUS_PLACED,
+    ORDER_STATUS_FILLED,
+    ORDER_STATUS_PARTIAL,
+    ORDER_STATUS_CANCELLED,
+    ORDER_STATUS_REJECTED,
+)
+from apps.core.utils.event_stream import ExecutionEventStream
+from apps.core.utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+# Neo 'ordSt' values mapped to internal order statuses
+NEO_ORDER_STATUS_MAP = {
+    'complete': ORDER_STATUS_FILLED,
+    'traded': ORDER_STATUS_FILLED,
+    'rejected': ORDER_STATUS_REJECTED,
+    'cancelled': ORDER_STATUS_CANCELLED,
+    'canceled': ORDER_STATUS_CANCELLED,
+}
+
+TERMINAL_STATUSES = (ORDER_STATUS_FILLED, ORDER_STATUS_REJECTED, ORDER_STATUS_CANCELLED)
+
+# Process-wide limiter shared by all executions so concurrent executions
+# together stay within the broker's order rate limit
+_shared_order_limiter = TokenBucket(rate=NEO_ORDER_RATE_PER_SECOND)
+
+
+def get_order_rate_limiter() -> TokenBucket:
+    """Return the process-wide Neo order placement rate limiter."""
+    return _shared_order_limiter
+
+
+# =============================================================================
+# CHILD ORDER SIZING
+# =============================================================================
+
+def get_freeze_quantity(trading_symbol: str) -> Optional[int]:
+    """
+    Get the exchange freeze quantity for a trading symbol's underlying.
+
+    Args:
+        trading_symbol: Neo trading symbol (e.g., 'NIFTY25NOV24500CE')
+
+    Returns:
+        int: Freeze quantity, or None if the underlying has no configured limit
+    """
+    symbol = (trading_symbol or '').upper()
+    # Longest prefix first so 'MIDCPNIFTY' is not matched as 'NIFTY'
+    for underlying in sorted(EXCHANGE_FREEZE_QUANTITY, key=len, reverse=True):
+        if symbol.startswith(underlying):
+            return EXCHANGE_FREEZE_QUANTITY[underlying]
+    return None
+
+
+def plan_child_lots(
+    total_lots: int,
+    lot_size: int,
+    trading_symbol: str,
+    max_lots_per_order: int = NEO_MAX_LOTS_PER_ORDER
+) -> List[int]:
+    """
+    Split a parent order into child order sizes (in lots).
+
+    Each child is capped by the Neo per-order lot limit and by the exchange
+    freeze quantity for the underlying.
+
+    Example:
+        >>> plan_child_lots(50, 75, 'NIFTY25NOV24500CE')  # freeze 1800 = 24 lots
+        [20, 20, 10]
+    """
+    if total_lots <= 0:
+        return []
+
+    max_lots = max(1, int(max_lots_per_order))
+    freeze_qty = get_freeze_quantity(trading_symbol)
+    if freeze_qty and lot_size > 0:
+        max_lots = min(max_lots, max(1, freeze_qty // lot_size))
+
+    full, remainder = divmod(total_lots, max_lots)
+    plan = [max_lots] * full
+    if remainder:
+        plan.append(remainder)
+    return plan
+
+
+# =============================================================================
+# PACING POLICIES
+# =============================================================================
+
+class PacingPolicy:
+    """
+    Base pacing policy.
+
+    A pacing policy decides the earliest time each wave of child orders may
+    start. Fill confirmations and the rate limiter still gate every wave; the
+    policy can only slow execution down, never bypass those limits.
+    """
+
+    name = 'base'
+
+    def start(self, total_waves: int):
+        self.total_waves = total_waves
+        self.started_at = time.monotonic()
+
+    def next_wave_at(self, wave_index: int) -> float:
+        """Return the monotonic time at which wave `wave_index` (0-based) may start."""
+        return self.started_at
+
+
+class AsFastAsAllowedPacing(PacingPolicy):
+    """Start each wave as soon as the previous one is confirmed."""
+
+    name = 'fast'
+
+
+class TWAPPacing(PacingPolicy):
+    """
+    Time-weighted pacing: spread waves evenly over a duration.
+
+    Args:
+        duration_seconds: Total time over which to spread all waves
+        interval_seconds: Fixed spacing between wave starts (used if no duration)
+    """
+
+    name = 'twap'
+
+    def __init__(self, duration_seconds: float = None, interval_seconds: float = None):
+        if duration_seconds is None and interval_seconds is None:
+            raise ValueError("TWAPPacing requires duration_seconds or interval_seconds")
+        self.duration_seconds = duration_seconds
+        self.interval_seconds = interval_seconds
+
+    def next_wave_at(self, wave_index: int) -> float:
+        if self.duration_seconds is not None:
+            interval = self.duration_seconds / max(1, self.total_waves - 1)
+        else:
+            interval = self.interval_seconds
+        return self.started_at + wave_index * interval
+
+
+PACING_POLICIES = {
+    AsFastAsAllowedPacing.name: AsFastAsAllowedPacing,
+    TWAPPacing.name: TWAPPacing,
+}
+
+
+def get_pacing_policy(pacing=None, **kwargs) -> PacingPolicy:
+    """
+    Resolve a pacing policy from a name or instance.
+
+    Args:
+        pacing: PacingPolicy instance, policy name ('fast', 'twap') or None
+        **kwargs: Constructor arguments for named policies
+
+    Returns:
+        PacingPolicy: Resolved policy (AsFastAsAllowedPacing by default)
+    """
+    if isinstance(pacing, PacingPolicy):
+        return pacing
+    if pacing is None:
+        return AsFastAsAllowedPacing()
+    try:
+        return PACING_POLICIES[pacing](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown pacing policy: {pacing}")
+
+
+# =============================================================================
+# ORDER FEED TRACKING
+# =============================================================================
+
+def _normalize_order_update(raw: Dict) -> Optional[Dict]:
+    """Convert a Neo order feed / order_history record into a status dict."""
+    if not isinstance(raw, dict):
+        return None
+
+    order_id = raw.get('nOrdNo') or raw.get('orderId') or raw.get('order_id')
+    if not order_id:
+        return None
+
+    neo_status = str(raw.get('ordSt') or raw.get('status') or '').strip().lower()
+    try:
+        quantity = int(float(raw.get('qty') or 0))
+    except (TypeError, ValueError):
+        quantity = 0
+    try:
+        filled = int(float(raw.get('fldQty') or 0))
+    except (TypeError, ValueError):
+        filled = 0
+
+    status = NEO_ORDER_STATUS_MAP.get(neo_status)
+    if status is None:
+        status = ORDER_STATUS_PARTIAL if 0 < filled < quantity else ORDER_STATUS_PLACED
+
+    try:
+        average_price = float(raw.get('avgPrc') or 0) or None
+    except (TypeError, ValueError):
+        average_price = None
+
+    return {
+        'order_id': str(order_id),
+        'status': status,
+        'neo_status': neo_status,
+        'quantity': quantity,
+        'filled_quantity': filled,
+        'average_price': average_price,
+        'reject_reason': raw.get('rejRsn') or '',
+    }
+
+
+def parse_order_feed_message(message) -> List[Dict]:
+    """
+    Extract order updates from a Neo websocket message.
+
+    Neo delivers order feed messages as {'type': 'order_feed', 'data': <json str>}
+    where the payload itself is {'type': 'order', 'data': {...}}. Heartbeats and
+    connection acks are ignored.
+    """
+    payload = message
+    if isinstance(payload, dict) and payload.get('type') == 'order_feed':
+        payload = payload.get('data')
+
+    if isinstance(payload, (str, bytes)):
+        try:
+            payload = json.loads(payload)
+        except (TypeError, ValueError):
+            return []
+
+    if isinstance(payload, dict) and 'data' in payload and not payload.get('nOrdNo'):
+        payload = payload['data']
+
+    records = payload if isinstance(payload, list) else [payload]
+    updates = []
+    for record in records:
+        update = _normalize_order_update(record)
+        if update:
+            updates.append(update)
+    return updates
+
+
+class OrderFeedTracker:
+    """
+    Tracks order states from the Neo order feed.
+
+    Hooks into the client's websocket callback (chaining any existing
+    on_message handler), subscribes to the order feed and wakes waiters as
+    updates arrive. When the feed is unavailable, or an update has not
+    arrived within `history_fallback_after` seconds, the order state is
+    polled from `client.order_history`.
+    """
+
+    def __init__(self, client, poll_interval: float = 1.0, history_fallback_after: float = 3.0):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.history_fallback_after = history_fallback_after
+        self.feed_active = False
+        self._states: Dict[str, Dict] = {}
+        self._condition = threading.Condition()
+        self._previous_on_message = None
+        self._started = False
+
+    def start(self):
+        """Subscribe to the Neo order feed (best effort)."""
+        if self._started:
+            return
+        self._started = True
+
+        if not hasattr(self.client, 'subscribe_to_orderfeed'):
+            logger.info("Order feed not supported by client, using order_history polling")
+            return
+
+        self._previous_on_message = getattr(self.client, 'on_message', None)
+        try:
+            self.client.on_message = self._on_message
+            response = self.client.subscribe_to_orderfeed()
+            if isinstance(response, dict) and response.get('Error Message'):
+                raise ValueError(response['Error Message'])
+            self.feed_active = True
+            logger.info("Subscribed to Neo order feed for fill confirmations")
+        except Exception as e:
+            self.client.on_message = self._previous_on_message
+            logger.warning(f"Order feed unavailable, falling back to order_history polling: {e}")
+
+    def stop(self):
+        """Restore the client's original message callback."""
+        if self.feed_active:
+            self.client.on_message = self._previous_on_message
+            self.feed_active = False
+
+    def _on_message(self, message):
+        self.handle_message(message)
+        if self._previous_on_message:
+            try:
+                self._previous_on_message(message)
+            except Exception as e:
+                logger.debug(f"Chained on_message callback failed: {e}")
+
+    def handle_message(self, message):
+        """Apply an order feed message to the tracked states."""
+        updates = parse_order_feed_message(message)
+        if not updates:
+            return
+        with self._condition:
+            for update in updates:
+                self._states[update['order_id']] = update
+            self._condition.notify_all()
+
+    def get_state(self, order_id: str) -> Optional[Dict]:
+        with self._condition:
+            return self._states.get(str(order_id))
+
+    def _poll_history(self, order_id: str) -> Optional[Dict]:
+        try:
+            response = self.client.order_history(order_id=order_id)
+        except Exception as e:
+            logger.debug(f"order_history failed for {order_id}: {e}")
+            return None
+
+        data = response.get('data') if isinstance(response, dict) else None
+        if isinstance(data, dict):
+            data = data.get('data')
+        if not isinstance(data, list) or not data:
+            return None
+
+        # order_history returns the latest status first
+        update = _normalize_order_update(data[0])
+        if update:
+            with self._condition:
+                self._states[update['order_id']] = update
+                self._condition.notify_all()
+        return update
+
+    def wait_for_terminal(self, order_id: str, timeout: float,
+                          cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+        """
+        Wait until an order reaches a terminal state (filled/rejected/cancelled).
+
+        Returns:
+            dict: Last known order state (may be non-terminal on timeout), or None
+        """
+        order_id = str(order_id)
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            with self._condition:
+                state = self._states.get(order_id)
+                if state and state['status'] in TERMINAL_STATUSES:
+                    return state
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return state
+                self._condition.wait(min(remaining, self.poll_interval))
+                state = self._states.get(order_id)
+                if state and state['status'] in TERMINAL_STATUSES:
+                    return state
+
+            if cancel_event is not None and cancel_event.is_set():
+                return state
+
+            waited = time.monotonic() - started
+            if not self.feed_active or waited >= self.history_fallback_after:
+                state = self._poll_history(order_id) or state
+                if state and state['status'] in TERMINAL_STATUSES:
+                    return state
+
+
+# =============================================================================
+# EXECUTION ENGINE
+# =============================================================================
+
+@dataclass
+class OrderLeg:
+    """One instrument of a parent order (e.g., the CALL leg of a strangle)."""
+    name: str
+    trading_symbol: str
+    transaction_type: str  # 'B' or 'S'
+
+
+@dataclass
+class ChildOrder:
+    """A single child order placed for one leg in one wave."""
+    leg: str
+    wave: int
+    trading_symbol: str
+    transaction_type: str
+    lots: int
+    quantity: int
+    order_id: Optional[str] = None
+    status: str = ORDER_STATUS_PENDING
+    filled_quantity: int = 0
+    average_price: Optional[float] = None
+    fill_confirmed: bool = False
+    error: Optional[str] = None
+    result: Dict = field(default_factory=dict)
+    placement_ms: Optional[float] = None
+    confirmation_ms: Optional[float] = None
+
+    @property
+    def success(self) -> bool:
+        return bool(self.order_id) and self.status not in (ORDER_STATUS_REJECTED, ORDER_STATUS_CANCELLED)
+
+    def as_batch_record(self) -> Dict:
+        """Legacy batch record format used by batch_orders callers."""
+        result = dict(self.result)
+        result.update({
+            'success': self.success,
+            'order_id': self.order_id,
+            'status': self.status,
+            'filled_quantity': self.filled_quantity,
+            'average_price': self.average_price,
+            'fill_confirmed': self.fill_confirmed,
+        })
+        if self.error:
+            result['error'] = self.error
+        return {
+            'batch': self.wave,
+            'lots': self.lots,
+            'quantity': self.quantity,
+            'result': result,
+        }
+
+
+@dataclass
+class ExecutionReport:
+    """Outcome of a BatchExecutionEngine run."""
+    total_lots: int
+    total_waves: int
+    waves_completed: int = 0
+    children: List[ChildOrder] = field(default_factory=list)
+    cancelled: bool = False
+    failed_wave: Optional[int] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.error is None and all(child.success for child in self.children)
+
+    def children_for_leg(self, leg: str) -> List[ChildOrder]:
+        return [child for child in self.children if child.leg == leg]
+
+
+class BatchExecutionEngine:
+    """
+    Executes a multi-leg parent order as waves of child orders.
+
+    Each wave places one child order per leg concurrently and completes once
+    every child is confirmed filled/rejected by the order feed (or the fill
+    timeout elapses). The next wave starts as soon as the pacing policy
+    allows - with the default as-fast-as-allowed policy that is immediately,
+    limited only by the token bucket.
+
+    Example:
+        >>> engine = BatchExecutionEngine(
+        ...     client=client,
+        ...     legs=[OrderLeg('CALL', 'NIFTY25NOV24500CE', 'S'),
+        ...           OrderLeg('PUT', 'NIFTY25NOV24000PE', 'S')],
+        ...     total_lots=100,
+        ...     lot_size=75,
+        ... )
+        >>> report = engine.run()
+    """
+
+    def __init__(
+        self,
+        client,
+        legs: List[OrderLeg],
+        total_lots: int,
+        lot_size: int,
+        product: str = 'NRML',
+        max_lots_per_order: int = NEO_MAX_LOTS_PER_ORDER,
+        pacing: PacingPolicy = None,
+        rate_limiter: TokenBucket = None,
+        max_workers: int = NEO_ORDER_WORKERS,
+        fill_timeout: float = ORDER_FILL_TIMEOUT_SECONDS,
+        stop_on_failure: bool = True,
+        cancel_check: Callable[[], bool] = None,
+        stream: ExecutionEventStream = None,
+        tracker: OrderFeedTracker = None,
+        order_func: Callable = None,
+    ):
+        if order_func is None:
+            from .orders import place_option_order
+            order_func = place_option_order
+
+        self.client = client
+        self.legs = legs
+        self.total_lots = total_lots
+        self.lot_size = lot_size
+        self.product = product
+        self.max_lots_per_order = max_lots_per_order
+        self.pacing = get_pacing_policy(pacing)
+        self.rate_limiter = rate_limiter or get_order_rate_limiter()
+        self.max_workers = max(max_workers, len(legs))
+        self.fill_timeout = fill_timeout
+        self.stop_on_failure = stop_on_failure
+        self.cancel_check = cancel_check
+        self.stream = stream or ExecutionEventStream()
+        self.tracker = tracker or OrderFeedTracker(client)
+        self.order_func = order_func
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; no further child orders will be placed."""
+        self.cancel_event.set()
+
+    def _is_cancelled(self) -> bool:
+        if self.cancel_event.is_set():
+            return True
+        if self.cancel_check:
+            try:
+                if self.cancel_check():
+                    self.cancel_event.set()
+                    return True
+            except Exception as e:
+                logger.warning(f"Cancellation check failed: {e}")
+        return False
+
+    def _wait_until(self, start_at: float) -> bool:
+        """Wait for a pacing slot. Returns False if cancelled while waiting."""
+        while True:
+            if self._is_cancelled():
+                return False
+            remaining = start_at - time.monotonic()
+            if remaining <= 0:
+                return True
+            self.cancel_event.wait(min(remaining, 0.5))
+
+    def _place_and_confirm(self, child: ChildOrder) -> ChildOrder:
+        if not self.rate_limiter.acquire(cancel_event=self.cancel_event):
+            child.status = ORDER_STATUS_CANCELLED
+            child.error = 'Cancelled before placement'
+            return child
+
+        started = time.monotonic()
+        result = self.order_func(
+            trading_symbol=child.trading_symbol,
+            transaction_type=child.transaction_type,
+            quantity=child.quantity,
+            product=self.product,
+            order_type='MKT',
+            client=self.client
+        )
+        child.placement_ms = round((time.monotonic() - started) * 1000, 1)
+        child.result = result or {}
+
+        if not child.result.get('success'):
+            child.status = ORDER_STATUS_REJECTED
+            child.error = child.result.get('error', 'Unknown error')
+            return child
+
+        child.order_id = str(child.result.get('order_id'))
+        child.status = ORDER_STATUS_PLACED
+
+        state = self.tracker.wait_for_terminal(child.order_id, self.fill_timeout, self.cancel_event)
+        child.confirmation_ms = round((time.monotonic() - started) * 1000, 1)
+
+        if state:
+            child.status = state['status']
+            child.filled_quantity = state['filled_quantity']
+            child.average_price = state['average_price']
+            child.fill_confirmed = state['status'] in TERMINAL_STATUSES
+            if state['status'] == ORDER_STATUS_REJECTED:
+                child.error = state['reject_reason'] or 'Rejected by exchange'
+
+        return child
+
+    def _publish_child(self, child: ChildOrder, total_waves: int):
+        label = f"{child.leg} batch {child.wave}/{total_waves}"
+        data = {
+            'leg': child.leg,
+            'wave': child.wave,
+            'order_id': child.order_id,
+            'status': child.status,
+            'lots': child.lots,
+            'quantity': child.quantity,
+            'filled_quantity': child.filled_quantity,
+            'average_price': child.average_price,
+            'placement_ms': child.placement_ms,
+            'confirmation_ms': child.confirmation_ms,
+        }
+        if not child.success:
+            self.stream.publish('order_rejected', f"{label} failed: {child.error}", 'error', **data)
+        elif child.fill_confirmed:
+            self.stream.publish('order_filled', f"{label} filled: Order ID {child.order_id}", 'success', **data)
+        else:
+            self.stream.publish(
+                'order_placed',
+                f"{label} placed: Order ID {child.order_id} (fill not yet confirmed)",
+                'info', **data
+            )
+
+    def run(self) -> ExecutionReport:
+        """Execute all waves and return an ExecutionReport."""
+        plan = plan_child_lots(
+            self.total_lots, self.lot_size, self.legs[0].trading_symbol, self.max_lots_per_order
+        ) if self.legs else []
+        report = ExecutionReport(total_lots=self.total_lots, total_waves=len(plan))
+        started = time.monotonic()
+
+        self.stream.update(
+            total_batches=len(plan),
+            batches_completed=0,
+            current_batch=None,
+            is_cancelled=False,
+            is_complete=False,
+            is_success=False,
+        )
+        self.stream.publish(
+            'plan',
+            f"Calculated {len(plan)} batches for {self.total_lots} lots "
+            f"(pacing: {self.pacing.name})",
+            'info',
+            child_lots=plan,
+            legs=[leg.name for leg in self.legs],
+        )
+
+        self.tracker.start()
+        self.pacing.start(len(plan))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='neo-exec') as pool:
+                for wave_index, lots in enumerate(plan):
+                    wave = wave_index + 1
+
+                    if not self._wait_until(self.pacing.next_wave_at(wave_index)):
+                        report.cancelled = True
+                        break
+
+                    quantity = lots * self.lot_size
+                    self.stream.update(current_batch={'batch_num': wave, 'lots': lots, 'quantity': quantity})
+                    self.stream.publish(
+                        'wave_started',
+                        f"Processing batch {wave}/{len(plan)}: {lots} lots",
+                        'info',
+                        wave=wave, lots=lots, quantity=quantity
+                    )
+
+                    children = [
+                        ChildOrder(
+                            leg=leg.name,
+                            wave=wave,
+                            trading_symbol=leg.trading_symbol,
+                            transaction_type=leg.transaction_type,
+                            lots=lots,
+                            quantity=quantity,
+                        )
+                        for leg in self.legs
+                    ]
+                    futures = [pool.submit(self._place_and_confirm, child) for child in children]
+                    for future in futures:
+                        future.result()
+
+                    report.children.extend(children)
+                    report.waves_completed += 1
+                    for child in children:
+                        self._publish_child(child, len(plan))
+
+                    self.stream.update(
+                        batches_completed=report.waves_completed,
+                        current_batch=None,
+                        leg_progress={
+                            leg.name: sum(1 for c in report.children_for_leg(leg.name) if c.success)
+                            for leg in self.legs
+                        },
+                    )
+
+                    failed = [child for child in children if not child.success]
+                    if failed and self.stop_on_failure:
+                        report.failed_wave = wave
+                        report.error = f"Batch {wave} failed: {failed[0].error}"
+                        break
+
+                    if self._is_cancelled():
+                        report.cancelled = wave < len(plan)
+                        break
+        except Exception as e:
+            logger.exception(f"Error in batch execution: {e}")
+            report.error = str(e)
+        finally:
+            self.tracker.stop()
+
+        report.elapsed_seconds = round(time.monotonic() - started, 3)
+        self._publish_completion(report)
+        return report
+
+    def _publish_completion(self, report: ExecutionReport):
+        success_count = sum(1 for child in report.children if child.success)
+        total = len(report.children)
+
+        if report.cancelled:
+            message = (f"Cancelled after batch {report.waves_completed}/{report.total_waves}. "
+                       f"Completed {report.waves_completed} batches.")
+            level, event_type = 'warning', 'cancelled'
+        elif report.error:
+            message = f"{report.error}. Stopping execution."
+            level, event_type = 'error', 'failed'
+        elif report.success:
+            message = f"Completed: {success_count}/{total} orders successful in {report.elapsed_seconds}s"
+            level, event_type = 'success', 'completed'
+        else:
+            message = f"Completed with {total - success_count} failures"
+            level, event_type = 'warning', 'completed'
+
+        self.stream.update(
+            batches_completed=report.waves_completed,
+            current_batch=None,
+            is_cancelled=report.cancelled,
+            is_complete=True,
+            is_success=report.success and not report.cancelled,
+        )
+        self.stream.publish(
+            event_type, message, level,
+            waves_completed=report.waves_completed,
+            total_waves=report.total_waves,
+            elapsed_seconds=report.elapsed_seconds,
+        )
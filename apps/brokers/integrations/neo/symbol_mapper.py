@@ -9,7 +9,6 @@ import re
 import csv
 import io
 import time
-import calendar
 import requests
 from datetime import datetime, date
 
@@ -139,17 +138,15 @@ def map_neo_symbol_to_breeze(neo_symbol: str) -> dict:
                 'exchange_code': 'NFO'
             }
 
-        # Calculate last trading Thursday of the month (standard F&O expiry)
-        last_day = calendar.monthrange(year, month)[1]
-        last_date = date(year, month, last_day)
-
-        # Find last Thursday
-        last_thursday = last_date
-        while last_thursday.weekday() != 3:  # 3 = Thursday
-            last_thursday = date(year, month, last_thursday.day - 1)
+        # Monthly F&O expiry for that month from the trading calendar
+        # (last Tuesday, moved to the previous trading day on holidays)
+        from apps.core.services.trading_calendar import get_trading_calendar
+        monthly_expiry = get_trading_calendar().next_expiry(
+            stock_code, kind='monthly', from_date=date(year, month, 1)
+        )
 
         # Format expiry date as DD-Mon-YYYY (Breeze format with title case month)
-        expiry_date = last_thursday.strftime('%d-%b-%Y')
+        expiry_date = monthly_expiry.strftime('%d-%b-%Y')
 
         logger.info(f"[NEO->BREEZE MAPPING] {neo_symbol} -> stock_code={stock_code}, expiry={expiry_date}")
 
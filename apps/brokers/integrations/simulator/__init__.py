@@ -0,0 +1,99 @@
+"""
+Local Broker Simulator
+
+An in-process exchange plus Neo/Breeze client stand-ins, selected with
+BROKER_SIMULATOR=True. When enabled, get_breeze_client() and the Neo
+_get_authenticated_client() hand out simulated clients, so order placement,
+batch execution, position sync and the monitors run with no network.
+
+Usage:
+    from apps.brokers.integrations.simulator import get_simulated_exchange
+
+    exchange = get_simulated_exchange()
+    exchange.set_spot('NIFTY', 24150)
+    exchange.start_recording()
+    ...
+    save_session(exchange.stop_recording(), 'sessions/expiry_day.jsonl')
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from django.conf import settings
+
+from .clients import SimulatedBreezeClient, SimulatedNeoClient
+from .exchange import ExecutionModel, Instrument, OrderRejected, SimulatedExchange, option_symbol, future_symbol
+from .replay import load_session, percentiles, replay_session, save_session, session_from_option_chain_store
+
+logger = logging.getLogger(__name__)
+
+_exchange: Optional[SimulatedExchange] = None
+_exchange_lock = threading.Lock()
+
+
+def is_simulator_enabled() -> bool:
+    """True when broker calls should go to the local simulator."""
+    return bool(getattr(settings, 'BROKER_SIMULATOR', False))
+
+
+def _build_exchange() -> SimulatedExchange:
+    options = getattr(settings, 'BROKER_SIMULATOR_OPTIONS', {}) or {}
+    model_options = {
+        key: options[key] for key in ('latency_ms', 'reject_rate', 'seed') if options.get(key) is not None
+    }
+    exchange = SimulatedExchange(model=ExecutionModel(**model_options))
+    if options.get('session'):
+        stats = replay_session(exchange, load_session(options['session']))
+        logger.info(f"Simulated exchange primed from {options['session']}: {stats['events']} events")
+    return exchange
+
+
+def get_simulated_exchange() -> SimulatedExchange:
+    """Get the process-wide simulated exchange (created on first use)."""
+    global _exchange
+    if _exchange is None:
+        with _exchange_lock:
+            if _exchange is None:
+                _exchange = _build_exchange()
+    return _exchange
+
+
+def reset_simulated_exchange(exchange: Optional[SimulatedExchange] = None) -> SimulatedExchange:
+    """Replace the shared exchange (fresh book, positions and prices); returns the new one."""
+    global _exchange
+    with _exchange_lock:
+        if _exchange is not None:
+            _exchange.close()
+        _exchange = exchange or _build_exchange()
+    return _exchange
+
+
+def get_simulated_neo_client() -> SimulatedNeoClient:
+    return SimulatedNeoClient(get_simulated_exchange())
+
+
+def get_simulated_breeze_client() -> SimulatedBreezeClient:
+    return SimulatedBreezeClient(get_simulated_exchange())
+
+
+__all__ = [
+    'ExecutionModel',
+    'Instrument',
+    'OrderRejected',
+    'SimulatedExchange',
+    'SimulatedNeoClient',
+    'SimulatedBreezeClient',
+    'is_simulator_enabled',
+    'get_simulated_exchange',
+    'reset_simulated_exchange',
+    'get_simulated_neo_client',
+    'get_simulated_breeze_client',
+    'option_symbol',
+    'future_symbol',
+    'save_session',
+    'load_session',
+    'replay_session',
+    'session_from_option_chain_store',
+    'percentiles',
+]
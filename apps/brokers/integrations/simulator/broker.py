@@ -0,0 +1,176 @@
+"""
+SimulatorBroker - BrokerInterface over the simulated exchange
+
+Registered with BrokerFactory as 'simulator' so code written against the
+broker interface can run offline:
+
+    broker = BrokerFactory.get_broker('simulator')
+    broker.login()
+    broker.place_order('NIFTY25NOV24000CE', 'S', 75)
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from apps.brokers.interfaces import BrokerInterface, MarginData, Order, Position, Quote
+
+from .exchange import OrderRejected, STATUS_CANCELLED, STATUS_COMPLETE, STATUS_REJECTED
+
+logger = logging.getLogger(__name__)
+
+ORDER_STATUS = {
+    STATUS_COMPLETE: 'EXECUTED',
+    STATUS_REJECTED: 'REJECTED',
+    STATUS_CANCELLED: 'CANCELLED',
+}
+
+
+class SimulatorBroker(BrokerInterface):
+    """Broker interface implementation backed by the shared SimulatedExchange."""
+
+    def __init__(self, exchange=None):
+        if exchange is None:
+            from . import get_simulated_exchange
+            exchange = get_simulated_exchange()
+        self.exchange = exchange
+        self.session_active = False
+        self._feed_handles: Dict[str, int] = {}
+
+    def login(self) -> bool:
+        self.session_active = True
+        return True
+
+    def logout(self) -> bool:
+        self.unsubscribe_live_feed(list(self._feed_handles))
+        self.session_active = False
+        return True
+
+    # ===== Margin & Funds =====
+
+    def get_margin(self) -> MarginData:
+        margin = self.exchange.margin()
+        return MarginData(
+            available_margin=margin['available'],
+            used_margin=margin['used'],
+            total_margin=margin['capital'],
+            cash=margin['available'],
+            raw_data=margin,
+        )
+
+    def get_available_margin(self) -> float:
+        return self.get_margin().available_margin
+
+    def check_margin_sufficient(self, required: float) -> bool:
+        return self.get_available_margin() >= required
+
+    # ===== Positions =====
+
+    def get_positions(self) -> List[Position]:
+        positions = []
+        for row in self.exchange.positions():
+            if not row['net_quantity']:
+                continue
+            invested = abs(row['net_quantity']) * row['average_price']
+            positions.append(Position(
+                symbol=row['symbol'],
+                quantity=row['net_quantity'],
+                average_price=row['average_price'],
+                current_price=row['ltp'],
+                pnl=row['pnl'],
+                pnl_percentage=(row['pnl'] / invested * 100) if invested else 0.0,
+                exchange='NFO' if self.exchange.instrument(row['symbol']).is_derivative else 'NSE',
+                product=row['product'],
+                raw_data=row,
+            ))
+        return positions
+
+    def has_open_positions(self) -> bool:
+        return bool(self.get_positions())
+
+    def get_position_pnl(self) -> float:
+        return sum(row['pnl'] for row in self.exchange.positions())
+
+    # ===== Orders =====
+
+    def place_order(self, symbol: str, action: str, quantity: int, order_type: str = 'MKT',
+                    price: float = 0.0, **kwargs) -> Optional[str]:
+        try:
+            order = self.exchange.place_order(
+                symbol, action, quantity, order_type=order_type, price=price,
+                product=kwargs.get('product', 'NRML'), tag=kwargs.get('tag'),
+            )
+        except OrderRejected as e:
+            logger.warning(f"Simulated order rejected: {e}")
+            return None
+        return order['nOrdNo']
+
+    def get_orders(self) -> List[Order]:
+        return [
+            Order(
+                order_id=order['nOrdNo'],
+                symbol=order['trdSym'],
+                quantity=order['qty'],
+                executed_quantity=order['fldQty'],
+                price=order['avgPrc'] or order['prc'],
+                order_type='LIMIT' if order['prcTp'] == 'L' else 'MARKET',
+                transaction_type='BUY' if order['trnsTp'] == 'B' else 'SELL',
+                status=ORDER_STATUS.get(order['ordSt'], 'PENDING'),
+                timestamp=datetime.strptime(order['ordDtTm'], '%d-%b-%Y %H:%M:%S'),
+                raw_data=order,
+            )
+            for order in self.exchange.orders()
+        ]
+
+    def cancel_order(self, order_id: str) -> bool:
+        return self.exchange.cancel_order(order_id)
+
+    # ===== Quotes & Data =====
+
+    def get_quote(self, symbol: str, **kwargs) -> Optional[Quote]:
+        quote = self.exchange.quote(symbol)
+        return Quote(
+            symbol=quote['symbol'],
+            ltp=quote['ltp'],
+            bid=quote['bid'],
+            ask=quote['ask'],
+            high=quote['high'],
+            low=quote['low'],
+            volume=quote['volume'],
+            oi=quote['oi'],
+            timestamp=quote['time'],
+            raw_data=quote,
+        )
+
+    def search_symbol(self, symbol: str, **kwargs) -> List[Dict]:
+        symbol = symbol.upper()
+        return [
+            {'symbol': instrument.symbol, 'token': instrument.token, 'lot_size': instrument.lot_size,
+             'exchange_segment': instrument.exchange_segment}
+            for instrument in self.exchange.instruments()
+            if symbol in instrument.symbol
+        ]
+
+    # ===== Market Status =====
+
+    def is_market_open(self) -> bool:
+        """The simulated market is always open."""
+        return True
+
+    # ===== WebSocket =====
+
+    def subscribe_live_feed(self, symbols: List[str], **kwargs) -> bool:
+        callback = kwargs.get('callback')
+        if callback is None:
+            return False
+        for symbol in symbols:
+            if symbol not in self._feed_handles:
+                self._feed_handles[symbol] = self.exchange.add_tick_listener(callback, [symbol])
+        return True
+
+    def unsubscribe_live_feed(self, symbols: List[str]) -> bool:
+        for symbol in symbols:
+            handle = self._feed_handles.pop(symbol, None)
+            if handle:
+                self.exchange.remove_tick_listener(handle)
+        return True
@@ -0,0 +1,559 @@
+"""
+Simulated Broker Clients - Neo and Breeze SDK Stand-ins
+
+SimulatedNeoClient and SimulatedBreezeClient expose the subset of the
+neo_api_client.NeoAPI and breeze_connect.BreezeConnect methods the code base
+calls, with the same argument names and response shapes, backed by a
+SimulatedExchange. Code holding one of these clients cannot tell it apart
+from a live session, so order placement, batch execution, position sync and
+the monitors run unchanged with no network.
+
+Neo websocket traffic follows the HS websocket callbacks: order updates
+arrive on `on_message` as {'type': 'order_feed', 'data': <json>} after
+subscribe_to_orderfeed(), ticks as {'type': 'stock_feed', 'data': [...]}
+after subscribe().
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from django.utils import timezone
+
+from .exchange import (
+    MONTHS,
+    OrderRejected,
+    SimulatedExchange,
+    STATUS_CANCELLED,
+    STATUS_COMPLETE,
+    STATUS_REJECTED,
+    future_symbol,
+    upcoming_expiries,
+)
+
+logger = logging.getLogger(__name__)
+
+BREEZE_ORDER_STATUS = {
+    STATUS_COMPLETE: 'Executed',
+    STATUS_REJECTED: 'Rejected',
+    STATUS_CANCELLED: 'Cancelled',
+}
+
+
+def _neo_tick(quote: Dict) -> Dict:
+    """Quote as an HS websocket feed record (values as strings, like the feed)."""
+    tick = {
+        'tk': quote['token'],
+        'e': 'nse_fo' if quote['kind'] in ('CE', 'PE', 'FUT') else 'nse_cm',
+        'ts': quote['symbol'],
+        'ltp': f"{quote['ltp']:.2f}",
+        'bp': f"{quote['bid']:.2f}",
+        'sp': f"{quote['ask']:.2f}",
+        'op': f"{quote['open']:.2f}",
+        'h': f"{quote['high']:.2f}",
+        'lo': f"{quote['low']:.2f}",
+        'c': f"{quote['close']:.2f}",
+        'v': str(quote['volume']),
+        'oi': str(quote['oi']),
+        'ltt': timezone.localtime(quote['time']).strftime('%d/%m/%Y %H:%M:%S'),
+        'name': 'sf',
+    }
+    if quote['kind'] == 'INDEX':
+        tick['iv'] = tick['ltp']
+        tick['name'] = 'if'
+    return tick
+
+
+class SimulatedNeoClient:
+    """Stand-in for neo_api_client.NeoAPI backed by a SimulatedExchange."""
+
+    def __init__(self, exchange: SimulatedExchange):
+        self.exchange = exchange
+        self.on_message = None
+        self.on_error = None
+        self.on_open = None
+        self.on_close = None
+        self._feed_subscribed = False
+        self._tick_handles: Dict[tuple, int] = {}
+
+    # ========== Session ==========
+
+    def login(self, pan=None, password=None, mobilenumber=None, **kwargs):
+        return {'data': {'token': 'SIMULATED', 'sid': 'SIMULATED', 'rid': 'SIMULATED'}}
+
+    def session_2fa(self, OTP=None):
+        return {'data': {'token': 'SIMULATED', 'sid': 'SIMULATED', 'hsServerId': 'SIMULATED'}}
+
+    def logout(self):
+        self.un_subscribe_all()
+        return {'data': {'stat': 'Ok'}}
+
+    # ========== Orders ==========
+
+    def place_order(self, exchange_segment=None, product=None, price=None, order_type=None,
+                    quantity=None, validity=None, trading_symbol=None, transaction_type=None,
+                    amo=None, disclosed_quantity=None, market_protection=None, pf=None,
+                    trigger_price=None, tag=None, **kwargs):
+        try:
+            order = self.exchange.place_order(
+                trading_symbol, transaction_type, int(float(quantity or 0)),
+                order_type=order_type or 'MKT', price=float(price or 0), product=product or 'NRML', tag=tag,
+            )
+        except OrderRejected as e:
+            return {'stat': 'Not_Ok', 'stCode': e.code, 'errMsg': str(e)}
+        return {'stat': 'Ok', 'stCode': 200, 'nOrdNo': order['nOrdNo']}
+
+    def cancel_order(self, order_id, amo='NO', isVerify=False, **kwargs):
+        if self.exchange.cancel_order(order_id):
+            return {'stat': 'Ok', 'stCode': 200, 'result': order_id}
+        return {'stat': 'Not_Ok', 'stCode': '1005', 'errMsg': f"Order {order_id} is not open"}
+
+    def order_report(self):
+        return {'stat': 'Ok', 'stCode': 200, 'data': self.exchange.orders()}
+
+    def order_history(self, order_id=None):
+        order = self.exchange.order(order_id)
+        return {'data': {'stat': 'Ok', 'data': [order] if order else []}}
+
+    def trade_report(self, order_id=None):
+        orders = [order for order in self.exchange.orders() if order['fldQty']]
+        if order_id:
+            orders = [order for order in orders if order['nOrdNo'] == str(order_id)]
+        return {'stat': 'Ok', 'stCode': 200, 'data': orders}
+
+    # ========== Account ==========
+
+    def positions(self):
+        data = []
+        for position in self.exchange.positions():
+            instrument = self.exchange.instrument(position['symbol'])
+            data.append({
+                'trdSym': position['symbol'],
+                'sym': instrument.underlying,
+                'tok': instrument.token,
+                'exSeg': instrument.exchange_segment,
+                'prod': position['product'],
+                'type': instrument.kind,
+                'optTp': instrument.kind if instrument.is_option else '',
+                'stkPrc': '0.00',  # the live API leaves this at 0; LTP comes from quotes()
+                'expDt': instrument.expiry.strftime('%d %b, %Y') if instrument.expiry else '',
+                'lotSz': str(instrument.lot_size),
+                'flBuyQty': str(position['buy_qty']),
+                'flSellQty': str(position['sell_qty']),
+                'cfBuyQty': '0',
+                'cfSellQty': '0',
+                'buyAmt': f"{position['buy_amt']:.2f}",
+                'sellAmt': f"{position['sell_amt']:.2f}",
+                'cfBuyAmt': '0.00',
+                'cfSellAmt': '0.00',
+            })
+        return {'stat': 'Ok', 'stCode': 200, 'data': data}
+
+    def limits(self, segment='ALL', exchange='ALL', product='ALL'):
+        margin = self.exchange.margin()
+        return {
+            'stat': 'Ok',
+            'stCode': 200,
+            'Category': 'SIMULATED',
+            'Net': f"{margin['available']:.2f}",
+            'Collateral': f"{margin['available']:.2f}",
+            'CollateralValue': f"{margin['capital']:.2f}",
+            'MarginUsed': f"{margin['used']:.2f}",
+            'MarginWarningPrcntPrsnt': '0.00',
+            'BoardLotLimit': '5000',
+        }
+
+    # ========== Instruments & Quotes ==========
+
+    def search_scrip(self, exchange_segment='nse_fo', symbol='', expiry=None, option_type=None,
+                     strike_price=None, ignore_50multiple=None, **kwargs):
+        symbol = (symbol or '').upper()
+        exchange = self.exchange
+        if exchange_segment == 'nse_cm':
+            instruments = [exchange.instrument(symbol)]
+        elif option_type and strike_price:
+            expiries = upcoming_expiries(symbol, exchange.now().date())
+            if expiry:
+                # Neo matches on the month ('...NOV2025'); keep every listed expiry if none match
+                wanted = str(expiry).upper()[-7:]
+                expiries = [e for e in expiries if f"{MONTHS[e.month]}{e:%Y}" == wanted] or expiries
+            instruments = [exchange.option(symbol, e, float(strike_price), option_type) for e in expiries]
+        else:
+            futures = [
+                exchange.instrument(future_symbol(symbol, e))
+                for e in upcoming_expiries(symbol, exchange.now().date(), weeks=0)
+            ]
+            instruments = futures + [
+                instrument for instrument in exchange.instruments(symbol)
+                if instrument.is_option and instrument not in futures
+            ]
+
+        results = []
+        for instrument in instruments:
+            quote = exchange.quote(instrument.symbol)
+            results.append({
+                'pSymbol': instrument.token,
+                'pTrdSymbol': instrument.symbol,
+                'pSymbolName': instrument.underlying,
+                'pExchSeg': instrument.exchange_segment,
+                'pInstType': {'CE': 'OPTIDX', 'PE': 'OPTIDX', 'FUT': 'FUTIDX'}.get(instrument.kind, 'EQ'),
+                'pOptionType': instrument.kind if instrument.is_option else 'XX',
+                'dStrikePrice;': f"{(instrument.strike or 0) * 100:.0f}",
+                'pExpiryDate': instrument.expiry.strftime('%d%b%Y').upper() if instrument.expiry else '',
+                'lLotSize': instrument.lot_size,
+                'pScripBasePrice': f"{quote['ltp'] * 100:.0f}",
+            })
+        return results
+
+    def scrip_master(self, exchange_segment=None):
+        """CSV text of every instrument the exchange knows (the live API returns a URL)."""
+        lines = ['pSymbol,pTrdSymbol,pSymbolName,pExchSeg,pOptionType,dStrikePrice,lLotSize']
+        for instrument in self.exchange.instruments():
+            lines.append(
+                f"{instrument.token},{instrument.symbol},{instrument.underlying},{instrument.exchange_segment},"
+                f"{instrument.kind},{(instrument.strike or 0) * 100:.0f},{instrument.lot_size}"
+            )
+        return '\n'.join(lines)
+
+    def _resolve_tokens(self, instrument_tokens) -> List[str]:
+        symbols = []
+        for item in instrument_tokens or []:
+            token = item.get('instrument_token') if isinstance(item, dict) else item
+            instrument = self.exchange.by_token(token)
+            symbols.append(instrument.symbol if instrument else self.exchange.instrument(str(token)).symbol)
+        return symbols
+
+    def quotes(self, instrument_tokens=None, quote_type=None, isIndex=False, **kwargs):
+        data = []
+        for symbol in self._resolve_tokens(instrument_tokens):
+            quote = self.exchange.quote(symbol)
+            record = _neo_tick(quote)
+            record.update({
+                'exchange_token': quote['token'],
+                'display_symbol': quote['symbol'],
+                'last': record['ltp'],
+                'ohlc': {'open': record['op'], 'high': record['h'], 'low': record['lo'], 'close': record['c']},
+            })
+            data.append(record)
+        return {'data': data}
+
+    # ========== Websocket ==========
+
+    def subscribe_to_orderfeed(self):
+        if not self._feed_subscribed:
+            self.exchange.add_order_listener(self._deliver_order)
+            self._feed_subscribed = True
+        return None
+
+    def _deliver_order(self, order: Dict):
+        callback = self.on_message
+        if callback:
+            callback({'type': 'order_feed', 'data': json.dumps({'type': 'order', 'data': order})})
+
+    def subscribe(self, instrument_tokens, isIndex=False, isDepth=False):
+        symbols = self._resolve_tokens(instrument_tokens)
+        key = (tuple(sorted(symbols)), bool(isIndex), bool(isDepth))
+        if key not in self._tick_handles:
+            self._tick_handles[key] = self.exchange.add_tick_listener(self._deliver_ticks, symbols)
+        # The live socket sends a snapshot on subscribe
+        self._deliver_ticks([self.exchange.quote(symbol) for symbol in symbols])
+        return None
+
+    def un_subscribe(self, instrument_tokens, isIndex=False, isDepth=False):
+        symbols = self._resolve_tokens(instrument_tokens)
+        handle = self._tick_handles.pop((tuple(sorted(symbols)), bool(isIndex), bool(isDepth)), None)
+        if handle:
+            self.exchange.remove_tick_listener(handle)
+        return None
+
+    def un_subscribe_all(self):
+        for handle in self._tick_handles.values():
+            self.exchange.remove_tick_listener(handle)
+        self._tick_handles.clear()
+        if self._feed_subscribed:
+            self.exchange.remove_order_listener(self._deliver_order)
+            self._feed_subscribed = False
+
+    def _deliver_ticks(self, quotes: List[Dict]):
+        callback = self.on_message
+        if callback and quotes:
+            callback({'type': 'stock_feed', 'data': [_neo_tick(quote) for quote in quotes]})
+
+
+def _parse_breeze_expiry(value) -> Optional[date]:
+    """Breeze expiries come as '27-Nov-2025' or '2025-11-27T06:00:00.000Z'."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    for fmt in ('%d-%b-%Y', '%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(str(value)[:24] if 'T' in str(value) else str(value), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _breeze_ok(success):
+    return {'Success': success, 'Status': 200, 'Error': None}
+
+
+def _breeze_error(message, status=500):
+    return {'Success': None, 'Status': status, 'Error': message}
+
+
+class SimulatedBreezeClient:
+    """Stand-in for breeze_connect.BreezeConnect backed by a SimulatedExchange."""
+
+    def __init__(self, exchange: SimulatedExchange, api_key: str = 'SIMULATED'):
+        self.exchange = exchange
+        self.api_key = api_key
+        self.on_ticks = None
+        self._tick_handles: Dict[str, int] = {}
+
+    def generate_session(self, api_secret=None, session_token=None):
+        return None
+
+    def get_customer_details(self, api_session=None):
+        return _breeze_ok({'session_token': 'SIMULATED', 'idirect_userid': 'SIMULATED'})
+
+    # ========== Funds ==========
+
+    def get_funds(self):
+        margin = self.exchange.margin()
+        return _breeze_ok({
+            'bank_account': 'SIMULATED',
+            'total_bank_balance': margin['capital'],
+            'allocated_equity': 0.0,
+            'allocated_fno': margin['capital'],
+            'block_by_trade_fno': margin['used'],
+            'unallocated_balance': 0.0,
+        })
+
+    def get_margin(self, exchange_code='NFO'):
+        margin = self.exchange.margin()
+        return _breeze_ok({
+            'cash_limit': margin['available'],
+            'amount_allocated': margin['capital'],
+            'block_by_trade': margin['used'],
+            'limit_list': [],
+        })
+
+    # ========== Instruments ==========
+
+    def _instrument_symbol(self, stock_code, product_type, expiry_date=None, right=None, strike_price=None):
+        product = (product_type or 'cash').lower()
+        if product == 'cash':
+            return stock_code.upper()
+        expiry = _parse_breeze_expiry(expiry_date)
+        if expiry is None:
+            raise OrderRejected(f"expiry_date is required for {product}")
+        if product == 'futures':
+            return future_symbol(stock_code, expiry)
+        option_type = 'CE' if str(right).lower() in ('call', 'ce') else 'PE'
+        return self.exchange.option(stock_code, expiry, float(strike_price), option_type).symbol
+
+    def _breeze_quote(self, symbol: str, exchange_code: str, product_type: str) -> Dict:
+        quote = self.exchange.quote(symbol)
+        row = {
+            'exchange_code': exchange_code,
+            'product_type': product_type.title(),
+            'stock_code': quote['underlying'],
+            'expiry_date': quote['expiry'].strftime('%d-%b-%Y') if quote['expiry'] else None,
+            'right': {'CE': 'Call', 'PE': 'Put'}.get(quote['kind'], 'Others'),
+            'strike_price': quote['strike'] or 0,
+            'ltp': quote['ltp'],
+            'ltt': timezone.localtime(quote['time']).strftime('%d-%b-%Y %H:%M:%S'),
+            'best_bid_price': quote['bid'],
+            'best_bid_quantity': str(quote['lot_size'] * 10),
+            'best_offer_price': quote['ask'],
+            'best_offer_quantity': str(quote['lot_size'] * 10),
+            'open': quote['open'],
+            'high': quote['high'],
+            'low': quote['low'],
+            'previous_close': quote['close'],
+            'total_quantity_traded': quote['volume'],
+            'open_interest': quote['oi'],
+            'chnge_oi': 0,
+        }
+        if quote['kind'] in ('CE', 'PE', 'FUT'):
+            row['spot_price'] = self.exchange.spot(quote['underlying'])
+        return row
+
+    def get_quotes(self, stock_code=None, exchange_code='NSE', expiry_date='', product_type='cash',
+                   right='', strike_price='', **kwargs):
+        try:
+            symbol = self._instrument_symbol(stock_code, product_type, expiry_date, right, strike_price)
+            return _breeze_ok([self._breeze_quote(symbol, exchange_code, product_type or 'cash')])
+        except OrderRejected as e:
+            return _breeze_error(str(e))
+
+    def get_option_chain_quotes(self, stock_code=None, exchange_code='NFO', product_type='options',
+                                expiry_date='', right='', strike_price='', **kwargs):
+        product = (product_type or 'options').lower()
+        expiry = _parse_breeze_expiry(expiry_date)
+        today = self.exchange.now().date()
+
+        if product == 'futures':
+            expiries = [expiry] if expiry else upcoming_expiries(stock_code.upper(), today, weeks=0)
+            return _breeze_ok([
+                self._breeze_quote(future_symbol(stock_code, e), exchange_code, 'futures') for e in expiries
+            ])
+
+        if expiry is None:
+            return _breeze_error('Expiry date cannot be empty for options', status=500)
+        rows = [
+            self._breeze_quote(quote['symbol'], exchange_code, 'options')
+            for quote in self.exchange.option_chain(stock_code, expiry)
+        ]
+        if right:
+            wanted = 'Call' if str(right).lower() in ('call', 'ce') else 'Put'
+            rows = [row for row in rows if row['right'] == wanted]
+        if strike_price:
+            rows = [row for row in rows if float(row['strike_price']) == float(strike_price)]
+        return _breeze_ok(rows)
+
+    def get_names(self, exchange_code='NSE', stock_code=''):
+        instrument = self.exchange.instrument(stock_code)
+        return {'exchange_code': exchange_code, 'exchange_stock_code': stock_code,
+                'isec_stock_code': stock_code, 'isec_token': instrument.token}
+
+    # ========== Orders ==========
+
+    def place_order(self, stock_code=None, exchange_code='NFO', product='options', action='buy',
+                    order_type='market', stoploss='', quantity='0', price='', validity='day',
+                    validity_date='', disclosed_quantity='0', expiry_date='', right='', strike_price='',
+                    user_remark='', **kwargs):
+        try:
+            symbol = self._instrument_symbol(stock_code, product, expiry_date, right, strike_price)
+            order = self.exchange.place_order(
+                symbol, action, int(float(quantity or 0)),
+                order_type='L' if str(order_type).lower() == 'limit' else 'MKT',
+                price=float(price or 0), product=str(product).upper(), tag=user_remark or None,
+            )
+        except OrderRejected as e:
+            return _breeze_error(str(e), status=500)
+        return _breeze_ok({'order_id': order['nOrdNo'], 'message': 'Successfully Placed the order',
+                           'user_remark': user_remark})
+
+    def _breeze_order(self, order: Dict) -> Dict:
+        instrument = self.exchange.instrument(order['trdSym'])
+        return {
+            'order_id': order['nOrdNo'],
+            'exchange_code': 'NFO' if instrument.is_derivative else 'NSE',
+            'stock_code': instrument.underlying,
+            'product_type': {'CE': 'Options', 'PE': 'Options', 'FUT': 'Futures'}.get(instrument.kind, 'Cash'),
+            'action': 'Buy' if order['trnsTp'] == 'B' else 'Sell',
+            'order_type': 'Limit' if order['prcTp'] == 'L' else 'Market',
+            'quantity': str(order['qty']),
+            'pending_quantity': str(order['unFldSz']),
+            'price': order['prc'],
+            'average_price': order['avgPrc'],
+            'status': BREEZE_ORDER_STATUS.get(order['ordSt'], 'Ordered'),
+            'expiry_date': instrument.expiry.strftime('%d-%b-%Y') if instrument.expiry else None,
+            'right': {'CE': 'Call', 'PE': 'Put'}.get(instrument.kind),
+            'strike_price': instrument.strike,
+            'order_datetime': order['ordDtTm'],
+            'user_remark': order.get('tag') or '',
+            'rejection_reason': order['rejRsn'],
+        }
+
+    def get_order_detail(self, exchange_code=None, order_id=None):
+        order = self.exchange.order(order_id)
+        if not order:
+            return _breeze_error(f"Order {order_id} not found", status=404)
+        return _breeze_ok([self._breeze_order(order)])
+
+    def get_order_list(self, exchange_code=None, from_date=None, to_date=None):
+        return _breeze_ok([self._breeze_order(order) for order in self.exchange.orders()])
+
+    def cancel_order(self, exchange_code=None, order_id=None):
+        if self.exchange.cancel_order(order_id):
+            return _breeze_ok({'order_id': order_id, 'message': 'Your Order Canceled Successfully'})
+        return _breeze_error(f"Order {order_id} is not open", status=500)
+
+    # ========== Portfolio ==========
+
+    def get_portfolio_positions(self):
+        rows = []
+        for position in self.exchange.positions():
+            if not position['net_quantity']:
+                continue
+            instrument = self.exchange.instrument(position['symbol'])
+            rows.append({
+                'segment': 'fno' if instrument.is_derivative else 'equity',
+                'product_type': {'CE': 'Options', 'PE': 'Options', 'FUT': 'Futures'}.get(instrument.kind, 'Cash'),
+                'exchange_code': 'NFO' if instrument.is_derivative else 'NSE',
+                'stock_code': instrument.underlying,
+                'expiry_date': instrument.expiry.strftime('%d-%b-%Y') if instrument.expiry else None,
+                'strike_price': instrument.strike,
+                'right': {'CE': 'Call', 'PE': 'Put'}.get(instrument.kind, 'Others'),
+                'action': 'Buy' if position['net_quantity'] > 0 else 'Sell',
+                'quantity': position['net_quantity'],
+                'average_price': position['average_price'],
+                'ltp': position['ltp'],
+                'price': position['ltp'],
+            })
+        return _breeze_ok(rows)
+
+    def get_portfolio_holdings(self, exchange_code='NSE', **kwargs):
+        return _breeze_ok([])
+
+    def get_historical_data(self, **kwargs):
+        return _breeze_ok([])
+
+    get_historical_data_v2 = get_historical_data
+
+    # ========== Streaming ==========
+
+    def ws_connect(self):
+        return None
+
+    def ws_disconnect(self):
+        for handle in self._tick_handles.values():
+            self.exchange.remove_tick_listener(handle)
+        self._tick_handles.clear()
+
+    def subscribe_feeds(self, stock_token='', exchange_code='NSE', stock_code='', product_type='cash',
+                        expiry_date='', strike_price='', right='', get_exchange_quotes=True,
+                        get_market_depth=False, **kwargs):
+        instrument = self.exchange.by_token(stock_token) if stock_token else None
+        symbol = instrument.symbol if instrument else self._instrument_symbol(
+            stock_code, product_type, expiry_date, right, strike_price
+        )
+        if symbol not in self._tick_handles:
+            self._tick_handles[symbol] = self.exchange.add_tick_listener(self._deliver_ticks, [symbol])
+        return {'message': f"Stock {symbol} subscribed successfully"}
+
+    def unsubscribe_feeds(self, stock_token='', stock_code='', product_type='cash', expiry_date='',
+                          strike_price='', right='', **kwargs):
+        instrument = self.exchange.by_token(stock_token) if stock_token else None
+        symbol = instrument.symbol if instrument else self._instrument_symbol(
+            stock_code, product_type, expiry_date, right, strike_price
+        )
+        handle = self._tick_handles.pop(symbol, None)
+        if handle:
+            self.exchange.remove_tick_listener(handle)
+        return {'message': f"Stock {symbol} unsubscribed successfully"}
+
+    def _deliver_ticks(self, quotes: List[Dict]):
+        callback = self.on_ticks
+        if not callback:
+            return
+        for quote in quotes:
+            callback({
+                'symbol': quote['token'],
+                'stock_name': quote['symbol'],
+                'exchange': 'NSE Futures & Options' if quote['kind'] in ('CE', 'PE', 'FUT') else 'NSE Equity',
+                'last': quote['ltp'],
+                'open': quote['open'],
+                'high': quote['high'],
+                'low': quote['low'],
+                'close': quote['close'],
+                'bPrice': quote['bid'],
+                'sPrice': quote['ask'],
+                'ttq': quote['volume'],
+                'OI': quote['oi'],
+                'ltt': timezone.localtime(quote['time']).strftime('%a %b %d %H:%M:%S %Y'),
+            })
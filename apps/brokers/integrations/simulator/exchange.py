@@ -0,0 +1,852 @@
+"""
+Simulated Exchange - In-Process Market, Order Matching and Accounts
+
+One SimulatedExchange holds everything the simulated broker clients serve:
+
+- Prices: underlying spots (random walk or replayed), option marks from
+  Black-Scholes with India VIX as IV, futures at cost of carry. Quotes set
+  explicitly (e.g. from a recorded session) override the model.
+- Orders: validated like the broker front end (lot multiples, freeze limits),
+  then filled, partially filled or rejected after a sampled latency by a
+  single dispatcher thread. Market orders fill at the touch plus slippage,
+  limit orders rest until marketable.
+- Accounts: net positions, realized/unrealized P&L and a SPAN-like margin
+  estimate; orders that would exceed available margin are RMS-rejected.
+- Listeners: order updates and ticks are pushed to registered callbacks,
+  which the clients translate into the Neo order feed / HS websocket format.
+"""
+
+import calendar
+import heapq
+import itertools
+import logging
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.utils import timezone
+
+from apps.core.constants import (
+    BACKTEST_RISK_FREE_RATE,
+    DEFAULT_EXPIRY_SCHEDULE,
+    EXCHANGE_FREEZE_QUANTITY,
+    EXPIRY_SCHEDULES,
+    SIMULATOR_CAPITAL,
+    SIMULATOR_CHAIN_STRIKES,
+    SIMULATOR_DEFAULT_LOT_SIZE,
+    SIMULATOR_FUTURES_MARGIN_PCT,
+    SIMULATOR_INITIAL_PRICES,
+    SIMULATOR_LATENCY_JITTER_MS,
+    SIMULATOR_LOT_SIZES,
+    SIMULATOR_ORDER_LATENCY_MS,
+    SIMULATOR_PARTIAL_FILL_RATE,
+    SIMULATOR_REJECT_RATE,
+    SIMULATOR_SHORT_OPTION_MARGIN_PCT,
+    SIMULATOR_SLIPPAGE_BPS,
+    SIMULATOR_SPREAD_BPS,
+)
+
+logger = logging.getLogger(__name__)
+
+VIX_SYMBOL = 'INDVIX'
+INDEX_UNDERLYINGS = {'NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY', 'SENSEX', VIX_SYMBOL}
+STRIKE_INTERVALS = {'NIFTY': 50, 'BANKNIFTY': 100, 'FINNIFTY': 50, 'MIDCPNIFTY': 25, 'SENSEX': 100}
+TICK_SIZE = 0.05
+MONTHS = [m.upper() for m in calendar.month_abbr]  # ['', 'JAN', ...]
+
+OPTION_SYMBOL_RE = re.compile(r'^([A-Z&-]+?)(\d{2})([A-Z]{3})(\d+(?:\.\d+)?)(CE|PE)$')
+WEEKLY_OPTION_SYMBOL_RE = re.compile(r'^([A-Z&-]+?)(\d{2})([1-9OND])(\d{2})(\d+(?:\.\d+)?)(CE|PE)$')
+FUTURE_SYMBOL_RE = re.compile(r'^([A-Z&-]+?)(\d{2})([A-Z]{3})FUT$')
+WEEKLY_MONTH_CODES = '123456789OND'
+
+# Neo 'ordSt' values used for simulated orders
+STATUS_OPEN = 'open'
+STATUS_COMPLETE = 'complete'
+STATUS_REJECTED = 'rejected'
+STATUS_CANCELLED = 'cancelled'
+
+
+class OrderRejected(Exception):
+    """Raised when an order fails pre-trade validation (never reaches the book)."""
+
+    def __init__(self, message: str, code: str = '400'):
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass
+class ExecutionModel:
+    """
+    Latency, reject and fill behaviour of simulated orders.
+
+    Attributes:
+        latency_ms: Mean order-to-fill latency
+        jitter_ms: Std deviation of the latency (normal, floored at 0)
+        reject_rate: Fraction of orders rejected at random
+        partial_fill_rate: Fraction of fills delivered in two parts
+        slippage_bps: Market order slippage beyond the touch
+        seed: Random seed for reproducible runs
+    """
+    latency_ms: float = SIMULATOR_ORDER_LATENCY_MS
+    jitter_ms: float = SIMULATOR_LATENCY_JITTER_MS
+    reject_rate: float = SIMULATOR_REJECT_RATE
+    partial_fill_rate: float = SIMULATOR_PARTIAL_FILL_RATE
+    slippage_bps: float = SIMULATOR_SLIPPAGE_BPS
+    seed: Optional[int] = None
+    rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+
+    def latency(self) -> float:
+        """Sampled latency in seconds."""
+        if self.jitter_ms <= 0:
+            return max(self.latency_ms, 0.0) / 1000
+        return max(self.rng.gauss(self.latency_ms, self.jitter_ms), 0.0) / 1000
+
+    def rejects(self) -> bool:
+        return self.reject_rate > 0 and self.rng.random() < self.reject_rate
+
+    def splits_fill(self) -> bool:
+        return self.partial_fill_rate > 0 and self.rng.random() < self.partial_fill_rate
+
+
+@dataclass
+class Instrument:
+    """A tradable or quotable symbol known to the exchange."""
+    symbol: str
+    underlying: str
+    kind: str  # 'INDEX', 'EQ', 'FUT', 'CE' or 'PE'
+    token: str
+    lot_size: int
+    expiry: Optional[date] = None
+    strike: Optional[float] = None
+
+    @property
+    def is_option(self) -> bool:
+        return self.kind in ('CE', 'PE')
+
+    @property
+    def is_derivative(self) -> bool:
+        return self.kind in ('CE', 'PE', 'FUT')
+
+    @property
+    def exchange_segment(self) -> str:
+        return 'nse_fo' if self.is_derivative else 'nse_cm'
+
+
+def round_tick(price: float) -> float:
+    """Round to the exchange tick (floored at one tick)."""
+    return max(round(round(price / TICK_SIZE) * TICK_SIZE, 2), TICK_SIZE)
+
+
+def last_weekday_of_month(year: int, month: int, weekday: int) -> date:
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def monthly_expiry(underlying: str, year: int, month: int) -> date:
+    schedule = EXPIRY_SCHEDULES.get(underlying, DEFAULT_EXPIRY_SCHEDULE)
+    return last_weekday_of_month(year, month, schedule['monthly'])
+
+
+def upcoming_expiries(underlying: str, from_date: date, weeks: int = 4, months: int = 3) -> List[date]:
+    """Weekly (where listed) and monthly expiries on or after from_date (no holiday shifts)."""
+    schedule = EXPIRY_SCHEDULES.get(underlying, DEFAULT_EXPIRY_SCHEDULE)
+    expiries = set()
+    if schedule.get('weekly') is not None:
+        first = from_date + timedelta(days=(schedule['weekly'] - from_date.weekday()) % 7)
+        expiries.update(first + timedelta(weeks=week) for week in range(weeks))
+    year, month = from_date.year, from_date.month
+    while len([e for e in expiries if e == monthly_expiry(underlying, e.year, e.month)]) < months:
+        expiry = monthly_expiry(underlying, year, month)
+        if expiry >= from_date:
+            expiries.add(expiry)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return sorted(expiries)
+
+
+def option_symbol(underlying: str, expiry: date, strike, option_type: str) -> str:
+    """
+    NSE-style trading symbol: NIFTY25NOV24500CE for a monthly expiry,
+    NIFTY25N1124500CE (year, month code, day) for any other expiry.
+    """
+    underlying = underlying.upper()
+    strike = float(strike)
+    strike_text = str(int(strike)) if strike.is_integer() else f"{strike:g}"
+    if expiry == monthly_expiry(underlying, expiry.year, expiry.month):
+        expiry_text = f"{expiry:%y}{MONTHS[expiry.month]}"
+    else:
+        expiry_text = f"{expiry:%y}{WEEKLY_MONTH_CODES[expiry.month - 1]}{expiry.day:02d}"
+    return f"{underlying}{expiry_text}{strike_text}{option_type.upper()}"
+
+
+def future_symbol(underlying: str, expiry: date) -> str:
+    """Neo-style futures symbol, e.g. NIFTY25NOVFUT."""
+    return f"{underlying.upper()}{expiry:%y}{MONTHS[expiry.month]}FUT"
+
+
+class _Dispatcher:
+    """Single thread running scheduled callbacks in due-time order."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = 0
+        self._closed = False
+
+    def call_later(self, delay: float, callback: Callable, *args):
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), callback, args))
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+                _, _, callback, args = heapq.heappop(self._heap)
+                self._running += 1
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.exception(f"Simulated exchange callback failed: {e}")
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    self._condition.notify_all()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap) + self._running
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until every scheduled callback has run."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._heap or self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(min(remaining, 0.05))
+        return True
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._heap.clear()
+            self._condition.notify_all()
+
+
+class SimulatedExchange:
+    """
+    In-process exchange and broker account shared by the simulated clients.
+
+    Thread-safe: orders may be placed from any number of threads; fills are
+    delivered from the dispatcher thread, like a broker websocket.
+    """
+
+    def __init__(self, model: Optional[ExecutionModel] = None, capital=SIMULATOR_CAPITAL,
+                 prices: Optional[Dict[str, float]] = None, start_time: Optional[datetime] = None):
+        self.model = model or ExecutionModel()
+        self.capital = float(capital)
+        self._lock = threading.RLock()
+        self._dispatcher = _Dispatcher('simulated-exchange')
+        self._time = start_time
+        self._spots: Dict[str, float] = {**SIMULATOR_INITIAL_PRICES, **(prices or {})}
+        self._quotes: Dict[str, Dict] = {}
+        self._sessions: Dict[str, Dict] = {}
+        self._instruments: Dict[str, Instrument] = {}
+        self._tokens: Dict[str, Instrument] = {}
+        self._token_sequence = itertools.count(40001)
+        self._orders: Dict[str, Dict] = {}
+        self._order_sequence = itertools.count(1)
+        self._resting: List[str] = []
+        self._positions: Dict[str, Dict] = {}
+        self._volume: Dict[str, int] = {}
+        self._order_listeners: List[Callable] = []
+        self._tick_listeners: Dict[int, tuple] = {}
+        self._listener_sequence = itertools.count(1)
+        self._recording: Optional[List[Dict]] = None
+        self._recording_started = 0.0
+
+    # ========== Clock ==========
+
+    def now(self) -> datetime:
+        """Exchange time: the replayed/simulated time if set, else wall clock."""
+        return self._time or timezone.now()
+
+    def set_time(self, moment: datetime):
+        with self._lock:
+            self._time = moment
+
+    # ========== Instruments ==========
+
+    def instrument(self, symbol: str) -> Instrument:
+        """
+        Look up (or create from the symbol format) an instrument.
+
+        Raises:
+            OrderRejected: If the symbol is not a known format
+        """
+        symbol = symbol.upper().strip()
+        with self._lock:
+            instrument = self._instruments.get(symbol)
+            if instrument:
+                return instrument
+
+            match = OPTION_SYMBOL_RE.match(symbol)
+            if match:
+                underlying, year, month, strike, option_type = match.groups()
+                if month not in MONTHS:
+                    raise OrderRejected(f"Invalid trading symbol: {symbol}", code='1006')
+                expiry = monthly_expiry(underlying, 2000 + int(year), MONTHS.index(month))
+                return self._register(symbol, underlying, option_type, expiry, float(strike))
+
+            match = WEEKLY_OPTION_SYMBOL_RE.match(symbol)
+            if match:
+                underlying, year, month_code, day, strike, option_type = match.groups()
+                try:
+                    expiry = date(2000 + int(year), WEEKLY_MONTH_CODES.index(month_code) + 1, int(day))
+                except ValueError:
+                    raise OrderRejected(f"Invalid trading symbol: {symbol}", code='1006')
+                return self._register(symbol, underlying, option_type, expiry, float(strike))
+
+            match = FUTURE_SYMBOL_RE.match(symbol)
+            if match:
+                underlying, year, month = match.groups()
+                if month not in MONTHS:
+                    raise OrderRejected(f"Invalid trading symbol: {symbol}", code='1006')
+                expiry = monthly_expiry(underlying, 2000 + int(year), MONTHS.index(month))
+                return self._register(symbol, underlying, 'FUT', expiry)
+
+            if re.match(r'^[A-Z&-]+$', symbol):
+                kind = 'INDEX' if symbol in INDEX_UNDERLYINGS else 'EQ'
+                return self._register(symbol, symbol, kind)
+
+        raise OrderRejected(f"Invalid trading symbol: {symbol}", code='1006')
+
+    def option(self, underlying: str, expiry: date, strike, option_type: str) -> Instrument:
+        return self.instrument(option_symbol(underlying, expiry, strike, option_type))
+
+    def by_token(self, token) -> Optional[Instrument]:
+        with self._lock:
+            return self._tokens.get(str(token))
+
+    def _register(self, symbol, underlying, kind, expiry=None, strike=None) -> Instrument:
+        instrument = Instrument(
+            symbol=symbol,
+            underlying=underlying,
+            kind=kind,
+            token=str(next(self._token_sequence)),
+            lot_size=SIMULATOR_LOT_SIZES.get(underlying, 1 if kind in ('INDEX', 'EQ') else SIMULATOR_DEFAULT_LOT_SIZE),
+            expiry=expiry,
+            strike=strike,
+        )
+        self._instruments[symbol] = instrument
+        self._tokens[instrument.token] = instrument
+        return instrument
+
+    def instruments(self, underlying: Optional[str] = None, expiry: Optional[date] = None) -> List[Instrument]:
+        with self._lock:
+            return [
+                instrument for instrument in self._instruments.values()
+                if (underlying is None or instrument.underlying == underlying.upper())
+                and (expiry is None or instrument.expiry == expiry)
+            ]
+
+    # ========== Prices ==========
+
+    def spot(self, underlying: str) -> float:
+        underlying = underlying.upper()
+        with self._lock:
+            if underlying not in self._spots:
+                self._spots[underlying] = 1000.0
+            return self._spots[underlying]
+
+    def set_spot(self, underlying: str, price: float, publish: bool = True):
+        """Move an underlying; option and futures marks follow."""
+        underlying = underlying.upper()
+        with self._lock:
+            self._spots[underlying] = float(price)
+            self._record('spot', underlying=underlying, price=float(price))
+        if publish:
+            self.publish_prices()
+
+    def set_quote(self, symbol: str, ltp: float, bid: Optional[float] = None, ask: Optional[float] = None,
+                  volume: Optional[int] = None, oi: Optional[int] = None, publish: bool = True):
+        """Pin a symbol's quote (overrides the model until clear_quote)."""
+        instrument = self.instrument(symbol)
+        with self._lock:
+            self._quotes[instrument.symbol] = {
+                'ltp': float(ltp),
+                'bid': float(bid) if bid else None,
+                'ask': float(ask) if ask else None,
+                'volume': volume,
+                'oi': oi,
+            }
+            if instrument.kind in ('INDEX', 'EQ'):
+                self._spots[instrument.underlying] = float(ltp)
+            self._record('quote', symbol=instrument.symbol, ltp=float(ltp), bid=bid, ask=ask, volume=volume, oi=oi)
+        if publish:
+            self.publish_prices()
+
+    def clear_quote(self, symbol: str):
+        with self._lock:
+            self._quotes.pop(symbol.upper(), None)
+
+    def _years_to_expiry(self, expiry: date) -> float:
+        now = timezone.localtime(self.now()) if timezone.is_aware(self.now()) else self.now()
+        close = datetime.combine(expiry, datetime.min.time()) + timedelta(hours=15, minutes=30)
+        seconds = (close - now.replace(tzinfo=None)).total_seconds()
+        return max(seconds, 0.0) / (365 * 24 * 60 * 60)
+
+    def _model_price(self, instrument: Instrument) -> float:
+        spot = self.spot(instrument.underlying)
+        if instrument.kind in ('INDEX', 'EQ'):
+            return spot
+        years = self._years_to_expiry(instrument.expiry)
+        if instrument.kind == 'FUT':
+            return spot * math.exp(BACKTEST_RISK_FREE_RATE * years)
+
+        from apps.analytics.services.backtest import black_scholes_prices
+
+        volatility = self.spot(VIX_SYMBOL) / 100
+        call, put = black_scholes_prices(spot, instrument.strike, years, volatility)
+        return float(call if instrument.kind == 'CE' else put)
+
+    def quote(self, symbol: str) -> Dict:
+        """
+        Current quote of a symbol.
+
+        Returns:
+            dict: symbol, token, ltp, bid, ask, open, high, low, close (previous),
+                volume, oi, time
+        """
+        instrument = self.instrument(symbol)
+        with self._lock:
+            pinned = self._quotes.get(instrument.symbol)
+            ltp = pinned['ltp'] if pinned else self._model_price(instrument)
+            ltp = round(ltp, 2) if instrument.kind in ('INDEX', 'EQ') else round_tick(ltp)
+            half_spread = ltp * SIMULATOR_SPREAD_BPS / 20000
+            bid = (pinned or {}).get('bid') or (round_tick(ltp - half_spread) if instrument.is_derivative else ltp)
+            ask = (pinned or {}).get('ask') or (round_tick(ltp + half_spread) if instrument.is_derivative else ltp)
+
+            session = self._sessions.setdefault(instrument.symbol, {'open': ltp, 'high': ltp, 'low': ltp, 'close': ltp})
+            session['high'] = max(session['high'], ltp)
+            session['low'] = min(session['low'], ltp)
+
+            volume = (pinned or {}).get('volume')
+            oi = (pinned or {}).get('oi')
+            return {
+                'symbol': instrument.symbol,
+                'token': instrument.token,
+                'underlying': instrument.underlying,
+                'kind': instrument.kind,
+                'expiry': instrument.expiry,
+                'strike': instrument.strike,
+                'lot_size': instrument.lot_size,
+                'ltp': ltp,
+                'bid': bid,
+                'ask': ask,
+                'open': session['open'],
+                'high': session['high'],
+                'low': session['low'],
+                'close': session['close'],
+                'volume': volume if volume is not None else self._volume.get(instrument.symbol, 0),
+                'oi': oi if oi is not None else abs(self._net_quantity(instrument.symbol)),
+                'time': self.now(),
+            }
+
+    def option_chain(self, underlying: str, expiry: date, strikes: int = SIMULATOR_CHAIN_STRIKES) -> List[Dict]:
+        """
+        Quotes of CE and PE options around ATM for one expiry.
+
+        Includes every other strike of that expiry the exchange already knows
+        (e.g. from a replayed session).
+        """
+        underlying = underlying.upper()
+        spot = self.spot(underlying)
+        interval = STRIKE_INTERVALS.get(underlying) or max(round(spot * 0.01 / 5) * 5, 1)
+        atm = round(spot / interval) * interval
+        chain_strikes = {atm + step * interval for step in range(-strikes, strikes + 1)}
+        chain_strikes.update(
+            instrument.strike for instrument in self.instruments(underlying, expiry) if instrument.is_option
+        )
+        rows = []
+        for strike in sorted(chain_strikes):
+            for option_type in ('CE', 'PE'):
+                rows.append(self.quote(self.option(underlying, expiry, strike, option_type).symbol))
+        return rows
+
+    def advance(self, seconds: float = 1.0, steps: int = 1, volatility: Optional[float] = None):
+        """
+        Random-walk every underlying (geometric Brownian motion, VIX as volatility)
+        and publish ticks. Simulated time moves forward when it is set.
+        """
+        rng = self.model.rng
+        for _ in range(max(steps, 1)):
+            with self._lock:
+                sigma = volatility if volatility is not None else self._spots.get(VIX_SYMBOL, 15.0) / 100
+                dt = seconds / (252 * 6.25 * 60 * 60)  # fraction of a trading year
+                for underlying, price in list(self._spots.items()):
+                    if underlying == VIX_SYMBOL:
+                        continue
+                    shock = rng.gauss(0, 1) * sigma * math.sqrt(dt)
+                    self._spots[underlying] = price * math.exp(shock - 0.5 * sigma * sigma * dt)
+                    self._record('spot', underlying=underlying, price=self._spots[underlying])
+                if self._time:
+                    self._time += timedelta(seconds=seconds)
+            self.publish_prices()
+
+    def publish_prices(self):
+        """Match resting limit orders and push ticks after price changes."""
+        self._match_resting()
+        self._publish_ticks()
+
+    # ========== Orders ==========
+
+    def place_order(self, symbol: str, side: str, quantity: int, order_type: str = 'MKT',
+                    price: float = 0.0, product: str = 'NRML', tag: Optional[str] = None) -> Dict:
+        """
+        Accept an order; the fill (or RMS reject) follows asynchronously.
+
+        Args:
+            symbol: Trading symbol
+            side: 'B' or 'S'
+            quantity: Units (multiple of the lot size)
+            order_type: 'MKT' or 'L'
+            price: Limit price
+            product: 'NRML', 'MIS', ...
+
+        Returns:
+            dict: Order record (Neo order report fields)
+
+        Raises:
+            OrderRejected: On pre-trade validation failure
+        """
+        side = 'B' if str(side).upper() in ('B', 'BUY') else 'S'
+        order_type = 'L' if str(order_type).upper() in ('L', 'LIMIT') else 'MKT'
+        quantity = int(quantity)
+        instrument = self.instrument(symbol)
+
+        if quantity <= 0:
+            raise OrderRejected("Quantity must be positive", code='1007')
+        if instrument.is_derivative and quantity % instrument.lot_size:
+            raise OrderRejected(
+                f"Quantity {quantity} is not a multiple of lot size {instrument.lot_size}", code='1008'
+            )
+        freeze = EXCHANGE_FREEZE_QUANTITY.get(instrument.underlying)
+        if instrument.is_derivative and freeze and quantity > freeze:
+            raise OrderRejected(f"Quantity {quantity} exceeds freeze limit {freeze}", code='1009')
+        if order_type == 'L' and float(price) <= 0:
+            raise OrderRejected("Limit price is required for limit orders", code='1010')
+
+        with self._lock:
+            order_id = f"SIM{self.now():%y%m%d}{next(self._order_sequence):06d}"
+            order = {
+                'nOrdNo': order_id,
+                'trdSym': instrument.symbol,
+                'sym': instrument.underlying,
+                'tok': instrument.token,
+                'exSeg': instrument.exchange_segment,
+                'trnsTp': side,
+                'prcTp': order_type,
+                'prod': product,
+                'qty': quantity,
+                'fldQty': 0,
+                'unFldSz': quantity,
+                'prc': f"{float(price):.2f}",
+                'avgPrc': '0.00',
+                'ordSt': STATUS_OPEN,
+                'rejRsn': '',
+                'tag': tag,
+                'ordDtTm': self.now().strftime('%d-%b-%Y %H:%M:%S'),
+            }
+            self._orders[order_id] = order
+            self._record('order', symbol=instrument.symbol, side=side, quantity=quantity,
+                         order_type=order_type, price=float(price), product=product)
+
+        self._notify_order(order)
+        self._dispatcher.call_later(self.model.latency(), self._execute, order_id)
+        return dict(order)
+
+    def cancel_order(self, order_id: str) -> bool:
+        with self._lock:
+            order = self._orders.get(str(order_id))
+            if not order or order['ordSt'] != STATUS_OPEN:
+                return False
+            order['ordSt'] = STATUS_CANCELLED
+            if order_id in self._resting:
+                self._resting.remove(order_id)
+        self._notify_order(order)
+        return True
+
+    def order(self, order_id: str) -> Optional[Dict]:
+        with self._lock:
+            order = self._orders.get(str(order_id))
+            return dict(order) if order else None
+
+    def orders(self) -> List[Dict]:
+        with self._lock:
+            return [dict(order) for order in self._orders.values()]
+
+    def _execute(self, order_id: str):
+        with self._lock:
+            order = self._orders.get(order_id)
+            if not order or order['ordSt'] != STATUS_OPEN:
+                return
+
+            reason = None
+            if self.model.rejects():
+                reason = 'RMS:Rule: Simulated broker reject'
+            elif order['fldQty'] == 0:
+                required = self._incremental_margin(order['trdSym'], order['trnsTp'], order['unFldSz'])
+                available = self.margin()['available']
+                if required > available:
+                    reason = f"RMS:Margin Exceeds, Required:{required:.2f}, Available:{available:.2f}"
+
+            if reason:
+                order['ordSt'] = STATUS_REJECTED
+                order['rejRsn'] = reason
+            else:
+                self._try_fill(order)
+                if order['ordSt'] == STATUS_OPEN and order['prcTp'] == 'L' and order_id not in self._resting:
+                    self._resting.append(order_id)
+            snapshot = dict(order)
+
+        self._notify_order(snapshot)
+
+    def _try_fill(self, order: Dict) -> bool:
+        """Fill an open order if marketable. Caller holds the lock."""
+        quote = self.quote(order['trdSym'])
+        buy = order['trnsTp'] == 'B'
+        touch = quote['ask'] if buy else quote['bid']
+        if order['prcTp'] == 'L':
+            limit = float(order['prc'])
+            if (buy and touch > limit) or (not buy and touch < limit):
+                return False
+            fill_price = touch
+        else:
+            slip = touch * self.model.slippage_bps / 10000
+            fill_price = round_tick(touch + slip if buy else touch - slip)
+
+        remaining = order['unFldSz']
+        instrument = self.instrument(order['trdSym'])
+        fill_quantity = remaining
+        lots = remaining // instrument.lot_size if instrument.is_derivative else remaining
+        if lots > 1 and self.model.splits_fill():
+            fill_quantity = (lots // 2) * (instrument.lot_size if instrument.is_derivative else 1)
+
+        filled_before = order['fldQty']
+        average = float(order['avgPrc'])
+        order['fldQty'] = filled_before + fill_quantity
+        order['unFldSz'] = remaining - fill_quantity
+        order['avgPrc'] = f"{(average * filled_before + fill_price * fill_quantity) / order['fldQty']:.2f}"
+        self._apply_fill(instrument, order['trnsTp'], fill_quantity, fill_price, order['prod'])
+
+        if order['unFldSz'] == 0:
+            order['ordSt'] = STATUS_COMPLETE
+            if order['nOrdNo'] in self._resting:
+                self._resting.remove(order['nOrdNo'])
+        else:
+            self._dispatcher.call_later(self.model.latency(), self._execute, order['nOrdNo'])
+        return True
+
+    def _match_resting(self):
+        updates = []
+        with self._lock:
+            for order_id in list(self._resting):
+                order = self._orders[order_id]
+                if order['ordSt'] == STATUS_OPEN and self._try_fill(order):
+                    updates.append(dict(order))
+        for update in updates:
+            self._notify_order(update)
+
+    # ========== Positions & Margin ==========
+
+    def _apply_fill(self, instrument: Instrument, side: str, quantity: int, price: float, product: str):
+        position = self._positions.setdefault(instrument.symbol, {
+            'symbol': instrument.symbol, 'token': instrument.token, 'product': product,
+            'buy_qty': 0, 'sell_qty': 0, 'buy_amt': 0.0, 'sell_amt': 0.0,
+        })
+        if side == 'B':
+            position['buy_qty'] += quantity
+            position['buy_amt'] += quantity * price
+        else:
+            position['sell_qty'] += quantity
+            position['sell_amt'] += quantity * price
+        self._volume[instrument.symbol] = self._volume.get(instrument.symbol, 0) + quantity
+
+    def _net_quantity(self, symbol: str) -> int:
+        position = self._positions.get(symbol)
+        return position['buy_qty'] - position['sell_qty'] if position else 0
+
+    def positions(self) -> List[Dict]:
+        """
+        Positions with marks and P&L.
+
+        Returns:
+            list: dicts with symbol, token, product, buy/sell qty and amounts,
+                net_quantity, average_price, ltp, realized_pnl, unrealized_pnl, pnl
+        """
+        with self._lock:
+            rows = []
+            for symbol, position in self._positions.items():
+                net = position['buy_qty'] - position['sell_qty']
+                ltp = self.quote(symbol)['ltp']
+                if net > 0:
+                    average = position['buy_amt'] / position['buy_qty']
+                elif net < 0:
+                    average = position['sell_amt'] / position['sell_qty']
+                else:
+                    average = 0.0
+                pnl = position['sell_amt'] - position['buy_amt'] + net * ltp
+                unrealized = net * (ltp - average)
+                rows.append({
+                    **position,
+                    'net_quantity': net,
+                    'average_price': round(average, 2),
+                    'ltp': ltp,
+                    'unrealized_pnl': round(unrealized, 2),
+                    'realized_pnl': round(pnl - unrealized, 2),
+                    'pnl': round(pnl, 2),
+                })
+            return rows
+
+    def _position_margin(self, symbol: str, net: int) -> float:
+        if net == 0:
+            return 0.0
+        instrument = self.instrument(symbol)
+        if instrument.is_option:
+            return abs(net) * self.spot(instrument.underlying) * SIMULATOR_SHORT_OPTION_MARGIN_PCT if net < 0 else 0.0
+        if instrument.kind == 'FUT':
+            return abs(net) * self._model_price(instrument) * SIMULATOR_FUTURES_MARGIN_PCT
+        return abs(net) * self.spot(instrument.underlying) if net > 0 else 0.0
+
+    def _incremental_margin(self, symbol: str, side: str, quantity: int) -> float:
+        net = self._net_quantity(symbol)
+        after = net + quantity if side == 'B' else net - quantity
+        increase = self._position_margin(symbol, after) - self._position_margin(symbol, net)
+        instrument = self.instrument(symbol)
+        if instrument.is_option and side == 'B' and after > 0:
+            increase += max(after - max(net, 0), 0) * self.quote(symbol)['ask']  # premium paid
+        return max(increase, 0.0)
+
+    def margin(self) -> Dict:
+        """
+        Account funds.
+
+        Returns:
+            dict: capital, used, available, total_pnl
+        """
+        with self._lock:
+            used = sum(
+                self._position_margin(symbol, self._net_quantity(symbol)) for symbol in self._positions
+            )
+            total_pnl = sum(row['pnl'] for row in self.positions())
+            return {
+                'capital': self.capital,
+                'used': round(used, 2),
+                'available': round(self.capital + total_pnl - used, 2),
+                'total_pnl': round(total_pnl, 2),
+            }
+
+    # ========== Listeners ==========
+
+    def add_order_listener(self, callback: Callable[[Dict], None]):
+        with self._lock:
+            if callback not in self._order_listeners:
+                self._order_listeners.append(callback)
+
+    def remove_order_listener(self, callback: Callable[[Dict], None]):
+        with self._lock:
+            if callback in self._order_listeners:
+                self._order_listeners.remove(callback)
+
+    def _notify_order(self, order: Dict):
+        with self._lock:
+            listeners = list(self._order_listeners)
+        for listener in listeners:
+            try:
+                listener(dict(order))
+            except Exception as e:
+                logger.debug(f"Order listener failed: {e}")
+
+    def add_tick_listener(self, callback: Callable[[List[Dict]], None], symbols: Iterable[str]) -> int:
+        """Register a tick callback for symbols; returns a handle for remove_tick_listener."""
+        instruments = [self.instrument(symbol).symbol for symbol in symbols]
+        with self._lock:
+            handle = next(self._listener_sequence)
+            self._tick_listeners[handle] = (callback, set(instruments))
+            return handle
+
+    def remove_tick_listener(self, handle: int):
+        with self._lock:
+            self._tick_listeners.pop(handle, None)
+
+    def _publish_ticks(self):
+        with self._lock:
+            listeners = list(self._tick_listeners.values())
+            if not listeners:
+                return
+            symbols = set().union(*(symbols for _, symbols in listeners))
+            quotes = {symbol: self.quote(symbol) for symbol in symbols}
+        for callback, symbols in listeners:
+            try:
+                callback([quotes[symbol] for symbol in symbols])
+            except Exception as e:
+                logger.debug(f"Tick listener failed: {e}")
+
+    # ========== Recording ==========
+
+    def start_recording(self):
+        """Record price moves and orders for save_session()/replay_session()."""
+        with self._lock:
+            self._recording = []
+            self._recording_started = time.monotonic()
+
+    def stop_recording(self) -> List[Dict]:
+        with self._lock:
+            events, self._recording = self._recording or [], None
+            return events
+
+    def _record(self, kind: str, **data):
+        if self._recording is None:
+            return
+        self._recording.append({
+            't': round(time.monotonic() - self._recording_started, 6),
+            'time': self.now().isoformat(),
+            'kind': kind,
+            **data,
+        })
+
+    # ========== Lifecycle ==========
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until every pending fill has been delivered."""
+        return self._dispatcher.drain(timeout)
+
+    def close(self):
+        self._dispatcher.close()
+
@@ -0,0 +1,164 @@
+"""
+Session Recording and Replay for the Simulated Exchange
+
+A session is a list of events ({'t', 'time', 'kind', ...}) captured by
+SimulatedExchange.start_recording() or built from the option-chain history
+store. Sessions are saved as JSON lines (one header line, then one event per
+line) so they can be checked into fixtures and replayed in CI.
+
+Replaying drives the exchange clock, spots and quotes in recorded order;
+ticks and resting-order matches fire after each timestamp, exactly as they
+did live.
+"""
+
+import json
+import logging
+import math
+import time
+from datetime import date, datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .exchange import OrderRejected, SimulatedExchange, option_symbol
+
+logger = logging.getLogger(__name__)
+
+SESSION_FORMAT = 'mcube-simulator-session'
+SESSION_VERSION = 1
+
+
+def save_session(events: Iterable[Dict], path) -> int:
+    """
+    Write events to a JSONL session file.
+
+    Returns:
+        int: Number of events written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open('w') as handle:
+        handle.write(json.dumps({'format': SESSION_FORMAT, 'version': SESSION_VERSION}) + '\n')
+        for event in events:
+            handle.write(json.dumps(event, default=str) + '\n')
+            count += 1
+    return count
+
+
+def load_session(path) -> List[Dict]:
+    """Read a session file written by save_session()."""
+    with Path(path).open() as handle:
+        header = json.loads(handle.readline() or '{}')
+        if header.get('format') != SESSION_FORMAT:
+            raise ValueError(f"{path} is not a simulator session file")
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def replay_session(exchange: SimulatedExchange, events: List[Dict], speed: float = 0.0,
+                   place_orders: bool = False) -> Dict:
+    """
+    Feed a recorded session into an exchange.
+
+    Args:
+        exchange: Target exchange
+        events: Session events (ordered by 't')
+        speed: 1.0 replays in real time, 10.0 ten times faster; 0 (default)
+            replays as fast as possible
+        place_orders: Re-submit recorded orders (off by default, so the code
+            under test places its own)
+
+    Returns:
+        dict: events, steps, orders, rejected, elapsed_seconds
+    """
+    started = time.monotonic()
+    steps = orders = rejected = 0
+
+    for t, group in groupby(events, key=lambda event: event.get('t', 0)):
+        if speed > 0:
+            delay = started + t / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        group = list(group)
+        if group[0].get('time'):
+            exchange.set_time(datetime.fromisoformat(group[0]['time']))
+
+        for event in group:
+            kind = event.get('kind')
+            if kind == 'spot':
+                exchange.set_spot(event['underlying'], event['price'], publish=False)
+            elif kind == 'quote':
+                exchange.set_quote(event['symbol'], event['ltp'], event.get('bid'), event.get('ask'),
+                                   event.get('volume'), event.get('oi'), publish=False)
+            elif kind == 'order' and place_orders:
+                try:
+                    exchange.place_order(event['symbol'], event['side'], event['quantity'],
+                                         order_type=event.get('order_type', 'MKT'),
+                                         price=event.get('price', 0.0), product=event.get('product', 'NRML'))
+                    orders += 1
+                except OrderRejected:
+                    rejected += 1
+
+        exchange.publish_prices()
+        steps += 1
+
+    return {
+        'events': len(events),
+        'steps': steps,
+        'orders': orders,
+        'rejected': rejected,
+        'elapsed_seconds': round(time.monotonic() - started, 3),
+    }
+
+
+def session_from_option_chain_store(underlying: str, expiry: date, start: Optional[datetime] = None,
+                                    end: Optional[datetime] = None) -> List[Dict]:
+    """
+    Build a replayable session from archived option-chain snapshots.
+
+    Each snapshot becomes a spot event plus one quote event per strike/side,
+    timed relative to the first snapshot.
+    """
+    from apps.data.services.option_chain_store import get_option_chain_store
+
+    table = get_option_chain_store().read_table(underlying, expiry, start, end)
+    rows = table.to_pylist()
+    if not rows:
+        return []
+
+    first = rows[0]['snapshot_time']
+    underlying = underlying.upper()
+    events = []
+    for snapshot_time, group in groupby(rows, key=lambda row: row['snapshot_time']):
+        group = list(group)
+        base = {'t': (snapshot_time - first).total_seconds(), 'time': snapshot_time.isoformat()}
+        spot = next((row['spot_price'] for row in group if row.get('spot_price')), None)
+        if spot:
+            events.append({**base, 'kind': 'spot', 'underlying': underlying, 'price': spot})
+        for row in group:
+            if not row.get('ltp'):
+                continue
+            events.append({
+                **base,
+                'kind': 'quote',
+                'symbol': option_symbol(underlying, expiry, row['strike'], row['option_type']),
+                'ltp': row['ltp'],
+                'bid': row.get('bid') or None,
+                'ask': row.get('ask') or None,
+                'volume': row.get('volume'),
+                'oi': row.get('oi'),
+            })
+    return events
+
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of latency samples, e.g. {'p50': 41.2, ...}."""
+    if not samples:
+        return {f'p{point}': 0.0 for point in points}
+    ordered = sorted(samples)
+    result = {}
+    for point in points:
+        index = min(len(ordered) - 1, max(0, math.ceil(point / 100 * len(ordered)) - 1))
+        result[f'p{point}'] = round(ordered[index], 3)
+    return result
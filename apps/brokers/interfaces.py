@@ -8,7 +8,7 @@ This allows switching between brokers by simply changing the broker type.
 
 Example:
     # Switch broker easily
-    broker = BrokerFactory.get_broker('breeze')  # or 'kotakneo'
+    broker = BrokerFactory.get_broker('breeze')  # or 'kotakneo', 'simulator'
     broker.login()
     margin = broker.get_available_margin()
     broker.place_order(symbol='RELIANCE', ...)
@@ -283,6 +283,12 @@ def register_brokers():
     except ImportError:
         pass
 
+    try:
+        from apps.brokers.integrations.simulator.broker import SimulatorBroker
+        BrokerFactory.register('simulator', SimulatorBroker)
+    except ImportError:
+        pass
+
 
 # Auto-register on import
 register_brokers()
@@ -0,0 +1,196 @@
+"""
+Management command to load-test order execution against the local broker simulator
+
+Places strangles through place_strangle_orders_in_batches with the Neo
+client swapped for the simulator, then optionally runs the position monitors
+and risk tasks, and reports order-to-fill latency and task timings. No
+network or broker credentials are needed.
+
+Usage:
+    python manage.py simulate_broker                              # 100 lots, default latency
+    python manage.py simulate_broker --lots 500 --runs 5 --latency-ms 80 --reject-rate 0.02
+    python manage.py simulate_broker --record sessions/run.jsonl  # save prices and orders
+    python manage.py simulate_broker --replay sessions/run.jsonl  # prime prices from a session
+    python manage.py simulate_broker --monitors 20 --json
+"""
+
+import json
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from apps.brokers.integrations.simulator import (
+    ExecutionModel,
+    SimulatedExchange,
+    load_session,
+    option_symbol,
+    percentiles,
+    replay_session,
+    reset_simulated_exchange,
+    save_session,
+)
+from apps.brokers.integrations.simulator.exchange import STRIKE_INTERVALS, monthly_expiry, upcoming_expiries
+
+
+class _LatencyProbe:
+    """Order listener timing placement -> final state for every simulated order."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._placed = {}
+        self.latencies_ms = []
+        self.statuses = {}
+
+    def __call__(self, order):
+        now = time.monotonic()
+        with self._lock:
+            order_id = order['nOrdNo']
+            self._placed.setdefault(order_id, now)
+            if order['ordSt'] != 'open':
+                self.statuses[order['ordSt']] = self.statuses.get(order['ordSt'], 0) + 1
+                self.latencies_ms.append((now - self._placed.pop(order_id)) * 1000)
+
+
+class Command(BaseCommand):
+    help = 'Load-test batch order placement, monitors and risk tasks against the broker simulator'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--underlying', default='NIFTY', help='Underlying to trade (default: NIFTY)')
+        parser.add_argument('--lots', type=int, default=100, help='Lots per strangle (default: 100)')
+        parser.add_argument('--batch-size', type=int, default=20, help='Max lots per child order (default: 20)')
+        parser.add_argument('--runs', type=int, default=1, help='Number of strangles to place (default: 1)')
+        parser.add_argument('--strike-offset', type=float, default=2.0,
+                            help='Strangle width as %% of spot on each side (default: 2.0)')
+        parser.add_argument('--latency-ms', type=float, help='Mean order-to-fill latency')
+        parser.add_argument('--reject-rate', type=float, help='Fraction of orders rejected at random')
+        parser.add_argument('--partial-fill-rate', type=float, help='Fraction of orders filled in two parts')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+        parser.add_argument('--replay', help='Prime prices from a recorded session file')
+        parser.add_argument('--record', help='Save the session (prices and orders) to this file')
+        parser.add_argument('--monitors', type=int, default=0,
+                            help='Run the position monitors and risk checks this many times after placing')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        model_options = {
+            key: options[key] for key in ('latency_ms', 'reject_rate', 'partial_fill_rate', 'seed')
+            if options[key] is not None
+        }
+        exchange = reset_simulated_exchange(SimulatedExchange(model=ExecutionModel(**model_options)))
+        report = {'model': model_options}
+
+        try:
+            if options['replay']:
+                try:
+                    events = load_session(options['replay'])
+                except (OSError, ValueError) as e:
+                    raise CommandError(str(e))
+                report['replay'] = replay_session(exchange, events)
+
+            if options['record']:
+                exchange.start_recording()
+
+            probe = _LatencyProbe()
+            exchange.add_order_listener(probe)
+            with override_settings(BROKER_SIMULATOR=True):
+                report['strangles'] = self._place_strangles(exchange, options)
+                exchange.drain()
+                if options['monitors']:
+                    report['monitors'] = self._run_monitors(options['monitors'])
+            exchange.remove_order_listener(probe)
+
+            report['orders'] = {
+                'count': len(probe.latencies_ms),
+                'statuses': probe.statuses,
+                'latency_ms': percentiles(probe.latencies_ms),
+            }
+            report['account'] = exchange.margin()
+
+            if options['record']:
+                report['recorded_events'] = save_session(exchange.stop_recording(), options['record'])
+        finally:
+            exchange.close()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+        else:
+            self._print_report(report)
+
+    def _place_strangles(self, exchange, options):
+        from apps.brokers.integrations.neo.batch_orders import place_strangle_orders_in_batches
+
+        underlying = options['underlying'].upper()
+        today = exchange.now().date()
+        expiry = next(
+            e for e in upcoming_expiries(underlying, today, weeks=0)
+            if e == monthly_expiry(underlying, e.year, e.month)
+        )
+        spot = exchange.spot(underlying)
+        interval = STRIKE_INTERVALS.get(underlying, 50)
+        offset = spot * options['strike_offset'] / 100
+        call_symbol = option_symbol(underlying, expiry, round((spot + offset) / interval) * interval, 'CE')
+        put_symbol = option_symbol(underlying, expiry, round((spot - offset) / interval) * interval, 'PE')
+
+        runs = []
+        for _ in range(options['runs']):
+            started = time.monotonic()
+            result = place_strangle_orders_in_batches(
+                call_symbol, put_symbol, total_lots=options['lots'], batch_size=options['batch_size']
+            )
+            runs.append({
+                'success': result['success'],
+                'seconds': round(time.monotonic() - started, 3),
+                'batches': result.get('batches_completed', 0),
+                'orders': result.get('summary', {}).get('total_orders_placed', 0),
+                'failed': (result.get('summary', {}).get('call_failed_count', 0)
+                           + result.get('summary', {}).get('put_failed_count', 0)),
+                'error': result.get('error'),
+            })
+        return {'call_symbol': call_symbol, 'put_symbol': put_symbol, 'runs': runs}
+
+    def _run_monitors(self, iterations):
+        from apps.positions.tasks import check_exit_conditions, monitor_all_positions, update_position_pnl
+        from apps.risk.tasks import check_risk_limits_all_accounts
+
+        tasks = {
+            'monitor_all_positions': monitor_all_positions,
+            'update_position_pnl': update_position_pnl,
+            'check_exit_conditions': check_exit_conditions,
+            'check_risk_limits_all_accounts': check_risk_limits_all_accounts,
+        }
+        timings = {name: [] for name in tasks}
+        for _ in range(iterations):
+            for name, task in tasks.items():
+                started = time.monotonic()
+                task()
+                timings[name].append((time.monotonic() - started) * 1000)
+        return {name: percentiles(samples) for name, samples in timings.items()}
+
+    def _print_report(self, report):
+        strangles = report['strangles']
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== Simulated strangles: {strangles['call_symbol']} / {strangles['put_symbol']} ==="
+        ))
+        for index, run in enumerate(strangles['runs'], 1):
+            status = 'OK' if run['success'] else f"FAILED ({run['error'] or run['failed']} failed orders)"
+            self.stdout.write(
+                f"Run {index:>3}: {run['orders']:>4} orders in {run['batches']:>3} batches, {run['seconds']:.3f}s  {status}"
+            )
+
+        orders = report['orders']
+        latency = orders['latency_ms']
+        self.stdout.write(
+            f"\nOrders: {orders['count']}  {orders['statuses']}\n"
+            f"Order-to-fill latency ms: p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  p99 {latency['p99']:.1f}"
+        )
+        for name, timing in report.get('monitors', {}).items():
+            self.stdout.write(f"{name:<34} p50 {timing['p50']:>8.1f} ms  p99 {timing['p99']:>8.1f} ms")
+
+        account = report['account']
+        self.stdout.write(
+            f"\nMargin used {account['used']:,.0f} of {account['capital']:,.0f}  P&L {account['total_pnl']:,.0f}"
+        )
+        if 'recorded_events' in report:
+            self.stdout.write(self.style.SUCCESS(f"Recorded {report['recorded_events']} events"))
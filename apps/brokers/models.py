@@ -893,6 +893,9 @@ class Order(TimeStampedModel):
         indexes = [
             models.Index(fields=['account', 'status']),
             models.Index(fields=['broker_order_id']),
+            # Today's orders (dashboard, order sync), per account and overall
+            models.Index(fields=['account', '-created_at']),
+            models.Index(fields=['-created_at']),
         ]
 
     def __str__(self):
@@ -22,10 +22,10 @@ def sync_orders_from_broker():
     try:
         from apps.accounts.models import BrokerAccount
         from apps.brokers.models import Order
-        from datetime import datetime
+        from apps.core.utils import local_day_range
 
         synced_count = 0
-        today = datetime.now().date()
+        start, end = local_day_range()
 
         # Get all active broker accounts
         accounts = BrokerAccount.objects.filter(is_active=True)
@@ -42,7 +42,8 @@ def sync_orders_from_broker():
                     # For now, just mark existing orders as refreshed
                     Order.objects.filter(
                         account=account,
-                        created_at__date=today
+                        created_at__gte=start,
+                        created_at__lt=end
                     ).update(updated_at=timezone.now())
 
                     synced_count += 1
@@ -54,7 +55,8 @@ def sync_orders_from_broker():
 
                     Order.objects.filter(
                         account=account,
-                        created_at__date=today
+                        created_at__gte=start,
+                        created_at__lt=end
                     ).update(updated_at=timezone.now())
 
                     synced_count += 1
@@ -1,3 +1,264 @@
-from django.test import TestCase
+"""
+Broker App Tests - Neo Batch Execution Engine
 
-# Create your tests here.
+Tests for:
+1. Child order sizing by freeze limits
+2. Fill-confirmed wave execution against a fake Neo client
+3. Cancellation and stop-on-failure behaviour
+4. Execution event stream cursors
+5. Broker simulator fills, rejects, order feed and session replay
+"""
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.brokers.integrations.neo.execution_engine import (
+    BatchExecutionEngine,
+    OrderFeedTracker,
+    OrderLeg,
+    TWAPPacing,
+    parse_order_feed_message,
+    plan_child_lots,
+)
+from apps.brokers.integrations.simulator import (
+    ExecutionModel,
+    SimulatedExchange,
+    SimulatedNeoClient,
+    load_session,
+    option_symbol,
+    replay_session,
+    reset_simulated_exchange,
+    save_session,
+)
+from apps.brokers.integrations.simulator.exchange import monthly_expiry
+from apps.core.utils.event_stream import ExecutionEventStream
+from apps.core.utils.rate_limiter import TokenBucket
+
+
+class FakeNeoClient:
+    """Minimal Neo client that fills every order on the order feed."""
+
+    def __init__(self, reject_symbols=()):
+        self.on_message = None
+        self.reject_symbols = set(reject_symbols)
+        self.placed = []
+        self._lock = threading.Lock()
+
+    def subscribe_to_orderfeed(self):
+        return None
+
+    def place_order(self, trading_symbol, quantity, **kwargs):
+        with self._lock:
+            order_id = f"ORD{len(self.placed) + 1}"
+            self.placed.append((trading_symbol, int(quantity)))
+        status = 'rejected' if trading_symbol in self.reject_symbols else 'complete'
+        feed = json.dumps({'type': 'order', 'data': {
+            'nOrdNo': order_id, 'ordSt': status, 'qty': quantity,
+            'fldQty': quantity if status == 'complete' else 0, 'avgPrc': '12.5',
+            'rejRsn': 'RMS: margin exceeds' if status == 'rejected' else '',
+        }})
+        # Deliver the fill asynchronously, like the websocket thread would
+        threading.Timer(0.01, lambda: self.on_message({'type': 'order_feed', 'data': feed})).start()
+        return {'stat': 'Ok', 'nOrdNo': order_id}
+
+
+def fake_place_order(trading_symbol, transaction_type, quantity, product, order_type, client):
+    response = client.place_order(trading_symbol=trading_symbol, quantity=quantity)
+    return {'success': True, 'order_id': response['nOrdNo'], 'response': response}
+
+
+class ChildOrderSizingTests(TestCase):
+    """Test child order planning"""
+
+    def test_plan_respects_lot_cap(self):
+        self.assertEqual(plan_child_lots(50, 75, 'NIFTY25NOV24500CE'), [20, 20, 10])
+
+    def test_plan_respects_freeze_quantity(self):
+        # BANKNIFTY freeze 900 / lot 35 = 25 lots, lot cap 30 -> 25 per order
+        self.assertEqual(plan_child_lots(60, 35, 'BANKNIFTY25NOVFUT', max_lots_per_order=30), [25, 25, 10])
+
+    def test_midcap_not_matched_as_nifty(self):
+        self.assertEqual(plan_child_lots(100, 140, 'MIDCPNIFTY25NOVFUT', max_lots_per_order=50), [20] * 5)
+
+    def test_parse_order_feed_message(self):
+        message = {'type': 'order_feed', 'data': json.dumps(
+            {'type': 'order', 'data': {'nOrdNo': '42', 'ordSt': 'complete', 'qty': 75, 'fldQty': 75}}
+        )}
+        updates = parse_order_feed_message(message)
+        self.assertEqual(updates[0]['order_id'], '42')
+        self.assertEqual(updates[0]['status'], 'FILLED')
+
+
+class BatchExecutionEngineTests(TestCase):
+    """Test event-driven batch execution"""
+
+    def _engine(self, client, legs, total_lots, **kwargs):
+        return BatchExecutionEngine(
+            client=client,
+            legs=legs,
+            total_lots=total_lots,
+            lot_size=75,
+            rate_limiter=TokenBucket(rate=1000),
+            fill_timeout=2,
+            order_func=fake_place_order,
+            tracker=OrderFeedTracker(client, poll_interval=0.05),
+            **kwargs
+        )
+
+    def test_strangle_waves_confirmed_by_order_feed(self):
+        client = FakeNeoClient()
+        engine = self._engine(client, [
+            OrderLeg('CALL', 'NIFTY25NOV24500CE', 'S'),
+            OrderLeg('PUT', 'NIFTY25NOV24000PE', 'S'),
+        ], total_lots=45)
+
+        report = engine.run()
+
+        self.assertTrue(report.success)
+        self.assertEqual(report.waves_completed, 3)
+        self.assertEqual(len(client.placed), 6)
+        self.assertTrue(all(child.fill_confirmed for child in report.children))
+        self.assertEqual(sum(c.filled_quantity for c in report.children_for_leg('PUT')), 45 * 75)
+        # No fixed sleeps: three waves finish well under a second
+        self.assertLess(report.elapsed_seconds, 2)
+
+    def test_stop_on_failure(self):
+        client = FakeNeoClient(reject_symbols={'NIFTY25NOV24500CE'})
+        engine = self._engine(client, [OrderLeg('OPTION', 'NIFTY25NOV24500CE', 'B')], total_lots=60)
+
+        report = engine.run()
+
+        self.assertFalse(report.success)
+        self.assertEqual(report.failed_wave, 1)
+        self.assertEqual(len(client.placed), 1)
+        self.assertIn('margin exceeds', report.error)
+
+    def test_cancellation_stops_remaining_waves(self):
+        client = FakeNeoClient()
+        engine = self._engine(
+            client, [OrderLeg('OPTION', 'NIFTY25NOV24500CE', 'B')], total_lots=100,
+            cancel_check=lambda: len(client.placed) >= 2
+        )
+
+        report = engine.run()
+
+        self.assertTrue(report.cancelled)
+        self.assertEqual(len(client.placed), 2)
+        self.assertTrue(engine.stream.snapshot['is_cancelled'])
+
+    def test_twap_pacing_spreads_waves(self):
+        pacing = TWAPPacing(duration_seconds=10)
+        pacing.start(total_waves=5)
+        self.assertAlmostEqual(pacing.next_wave_at(4) - pacing.next_wave_at(0), 10)
+
+
+class ExecutionEventStreamTests(TestCase):
+    """Test execution progress events"""
+
+    def test_read_since_cursor(self):
+        stream = ExecutionEventStream('test_progress_stream')
+        stream.publish('progress', 'first')
+        stream.publish('progress', 'second', 'success')
+        stream.update(batches_completed=1, total_batches=2)
+
+        snapshot, events = ExecutionEventStream.read('test_progress_stream', since=1)
+
+        self.assertEqual([e['message'] for e in events], ['second'])
+        self.assertEqual(snapshot['batches_completed'], 1)
+        self.assertEqual(snapshot['last_log_type'], 'success')
+
+    def test_resume_keeps_sequence(self):
+        ExecutionEventStream('test_resume_stream').publish('progress', 'started')
+        resumed = ExecutionEventStream('test_resume_stream', reset=False)
+        event = resumed.publish('progress', 'next')
+        self.assertEqual(event['seq'], 2)
+
+
+class BrokerSimulatorTests(TestCase):
+    """Test the simulated exchange and Neo client stand-in"""
+
+    def setUp(self):
+        start = timezone.make_aware(datetime(2025, 11, 3, 10, 0))
+        self.exchange = SimulatedExchange(ExecutionModel(latency_ms=1, jitter_ms=0, seed=7), start_time=start)
+        expiry = monthly_expiry('NIFTY', 2025, 11)
+        self.call = option_symbol('NIFTY', expiry, 24500, 'CE')
+        self.put = option_symbol('NIFTY', expiry, 23500, 'PE')
+
+    def tearDown(self):
+        self.exchange.close()
+
+    def test_market_order_fills_and_updates_position(self):
+        order = self.exchange.place_order(self.call, 'S', 150)
+        self.assertTrue(self.exchange.drain())
+
+        filled = self.exchange.order(order['nOrdNo'])
+        self.assertEqual(filled['ordSt'], 'complete')
+        self.assertEqual(filled['fldQty'], 150)
+        position = self.exchange.positions()[0]
+        self.assertEqual(position['net_quantity'], -150)
+        self.assertGreater(self.exchange.margin()['used'], 0)
+
+    def test_rejects_bad_lot_multiple_and_margin_breach(self):
+        client = SimulatedNeoClient(self.exchange)
+        response = client.place_order(trading_symbol=self.call, transaction_type='S', quantity='100')
+        self.assertEqual(response['stat'], 'Not_Ok')
+
+        self.exchange.capital = 1000
+        response = client.place_order(trading_symbol=self.call, transaction_type='S', quantity='75')
+        self.exchange.drain()
+        self.assertEqual(self.exchange.order(response['nOrdNo'])['ordSt'], 'rejected')
+
+    def test_order_feed_and_ticks_use_neo_message_format(self):
+        client = SimulatedNeoClient(self.exchange)
+        messages = []
+        client.on_message = messages.append
+        client.subscribe_to_orderfeed()
+        token = self.exchange.instrument(self.put).token
+        client.subscribe([{'instrument_token': token, 'exchange_segment': 'nse_fo'}])
+
+        response = client.place_order(trading_symbol=self.put, transaction_type='S', quantity='75')
+        self.exchange.drain()
+        self.exchange.set_spot('NIFTY', 23800)
+
+        updates = [u for m in messages for u in parse_order_feed_message(m)]
+        self.assertIn(('complete', 75), [(u['neo_status'], u['filled_quantity']) for u in updates
+                                         if u['order_id'] == response['nOrdNo']])
+        ticks = [m for m in messages if m['type'] == 'stock_feed']
+        self.assertGreaterEqual(len(ticks), 2)
+        self.assertEqual(ticks[-1]['data'][0]['tk'], token)
+
+    def test_strangle_batches_run_against_simulator(self):
+        from apps.brokers.integrations.neo.batch_orders import place_strangle_orders_in_batches
+
+        exchange = reset_simulated_exchange(self.exchange)
+        with override_settings(BROKER_SIMULATOR=True):
+            result = place_strangle_orders_in_batches(self.call, self.put, total_lots=45, batch_size=20)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['summary']['total_orders_placed'], 6)
+        quantities = {row['symbol']: row['net_quantity'] for row in exchange.positions()}
+        self.assertEqual(quantities, {self.call: -45 * 75, self.put: -45 * 75})
+
+    def test_recorded_session_replays_prices(self):
+        self.exchange.start_recording()
+        self.exchange.set_spot('NIFTY', 24100)
+        self.exchange.set_quote(self.call, 120.5, 120, 121)
+        events = self.exchange.stop_recording()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'session.jsonl')
+            self.assertEqual(save_session(events, path), 2)
+            replayed = SimulatedExchange(ExecutionModel(latency_ms=1, jitter_ms=0))
+            try:
+                stats = replay_session(replayed, load_session(path))
+                self.assertEqual(stats['steps'], 2)
+                self.assertEqual(replayed.spot('NIFTY'), 24100)
+                self.assertEqual(replayed.quote(self.call)['ltp'], 120.5)
+            finally:
+                replayed.close()
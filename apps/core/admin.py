@@ -2,8 +2,10 @@ from django.contrib import admin
 from .models import (
     CredentialStore,
     TradingSchedule,
+    MarketHoliday,
     NseFlag,
     BkLog,
+    LogRollup,
     DayReport,
     TodaysPosition,
     SystemSettings
@@ -74,6 +76,14 @@ class TradingScheduleAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(MarketHoliday)
+class MarketHolidayAdmin(admin.ModelAdmin):
+    list_display = ['date', 'description', 'exchange']
+    list_filter = ['exchange']
+    search_fields = ['description']
+    date_hierarchy = 'date'
+
+
 @admin.register(NseFlag)
 class NseFlagAdmin(admin.ModelAdmin):
     list_display = ['flag', 'value', 'updated_at']
@@ -250,6 +260,25 @@ class BkLogAdmin(admin.ModelAdmin):
     export_to_csv.short_description = 'Export selected logs to CSV'
 
 
+@admin.register(LogRollup)
+class LogRollupAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'source', 'task', 'category', 'count', 'error_count', 'warning_count', 'avg_time', 'max_ms']
+    list_filter = ['source', 'category', ('hour', admin.DateFieldListFilter)]
+    search_fields = ['task']
+    date_hierarchy = 'hour'
+    ordering = ['-hour']
+
+    def avg_time(self, obj):
+        return f"{obj.avg_ms:.0f} ms" if obj.avg_ms is not None else '-'
+    avg_time.short_description = 'Avg Time'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(DayReport)
 class DayReportAdmin(admin.ModelAdmin):
     list_display = ['date', 'day_of_week', 'pnl', 'num_legs', 'is_closed', 'expiry_date']
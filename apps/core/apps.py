@@ -5,3 +5,10 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'Core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from apps.core.utils.db import configure_sqlite_connection
+
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='core.sqlite_pragmas')
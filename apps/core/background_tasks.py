@@ -61,7 +61,7 @@ def _log(level: str, action: str, message: str, task_name: str = "") -> None:
     print(line)
 
     try:
-        BkLog.objects.create(
+        BkLog.log(
             level=level,
             action=action,
             message=message,
@@ -0,0 +1,30 @@
+"""
+Performance Benchmarks for the Trading Hot Paths
+
+Run with `python manage.py bench`; see runner.py for the registry, history
+file and regression checks and suite.py for the benchmarks themselves.
+"""
+
+from .runner import (
+    Benchmark,
+    benchmark,
+    compare_runs,
+    get_benchmarks,
+    load_history,
+    regression_thresholds,
+    run_benchmark,
+    run_suite,
+    save_history,
+)
+
+__all__ = [
+    'Benchmark',
+    'benchmark',
+    'compare_runs',
+    'get_benchmarks',
+    'load_history',
+    'regression_thresholds',
+    'run_benchmark',
+    'run_suite',
+    'save_history',
+]
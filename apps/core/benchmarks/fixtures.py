@@ -0,0 +1,288 @@
+"""
+Synthetic Fixtures for Benchmarks
+
+Deterministic (seeded) market data shaped like the real feeds: option
+chains priced with Black-Scholes, OHLC candles from a random walk, a
+Trendlyne F&O export, an ICICI SecurityMaster file, broker accounts with
+risk limits and open positions. Database fixtures use bulk_create and are
+rolled back by the runner.
+"""
+
+import csv
+import math
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.utils import timezone
+
+BENCH_SYMBOL = 'BENCH'
+BENCH_EXPIRY = '30-Dec-2025'  # As Trendlyne exports write it (ContractData stores the date)
+BENCH_EXPIRY_DATE = date(2025, 12, 30)
+
+FNO_CSV_COLUMNS = [
+    'Symbol', 'Type', 'Strike', 'LTP', 'Spot', 'Expiry', 'Last Updated', 'Build Up', 'Lot Size',
+    'Change', '% Change', 'Open', 'High', 'Low', 'Prev Close',
+    'OI', 'OI Change %', 'OI Change', 'Prev OI',
+    'Volume', 'Volume Change %', 'Shares Traded', 'Shares Change %', 'Prev Volume',
+    'Basis', 'Cost of Carry',
+    'IV', 'Prev IV', 'IV Change %', 'Delta', 'Vega', 'Gamma', 'Theta', 'Rho',
+]
+
+SECURITY_MASTER_COLUMNS = [
+    'Token', 'InstrumentName', 'ShortName', 'Series', 'ExpiryDate', 'StrikePrice', 'OptionType',
+    'LotSize', 'ExchangeCode', 'CompanyName', 'TickSize', 'BasePrice',
+]
+
+
+def _norm_cdf(x: float) -> float:
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+def _bs_price(spot, strike, years, vol, rate, option_type):
+    if years <= 0:
+        return max(spot - strike, 0) if option_type == 'CE' else max(strike - spot, 0)
+    d1 = (math.log(spot / strike) + (rate + vol * vol / 2) * years) / (vol * math.sqrt(years))
+    d2 = d1 - vol * math.sqrt(years)
+    if option_type == 'CE':
+        return spot * _norm_cdf(d1) - strike * math.exp(-rate * years) * _norm_cdf(d2)
+    return strike * math.exp(-rate * years) * _norm_cdf(-d2) - spot * _norm_cdf(-d1)
+
+
+def synthetic_chain(spot: float = 24000.0, strikes: int = 100, interval: int = 50, days: int = 14,
+                    vol: float = 0.14, seed: int = 7) -> List[Dict]:
+    """
+    One expiry's chain, one row per strike.
+
+    Returns:
+        list: {strike, call_ltp, put_ltp, call_oi, put_oi, call_volume, put_volume}
+    """
+    rng = random.Random(seed)
+    atm = round(spot / interval) * interval
+    years = days / 365
+    rows = []
+    for index in range(strikes):
+        strike = atm + (index - strikes // 2) * interval
+        distance = abs(strike - spot) / spot
+        skew = vol * (1 + 2.5 * distance)  # smile: wings richer than ATM
+        rows.append({
+            'strike': float(strike),
+            'call_ltp': round(max(_bs_price(spot, strike, years, skew, 0.065, 'CE'), 0.05), 2),
+            'put_ltp': round(max(_bs_price(spot, strike, years, skew, 0.065, 'PE'), 0.05), 2),
+            'call_oi': int(rng.uniform(0.2, 1.0) * 5e6 * math.exp(-distance * 40)),
+            'put_oi': int(rng.uniform(0.2, 1.0) * 5e6 * math.exp(-distance * 40)),
+            'call_volume': rng.randint(1000, 500000),
+            'put_volume': rng.randint(1000, 500000),
+        })
+    return rows
+
+
+def synthetic_candles(count: int = 250, start_price: float = 1000.0, seed: int = 7) -> List[Dict]:
+    """Daily OHLCV candles from a geometric random walk, oldest first."""
+    rng = random.Random(seed)
+    price = start_price
+    day = date(2025, 1, 1)
+    candles = []
+    while len(candles) < count:
+        day += timedelta(days=1)
+        if day.weekday() >= 5:
+            continue
+        open_price = price
+        close = open_price * math.exp(rng.gauss(0.0003, 0.015))
+        high = max(open_price, close) * (1 + abs(rng.gauss(0, 0.006)))
+        low = min(open_price, close) * (1 - abs(rng.gauss(0, 0.006)))
+        candles.append({
+            'date': day, 'open': round(open_price, 2), 'high': round(high, 2),
+            'low': round(low, 2), 'close': round(close, 2), 'volume': rng.randint(10 ** 5, 10 ** 7),
+        })
+        price = close
+    return candles
+
+
+def write_fno_csv(path, rows: int = 20000, seed: int = 7) -> int:
+    """
+    Trendlyne F&O export with `rows` contracts (futures plus option chains
+    across symbols and expiries). Returns the number of rows written.
+    """
+    rng = random.Random(seed)
+    expiries = ['30-Dec-2025', '27-Jan-2026', '24-Feb-2026']
+    written = 0
+    symbol_index = 0
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(FNO_CSV_COLUMNS)
+        while written < rows:
+            symbol = f"STK{symbol_index:03d}"
+            spot = rng.uniform(100, 5000)
+            interval = max(round(spot * 0.01 / 5) * 5, 1)
+            for expiry in expiries:
+                contracts = [('FUT', None)] + [
+                    (option_type, round(spot / interval) * interval + offset * interval)
+                    for offset in range(-10, 11) for option_type in ('CE', 'PE')
+                ]
+                for option_type, strike in contracts:
+                    if written >= rows:
+                        break
+                    price = spot * rng.uniform(0.001, 0.08) if strike else spot * 1.004
+                    oi = rng.randint(1000, 10 ** 6)
+                    writer.writerow([
+                        symbol, option_type, strike or '', round(price, 2), round(spot, 2), expiry,
+                        '2025-12-01', rng.choice(['Long Build Up', 'Short Build Up', 'Short Covering', 'Long Unwinding']),
+                        rng.choice([250, 500, 750, 1000]),
+                        round(rng.uniform(-5, 5), 2), round(rng.uniform(-10, 10), 2),
+                        round(price * 0.98, 2), round(price * 1.03, 2), round(price * 0.96, 2), round(price * 0.99, 2),
+                        oi, round(rng.uniform(-20, 20), 2), rng.randint(-50000, 50000), rng.randint(1000, 10 ** 6),
+                        rng.randint(0, 10 ** 5), round(rng.uniform(-50, 50), 2), rng.randint(0, 10 ** 7),
+                        round(rng.uniform(-50, 50), 2), rng.randint(0, 10 ** 5),
+                        round(rng.uniform(-5, 5), 2) if not strike else '', round(rng.uniform(5, 10), 2) if not strike else '',
+                        round(rng.uniform(10, 60), 2) if strike else '', round(rng.uniform(10, 60), 2) if strike else '',
+                        round(rng.uniform(-10, 10), 2) if strike else '',
+                        round(rng.uniform(-1, 1), 3) if strike else '', round(rng.uniform(0, 5), 3) if strike else '',
+                        round(rng.uniform(0, 0.01), 5) if strike else '', round(rng.uniform(-5, 0), 3) if strike else '',
+                        round(rng.uniform(0, 1), 3) if strike else '',
+                    ])
+                    written += 1
+            symbol_index += 1
+    return written
+
+
+def write_security_master(path, symbols: int = 200, seed: int = 7) -> int:
+    """ICICI FONSEScripMaster-style CSV (futures plus option strikes per symbol)."""
+    rng = random.Random(seed)
+    expiries = ['30-Dec-2025', '27-Jan-2026', '24-Feb-2026']
+    token = 100000
+    written = 0
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle, quoting=csv.QUOTE_ALL)
+        writer.writerow(SECURITY_MASTER_COLUMNS)
+        for index in range(symbols):
+            symbol = f"STK{index:03d}"
+            short_name = f"S{index:05d}"
+            spot = rng.uniform(100, 5000)
+            lot_size = rng.choice([250, 500, 750, 1000])
+            for expiry in expiries:
+                token += 1
+                writer.writerow([token, 'FUTSTK', short_name, 'FUTURE', expiry, 0, 'XX', lot_size,
+                                 symbol, f"{symbol} LIMITED", 0.05, round(spot, 2)])
+                written += 1
+                for offset in range(-20, 21):
+                    for option_type in ('CE', 'PE'):
+                        token += 1
+                        strike = round(spot * (1 + offset * 0.025))
+                        writer.writerow([token, 'OPTSTK', short_name, 'OPTION', expiry, strike, option_type,
+                                         lot_size, symbol, f"{symbol} LIMITED", 0.05, round(spot * 0.02, 2)])
+                        written += 1
+    return written
+
+
+def seed_option_contracts(symbol: str = BENCH_SYMBOL, expiry: str = BENCH_EXPIRY, strikes: int = 200) -> int:
+    """ContractData rows for one chain (CE and PE per strike)."""
+    from apps.data.models import ContractData
+
+    chain = synthetic_chain(strikes=strikes)
+    contracts = []
+    for row in chain:
+        for option_type in ('CE', 'PE'):
+            prefix = 'call' if option_type == 'CE' else 'put'
+            contracts.append(ContractData(
+                symbol=symbol, option_type=option_type, expiry=expiry, strike_price=row['strike'],
+                price=row[f'{prefix}_ltp'], spot=24000.0, oi=row[f'{prefix}_oi'],
+                traded_contracts=row[f'{prefix}_volume'], iv=0.14, lot_size=75,
+            ))
+    ContractData.objects.bulk_create(contracts, batch_size=1000)
+    return len(contracts)
+
+
+def seed_stock_universe(stocks: int = 60, seed: int = 7) -> List[str]:
+    """TLStockData, ContractStockData, futures/option contracts and candles for `stocks` symbols."""
+    from apps.brokers.models import HistoricalPrice
+    from apps.data.models import ContractData, ContractStockData, TLStockData
+
+    rng = random.Random(seed)
+    sectors = ['Banks', 'IT', 'Pharma', 'Auto', 'Metals', 'FMCG']
+    symbols = [f"STK{index:03d}" for index in range(stocks)]
+    tl_rows, stock_rows, contracts, candles = [], [], [], []
+    zero_fields = {
+        name: 0 for name in (
+            'fno_prev_day_total_oi', 'fno_prev_day_put_oi', 'fno_prev_day_call_oi', 'fno_prev_day_put_vol',
+            'fno_prev_day_call_vol', 'fno_mwpl', 'fno_pcr_vol_prev', 'fno_pcr_vol_change_pct', 'fno_pcr_oi_prev',
+            'fno_pcr_oi_change_pct', 'fno_mwpl_pct', 'fno_mwpl_prev_pct', 'fno_total_oi_change_pct',
+            'fno_put_oi_change_pct', 'fno_call_oi_change_pct', 'fno_put_vol_change_pct', 'fno_call_vol_change_pct',
+            'fno_rollover_cost', 'fno_rollover_cost_pct', 'fno_rollover_pct',
+        )
+    }
+    for symbol in symbols:
+        price = rng.uniform(100, 5000)
+        sector = rng.choice(sectors)
+        call_oi, put_oi = rng.randint(10 ** 5, 10 ** 7), rng.randint(10 ** 5, 10 ** 7)
+        tl_rows.append(TLStockData(
+            nsecode=symbol, stock_name=f"{symbol} Ltd", sector_name=sector, industry_name=sector,
+            current_price=price, trendlyne_durability_score=rng.uniform(20, 90),
+            trendlyne_valuation_score=rng.uniform(20, 90), trendlyne_momentum_score=rng.uniform(20, 90),
+        ))
+        stock_rows.append(ContractStockData(
+            nse_code=symbol, stock_name=f"{symbol} Ltd", current_price=price, industry_name=sector,
+            annualized_volatility=rng.uniform(15, 45), fno_total_oi=call_oi + put_oi,
+            fno_total_call_oi=call_oi, fno_total_put_oi=put_oi,
+            fno_total_call_vol=rng.randint(10 ** 4, 10 ** 6), fno_total_put_vol=rng.randint(10 ** 4, 10 ** 6),
+            fno_pcr_oi=put_oi / call_oi, fno_pcr_vol=rng.uniform(0.5, 1.5), **zero_fields,
+        ))
+        contracts.append(ContractData(
+            symbol=symbol, option_type='FUT', expiry=BENCH_EXPIRY, price=price * 1.004, spot=price,
+            oi=rng.randint(10 ** 5, 10 ** 7), pct_oi_change=rng.uniform(-15, 15),
+            pct_day_change=rng.uniform(-4, 4), traded_contracts=rng.randint(10 ** 3, 10 ** 5),
+            build_up=rng.choice(['Long Build Up', 'Short Build Up', 'Short Covering', 'Long Unwinding']),
+            lot_size=500,
+        ))
+        for candle in synthetic_candles(count=200, start_price=price, seed=rng.randint(0, 10 ** 6)):
+            candles.append(HistoricalPrice(
+                datetime=timezone.make_aware(datetime.combine(candle['date'], datetime.min.time())),
+                stock_code=symbol, exchange_code='NSE', product_type='cash',
+                open=Decimal(str(candle['open'])), high=Decimal(str(candle['high'])),
+                low=Decimal(str(candle['low'])), close=Decimal(str(candle['close'])), volume=candle['volume'],
+            ))
+    TLStockData.objects.bulk_create(tl_rows, batch_size=1000)
+    ContractStockData.objects.bulk_create(stock_rows, batch_size=1000)
+    ContractData.objects.bulk_create(contracts, batch_size=1000)
+    HistoricalPrice.objects.bulk_create(candles, batch_size=2000)
+    return symbols
+
+
+def seed_accounts(accounts: int = 20, positions_per_account: int = 1) -> List:
+    """Active broker accounts with risk limits and open positions."""
+    from apps.accounts.models import BrokerAccount
+    from apps.positions.models import Position
+    from apps.risk.models import RiskLimit
+
+    today = timezone.localdate()
+    week_start = today - timedelta(days=today.weekday())
+    BrokerAccount.objects.bulk_create([
+        BrokerAccount(
+            broker='KOTAK', account_number=f"BENCH{index:05d}", account_name=f"Bench account {index}",
+            allocated_capital=Decimal('5000000'), max_daily_loss=Decimal('100000'),
+            max_weekly_loss=Decimal('250000'), is_active=True,
+        )
+        for index in range(accounts)
+    ])
+    accounts_list = list(BrokerAccount.objects.filter(account_number__startswith='BENCH'))
+
+    limits, positions = [], []
+    for index, account in enumerate(accounts_list):
+        limits.append(RiskLimit(account=account, limit_type='DAILY_LOSS', limit_value=Decimal('100000'),
+                                current_value=Decimal('20000'), period_start=today))
+        limits.append(RiskLimit(account=account, limit_type='WEEKLY_LOSS', limit_value=Decimal('250000'),
+                                current_value=Decimal('40000'), period_start=week_start))
+        for number in range(positions_per_account):
+            entry = Decimal('24000') + Decimal(index * 10 + number)
+            positions.append(Position(
+                account=account, strategy_type='WEEKLY_NIFTY_STRANGLE', instrument=f"NIFTY-{index}-{number}",
+                direction=('LONG', 'SHORT', 'NEUTRAL')[(index + number) % 3], quantity=75, lot_size=75,
+                entry_price=entry, current_price=entry + Decimal('12.5'),
+                stop_loss=entry - Decimal('200'), target=entry + Decimal('300'),
+                premium_collected=Decimal('15000'), expiry_date=BENCH_EXPIRY_DATE,
+                margin_used=Decimal('150000'), entry_value=entry * 75, status='ACTIVE',
+            ))
+    RiskLimit.objects.bulk_create(limits)
+    Position.objects.bulk_create(positions)
+    return accounts_list
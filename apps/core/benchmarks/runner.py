@@ -0,0 +1,282 @@
+"""
+Benchmark Runner - Registry, Timing, History and Regression Checks
+
+Benchmarks are registered with @benchmark. The decorated function is the
+setup: it receives a scale factor, builds its fixtures and returns the
+callable to time plus the number of items one call processes (and
+optionally a cleanup callable for files or rows written outside the
+transaction):
+
+    @benchmark('max_pain', group='analytics')
+    def bench_max_pain(scale):
+        seed_option_contracts(strikes=int(200 * scale))
+        return lambda: OpenInterestAnalyzer.find_max_pain('BENCH', EXPIRY), 1
+
+Each benchmark runs inside a transaction that is rolled back, so fixtures
+and anything the code under test writes never persist.
+
+Results are appended to a JSON history file. A baseline (any saved run)
+is the reference for regression checks: a benchmark regresses when its
+median is more than the threshold slower than the baseline median.
+"""
+
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.constants import (
+    BENCHMARK_DEFAULT_ROUNDS,
+    BENCHMARK_HISTORY_LIMIT,
+    BENCHMARK_NOISE_FLOOR_MS,
+    BENCHMARK_REGRESSION_THRESHOLD,
+    BENCHMARK_WARMUP_ROUNDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark."""
+
+    name: str
+    group: str
+    setup: Callable
+    description: str = ''
+    rounds: Optional[int] = None  # Overrides the default (e.g. 1 for slow imports)
+    warmup: Optional[int] = None  # Overrides BENCHMARK_WARMUP_ROUNDS (0 to time a cold first call)
+    threshold: Optional[float] = None  # Overrides BENCHMARK_REGRESSION_THRESHOLD
+
+
+_REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, group: str, rounds: Optional[int] = None, warmup: Optional[int] = None,
+              threshold: Optional[float] = None):
+    """Register a benchmark setup function."""
+    def decorator(setup):
+        doc = (setup.__doc__ or '').strip()
+        _REGISTRY[name] = Benchmark(
+            name=name, group=group, setup=setup, description=doc.splitlines()[0] if doc else '',
+            rounds=rounds, warmup=warmup, threshold=threshold,
+        )
+        return setup
+    return decorator
+
+
+def get_benchmarks(selected: Optional[Iterable[str]] = None) -> List[Benchmark]:
+    """
+    Registered benchmarks, optionally filtered by name or group.
+
+    Raises:
+        KeyError: If a selector matches no benchmark
+    """
+    from . import suite  # noqa: F401 - registers the suite
+
+    if not selected:
+        return list(_REGISTRY.values())
+    chosen = []
+    for selector in selected:
+        matches = [b for b in _REGISTRY.values() if selector in (b.name, b.group)]
+        if not matches:
+            raise KeyError(selector)
+        chosen.extend(b for b in matches if b not in chosen)
+    return chosen
+
+
+def _summarize(samples_ms: List[float], items: int) -> Dict:
+    ordered = sorted(samples_ms)
+    median = statistics.median(ordered)
+    return {
+        'rounds': len(ordered),
+        'items': items,
+        'min_ms': round(ordered[0], 3),
+        'median_ms': round(median, 3),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max_ms': round(ordered[-1], 3),
+        'stdev_ms': round(statistics.stdev(ordered), 3) if len(ordered) > 1 else 0.0,
+        'items_per_sec': round(items / (median / 1000), 1) if median > 0 and items else None,
+    }
+
+
+class _Rollback(Exception):
+    pass
+
+
+FIRST_PARTY_PACKAGES = ('apps', 'tools', 'mcube_ai')
+
+
+def _missing_dependency(error: ImportError) -> Optional[str]:
+    """Name of the missing third-party package, None for any other import failure."""
+    if not isinstance(error, ModuleNotFoundError) or not error.name:
+        return None
+    package = error.name.split('.')[0]
+    return None if package in FIRST_PARTY_PACKAGES else package
+
+
+def run_benchmark(bench: Benchmark, scale: float = 1.0, rounds: Optional[int] = None,
+                  warmup: Optional[int] = None) -> Dict:
+    """
+    Set up and time one benchmark.
+
+    Only a missing third-party package skips a benchmark; a broken
+    first-party import is an error, so the regression check does not lose it.
+
+    Returns:
+        dict: timing summary, or {'status': 'skipped'|'error', 'error': str}
+    """
+    rounds = rounds or bench.rounds or BENCHMARK_DEFAULT_ROUNDS
+    if warmup is None:
+        warmup = bench.warmup if bench.warmup is not None else BENCHMARK_WARMUP_ROUNDS
+    result = {'group': bench.group}
+    cleanup = None
+    try:
+        with transaction.atomic():
+            func, items, *rest = bench.setup(scale)
+            cleanup = rest[0] if rest else None
+            for _ in range(warmup):
+                func()
+            samples = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                func()
+                samples.append((time.perf_counter() - started) * 1000)
+            result.update(status='ok', **_summarize(samples, items))
+            raise _Rollback()
+    except _Rollback:
+        pass
+    except Exception as e:
+        missing = _missing_dependency(e) if isinstance(e, ImportError) else None
+        if missing:
+            result.update(status='skipped', error=f"missing dependency: {missing}")
+        else:
+            logger.exception(f"Benchmark {bench.name} failed")
+            result.update(status='error', error=str(e))
+    finally:
+        if cleanup:
+            try:
+                cleanup()
+            except Exception:
+                logger.exception(f"Cleanup of benchmark {bench.name} failed")
+    return result
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def run_suite(benchmarks: List[Benchmark], scale: float = 1.0, rounds: Optional[int] = None,
+              progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    """
+    Run benchmarks and build a history record.
+
+    Returns:
+        dict: timestamp, commit, scale, host, python, results {name: summary}
+    """
+    results = {}
+    for bench in benchmarks:
+        results[bench.name] = run_benchmark(bench, scale=scale, rounds=rounds)
+        if progress:
+            progress(bench.name, results[bench.name])
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'commit': _git_revision(),
+        'scale': scale,
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+
+# ========== History ==========
+
+def history_path() -> Path:
+    return Path(getattr(settings, 'BENCHMARK_HISTORY_PATH', Path(settings.BASE_DIR) / 'benchmarks' / 'history.json'))
+
+
+def load_history(path: Optional[Path] = None) -> Dict:
+    path = Path(path or history_path())
+    if not path.exists():
+        return {'baseline': None, 'runs': []}
+    with path.open() as handle:
+        history = json.load(handle)
+    history.setdefault('baseline', None)
+    history.setdefault('runs', [])
+    return history
+
+
+def save_history(history: Dict, path: Optional[Path] = None):
+    """Write the history file atomically."""
+    path = Path(path or history_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    history['runs'] = history['runs'][-BENCHMARK_HISTORY_LIMIT:]
+    tmp = path.with_suffix('.tmp')
+    with tmp.open('w') as handle:
+        json.dump(history, handle, indent=2)
+    tmp.replace(path)
+
+
+def compare_runs(current: Dict, reference: Optional[Dict], threshold: float = BENCHMARK_REGRESSION_THRESHOLD,
+                 overrides: Optional[Dict[str, float]] = None) -> List[Dict]:
+    """
+    Compare medians of two runs.
+
+    Args:
+        current: Run record from run_suite()
+        reference: Baseline or previous run (None: everything is 'new')
+        threshold: Allowed fractional slowdown
+        overrides: Per-benchmark thresholds
+
+    Returns:
+        list: {name, current_ms, reference_ms, change_pct, status} with status
+            'regression', 'improvement', 'ok', 'new', 'skipped' or 'error'
+    """
+    overrides = overrides or {}
+    reference_results = (reference or {}).get('results', {})
+    if reference and reference.get('scale') != current.get('scale'):
+        reference_results = {}  # different fixture sizes are not comparable
+
+    rows = []
+    for name, result in current['results'].items():
+        row = {'name': name, 'current_ms': result.get('median_ms'), 'reference_ms': None,
+               'change_pct': None, 'status': result.get('status', 'ok')}
+        previous = reference_results.get(name)
+        if row['status'] == 'ok':
+            if not previous or previous.get('status') != 'ok':
+                row['status'] = 'new'
+            else:
+                limit = overrides.get(name, threshold)
+                row['reference_ms'] = previous['median_ms']
+                delta = result['median_ms'] - previous['median_ms']
+                row['change_pct'] = round(delta / previous['median_ms'] * 100, 1) if previous['median_ms'] else None
+                if abs(delta) < BENCHMARK_NOISE_FLOOR_MS:
+                    row['status'] = 'ok'
+                elif delta > previous['median_ms'] * limit:
+                    row['status'] = 'regression'
+                elif -delta > previous['median_ms'] * limit:
+                    row['status'] = 'improvement'
+        rows.append(row)
+    return rows
+
+
+def regression_thresholds() -> Dict[str, float]:
+    """Per-benchmark threshold overrides declared at registration."""
+    get_benchmarks()
+    return {name: bench.threshold for name, bench in _REGISTRY.items() if bench.threshold is not None}
@@ -0,0 +1,167 @@
+"""
+Benchmark Suite - Trading Hot Paths
+
+Sizes are at scale 1.0; `manage.py bench --scale 0.1` shrinks every
+fixture for a quick CI run (results are only compared at equal scale).
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .fixtures import (
+    BENCH_EXPIRY,
+    BENCH_SYMBOL,
+    seed_accounts,
+    seed_option_contracts,
+    seed_stock_universe,
+    synthetic_chain,
+    write_fno_csv,
+    write_security_master,
+)
+from .runner import benchmark
+
+
+def _scaled(value: int, scale: float, minimum: int = 1) -> int:
+    return max(int(value * scale), minimum)
+
+
+def _scratch_dir():
+    path = tempfile.mkdtemp(prefix='mcube_bench_')
+    return path, lambda: shutil.rmtree(path, ignore_errors=True)
+
+
+@benchmark('security_master_lookup', group='brokers')
+def bench_security_master_lookup(scale):
+    """SecurityMaster futures + option lookups (uncached) in a 250-symbol file."""
+    from apps.brokers.utils.security_master import get_futures_instrument, get_option_instrument
+
+    directory, cleanup = _scratch_dir()
+    path = os.path.join(directory, 'FONSEScripMaster.txt')
+    symbols = _scaled(250, scale, minimum=10)
+    write_security_master(path, symbols=symbols)
+    # Spread lookups across the file: late symbols are the worst case for a scan
+    targets = [f"STK{index:03d}" for index in range(0, symbols, max(symbols // 10, 1))][:10]
+
+    def run():
+        for symbol in targets:
+            future = get_futures_instrument(symbol, '24-Feb-2026', security_master_path=path,
+                                            use_cache=False, use_breeze_fallback=False)
+            atm = round(future['base_price'])  # the fixture's ATM strike is the rounded spot
+            get_option_instrument(symbol, '24-Feb-2026', atm, 'CE',
+                                  security_master_path=path, use_cache=False, use_breeze_fallback=False)
+
+    return run, len(targets) * 2, cleanup
+
+
+@benchmark('chain_greeks', group='analytics')
+def bench_chain_greeks(scale):
+    """IV (Newton-Raphson) and greeks for every strike of a chain."""
+    from apps.strategies.services.greeks_calculator import calculate_all_greeks
+
+    chain = synthetic_chain(strikes=_scaled(100, scale, minimum=10))
+    expiry = timezone.localdate() + timedelta(days=14)
+    spot = Decimal('24000')
+    vix = Decimal('14')
+
+    def run():
+        for row in chain:
+            calculate_all_greeks(spot, Decimal(str(row['strike'])), expiry,
+                                 Decimal(str(row['call_ltp'])), Decimal(str(row['put_ltp'])), india_vix=vix)
+
+    return run, len(chain)
+
+
+@benchmark('find_max_pain', group='analytics')
+def bench_find_max_pain(scale):
+    """Max pain over a 100-strike chain in ContractData."""
+    from apps.data.data_analyzers import OpenInterestAnalyzer
+
+    seed_option_contracts(strikes=_scaled(100, scale, minimum=10))
+    return lambda: OpenInterestAnalyzer.find_max_pain(BENCH_SYMBOL, BENCH_EXPIRY), 1
+
+
+@benchmark('trendlyne_fno_import', group='data', rounds=1, warmup=0)
+def bench_trendlyne_fno_import(scale):
+    """Trendlyne F&O CSV import (20k rows) into ContractData."""
+    from apps.data.importers import TrendlyneDataImporter
+
+    directory, cleanup = _scratch_dir()
+    path = os.path.join(directory, 'fno_data_bench.csv')
+    rows = write_fno_csv(path, rows=_scaled(20000, scale, minimum=100))
+    importer = TrendlyneDataImporter()
+    return lambda: importer.import_fno_data(csv_path=path), rows, cleanup
+
+
+@benchmark('contract_stock_importer', group='data', rounds=3)
+def bench_contract_stock_importer(scale):
+    """ContractStockDataImporter aggregation over 50 symbols x 40-strike chains."""
+    from apps.data.importers import ContractStockDataImporter
+
+    symbols = _scaled(50, scale, minimum=5)
+    for index in range(symbols):
+        seed_option_contracts(symbol=f"STK{index:03d}", strikes=20)
+    importer = ContractStockDataImporter()
+    return importer.calculate_and_save_stock_fno_data, symbols
+
+
+@benchmark('screen_futures_opportunities', group='strategies', rounds=3)
+def bench_screen_futures_opportunities(scale):
+    """Multi-factor futures screen over a 60-stock F&O universe."""
+    from apps.strategies.strategies.icici_futures import screen_futures_opportunities
+
+    stocks = _scaled(60, scale, minimum=5)
+    seed_stock_universe(stocks=stocks)
+    return lambda: screen_futures_opportunities(min_volume_rank=50), min(stocks, 50)
+
+
+@benchmark('check_risk_limits', group='risk')
+def bench_check_risk_limits(scale):
+    """check_risk_limits across 50 accounts."""
+    from apps.risk.services.risk_manager import check_risk_limits
+
+    accounts = seed_accounts(accounts=_scaled(50, scale, minimum=2))
+
+    def run():
+        for account in accounts:
+            check_risk_limits(account)
+
+    return run, len(accounts)
+
+
+@benchmark('position_monitor_tick', group='positions')
+def bench_position_monitor_tick(scale):
+    """One monitoring tick (monitor_all_positions + update_position_pnl) over 100 positions."""
+    from apps.positions.tasks import monitor_all_positions, update_position_pnl
+
+    accounts = _scaled(20, scale, minimum=2)
+    seed_accounts(accounts=accounts, positions_per_account=5)
+
+    def run():
+        monitor_all_positions()
+        update_position_pnl()
+
+    return run, accounts * 5
+
+
+@benchmark('bklog_writes', group='core')
+def bench_bklog_writes(scale):
+    """BkLog.log throughput (through the writer queue when enabled)."""
+    from apps.core.models import BkLog
+    from apps.core.services.write_queue import get_write_queue
+
+    count = _scaled(1000, scale, minimum=50)
+    queue = get_write_queue()
+
+    def run():
+        for index in range(count):
+            BkLog.log('info', 'bench_write', f"benchmark row {index}", background_task='bench',
+                      task_category='other', context_data={'index': index})
+        queue.flush()
+
+    # A queued writer commits on its own connection, outside the rolled-back transaction
+    return run, count, lambda: BkLog.objects.filter(background_task='bench').delete()
@@ -74,6 +74,83 @@ DIRECTION_CHOICES = [
     (DIRECTION_NEUTRAL, 'Neutral'),
 ]
 
+# Mark-to-market events (apps/positions/services/position_updates.py)
+POSITION_PROFIT_ALERT_PCT = Decimal('5')  # Unrealized P&L crossing above +5% of entry value
+POSITION_LOSS_ALERT_PCT = Decimal('3')  # Unrealized P&L crossing below -3% of entry value
+POSITION_UPDATE_BATCH_SIZE = 500  # Rows per UPDATE statement
+
+# Portfolio greeks (apps/positions/services/portfolio_greeks.py)
+POSITION_GREEKS_RISK_FREE_RATE = 0.065  # Annualized rate for Black-Scholes greeks
+POSITION_GREEKS_DEFAULT_VOLATILITY = 15.0  # IV % when neither the chain nor India VIX has one
+
+# Exit / averaging rules (apps/positions/services/rule_engine.py)
+RULE_ACTION_EXIT = 'EXIT'
+RULE_ACTION_AVERAGE = 'AVERAGE'
+RULE_ACTION_ALERT = 'ALERT'
+
+RULE_ACTION_CHOICES = [
+    (RULE_ACTION_EXIT, 'Exit position'),
+    (RULE_ACTION_AVERAGE, 'Recommend averaging'),
+    (RULE_ACTION_ALERT, 'Alert only'),
+]
+
+# Built-in rule set: seeded into PositionRule and used while no rules are stored.
+# Conditions are ANDed; see rule_engine.FIELDS for the fields and OPERATORS for ops.
+DEFAULT_POSITION_RULES = [
+    {
+        'name': 'Stop-loss hit', 'strategy_type': '', 'action': RULE_ACTION_EXIT,
+        'reason': 'STOP_LOSS', 'priority': 10, 'is_mandatory': True,
+        'conditions': [{'field': 'stop_loss_hit', 'op': 'eq', 'value': True}],
+    },
+    {
+        'name': 'Target hit', 'strategy_type': '', 'action': RULE_ACTION_EXIT,
+        'reason': 'TARGET', 'priority': 20, 'is_mandatory': True,
+        'conditions': [{'field': 'target_hit', 'op': 'eq', 'value': True}],
+    },
+    {
+        'name': 'Thursday EOD exit at 50% profit', 'strategy_type': 'WEEKLY_NIFTY_STRANGLE',
+        'action': RULE_ACTION_EXIT, 'reason': 'EOD_THURSDAY', 'priority': 30, 'is_mandatory': False,
+        'conditions': [
+            {'field': 'weekday', 'op': 'eq', 'value': 'THURSDAY'},
+            {'field': 'time', 'op': 'gte', 'value': '15:15'},
+            {'field': 'profit_pct', 'op': 'gte', 'value': 50},
+        ],
+    },
+    {
+        'name': 'EOD exit at 50% profit', 'strategy_type': 'LLM_VALIDATED_FUTURES',
+        'action': RULE_ACTION_EXIT, 'reason': 'EOD', 'priority': 30, 'is_mandatory': False,
+        'conditions': [
+            {'field': 'time', 'op': 'gte', 'value': '15:15'},
+            {'field': 'profit_pct', 'op': 'gte', 'value': 50},
+        ],
+    },
+    {
+        'name': 'Expiry day exit', 'strategy_type': '', 'action': RULE_ACTION_EXIT,
+        'reason': 'EXPIRY_DAY', 'priority': 40, 'is_mandatory': True,
+        'conditions': [
+            {'field': 'days_to_expiry', 'op': 'eq', 'value': 0},
+            {'field': 'time', 'op': 'gte', 'value': '15:20'},
+        ],
+    },
+    {
+        'name': 'Friday exit before weekend expiry', 'strategy_type': '', 'action': RULE_ACTION_EXIT,
+        'reason': 'FRIDAY_EOD', 'priority': 50, 'is_mandatory': True,
+        'conditions': [
+            {'field': 'days_to_expiry', 'op': 'eq', 'value': 1},
+            {'field': 'weekday', 'op': 'eq', 'value': 'FRIDAY'},
+            {'field': 'time', 'op': 'gte', 'value': '15:15'},
+        ],
+    },
+    {
+        'name': 'Average futures at 1% adverse move', 'strategy_type': 'LLM_VALIDATED_FUTURES',
+        'action': RULE_ACTION_AVERAGE, 'reason': 'AVERAGE_DOWN', 'priority': 100, 'is_mandatory': False,
+        'conditions': [
+            {'field': 'move_pct', 'op': 'lte', 'value': -1},
+            {'field': 'averaging_count', 'op': 'lt', 'value': 3},
+        ],
+    },
+]
+
 # ============================================================================
 # STRATEGY CONSTANTS
 # ============================================================================
@@ -251,6 +328,109 @@ ORDER_STATUS_CHOICES = [
     (ORDER_STATUS_REJECTED, 'Rejected'),
 ]
 
+# ============================================================================
+# ORDER EXECUTION CONSTANTS
+# ============================================================================
+
+# Exchange freeze quantity (max quantity per single order) by underlying.
+# Child orders are sized so that no order ever exceeds these limits.
+EXCHANGE_FREEZE_QUANTITY = {
+    'NIFTY': 1800,
+    'BANKNIFTY': 900,
+    'FINNIFTY': 1800,
+    'MIDCPNIFTY': 2800,
+    'SENSEX': 1000,
+}
+
+NEO_MAX_LOTS_PER_ORDER = 20  # Neo API limit per order
+NEO_ORDER_RATE_PER_SECOND = 8  # Sustained order placement rate (Neo allows 10/sec)
+NEO_ORDER_WORKERS = 4  # Concurrent order placement workers
+ORDER_FILL_TIMEOUT_SECONDS = 15  # Max wait for a fill confirmation before moving on
+EXECUTION_PROGRESS_TTL = 600  # Seconds execution progress/events stay in cache
+
+# Market data refresh (Breeze allows 100 API calls per minute)
+BREEZE_API_RATE_PER_SECOND = 1.6  # Sustained quote/option-chain calls per second
+BREEZE_API_BURST = 5  # Calls allowed back-to-back before pacing kicks in
+MARKET_DATA_WORKERS = 4  # Concurrent per-symbol broker fetches
+MARKET_DATA_FETCH_RETRIES = 2  # Retries of a transient broker failure per call
+MARKET_DATA_RETRY_DELAY = 1.0  # Seconds before the first retry (doubles each attempt)
+MARKET_DATA_UPSERT_BATCH = 500  # Rows per bulk create/update
+
+# Trendlyne downloads (apps/data/providers/trendlyne_http.py)
+TRENDLYNE_HTTP_WORKERS = 6  # Concurrent export / screener requests
+TRENDLYNE_HTTP_TIMEOUT = 60  # Seconds per request (exports are a few MB)
+TRENDLYNE_HTTP_RETRIES = 2  # Retries of a 5xx / connection error per request
+TRENDLYNE_BROWSER_IDLE_SECONDS = 1800  # Pooled fallback browser is closed after this idle time
+
+# Trendlyne export cache (apps/data/services/trendlyne_parquet.py)
+TRENDLYNE_PARQUET_HASH_CHUNK = 1 << 20  # Bytes read per step while hashing an export
+TRENDLYNE_PARQUET_KEEP_DAYS = 14  # Conversions not used for this long are deleted
+
+# ============================================================================
+# BROKER SIMULATOR CONSTANTS
+# ============================================================================
+
+# Defaults of the local broker simulator (apps.brokers.integrations.simulator),
+# used when settings.BROKER_SIMULATOR is on
+SIMULATOR_ORDER_LATENCY_MS = 40  # Mean order-to-fill latency
+SIMULATOR_LATENCY_JITTER_MS = 15  # Std deviation of the latency
+SIMULATOR_REJECT_RATE = 0.0  # Fraction of orders rejected at random (RMS rejects come on top)
+SIMULATOR_PARTIAL_FILL_RATE = 0.0  # Fraction of fills delivered in two parts
+SIMULATOR_SLIPPAGE_BPS = 5  # Market order slippage beyond the touch
+SIMULATOR_SPREAD_BPS = 10  # Quoted bid/ask spread around the model price
+SIMULATOR_CAPITAL = Decimal('72000000')  # Starting funds (matches paper trading)
+SIMULATOR_SHORT_OPTION_MARGIN_PCT = 0.12  # Margin per short option as a share of underlying notional
+SIMULATOR_FUTURES_MARGIN_PCT = 0.12  # Margin per futures contract as a share of notional
+SIMULATOR_CHAIN_STRIKES = 20  # Strikes each side of ATM in a simulated option chain
+SIMULATOR_LOT_SIZES = {
+    'NIFTY': 75,
+    'BANKNIFTY': 35,
+    'FINNIFTY': 65,
+    'MIDCPNIFTY': 140,
+    'SENSEX': 20,
+}
+SIMULATOR_DEFAULT_LOT_SIZE = 500  # Stocks without an entry above
+SIMULATOR_INITIAL_PRICES = {
+    'NIFTY': 24000.0,
+    'BANKNIFTY': 52000.0,
+    'FINNIFTY': 23500.0,
+    'INDVIX': 14.0,
+}
+
+# ============================================================================
+# LIVE FEED CONSTANTS
+# ============================================================================
+
+LIVE_FEED_INTERVAL_SECONDS = 2  # Producer poll interval per topic
+LIVE_FEED_HEARTBEAT_SECONDS = 15  # Keep-alive comment sent to idle connections
+LIVE_FEED_QUEUE_SIZE = 100  # Per-connection buffer; oldest messages dropped when full
+LIVE_FEED_MAX_CONNECTION_SECONDS = 300  # Streams end after this; EventSource reconnects
+LIVE_FEED_TASK_EVENTS = 10  # Recent task events sent when a topic starts
+DASHBOARD_STALE_SECONDS = 300  # Broker data older than this triggers a background sync
+BROKER_SYNC_LOCK_SECONDS = 120  # One background sync per kind within this window
+
+# ============================================================================
+# DATABASE CONCURRENCY CONSTANTS
+# ============================================================================
+
+DB_LOCK_RETRIES = 5  # Retries of a write that still hits 'database is locked' after the busy timeout
+DB_LOCK_RETRY_DELAY = 0.2  # Seconds before the first retry (doubles each attempt)
+DB_WRITE_QUEUE_FLUSH_SECONDS = 0.5  # Writer queue flushes at least this often
+DB_WRITE_QUEUE_MAX_BATCH = 500  # Max queued writes committed in one transaction
+
+# ============================================================================
+# LOG LIFECYCLE CONSTANTS
+# ============================================================================
+
+# Days detail rows stay in each log table before they are rolled up and archived
+LOG_RETENTION_DAYS = {
+    'bk_log': 7,
+    'monitor_logs': 30,
+}
+LOG_LIFECYCLE_BATCH_SIZE = 500  # Rows archived and deleted per transaction
+LOG_LIFECYCLE_BATCH_PAUSE_SECONDS = 0.05  # Pause between batches so other writers get the lock
+LOG_LIFECYCLE_MAX_BATCHES = 200  # Batches per table in one run; the next run continues
+
 # ============================================================================
 # INSTRUMENT CONSTANTS
 # ============================================================================
@@ -293,6 +473,73 @@ TRADING_DAYS = [
     WEEKDAY_FRIDAY,
 ]
 
+# ============================================================================
+# TRADING CALENDAR CONSTANTS
+# ============================================================================
+
+# NSE trading holidays (weekday closures). Dates added through the
+# MarketHoliday table are merged on top of this list.
+NSE_MARKET_HOLIDAYS = {
+    '2025-02-26': 'Mahashivratri',
+    '2025-03-14': 'Holi',
+    '2025-03-31': 'Id-Ul-Fitr',
+    '2025-04-10': 'Shri Mahavir Jayanti',
+    '2025-04-14': 'Dr. Baba Saheb Ambedkar Jayanti',
+    '2025-04-18': 'Good Friday',
+    '2025-05-01': 'Maharashtra Day',
+    '2025-08-15': 'Independence Day',
+    '2025-08-27': 'Ganesh Chaturthi',
+    '2025-10-02': 'Mahatma Gandhi Jayanti / Dussehra',
+    '2025-10-21': 'Diwali Laxmi Pujan',
+    '2025-10-22': 'Balipratipada',
+    '2025-11-05': 'Prakash Gurpurb Sri Guru Nanak Dev',
+    '2025-12-25': 'Christmas',
+    '2026-01-26': 'Republic Day',
+    '2026-03-03': 'Holi',
+    '2026-03-26': 'Shri Ram Navami',
+    '2026-03-31': 'Shri Mahavir Jayanti',
+    '2026-04-03': 'Good Friday',
+    '2026-04-14': 'Dr. Baba Saheb Ambedkar Jayanti',
+    '2026-05-01': 'Maharashtra Day',
+    '2026-05-28': 'Bakri Id',
+    '2026-06-26': 'Muharram',
+    '2026-09-14': 'Ganesh Chaturthi',
+    '2026-10-02': 'Mahatma Gandhi Jayanti',
+    '2026-10-20': 'Dussehra',
+    '2026-11-10': 'Diwali Balipratipada',
+    '2026-11-24': 'Prakash Gurpurb Sri Guru Nanak Dev',
+    '2026-12-25': 'Christmas',
+}
+
+# Expiry weekday per underlying. Weekly contracts expire on 'weekly', monthly
+# contracts on the last 'monthly' weekday of the month. An expiry that falls
+# on a holiday moves to the previous trading day.
+# NOTE: Since September 2025 every NSE derivative expires on a Tuesday: NIFTY
+# weekly on Tuesday, and all monthly contracts (index and stock) on the last
+# Tuesday of the month
+EXPIRY_SCHEDULES = {
+    'NIFTY': {'weekly': WEEKDAY_TUESDAY, 'monthly': WEEKDAY_TUESDAY},
+    'BANKNIFTY': {'weekly': WEEKDAY_WEDNESDAY, 'monthly': WEEKDAY_TUESDAY},
+    'FINNIFTY': {'weekly': WEEKDAY_TUESDAY, 'monthly': WEEKDAY_TUESDAY},
+}
+
+# Stocks and other underlyings only have monthly contracts
+DEFAULT_EXPIRY_SCHEDULE = {'weekly': None, 'monthly': WEEKDAY_TUESDAY}
+
+TRADING_CALENDAR_HORIZON_DAYS = 400  # Expiry/trading-day tables built this far ahead
+TRADING_CALENDAR_CACHE_TIMEOUT = 24 * 60 * 60  # Cached snapshot lifetime (seconds)
+TRADING_CALENDAR_VERSION_CHECK_SECONDS = 60  # How often a process checks the calendar version stamp
+
+# ============================================================================
+# BACKTEST CONSTANTS
+# ============================================================================
+
+BACKTEST_VIX_SYMBOL = 'INDVIX'  # Breeze stock code of India VIX candles
+BACKTEST_DEFAULT_VIX = 15.0  # Used for days without a stored VIX candle
+BACKTEST_RISK_FREE_RATE = 0.065  # Annualized rate for model option prices
+BACKTEST_MIN_TRADES = 20  # Simulated trades before a sweep result is actionable
+BACKTEST_CONFIDENCE_PER_TRADE = 2  # Confidence % per simulated trade (capped at 100)
+
 # ============================================================================
 # SECTOR ANALYSIS CONSTANTS
 # ============================================================================
@@ -302,6 +549,13 @@ SECTOR_SIGNAL_BEARISH = 'STRONG_BEARISH'
 SECTOR_SIGNAL_MIXED = 'MIXED'
 SECTOR_SIGNAL_NEUTRAL = 'NEUTRAL'
 
+# Sector performance cache (apps/data/services/sector_performance.py)
+SECTOR_RETURN_WINDOWS = (1, 3, 7, 21)  # Sessions; the sector filter uses 3 / 7 / 21
+SECTOR_BREADTH_WINDOW = 7  # Advancers / decliners measured over this many sessions
+SECTOR_HISTORY_DAYS = 45  # Calendar days of daily closes loaded per refresh
+SECTOR_BENCHMARK_SYMBOL = 'NIFTY'  # Relative strength is measured against this index
+SECTOR_CACHE_CHECK_SECONDS = 60  # How often a process checks for a newer snapshot
+
 # ============================================================================
 # OI ANALYSIS CONSTANTS
 # ============================================================================
@@ -324,6 +578,82 @@ LLM_MODEL_DEEPSEEK = 'deepseek-coder:33b'
 LLM_MAX_RETRIES = 3
 LLM_TIMEOUT_SECONDS = 30
 
+# LLM request scheduler (apps.llm.services.llm_scheduler)
+LLM_VLLM_MAX_INFLIGHT = 8  # Concurrent requests to the vLLM server (it batches them on the GPU)
+LLM_OLLAMA_MAX_INFLIGHT = 2  # Concurrent requests to Ollama (match OLLAMA_NUM_PARALLEL on the server)
+LLM_REQUEST_TIMEOUT_SECONDS = 300  # One generation, time spent queued excluded
+LLM_NEWS_WORKERS = 4  # Articles of a news batch analysed at once
+
+# ============================================================================
+# ANALYSIS JOB CONSTANTS
+# ============================================================================
+
+ANALYSIS_JOB_THREADS = 4  # Worker threads of the in-process executor (no Celery worker)
+ANALYSIS_RESULT_CACHE_MINUTES = 15  # Reuse a contract's analysis while its input data is unchanged
+ANALYSIS_PROGRESS_MAX_ITEMS = 100  # Item results returned per progress request
+
+# ============================================================================
+# LEVEL 2 REPORT CONSTANTS
+# ============================================================================
+
+LEVEL2_ANALYZER_WORKERS = 4  # Analyzers of one report run concurrently on this many threads
+LEVEL2_BATCH_WORKERS = 4  # Reports built at once by a watchlist batch
+LEVEL2_BATCH_MAX_SYMBOLS = 50  # Symbols accepted per batch request
+LEVEL2_REPORT_CACHE_SECONDS = 900  # A report is reused while its data version is unchanged
+LEVEL2_FRESHNESS_CHECK_SECONDS = 300  # Min. interval between background data freshness checks
+LEVEL2_CONTRACTS_PER_SYMBOL = 50  # ContractData rows loaded per symbol (latest expiry, highest OI)
+
+# ============================================================================
+# LEARNING ANALYTICS CONSTANTS
+# ============================================================================
+
+LEARNING_VIX_BUCKET_EDGES = (12, 15, 18, 22)  # India VIX at entry: <12, 12-15, 15-18, 18-22, 22+
+LEARNING_STRIKE_DISTANCE_EDGES = (2, 3, 4, 5, 6)  # Strangle half-width as % of the mid strike
+LEARNING_CONFIDENCE_Z = 1.96  # 95% intervals on bucket win rates and average P&L
+LEARNING_AGGREGATE_REBUILD_THRESHOLD = 500  # Pending trades above which aggregates are rebuilt in SQL
+
+# ============================================================================
+# FORECASTER INDEX CONSTANTS
+# ============================================================================
+
+FORECASTER_INDEX_CHECK_SECONDS = 5  # Min. interval between CSV mtime checks of the forecaster index
+
+# ============================================================================
+# BENCHMARK CONSTANTS
+# ============================================================================
+
+BENCHMARK_DEFAULT_ROUNDS = 5  # Timed rounds per benchmark (after warmup)
+BENCHMARK_WARMUP_ROUNDS = 1
+BENCHMARK_REGRESSION_THRESHOLD = 0.25  # Median slower than the baseline by >25% is a regression
+BENCHMARK_NOISE_FLOOR_MS = 2.0  # Changes smaller than this are never flagged
+BENCHMARK_HISTORY_LIMIT = 200  # Runs kept in the history file
+
+# ============================================================================
+# TELEMETRY CONSTANTS
+# ============================================================================
+
+TELEMETRY_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+TELEMETRY_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)  # DB queries per request / task
+TELEMETRY_FLUSH_SECONDS = 15  # Min. interval between snapshot writes of one process
+TELEMETRY_PAGE_ROWS = 50  # Slowest series listed per table on the telemetry page
+
+# ============================================================================
+# IMPORT PROFILE CONSTANTS
+# ============================================================================
+
+# Startup wall-time budget per target (manage.py import_profile)
+IMPORT_PROFILE_BUDGET_MS = {
+    'setup': 1500,   # django.setup(): every management command
+    'worker': 2500,  # Celery worker: setup + every app's tasks module
+    'web': 4000,     # Web worker: setup + URLconf and all views
+}
+
+# Libraries that must load lazily, behind the service that needs them
+IMPORT_PROFILE_HEAVY_MODULES = (
+    'pandas', 'scipy', 'pyarrow', 'selenium', 'chromedriver_autoinstaller',
+    'chromadb', 'sentence_transformers', 'torch', 'breeze_connect', 'neo_api_client', 'openai',
+)
+
 # ============================================================================
 # PAPER TRADING
 # ============================================================================
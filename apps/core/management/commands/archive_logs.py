@@ -0,0 +1,88 @@
+"""
+Management command to roll up and archive old log rows
+
+Runs the log lifecycle (apps/core/services/log_lifecycle.py) once: BkLog and
+MonitorLog rows past their retention window are summarised into LogRollup,
+appended to the gzipped archive files and deleted, in small batches.
+
+Usage:
+    python manage.py archive_logs                         # all tables, default retention
+    python manage.py archive_logs bk_log --days 3         # one table, shorter retention
+    python manage.py archive_logs --max-batches 0         # until the backlog is cleared
+    python manage.py archive_logs --summary --hours 24    # per-task health, rollups + live rows
+"""
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.constants import LOG_LIFECYCLE_BATCH_SIZE, LOG_LIFECYCLE_MAX_BATCHES
+from apps.core.services.log_lifecycle import SOURCES, LogLifecycle, task_summary
+
+
+class Command(BaseCommand):
+    help = 'Roll up and archive log rows past their retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tables', nargs='*', help=f"Log tables (default: {', '.join(SOURCES)})")
+        parser.add_argument('--days', type=int, help='Retention in days for the selected tables')
+        parser.add_argument('--batch-size', type=int, default=LOG_LIFECYCLE_BATCH_SIZE,
+                            help=f'Rows per transaction (default: {LOG_LIFECYCLE_BATCH_SIZE})')
+        parser.add_argument('--max-batches', type=int, default=LOG_LIFECYCLE_MAX_BATCHES,
+                            help=f'Batches per table, 0 for no limit (default: {LOG_LIFECYCLE_MAX_BATCHES})')
+        parser.add_argument('--archive-dir', help='Archive directory (default: settings.LOG_ARCHIVE_DIR)')
+        parser.add_argument('--summary', action='store_true', help='Print per-task counts instead of archiving')
+        parser.add_argument('--hours', type=int, default=24, help='Summary window in hours (default: 24)')
+        parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or list(SOURCES)
+        unknown = [table for table in tables if table not in SOURCES]
+        if unknown:
+            raise CommandError(f"Unknown log table: {', '.join(unknown)} (choose from {', '.join(SOURCES)})")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        if options['summary']:
+            return self._summary(tables, options)
+
+        lifecycle = LogLifecycle(
+            archive_dir=options['archive_dir'],
+            retention_days={table: options['days'] for table in tables} if options['days'] is not None else None,
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'] or float('inf'),
+        )
+        stats = lifecycle.run(tables)
+
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        for table, result in stats.items():
+            state = 'done' if result['complete'] else 'more to do, continues next run'
+            self.stdout.write(self.style.SUCCESS(
+                f"{table}: archived {result['archived']} rows before {result['cutoff'][:16]} "
+                f"in {result['batches']} batches ({state})"
+            ))
+            for path in result['files']:
+                self.stdout.write(f"  {path}")
+
+    def _summary(self, tables, options):
+        since = timezone.now() - timedelta(hours=options['hours'])
+        summaries = {table: task_summary(table, since) for table in tables}
+
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2, default=str))
+            return
+
+        for table, rows in summaries.items():
+            self.stdout.write(self.style.SUCCESS(f"\n=== {table}: last {options['hours']} hours ==="))
+            self.stdout.write(f"  {'Task':<40} {'Rows':>8} {'Errors':>8} {'Rate':>7} {'Avg ms':>8} {'Max ms':>8}")
+            for row in rows:
+                avg = f"{row['avg_ms']:.0f}" if row['avg_ms'] is not None else '-'
+                self.stdout.write(
+                    f"  {row['task'][:40]:<40} {row['count']:>8} {row['error_count']:>8} "
+                    f"{row['error_rate']:>7.1%} {avg:>8} {row['max_ms'] or '-':>8}"
+                )
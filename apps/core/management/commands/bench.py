@@ -0,0 +1,113 @@
+"""
+Management command to benchmark the trading hot paths
+
+Runs the suite in apps/core/benchmarks against synthetic chains, candles,
+accounts and positions (created in a transaction that is rolled back),
+prints median timings and compares them with the baseline or previous run.
+
+Usage:
+    python manage.py bench --list
+    python manage.py bench                                   # full suite, compare with baseline
+    python manage.py bench analytics check_risk_limits      # by group or name
+    python manage.py bench --scale 0.1 --save               # quick run, appended to history
+    python manage.py bench --baseline                        # save this run as the new baseline
+    python manage.py bench --fail-on-regression --threshold 0.3
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.benchmarks import (
+    compare_runs,
+    get_benchmarks,
+    load_history,
+    regression_thresholds,
+    run_suite,
+    save_history,
+)
+from apps.core.constants import BENCHMARK_REGRESSION_THRESHOLD
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the trading hot paths and check for regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('benchmarks', nargs='*', help='Benchmark names or groups (default: all)')
+        parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+        parser.add_argument('--scale', type=float, default=1.0, help='Fixture size multiplier (default: 1.0)')
+        parser.add_argument('--rounds', type=int, help='Timed rounds per benchmark')
+        parser.add_argument('--save', action='store_true', help='Append this run to the history file')
+        parser.add_argument('--baseline', action='store_true', help='Save this run as the baseline')
+        parser.add_argument('--compare', choices=['baseline', 'last', 'none'], default='baseline',
+                            help='Reference run (default: baseline, falling back to the last run)')
+        parser.add_argument('--threshold', type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                            help=f'Allowed slowdown as a fraction (default: {BENCHMARK_REGRESSION_THRESHOLD})')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if any benchmark regressed')
+        parser.add_argument('--history', help='History file (default: settings.BENCHMARK_HISTORY_PATH)')
+        parser.add_argument('--json', action='store_true', help='Print the run and comparison as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            benchmarks = get_benchmarks(options['benchmarks'])
+        except KeyError as e:
+            raise CommandError(f"Unknown benchmark or group: {e.args[0]}")
+
+        if options['list']:
+            for bench in benchmarks:
+                self.stdout.write(f"{bench.name:<30} {bench.group:<12} {bench.description}")
+            return
+
+        def progress(name, result):
+            if not options['json']:
+                self.stdout.write(f"  {name:<30} {self._format_result(result)}")
+
+        if not options['json']:
+            self.stdout.write(self.style.SUCCESS(f"\n=== Running {len(benchmarks)} benchmarks (scale {options['scale']}) ==="))
+        run = run_suite(benchmarks, scale=options['scale'], rounds=options['rounds'], progress=progress)
+
+        history = load_history(options['history'])
+        reference = None
+        if options['compare'] == 'baseline':
+            reference = history['baseline'] or (history['runs'][-1] if history['runs'] else None)
+        elif options['compare'] == 'last' and history['runs']:
+            reference = history['runs'][-1]
+        rows = compare_runs(run, reference, threshold=options['threshold'], overrides=regression_thresholds())
+
+        if options['save'] or options['baseline']:
+            history['runs'].append(run)
+            if options['baseline']:
+                history['baseline'] = run
+            save_history(history, options['history'])
+
+        if options['json']:
+            self.stdout.write(json.dumps({'run': run, 'comparison': rows}, indent=2))
+        else:
+            self._print_comparison(rows, reference)
+
+        regressions = [row['name'] for row in rows if row['status'] == 'regression']
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"Performance regression in: {', '.join(regressions)}")
+
+    def _format_result(self, result):
+        if result['status'] != 'ok':
+            return f"{result['status'].upper()}: {result.get('error', '')}"
+        rate = f"{result['items_per_sec']:>12,.1f} items/s" if result['items_per_sec'] else ''
+        return f"median {result['median_ms']:>10.2f} ms  p95 {result['p95_ms']:>10.2f} ms  {rate}"
+
+    def _print_comparison(self, rows, reference):
+        if reference is None:
+            self.stdout.write("\nNo reference run to compare with (use --save or --baseline)")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== Compared with {reference.get('commit') or 'run'} at {reference['timestamp']} ==="
+        ))
+        styles = {'regression': self.style.ERROR, 'improvement': self.style.SUCCESS}
+        for row in rows:
+            if row['change_pct'] is None:
+                line = f"{row['name']:<30} {row['status']}"
+            else:
+                line = (f"{row['name']:<30} {row['reference_ms']:>10.2f} -> {row['current_ms']:>10.2f} ms "
+                        f"({row['change_pct']:+.1f}%)  {row['status']}")
+            self.stdout.write(styles.get(row['status'], str)(line))
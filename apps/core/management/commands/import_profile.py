@@ -0,0 +1,80 @@
+"""
+Management command to profile process startup imports
+
+Runs a fresh interpreter with ``python -X importtime`` for each target and
+reports startup time, peak memory, the slowest imports and any heavy library
+(pandas, selenium, chromadb, breeze_connect, ...) loaded at startup, with
+the first-party module that imported it.
+
+Usage:
+    python manage.py import_profile                          # setup and worker
+    python manage.py import_profile web --top 25
+    python manage.py import_profile --modules apps.risk.tasks apps.positions.tasks
+    python manage.py import_profile worker --fail-over-budget --budget-ms 2000
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.services.import_profile import TARGETS, profile_startup
+
+
+class Command(BaseCommand):
+    help = 'Profile import time and memory of worker / command / web startup'
+    requires_system_checks = []  # The checks import the URLconf, which is what the web target measures
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='*', choices=[[], *TARGETS], default=[],
+                            help=f"Startup targets: {', '.join(TARGETS)} (default: setup worker)")
+        parser.add_argument('--modules', nargs='+', default=[], help='Profile importing these modules after setup')
+        parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to show (default: 15)')
+        parser.add_argument('--budget-ms', type=float, help='Override the startup budget of every target')
+        parser.add_argument('--allow-heavy', action='store_true', help='Do not flag heavy libraries')
+        parser.add_argument('--fail-over-budget', action='store_true',
+                            help='Exit with an error if a target is over budget or loads a heavy library')
+        parser.add_argument('--json', action='store_true', help='Print the profiles as JSON')
+
+    def handle(self, *args, **options):
+        targets = [(target, ()) for target in options['targets'] or ([] if options['modules'] else ['setup', 'worker'])]
+        if options['modules']:
+            targets.append(('modules', options['modules']))
+
+        profiles = []
+        for target, modules in targets:
+            try:
+                profiles.append(profile_startup(
+                    target, modules, top=options['top'],
+                    budget_ms=options['budget_ms'], allow_heavy=options['allow_heavy'],
+                ))
+            except RuntimeError as e:
+                raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps([profile.to_dict() for profile in profiles], indent=2))
+        else:
+            for profile in profiles:
+                self._print_profile(profile)
+
+        violations = [f"{p.target}: {violation}" for p in profiles for violation in p.violations]
+        if violations and options['fail_over_budget']:
+            raise CommandError("Import profile over budget:\n  " + "\n  ".join(violations))
+
+    def _print_profile(self, profile):
+        budget = f" / budget {profile.budget_ms:.0f} ms" if profile.budget_ms is not None else ''
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{profile.target}"))
+        self.stdout.write(
+            f"  startup {profile.wall_ms:.0f} ms{budget}, imports {profile.import_ms:.0f} ms, "
+            f"{profile.module_count} modules, peak RSS {profile.max_rss_mb:.0f} MB"
+        )
+        self.stdout.write("  slowest imports:")
+        for row in profile.slowest:
+            self.stdout.write(f"    {row['cumulative_ms']:>9.1f} ms  {row['module']}")
+        for library, importer in profile.heavy_modules.items():
+            self.stdout.write(f"  heavy: {library} (via {importer or 'a third-party module'})")
+        for module, error in profile.errors.items():
+            self.stdout.write(self.style.WARNING(f"  import failed: {module}: {error}"))
+        for violation in profile.violations:
+            self.stdout.write(self.style.ERROR(f"  OVER BUDGET: {violation}"))
+        if not profile.violations:
+            self.stdout.write(self.style.SUCCESS("  within budget"))
@@ -0,0 +1,74 @@
+"""
+Management command to check the query plans of the hot queries
+
+Prints the database's plan for each query the monitors, dashboards, order
+screens and screeners issue (apps/core/services/query_plans.py) and flags
+the ones that read a whole table or sort without an index.
+
+Usage:
+    python manage.py query_plans                     # all hot queries
+    python manage.py query_plans position contract   # by group or name
+    python manage.py query_plans --verbose           # print SQL and plans
+    python manage.py query_plans --fail-on-scan      # exit with an error on any full scan (CI)
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.services.query_plans import check_query_plans, get_hot_queries
+
+
+class Command(BaseCommand):
+    help = 'Check the query plans of the hot queries for full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', help='Query names or groups (default: all)')
+        parser.add_argument('--list', action='store_true', help='List hot queries and exit')
+        parser.add_argument('--verbose', action='store_true', help='Print the SQL and plan of every query')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Exit with an error if any query does a full table scan')
+        parser.add_argument('--json', action='store_true', help='Print the plans as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            queries = get_hot_queries(options['queries'])
+        except KeyError as e:
+            raise CommandError(f"Unknown query or group: {e.args[0]}")
+
+        if options['list']:
+            for query in queries:
+                self.stdout.write(f"{query.name:<32} {query.description}")
+            return
+
+        plans = check_query_plans([query.name for query in queries])
+
+        if options['json']:
+            self.stdout.write(json.dumps([{
+                'name': p.name, 'ok': p.ok, 'full_scans': p.full_scans, 'sorts': p.sorts, 'sql': p.sql, 'plan': p.plan,
+            } for p in plans], indent=2))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"\n=== Query plans of {len(plans)} hot queries ==="))
+            for plan in plans:
+                if plan.ok:
+                    status = self.style.SUCCESS('OK  ')
+                else:
+                    status = self.style.ERROR('SCAN')
+                notes = []
+                if plan.full_scans:
+                    notes.append(f"full scan of {', '.join(plan.full_scans)}")
+                if plan.sorts:
+                    notes.append(f"{plan.sorts} sort(s) without an index")
+                self.stdout.write(f"  {status} {plan.name:<32} {'; '.join(notes) or plan.description}")
+                if options['verbose'] or not plan.ok:
+                    if options['verbose']:
+                        self.stdout.write(f"       {plan.sql}")
+                    for line in plan.plan.splitlines():
+                        self.stdout.write(f"       | {line}")
+
+            scans = [p.name for p in plans if not p.ok]
+            summary = f"\n{len(plans) - len(scans)} of {len(plans)} queries use an index"
+            self.stdout.write(self.style.WARNING(summary) if scans else self.style.SUCCESS(summary))
+
+        if options['fail_on_scan'] and any(not p.ok for p in plans):
+            raise CommandError(f"Full table scans in: {', '.join(p.name for p in plans if not p.ok)}")
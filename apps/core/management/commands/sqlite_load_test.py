@@ -0,0 +1,203 @@
+"""
+Management command to load-test SQLite concurrency settings
+
+Runs concurrent readers and writers against a scratch SQLite file (never the
+application database) and reports throughput, latency and lock errors for:
+
+1. default   - SQLite defaults (rollback journal, synchronous=FULL)
+2. tuned     - settings.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, cache/mmap)
+3. batched   - tuned, with writers committing in batches like the writer queue
+
+Each worker thread uses its own connection, like separate processes
+(runserver, Celery workers, the background-task runner) would.
+
+Usage:
+    python manage.py sqlite_load_test
+    python manage.py sqlite_load_test --readers 8 --writers 4 --duration 10 --json
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.utils.db import apply_sqlite_pragmas, is_database_locked
+
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+SCHEMA = """
+CREATE TABLE bk_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    level TEXT NOT NULL,
+    action TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX bk_log_timestamp ON bk_log (timestamp);
+"""
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_load_test(path, pragmas, readers, writers, duration, batch_size=1, busy_timeout=5.0):
+    """
+    Run one load test profile against a fresh database file.
+
+    Returns:
+        dict: reads/writes per second, p95 latencies (ms), lock errors
+    """
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    setup = sqlite3.connect(path, timeout=busy_timeout)
+    apply_sqlite_pragmas(setup.cursor(), pragmas)
+    setup.executescript(SCHEMA)
+    setup.executemany(
+        "INSERT INTO bk_log (timestamp, level, action, message) VALUES (?, 'info', 'seed', ?)",
+        [(time.time(), f"seed row {n}") for n in range(5000)]
+    )
+    setup.commit()
+    setup.close()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {'reads': 0, 'writes': 0, 'lock_errors': 0, 'read_ms': [], 'write_ms': []}
+
+    def connect():
+        conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+        apply_sqlite_pragmas(conn.cursor(), {k: v for k, v in pragmas.items() if k != 'journal_mode'})
+        return conn
+
+    def reader():
+        conn = connect()
+        reads, latencies, errors = 0, [], 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                conn.execute(
+                    "SELECT level, COUNT(*) FROM bk_log WHERE timestamp > ? GROUP BY level",
+                    (time.time() - 60,)
+                ).fetchall()
+                conn.execute("SELECT * FROM bk_log ORDER BY id DESC LIMIT 20").fetchall()
+                reads += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+            except sqlite3.OperationalError as e:
+                if not is_database_locked(e):
+                    raise
+                errors += 1
+        conn.close()
+        with lock:
+            results['reads'] += reads
+            results['read_ms'].extend(latencies)
+            results['lock_errors'] += errors
+
+    def writer(worker):
+        conn = connect()
+        writes, latencies, errors = 0, [], 0
+        while not stop.is_set():
+            rows = [(time.time(), f"worker {worker} tick") for _ in range(batch_size)]
+            started = time.perf_counter()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO bk_log (timestamp, level, action, message) VALUES (?, 'info', 'tick', ?)",
+                    rows
+                )
+                conn.execute("COMMIT")
+                writes += len(rows)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if not is_database_locked(e):
+                    raise
+                errors += 1
+            # Hot loops produce rows in bursts, not back-to-back
+            time.sleep(0.001 * batch_size)
+        conn.close()
+        with lock:
+            results['writes'] += writes
+            results['write_ms'].extend(latencies)
+            results['lock_errors'] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'reads_per_sec': round(results['reads'] / duration, 1),
+        'writes_per_sec': round(results['writes'] / duration, 1),
+        'read_p95_ms': round(_percentile(results['read_ms'], 95), 2),
+        'write_p95_ms': round(_percentile(results['write_ms'], 95), 2),
+        'lock_errors': results['lock_errors'],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Load-test SQLite reader/writer throughput with default and tuned settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads')
+        parser.add_argument('--writers', type=int, default=4, help='Concurrent writer threads')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per profile')
+        parser.add_argument('--batch-size', type=int, default=50, help='Rows per commit in the batched profile')
+        parser.add_argument('--busy-timeout', type=float, default=1.0,
+                            help='Seconds a connection waits for a lock')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        tuned = getattr(settings, 'SQLITE_PRAGMAS', None) or {'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+        profiles = [
+            ('default', DEFAULT_PRAGMAS, 1),
+            ('tuned', tuned, 1),
+            ('batched', tuned, options['batch_size']),
+        ]
+
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'load_test.sqlite3')
+            for name, pragmas, batch_size in profiles:
+                if not options['json']:
+                    self.stdout.write(f"Running '{name}' profile for {options['duration']}s...")
+                results[name] = run_load_test(
+                    path, pragmas,
+                    readers=options['readers'],
+                    writers=options['writers'],
+                    duration=options['duration'],
+                    batch_size=batch_size,
+                    busy_timeout=options['busy_timeout'],
+                )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(self.style.SUCCESS('\n=== SQLite Load Test ==='))
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers, "
+            f"{options['duration']}s per profile\n"
+        )
+        header = f"{'Profile':<10}{'Reads/s':>12}{'Writes/s':>12}{'Read p95':>12}{'Write p95':>12}{'Locked':>10}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<10}{row['reads_per_sec']:>12}{row['writes_per_sec']:>12}"
+                f"{row['read_p95_ms']:>10}ms{row['write_p95_ms']:>10}ms{row['lock_errors']:>10}"
+            )
@@ -11,9 +11,36 @@ from django.shortcuts import render
 from django.conf import settings
 from django.template import TemplateDoesNotExist, TemplateSyntaxError
 
+from apps.core.services import telemetry
+
 logger = logging.getLogger(__name__)
 
 
+class TelemetryMiddleware:
+    """
+    Records wall time, DB queries, cache reads and broker time of every
+    request, by view name (apps.core.services.telemetry).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        scope = telemetry.start(telemetry.KIND_VIEW, '<unresolved>')
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            if scope is not None:
+                match = getattr(request, 'resolver_match', None)
+                if match is not None:
+                    scope.name = match.view_name or match._func_path
+                scope.outcome = f'{status // 100}xx'
+                telemetry.finish(scope)
+
+
 class ErrorHandlingMiddleware:
     """
     Middleware to catch and handle errors gracefully.
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_systemsettings_bklog_context_data_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MarketHoliday",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateField(help_text="Holiday date", unique=True),
+                ),
+                (
+                    "description",
+                    models.CharField(
+                        blank=True, help_text="Holiday name", max_length=100
+                    ),
+                ),
+                (
+                    "exchange",
+                    models.CharField(
+                        default="NSE",
+                        help_text="Exchange the holiday applies to",
+                        max_length=10,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "market_holiday",
+                "ordering": ["date"],
+            },
+        ),
+    ]
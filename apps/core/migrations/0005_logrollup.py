@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_marketholiday'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('bk_log', 'Background Tasks'), ('monitor_logs', 'Position Monitoring')], max_length=20)),
+                ('hour', models.DateTimeField(help_text='Start of the hour')),
+                ('task', models.CharField(blank=True, max_length=100)),
+                ('category', models.CharField(blank=True, max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('warning_count', models.IntegerField(default=0)),
+                ('timed_count', models.IntegerField(default=0, help_text='Rows with an execution time')),
+                ('total_ms', models.BigIntegerField(default=0, help_text='Sum of execution times (ms)')),
+                ('max_ms', models.IntegerField(default=0, help_text='Longest execution time (ms)')),
+            ],
+            options={
+                'db_table': 'log_rollup',
+                'ordering': ['-hour'],
+                'indexes': [models.Index(fields=['source', '-hour'], name='log_rollup_source_b11c67_idx')],
+                'unique_together': {('source', 'hour', 'task', 'category')},
+            },
+        ),
+    ]
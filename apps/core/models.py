@@ -171,6 +171,35 @@ class TradingSchedule(models.Model):
         }
 
 
+class MarketHoliday(models.Model):
+    """
+    Exchange trading holidays
+
+    Merged with NSE_MARKET_HOLIDAYS by the trading calendar service. Use this
+    table to add holidays announced after a release; the calendar picks them
+    up on its next daily rebuild.
+    """
+
+    date = models.DateField(unique=True, help_text="Holiday date")
+    description = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Holiday name"
+    )
+    exchange = models.CharField(
+        max_length=10,
+        default='NSE',
+        help_text="Exchange the holiday applies to"
+    )
+
+    class Meta:
+        db_table = 'market_holiday'
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} - {self.description or 'Holiday'}"
+
+
 class NseFlag(models.Model):
     """
     Runtime configuration flags and state variables
@@ -347,11 +376,17 @@ class BkLog(models.Model):
         """
         Convenience method to create log entries
 
+        Goes through the writer queue: with DB_WRITE_QUEUE_ENABLED the row is
+        committed in the next batch and None is returned.
+
         Example:
             BkLog.log('info', 'fetch_data', 'Started fetching market data',
                      background_task='fetch_trendlyne_data', task_category='data')
         """
-        return cls.objects.create(
+        from apps.core.services.write_queue import get_write_queue
+
+        return get_write_queue().create(
+            cls,
             level=level,
             action=action,
             message=message,
@@ -365,6 +400,62 @@ class BkLog(models.Model):
         )
 
 
+class LogRollup(models.Model):
+    """
+    Hourly summary of archived log rows
+
+    Written by the log lifecycle (apps.core.services.log_lifecycle) when detail
+    rows past their retention window are moved to the archive files, so task
+    health stays queryable without keeping every row.
+
+    Fields:
+        source: Log table the rows came from
+        hour: Start of the local hour
+        task: Background task (BkLog) or check type (MonitorLog)
+        category: Task category (BkLog) or 'position' (MonitorLog)
+        count: Rows in the hour
+        error_count: Failed / error rows (MonitorLog: ALERT and ACTION_REQUIRED)
+        warning_count: Warning rows
+        timed_count / total_ms / max_ms: Rows with an execution time and their totals
+    """
+
+    SOURCE_CHOICES = [
+        ('bk_log', 'Background Tasks'),
+        ('monitor_logs', 'Position Monitoring'),
+    ]
+
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    hour = models.DateTimeField(help_text="Start of the hour")
+    task = models.CharField(max_length=100, blank=True)
+    category = models.CharField(max_length=20, blank=True)
+
+    count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    warning_count = models.IntegerField(default=0)
+    timed_count = models.IntegerField(default=0, help_text="Rows with an execution time")
+    total_ms = models.BigIntegerField(default=0, help_text="Sum of execution times (ms)")
+    max_ms = models.IntegerField(default=0, help_text="Longest execution time (ms)")
+
+    class Meta:
+        db_table = 'log_rollup'
+        ordering = ['-hour']
+        unique_together = ['source', 'hour', 'task', 'category']
+        indexes = [
+            models.Index(fields=['source', '-hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.hour:%Y-%m-%d %H}:00 {self.task}: {self.count} ({self.error_count} errors)"
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.count if self.count else 0.0
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.timed_count if self.timed_count else None
+
+
 class DayReport(models.Model):
     """
     Daily trading report
@@ -0,0 +1,166 @@
+"""
+Dashboard Data Service
+
+Builds the dashboard snapshot (positions, P&L, orders, risk state, learning
+status) from the database and keeps it fresh with background broker syncs.
+
+Broker syncs never run inside a page request: callers ask for a sync with
+`schedule_broker_sync()`, which starts it on a background thread and uses a
+cache lock so N open tabs (or N refresh clicks) cost one upstream fetch.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.core.constants import (
+    BROKER_SYNC_LOCK_SECONDS,
+    DASHBOARD_STALE_SECONDS,
+    LIVE_FEED_TASK_EVENTS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _sync_positions():
+    from apps.positions.services.position_sync import sync_positions_from_broker
+    return sync_positions_from_broker()
+
+
+def _sync_orders():
+    from apps.brokers.services.order_sync import sync_orders_from_broker
+    return sync_orders_from_broker()
+
+
+def _update_pnl():
+    from apps.positions.services.pnl_updater import update_all_position_pnl
+    return update_all_position_pnl()
+
+
+# Background sync jobs by kind
+BROKER_SYNC_JOBS = {
+    'positions': _sync_positions,
+    'orders': _sync_orders,
+    'pnl': _update_pnl,
+}
+
+
+def schedule_broker_sync(kind: str) -> bool:
+    """
+    Start a broker sync in the background unless one is already running.
+
+    Args:
+        kind: 'positions', 'orders' or 'pnl'
+
+    Returns:
+        bool: True if a sync was started, False if one is already in flight
+    """
+    job = BROKER_SYNC_JOBS.get(kind)
+    if job is None:
+        raise ValueError(f"Unknown broker sync: {kind}")
+
+    lock_key = f"dashboard_sync_lock:{kind}"
+    if not cache.add(lock_key, True, BROKER_SYNC_LOCK_SECONDS):
+        logger.debug(f"Broker sync '{kind}' already in progress")
+        return False
+
+    def run():
+        try:
+            job()
+            logger.info(f"Background broker sync '{kind}' complete")
+        except Exception as e:
+            logger.warning(f"Background broker sync '{kind}' failed: {e}")
+        finally:
+            cache.delete(lock_key)
+            close_old_connections()
+
+    threading.Thread(target=run, name=f"broker-sync-{kind}", daemon=True).start()
+    return True
+
+
+def build_dashboard_snapshot() -> Dict:
+    """
+    Current dashboard state from the database.
+
+    Returns:
+        dict: {'positions', 'accounts', 'orders', 'pnl', 'risk', 'learning', 'stale'}
+    """
+    from apps.accounts.models import BrokerAccount
+    from apps.analytics.models import LearningSession
+    from apps.brokers.models import Order
+    from apps.core.utils import format_currency, local_day_range
+    from apps.positions.models import Position
+    from apps.risk.models import CircuitBreaker, RiskLimit
+
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=DASHBOARD_STALE_SECONDS)
+
+    positions = list(Position.objects.filter(status='ACTIVE').only('unrealized_pnl', 'updated_at'))
+    total_pnl = sum((pos.unrealized_pnl or Decimal('0') for pos in positions), Decimal('0'))
+    positions_updated = max((pos.updated_at for pos in positions), default=None)
+
+    start, end = local_day_range()
+    today_orders = Order.objects.filter(created_at__gte=start, created_at__lt=end)
+    last_order = today_orders.order_by('-created_at').values_list('created_at', flat=True).first()
+
+    learning = LearningSession.objects.filter(status='RUNNING').values('id', 'name').first()
+
+    return {
+        'positions': len(positions),
+        'accounts': BrokerAccount.objects.filter(is_active=True).count(),
+        'orders': today_orders.count(),
+        'pnl': format_currency(total_pnl),
+        'pnl_value': float(total_pnl),
+        'risk': {
+            'breached_limits': RiskLimit.objects.filter(is_breached=True).count(),
+            'active_circuit_breakers': CircuitBreaker.objects.filter(is_active=True).count(),
+        },
+        'learning': {
+            'status': 'running' if learning else 'stopped',
+            'session': learning,
+        },
+        'stale': {
+            'positions': bool(positions_updated and positions_updated < stale_before),
+            'orders': bool(last_order and last_order < stale_before),
+        },
+    }
+
+
+def schedule_stale_syncs(snapshot: Dict) -> List[str]:
+    """Start background syncs for any stale data in a dashboard snapshot."""
+    started = []
+    if snapshot['stale']['positions']:
+        for kind in ('positions', 'pnl'):
+            if schedule_broker_sync(kind):
+                started.append(kind)
+    if snapshot['stale']['orders'] and schedule_broker_sync('orders'):
+        started.append('orders')
+    return started
+
+
+def recent_task_events(after_id: int = 0, limit: int = LIVE_FEED_TASK_EVENTS) -> List[Dict]:
+    """
+    Background task log entries (BkLog) newer than `after_id`, oldest first.
+
+    With after_id=0 only the latest `limit` entries are returned.
+    """
+    from apps.core.models import BkLog
+
+    queryset = BkLog.objects.order_by('-id')
+    if after_id:
+        queryset = queryset.filter(id__gt=after_id)
+
+    rows = list(queryset.values(
+        'id', 'timestamp', 'level', 'action', 'message',
+        'background_task', 'task_category', 'success'
+    )[:limit])
+
+    for row in rows:
+        row['timestamp'] = row['timestamp'].isoformat() if row['timestamp'] else None
+    return rows[::-1]
@@ -0,0 +1,196 @@
+"""
+Import-Time Profile of Process Startup
+
+Every Celery worker imports the tasks module of every installed app (task
+autodiscovery), every management command runs django.setup() and every web
+worker loads the URLconf with all views. A module-level import of a heavy
+library (pandas, selenium, chromadb, breeze_connect, ...) anywhere on those
+paths is paid by all of them.
+
+profile_startup() runs a fresh interpreter with ``python -X importtime``,
+imports one startup target and parses the report: total import time, peak
+memory, the slowest imports and which first-party module pulled in each heavy
+library. Results are checked against IMPORT_PROFILE_BUDGET_MS and
+IMPORT_PROFILE_HEAVY_MODULES.
+
+Targets:
+- setup: django.setup() (what every management command pays)
+- worker: setup + mcube_ai.celery + every app's tasks module
+- web: setup + the URLconf (all views)
+- any dotted module names
+
+Usage:
+    from apps.core.services.import_profile import profile_startup
+
+    profile = profile_startup('worker')
+    profile.wall_ms, profile.max_rss_mb, profile.heavy_modules, profile.violations
+"""
+
+import json
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+
+from apps.core.constants import IMPORT_PROFILE_BUDGET_MS, IMPORT_PROFILE_HEAVY_MODULES
+
+TARGETS = ('setup', 'worker', 'web')
+FIRST_PARTY = ('apps', 'mcube_ai', 'tools')
+
+# Runs in the profiled interpreter; prints one JSON line on stdout
+CHILD_SCRIPT = """
+import importlib, json, os, resource, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mcube_ai.settings')
+import django
+django.setup()
+errors = {}
+target, modules = sys.argv[1], sys.argv[2:]
+if target == 'worker':
+    from django.apps import apps
+    importlib.import_module('mcube_ai.celery')
+    modules = [config.name + '.tasks' for config in apps.get_app_configs()]
+elif target == 'web':
+    from django.urls import get_resolver
+    modules = []
+    try:
+        get_resolver().url_patterns
+    except Exception as e:
+        errors['urls'] = repr(e)
+for module in modules:
+    try:
+        importlib.import_module(module)
+    except ModuleNotFoundError as e:
+        if e.name != module:
+            errors[module] = repr(e)
+    except Exception as e:
+        errors[module] = repr(e)
+print(json.dumps({
+    'wall_ms': (time.perf_counter() - started) * 1000,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'errors': errors,
+}))
+"""
+
+
+@dataclass
+class ImportRecord:
+    """One line of the -X importtime report (times in ms)."""
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    """Import profile of one startup target."""
+    target: str
+    wall_ms: float
+    import_ms: float  # Sum of the top-level imports
+    max_rss_mb: float
+    module_count: int
+    slowest: List[Dict] = field(default_factory=list)
+    heavy_modules: Dict[str, Optional[str]] = field(default_factory=dict)  # library -> first-party importer
+    errors: Dict[str, str] = field(default_factory=dict)
+    budget_ms: Optional[float] = None
+    violations: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Parse the stderr of ``python -X importtime``.
+
+    Lines are written when an import finishes, so a module's children come
+    before it; nesting is the indentation of the name (2 spaces per level).
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = (part for part in line.replace('import time:', '|', 1).split('|'))
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        records.append(ImportRecord(stripped, self_us / 1000, cumulative_us / 1000, depth))
+    return records
+
+
+def _importer(records: List[ImportRecord], index: int) -> Optional[str]:
+    """Nearest first-party module whose import led to records[index]."""
+    depth = records[index].depth
+    for record in records[index + 1:]:
+        if record.depth < depth:
+            if record.module.split('.')[0] in FIRST_PARTY:
+                return record.module
+            depth = record.depth
+    return None
+
+
+def heavy_imports(records: List[ImportRecord], heavy: Sequence[str] = IMPORT_PROFILE_HEAVY_MODULES) -> Dict[str, Optional[str]]:
+    """Heavy libraries that were imported, with the first-party module responsible."""
+    found = {}
+    for index, record in enumerate(records):
+        if record.module in heavy and record.module not in found:
+            found[record.module] = _importer(records, index)
+    return found
+
+
+def profile_startup(target: str, modules: Sequence[str] = (), top: int = 15,
+                    budget_ms: Optional[float] = None, allow_heavy: bool = False) -> ImportProfile:
+    """
+    Import a startup target in a fresh interpreter and profile it.
+
+    Args:
+        target: setup, worker, web, or a label for the given modules
+        modules: Modules to import after django.setup() (custom targets)
+        top: Number of slowest top-level imports to report
+        budget_ms: Wall-time budget (default: IMPORT_PROFILE_BUDGET_MS[target])
+        allow_heavy: Do not report heavy libraries as violations
+
+    Returns:
+        ImportProfile
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT, target, *modules],
+        cwd=str(settings.BASE_DIR), capture_output=True, text=True,
+    )
+    summary = None
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith('{'):
+            summary = json.loads(line)
+            break
+    if summary is None:
+        tail = '\n'.join(line for line in result.stderr.splitlines() if not line.startswith('import time:'))[-2000:]
+        raise RuntimeError(f"Profiling '{target}' failed (exit {result.returncode}):\n{tail}")
+
+    records = parse_importtime(result.stderr)
+    top_level = sorted((r for r in records if r.depth == 0), key=lambda r: r.cumulative_ms, reverse=True)
+    rss_kb = summary['max_rss_kb']
+    profile = ImportProfile(
+        target=target,
+        wall_ms=round(summary['wall_ms'], 1),
+        import_ms=round(sum(r.cumulative_ms for r in top_level), 1),
+        # ru_maxrss is in bytes on macOS, KiB on Linux
+        max_rss_mb=round(rss_kb / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+        module_count=len(records),
+        slowest=[{'module': r.module, 'cumulative_ms': round(r.cumulative_ms, 1)} for r in top_level[:top]],
+        heavy_modules=heavy_imports(records),
+        errors=summary['errors'],
+        budget_ms=budget_ms if budget_ms is not None else IMPORT_PROFILE_BUDGET_MS.get(target),
+    )
+
+    if profile.budget_ms is not None and profile.wall_ms > profile.budget_ms:
+        profile.violations.append(f"startup took {profile.wall_ms:.0f} ms (budget {profile.budget_ms:.0f} ms)")
+    if not allow_heavy:
+        for library, importer in profile.heavy_modules.items():
+            profile.violations.append(f"{library} imported at startup (via {importer or 'a third-party module'})")
+    return profile
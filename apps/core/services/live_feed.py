@@ -0,0 +1,326 @@
+"""
+Live Feed Hub - Server-Push Dashboard Feed
+
+One producer per topic per process fans messages out to every connected
+browser (Server-Sent Events served through mcube_ai/asgi.py), so N open tabs
+cost one database/cache poll per interval instead of N HTTP polls.
+
+Topics:
+- 'dashboard': position P&L, orders, risk state, learning status and
+  background task events
+- 'execution:<progress_key>': order execution progress and events from an
+  ExecutionEventStream
+- 'analysis_job:<job_id>': per-contract results and progress of an analysis job
+
+A producer thread starts with the first subscriber of a topic and stops when
+the last one disconnects. Subscriptions work for both async (ASGI) and
+blocking (WSGI/runserver) consumers.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from django.db import close_old_connections
+
+from apps.core.constants import (
+    LIVE_FEED_INTERVAL_SECONDS,
+    LIVE_FEED_QUEUE_SIZE,
+    LIVE_FEED_TASK_EVENTS,
+)
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_TOPIC_PREFIX = 'execution:'
+ANALYSIS_JOB_TOPIC_PREFIX = 'analysis_job:'
+
+
+def format_sse(message: Dict) -> str:
+    """Encode a feed message as a Server-Sent Events frame."""
+    lines = []
+    if message.get('id') is not None:
+        lines.append(f"id: {message['id']}")
+    lines.append(f"event: {message['type']}")
+    lines.append(f"data: {json.dumps(message['data'], default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """
+    A connection's message buffer.
+
+    Pass the running event loop for async consumers; without one the buffer
+    is a thread-safe queue for blocking consumers. When a consumer falls
+    behind, the oldest buffered message is dropped instead of stalling the
+    producer.
+    """
+
+    def __init__(self, topic: str, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 maxsize: int = LIVE_FEED_QUEUE_SIZE):
+        self.topic = topic
+        self.dropped = 0
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize) if loop else queue.Queue(maxsize)
+
+    def push(self, message: Dict):
+        """Deliver a message (callable from any thread)."""
+        if self._loop is None:
+            self._put(message)
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Event loop already closed - the connection is gone
+            pass
+
+    def _put(self, message: Dict):
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except (asyncio.QueueFull, queue.Full):
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except (asyncio.QueueEmpty, queue.Empty):
+                    pass
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        """Next message for async consumers, None on timeout."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def get_sync(self, timeout: float) -> Optional[Dict]:
+        """Next message for blocking consumers, None on timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+# ========== Producers ==========
+
+class DashboardProducer:
+    """Dashboard snapshot and task events; schedules background syncs for stale data."""
+
+    def __init__(self):
+        self._last_snapshot = None
+        self._last_event_id = 0
+
+    def poll(self) -> List[Dict]:
+        from apps.core.services.dashboard import (
+            build_dashboard_snapshot,
+            recent_task_events,
+            schedule_stale_syncs,
+        )
+
+        messages = []
+
+        snapshot = build_dashboard_snapshot()
+        schedule_stale_syncs(snapshot)
+        if snapshot != self._last_snapshot:
+            self._last_snapshot = snapshot
+            messages.append({'type': 'dashboard', 'data': snapshot})
+
+        # Backlog of recent events on start, then everything new since the last poll
+        limit = 50 if self._last_event_id else LIVE_FEED_TASK_EVENTS
+        events = recent_task_events(self._last_event_id, limit=limit)
+        for event in events:
+            messages.append({'type': 'task_event', 'data': event, 'id': event['id']})
+        if events:
+            self._last_event_id = events[-1]['id']
+
+        return messages
+
+    def snapshot(self) -> List[Dict]:
+        if self._last_snapshot is None:
+            return []
+        return [{'type': 'dashboard', 'data': self._last_snapshot}]
+
+
+class ExecutionProducer:
+    """Progress snapshot and new events of one ExecutionEventStream."""
+
+    def __init__(self, progress_key: str):
+        self.progress_key = progress_key
+        self._since = 0
+        self._last_snapshot = None
+
+    def poll(self) -> List[Dict]:
+        from apps.core.utils.event_stream import ExecutionEventStream
+
+        snapshot, events = ExecutionEventStream.read(self.progress_key, since=self._since)
+
+        messages = [{'type': 'execution_event', 'data': event, 'id': event['seq']} for event in events]
+        if events:
+            self._since = events[-1]['seq']
+        if snapshot != self._last_snapshot:
+            self._last_snapshot = snapshot
+            messages.append({'type': 'progress', 'data': snapshot})
+        return messages
+
+    def snapshot(self) -> List[Dict]:
+        if self._last_snapshot is None:
+            return []
+        return [{'type': 'progress', 'data': self._last_snapshot}]
+
+
+class AnalysisJobProducer:
+    """Item results of an analysis job as they finish, plus its progress counts."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._since = 0
+        self._last_snapshot = None
+
+    def poll(self) -> List[Dict]:
+        from apps.trading.models import AnalysisJob
+        from apps.trading.services.analysis_jobs import job_progress
+
+        job = AnalysisJob.objects.filter(id=self.job_id).first()
+        if job is None:
+            return []
+
+        progress = job_progress(job, since=self._since)
+        items = progress.pop('items')
+        messages = [{'type': 'analysis_item', 'data': item, 'id': item['seq']} for item in items]
+        self._since = progress['last_seq']
+        if progress != self._last_snapshot:
+            self._last_snapshot = progress
+            messages.append({'type': 'progress', 'data': progress})
+        return messages
+
+    def snapshot(self) -> List[Dict]:
+        if self._last_snapshot is None:
+            return []
+        return [{'type': 'progress', 'data': self._last_snapshot}]
+
+
+def create_producer(topic: str):
+    """Producer for a topic name."""
+    if topic == 'dashboard':
+        return DashboardProducer()
+    if topic.startswith(EXECUTION_TOPIC_PREFIX):
+        return ExecutionProducer(topic[len(EXECUTION_TOPIC_PREFIX):])
+    if topic.startswith(ANALYSIS_JOB_TOPIC_PREFIX):
+        return AnalysisJobProducer(int(topic[len(ANALYSIS_JOB_TOPIC_PREFIX):]))
+    raise ValueError(f"Unknown live feed topic: {topic}")
+
+
+# ========== Hub ==========
+
+class _TopicState:
+    def __init__(self, producer):
+        self.producer = producer
+        self.subscribers: Set[Subscription] = set()
+        self.stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+
+class LiveFeedHub:
+    """Per-process fan-out of producer messages to subscriptions."""
+
+    def __init__(self, interval: float = LIVE_FEED_INTERVAL_SECONDS,
+                 producer_factory: Callable[[str], object] = create_producer):
+        self.interval = interval
+        self._producer_factory = producer_factory
+        self._topics: Dict[str, _TopicState] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        """
+        Subscribe to a topic, starting its producer if this is the first subscriber.
+
+        The latest snapshot (if any) is delivered immediately.
+        """
+        subscription = Subscription(topic, loop=loop)
+
+        with self._lock:
+            state = self._topics.get(topic)
+            if state is None:
+                state = _TopicState(self._producer_factory(topic))
+                self._topics[topic] = state
+            state.subscribers.add(subscription)
+
+            for message in state.producer.snapshot():
+                subscription.push(message)
+
+            if state.thread is None:
+                state.thread = threading.Thread(
+                    target=self._run, args=(topic, state),
+                    name=f"live-feed-{topic}", daemon=True
+                )
+                state.thread.start()
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription; the producer stops with its last subscriber."""
+        with self._lock:
+            state = self._topics.get(subscription.topic)
+            if state is None:
+                return
+            state.subscribers.discard(subscription)
+            if not state.subscribers:
+                state.stop.set()
+                del self._topics[subscription.topic]
+
+    def publish(self, topic: str, message: Dict):
+        """Push a message to current subscribers of a topic (no-op without subscribers)."""
+        with self._lock:
+            state = self._topics.get(topic)
+            subscribers = list(state.subscribers) if state else []
+        for subscription in subscribers:
+            subscription.push(message)
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            state = self._topics.get(topic)
+            return len(state.subscribers) if state else 0
+
+    def _run(self, topic: str, state: _TopicState):
+        try:
+            while not state.stop.is_set():
+                try:
+                    messages = state.producer.poll()
+                except Exception as e:
+                    logger.error(f"Live feed producer '{topic}' failed: {e}", exc_info=True)
+                    messages = []
+
+                if messages:
+                    with self._lock:
+                        subscribers = list(state.subscribers)
+                    for subscription in subscribers:
+                        for message in messages:
+                            subscription.push(message)
+
+                state.stop.wait(self.interval)
+        finally:
+            close_old_connections()
+
+    def close(self):
+        """Stop all producers (server shutdown)."""
+        with self._lock:
+            for state in self._topics.values():
+                state.stop.set()
+            self._topics.clear()
+
+
+_hub: Optional[LiveFeedHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_live_feed_hub() -> LiveFeedHub:
+    """The process-wide hub."""
+    global _hub
+
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = LiveFeedHub()
+    return _hub
@@ -0,0 +1,298 @@
+"""
+Log Lifecycle - Rollup, Archive and Retention
+
+BkLog (every TaskLogger call of every Celery task, including the monitors
+that run every 10-60 seconds) and MonitorLog grow without bound in the same
+SQLite file the trading path writes to. The lifecycle keeps them small:
+
+1. Rows older than LOG_RETENTION_DAYS[table] are taken in id order, in
+   batches of LOG_LIFECYCLE_BATCH_SIZE
+2. Each batch is appended to a gzipped JSON-lines file under
+   settings.LOG_ARCHIVE_DIR/<table>/<local date>.jsonl.gz
+3. In one short transaction the batch is summarised into LogRollup (per
+   task, category and hour: counts, errors, warnings, durations) and deleted
+
+Batches pause between commits so the monitors and the writer queue get the
+write lock, and a run stops after LOG_LIFECYCLE_MAX_BATCHES per table; the
+next run continues where it stopped. A batch is archived before it is
+deleted, so a crash in between only repeats rows in the archive
+(read_archive() skips repeated ids); the rollup and the delete commit
+together, so no row is counted twice.
+
+task_summary() answers "how did each task do since X" from the rollups for
+archived hours plus the detail rows still in the table.
+
+Usage:
+    from apps.core.services.log_lifecycle import run_log_lifecycle, task_summary
+
+    stats = run_log_lifecycle()                      # all tables, default retention
+    rows = task_summary('bk_log', since=timezone.now() - timedelta(days=30))
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Greatest, TruncHour
+from django.utils import timezone
+
+from apps.core.constants import (
+    LOG_LIFECYCLE_BATCH_PAUSE_SECONDS,
+    LOG_LIFECYCLE_BATCH_SIZE,
+    LOG_LIFECYCLE_MAX_BATCHES,
+    LOG_RETENTION_DAYS,
+)
+from apps.core.utils.db import retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+MEASURES = ('count', 'error_count', 'warning_count', 'timed_count', 'total_ms', 'max_ms')
+
+
+@dataclass(frozen=True)
+class LogSource:
+    """A log table: how its rows are timed, grouped and classified"""
+    name: str  # db_table, also LogRollup.source
+    model: str  # app_label.ModelName
+    time_field: str
+    task: Callable[[], object]  # Expression for LogRollup.task
+    category: Callable[[], object]  # Expression for LogRollup.category
+    errors: Callable[[], Q]
+    warnings: Callable[[], Q]
+    duration_field: Optional[str] = None  # Execution time in ms
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def dimensions(self) -> Dict:
+        return {'task': self.task(), 'category': self.category()}
+
+    def measures(self) -> Dict:
+        measures = {
+            'count': Count('id'),
+            'error_count': Count('id', filter=self.errors()),
+            'warning_count': Count('id', filter=self.warnings()),
+        }
+        if self.duration_field:
+            measures.update(timed_count=Count(self.duration_field), total_ms=Sum(self.duration_field),
+                            max_ms=Max(self.duration_field))
+        return measures
+
+
+SOURCES: Dict[str, LogSource] = {
+    'bk_log': LogSource(
+        name='bk_log',
+        model='core.BkLog',
+        time_field='timestamp',
+        # Rows logged outside a named task are grouped by action
+        task=lambda: Case(When(background_task='', then=F('action')), default=F('background_task')),
+        category=lambda: F('task_category'),
+        errors=lambda: Q(success=False) | Q(level__in=['error', 'critical']),
+        warnings=lambda: Q(level='warning'),
+        duration_field='execution_time_ms',
+    ),
+    'monitor_logs': LogSource(
+        name='monitor_logs',
+        model='positions.MonitorLog',
+        time_field='created_at',
+        task=lambda: F('check_type'),
+        category=lambda: Value('position'),
+        errors=lambda: Q(result__in=['ALERT', 'ACTION_REQUIRED']),
+        warnings=lambda: Q(result='WARNING'),
+    ),
+}
+
+
+def get_sources(names: Optional[Sequence[str]] = None) -> List[LogSource]:
+    """
+    Log sources by table name (all by default)
+
+    Raises:
+        KeyError: Unknown table name
+    """
+    return [SOURCES[name] for name in (names or SOURCES)]
+
+
+class LogLifecycle:
+    """Rolls up, archives and deletes log rows past their retention window"""
+
+    def __init__(self, archive_dir: Optional[Path] = None, retention_days: Optional[Dict[str, int]] = None,
+                 batch_size: int = LOG_LIFECYCLE_BATCH_SIZE, pause: float = LOG_LIFECYCLE_BATCH_PAUSE_SECONDS,
+                 max_batches: int = LOG_LIFECYCLE_MAX_BATCHES):
+        """
+        Args:
+            archive_dir: Defaults to settings.LOG_ARCHIVE_DIR
+            retention_days: Overrides of LOG_RETENTION_DAYS, by table
+            batch_size: Rows per transaction
+            pause: Seconds between batches
+            max_batches: Batches per table in one run
+        """
+        self.archive_dir = Path(archive_dir or settings.LOG_ARCHIVE_DIR)
+        self.retention_days = dict(LOG_RETENTION_DAYS, **(retention_days or {}))
+        self.batch_size = batch_size
+        self.pause = pause
+        self.max_batches = max_batches
+
+    def cutoff(self, source: LogSource, now: Optional[datetime] = None) -> datetime:
+        return (now or timezone.now()) - timedelta(days=self.retention_days[source.name])
+
+    def run(self, sources: Optional[Sequence[str]] = None, now: Optional[datetime] = None) -> Dict[str, Dict]:
+        """Process every table (or those named); stats by table"""
+        return {source.name: self.process(source, self.cutoff(source, now)) for source in get_sources(sources)}
+
+    def process(self, source: LogSource, cutoff: datetime) -> Dict:
+        """Archive, roll up and delete the rows of one table older than cutoff"""
+        stats = {'cutoff': cutoff.isoformat(), 'archived': 0, 'batches': 0, 'rollups': 0, 'files': [],
+                 'complete': False}
+        files = set()
+
+        while stats['batches'] < self.max_batches:
+            if stats['batches'] and self.pause:
+                time.sleep(self.pause)
+            rows = self._next_batch(source, cutoff)
+            if not rows:
+                stats['complete'] = True
+                break
+
+            files.update(self._archive(source, rows))
+            stats['rollups'] += self._commit(source, [row['id'] for row in rows])
+            stats['archived'] += len(rows)
+            stats['batches'] += 1
+
+            if len(rows) < self.batch_size:
+                stats['complete'] = True
+                break
+
+        stats['files'] = sorted(str(path) for path in files)
+        if stats['archived']:
+            logger.info(f"{source.name}: archived {stats['archived']} rows older than {cutoff:%Y-%m-%d %H:%M} "
+                        f"in {stats['batches']} batches")
+        return stats
+
+    def _next_batch(self, source: LogSource, cutoff: datetime) -> List[Dict]:
+        # Old rows have the lowest ids, so walking the primary key finds them first
+        model = source.get_model()
+        columns = [f.attname for f in model._meta.concrete_fields]
+        queryset = model.objects.filter(**{f'{source.time_field}__lt': cutoff}).order_by('id')
+        return list(queryset.values(*columns)[:self.batch_size])
+
+    def _archive(self, source: LogSource, rows: List[Dict]) -> List[Path]:
+        """Append rows to the archive file of their local date; one gzip member per batch and file"""
+        by_day: Dict[str, List[Dict]] = {}
+        for row in rows:
+            day = timezone.localtime(row[source.time_field]).date().isoformat()
+            by_day.setdefault(day, []).append(row)
+
+        paths = []
+        directory = self.archive_dir / source.name
+        directory.mkdir(parents=True, exist_ok=True)
+        for day, day_rows in by_day.items():
+            path = directory / f"{day}.jsonl.gz"
+            data = ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in day_rows)
+            with open(path, 'ab') as handle:
+                handle.write(gzip.compress(data.encode()))
+                handle.flush()
+                os.fsync(handle.fileno())
+            paths.append(path)
+        return paths
+
+    @retry_on_locked()
+    def _commit(self, source: LogSource, ids: List[int]) -> int:
+        """Add the batch to LogRollup and delete it, in one transaction; rollup rows touched"""
+        from apps.core.models import LogRollup
+
+        model = source.get_model()
+        with transaction.atomic():
+            batch = model.objects.filter(id__in=ids)
+            hours = (batch
+                     .annotate(hour=TruncHour(source.time_field), **source.dimensions())
+                     .values('hour', 'task', 'category')
+                     .annotate(**source.measures())
+                     .order_by())
+            for group in hours:
+                key = {'source': source.name, 'hour': group['hour'], 'task': group['task'] or '',
+                       'category': group['category'] or ''}
+                values = {name: group.get(name) or 0 for name in MEASURES}
+                updated = LogRollup.objects.filter(**key).update(
+                    max_ms=Greatest('max_ms', Value(values['max_ms'])),
+                    **{name: F(name) + values[name] for name in MEASURES if name != 'max_ms'}
+                )
+                if not updated:
+                    LogRollup.objects.create(**key, **values)
+            batch.delete()
+        return len(hours)
+
+
+def run_log_lifecycle(sources: Optional[Sequence[str]] = None, **options) -> Dict[str, Dict]:
+    """Run the lifecycle once with LogLifecycle(**options)"""
+    return LogLifecycle(**options).run(sources)
+
+
+def read_archive(path) -> Iterator[Dict]:
+    """Rows of an archive file, each id once"""
+    seen = set()
+    with gzip.open(path, 'rt') as handle:
+        for line in handle:
+            row = json.loads(line)
+            if row['id'] in seen:
+                continue
+            seen.add(row['id'])
+            yield row
+
+
+def task_summary(source: str = 'bk_log', since: Optional[datetime] = None) -> List[Dict]:
+    """
+    Counts, error rate and durations per task since `since` (default: 24 hours)
+
+    Archived hours come from LogRollup, the rest from the detail rows. Rollups
+    cover whole local hours, so `since` is rounded down to the hour for them.
+    """
+    from apps.core.models import LogRollup
+
+    log_source = SOURCES[source]
+    since = since or timezone.now() - timedelta(days=1)
+    totals: Dict[tuple, Dict] = {}
+
+    def add(group: Dict):
+        key = (group['task'] or '', group['category'] or '')
+        total = totals.setdefault(key, dict.fromkeys(MEASURES, 0))
+        for name in MEASURES:
+            value = group.get(name) or 0
+            total[name] = max(total[name], value) if name == 'max_ms' else total[name] + value
+
+    rollups = (LogRollup.objects
+               .filter(source=source, hour__gte=timezone.localtime(since).replace(minute=0, second=0, microsecond=0))
+               .values('task', 'category')
+               .annotate(**{name: Sum(name) for name in MEASURES if name != 'max_ms'}, max_ms=Max('max_ms'))
+               .order_by())
+    for group in rollups:
+        add(group)
+
+    detail = (log_source.get_model().objects
+              .filter(**{f'{log_source.time_field}__gte': since})
+              .annotate(**log_source.dimensions())
+              .values('task', 'category')
+              .annotate(**log_source.measures())
+              .order_by())
+    for group in detail:
+        add(group)
+
+    summary = []
+    for (task, category), total in totals.items():
+        summary.append(dict(
+            total, task=task, category=category,
+            error_rate=round(total['error_count'] / total['count'], 4) if total['count'] else 0.0,
+            avg_ms=round(total['total_ms'] / total['timed_count'], 1) if total['timed_count'] else None,
+        ))
+    return sorted(summary, key=lambda row: (-row['count'], row['task']))
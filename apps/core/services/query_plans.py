@@ -0,0 +1,163 @@
+"""
+Query Plans of the Hot Queries
+
+The queries the position monitors, the dashboard, the order screens and the
+futures / option screeners issue on every refresh, built the way the code
+paths build them. check_query_plans() asks the database for the plan of each
+one (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL) and flags:
+
+- full scans: every row of a table read, instead of an index lookup
+- sorts: ORDER BY served by a temporary B-tree instead of an index
+
+A full scan on one of these queries means a missing or unusable index (a
+filter wrapped in a function, such as created_at__date, cannot use one).
+
+Usage:
+    from apps.core.services.query_plans import check_query_plans
+
+    for plan in check_query_plans():
+        plan.name, plan.full_scans, plan.sorts, plan.plan
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from django.db import connection
+from django.db.models import QuerySet
+
+# SQLite: "SEARCH t USING INDEX" is an index lookup; "SCAN t" ("SCAN TABLE t" before 3.36) reads every
+# row, also when it walks an index for the ORDER BY ("SCAN t USING INDEX ...")
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+_SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|GROUP BY|DISTINCT)')
+# PostgreSQL: "Seq Scan on positions"
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+_POSTGRES_SORT = re.compile(r'^\s*(?:->\s*)?Sort\b', re.MULTILINE)
+
+
+@dataclass
+class HotQuery:
+    name: str
+    description: str
+    build: Callable[[], QuerySet]
+
+
+@dataclass
+class QueryPlan:
+    name: str
+    description: str
+    sql: str
+    plan: str
+    full_scans: List[str] = field(default_factory=list)  # Tables read without an index
+    sorts: int = 0  # Sorts not served by an index
+
+    @property
+    def ok(self) -> bool:
+        return not self.full_scans
+
+
+def _today_range():
+    from apps.core.utils import local_day_range
+
+    return local_day_range()
+
+
+def _positions():
+    from apps.positions.models import Position
+    return Position.objects
+
+
+def _orders():
+    from apps.brokers.models import Order
+    return Order.objects
+
+
+def _contracts():
+    from apps.data.models import ContractData
+    return ContractData.objects
+
+
+def _futures_screen():
+    from apps.trading.services.futures_screening import select_volume_qualified_futures
+    return select_volume_qualified_futures(1000, 800)
+
+
+def _suggestions():
+    from apps.trading.models import TradeSuggestion
+    return TradeSuggestion.objects
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery('position.active_for_account', 'One-position rule (Position.has_active_position)',
+             lambda: _positions().filter(account_id=1, status='ACTIVE').order_by()),
+    HotQuery('position.strategy_for_account', 'Active positions of one strategy on an account',
+             lambda: _positions().filter(account_id=1, status='ACTIVE', strategy_type='WEEKLY_NIFTY_STRANGLE')),
+    HotQuery('position.active_book', 'Monitors and dashboard: every active position',
+             lambda: _positions().filter(status='ACTIVE').order_by()),
+    HotQuery('position.expiring', 'Expiry-day exits: active positions by expiry',
+             lambda: _positions().filter(status='ACTIVE', expiry_date__lte=date.today()).order_by()),
+    HotQuery('position.closed_today', "Today's realized P&L",
+             lambda: _positions().filter(status='CLOSED', exit_time__gte=_today_range()[0],
+                                         exit_time__lt=_today_range()[1]).order_by()),
+    HotQuery('order.today', "Dashboard: today's orders, latest first",
+             lambda: _orders().filter(created_at__gte=_today_range()[0], created_at__lt=_today_range()[1])),
+    HotQuery('order.account_today', "Order sync: one account's orders today",
+             lambda: _orders().filter(account_id=1, created_at__gte=_today_range()[0],
+                                      created_at__lt=_today_range()[1])),
+    HotQuery('order.by_broker_id', 'Order status polling by broker order id',
+             lambda: _orders().filter(broker_order_id='0').order_by()),
+    HotQuery('contract.option_chain', 'Max pain / OI distribution of one expiry',
+             lambda: _contracts().filter(symbol='NIFTY', expiry=date.today(),
+                                         option_type__in=['CE', 'PE']).order_by('strike_price')),
+    HotQuery('contract.latest_future', 'Order screens: latest future of a symbol',
+             lambda: _contracts().filter(symbol='RELIANCE', option_type='FUTURE').order_by('-expiry')),
+    HotQuery('contract.futures_screen', 'Futures screener: volume-qualified contracts of the next two expiries',
+             lambda: _futures_screen().order_by()),
+    HotQuery('contract.expiry_window', 'Option screens: contracts expiring in the next 30 days',
+             lambda: _contracts().filter(option_type='CE', expiry__gte=date.today(),
+                                         expiry__lte=date.today() + timedelta(days=30)).order_by()),
+    HotQuery('suggestion.for_user', "A user's trade suggestions, newest first",
+             lambda: _suggestions().filter(user_id=1).order_by('-created_at')),
+]
+
+
+def get_hot_queries(names: Optional[Sequence[str]] = None) -> List[HotQuery]:
+    """
+    Hot queries by name or name prefix ('position', 'contract.option_chain')
+
+    Raises:
+        KeyError: A name matching no query
+    """
+    if not names:
+        return list(HOT_QUERIES)
+    selected: Dict[str, HotQuery] = {}
+    for name in names:
+        matches = [q for q in HOT_QUERIES if q.name == name or q.name.startswith(f'{name}.')]
+        if not matches:
+            raise KeyError(name)
+        selected.update((q.name, q) for q in matches)
+    return list(selected.values())
+
+
+def analyze_plan(plan: str, vendor: str) -> Dict:
+    """Full scans and sorts in a plan printed by QuerySet.explain()"""
+    if vendor == 'sqlite':
+        scans, sorts = _SQLITE_SCAN.findall(plan), len(_SQLITE_SORT.findall(plan))
+    elif vendor == 'postgresql':
+        scans, sorts = _POSTGRES_SCAN.findall(plan), len(_POSTGRES_SORT.findall(plan))
+    else:
+        scans, sorts = [], 0
+    return {'full_scans': list(dict.fromkeys(scans)), 'sorts': sorts}
+
+
+def explain(query: HotQuery) -> QueryPlan:
+    queryset = query.build()
+    plan = queryset.explain()
+    return QueryPlan(name=query.name, description=query.description, sql=str(queryset.query), plan=plan,
+                     **analyze_plan(plan, connection.vendor))
+
+
+def check_query_plans(names: Optional[Sequence[str]] = None) -> List[QueryPlan]:
+    """Plans of the hot queries (all, or those selected by name / prefix)"""
+    return [explain(query) for query in get_hot_queries(names)]
@@ -0,0 +1,513 @@
+"""
+Request, Task and Broker Telemetry
+
+Measures every web request (TelemetryMiddleware), every Celery task
+(connect_celery_signals) and every call on a broker client (instrument_client):
+
+- wall time, by view / task and outcome
+- DB queries and DB time (a wrapper on each connection, counted per request / task)
+- cache reads, hit or miss (the cache backends below)
+- broker API latency, by broker and client method, and broker time per request / task
+
+Observations are aggregated in memory into fixed-bucket histograms and
+counters. Each process writes its snapshot to settings.TELEMETRY_DIR at most
+every TELEMETRY_FLUSH_SECONDS; /metrics (Prometheus text format) merges the
+snapshots of the other live processes (Celery workers, other web workers)
+with the serving process's own numbers.
+
+Usage:
+    from apps.core.services.telemetry import instrument_client, measure, render_prometheus
+
+    with measure('task', 'rebuild_learning_patterns'):
+        ...                                      # any unit of work outside a request / Celery task
+
+    client = instrument_client('breeze', BreezeConnect(...))
+    text = render_prometheus()                    # what /metrics serves
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache as DjangoLocMemCache
+from django.db import connections
+
+from apps.core.constants import (
+    TELEMETRY_FLUSH_SECONDS,
+    TELEMETRY_QUERY_BUCKETS,
+    TELEMETRY_SECONDS_BUCKETS,
+)
+
+logger = logging.getLogger(__name__)
+
+KIND_VIEW = 'view'
+KIND_TASK = 'task'
+
+ERROR_OUTCOMES = {'5xx', 'failure', 'error'}  # Request status class, Celery state, measure()
+SNAPSHOT_MAX_AGE_SECONDS = 86400  # Snapshots whose process cannot be checked (other host) are dropped after this
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# name: (type, help, buckets)
+METRICS = {
+    'mcube_broker_call_seconds': ('histogram', 'Latency of broker API calls by broker and method',
+                                  TELEMETRY_SECONDS_BUCKETS),
+}
+for _kind, _what in ((KIND_VIEW, 'request'), (KIND_TASK, 'task run')):
+    METRICS.update({
+        f'mcube_{_kind}_seconds': ('histogram', f'Wall time per {_what}', TELEMETRY_SECONDS_BUCKETS),
+        f'mcube_{_kind}_db_queries': ('histogram', f'DB queries per {_what}', TELEMETRY_QUERY_BUCKETS),
+        f'mcube_{_kind}_db_seconds': ('histogram', f'DB time per {_what}', TELEMETRY_SECONDS_BUCKETS),
+        f'mcube_{_kind}_broker_seconds': ('histogram', f'Broker API time per {_what} (when it called a broker)',
+                                          TELEMETRY_SECONDS_BUCKETS),
+        f'mcube_{_kind}_cache_reads_total': ('counter', f'Cache reads per {_what}, by result', None),
+    })
+
+
+def enabled() -> bool:
+    return getattr(settings, 'TELEMETRY_ENABLED', True)
+
+
+# ========== Registry ==========
+
+class Registry:
+    """Histograms and counters of this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, Labels], List] = {}  # -> [bucket counts..., sum, count]
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+
+    def observe(self, metric: str, labels: Labels, value: float):
+        buckets = METRICS[metric][2]
+        with self._lock:
+            series = self.histograms.get((metric, labels))
+            if series is None:
+                series = self.histograms[(metric, labels)] = [0] * len(buckets) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def inc(self, metric: str, labels: Labels, amount: float = 1):
+        with self._lock:
+            self.counters[(metric, labels)] = self.counters.get((metric, labels), 0) + amount
+
+    def snapshot(self) -> Dict:
+        """JSON-serializable copy"""
+        with self._lock:
+            return {
+                'histograms': [[m, [list(p) for p in labels], list(v)] for (m, labels), v in self.histograms.items()],
+                'counters': [[m, [list(p) for p in labels], v] for (m, labels), v in self.counters.items()],
+            }
+
+    def merge(self, snapshot: Dict):
+        with self._lock:
+            for metric, labels, values in snapshot.get('histograms', []):
+                key = (metric, tuple(tuple(p) for p in labels))
+                series = self.histograms.get(key)
+                if metric not in METRICS or (series is not None and len(series) != len(values)):
+                    continue  # Bucket layout changed between versions
+                self.histograms[key] = [a + b for a, b in zip(series, values)] if series else list(values)
+            for metric, labels, value in snapshot.get('counters', []):
+                key = (metric, tuple(tuple(p) for p in labels))
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+registry = Registry()
+
+
+# ========== Scopes (one request / task) ==========
+
+@dataclass
+class Scope:
+    kind: str
+    name: str
+    outcome: str = 'ok'
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    broker_calls: int = 0
+    broker_seconds: float = 0.0
+    parent: Optional['Scope'] = None  # Scope this one is nested in
+
+
+_local = threading.local()
+
+
+def current_scope() -> Optional[Scope]:
+    return getattr(_local, 'scope', None)
+
+
+def _count_query(execute, sql, params, many, context):
+    scope = current_scope()
+    if scope is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        scope.db_queries += 1
+        scope.db_seconds += time.perf_counter() - started
+
+
+def start(kind: str, name: str) -> Optional[Scope]:
+    """Begin measuring on this thread (None when telemetry is off)"""
+    if not enabled():
+        return None
+    for connection in connections.all():
+        # Stays installed on this thread's connection; a no-op outside a scope
+        if _count_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_count_query)
+    scope = Scope(kind, name, parent=current_scope())
+    _local.scope = scope
+    return scope
+
+
+def finish(scope: Optional[Scope]):
+    """Record a scope begun with start()"""
+    if scope is None:
+        return
+    _local.scope = scope.parent
+    base = ((scope.kind, scope.name),)
+    prefix = f'mcube_{scope.kind}'
+    registry.observe(f'{prefix}_seconds', base + (('outcome', scope.outcome),), time.perf_counter() - scope.started)
+    registry.observe(f'{prefix}_db_queries', base, scope.db_queries)
+    registry.observe(f'{prefix}_db_seconds', base, scope.db_seconds)
+    if scope.broker_calls:
+        registry.observe(f'{prefix}_broker_seconds', base, scope.broker_seconds)
+    if scope.cache_hits:
+        registry.inc(f'{prefix}_cache_reads_total', base + (('result', 'hit'),), scope.cache_hits)
+    if scope.cache_misses:
+        registry.inc(f'{prefix}_cache_reads_total', base + (('result', 'miss'),), scope.cache_misses)
+    flush()
+
+
+class measure:
+    """Context manager measuring a block as one view / task run"""
+
+    def __init__(self, kind: str, name: str):
+        self.kind, self.name = kind, name
+        self.scope = None
+
+    def __enter__(self) -> Optional[Scope]:
+        self.scope = start(self.kind, self.name)
+        return self.scope
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.scope is not None and exc_type is not None:
+            self.scope.outcome = 'error'
+        finish(self.scope)
+
+
+# ========== Cache backends ==========
+
+_MISSING = object()
+
+
+class CacheTelemetryMixin:
+    """Counts get() hits and misses against the current scope"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        scope = current_scope()
+        if scope is not None:
+            if value is _MISSING:
+                scope.cache_misses += 1
+            else:
+                scope.cache_hits += 1
+        return default if value is _MISSING else value
+
+
+class LocMemCache(CacheTelemetryMixin, DjangoLocMemCache):
+    """django.core.cache.backends.locmem.LocMemCache with hit / miss counts"""
+
+
+# ========== Broker clients ==========
+
+class _InstrumentedClient:
+    """Forwards to a broker client, timing each method call"""
+
+    def __init__(self, broker: str, client):
+        object.__setattr__(self, '_broker', broker)
+        object.__setattr__(self, '_client', client)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or not callable(getattr(type(self._client), name, None)):
+            return attr  # Data attributes and per-instance callbacks (on_message) pass through
+        broker = self._broker
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = attr(*args, **kwargs)
+                outcome = 'ok'
+                return result
+            finally:
+                elapsed = time.perf_counter() - started
+                registry.observe('mcube_broker_call_seconds',
+                                 (('broker', broker), ('method', name), ('outcome', outcome)), elapsed)
+                scope = current_scope()
+                if scope is not None:
+                    scope.broker_calls += 1
+                    scope.broker_seconds += elapsed
+
+        timed.__name__ = name
+        return timed
+
+    def __setattr__(self, name, value):
+        setattr(self._client, name, value)
+
+    def __repr__(self):
+        return f"<instrumented {self._broker} {self._client!r}>"
+
+
+def instrument_client(broker: str, client):
+    """client, with the latency of its method calls recorded under broker"""
+    if client is None or not enabled() or isinstance(client, _InstrumentedClient):
+        return client
+    return _InstrumentedClient(broker, client)
+
+
+# ========== Celery ==========
+
+_task_scopes: Dict[str, Scope] = {}
+
+
+def _task_prerun(task_id=None, task=None, **kwargs):
+    scope = start(KIND_TASK, getattr(task, 'name', None) or 'unknown')
+    if scope is not None:
+        _task_scopes[task_id] = scope
+
+
+def _task_postrun(task_id=None, state=None, **kwargs):
+    scope = _task_scopes.pop(task_id, None)
+    if scope is not None:
+        scope.outcome = (state or 'unknown').lower()
+        finish(scope)
+
+
+def connect_celery_signals():
+    """Measure every task this process runs"""
+    from celery import signals
+
+    signals.task_prerun.connect(_task_prerun, weak=False, dispatch_uid='telemetry.task_prerun')
+    signals.task_postrun.connect(_task_postrun, weak=False, dispatch_uid='telemetry.task_postrun')
+
+
+# ========== Snapshots ==========
+
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def _snapshot_dir():
+    return getattr(settings, 'TELEMETRY_DIR', None)
+
+
+def flush(force: bool = False):
+    """Write this process's snapshot if TELEMETRY_FLUSH_SECONDS have passed"""
+    global _last_flush
+    directory = _snapshot_dir()
+    now = time.time()
+    if directory is None or (not force and now - _last_flush < TELEMETRY_FLUSH_SECONDS):
+        return
+    with _flush_lock:
+        if not force and now - _last_flush < TELEMETRY_FLUSH_SECONDS:
+            return
+        _last_flush = now
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{socket.gethostname()}-{os.getpid()}.json"
+            data = dict(registry.snapshot(), host=socket.gethostname(), pid=os.getpid(), written_at=now)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Telemetry snapshot not written: {e}")
+
+
+def _process_alive(snapshot: Dict) -> bool:
+    if snapshot.get('host') != socket.gethostname():
+        return time.time() - snapshot.get('written_at', 0) < SNAPSHOT_MAX_AGE_SECONDS
+    try:
+        os.kill(snapshot['pid'], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect() -> Registry:
+    """This process's numbers plus the snapshots of the other live processes"""
+    merged = Registry()
+    merged.merge(registry.snapshot())
+    directory = _snapshot_dir()
+    if directory is None or not directory.exists():
+        return merged
+    for path in directory.glob('*.json'):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if snapshot.get('host') == socket.gethostname() and snapshot.get('pid') == os.getpid():
+            continue
+        if not _process_alive(snapshot):
+            path.unlink(missing_ok=True)
+            continue
+        merged.merge(snapshot)
+    return merged
+
+
+# ========== Output ==========
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Sequence[Tuple[str, str]]) -> str:
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}' if labels else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(source: Optional[Registry] = None) -> str:
+    """Prometheus text exposition format (0.0.4)"""
+    source = source or collect()
+    lines = []
+    for metric, (kind, help_text, buckets) in METRICS.items():
+        if kind == 'histogram':
+            series = sorted((labels, v) for (m, labels), v in source.histograms.items() if m == metric)
+        else:
+            series = sorted((labels, v) for (m, labels), v in source.counters.items() if m == metric)
+        if not series:
+            continue
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for labels, values in series:
+            if kind == 'counter':
+                lines.append(f'{metric}{_labels(labels)} {_number(values)}')
+                continue
+            for bound, count in zip(buckets, values):
+                lines.append(f'{metric}_bucket{_labels(labels + (("le", _number(float(bound))),))} {count}')
+            lines.append(f'{metric}_bucket{_labels(labels + (("le", "+Inf"),))} {values[-1]}')
+            lines.append(f'{metric}_sum{_labels(labels)} {_number(float(values[-2]))}')
+            lines.append(f'{metric}_count{_labels(labels)} {values[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+def quantile(q: float, buckets: Sequence[float], values: Sequence) -> Optional[float]:
+    """Estimate of the q-quantile from cumulative bucket counts (like histogram_quantile)"""
+    count = values[-1]
+    if not count:
+        return None
+    rank = q * count
+    lower, below = 0.0, 0
+    for bound, cumulative in zip(buckets, values):
+        if cumulative >= rank:
+            in_bucket = cumulative - below
+            return lower + (bound - lower) * ((rank - below) / in_bucket if in_bucket else 1)
+        lower, below = bound, cumulative
+    return float(buckets[-1])  # Beyond the last bucket
+
+
+def summary(kind: str, source: Optional[Registry] = None) -> List[Dict]:
+    """
+    One row per view / task (all outcomes together), slowest p95 first.
+
+    Returns:
+        list: [{'name', 'calls', 'errors', 'avg_ms', 'p50_ms', 'p95_ms', 'avg_queries', 'avg_db_ms',
+                'avg_broker_ms', 'cache_hit_rate'}]
+    """
+    source = source or collect()
+    prefix = f'mcube_{kind}'
+    buckets = METRICS[f'{prefix}_seconds'][2]
+    rows: Dict[str, Dict] = {}
+
+    for (metric, labels), values in source.histograms.items():
+        label_map = dict(labels)
+        if kind not in label_map or not metric.startswith(prefix):
+            continue
+        row = rows.setdefault(label_map[kind], {'name': label_map[kind], 'values': [0] * (len(buckets) + 2),
+                                                'errors': 0})
+        if metric == f'{prefix}_seconds':
+            row['values'] = [a + b for a, b in zip(row['values'], values)]
+            if label_map.get('outcome') in ERROR_OUTCOMES:
+                row['errors'] += values[-1]
+        else:
+            row[metric[len(prefix) + 1:]] = values
+
+    for (metric, labels), value in source.counters.items():
+        label_map = dict(labels)
+        if metric == f'{prefix}_cache_reads_total' and label_map.get(kind) in rows:
+            rows[label_map[kind]][label_map['result']] = value
+
+    result = []
+    for row in rows.values():
+        values, calls = row['values'], row['values'][-1]
+        if not calls:
+            continue
+        queries, db, broker = row.get('db_queries'), row.get('db_seconds'), row.get('broker_seconds')
+        reads = row.get('hit', 0) + row.get('miss', 0)
+        result.append({
+            'name': row['name'],
+            'calls': calls,
+            'errors': row['errors'],
+            'avg_ms': values[-2] / calls * 1000,
+            'p50_ms': quantile(0.5, buckets, values) * 1000,
+            'p95_ms': quantile(0.95, buckets, values) * 1000,
+            'avg_queries': queries[-2] / queries[-1] if queries and queries[-1] else 0,
+            'avg_db_ms': db[-2] / db[-1] * 1000 if db and db[-1] else 0,
+            'avg_broker_ms': broker[-2] / calls * 1000 if broker else 0,
+            'cache_hit_rate': row.get('hit', 0) / reads if reads else None,
+        })
+    return sorted(result, key=lambda r: r['p95_ms'], reverse=True)
+
+
+def broker_summary(source: Optional[Registry] = None) -> List[Dict]:
+    """One row per broker method, slowest p95 first"""
+    source = source or collect()
+    buckets = METRICS['mcube_broker_call_seconds'][2]
+    rows: Dict[Tuple[str, str], Dict] = {}
+    for (metric, labels), values in source.histograms.items():
+        if metric != 'mcube_broker_call_seconds':
+            continue
+        label_map = dict(labels)
+        row = rows.setdefault((label_map['broker'], label_map['method']),
+                              {'values': [0] * len(values), 'errors': 0})
+        row['values'] = [a + b for a, b in zip(row['values'], values)]
+        if label_map['outcome'] in ERROR_OUTCOMES:
+            row['errors'] += values[-1]
+
+    result = []
+    for (broker, method), row in rows.items():
+        values = row['values']
+        result.append({
+            'broker': broker,
+            'method': method,
+            'calls': values[-1],
+            'errors': row['errors'],
+            'avg_ms': values[-2] / values[-1] * 1000,
+            'p50_ms': quantile(0.5, buckets, values) * 1000,
+            'p95_ms': quantile(0.95, buckets, values) * 1000,
+        })
+    return sorted(result, key=lambda r: r['p95_ms'], reverse=True)
@@ -0,0 +1,607 @@
+"""
+Trading Calendar Service
+
+Single source of truth for trading days, market holidays and contract expiries.
+
+The calendar is built once per day from:
+- Holidays: NSE_MARKET_HOLIDAYS merged with the MarketHoliday table
+- Expiries: listed contracts in the ICICI SecurityMaster file and, during the
+  daily refresh task, NSE's published expiry list
+- EXPIRY_SCHEDULES weekday rules, which cover anything beyond the listed contracts
+
+Lookups ("next expiry", "days to expiry", "is trading day", "trading minutes
+remaining") are answered from sorted in-memory tables, so callers no longer
+recompute or refetch on every call.
+
+Each process keeps its own calendar (the default cache is per-process
+LocMemCache). refresh_trading_calendar() and reset_trading_calendar() bump a
+version stamp in the NseFlag table; every process checks it at most every
+TRADING_CALENDAR_VERSION_CHECK_SECONDS and rebuilds when it changed, so a
+refresh in the Celery worker or a holiday edit in the web process reaches all
+of them. Expiries fetched from NSE are only added in the process that runs the
+refresh; the others rely on SecurityMaster and the weekday rules.
+
+Usage:
+    from apps.core.services.trading_calendar import get_trading_calendar
+
+    calendar = get_trading_calendar()
+    expiry = calendar.next_expiry('NIFTY')                   # current weekly
+    monthly = calendar.next_expiry('NIFTY', kind='monthly')
+    calendar.is_trading_day(date(2025, 10, 21))             # False (Diwali)
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+import time as time_module
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import pytz
+import requests
+from django.core.cache import cache
+
+from apps.core.constants import (
+    DEFAULT_EXPIRY_SCHEDULE,
+    EXPIRY_SCHEDULES,
+    MARKET_CLOSE_TIME,
+    MARKET_OPEN_TIME,
+    NSE_MARKET_HOLIDAYS,
+    TRADING_CALENDAR_CACHE_TIMEOUT,
+    TRADING_CALENDAR_HORIZON_DAYS,
+    TRADING_CALENDAR_VERSION_CHECK_SECONDS,
+    TRADING_DAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+CACHE_KEY = 'trading_calendar:snapshot'
+VERSION_FLAG = 'tradingCalendarVersion'  # NseFlag bumped on every refresh / reset
+
+NSE_BASE = "https://www.nseindia.com"
+NSE_OC_URL = "https://www.nseindia.com/api/option-chain-indices?symbol={symbol}"
+
+EXPIRY_KINDS = ('weekly', 'monthly')
+
+
+def _today_ist() -> date:
+    return datetime.now(IST).date()
+
+
+def _parse_hhmm(value: str) -> time:
+    hours, minutes = value.split(':')
+    return time(int(hours), int(minutes))
+
+
+def _last_weekday_of_month(year: int, month: int, weekday: int) -> date:
+    if month == 12:
+        last_day = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        last_day = date(year, month + 1, 1) - timedelta(days=1)
+    return last_day - timedelta(days=(last_day.weekday() - weekday) % 7)
+
+
+def _monthly_from(expiries: Iterable[date]) -> List[date]:
+    """Last expiry of each month - the monthly contract."""
+    last_per_month = {}
+    for expiry in expiries:
+        key = (expiry.year, expiry.month)
+        if key not in last_per_month or expiry > last_per_month[key]:
+            last_per_month[key] = expiry
+    return sorted(last_per_month.values())
+
+
+class TradingCalendar:
+    """
+    Precomputed trading days and per-underlying expiry schedules.
+
+    Instances are immutable once built apart from lazily adding rule-based
+    schedules for underlyings that were not listed at build time, so they are
+    safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        holidays: Optional[Dict[date, str]] = None,
+        listed_expiries: Optional[Dict[str, Dict[str, List[date]]]] = None,
+        start: Optional[date] = None,
+        horizon_days: int = TRADING_CALENDAR_HORIZON_DAYS,
+        built_for: Optional[date] = None,
+    ):
+        """
+        Args:
+            holidays: {date: description} market holidays
+            listed_expiries: {underlying: {'weekly': [dates], 'monthly': [dates]}}
+                from listed contracts; 'weekly' holds every expiry
+            start: First day covered by the tables (default: 31 days before today)
+            horizon_days: Number of days covered from `start`
+            built_for: Day the calendar was built for (default: today, IST)
+        """
+        self.built_for = built_for or _today_ist()
+        self.start = start or (self.built_for - timedelta(days=31))
+        self.end = self.start + timedelta(days=horizon_days)
+        self.horizon_days = horizon_days
+        self.holidays = dict(holidays or {})
+        self.listed_expiries = {
+            symbol.upper(): {kind: sorted(set(dates.get(kind) or [])) for kind in EXPIRY_KINDS}
+            for symbol, dates in (listed_expiries or {}).items()
+        }
+
+        self._holiday_set = frozenset(self.holidays)
+        self._trading_days = [
+            day for day in (self.start + timedelta(days=i) for i in range(horizon_days + 1))
+            if day.weekday() in TRADING_DAYS and day not in self._holiday_set
+        ]
+        self._trading_day_set = frozenset(self._trading_days)
+        self._market_open = _parse_hhmm(MARKET_OPEN_TIME)
+        self._market_close = _parse_hhmm(MARKET_CLOSE_TIME)
+
+        self._schedules: Dict[str, Dict[str, List[date]]] = {}
+        self._lock = threading.Lock()
+        for symbol in self.listed_expiries:
+            self._schedule(symbol)
+
+    # ========== Trading days ==========
+
+    def is_holiday(self, check_date: date) -> bool:
+        """True if the exchange is closed for a holiday on this date."""
+        return check_date in self._holiday_set
+
+    def is_trading_day(self, check_date: Optional[date] = None) -> bool:
+        """True if the date is a weekday and not a market holiday."""
+        if check_date is None:
+            check_date = _today_ist()
+        if self.start <= check_date <= self.end:
+            return check_date in self._trading_day_set
+        return check_date.weekday() in TRADING_DAYS and check_date not in self._holiday_set
+
+    def previous_trading_day(self, check_date: date) -> date:
+        """The latest trading day on or before `check_date`."""
+        day = check_date
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def trading_days_between(self, start: date, end: date) -> int:
+        """Number of trading days in (start, end]."""
+        if end <= start:
+            return 0
+        if self.start <= start and end <= self.end:
+            return bisect_right(self._trading_days, end) - bisect_right(self._trading_days, start)
+        return sum(
+            1 for i in range(1, (end - start).days + 1)
+            if self.is_trading_day(start + timedelta(days=i))
+        )
+
+    def trading_minutes_remaining(self, now: Optional[datetime] = None) -> int:
+        """
+        Minutes of the regular session left at `now` (0 outside trading days/hours).
+
+        Before the open this is the full session length.
+        """
+        if now is None:
+            now = datetime.now(IST)
+        elif now.tzinfo is None:
+            now = IST.localize(now)
+        else:
+            now = now.astimezone(IST)
+
+        if not self.is_trading_day(now.date()):
+            return 0
+
+        close_at = IST.localize(datetime.combine(now.date(), self._market_close))
+        open_at = IST.localize(datetime.combine(now.date(), self._market_open))
+        if now >= close_at:
+            return 0
+        return int((close_at - max(now, open_at)).total_seconds() // 60)
+
+    # ========== Expiries ==========
+
+    def _rule_expiries(self, symbol: str) -> Dict[str, List[date]]:
+        schedule = EXPIRY_SCHEDULES.get(symbol, DEFAULT_EXPIRY_SCHEDULE)
+
+        monthly = []
+        year, month = self.start.year, self.start.month
+        while date(year, month, 1) <= self.end:
+            monthly.append(self.previous_trading_day(
+                _last_weekday_of_month(year, month, schedule['monthly'])
+            ))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        if schedule['weekly'] is None:
+            return {'weekly': list(monthly), 'monthly': monthly}
+
+        weekly = []
+        day = self.start + timedelta(days=(schedule['weekly'] - self.start.weekday()) % 7)
+        while day <= self.end:
+            weekly.append(self.previous_trading_day(day))
+            day += timedelta(days=7)
+
+        return {'weekly': weekly, 'monthly': monthly}
+
+    def _schedule(self, symbol: str) -> Dict[str, List[date]]:
+        schedule = self._schedules.get(symbol)
+        if schedule is not None:
+            return schedule
+
+        with self._lock:
+            if symbol in self._schedules:
+                return self._schedules[symbol]
+
+            schedule = self._rule_expiries(symbol)
+            listed = self.listed_expiries.get(symbol)
+            if listed and listed['weekly']:
+                # Listed contracts are authoritative; rules extend past the last one
+                listed_weekly = listed['weekly']
+                listed_monthly = listed['monthly'] or _monthly_from(listed_weekly)
+                schedule = {
+                    'weekly': listed_weekly + [d for d in schedule['weekly'] if d > listed_weekly[-1]],
+                    'monthly': listed_monthly + [d for d in schedule['monthly'] if d > listed_monthly[-1]],
+                }
+
+            self._schedules[symbol] = schedule
+            return schedule
+
+    def expiries(
+        self,
+        underlying: str = 'NIFTY',
+        kind: str = 'weekly',
+        from_date: Optional[date] = None,
+        count: Optional[int] = None,
+    ) -> List[date]:
+        """
+        Expiries on or after `from_date` (default: today).
+
+        Args:
+            underlying: NIFTY, BANKNIFTY, FINNIFTY or a stock symbol
+            kind: 'weekly' (nearest contracts) or 'monthly'
+            from_date: First date to include
+            count: Maximum number of expiries to return
+        """
+        if kind not in EXPIRY_KINDS:
+            raise ValueError(f"Unknown expiry kind: {kind}")
+        dates = self._schedule(underlying.upper())[kind]
+        index = bisect_left(dates, from_date or _today_ist())
+        return dates[index:] if count is None else dates[index:index + count]
+
+    def next_expiry(
+        self,
+        underlying: str = 'NIFTY',
+        kind: str = 'weekly',
+        from_date: Optional[date] = None,
+        skip: int = 0,
+        include_today: bool = True,
+    ) -> date:
+        """
+        Nearest expiry on or after `from_date` (default: today).
+
+        Args:
+            underlying: NIFTY, BANKNIFTY, FINNIFTY or a stock symbol
+            kind: 'weekly' or 'monthly'
+            from_date: Reference date
+            skip: Number of expiries to skip (1 = the one after the nearest)
+            include_today: Whether an expiry on `from_date` counts
+
+        Raises:
+            ValueError: If the requested expiry lies beyond the calendar horizon
+        """
+        if kind not in EXPIRY_KINDS:
+            raise ValueError(f"Unknown expiry kind: {kind}")
+        from_date = from_date or _today_ist()
+        dates = self._schedule(underlying.upper())[kind]
+        index = (bisect_left if include_today else bisect_right)(dates, from_date) + skip
+        if index >= len(dates):
+            raise ValueError(f"No {kind} expiry for {underlying} within calendar horizon")
+        return dates[index]
+
+    def is_expiry_day(self, underlying: str = 'NIFTY', check_date: Optional[date] = None) -> bool:
+        """True if any contract of the underlying expires on this date."""
+        check_date = check_date or _today_ist()
+        return self.next_expiry(underlying, from_date=check_date) == check_date
+
+    @staticmethod
+    def days_to_expiry(expiry: date, from_date: Optional[date] = None) -> int:
+        """Calendar days from `from_date` (default: today) to the expiry."""
+        return (expiry - (from_date or _today_ist())).days
+
+    def trading_days_to_expiry(self, expiry: date, from_date: Optional[date] = None) -> int:
+        """Trading sessions left after `from_date` up to and including expiry day."""
+        return self.trading_days_between(from_date or _today_ist(), expiry)
+
+    # ========== Serialization ==========
+
+    def to_dict(self) -> Dict:
+        """Snapshot stored in the cache (shared between processes only with a shared cache backend)."""
+        return {
+            'built_for': self.built_for,
+            'start': self.start,
+            'horizon_days': self.horizon_days,
+            'holidays': self.holidays,
+            'listed_expiries': self.listed_expiries,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TradingCalendar':
+        return cls(
+            holidays=data['holidays'],
+            listed_expiries=data['listed_expiries'],
+            start=data['start'],
+            horizon_days=data['horizon_days'],
+            built_for=data['built_for'],
+        )
+
+
+# ========== Sources ==========
+
+def load_market_holidays() -> Dict[date, str]:
+    """NSE_MARKET_HOLIDAYS merged with the MarketHoliday table."""
+    holidays = {
+        datetime.strptime(day, '%Y-%m-%d').date(): name
+        for day, name in NSE_MARKET_HOLIDAYS.items()
+    }
+
+    try:
+        from apps.core.models import MarketHoliday
+        for day, name in MarketHoliday.objects.values_list('date', 'description'):
+            holidays[day] = name or holidays.get(day, 'Holiday')
+    except Exception as e:
+        logger.warning(f"Could not load MarketHoliday table, using built-in holidays: {e}")
+
+    return holidays
+
+
+def load_security_master_expiries(
+    security_master_path: Optional[str] = None,
+    underlyings: Iterable[str] = tuple(EXPIRY_SCHEDULES),
+) -> Dict[str, Dict[str, List[date]]]:
+    """
+    Collect listed index expiries from the SecurityMaster file.
+
+    OPTIDX rows give every expiry, FUTIDX rows the monthly ones.
+
+    Returns:
+        dict: {underlying: {'weekly': [dates], 'monthly': [dates]}}, empty if
+        the file is missing or unreadable
+    """
+    if not security_master_path:
+        from apps.brokers.utils.security_master import get_security_master_path
+        security_master_path = get_security_master_path()
+
+    if not os.path.exists(security_master_path):
+        logger.info(f"SecurityMaster not found at {security_master_path}, using expiry rules")
+        return {}
+
+    wanted = {symbol.upper() for symbol in underlyings}
+    found: Dict[str, Dict[str, set]] = {}
+
+    try:
+        with open(security_master_path, 'r') as f:
+            for row in csv.DictReader(f):
+                instrument = row.get('InstrumentName', '').strip('"')
+                if instrument not in ('OPTIDX', 'FUTIDX'):
+                    continue
+                symbol = row.get('ExchangeCode', '').strip('"').upper()
+                if symbol not in wanted:
+                    continue
+                try:
+                    expiry = datetime.strptime(row.get('ExpiryDate', '').strip('"'), '%d-%b-%Y').date()
+                except ValueError:
+                    continue
+
+                entry = found.setdefault(symbol, {'weekly': set(), 'monthly': set()})
+                entry['weekly'].add(expiry)
+                if instrument == 'FUTIDX':
+                    entry['monthly'].add(expiry)
+    except Exception as e:
+        logger.error(f"Error reading SecurityMaster expiries: {e}", exc_info=True)
+        return {}
+
+    return {
+        symbol: {kind: sorted(dates) for kind, dates in entry.items()}
+        for symbol, entry in found.items()
+    }
+
+
+def fetch_nse_expiry_dates(symbol: str = 'NIFTY', timeout: int = 15) -> List[date]:
+    """
+    Fetch listed option expiry dates for an index from NSE.
+
+    NSE only provides the LIST OF EXPIRY DATES here; option chain data is
+    always fetched from the broker. NSE may block automated access (403).
+
+    Returns:
+        List[date]: Sorted expiry dates
+
+    Raises:
+        RuntimeError: If data fetch/parsing fails or NSE blocks access
+    """
+    sess = requests.Session()
+
+    # Browser-like headers to avoid 403 errors
+    sess.headers.update({
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Cache-Control": "max-age=0",
+    })
+
+    try:
+        # Visit NSE homepage first to get cookies
+        resp_home = sess.get(NSE_BASE, timeout=timeout)
+        if not resp_home.ok:
+            logger.warning(f"NSE homepage returned {resp_home.status_code}, continuing anyway...")
+
+        # Small delay to mimic human behavior (runs once a day in the refresh task)
+        time_module.sleep(1)
+
+        sess.headers.update({
+            "Accept": "application/json, text/plain, */*",
+            "Referer": "https://www.nseindia.com/option-chain",
+        })
+
+        resp = sess.get(NSE_OC_URL.format(symbol=symbol.upper()), timeout=timeout)
+        if not resp.ok:
+            raise RuntimeError(f"NSE option chain request failed: {resp.status_code}")
+
+        expiry_list = resp.json()["records"]["expiryDates"]
+        if not expiry_list:
+            raise RuntimeError("Expiry list is empty from NSE")
+
+        result = sorted({datetime.strptime(s, "%d-%b-%Y").date() for s in expiry_list})
+        logger.info(f"Fetched {len(result)} {symbol} expiry dates from NSE")
+        return result
+
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Failed to fetch NSE option chain data: {e}") from e
+    except (KeyError, ValueError, json.JSONDecodeError) as e:
+        raise RuntimeError(f"Failed to parse NSE response: {e}") from e
+
+
+def build_trading_calendar(
+    fetch_nse: bool = False,
+    security_master_path: Optional[str] = None,
+) -> TradingCalendar:
+    """
+    Build a calendar from all sources.
+
+    Args:
+        fetch_nse: Also fetch listed NIFTY expiries from NSE (slow; refresh task only)
+        security_master_path: Optional custom SecurityMaster path
+    """
+    holidays = load_market_holidays()
+    listed = load_security_master_expiries(security_master_path)
+
+    if fetch_nse:
+        try:
+            nse_dates = fetch_nse_expiry_dates('NIFTY')
+            entry = listed.setdefault('NIFTY', {'weekly': [], 'monthly': []})
+            entry['weekly'] = sorted(set(entry['weekly']) | set(nse_dates))
+        except RuntimeError as e:
+            logger.warning(f"NSE expiry fetch failed (normal if NSE blocks API): {e}")
+
+    calendar = TradingCalendar(holidays=holidays, listed_expiries=listed)
+    logger.info(
+        f"Trading calendar built for {calendar.built_for}: {len(holidays)} holidays, "
+        f"listed expiries for {sorted(listed) or 'none'}"
+    )
+    return calendar
+
+
+# ========== Process-wide calendar ==========
+
+_calendar: Optional[TradingCalendar] = None
+_calendar_version = ''  # Version stamp the in-process calendar was built for
+_version_checked_at = 0.0
+_calendar_lock = threading.Lock()
+
+
+def _read_version() -> Optional[str]:
+    """Current version stamp, or None when the database cannot be read."""
+    from apps.core.models import NseFlag
+
+    try:
+        return NseFlag.get(VERSION_FLAG)
+    except Exception as e:
+        logger.debug(f"Trading calendar version not readable: {e}")
+        return None
+
+
+def _bump_version() -> str:
+    from apps.core.models import NseFlag
+
+    version = f"{time_module.time():.6f}"
+    try:
+        NseFlag.set(VERSION_FLAG, version, "Trading calendar version; processes rebuild when it changes")
+    except Exception as e:
+        logger.warning(f"Could not publish trading calendar version: {e}")
+    return version
+
+
+def _check_version():
+    """Drop the in-process calendar when another process refreshed or reset it (throttled)."""
+    global _calendar, _calendar_version, _version_checked_at
+
+    now = time_module.monotonic()
+    if _calendar is None or now - _version_checked_at < TRADING_CALENDAR_VERSION_CHECK_SECONDS:
+        return
+    _version_checked_at = now
+    version = _read_version()
+    if version is not None and version != _calendar_version:
+        _calendar = None
+        cache.delete(CACHE_KEY)
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """
+    Today's calendar.
+
+    Served from memory; on the first call of a day (or after another process
+    bumped the version stamp) it is loaded from the cache snapshot, or built
+    locally if none exists.
+    """
+    global _calendar, _calendar_version, _version_checked_at
+
+    with _calendar_lock:
+        _check_version()
+
+    calendar = _calendar
+    today = _today_ist()
+    if calendar is not None and calendar.built_for == today:
+        return calendar
+
+    with _calendar_lock:
+        if _calendar is not None and _calendar.built_for == today:
+            return _calendar
+
+        version = _read_version() or ''
+        snapshot = cache.get(CACHE_KEY)
+        if snapshot and snapshot.get('built_for') == today and snapshot.get('version', '') == version:
+            _calendar = TradingCalendar.from_dict(snapshot)
+        else:
+            _calendar = build_trading_calendar()
+            cache.set(CACHE_KEY, dict(_calendar.to_dict(), version=version), TRADING_CALENDAR_CACHE_TIMEOUT)
+        _calendar_version = version
+        _version_checked_at = time_module.monotonic()
+        return _calendar
+
+
+def refresh_trading_calendar(fetch_nse: bool = True) -> TradingCalendar:
+    """
+    Rebuild the calendar from all sources and bump the version stamp, so
+    every other process rebuilds its own on its next version check.
+
+    Run once a day after the SecurityMaster file is updated (8:00 AM IST).
+    """
+    global _calendar, _calendar_version, _version_checked_at
+
+    calendar = build_trading_calendar(fetch_nse=fetch_nse)
+    with _calendar_lock:
+        version = _bump_version()
+        _calendar = calendar
+        _calendar_version = version
+        _version_checked_at = time_module.monotonic()
+        cache.set(CACHE_KEY, dict(calendar.to_dict(), version=version), TRADING_CALENDAR_CACHE_TIMEOUT)
+    return calendar
+
+
+def reset_trading_calendar():
+    """Drop the calendar in this process and, through the version stamp, in all others (e.g. after editing holidays)."""
+    global _calendar, _calendar_version
+
+    with _calendar_lock:
+        _calendar = None
+        _calendar_version = ''
+        cache.delete(CACHE_KEY)
+        _bump_version()
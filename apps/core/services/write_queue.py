@@ -0,0 +1,210 @@
+"""
+Database Writer Queue
+
+Batches small writes from hot loops (task log rows, monitor updates) into one
+transaction per flush instead of one transaction per row. On SQLite every
+commit takes the database write lock, so fewer, larger commits leave more room
+for the other processes sharing the file.
+
+Writes are applied by a background thread at least every
+DB_WRITE_QUEUE_FLUSH_SECONDS, or sooner when DB_WRITE_QUEUE_MAX_BATCH writes
+are pending. With settings.DB_WRITE_QUEUE_ENABLED off (the default) writes
+run immediately in the caller.
+
+Usage:
+    from apps.core.services.write_queue import get_write_queue
+
+    queue = get_write_queue()
+    queue.create(BkLog, level='info', action='tick', message='...')
+    queue.submit(lambda: Position.objects.filter(id=pk).update(current_price=price))
+"""
+
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, List, Optional, Tuple
+
+from django.db import close_old_connections, transaction
+
+from apps.core.constants import DB_WRITE_QUEUE_FLUSH_SECONDS, DB_WRITE_QUEUE_MAX_BATCH
+from apps.core.utils.db import retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+
+class DBWriteQueue:
+    """
+    In-process queue of pending writes, committed in batches.
+
+    Two kinds of writes are queued:
+    - create(model, **fields): grouped per model into bulk_create()
+    - submit(func): any callable, run inside the batch transaction
+    """
+
+    def __init__(self, flush_interval: float = DB_WRITE_QUEUE_FLUSH_SECONDS,
+                 max_batch: int = DB_WRITE_QUEUE_MAX_BATCH, background: bool = True):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.background = background
+
+        self._pending: List[Tuple[str, object]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {'writes': 0, 'batches': 0, 'failed': 0}
+
+    # ========== Enqueue ==========
+
+    def create(self, model, **fields):
+        """Queue a row insert."""
+        self._enqueue(('create', model(**fields)))
+
+    def submit(self, func: Callable[[], object]):
+        """Queue a callable that performs a write."""
+        self._enqueue(('call', func))
+
+    def _enqueue(self, item: Tuple[str, object]):
+        with self._lock:
+            self._pending.append(item)
+            pending = len(self._pending)
+
+        if not self.background:
+            return
+        self._ensure_thread()
+        if pending >= self.max_batch:
+            self._wakeup.set()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ========== Flush ==========
+
+    def flush(self) -> int:
+        """
+        Commit all pending writes in the calling thread.
+
+        Returns:
+            int: Number of writes applied
+        """
+        applied = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[:self.max_batch]
+                    del self._pending[:self.max_batch]
+                if not batch:
+                    return applied
+                applied += self._apply(batch)
+
+    def _apply(self, batch: List[Tuple[str, object]]) -> int:
+        try:
+            self._commit_batch(batch)
+            self.stats['batches'] += 1
+            self.stats['writes'] += len(batch)
+            return len(batch)
+        except Exception as e:
+            # One bad write must not lose the rest of the batch
+            logger.warning(f"Write batch of {len(batch)} failed ({e}), applying individually")
+
+        applied = 0
+        for item in batch:
+            try:
+                self._commit_batch([item])
+                applied += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Queued write failed: {e}")
+        self.stats['writes'] += applied
+        return applied
+
+    @retry_on_locked()
+    def _commit_batch(self, batch: List[Tuple[str, object]]):
+        creates = defaultdict(list)
+        calls = []
+        for kind, payload in batch:
+            if kind == 'create':
+                creates[type(payload)].append(payload)
+            else:
+                calls.append(payload)
+
+        with transaction.atomic():
+            for model, objects in creates.items():
+                model.objects.bulk_create(objects)
+            for func in calls:
+                func()
+
+    # ========== Background thread ==========
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name='db-write-queue', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Write queue flush failed: {e}", exc_info=True)
+        finally:
+            close_old_connections()
+
+    def close(self):
+        """Stop the background thread and commit what is left."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+class ImmediateWriteQueue:
+    """Same interface as DBWriteQueue; every write runs immediately."""
+
+    def create(self, model, **fields):
+        return model.objects.create(**fields)
+
+    def submit(self, func: Callable[[], object]):
+        return func()
+
+    def pending_count(self) -> int:
+        return 0
+
+    def flush(self) -> int:
+        return 0
+
+    def close(self):
+        pass
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """The process-wide writer queue (immediate writes unless DB_WRITE_QUEUE_ENABLED)."""
+    global _write_queue
+
+    if _write_queue is None:
+        from django.conf import settings
+
+        with _write_queue_lock:
+            if _write_queue is None:
+                if getattr(settings, 'DB_WRITE_QUEUE_ENABLED', False):
+                    _write_queue = DBWriteQueue()
+                    atexit.register(_write_queue.close)
+                else:
+                    _write_queue = ImmediateWriteQueue()
+    return _write_queue
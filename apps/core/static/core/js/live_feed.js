@@ -0,0 +1,77 @@
+/**
+ * mCube Trading System - Live Feed
+ *
+ * Subscribes to server-pushed updates (Server-Sent Events from
+ * /system/api/live/) and falls back to polling where EventSource is not
+ * available or the stream keeps failing.
+ *
+ * Usage:
+ *   const feed = LiveFeed.subscribe('dashboard', {
+ *       dashboard: (data) => { ... },
+ *       task_event: (data) => { ... },
+ *   }, { fallback: () => startPolling() });
+ *   feed.close();
+ */
+
+const LiveFeed = (function() {
+    const ENDPOINT = '/system/api/live/';
+    const MAX_FAILURES = 3;
+
+    function subscribe(topic, handlers, options = {}) {
+        const fallback = options.fallback || null;
+        let source = null;
+        let failures = 0;
+        let closed = false;
+        let fellBack = false;
+
+        function useFallback() {
+            if (fellBack || closed) return;
+            fellBack = true;
+            if (source) source.close();
+            if (fallback) fallback();
+        }
+
+        if (!window.EventSource) {
+            useFallback();
+            return { close() { closed = true; } };
+        }
+
+        source = new EventSource(`${ENDPOINT}?topic=${encodeURIComponent(topic)}`);
+
+        Object.keys(handlers).forEach(eventType => {
+            source.addEventListener(eventType, (event) => {
+                failures = 0;
+                let data = null;
+                try {
+                    data = JSON.parse(event.data);
+                } catch (e) {
+                    console.error(`Live feed: bad ${eventType} payload`, e);
+                    return;
+                }
+                handlers[eventType](data, event);
+            });
+        });
+
+        source.addEventListener('open', () => { failures = 0; });
+
+        // EventSource reconnects by itself (server closes long-lived streams);
+        // only give up after repeated failures
+        source.addEventListener('error', () => {
+            if (closed) return;
+            failures += 1;
+            if (failures >= MAX_FAILURES || source.readyState === EventSource.CLOSED) {
+                console.warn(`Live feed '${topic}' unavailable, falling back to polling`);
+                useFallback();
+            }
+        });
+
+        return {
+            close() {
+                closed = true;
+                source.close();
+            }
+        };
+    }
+
+    return { subscribe };
+})();
@@ -0,0 +1,50 @@
+"""
+Celery tasks for core maintenance
+
+Log lifecycle: BkLog / MonitorLog rows past their retention window are rolled
+up into LogRollup and moved to the log archive (apps.core.services.log_lifecycle).
+"""
+
+from celery import shared_task
+from django.utils import timezone
+
+from apps.core.utils.task_logger import TaskLogger
+
+
+@shared_task(name='apps.core.tasks.archive_old_logs', bind=True)
+def archive_old_logs(self):
+    """
+    Roll up and archive old task and monitoring logs (hourly)
+
+    Works in small batches; a backlog larger than one run's batch limit is
+    finished by the following runs.
+    """
+    from apps.core.services.log_lifecycle import run_log_lifecycle
+
+    logger = TaskLogger(
+        task_name='archive_old_logs',
+        task_category='other',
+        task_id=self.request.id
+    )
+
+    logger.start("Archiving old log rows")
+
+    try:
+        stats = run_log_lifecycle()
+        archived = sum(table['archived'] for table in stats.values())
+
+        logger.success(f"Archived {archived} log rows", context={
+            table: {'archived': s['archived'], 'batches': s['batches'], 'complete': s['complete']}
+            for table, s in stats.items()
+        })
+
+        return {
+            "status": "success",
+            "archived": archived,
+            "tables": stats,
+            "timestamp": timezone.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.failure("Error archiving old logs", error=e)
+        return {"status": "error", "error": str(e)}
@@ -0,0 +1,785 @@
+"""
+Core App Tests - Trading Calendar, Live Feed and Database Concurrency
+
+Tests for:
+1. Holiday-aware trading days and session minutes
+2. Rule-based and listed expiry schedules
+3. SecurityMaster expiry loading
+4. Process-wide calendar caching
+5. Live feed fan-out, producers and background broker syncs
+6. SQLite pragmas, lock retries and the writer queue
+7. Benchmark runner and import-time profile
+8. Request, task and broker telemetry
+9. Query plans of the hot queries and date-range helpers
+10. Log rollup, archiving and retention
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path
+
+from apps.core.models import MarketHoliday
+from apps.core.services.trading_calendar import (
+    TradingCalendar,
+    get_trading_calendar,
+    load_market_holidays,
+    load_security_master_expiries,
+    reset_trading_calendar,
+)
+
+
+def make_calendar(**kwargs):
+    return TradingCalendar(
+        holidays=load_market_holidays(),
+        start=date(2025, 10, 1),
+        built_for=date(2025, 10, 1),
+        **kwargs
+    )
+
+
+class TradingDayTests(TestCase):
+    """Test trading days and session minutes"""
+
+    def test_holidays_and_weekends(self):
+        calendar = make_calendar()
+        self.assertFalse(calendar.is_trading_day(date(2025, 10, 21)))  # Diwali
+        self.assertFalse(calendar.is_trading_day(date(2025, 10, 25)))  # Saturday
+        self.assertTrue(calendar.is_trading_day(date(2025, 10, 20)))
+
+    def test_market_holiday_table_is_merged(self):
+        MarketHoliday.objects.create(date=date(2025, 10, 16), description='Special closure')
+        calendar = make_calendar()
+        self.assertTrue(calendar.is_holiday(date(2025, 10, 16)))
+
+    def test_trading_days_between_skips_holidays(self):
+        calendar = make_calendar()
+        # Oct 20 (Mon) .. Oct 24 (Fri): 21st and 22nd are holidays
+        self.assertEqual(calendar.trading_days_between(date(2025, 10, 19), date(2025, 10, 24)), 3)
+
+    def test_trading_minutes_remaining(self):
+        calendar = make_calendar()
+        self.assertEqual(calendar.trading_minutes_remaining(datetime(2025, 10, 20, 15, 0)), 30)
+        self.assertEqual(calendar.trading_minutes_remaining(datetime(2025, 10, 20, 8, 0)), 375)
+        self.assertEqual(calendar.trading_minutes_remaining(datetime(2025, 10, 20, 16, 0)), 0)
+        self.assertEqual(calendar.trading_minutes_remaining(datetime(2025, 10, 21, 10, 0)), 0)
+
+
+class ExpiryScheduleTests(TestCase):
+    """Test expiry lookups"""
+
+    def test_weekly_expiry_moves_before_holiday(self):
+        calendar = make_calendar()
+        # Tuesday Oct 21 is a holiday -> expiry on Monday Oct 20
+        self.assertEqual(calendar.next_expiry('NIFTY', from_date=date(2025, 10, 15)), date(2025, 10, 20))
+        self.assertEqual(calendar.next_expiry('NIFTY', from_date=date(2025, 10, 15), skip=1),
+                         date(2025, 10, 28))
+
+    def test_expiry_day_counts_unless_excluded(self):
+        calendar = make_calendar()
+        self.assertEqual(calendar.next_expiry('NIFTY', from_date=date(2025, 10, 14)), date(2025, 10, 14))
+        self.assertEqual(calendar.next_expiry('NIFTY', from_date=date(2025, 10, 14), include_today=False),
+                         date(2025, 10, 20))
+        self.assertTrue(calendar.is_expiry_day('NIFTY', date(2025, 10, 14)))
+
+    def test_monthly_and_stock_expiries(self):
+        calendar = make_calendar()
+        # Last Tuesday of the month, as listed (FUTIDX / OPTSTK 28-Oct-2025 below)
+        self.assertEqual(calendar.next_expiry('NIFTY', kind='monthly', from_date=date(2025, 10, 1)),
+                         date(2025, 10, 28))
+        self.assertEqual(calendar.next_expiry('FINNIFTY', kind='monthly', from_date=date(2025, 10, 1)),
+                         date(2025, 10, 28))
+        # Stocks have no weekly contracts
+        self.assertEqual(calendar.next_expiry('RELIANCE', from_date=date(2025, 10, 1)), date(2025, 10, 28))
+        self.assertEqual(calendar.next_expiry('RELIANCE', from_date=date(2025, 10, 29)), date(2025, 11, 25))
+
+    def test_listed_expiries_take_precedence(self):
+        calendar = make_calendar(listed_expiries={'NIFTY': {'weekly': [date(2025, 10, 6), date(2025, 10, 14)]}})
+        self.assertEqual(calendar.expiries('NIFTY', from_date=date(2025, 10, 1), count=3),
+                         [date(2025, 10, 6), date(2025, 10, 14), date(2025, 10, 20)])
+
+    def test_security_master_expiries(self):
+        rows = [
+            'Token,InstrumentName,ShortName,ExchangeCode,ExpiryDate,StrikePrice,OptionType',
+            '1,OPTIDX,NIFTY,NIFTY,07-Oct-2025,24500,CE',
+            '2,OPTIDX,NIFTY,NIFTY,28-Oct-2025,24500,CE',
+            '3,FUTIDX,NIFTY,NIFTY,28-Oct-2025,0,XX',
+            '4,OPTSTK,RELIND,RELIANCE,28-Oct-2025,1400,CE',
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('\n'.join(rows))
+        self.addCleanup(os.remove, f.name)
+
+        listed = load_security_master_expiries(f.name)
+
+        self.assertEqual(list(listed), ['NIFTY'])
+        self.assertEqual(listed['NIFTY']['weekly'], [date(2025, 10, 7), date(2025, 10, 28)])
+        self.assertEqual(listed['NIFTY']['monthly'], [date(2025, 10, 28)])
+
+
+class CalendarCacheTests(TestCase):
+    """Test the process-wide calendar"""
+
+    def setUp(self):
+        reset_trading_calendar()
+        self.addCleanup(reset_trading_calendar)
+
+    def test_calendar_built_once_per_day(self):
+        self.assertIs(get_trading_calendar(), get_trading_calendar())
+
+    def test_version_bump_from_another_process_rebuilds(self):
+        from apps.core.models import NseFlag
+        from apps.core.services import trading_calendar
+
+        calendar = get_trading_calendar()
+        NseFlag.set(trading_calendar.VERSION_FLAG, 'refreshed-by-worker')
+        self.assertIs(get_trading_calendar(), calendar)  # Not checked again within the interval
+
+        trading_calendar._version_checked_at = 0.0
+        rebuilt = get_trading_calendar()
+        self.assertIsNot(rebuilt, calendar)
+        self.assertIs(get_trading_calendar(), rebuilt)
+
+    def test_date_utils_use_calendar(self):
+        from apps.core.utils import get_current_weekly_expiry, get_next_weekly_expiry
+
+        calendar = get_trading_calendar()
+        self.assertEqual(get_current_weekly_expiry('NIFTY'), calendar.next_expiry('NIFTY'))
+        self.assertEqual(get_next_weekly_expiry('NIFTY'), calendar.next_expiry('NIFTY', skip=1))
+
+
+class FakeProducer:
+    """Counts polls and emits one message per poll"""
+
+    def __init__(self):
+        self.polls = 0
+        self.polled = threading.Event()
+
+    def poll(self):
+        self.polls += 1
+        self.polled.set()
+        return [{'type': 'tick', 'data': self.polls}]
+
+    def snapshot(self):
+        return [{'type': 'tick', 'data': self.polls}] if self.polls else []
+
+
+class LiveFeedHubTests(SimpleTestCase):
+    """Test per-topic producer fan-out"""
+
+    def setUp(self):
+        from apps.core.services.live_feed import LiveFeedHub
+
+        self.producers = []
+
+        def factory(topic):
+            producer = FakeProducer()
+            self.producers.append(producer)
+            return producer
+
+        self.hub = LiveFeedHub(interval=60, producer_factory=factory)
+        self.addCleanup(self.hub.close)
+
+    def test_one_producer_per_topic(self):
+        subscriptions = [self.hub.subscribe('dashboard') for _ in range(3)]
+        self.producers[0].polled.wait(5)
+
+        self.assertEqual(len(self.producers), 1)
+        self.assertEqual(self.producers[0].polls, 1)
+        for subscription in subscriptions:
+            self.assertEqual(subscription.get_sync(5), {'type': 'tick', 'data': 1})
+        self.assertEqual(self.hub.subscriber_count('dashboard'), 3)
+
+    def test_late_subscriber_gets_snapshot(self):
+        self.hub.subscribe('dashboard')
+        self.producers[0].polled.wait(5)
+
+        late = self.hub.subscribe('dashboard')
+        self.assertEqual(late.get_sync(1), {'type': 'tick', 'data': 1})
+
+    def test_producer_stops_with_last_subscriber(self):
+        first = self.hub.subscribe('dashboard')
+        second = self.hub.subscribe('dashboard')
+
+        self.hub.unsubscribe(first)
+        self.assertEqual(self.hub.subscriber_count('dashboard'), 1)
+        self.hub.unsubscribe(second)
+        self.assertEqual(self.hub.subscriber_count('dashboard'), 0)
+
+        # A new subscriber starts a fresh producer
+        self.hub.subscribe('dashboard')
+        self.assertEqual(len(self.producers), 2)
+
+    def test_slow_subscriber_drops_oldest(self):
+        from apps.core.services.live_feed import Subscription
+
+        subscription = Subscription('dashboard', maxsize=2)
+        for n in range(3):
+            subscription.push({'type': 'tick', 'data': n})
+
+        self.assertEqual(subscription.dropped, 1)
+        self.assertEqual(subscription.get_sync(0)['data'], 1)
+
+    def test_format_sse(self):
+        from apps.core.services.live_feed import format_sse
+
+        self.assertEqual(
+            format_sse({'type': 'progress', 'data': {'a': 1}, 'id': 7}),
+            'id: 7\nevent: progress\ndata: {"a": 1}\n\n'
+        )
+
+
+class LiveFeedProducerTests(TestCase):
+    """Test live feed producers and background syncs"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_execution_producer_reads_new_events_only(self):
+        from apps.core.services.live_feed import create_producer
+        from apps.core.utils.event_stream import ExecutionEventStream
+
+        stream = ExecutionEventStream('test_progress')
+        stream.publish('order_placed', 'Batch 1 placed')
+        producer = create_producer('execution:test_progress')
+
+        messages = producer.poll()
+        self.assertEqual([m['type'] for m in messages], ['execution_event', 'progress'])
+
+        stream.publish('order_placed', 'Batch 2 placed')
+        messages = producer.poll()
+        events = [m for m in messages if m['type'] == 'execution_event']
+        self.assertEqual([e['data']['message'] for e in events], ['Batch 2 placed'])
+
+        self.assertEqual([m for m in producer.poll() if m['type'] == 'execution_event'], [])
+
+    def test_unknown_topic_rejected(self):
+        from apps.core.services.live_feed import create_producer
+
+        with self.assertRaises(ValueError):
+            create_producer('orders')
+
+    def test_dashboard_snapshot_and_task_events(self):
+        from apps.core.models import BkLog
+        from apps.core.services.live_feed import DashboardProducer
+
+        BkLog.objects.create(level='info', action='sync', message='Positions synced')
+        producer = DashboardProducer()
+
+        messages = producer.poll()
+        self.assertEqual(messages[0]['type'], 'dashboard')
+        self.assertEqual(messages[0]['data']['positions'], 0)
+        self.assertEqual(messages[1]['data']['message'], 'Positions synced')
+
+        # Unchanged snapshot and no new events -> nothing to send
+        self.assertEqual(producer.poll(), [])
+
+    def test_broker_sync_runs_once_while_locked(self):
+        from apps.core.services import dashboard
+
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def job():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+
+        original = dashboard.BROKER_SYNC_JOBS['orders']
+        dashboard.BROKER_SYNC_JOBS['orders'] = job
+        self.addCleanup(dashboard.BROKER_SYNC_JOBS.__setitem__, 'orders', original)
+
+        self.assertTrue(dashboard.schedule_broker_sync('orders'))
+        self.assertFalse(dashboard.schedule_broker_sync('orders'))
+        started.wait(5)
+        release.set()
+        self.assertEqual(len(calls), 1)
+
+
+class SQLiteTuningTests(SimpleTestCase):
+    """Test connection pragmas and lock retries"""
+
+    def test_pragmas_enable_wal(self):
+        from apps.core.utils.db import apply_sqlite_pragmas
+
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = sqlite3.connect(os.path.join(tmp, 'test.sqlite3'))
+            applied = apply_sqlite_pragmas(conn.cursor(), {'journal_mode': 'WAL', 'synchronous': 'NORMAL'})
+            self.assertEqual(applied['journal_mode'], 'wal')
+            self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 1)
+            conn.close()
+
+    def test_retry_on_locked(self):
+        from django.db import OperationalError
+        from apps.core.utils.db import retry_on_locked
+
+        attempts = []
+
+        @retry_on_locked(attempts=3, delay=0)
+        def write():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        self.assertEqual(write(), 'ok')
+        self.assertEqual(len(attempts), 3)
+
+    def test_other_errors_not_retried(self):
+        from django.db import OperationalError
+        from apps.core.utils.db import retry_on_locked
+
+        attempts = []
+
+        @retry_on_locked(attempts=3, delay=0)
+        def write():
+            attempts.append(1)
+            raise OperationalError('no such table: bk_log')
+
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(attempts), 1)
+
+
+class WriteQueueTests(TestCase):
+    """Test batched writes"""
+
+    def test_creates_are_batched(self):
+        from apps.core.models import BkLog
+        from apps.core.services.write_queue import DBWriteQueue
+
+        queue = DBWriteQueue(max_batch=10, background=False)
+        for n in range(25):
+            queue.create(BkLog, level='info', action='tick', message=f'tick {n}')
+
+        self.assertEqual(BkLog.objects.count(), 0)
+        self.assertEqual(queue.flush(), 25)
+        self.assertEqual(BkLog.objects.count(), 25)
+        self.assertEqual(queue.stats['batches'], 3)
+
+    def test_failed_write_does_not_lose_batch(self):
+        from apps.core.models import BkLog
+        from apps.core.services.write_queue import DBWriteQueue
+
+        def broken():
+            raise ValueError('bad write')
+
+        queue = DBWriteQueue(background=False)
+        queue.create(BkLog, level='info', action='a', message='first')
+        queue.submit(broken)
+        queue.create(BkLog, level='info', action='b', message='second')
+
+        self.assertEqual(queue.flush(), 2)
+        self.assertEqual(queue.stats['failed'], 1)
+        self.assertEqual(BkLog.objects.count(), 2)
+
+    def test_bklog_writes_immediately_by_default(self):
+        from apps.core.models import BkLog
+
+        entry = BkLog.log('info', 'sync', 'Positions synced')
+        self.assertEqual(BkLog.objects.get().pk, entry.pk)
+
+
+class BenchmarkRunnerTests(TestCase):
+    """Benchmark fixtures roll back; history comparisons flag regressions."""
+
+    def test_fixtures_are_rolled_back(self):
+        from apps.core.benchmarks import get_benchmarks, run_benchmark
+        from apps.data.models import ContractData
+
+        bench = get_benchmarks(['find_max_pain'])[0]
+        result = run_benchmark(bench, scale=0.1, rounds=2, warmup=0)
+
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['rounds'], 2)
+        self.assertEqual(ContractData.objects.count(), 0)
+
+    def test_only_missing_third_party_packages_skip(self):
+        from apps.core.benchmarks import get_benchmarks, run_benchmark
+        from apps.core.benchmarks.runner import Benchmark
+
+        def failing(error):
+            def setup(scale):
+                raise error
+            return setup
+
+        def run(error):
+            return run_benchmark(Benchmark('b', 'g', failing(error)), rounds=1, warmup=0)
+
+        self.assertEqual(run(ModuleNotFoundError("No module named 'talib'", name='talib'))['status'], 'skipped')
+        self.assertEqual(run(ModuleNotFoundError("No module named 'apps.x'", name='apps.x'))['status'], 'error')
+        self.assertEqual(run(ImportError("cannot import name 'X'", name='apps.trading.services'))['status'], 'error')
+
+        screen = run_benchmark(get_benchmarks(['screen_futures_opportunities'])[0], scale=0.1, rounds=1, warmup=0)
+        self.assertEqual(screen['status'], 'ok', screen.get('error'))
+
+    def test_failing_cleanup_does_not_abort_the_run(self):
+        from apps.core.benchmarks import run_suite
+        from apps.core.benchmarks.runner import Benchmark
+
+        def broken_cleanup():
+            raise RuntimeError('database is locked')
+
+        benchmarks = [Benchmark('first', 'g', lambda scale: (lambda: None, 1, broken_cleanup)),
+                      Benchmark('second', 'g', lambda scale: (lambda: None, 1))]
+        results = run_suite(benchmarks, rounds=1)['results']
+
+        self.assertEqual([results[name]['status'] for name in ('first', 'second')], ['ok', 'ok'])
+
+    def test_unknown_selector(self):
+        from apps.core.benchmarks import get_benchmarks
+
+        self.assertEqual({b.name for b in get_benchmarks(['risk'])}, {'check_risk_limits'})
+        with self.assertRaises(KeyError):
+            get_benchmarks(['no_such_benchmark'])
+
+    def test_compare_runs(self):
+        from apps.core.benchmarks import compare_runs
+
+        def run(scale=1.0, **medians):
+            return {'scale': scale, 'results': {
+                name: {'status': 'ok', 'median_ms': ms} for name, ms in medians.items()
+            }}
+
+        reference = run(a=100.0, b=100.0, c=100.0, d=1.0)
+        rows = {row['name']: row for row in compare_runs(run(a=140.0, b=60.0, c=110.0, d=2.5, e=5.0), reference)}
+
+        self.assertEqual(rows['a']['status'], 'regression')
+        self.assertEqual(rows['a']['change_pct'], 40.0)
+        self.assertEqual(rows['b']['status'], 'improvement')
+        self.assertEqual(rows['c']['status'], 'ok')
+        self.assertEqual(rows['d']['status'], 'ok')  # within the noise floor
+        self.assertEqual(rows['e']['status'], 'new')
+        self.assertEqual(compare_runs(run(a=140.0), reference, overrides={'a': 0.5})[0]['status'], 'ok')
+        self.assertEqual(compare_runs(run(scale=0.1, a=140.0), reference)[0]['status'], 'new')
+
+    def test_history_round_trip(self):
+        from apps.core.benchmarks import load_history, save_history
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench', 'history.json')
+            self.assertEqual(load_history(path), {'baseline': None, 'runs': []})
+
+            run = {'timestamp': 't', 'scale': 1.0, 'results': {}}
+            save_history({'baseline': run, 'runs': [run] * 250}, path)
+            history = load_history(path)
+
+            self.assertEqual(history['baseline'], run)
+            self.assertEqual(len(history['runs']), 200)
+
+
+class ImportProfileTests(SimpleTestCase):
+    """-X importtime parsing and heavy-library attribution."""
+
+    REPORT = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       200 |        200 |     pandas._libs",
+        "import time:      5000 |       5200 |   pandas",
+        "import time:       100 |       5300 | apps.data.importers",
+        "import time:        50 |         50 | apps.risk.tasks",
+    ])
+
+    def test_parse_and_attribute(self):
+        from apps.core.services.import_profile import heavy_imports, parse_importtime
+
+        records = parse_importtime(self.REPORT)
+        self.assertEqual([(r.module, r.depth) for r in records],
+                         [('pandas._libs', 2), ('pandas', 1), ('apps.data.importers', 0), ('apps.risk.tasks', 0)])
+        self.assertEqual(records[1].cumulative_ms, 5.2)
+        self.assertEqual(heavy_imports(records), {'pandas': 'apps.data.importers'})
+
+    def test_worker_startup_loads_no_heavy_library(self):
+        from apps.core.services.import_profile import profile_startup
+
+        profile = profile_startup('worker', budget_ms=60000)
+        self.assertEqual(profile.heavy_modules, {})
+        self.assertGreater(profile.module_count, 0)
+
+
+
+def _telemetry_view(request):
+    cache.get('telemetry-test')
+    cache.set('telemetry-test', 1)
+    cache.get('telemetry-test')
+    return HttpResponse(str(MarketHoliday.objects.count()))
+
+
+urlpatterns = [path('telemetry-test/', _telemetry_view, name='telemetry_test')]
+
+
+class FakeBrokerClient:
+    def __init__(self):
+        self.on_ticks = None
+
+    def get_quotes(self, stock_code):
+        return {'Status': 200, 'stock_code': stock_code}
+
+    def place_order(self, **kwargs):
+        raise RuntimeError('rejected')
+
+
+class TelemetryTests(TestCase):
+    """Per-request / per-task histograms, broker latency, snapshots and /metrics."""
+
+    def setUp(self):
+        from apps.core.services import telemetry
+
+        self.telemetry = telemetry
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        overrides = override_settings(TELEMETRY_DIR=self.directory, TELEMETRY_METRICS_TOKEN='')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        telemetry.registry.reset()
+        self.addCleanup(telemetry.registry.reset)
+        cache.delete('telemetry-test')
+
+    def series(self, metric, **labels):
+        for (name, series_labels), values in self.telemetry.registry.histograms.items():
+            if name == metric and dict(series_labels) == labels:
+                return values
+        return None
+
+    @override_settings(ROOT_URLCONF='apps.core.tests')
+    def test_request_records_time_queries_and_cache_reads(self):
+        self.client.get('/telemetry-test/')
+
+        seconds = self.series('mcube_view_seconds', view='telemetry_test', outcome='2xx')
+        queries = self.series('mcube_view_db_queries', view='telemetry_test')
+        self.assertEqual(seconds[-1], 1)
+        self.assertGreaterEqual(queries[-2], 1)
+        counters = {dict(labels)['result']: value for (name, labels), value in self.telemetry.registry.counters.items()
+                    if name == 'mcube_view_cache_reads_total'}
+        self.assertEqual(counters, {'hit': 1, 'miss': 1})
+
+        self.client.get('/no-such-page/')
+        self.assertIsNotNone(self.series('mcube_view_seconds', view='<unresolved>', outcome='4xx'))
+
+    def test_broker_calls_are_timed_and_attributes_pass_through(self):
+        client = self.telemetry.instrument_client('breeze', FakeBrokerClient())
+        callback = lambda ticks: None
+        client.on_ticks = callback
+
+        with self.telemetry.measure(self.telemetry.KIND_TASK, 'sync_positions') as scope:
+            self.assertEqual(client.get_quotes(stock_code='NIFTY')['stock_code'], 'NIFTY')
+            with self.assertRaises(RuntimeError):
+                client.place_order(quantity=50)
+
+        self.assertIs(client.on_ticks, callback)
+        self.assertIs(self.telemetry.instrument_client('breeze', client), client)
+        self.assertEqual(scope.broker_calls, 2)
+        self.assertEqual(self.series('mcube_broker_call_seconds', broker='breeze', method='get_quotes',
+                                     outcome='ok')[-1], 1)
+        self.assertEqual(self.series('mcube_broker_call_seconds', broker='breeze', method='place_order',
+                                     outcome='error')[-1], 1)
+        self.assertEqual(self.series('mcube_task_broker_seconds', task='sync_positions')[-1], 1)
+
+    def test_celery_signals_record_task_runs(self):
+        task = type('Task', (), {'name': 'apps.risk.tasks.check_limits'})()
+
+        self.telemetry._task_prerun(task_id='a', task=task)
+        MarketHoliday.objects.exists()
+        self.telemetry._task_postrun(task_id='a', task=task, state='SUCCESS')
+        self.telemetry._task_prerun(task_id='b', task=task)
+        self.telemetry._task_postrun(task_id='b', task=task, state='FAILURE')
+
+        rows = self.telemetry.summary(self.telemetry.KIND_TASK)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]['calls'], rows[0]['errors']), (2, 1))
+        self.assertEqual(rows[0]['avg_queries'], 0.5)
+        self.assertIsNone(self.telemetry.current_scope())
+
+    def test_collect_merges_live_processes_and_drops_dead_ones(self):
+        with self.telemetry.measure(self.telemetry.KIND_TASK, 'rebuild'):
+            pass
+        snapshot = dict(self.telemetry.registry.snapshot(), host=socket.gethostname())
+
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        (self.directory / 'live.json').write_text(json.dumps(dict(snapshot, pid=os.getppid())))
+        (self.directory / 'dead.json').write_text(json.dumps(dict(snapshot, pid=dead.pid)))
+
+        merged = self.telemetry.collect()
+
+        self.assertEqual(self.telemetry.summary(self.telemetry.KIND_TASK, merged)[0]['calls'], 2)
+        self.assertEqual(sorted(p.name for p in self.directory.glob('*.json')), ['live.json'])
+
+    def test_metrics_endpoint(self):
+        with self.telemetry.measure(self.telemetry.KIND_TASK, 'rebuild'):
+            pass
+
+        # Closed by default: no token configured and nobody logged in
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+        self.client.force_login(User.objects.create_user('viewer', password='x'))
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.client.force_login(User.objects.create_user('ops', password='x', is_staff=True))
+
+        response = self.client.get('/metrics')
+        text = response.content.decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE mcube_task_seconds histogram', text)
+        self.assertIn('mcube_task_seconds_bucket{task="rebuild",outcome="ok",le="+Inf"} 1', text)
+        self.assertIn('mcube_task_seconds_count{task="rebuild",outcome="ok"} 1', text)
+
+        self.client.logout()
+        with override_settings(TELEMETRY_METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class QueryPlanTests(TestCase):
+    """The hot queries are served by indexes"""
+
+    def test_hot_queries_do_not_scan_tables(self):
+        from apps.core.services.query_plans import check_query_plans
+
+        plans = check_query_plans()
+
+        self.assertEqual([p.name for p in plans if not p.ok], [])
+        self.assertIn('USING INDEX', next(p for p in plans if p.name == 'order.today').plan)
+
+    def test_unindexed_filter_is_flagged(self):
+        from apps.brokers.models import Order
+        from apps.core.services.query_plans import HotQuery, explain
+
+        plan = explain(HotQuery('order.by_date', 'created_at__date',
+                                lambda: Order.objects.filter(created_at__date=date.today())))
+
+        self.assertEqual(plan.full_scans, ['orders'])
+        self.assertFalse(plan.ok)
+
+    def test_command_selects_groups_and_fails_on_scan(self):
+        from io import StringIO
+
+        from django.core.management import CommandError, call_command
+
+        out = StringIO()
+        call_command('query_plans', 'order', '--fail-on-scan', stdout=out)
+        self.assertIn('3 of 3 queries use an index', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('query_plans', 'nothing')
+
+    def test_local_day_range_and_parse_expiry(self):
+        from django.utils import timezone
+
+        from apps.core.utils import local_day_range, parse_expiry
+
+        start, end = local_day_range(date(2025, 11, 27))
+        self.assertEqual(timezone.localtime(start).replace(tzinfo=None), datetime(2025, 11, 27))
+        self.assertEqual(end - start, timedelta(days=1))
+
+        for raw in ('2025-11-27', '27-Nov-2025', '27-NOV-2025', '27/11/2025', '2025-11-27T00:00:00',
+                    datetime(2025, 11, 27, 15, 30), date(2025, 11, 27)):
+            self.assertEqual(parse_expiry(raw), date(2025, 11, 27), raw)
+        self.assertIsNone(parse_expiry('next week'))
+        self.assertIsNone(parse_expiry(''))
+
+
+class LogLifecycleTests(TestCase):
+    """Old BkLog rows are rolled up, archived and deleted in batches"""
+
+    def setUp(self):
+        from django.utils import timezone
+
+        from apps.core.models import BkLog
+
+        self.directory = Path(tempfile.mkdtemp())
+        self.now = timezone.now()
+        old = self.now - timedelta(days=10)
+        rows = [('monitor_all_positions', 'info', True, 20), ('monitor_all_positions', 'error', False, 80),
+                ('monitor_all_positions', 'warning', True, None), ('fetch_trendlyne_data', 'info', True, 500),
+                ('', 'info', True, None)]
+        for task, level, success, ms in rows:
+            BkLog.objects.create(level=level, action='tick', message='old', background_task=task,
+                                 success=success, execution_time_ms=ms)
+        BkLog.objects.update(timestamp=old)
+        BkLog.objects.create(level='info', action='tick', message='recent', background_task='monitor_all_positions',
+                             execution_time_ms=30)
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _lifecycle(self, **options):
+        from apps.core.services.log_lifecycle import LogLifecycle
+
+        return LogLifecycle(archive_dir=self.directory, pause=0, **dict({'batch_size': 2}, **options))
+
+    def test_old_rows_are_rolled_up_archived_and_deleted(self):
+        from django.utils import timezone
+
+        from apps.core.models import BkLog, LogRollup
+        from apps.core.services.log_lifecycle import read_archive
+
+        stats = self._lifecycle().run(['bk_log'], now=self.now)['bk_log']
+
+        self.assertEqual((stats['archived'], stats['batches'], stats['complete']), (5, 3, True))
+        self.assertEqual(list(BkLog.objects.values_list('message', flat=True)), ['recent'])
+
+        monitor = LogRollup.objects.get(source='bk_log', task='monitor_all_positions')
+        self.assertEqual((monitor.count, monitor.error_count, monitor.warning_count), (3, 1, 1))
+        self.assertEqual((monitor.timed_count, monitor.total_ms, monitor.max_ms, monitor.avg_ms), (2, 100, 80, 50))
+        self.assertEqual(timezone.localtime(monitor.hour).minute, 0)  # Local hours (IST is UTC+5:30)
+        self.assertTrue(LogRollup.objects.filter(task='tick').exists())  # No task name: grouped by action
+
+        [archive] = stats['files']
+        archived = list(read_archive(archive))
+        self.assertEqual(len(archived), 5)
+        self.assertEqual({row['message'] for row in archived}, {'old'})
+
+    def test_runs_are_bounded_and_resume(self):
+        from apps.core.models import BkLog, LogRollup
+        from apps.core.services.log_lifecycle import read_archive
+
+        first = self._lifecycle(max_batches=1).run(['bk_log'], now=self.now)['bk_log']
+        self.assertEqual((first['archived'], first['complete']), (2, False))
+        self.assertEqual(BkLog.objects.count(), 4)
+
+        second = self._lifecycle(max_batches=10).run(['bk_log'], now=self.now)['bk_log']
+        self.assertEqual((second['archived'], second['complete']), (3, True))
+        self.assertEqual(sum(LogRollup.objects.values_list('count', flat=True)), 5)
+        self.assertEqual(len(list(read_archive(second['files'][0]))), 5)
+
+    def test_task_summary_merges_rollups_and_live_rows(self):
+        from apps.core.services.log_lifecycle import task_summary
+
+        self._lifecycle().run(['bk_log'], now=self.now)
+
+        summary = {row['task']: row for row in task_summary('bk_log', since=self.now - timedelta(days=30))}
+
+        monitor = summary['monitor_all_positions']
+        self.assertEqual((monitor['count'], monitor['error_count'], monitor['timed_count']), (4, 1, 3))
+        self.assertEqual(monitor['error_rate'], 0.25)
+        self.assertEqual(monitor['avg_ms'], 43.3)
+        self.assertEqual(summary['fetch_trendlyne_data']['max_ms'], 500)
+
+    def test_command(self):
+        from io import StringIO
+
+        from django.core.management import CommandError, call_command
+
+        out = StringIO()
+        call_command('archive_logs', 'bk_log', '--days', '3', '--archive-dir', str(self.directory), stdout=out)
+        self.assertIn('bk_log: archived 5 rows', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('archive_logs', 'trades')
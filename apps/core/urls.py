@@ -15,6 +15,10 @@ urlpatterns = [
 
     # Dashboard API
     path('api/dashboard/refresh/<str:stat_type>/', views.refresh_dashboard_stat, name='refresh_dashboard_stat'),
+    path('api/live/', views.live_feed, name='live_feed'),
+
+    # Telemetry (Prometheus endpoint is /metrics)
+    path('telemetry/', views.telemetry_page, name='telemetry'),
 
     # Testing
     path('test/', views.system_test_page, name='system_test'),
@@ -13,7 +13,10 @@ from .date_utils import (
     get_next_month_expiry,
     is_trading_day,
     is_market_hours,
+    get_trading_minutes_remaining,
     get_days_to_expiry,
+    parse_expiry,
+    local_day_range,
     is_within_entry_window,
     get_current_ist_time,
     format_time_ist,
@@ -65,6 +68,10 @@ from .decorators import (
     cache_result,
 )
 
+# Rate limiting & execution progress
+from .rate_limiter import TokenBucket
+from .event_stream import ExecutionEventStream
+
 # Custom exceptions (NEW - provides domain-specific exceptions)
 from .exceptions import (
     mCubeBaseException,
@@ -93,7 +100,10 @@ __all__ = [
     'get_next_month_expiry',
     'is_trading_day',
     'is_market_hours',
+    'get_trading_minutes_remaining',
     'get_days_to_expiry',
+    'parse_expiry',
+    'local_day_range',
     'is_within_entry_window',
     'get_current_ist_time',
     'format_time_ist',
@@ -134,6 +144,10 @@ __all__ = [
     'require_post_method',
     'cache_result',
 
+    # Rate limiting & execution progress
+    'TokenBucket',
+    'ExecutionEventStream',
+
     # Exceptions (NEW)
     'mCubeBaseException',
     'BrokerAuthenticationError',
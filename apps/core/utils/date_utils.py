@@ -3,23 +3,21 @@ Date and time utility functions for mCube Trading System
 
 This module provides functions for:
 - Expiry date calculations (weekly/monthly)
+- Expiry parsing (Trendlyne, Breeze and Neo formats)
 - Trading day validation
 - Market hours checking
 """
 
 import logging
+import re
 from datetime import date, datetime, time, timedelta
-from typing import Optional
+from typing import Any, Optional, Tuple
 
 import pytz
 
 from apps.core.constants import (
     MARKET_OPEN_TIME,
     MARKET_CLOSE_TIME,
-    TRADING_DAYS,
-    WEEKDAY_TUESDAY,
-    WEEKDAY_WEDNESDAY,
-    WEEKDAY_THURSDAY,
     WEEKDAY_FRIDAY,
 )
 
@@ -28,55 +26,42 @@ logger = logging.getLogger(__name__)
 # Indian timezone
 IST = pytz.timezone('Asia/Kolkata')
 
+# Expiry formats of Trendlyne exports, broker APIs and older ContractData rows
+EXPIRY_FORMATS = ('%Y-%m-%d', '%d-%b-%Y', '%d-%m-%Y', '%d/%m/%Y', '%d %b %Y', '%b %d, %Y', '%d%b%Y', '%d-%B-%Y')
+_ISO_PREFIX = re.compile(r'^\d{4}-\d{2}-\d{2}(?:[T ]|$)')
+
 
 def get_current_weekly_expiry(instrument: str = 'NIFTY') -> date:
     """
     Get the current weekly expiry date for the given instrument
 
-    IMPORTANT: As of 2025, NIFTY weekly expiry changed from Thursday to Tuesday
+    Resolved from the trading calendar (listed contracts, holiday-adjusted).
+    Expiry weekdays per instrument are defined in EXPIRY_SCHEDULES:
     - NIFTY: Tuesday (since 2025)
     - BANKNIFTY: Wednesday
     - FINNIFTY: Tuesday
+    Monthly contracts (index and stock) expire on the last Tuesday.
 
     Args:
         instrument: The instrument name (NIFTY, BANKNIFTY, FINNIFTY)
 
     Returns:
-        date: The current weekly expiry date
+        date: The current weekly expiry date (today if today is expiry day)
 
     Example:
         >>> get_current_weekly_expiry('NIFTY')
         datetime.date(2025, 11, 18)  # Next Tuesday
     """
-    today = date.today()
-
-    # Determine expiry weekday based on instrument
-    # NIFTY changed from Thursday to Tuesday in 2025
-    if instrument.upper() == 'NIFTY':
-        expiry_weekday = WEEKDAY_TUESDAY  # Tuesday = 1
-    elif instrument.upper() == 'BANKNIFTY':
-        expiry_weekday = WEEKDAY_WEDNESDAY  # Wednesday = 2 (changed from Thursday)
-    elif instrument.upper() == 'FINNIFTY':
-        expiry_weekday = WEEKDAY_TUESDAY  # Tuesday = 1
-    else:
-        # Default to Thursday for unknown instruments (legacy behavior)
-        expiry_weekday = WEEKDAY_THURSDAY  # Thursday = 3
-        logger.warning(f"Unknown instrument {instrument}, defaulting to Thursday expiry")
+    from apps.core.services.trading_calendar import get_trading_calendar
 
-    days_ahead = expiry_weekday - today.weekday()
-
-    if days_ahead < 0:  # Expiry day already passed this week
-        days_ahead += 7
-
-    expiry = today + timedelta(days=days_ahead)
+    expiry = get_trading_calendar().next_expiry(instrument)
     logger.debug(f"Current weekly expiry for {instrument}: {expiry}")
-
     return expiry
 
 
 def get_next_weekly_expiry(instrument: str = 'NIFTY') -> date:
     """
-    Get the next weekly expiry date (skip current week if already expired)
+    Get the next weekly expiry date (the one after the current expiry)
 
     Args:
         instrument: The instrument name (NIFTY, BANKNIFTY, FINNIFTY)
@@ -88,39 +73,19 @@ def get_next_weekly_expiry(instrument: str = 'NIFTY') -> date:
         >>> get_next_weekly_expiry('NIFTY')
         datetime.date(2025, 11, 25)  # Next week's Tuesday
     """
-    current_expiry = get_current_weekly_expiry(instrument)
-    today = date.today()
+    from apps.core.services.trading_calendar import get_trading_calendar
 
-    # Determine expiry weekday based on instrument (must match get_current_weekly_expiry)
-    if instrument.upper() == 'NIFTY':
-        expiry_weekday = WEEKDAY_TUESDAY
-    elif instrument.upper() == 'BANKNIFTY':
-        expiry_weekday = WEEKDAY_WEDNESDAY
-    elif instrument.upper() == 'FINNIFTY':
-        expiry_weekday = WEEKDAY_TUESDAY
-    else:
-        expiry_weekday = WEEKDAY_THURSDAY
-
-    # If current expiry is today or has passed, get next week
-    if current_expiry <= today:
-        next_expiry = current_expiry + timedelta(days=7)
-    else:
-        # If we're past expiry day 3:30 PM, skip to next week
-        now = datetime.now(IST)
-        if today.weekday() == expiry_weekday and now.time() > time(15, 30):
-            next_expiry = current_expiry + timedelta(days=7)
-        else:
-            next_expiry = current_expiry + timedelta(days=7)
-
-    logger.debug(f"Next weekly expiry for {instrument}: {next_expiry}")
-    return next_expiry
+    expiry = get_trading_calendar().next_expiry(instrument, skip=1)
+    logger.debug(f"Next weekly expiry for {instrument}: {expiry}")
+    return expiry
 
 
 def get_current_month_expiry(symbol: str) -> date:
     """
     Get the current monthly expiry date for futures
 
-    Monthly expiry is on the last Thursday of the month
+    Monthly expiry is on the last Tuesday of the month, moved to the previous
+    trading day when that is a holiday.
 
     Args:
         symbol: The stock/index symbol
@@ -132,27 +97,16 @@ def get_current_month_expiry(symbol: str) -> date:
         >>> get_current_month_expiry('RELIANCE')
         datetime.date(2024, 11, 28)  # Last Thursday of November
     """
-    today = date.today()
-
-    # Get the last day of current month
-    if today.month == 12:
-        next_month = date(today.year + 1, 1, 1)
-    else:
-        next_month = date(today.year, today.month + 1, 1)
-
-    last_day = next_month - timedelta(days=1)
-
-    # Find the last Thursday
-    days_back = (last_day.weekday() - WEEKDAY_THURSDAY) % 7
-    expiry = last_day - timedelta(days=days_back)
+    from apps.core.services.trading_calendar import get_trading_calendar
 
+    expiry = get_trading_calendar().next_expiry(symbol, kind='monthly')
     logger.debug(f"Current monthly expiry for {symbol}: {expiry}")
     return expiry
 
 
 def get_next_month_expiry(symbol: str) -> date:
     """
-    Get the next monthly expiry date (next month's last Thursday)
+    Get the next monthly expiry date (the one after the current monthly expiry)
 
     Args:
         symbol: The stock/index symbol
@@ -164,26 +118,9 @@ def get_next_month_expiry(symbol: str) -> date:
         >>> get_next_month_expiry('RELIANCE')
         datetime.date(2024, 12, 26)  # Last Thursday of December
     """
-    today = date.today()
-
-    # Get next month
-    if today.month == 12:
-        next_month_start = date(today.year + 1, 1, 1)
-    else:
-        next_month_start = date(today.year, today.month + 1, 1)
-
-    # Get the last day of next month
-    if next_month_start.month == 12:
-        month_after = date(next_month_start.year + 1, 1, 1)
-    else:
-        month_after = date(next_month_start.year, next_month_start.month + 1, 1)
-
-    last_day = month_after - timedelta(days=1)
-
-    # Find the last Thursday
-    days_back = (last_day.weekday() - WEEKDAY_THURSDAY) % 7
-    expiry = last_day - timedelta(days=days_back)
+    from apps.core.services.trading_calendar import get_trading_calendar
 
+    expiry = get_trading_calendar().next_expiry(symbol, kind='monthly', skip=1)
     logger.debug(f"Next monthly expiry for {symbol}: {expiry}")
     return expiry
 
@@ -207,11 +144,65 @@ def get_days_to_expiry(expiry_date: date) -> int:
     return days
 
 
+def parse_expiry(value: Any) -> Optional[date]:
+    """
+    Expiry date from any of the formats the data sources use
+
+    Args:
+        value: date, datetime or string ('2025-11-27', '27-Nov-2025', '27-NOV-2025',
+               '2025-11-27T06:00:00.000Z', ...)
+
+    Returns:
+        date or None: None when value is empty or not a date
+
+    Example:
+        >>> parse_expiry('28-NOV-2024')
+        datetime.date(2024, 11, 28)
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    text = value.strip()
+    if _ISO_PREFIX.match(text):
+        text = text[:10]  # Breeze timestamps: 2025-11-27T06:00:00.000Z
+    for fmt in EXPIRY_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def local_day_range(day: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """
+    Start and end (exclusive) of a calendar day in the current time zone
+
+    For filtering timestamp columns by day with an index:
+    created_at__gte=start, created_at__lt=end instead of created_at__date=day,
+    which wraps the column in a function.
+
+    Args:
+        day: Date (default: today in the current time zone)
+
+    Returns:
+        tuple: (start, end) aware datetimes
+    """
+    from django.utils import timezone
+
+    day = day or timezone.localdate()
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
 def is_trading_day(check_date: Optional[date] = None) -> bool:
     """
     Check if a given date is a trading day (Monday-Friday, excluding holidays)
 
-    Note: This only checks for weekdays. Market holidays need to be checked separately.
+    Holidays come from the trading calendar (NSE_MARKET_HOLIDAYS + MarketHoliday).
 
     Args:
         check_date: Date to check (defaults to today)
@@ -225,15 +216,9 @@ def is_trading_day(check_date: Optional[date] = None) -> bool:
         >>> is_trading_day(date(2024, 11, 18))  # Monday
         True
     """
-    if check_date is None:
-        check_date = date.today()
+    from apps.core.services.trading_calendar import get_trading_calendar
 
-    is_weekday = check_date.weekday() in TRADING_DAYS
-
-    # TODO: Add holiday calendar check
-    # is_holiday = check_date in MARKET_HOLIDAYS
-
-    return is_weekday
+    return get_trading_calendar().is_trading_day(check_date)
 
 
 def is_market_hours(check_time: Optional[datetime] = None) -> bool:
@@ -271,6 +256,25 @@ def is_market_hours(check_time: Optional[datetime] = None) -> bool:
     return market_open <= current_time <= market_close
 
 
+def get_trading_minutes_remaining(check_time: Optional[datetime] = None) -> int:
+    """
+    Minutes left in today's regular session (0 on holidays or after the close)
+
+    Args:
+        check_time: Time to check (defaults to now in IST)
+
+    Returns:
+        int: Trading minutes remaining
+
+    Example:
+        >>> get_trading_minutes_remaining()  # Called at 3:00 PM on a trading day
+        30
+    """
+    from apps.core.services.trading_calendar import get_trading_calendar
+
+    return get_trading_calendar().trading_minutes_remaining(check_time)
+
+
 def is_within_entry_window(check_time: Optional[datetime] = None) -> bool:
     """
     Check if current time is within the entry window (9:00 AM - 11:30 AM IST)
@@ -0,0 +1,135 @@
+"""
+SQLite Concurrency Utilities
+
+The web server, Celery workers, the background-task runner and the Telegram
+bot all share one SQLite file. These helpers make that safe under load:
+
+- `configure_sqlite_connection()` applies the pragmas in settings.SQLITE_PRAGMAS
+  (WAL journal, synchronous/cache/mmap tuning) to every new connection
+- `retry_on_locked()` retries writes that still hit "database is locked"
+  after the connection's busy timeout
+
+Usage:
+    from apps.core.utils.db import retry_on_locked
+
+    @retry_on_locked()
+    def save_snapshot(...):
+        ...
+"""
+
+import functools
+import logging
+import sqlite3
+import time
+from typing import Callable, Dict, Optional
+
+from django.db import OperationalError, connections
+
+from apps.core.constants import DB_LOCK_RETRIES, DB_LOCK_RETRY_DELAY
+
+logger = logging.getLogger(__name__)
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def apply_sqlite_pragmas(cursor, pragmas: Dict[str, object]) -> Dict[str, object]:
+    """
+    Apply PRAGMA settings through a DB-API cursor.
+
+    Args:
+        cursor: sqlite3 (or Django) cursor
+        pragmas: {'journal_mode': 'WAL', 'synchronous': 'NORMAL', ...}
+
+    Returns:
+        dict: Value each pragma reports after being set
+    """
+    applied = {}
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+        row = cursor.fetchone()
+        applied[name] = row[0] if row else value
+    return applied
+
+
+def _is_memory_database(name) -> bool:
+    name = str(name or '')
+    return name in ('', ':memory:') or 'mode=memory' in name
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    connection_created receiver: apply settings.SQLITE_PRAGMAS to SQLite connections.
+
+    In-memory databases (tests) are skipped; they cannot use WAL.
+    """
+    from django.conf import settings
+
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas or _is_memory_database(connection.settings_dict.get('NAME')):
+        return
+
+    with connection.cursor() as cursor:
+        applied = apply_sqlite_pragmas(cursor, pragmas)
+
+    journal_mode = str(applied.get('journal_mode', '')).lower()
+    if 'journal_mode' in pragmas and journal_mode != str(pragmas['journal_mode']).lower():
+        logger.warning(f"SQLite journal_mode is '{journal_mode}', expected '{pragmas['journal_mode']}'")
+
+
+def is_database_locked(error: Exception) -> bool:
+    """True if an exception is SQLite's 'database is locked' error."""
+    if not isinstance(error, (OperationalError, sqlite3.OperationalError)):
+        return False
+    message = str(error).lower()
+    return any(text in message for text in LOCKED_MESSAGES)
+
+
+def retry_on_locked(attempts: int = DB_LOCK_RETRIES, delay: float = DB_LOCK_RETRY_DELAY,
+                    using: str = 'default') -> Callable:
+    """
+    Retry a database write when SQLite reports the database is locked.
+
+    Retries only at the outermost level: inside an atomic block the enclosing
+    transaction is already broken, so the error is re-raised for the caller
+    that owns the transaction.
+
+    Args:
+        attempts: Retries after the first failure
+        delay: Seconds before the first retry (doubles each attempt)
+        using: Database alias
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            wait = delay
+            for attempt in range(attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except (OperationalError, sqlite3.OperationalError) as e:
+                    if (not is_database_locked(e) or attempt == attempts
+                            or connections[using].in_atomic_block):
+                        raise
+                    logger.warning(
+                        f"{func.__name__}: database locked, retry {attempt + 1}/{attempts} in {wait:.2f}s"
+                    )
+                    time.sleep(wait)
+                    wait *= 2
+        return wrapper
+    return decorator
+
+
+def sqlite_status(using: str = 'default') -> Optional[Dict[str, object]]:
+    """Current journal mode and tuning pragmas of a connection (None if not SQLite)."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return None
+
+    status = {}
+    with connection.cursor() as cursor:
+        for name in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout'):
+            cursor.execute(f"PRAGMA {name}")
+            status[name] = cursor.fetchone()[0]
+    return status
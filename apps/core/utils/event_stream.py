@@ -0,0 +1,137 @@
+"""
+Execution Event Stream
+
+Ordered progress/event stream for long-running executions (batch order
+placement, position closing). Producers publish sequenced events and keep a
+progress snapshot in the Django cache; readers poll with a cursor
+(`since=<seq>`) and receive only the events they have not seen yet.
+"""
+
+import logging
+import threading
+import uuid
+from typing import Callable, Dict, List
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.core.constants import EXECUTION_PROGRESS_TTL
+
+logger = logging.getLogger(__name__)
+
+
+def _default_snapshot() -> Dict:
+    return {
+        'batches_completed': 0,
+        'total_batches': 0,
+        'current_batch': None,
+        'is_cancelled': False,
+        'is_complete': False,
+        'is_success': False,
+        'last_log_message': None,
+        'last_log_type': None,
+        'last_seq': 0,
+    }
+
+
+class ExecutionEventStream:
+    """
+    Ordered progress/event stream for an execution.
+
+    The stream keeps a progress snapshot (same shape as the legacy
+    close_progress dicts, so existing readers keep working) plus an
+    append-only list of sequenced events. Readers in other processes call
+    `ExecutionEventStream.read(key, since=seq)` to receive only new events;
+    in-process consumers can register listeners with `subscribe()`.
+    """
+
+    def __init__(self, key: str = None, ttl: int = EXECUTION_PROGRESS_TTL,
+                 max_events: int = 200, reset: bool = True):
+        self.key = key or f"execution_{uuid.uuid4().hex}"
+        self.ttl = ttl
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict], None]] = []
+
+        if reset:
+            self._snapshot = _default_snapshot()
+            self._events = []
+            cache.set(self.events_key, self._events, self.ttl)
+            cache.set(self.key, self._snapshot, self.ttl)
+        else:
+            self._snapshot = cache.get(self.key) or _default_snapshot()
+            self._events = cache.get(self.events_key) or []
+
+    @property
+    def events_key(self) -> str:
+        return f"{self.key}:events"
+
+    def subscribe(self, listener: Callable[[Dict], None]):
+        """Register an in-process listener called with every published event."""
+        self._listeners.append(listener)
+
+    def update(self, **fields) -> Dict:
+        """Update snapshot fields without emitting an event."""
+        with self._lock:
+            self._snapshot.update(fields)
+            cache.set(self.key, self._snapshot, self.ttl)
+            return dict(self._snapshot)
+
+    def publish(self, event_type: str, message: str, level: str = 'info', **data) -> Dict:
+        """
+        Append an event and update the snapshot.
+
+        Args:
+            event_type: Machine-readable event type (e.g., 'order_filled')
+            message: Human-readable log message
+            level: 'info', 'success', 'warning' or 'error'
+            **data: Extra event payload
+
+        Returns:
+            dict: The published event
+        """
+        with self._lock:
+            seq = (self._events[-1]['seq'] if self._events else self._snapshot.get('last_seq', 0)) + 1
+            event = {
+                'seq': seq,
+                'type': event_type,
+                'message': message,
+                'level': level,
+                'timestamp': timezone.now().isoformat(),
+                'data': data,
+            }
+            self._events.append(event)
+            if len(self._events) > self.max_events:
+                self._events = self._events[-self.max_events:]
+
+            self._snapshot['last_log_message'] = message
+            self._snapshot['last_log_type'] = level
+            self._snapshot['last_seq'] = seq
+
+            cache.set(self.events_key, self._events, self.ttl)
+            cache.set(self.key, self._snapshot, self.ttl)
+
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Execution event listener failed: {e}")
+
+        return event
+
+    @property
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self._snapshot)
+
+    @classmethod
+    def read(cls, key: str, since: int = 0):
+        """
+        Read the progress snapshot and events newer than `since`.
+
+        Returns:
+            tuple: (snapshot dict, list of events with seq > since)
+        """
+        snapshot = cache.get(key) or _default_snapshot()
+        events = cache.get(f"{key}:events") or []
+        return snapshot, [e for e in events if e['seq'] > since]
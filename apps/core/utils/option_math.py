@@ -0,0 +1,43 @@
+"""
+Option Pricing Math
+
+Vectorized Black-Scholes building blocks shared by the backtest engine
+(apps.analytics.services.backtest) and the live portfolio greeks
+(apps.positions.services.portfolio_greeks). Inputs are broadcastable numpy
+arrays or scalars; years to expiry and volatility are annualized fractions.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (Abramowitz & Stegun 7.1.26, error < 1.5e-7)."""
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal density."""
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def black_scholes_d1_d2(spot, strike, years, volatility, rate: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Black-Scholes d1 and d2.
+
+    Callers clamp years and volatility away from zero first (expired or
+    zero-vol contracts are priced at intrinsic value by the caller).
+
+    Returns:
+        tuple: (d1, d2)
+    """
+    vol_sqrt = volatility * np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * volatility ** 2) * years) / vol_sqrt
+    return d1, d1 - vol_sqrt
@@ -5,7 +5,8 @@ This module provides functions for aggregating P&L data at multiple levels:
 - Account-level P&L
 - Position-level P&L
 - Strategy-level P&L
-- Daily/Weekly/Monthly summaries
+- Daily/Weekly/Monthly summaries (read from the DailyPnL / Performance
+  rollups written by apps.analytics.services.reporting)
 """
 
 from decimal import Decimal
@@ -28,42 +29,31 @@ def get_account_pnl_summary(account) -> Dict[str, Any]:
     from apps.positions.models import Position
     from apps.core.constants import POSITION_STATUS_ACTIVE, POSITION_STATUS_CLOSED
 
-    # Get realized P&L (closed positions)
-    closed_positions = Position.objects.filter(
-        account=account,
-        status=POSITION_STATUS_CLOSED
-    )
-
-    realized_stats = closed_positions.aggregate(
-        total_realized=Sum('realized_pnl'),
-        closed_count=Count('id')
-    )
-
-    # Get unrealized P&L (active positions)
-    active_positions = Position.objects.filter(
-        account=account,
-        status=POSITION_STATUS_ACTIVE
-    )
-
-    unrealized_stats = active_positions.aggregate(
-        total_unrealized=Sum('unrealized_pnl'),
-        active_count=Count('id')
+    # One conditional-aggregate query for closed, active and today's numbers
+    closed = Q(status=POSITION_STATUS_CLOSED)
+    today = timezone.localdate()
+    stats = Position.objects.filter(account=account).aggregate(
+        total_realized=Sum('realized_pnl', filter=closed),
+        closed_count=Count('id', filter=closed),
+        winning=Count('id', filter=closed & Q(realized_pnl__gt=0)),
+        losing=Count('id', filter=closed & Q(realized_pnl__lt=0)),
+        todays_realized=Sum('realized_pnl', filter=closed & Q(exit_time__date=today)),
+        total_unrealized=Sum('unrealized_pnl', filter=Q(status=POSITION_STATUS_ACTIVE)),
+        active_count=Count('id', filter=Q(status=POSITION_STATUS_ACTIVE)),
     )
 
     # Calculate totals
-    total_realized = realized_stats['total_realized'] or Decimal('0.00')
-    total_unrealized = unrealized_stats['total_unrealized'] or Decimal('0.00')
+    total_realized = stats['total_realized'] or Decimal('0.00')
+    total_unrealized = stats['total_unrealized'] or Decimal('0.00')
     total_pnl = total_realized + total_unrealized
 
-    # Get today's P&L
-    today = timezone.now().date()
-    todays_closed = closed_positions.filter(exit_time__date=today)
-    todays_realized = todays_closed.aggregate(Sum('realized_pnl'))['realized_pnl__sum'] or Decimal('0.00')
+    # Today's P&L
+    todays_realized = stats['todays_realized'] or Decimal('0.00')
     todays_pnl = todays_realized + total_unrealized
 
     # Calculate win rate
-    winning_trades = closed_positions.filter(realized_pnl__gt=0).count()
-    losing_trades = closed_positions.filter(realized_pnl__lt=0).count()
+    winning_trades = stats['winning']
+    losing_trades = stats['losing']
     total_trades = winning_trades + losing_trades
     win_rate = (Decimal(winning_trades) / Decimal(total_trades) * 100) if total_trades > 0 else Decimal('0.00')
 
@@ -75,8 +65,8 @@ def get_account_pnl_summary(account) -> Dict[str, Any]:
         'unrealized_pnl': total_unrealized,
         'todays_pnl': todays_pnl,
         'todays_realized': todays_realized,
-        'active_positions_count': unrealized_stats['active_count'] or 0,
-        'closed_positions_count': realized_stats['closed_count'] or 0,
+        'active_positions_count': stats['active_count'],
+        'closed_positions_count': stats['closed_count'],
         'total_trades': total_trades,
         'winning_trades': winning_trades,
         'losing_trades': losing_trades,
@@ -146,57 +136,37 @@ def get_strategy_level_pnl(account) -> List[Dict[str, Any]]:
     from apps.positions.models import Position
     from apps.core.constants import POSITION_STATUS_CLOSED, POSITION_STATUS_ACTIVE
 
-    # Get all unique strategy types
-    strategies = Position.objects.filter(
-        account=account
-    ).values('strategy_type').distinct()
+    closed = Q(status=POSITION_STATUS_CLOSED)
+    active = Q(status=POSITION_STATUS_ACTIVE)
+
+    # One grouped query: closed and active stats per strategy
+    strategies = Position.objects.filter(account=account).values('strategy_type').annotate(
+        total_realized=Sum('realized_pnl', filter=closed),
+        closed_count=Count('id', filter=closed),
+        winning=Count('id', filter=closed & Q(realized_pnl__gt=0)),
+        losing=Count('id', filter=closed & Q(realized_pnl__lt=0)),
+        total_unrealized=Sum('unrealized_pnl', filter=active),
+        active_count=Count('id', filter=active),
+    )
 
     strategy_list = []
 
-    for strategy in strategies:
-        strategy_type = strategy['strategy_type']
-
-        # Closed positions stats
-        closed = Position.objects.filter(
-            account=account,
-            strategy_type=strategy_type,
-            status=POSITION_STATUS_CLOSED
-        )
-
-        closed_stats = closed.aggregate(
-            total_realized=Sum('realized_pnl'),
-            count=Count('id'),
-            winning=Count('id', filter=Q(realized_pnl__gt=0)),
-            losing=Count('id', filter=Q(realized_pnl__lt=0))
-        )
-
-        # Active positions stats
-        active = Position.objects.filter(
-            account=account,
-            strategy_type=strategy_type,
-            status=POSITION_STATUS_ACTIVE
-        )
-
-        active_stats = active.aggregate(
-            total_unrealized=Sum('unrealized_pnl'),
-            count=Count('id')
-        )
-
-        total_realized = closed_stats['total_realized'] or Decimal('0.00')
-        total_unrealized = active_stats['total_unrealized'] or Decimal('0.00')
+    for stats in strategies:
+        total_realized = stats['total_realized'] or Decimal('0.00')
+        total_unrealized = stats['total_unrealized'] or Decimal('0.00')
         total_pnl = total_realized + total_unrealized
 
-        total_trades = closed_stats['count'] or 0
-        winning_trades = closed_stats['winning'] or 0
-        losing_trades = closed_stats['losing'] or 0
+        total_trades = stats['closed_count']
+        winning_trades = stats['winning']
+        losing_trades = stats['losing']
         win_rate = (Decimal(winning_trades) / Decimal(total_trades) * 100) if total_trades > 0 else Decimal('0.00')
 
         strategy_list.append({
-            'strategy_type': strategy_type,
+            'strategy_type': stats['strategy_type'],
             'total_pnl': total_pnl,
             'realized_pnl': total_realized,
             'unrealized_pnl': total_unrealized,
-            'active_positions': active_stats['count'] or 0,
+            'active_positions': stats['active_count'],
             'closed_positions': total_trades,
             'winning_trades': winning_trades,
             'losing_trades': losing_trades,
@@ -267,7 +237,7 @@ def get_weekly_pnl_summary(account, weeks=12) -> List[Dict[str, Any]]:
         account=account,
         period_type='WEEKLY',
         period_end__gte=start_date,
-        period_end__lte=end_date
+        period_start__lte=end_date  # Includes the current (partial) period
     ).order_by('-period_end')
 
     weekly_list = []
@@ -307,7 +277,7 @@ def get_monthly_pnl_summary(account, months=12) -> List[Dict[str, Any]]:
         account=account,
         period_type='MONTHLY',
         period_end__gte=start_date,
-        period_end__lte=end_date
+        period_start__lte=end_date  # Includes the current (partial) period
     ).order_by('-period_end')
 
     monthly_list = []
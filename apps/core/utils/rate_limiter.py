@@ -0,0 +1,99 @@
+"""
+Rate Limiting Utilities
+
+Thread-safe token bucket used to pace calls against broker APIs that
+enforce per-second request limits (order placement, quotes, option chains).
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per
+second. Each call consumes one token; callers block until a token is
+available, so a burst of work is smoothed to the broker's allowed rate
+instead of being paced with fixed sleeps.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Example:
+        >>> limiter = TokenBucket(rate=8, capacity=8)  # 8 calls/sec, burst of 8
+        >>> for order in orders:
+        ...     limiter.acquire()
+        ...     client.place_order(**order)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second (sustained calls per second)
+            capacity: Maximum burst size (defaults to `rate`)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens without blocking. Returns False if not enough are available."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None,
+                cancel_event: Optional[threading.Event] = None) -> bool:
+        """
+        Block until tokens are available.
+
+        Args:
+            tokens: Number of tokens to take (default 1)
+            timeout: Maximum seconds to wait (None = wait indefinitely)
+            cancel_event: Optional event; waiting stops as soon as it is set
+
+        Returns:
+            bool: True if tokens were acquired, False on timeout or cancellation
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+    @property
+    def available_tokens(self) -> float:
+        """Current number of tokens in the bucket."""
+        with self._lock:
+            self._refill()
+            return self._tokens
@@ -40,8 +40,10 @@ def home_page(request):
             active_accounts = BrokerAccount.objects.filter(is_active=True).count()
 
             # Get today's orders
-            today = datetime.now().date()
-            today_orders = Order.objects.filter(created_at__date=today).count()
+            from apps.core.utils import local_day_range
+
+            start, end = local_day_range()
+            today_orders = Order.objects.filter(created_at__gte=start, created_at__lt=end).count()
 
             # Get total P&L for today
             total_pnl = sum([
@@ -3375,125 +3377,210 @@ from django.utils import timezone as django_timezone
 def refresh_dashboard_stat(request, stat_type):
     """
     Refresh a single dashboard statistic
-    
-    Smart data fetching:
-    1. Check database cache first
-    2. If data is stale (> 5 minutes), fetch from API
-    3. Update database
-    4. Return fresh data
-    
+
+    Returns the current database value immediately. If the underlying broker
+    data is stale (> 5 minutes) a background sync is scheduled; the new value
+    reaches the page through the live feed (/api/live/?topic=dashboard)
+    instead of blocking this request on the broker API.
+
     Args:
         stat_type: One of 'positions', 'accounts', 'orders', 'pnl'
     """
+    if stat_type not in ('positions', 'accounts', 'orders', 'pnl'):
+        return JsonResponse({
+            'success': False,
+            'error': f'Invalid stat type: {stat_type}'
+        }, status=400)
+
     try:
-        from apps.positions.models import Position
-        from apps.accounts.models import BrokerAccount
-        from apps.brokers.models import Order
-        from decimal import Decimal
-        
-        STALE_THRESHOLD = timedelta(minutes=5)
-        from_api = False
-        
-        if stat_type == 'positions':
-            # Check if we need to refresh from API
-            last_updated = Position.objects.filter(
-                status='ACTIVE'
-            ).order_by('-updated_at').first()
-            
-            if last_updated and (django_timezone.now() - last_updated.updated_at) > STALE_THRESHOLD:
-                # Data is stale, fetch from API
-                try:
-                    # Trigger position refresh from broker API
-                    from apps.positions.services.position_sync import sync_positions_from_broker
-                    sync_positions_from_broker()
-                    from_api = True
-                except Exception as e:
-                    logger.warning(f"Failed to sync positions from API: {e}")
-            
-            # Get count from database (fresh or existing)
-            count = Position.objects.filter(status='ACTIVE').count()
-            return JsonResponse({
-                'success': True,
-                'value': count,
-                'from_api': from_api,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        elif stat_type == 'accounts':
-            # Accounts don't change frequently, just return DB count
-            count = BrokerAccount.objects.filter(is_active=True).count()
-            return JsonResponse({
-                'success': True,
-                'value': count,
-                'from_api': False,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        elif stat_type == 'orders':
-            # Check if we need to refresh today's orders from API
-            today = datetime.now().date()
-            last_order = Order.objects.filter(
-                created_at__date=today
-            ).order_by('-created_at').first()
-            
-            if last_order and (django_timezone.now() - last_order.created_at) > STALE_THRESHOLD:
-                # Data might be stale, fetch from API
-                try:
-                    from apps.brokers.services.order_sync import sync_orders_from_broker
-                    sync_orders_from_broker()
-                    from_api = True
-                except Exception as e:
-                    logger.warning(f"Failed to sync orders from API: {e}")
-            
-            count = Order.objects.filter(created_at__date=today).count()
-            return JsonResponse({
-                'success': True,
-                'value': count,
-                'from_api': from_api,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        elif stat_type == 'pnl':
-            # Check if position P&L needs update
-            positions = Position.objects.filter(status='ACTIVE')
-            
-            if positions.exists():
-                latest_position = positions.order_by('-updated_at').first()
-                
-                if (django_timezone.now() - latest_position.updated_at) > STALE_THRESHOLD:
-                    # Data is stale, fetch fresh prices from API
-                    try:
-                        from apps.positions.services.pnl_updater import update_all_position_pnl
-                        update_all_position_pnl()
-                        from_api = True
-                    except Exception as e:
-                        logger.warning(f"Failed to update P&L from API: {e}")
-            
-            # Calculate total P&L
-            total_pnl = sum([
-                pos.unrealized_pnl or Decimal('0')
-                for pos in Position.objects.filter(status='ACTIVE')
-            ])
-            
-            # Format as currency
-            formatted_pnl = format_currency(total_pnl)
-            
-            return JsonResponse({
-                'success': True,
-                'value': formatted_pnl,
-                'from_api': from_api,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        else:
-            return JsonResponse({
-                'success': False,
-                'error': f'Invalid stat type: {stat_type}'
-            }, status=400)
-    
+        from apps.core.services.dashboard import (
+            build_dashboard_snapshot,
+            schedule_broker_sync,
+        )
+
+        snapshot = build_dashboard_snapshot()
+
+        sync_scheduled = False
+        if stat_type in ('positions', 'pnl') and snapshot['stale']['positions']:
+            sync_scheduled = schedule_broker_sync(stat_type)
+        elif stat_type == 'orders' and snapshot['stale']['orders']:
+            sync_scheduled = schedule_broker_sync('orders')
+
+        return JsonResponse({
+            'success': True,
+            'value': snapshot[stat_type],
+            'from_api': False,
+            'sync_scheduled': sync_scheduled,
+            'timestamp': datetime.now().isoformat()
+        })
+
     except Exception as e:
         logger.error(f"Error refreshing dashboard stat {stat_type}: {e}", exc_info=True)
         return JsonResponse({
             'success': False,
             'error': str(e)
         }, status=500)
+
+
+# =============================================================================
+# LIVE FEED (SERVER-SENT EVENTS)
+# =============================================================================
+
+def _resolve_live_topic(request, topic):
+    """
+    Map a client topic to a hub topic the user may read.
+
+    Client topics:
+        dashboard                   -> dashboard
+        strangle:<suggestion_id>    -> strangle execution progress (own suggestions only)
+        close:<broker>:<symbol>     -> close-position progress of this user
+        analysis:<job_id>           -> analysis job results (own jobs only)
+
+    Returns:
+        str or None: Hub topic, None if unknown or not allowed
+    """
+    if topic == 'dashboard':
+        return 'dashboard'
+
+    if topic.startswith('strangle:'):
+        from apps.trading.models import OrderExecutionControl, TradeSuggestion
+
+        suggestion_id = topic.split(':', 1)[1]
+        if not suggestion_id.isdigit():
+            return None
+        if not TradeSuggestion.objects.filter(id=suggestion_id, user=request.user).exists():
+            return None
+        return f"execution:{OrderExecutionControl.progress_key_for(suggestion_id)}"
+
+    if topic.startswith('close:'):
+        parts = topic.split(':', 2)
+        if len(parts) != 3:
+            return None
+        _, broker, symbol = parts
+        # Same key close_live_position publishes its progress to
+        return f"execution:close_progress_{request.user.id}_{broker}_{symbol.replace('/', '_')}"
+
+    if topic.startswith('analysis:'):
+        from apps.trading.models import AnalysisJob
+
+        job_id = topic.split(':', 1)[1]
+        if not job_id.isdigit() or not AnalysisJob.objects.filter(id=job_id, user=request.user).exists():
+            return None
+        return f"analysis_job:{job_id}"
+
+    return None
+
+
+async def _live_feed_stream_async(topic):
+    import asyncio
+    from apps.core.constants import LIVE_FEED_HEARTBEAT_SECONDS, LIVE_FEED_MAX_CONNECTION_SECONDS
+    from apps.core.services.live_feed import format_sse, get_live_feed_hub
+
+    hub = get_live_feed_hub()
+    loop = asyncio.get_running_loop()
+    subscription = hub.subscribe(topic, loop=loop)
+    deadline = loop.time() + LIVE_FEED_MAX_CONNECTION_SECONDS
+    try:
+        yield 'retry: 3000\n\n'
+        while loop.time() < deadline:
+            message = await subscription.get(LIVE_FEED_HEARTBEAT_SECONDS)
+            yield format_sse(message) if message else ': keepalive\n\n'
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def _live_feed_stream_sync(topic):
+    import time
+    from apps.core.constants import LIVE_FEED_HEARTBEAT_SECONDS, LIVE_FEED_MAX_CONNECTION_SECONDS
+    from apps.core.services.live_feed import format_sse, get_live_feed_hub
+
+    hub = get_live_feed_hub()
+    subscription = hub.subscribe(topic)
+    deadline = time.monotonic() + LIVE_FEED_MAX_CONNECTION_SECONDS
+    try:
+        yield 'retry: 3000\n\n'
+        while time.monotonic() < deadline:
+            message = subscription.get_sync(LIVE_FEED_HEARTBEAT_SECONDS)
+            yield format_sse(message) if message else ': keepalive\n\n'
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@login_required
+def live_feed(request):
+    """
+    Server-Sent Events stream of live dashboard data
+
+    GET params:
+        topic: 'dashboard', 'strangle:<suggestion_id>', 'close:<broker>:<symbol>' or 'analysis:<job_id>'
+
+    Events:
+        dashboard        Positions, P&L, orders, risk state, learning status
+        task_event       Background task log entry (BkLog)
+        progress         Execution progress snapshot
+        execution_event  Execution event (order placed/filled, batch done, ...)
+        analysis_item    Analysis job result of one contract
+
+    All connections to a topic share one server-side producer. Under ASGI the
+    stream is served asynchronously; under WSGI each stream holds a worker
+    thread, so run the ASGI application (mcube_ai/asgi.py) in production.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import StreamingHttpResponse
+
+    topic = _resolve_live_topic(request, request.GET.get('topic', 'dashboard'))
+    if topic is None:
+        return JsonResponse({'success': False, 'error': 'Unknown topic'}, status=404)
+
+    if isinstance(request, ASGIRequest):
+        stream = _live_feed_stream_async(topic)
+    else:
+        stream = _live_feed_stream_sync(topic)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
+# =============================================================================
+# TELEMETRY
+# =============================================================================
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint: request, task and broker-call histograms of
+    every process (apps.core.services.telemetry).
+
+    Requires "Authorization: Bearer <TELEMETRY_METRICS_TOKEN>" (scrapers) or
+    a logged-in staff / admin user; without a token configured only the
+    latter is accepted.
+    """
+    import hmac
+    from django.http import HttpResponse
+    from apps.core.services.telemetry import render_prometheus
+
+    token = settings.TELEMETRY_METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    user = request.user
+    scraper = bool(token) and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+    staff = user.is_authenticated and (user.is_staff or is_admin_user(user))
+    if not (scraper or staff):
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain; charset=utf-8')
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/login/')
+def telemetry_page(request):
+    """Slowest views, tasks and broker methods since the processes started"""
+    from apps.core.constants import TELEMETRY_PAGE_ROWS
+    from apps.core.services.telemetry import KIND_TASK, KIND_VIEW, broker_summary, collect, summary
+
+    source = collect()
+    return render(request, 'core/telemetry.html', {
+        'views': summary(KIND_VIEW, source)[:TELEMETRY_PAGE_ROWS],
+        'tasks': summary(KIND_TASK, source)[:TELEMETRY_PAGE_ROWS],
+        'broker_calls': broker_summary(source)[:TELEMETRY_PAGE_ROWS],
+        'breadcrumbs': [{'title': 'System', 'url': '/system/test/'}, {'title': 'Telemetry', 'url': None}],
+    })
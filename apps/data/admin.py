@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    MarketData, OptionChain, Event, TLStockData, ContractData, ContractStockData,
+    MarketData, OptionChain, Event, TLStockData, SectorPerformance, ContractData, ContractStockData,
     NewsArticle, InvestorCall, KnowledgeBase
 )
 
@@ -39,6 +39,15 @@ class TLStockDataAdmin(admin.ModelAdmin):
     # No fieldsets - Django will show ALL 172 fields in alphabetical order
 
 
+@admin.register(SectorPerformance)
+class SectorPerformanceAdmin(admin.ModelAdmin):
+    list_display = ['sector', 'sector_index', 'stocks', 'return_3d', 'return_7d', 'return_21d',
+                    'breadth_pct', 'relative_strength', 'source', 'as_of']
+    list_filter = ['source', 'sector_index']
+    search_fields = ['sector']
+    readonly_fields = ['created_at', 'updated_at']
+
+
 @admin.register(ContractData)
 class ContractDataAdmin(admin.ModelAdmin):
     list_display = ['symbol', 'option_type', 'strike_price', 'expiry', 'price', 'oi', 'iv', 'delta']
@@ -11,22 +11,224 @@ Supports:
 - ICICI Breeze
 - Kotak Neo
 - (Add more as needed)
+
+Per-symbol broker calls run concurrently through a bounded worker pool,
+paced by a process-wide token bucket matched to the Breeze rate limit.
+Results are written with batched upserts instead of one transaction per row.
 """
 
-from typing import Dict, List, Optional
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from django.db import transaction
+from django.db import close_old_connections, transaction
 from django.utils import timezone
 
+from apps.core.constants import (
+    BREEZE_API_BURST,
+    BREEZE_API_RATE_PER_SECOND,
+    MARKET_DATA_FETCH_RETRIES,
+    MARKET_DATA_RETRY_DELAY,
+    MARKET_DATA_UPSERT_BATCH,
+    MARKET_DATA_WORKERS,
+)
+from apps.core.utils.date_utils import parse_expiry
+from apps.core.utils.db import retry_on_locked
+from apps.core.utils.exceptions import BrokerAPIError
+from apps.core.utils.rate_limiter import TokenBucket
+
 from .models import TLStockData, ContractData, ContractStockData
 
+logger = logging.getLogger(__name__)
+
+# Process-wide limiter shared by all updaters so concurrent refreshes
+# together stay within the Breeze API rate limit
+_breeze_api_limiter = TokenBucket(rate=BREEZE_API_RATE_PER_SECOND, capacity=BREEZE_API_BURST)
+
+
+def get_breeze_rate_limiter() -> TokenBucket:
+    """Return the process-wide Breeze market data rate limiter."""
+    return _breeze_api_limiter
+
+
+def _is_transient_response(response: Dict) -> bool:
+    """True if a failed Breeze response is worth retrying (server error, rate limit, timeout)."""
+    status = response.get('Status')
+    error = str(response.get('Error') or '').lower()
+    if isinstance(status, int) and (status >= 500 or status == 429):
+        return True
+    return any(text in error for text in ('limit', 'timeout', 'timed out', 'try again'))
+
+
+# =============================================================================
+# BATCHED UPSERTS
+# =============================================================================
+
+STOCK_QUOTE_FIELDS = ['current_price', 'day_volume', 'day_high', 'day_low', 'day_change_pct']
+
+CONTRACT_KEY_FIELDS = ('symbol', 'expiry', 'strike_price', 'option_type')
+CONTRACT_FIELDS = [
+    'price', 'oi', 'oi_change', 'traded_contracts', 'iv', 'delta', 'gamma', 'theta', 'vega',
+    'day_change', 'pct_day_change', 'open_price', 'high_price', 'low_price', 'prev_close_price',
+    'last_updated',
+]
+
+
+def _contract_key(symbol, expiry, strike_price, option_type) -> Tuple:
+    # Quotes carry '28-NOV-2024', stored rows a date
+    return (symbol, parse_expiry(expiry) or expiry, float(strike_price or 0), option_type)
+
+
+def futures_row(quote: Dict) -> Dict:
+    """ContractData row for a futures quote."""
+    return {
+        'symbol': quote['symbol'],
+        'expiry': quote['expiry'],
+        'option_type': 'FUT',
+        'strike_price': 0,
+        'price': quote['price'],
+        'oi': quote['oi'],
+        'oi_change': quote['oi_change'],
+        'traded_contracts': quote['volume'],
+        'day_change': quote['day_change'],
+        'pct_day_change': quote['pct_day_change'],
+        'open_price': quote['open_price'],
+        'high_price': quote['high_price'],
+        'low_price': quote['low_price'],
+        'prev_close_price': quote['prev_close_price'],
+        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def option_row(option: Dict) -> Dict:
+    """ContractData row for an option chain entry."""
+    return {
+        'symbol': option['symbol'],
+        'expiry': option['expiry'],
+        'strike_price': option['strike_price'],
+        'option_type': option['option_type'],
+        'price': option['price'],
+        'oi': option['oi'],
+        'oi_change': option['oi_change'],
+        'traded_contracts': option['volume'],
+        'iv': option['iv'],
+        'delta': option['delta'],
+        'gamma': option['gamma'],
+        'theta': option['theta'],
+        'vega': option['vega'],
+        'day_change': option['day_change'],
+        'pct_day_change': option['pct_day_change'],
+        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+@retry_on_locked()
+def upsert_stock_quotes(quotes: List[Dict], batch_size: int = MARKET_DATA_UPSERT_BATCH) -> int:
+    """
+    Write stock quotes to TLStockData in one transaction.
+
+    Existing rows (by nsecode) are bulk-updated, new symbols bulk-created.
+
+    Returns:
+        int: Number of rows written
+    """
+    if not quotes:
+        return 0
+
+    by_symbol = {quote['symbol']: quote for quote in quotes}
+
+    with transaction.atomic():
+        existing = list(TLStockData.objects.filter(nsecode__in=list(by_symbol)))
+        for stock in existing:
+            quote = by_symbol[stock.nsecode]
+            for field in STOCK_QUOTE_FIELDS:
+                setattr(stock, field, quote[field])
+        TLStockData.objects.bulk_update(existing, STOCK_QUOTE_FIELDS, batch_size=batch_size)
+
+        known = {stock.nsecode for stock in existing}
+        new_rows = [
+            TLStockData(nsecode=symbol, **{field: quote[field] for field in STOCK_QUOTE_FIELDS})
+            for symbol, quote in by_symbol.items() if symbol not in known
+        ]
+        TLStockData.objects.bulk_create(new_rows, batch_size=batch_size)
+
+    return len(by_symbol)
+
+
+@retry_on_locked()
+def upsert_contract_rows(rows: List[Dict], batch_size: int = MARKET_DATA_UPSERT_BATCH) -> int:
+    """
+    Write futures/option rows to ContractData in one transaction.
+
+    Rows are matched on (symbol, expiry, strike_price, option_type); matches
+    are bulk-updated with the fields present in the row, the rest bulk-created.
+
+    Returns:
+        int: Number of rows written
+    """
+    if not rows:
+        return 0
+
+    by_key = {_contract_key(*(row[f] for f in CONTRACT_KEY_FIELDS)): row for row in rows}
+    symbols = {key[0] for key in by_key}
+    expiries = {key[1] for key in by_key}
+
+    with transaction.atomic():
+        existing = ContractData.objects.filter(symbol__in=symbols, expiry__in=expiries)
+
+        to_update = {}
+        matched = set()
+        for contract in existing:
+            key = _contract_key(contract.symbol, contract.expiry, contract.strike_price, contract.option_type)
+            row = by_key.get(key)
+            if row is None:
+                continue
+            for field in CONTRACT_FIELDS:
+                if field in row:
+                    setattr(contract, field, row[field])
+            matched.add(key)
+            to_update.setdefault(frozenset(f for f in CONTRACT_FIELDS if f in row), []).append(contract)
+
+        # Futures and option rows carry different fields; update each shape separately
+        for fields, contracts in to_update.items():
+            ContractData.objects.bulk_update(contracts, sorted(fields), batch_size=batch_size)
+
+        ContractData.objects.bulk_create(
+            [ContractData(**row) for key, row in by_key.items() if key not in matched],
+            batch_size=batch_size
+        )
+
+    return len(by_key)
+
+
+def _latency_summary(latencies: Dict[str, float]) -> Dict:
+    """p50/p95/max of per-symbol latencies (ms) plus the slowest symbols."""
+    if not latencies:
+        return {'p50_ms': 0, 'p95_ms': 0, 'max_ms': 0, 'slowest': []}
+
+    values = sorted(latencies.values())
+    slowest = sorted(latencies.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        'p50_ms': round(values[len(values) // 2], 1),
+        'p95_ms': round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+        'max_ms': round(values[-1], 1),
+        'slowest': [{'symbol': symbol, 'ms': round(ms, 1)} for symbol, ms in slowest],
+    }
+
 
 class BreezeDataFetcher:
     """Fetch real-time data from ICICI Breeze API"""
 
-    def __init__(self):
+    def __init__(self, rate_limiter: TokenBucket = None,
+                 retries: int = MARKET_DATA_FETCH_RETRIES,
+                 retry_delay: float = MARKET_DATA_RETRY_DELAY):
         from apps.core.models import CredentialStore
 
+        self.rate_limiter = rate_limiter or get_breeze_rate_limiter()
+        self.retries = retries
+        self.retry_delay = retry_delay
+
         # Get Breeze credentials
         creds = CredentialStore.objects.filter(service='breeze').first()
         if not creds:
@@ -40,6 +242,37 @@ class BreezeDataFetcher:
             session_token=creds.session_token
         )
 
+    def _call(self, method: str, **params) -> Optional[Dict]:
+        """
+        Call a Breeze API method within the rate limit, retrying transient failures.
+
+        Returns:
+            dict: The response; failed responses that are not transient are
+            returned as-is for the caller to inspect
+
+        Raises:
+            BrokerAPIError: If the call still fails after all retries
+        """
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = getattr(self.breeze, method)(**params)
+                if not response or response.get('Success') or not _is_transient_response(response):
+                    return response
+                error = response.get('Error')
+            except Exception as e:
+                error = e
+
+            if attempt == self.retries:
+                raise BrokerAPIError(
+                    f"{method} failed after {attempt + 1} attempts: {error}",
+                    details={'params': params}
+                )
+            logger.debug(f"{method} {params.get('stock_code')}: {error}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            delay *= 2
+
     def fetch_stock_quote(self, symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
         """
         Fetch current stock quote
@@ -48,7 +281,8 @@ class BreezeDataFetcher:
             dict with: price, volume, change, etc.
         """
         try:
-            quote = self.breeze.get_quotes(
+            quote = self._call(
+                'get_quotes',
                 stock_code=symbol,
                 exchange_code=exchange,
                 expiry_date="",
@@ -80,7 +314,8 @@ class BreezeDataFetcher:
     def fetch_futures_quote(self, symbol: str, expiry: str) -> Optional[Dict]:
         """Fetch futures contract quote"""
         try:
-            quote = self.breeze.get_quotes(
+            quote = self._call(
+                'get_quotes',
                 stock_code=symbol,
                 exchange_code='NFO',
                 expiry_date=expiry,
@@ -120,7 +355,8 @@ class BreezeDataFetcher:
         """
         try:
             # Fetch option chain
-            chain = self.breeze.get_option_chain_quotes(
+            chain = self._call(
+                'get_option_chain_quotes',
                 stock_code=symbol,
                 exchange_code='NFO',
                 expiry_date=expiry,
@@ -159,7 +395,6 @@ class BreezeDataFetcher:
             print(f"Error fetching option chain for {symbol}: {e}")
             return []
 
-    @transaction.atomic
     def update_stock_data(self, symbol: str) -> bool:
         """
         Fetch live data and update TLStockData model
@@ -175,24 +410,13 @@ class BreezeDataFetcher:
             return False
 
         try:
-            stock, created = TLStockData.objects.update_or_create(
-                nsecode=symbol,
-                defaults={
-                    'current_price': quote['current_price'],
-                    'day_volume': quote['day_volume'],
-                    'day_high': quote['day_high'],
-                    'day_low': quote['day_low'],
-                    'day_change_pct': quote['day_change_pct'],
-                }
-            )
-
+            upsert_stock_quotes([quote])
             return True
 
         except Exception as e:
             print(f"Error updating stock data for {symbol}: {e}")
             return False
 
-    @transaction.atomic
     def update_futures_data(self, symbol: str, expiry: str) -> bool:
         """Update futures contract data"""
         quote = self.fetch_futures_quote(symbol, expiry)
@@ -200,33 +424,13 @@ class BreezeDataFetcher:
             return False
 
         try:
-            contract, created = ContractData.objects.update_or_create(
-                symbol=symbol,
-                expiry=expiry,
-                option_type='FUT',
-                strike_price=0,
-                defaults={
-                    'price': quote['price'],
-                    'oi': quote['oi'],
-                    'oi_change': quote['oi_change'],
-                    'traded_contracts': quote['volume'],
-                    'day_change': quote['day_change'],
-                    'pct_day_change': quote['pct_day_change'],
-                    'open_price': quote['open_price'],
-                    'high_price': quote['high_price'],
-                    'low_price': quote['low_price'],
-                    'prev_close_price': quote['prev_close_price'],
-                    'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                }
-            )
-
+            upsert_contract_rows([futures_row(quote)])
             return True
 
         except Exception as e:
             print(f"Error updating futures data for {symbol}: {e}")
             return False
 
-    @transaction.atomic
     def update_option_chain_data(self, symbol: str, expiry: str) -> int:
         """
         Update option chain data
@@ -237,38 +441,12 @@ class BreezeDataFetcher:
         if not options:
             return 0
 
-        updated_count = 0
-
-        for option_data in options:
-            try:
-                contract, created = ContractData.objects.update_or_create(
-                    symbol=option_data['symbol'],
-                    expiry=option_data['expiry'],
-                    strike_price=option_data['strike_price'],
-                    option_type=option_data['option_type'],
-                    defaults={
-                        'price': option_data['price'],
-                        'oi': option_data['oi'],
-                        'oi_change': option_data['oi_change'],
-                        'traded_contracts': option_data['volume'],
-                        'iv': option_data['iv'],
-                        'delta': option_data['delta'],
-                        'gamma': option_data['gamma'],
-                        'theta': option_data['theta'],
-                        'vega': option_data['vega'],
-                        'day_change': option_data['day_change'],
-                        'pct_day_change': option_data['pct_day_change'],
-                        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    }
-                )
-
-                updated_count += 1
-
-            except Exception as e:
-                print(f"Error updating option data: {e}")
-                continue
+        try:
+            return upsert_contract_rows([option_row(option) for option in options])
 
-        return updated_count
+        except Exception as e:
+            print(f"Error updating option data for {symbol}: {e}")
+            return 0
 
 
 class MarketDataUpdater:
@@ -278,20 +456,87 @@ class MarketDataUpdater:
     Orchestrates fetching data from broker APIs and updating Django models
     """
 
-    def __init__(self, broker: str = 'breeze'):
+    def __init__(self, broker: str = 'breeze', max_workers: int = MARKET_DATA_WORKERS,
+                 upsert_batch_size: int = MARKET_DATA_UPSERT_BATCH):
         """
         Initialize with specific broker
 
         Args:
             broker: 'breeze' or 'kotak_neo'
+            max_workers: Concurrent per-symbol broker fetches
+            upsert_batch_size: Fetched rows buffered before each batched write
         """
         self.broker = broker
+        self.max_workers = max_workers
+        self.upsert_batch_size = upsert_batch_size
 
         if broker == 'breeze':
             self.fetcher = BreezeDataFetcher()
         else:
             raise ValueError(f"Broker {broker} not supported yet")
 
+    def _fan_out(self, symbols: List[str], fetch: Callable[[str], object],
+                 write: Callable[[List], int]) -> Tuple[Dict[str, object], Dict[str, float]]:
+        """
+        Run `fetch(symbol)` for all symbols on the worker pool and pass the
+        results to `write(results)` in batches as they complete.
+
+        Fetch errors are logged and recorded as None. A failed write (e.g.
+        "database is locked") is logged and its symbols are recorded as None;
+        the other batches are still written. Rate limiting and retries happen
+        inside the fetcher.
+
+        Returns:
+            (results by symbol, fetch latency in ms by symbol)
+        """
+        results: Dict[str, object] = {}
+        latencies: Dict[str, float] = {}
+        pending: List = []
+        pending_symbols: List[str] = []
+        pending_rows = 0
+
+        def flush():
+            try:
+                write(pending)
+            except Exception as e:
+                logger.error(f"Market data write failed for {len(pending_symbols)} symbols "
+                             f"({', '.join(pending_symbols)}): {e}")
+                for failed in pending_symbols:
+                    results[failed] = None
+
+        def timed(symbol):
+            started = time.perf_counter()
+            try:
+                return fetch(symbol)
+            finally:
+                latencies[symbol] = (time.perf_counter() - started) * 1000
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='market-data') as pool:
+            futures = {pool.submit(timed, symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Market data fetch failed for {symbol}: {e}")
+                    result = None
+                results[symbol] = result
+                logger.debug(f"{symbol}: fetched in {latencies.get(symbol, 0):.0f}ms")
+
+                if result:
+                    pending.append(result)
+                    pending_symbols.append(symbol)
+                    pending_rows += len(result) if isinstance(result, list) else 1
+                if pending_rows >= self.upsert_batch_size:
+                    flush()
+                    pending, pending_symbols, pending_rows = [], [], 0
+
+        if pending:
+            flush()
+
+        return results, latencies
+
     def update_stock_universe(self, symbols: List[str]) -> Dict:
         """
         Update data for multiple stocks
@@ -300,21 +545,24 @@ class MarketDataUpdater:
             symbols: List of NSE codes
 
         Returns:
-            dict with update statistics
+            dict with update statistics, per-symbol latency summary and cycle time
         """
+        started = time.perf_counter()
+
+        results, latencies = self._fan_out(symbols, self.fetcher.fetch_stock_quote, upsert_stock_quotes)
+
+        updated = sum(1 for quote in results.values() if quote)
         stats = {
             'total': len(symbols),
-            'updated': 0,
-            'failed': 0
+            'updated': updated,
+            'failed': len(symbols) - updated,
+            'latency': _latency_summary(latencies),
+            'cycle_seconds': round(time.perf_counter() - started, 2),
         }
-
-        for symbol in symbols:
-            success = self.fetcher.update_stock_data(symbol)
-            if success:
-                stats['updated'] += 1
-            else:
-                stats['failed'] += 1
-
+        logger.info(
+            f"Stock update: {updated}/{len(symbols)} in {stats['cycle_seconds']}s "
+            f"(p95 {stats['latency']['p95_ms']}ms)"
+        )
         return stats
 
     def update_fno_universe(self, symbols: List[str], expiry: str) -> Dict:
@@ -326,28 +574,43 @@ class MarketDataUpdater:
             expiry: Expiry date (e.g., '28-NOV-2024')
 
         Returns:
-            dict with update statistics
+            dict with update statistics, per-symbol latency summary and cycle time
         """
+        started = time.perf_counter()
+
+        def fetch(symbol):
+            rows = []
+            quote = self.fetcher.fetch_futures_quote(symbol, expiry)
+            if quote:
+                rows.append(futures_row(quote))
+            rows.extend(option_row(option) for option in self.fetcher.fetch_option_chain(symbol, expiry))
+            return rows
+
+        def write(batches):
+            return upsert_contract_rows([row for rows in batches for row in rows])
+
+        results, latencies = self._fan_out(symbols, fetch, write)
+
         stats = {
             'total': len(symbols),
             'futures_updated': 0,
             'options_updated': 0,
             'failed': 0
         }
-
-        for symbol in symbols:
-            # Update futures
-            futures_success = self.fetcher.update_futures_data(symbol, expiry)
-            if futures_success:
-                stats['futures_updated'] += 1
-
-            # Update options
-            options_count = self.fetcher.update_option_chain_data(symbol, expiry)
-            if options_count > 0:
-                stats['options_updated'] += options_count
-            else:
+        for rows in results.values():
+            rows = rows or []
+            futures = sum(1 for row in rows if row['option_type'] == 'FUT')
+            stats['futures_updated'] += futures
+            stats['options_updated'] += len(rows) - futures
+            if len(rows) == futures:
                 stats['failed'] += 1
 
+        stats['latency'] = _latency_summary(latencies)
+        stats['cycle_seconds'] = round(time.perf_counter() - started, 2)
+        logger.info(
+            f"F&O update: {len(symbols)} symbols, {stats['options_updated']} options in "
+            f"{stats['cycle_seconds']}s (p95 {stats['latency']['p95_ms']}ms)"
+        )
         return stats
 
     def update_nifty50_stocks(self) -> Dict:
@@ -375,7 +638,7 @@ class MarketDataUpdater:
             expiry: Expiry date. If None, uses current month expiry
         """
         if expiry is None:
-            # Auto-calculate current month expiry (last Thursday)
+            # Auto-calculate current month expiry (last Tuesday)
             expiry = self._get_current_expiry()
 
         fno_symbols = [
@@ -388,27 +651,15 @@ class MarketDataUpdater:
 
     def _get_current_expiry(self) -> str:
         """
-        Calculate current month expiry (last Thursday)
+        Current monthly expiry from the trading calendar (last Tuesday, holiday-adjusted)
 
         Returns:
             str: Expiry date in format 'DD-MMM-YYYY'
         """
-        from calendar import monthrange
-
-        today = datetime.now()
-        year = today.year
-        month = today.month
-
-        # Get last day of current month
-        last_day = monthrange(year, month)[1]
-
-        # Find last Thursday
-        for day in range(last_day, 0, -1):
-            date = datetime(year, month, day)
-            if date.weekday() == 3:  # Thursday
-                return date.strftime('%d-%b-%Y').upper()
+        from apps.core.services.trading_calendar import get_trading_calendar
 
-        return today.strftime('%d-%b-%Y').upper()
+        expiry = get_trading_calendar().next_expiry('NIFTY', kind='monthly')
+        return expiry.strftime('%d-%b-%Y').upper()
 
     @transaction.atomic
     def calculate_and_update_derived_metrics(self, symbol: str, expiry: str):
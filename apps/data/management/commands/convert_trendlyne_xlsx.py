@@ -1,26 +1,35 @@
 """
-Convert Trendlyne XLSX files to CSV format for database import
+Convert Trendlyne XLSX files to Parquet for database import
 
-This command converts downloaded XLSX files from apps/data/tldata/ to CSV format
-in trendlyne_data/ directory for processing by trendlyne_data_manager.
+This command converts the latest downloaded XLSX files from apps/data/tldata/
+through the export cache (apps.data.services.trendlyne_parquet) and places
+the typed Parquet files in trendlyne_data/ for trendlyne_data_manager. A
+workbook already converted (same content) is not parsed again.
 
 Usage:
     python manage.py convert_trendlyne_xlsx
+    python manage.py convert_trendlyne_xlsx --csv     # also write the old CSV files
 """
 
-import os
-import pandas as pd
+import shutil
 from pathlib import Path
+
+import pyarrow.csv as pacsv
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
+from apps.data.services.trendlyne_parquet import KIND_FNO, KIND_STOCK, convert_export
+
 
 class Command(BaseCommand):
-    help = 'Convert Trendlyne XLSX files to CSV format'
+    help = 'Convert Trendlyne XLSX files to Parquet (cached by content)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', action='store_true', help='Also write contract_data.csv / stock_data.csv')
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('\n' + '=' * 70))
-        self.stdout.write(self.style.SUCCESS('CONVERT TRENDLYNE XLSX TO CSV'))
+        self.stdout.write(self.style.SUCCESS('CONVERT TRENDLYNE XLSX TO PARQUET'))
         self.stdout.write(self.style.SUCCESS('=' * 70 + '\n'))
 
         # Define directories
@@ -29,112 +38,40 @@ class Command(BaseCommand):
         target_dir.mkdir(parents=True, exist_ok=True)
 
         # Convert FNO Data (Contract Data)
-        self.convert_fno_data(source_dir, target_dir)
+        self.stdout.write('📊 Converting FNO Data...')
+        self.convert(source_dir.glob('fno_data_*.xlsx'), KIND_FNO, target_dir, 'contract_data', options['csv'])
 
         # Convert Stock Data
-        self.convert_stock_data(source_dir, target_dir)
+        self.stdout.write('\n📊 Converting Stock Data...')
+        self.convert(source_dir.glob('Stocks-data-IND-*.xlsx'), KIND_STOCK, target_dir, 'stock_data', options['csv'])
 
         self.stdout.write(self.style.SUCCESS('\n' + '=' * 70))
         self.stdout.write(self.style.SUCCESS('✅ CONVERSION COMPLETE'))
         self.stdout.write(self.style.SUCCESS('=' * 70 + '\n'))
 
-    def convert_fno_data(self, source_dir, target_dir):
-        """Convert FNO data XLSX to contract_data.csv"""
-        self.stdout.write('📊 Converting FNO Data...')
-
-        # Find the latest FNO data file
-        fno_files = list(source_dir.glob('fno_data_*.xlsx'))
-        if not fno_files:
-            self.stdout.write(self.style.WARNING('  ⚠️  No FNO data files found'))
-            return
-
-        # Get the most recent file
-        latest_file = max(fno_files, key=lambda x: x.stat().st_mtime)
-        self.stdout.write(f'  📁 Reading {latest_file.name}')
-
-        try:
-            # Read XLSX
-            df = pd.read_excel(latest_file, sheet_name=0)
-
-            # Normalize column names
-            df.columns = [
-                col.lower()
-                .replace(' ', '_')
-                .replace('%', 'pct_')
-                .replace('(', '')
-                .replace(')', '')
-                .replace('__', '_')
-                for col in df.columns
-            ]
-
-            # Handle NaN values
-            df = df.fillna(0)
-
-            # Replace string 'nan' with empty strings
-            for col in df.columns:
-                if df[col].dtype == 'object':
-                    df[col] = df[col].replace('nan', '')
-
-            # Save as CSV
-            csv_file = target_dir / 'contract_data.csv'
-            df.to_csv(csv_file, index=False)
-
-            self.stdout.write(
-                self.style.SUCCESS(f'  ✅ Converted {len(df):,} rows to {csv_file.name}')
-            )
-
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'  ❌ Error converting FNO data: {e}')
-            )
-
-    def convert_stock_data(self, source_dir, target_dir):
-        """Convert Stock data XLSX to stock_data.csv"""
-        self.stdout.write('\n📊 Converting Stock Data...')
-
-        # Find the latest Stock data file
-        stock_files = list(source_dir.glob('Stocks-data-IND-*.xlsx'))
-        if not stock_files:
-            self.stdout.write(self.style.WARNING('  ⚠️  No Stock data files found'))
+    def convert(self, files, kind, target_dir, name, write_csv=False):
+        """Convert the most recent of files and copy it to target_dir/<name>.parquet"""
+        files = list(files)
+        if not files:
+            self.stdout.write(self.style.WARNING('  ⚠️  No data files found'))
             return
 
-        # Get the most recent file
-        latest_file = max(stock_files, key=lambda x: x.stat().st_mtime)
+        latest_file = max(files, key=lambda x: x.stat().st_mtime)
         self.stdout.write(f'  📁 Reading {latest_file.name}')
 
         try:
-            # Read XLSX
-            df = pd.read_excel(latest_file, sheet_name=0)
-
-            # Normalize column names
-            df.columns = [
-                col.lower()
-                .replace(' ', '_')
-                .replace('%', 'pct_')
-                .replace('(', '')
-                .replace(')', '')
-                .replace('__', '_')
-                .replace('-', '_')
-                for col in df.columns
-            ]
-
-            # Handle NaN values
-            for col in df.columns:
-                if df[col].dtype in ['float64', 'int64']:
-                    df[col] = df[col].fillna(0)
-                elif df[col].dtype == 'object':
-                    df[col] = df[col].fillna('')
-                    df[col] = df[col].replace('nan', '')
-
-            # Save as CSV
-            csv_file = target_dir / 'stock_data.csv'
-            df.to_csv(csv_file, index=False)
+            export = convert_export(latest_file, kind=kind)
+            parquet_file = target_dir / f'{name}.parquet'
+            shutil.copyfile(export.path, parquet_file)
+            if write_csv:
+                pacsv.write_csv(export.read(), target_dir / f'{name}.csv')
 
+            state = 'already converted' if export.cached else f'{len(export.columns)} of {len(export.header)} columns'
             self.stdout.write(
-                self.style.SUCCESS(f'  ✅ Converted {len(df):,} rows to {csv_file.name}')
+                self.style.SUCCESS(f'  ✅ {export.rows:,} rows to {parquet_file.name} ({state})')
             )
 
         except Exception as e:
             self.stdout.write(
-                self.style.ERROR(f'  ❌ Error converting Stock data: {e}')
+                self.style.ERROR(f'  ❌ Error converting {latest_file.name}: {e}')
             )
@@ -0,0 +1,105 @@
+"""
+Management command for the option-chain history store
+
+Usage:
+    python manage.py option_chain_store                      # catalog summary
+    python manage.py option_chain_store --compact            # merge finished days
+    python manage.py option_chain_store --compact --before 2025-01-28
+    python manage.py option_chain_store --backfill           # archive the current OptionChain table
+    python manage.py option_chain_store --history NIFTY --expiry 2025-01-30 --type PE --field oi
+"""
+
+from datetime import datetime
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from apps.data.models import OptionChain
+from apps.data.services.option_chain_store import get_option_chain_store
+
+
+def _parse_date(raw):
+    try:
+        return datetime.strptime(raw, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date (expected YYYY-MM-DD): {raw}")
+
+
+class Command(BaseCommand):
+    help = 'Inspect, compact and backfill the option-chain history store'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compact', action='store_true', help='Merge per-snapshot files into day files')
+        parser.add_argument('--before', help='Only compact days before this date (YYYY-MM-DD, default today)')
+        parser.add_argument('--backfill', action='store_true',
+                            help='Archive the chain currently in the OptionChain table')
+        parser.add_argument('--history', metavar='UNDERLYING', help='Print the stored history of one expiry')
+        parser.add_argument('--expiry', help='Expiry for --history (YYYY-MM-DD)')
+        parser.add_argument('--type', choices=['CE', 'PE'], default='CE', help='Option type for --history')
+        parser.add_argument('--field', default='oi', help='Field for --history (ltp, oi, iv, volume, ...)')
+
+    def handle(self, *args, **options):
+        store = get_option_chain_store()
+
+        if options['backfill']:
+            self._backfill(store)
+
+        if options['compact']:
+            before = _parse_date(options['before']) if options['before'] else None
+            days = store.compact_all(before=before)
+            self.stdout.write(self.style.SUCCESS(f"Compacted {days} days"))
+
+        if options['history']:
+            if not options['expiry']:
+                raise CommandError("--history needs --expiry")
+            self._history(store, options['history'], _parse_date(options['expiry']),
+                          options['type'], options['field'])
+            return
+
+        self._stats(store)
+
+    def _backfill(self, store):
+        groups = (
+            OptionChain.objects.values('underlying', 'expiry_date')
+            .annotate(snapshot_time=Min('snapshot_time'))
+        )
+        archived = 0
+        for group in groups:
+            rows = OptionChain.objects.filter(
+                underlying=group['underlying'], expiry_date=group['expiry_date']
+            ).values('strike', 'option_type', 'ltp', 'bid', 'ask', 'volume', 'oi', 'oi_change', 'iv', 'spot_price')
+            if store.append_snapshot(group['underlying'], group['expiry_date'], rows, group['snapshot_time']):
+                archived += 1
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} option chain snapshots"))
+
+    def _history(self, store, underlying, expiry, option_type, field):
+        history = store.read_history(underlying, expiry, option_type=option_type, fields=(field,))
+        if not len(history.times):
+            raise CommandError(f"No stored {underlying} {option_type} chain for {expiry}")
+
+        grid = history.values[field]
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== {underlying} {expiry} {option_type} {field}: "
+            f"{len(history.times)} snapshots x {len(history.strikes)} strikes ==="
+        ))
+        latest = grid[-1]
+        order = np.argsort(np.nan_to_num(latest, nan=-np.inf))[::-1][:10]
+        self.stdout.write(f"Top strikes at {history.times[-1]}:")
+        for index in order:
+            change = latest[index] - grid[0][index]
+            self.stdout.write(f"  {history.strikes[index]:>10,.0f}  {latest[index]:>14,.2f}  ({change:+,.2f} since first)")
+
+    def _stats(self, store):
+        stats = store.stats()
+        self.stdout.write(self.style.SUCCESS(f"\n=== Option Chain Store: {store.root} ==="))
+        if not stats:
+            self.stdout.write("No snapshots stored")
+            return
+        for underlying, row in stats.items():
+            self.stdout.write(
+                f"{underlying:<12}{row['expiries']:>4} expiries  {row['snapshots']:>7} snapshots  "
+                f"{row['rows']:>10,} rows  {row['files']:>6} files  {row['size_bytes'] / 1024 / 1024:>8.1f} MB  "
+                f"{timezone.localtime(row['first']):%Y-%m-%d} to {timezone.localtime(row['last']):%Y-%m-%d}"
+            )
@@ -2,8 +2,8 @@
 Populate Trendlyne data - Complete workflow
 
 This command performs the complete workflow to populate Trendlyne data:
-1. Convert XLSX files to CSV format
-2. Parse CSV files and populate database
+1. Convert XLSX files to Parquet (cached by content hash)
+2. Parse the converted files and populate database
 3. Show status
 
 Usage:
@@ -15,7 +15,7 @@ from django.core.management import call_command
 
 
 class Command(BaseCommand):
-    help = 'Complete workflow: Convert XLSX → Parse CSV → Populate Database'
+    help = 'Complete workflow: Convert XLSX → Parse Parquet → Populate Database'
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('\n' + '=' * 70))
@@ -30,16 +30,16 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'❌ Data cleanup failed: {e}'))
             return
 
-        # Step 1: Convert XLSX to CSV
-        self.stdout.write(self.style.WARNING('\n[Step 2/4] Converting XLSX files to CSV...\n'))
+        # Step 1: Convert XLSX to Parquet
+        self.stdout.write(self.style.WARNING('\n[Step 2/4] Converting XLSX files to Parquet...\n'))
         try:
             call_command('convert_trendlyne_xlsx')
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'❌ XLSX conversion failed: {e}'))
             return
 
-        # Step 2: Parse CSV and populate database
-        self.stdout.write(self.style.WARNING('\n[Step 3/4] Parsing CSV and populating database...\n'))
+        # Step 2: Parse Parquet and populate database
+        self.stdout.write(self.style.WARNING('\n[Step 3/4] Parsing Parquet and populating database...\n'))
         try:
             call_command('trendlyne_data_manager', '--parse-all')
         except Exception as e:
@@ -0,0 +1,59 @@
+"""
+Management command for the sector performance table
+
+Usage:
+    python manage.py sector_performance                          # print the cached table
+    python manage.py sector_performance --refresh                # recompute from TLStockData / HistoricalPrice
+    python manage.py sector_performance --record sectors.json    # save the universe as an offline fixture
+    python manage.py sector_performance --fixture sectors.json   # recompute from a recorded fixture
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.data.models import SectorPerformance
+from apps.data.services.sector_performance import record_fixture, refresh_sector_performance
+
+
+def _pct(value):
+    return f"{value:+7.2f}" if value is not None else "      -"
+
+
+class Command(BaseCommand):
+    help = 'Refresh and inspect sector returns, breadth and relative strength'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh', action='store_true', help='Recompute from the stored universe')
+        parser.add_argument('--fixture', help='Recompute from a recorded JSON fixture instead')
+        parser.add_argument('--record', help='Write the current universe to a JSON fixture')
+
+    def handle(self, *args, **options):
+        if options['record']:
+            universe = record_fixture(options['record'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Recorded {len(universe['stocks'])} stocks to {options['record']}"))
+
+        if options['fixture']:
+            if not Path(options['fixture']).exists():
+                raise CommandError(f"Fixture not found: {options['fixture']}")
+            metrics = refresh_sector_performance(fixture=options['fixture'])
+            self.stdout.write(self.style.SUCCESS(f"Refreshed {len(metrics)} sectors from fixture"))
+        elif options['refresh']:
+            metrics = refresh_sector_performance()
+            self.stdout.write(self.style.SUCCESS(f"Refreshed {len(metrics)} sectors"))
+
+        rows = SectorPerformance.objects.order_by('-relative_strength')
+        if not rows:
+            self.stdout.write("No sector performance yet (run with --refresh)")
+            return
+
+        self.stdout.write(f"{'Sector':40} {'Stocks':>7} {'1D':>7} {'3D':>7} {'7D':>7} {'21D':>7} "
+                          f"{'Breadth':>8} {'RS':>7}  Source")
+        for row in rows:
+            breadth = f"{row.breadth_pct:7.1f}%" if row.breadth_pct is not None else "       -"
+            self.stdout.write(
+                f"{row.sector[:40]:40} {row.priced_stocks:>3}/{row.stocks:<3} {_pct(row.return_1d)} "
+                f"{_pct(row.return_3d)} {_pct(row.return_7d)} {_pct(row.return_21d)} {breadth} "
+                f"{_pct(row.relative_strength)}  {row.source}")
+        self.stdout.write(f"\nAs of {rows[0].as_of:%Y-%m-%d %H:%M}")
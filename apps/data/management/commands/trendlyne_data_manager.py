@@ -157,11 +157,12 @@ class Command(BaseCommand):
         try:
             download_dir = self.get_download_dir()
 
-            # List of (model, parser_function, csv_filename)
+            # List of (model, parser_function, filename); the Parquet files written by
+            # convert_trendlyne_xlsx are preferred over the old CSVs
             parsers = [
-                (ContractData, self.parse_contract_data, 'contract_data.csv'),
+                (ContractData, self.parse_contract_data, ('contract_data.parquet', 'contract_data.csv')),
                 (ContractStockData, self.parse_contract_stock_data, 'contract_stock_data.csv'),
-                (TLStockData, self.parse_stock_data, 'stock_data.csv'),
+                (TLStockData, self.parse_stock_data, ('stock_data.parquet', 'stock_data.csv')),
                 (OptionChain, self.parse_option_chains, 'option_chains.csv'),
                 (Event, self.parse_events, 'events.csv'),
                 (NewsArticle, self.parse_news, 'news.csv'),
@@ -171,9 +172,12 @@ class Command(BaseCommand):
 
             self.stdout.write('\n📊 Parsing and populating database...\n')
 
-            for model, parser_func, filename in parsers:
-                filepath = download_dir / filename
-                if filepath.exists():
+            for model, parser_func, filenames in parsers:
+                if isinstance(filenames, str):
+                    filenames = (filenames,)
+                filename = filenames[-1]
+                filepath = next((download_dir / name for name in filenames if (download_dir / name).exists()), None)
+                if filepath:
                     try:
                         self.stdout.write(f'🔄 Parsing {model.__name__}...')
                         count = parser_func(filepath)
@@ -192,6 +196,14 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f'Parse failed: {e}')
 
+    def _read_frame(self, filepath):
+        """Rows of a Parquet conversion or a CSV file"""
+        import pandas as pd
+
+        if str(filepath).endswith('.parquet'):
+            return pd.read_parquet(filepath)
+        return pd.read_csv(filepath)
+
     def _get_contract_csv_column(self, field_name, csv_columns):
         """
         Find matching CSV column for ContractData model field.
@@ -227,9 +239,9 @@ class Command(BaseCommand):
         import pandas as pd
         import numpy as np
 
-        self.stdout.write("Parsing contract data CSV...")
+        self.stdout.write(f"Parsing contract data {filepath.suffix[1:].upper()}...")
         ContractData.objects.all().delete()
-        df = pd.read_csv(filepath)
+        df = self._read_frame(filepath)
 
         # Get all model field names and CSV columns
         model_fields = {f.name: f for f in ContractData._meta.fields}
@@ -434,9 +446,9 @@ class Command(BaseCommand):
         import pandas as pd
         import numpy as np
 
-        self.stdout.write("Parsing stock data CSV...")
+        self.stdout.write(f"Parsing stock data {filepath.suffix[1:].upper()}...")
         TLStockData.objects.all().delete()
-        df = pd.read_csv(filepath)
+        df = self._read_frame(filepath)
 
         # Get all model field names and CSV columns
         model_fields = {f.name: f for f in TLStockData._meta.fields}
@@ -0,0 +1,71 @@
+"""
+Management command for the HTTP Trendlyne download
+
+Usage:
+    python manage.py trendlyne_download                        # F&O, snapshot and screeners over HTTP
+    python manage.py trendlyne_download --no-browser           # never fall back to the browser
+    python manage.py trendlyne_download --record recordings/   # also save the responses for the stub
+    python manage.py trendlyne_download --stub recordings/     # replay a recording from a local stub (offline)
+"""
+
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.data.providers.trendlyne_http import TrendlyneDownloader
+
+
+class Command(BaseCommand):
+    help = 'Download the daily Trendlyne files over HTTP (browser only as fallback)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--download-dir', help='Destination directory (default apps/data/tldata)')
+        parser.add_argument('--no-browser', action='store_true', help='Fail instead of using the browser')
+        parser.add_argument('--record', metavar='DIR', help='Save every response for offline replay')
+        parser.add_argument('--stub', metavar='DIR', help='Download from a local stub replaying DIR')
+
+    def handle(self, *args, **options):
+        if options['stub']:
+            self._run_stub(options)
+        else:
+            self._report(TrendlyneDownloader(
+                download_dir=options['download_dir'],
+                browser_fallback=not options['no_browser'],
+                record_dir=options['record'],
+            ).fetch_all())
+
+    def _run_stub(self, options):
+        from apps.data.providers.trendlyne_stub import TrendlyneStub
+
+        if not (Path(options['stub']) / 'manifest.json').exists():
+            raise CommandError(f"No recording in {options['stub']} (manifest.json missing)")
+
+        with TrendlyneStub.from_recording(options['stub']) as stub, tempfile.TemporaryDirectory() as tmp:
+            self.stdout.write(f"Replaying {len(stub.responses)} responses from {stub.base_url}")
+            self._report(TrendlyneDownloader(
+                download_dir=options['download_dir'] or tmp,
+                base_url=stub.base_url,
+                cookie_path=Path(tmp) / 'cookies.json',
+                credentials=('stub', 'stub'),
+                browser_fallback=False,
+            ).fetch_all())
+
+    def _report(self, result):
+        if not result.get('success'):
+            raise CommandError(f"Download failed: {result.get('error')}")
+
+        results = result['results']
+        for name in ('fno', 'market_snapshot'):
+            item = results[name]
+            if item.get('success'):
+                self.stdout.write(f"  {name:16} {item['filename']} ({item.get('via')})")
+            else:
+                self.stdout.write(self.style.WARNING(f"  {name:16} failed: {item.get('error')}"))
+
+        screeners = results['forecaster']
+        fetched = [r for r in screeners.values() if r.get('success')]
+        browser = sum(1 for r in fetched if r.get('via') == 'browser')
+        self.stdout.write(f"  {'forecaster':16} {len(fetched)}/{len(screeners)} screeners ({browser} via browser)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {result['elapsed']:.1f}s (session: {result['auth']})"))
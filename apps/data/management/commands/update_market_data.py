@@ -3,6 +3,7 @@ Management command to update live market data from broker APIs
 """
 
 from django.core.management.base import BaseCommand
+from apps.core.constants import MARKET_DATA_WORKERS
 from apps.data.broker_integration import MarketDataUpdater
 
 
@@ -35,6 +36,12 @@ class Command(BaseCommand):
             type=str,
             help='F&O expiry date (DD-MMM-YYYY)'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=MARKET_DATA_WORKERS,
+            help='Concurrent per-symbol broker fetches'
+        )
 
     def handle(self, *args, **options):
         broker = options['broker']
@@ -47,7 +54,7 @@ class Command(BaseCommand):
         ))
 
         try:
-            updater = MarketDataUpdater(broker=broker)
+            updater = MarketDataUpdater(broker=broker, max_workers=options['workers'])
 
             if data_type in ['stocks', 'all']:
                 self.stdout.write('Updating stock data...')
@@ -59,7 +66,8 @@ class Command(BaseCommand):
 
                 self.stdout.write(self.style.SUCCESS(
                     f"Stocks: {stats['updated']}/{stats['total']} updated, "
-                    f"{stats['failed']} failed"
+                    f"{stats['failed']} failed in {stats['cycle_seconds']}s "
+                    f"(p95 {stats['latency']['p95_ms']}ms per symbol)"
                 ))
 
             if data_type in ['fno', 'all']:
@@ -73,7 +81,8 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.SUCCESS(
                     f"F&O: {stats['futures_updated']} futures, "
                     f"{stats['options_updated']} options updated, "
-                    f"{stats['failed']} failed"
+                    f"{stats['failed']} failed in {stats['cycle_seconds']}s "
+                    f"(p95 {stats['latency']['p95_ms']}ms per symbol)"
                 ))
 
                 # Calculate derived metrics
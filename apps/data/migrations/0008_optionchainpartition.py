@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data", "0007_make_contract_fields_nullable"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OptionChainPartition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        db_index=True,
+                        help_text="Timestamp when the record was created",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Timestamp when the record was last updated",
+                    ),
+                ),
+                ("underlying", models.CharField(max_length=50)),
+                ("expiry_date", models.DateField()),
+                ("trade_date", models.DateField()),
+                (
+                    "path",
+                    models.CharField(
+                        help_text="File path relative to the store root",
+                        max_length=500,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "snapshots",
+                    models.IntegerField(
+                        default=0, help_text="Chain snapshots in the file"
+                    ),
+                ),
+                (
+                    "rows",
+                    models.IntegerField(default=0, help_text="Strike rows in the file"),
+                ),
+                ("first_snapshot", models.DateTimeField()),
+                ("last_snapshot", models.DateTimeField()),
+                ("size_bytes", models.BigIntegerField(default=0)),
+                (
+                    "is_compacted",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Merged day file (vs one file per snapshot)",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "option_chain_partition",
+                "ordering": ["underlying", "expiry_date", "first_snapshot"],
+                "indexes": [
+                    models.Index(
+                        fields=["underlying", "expiry_date", "trade_date"],
+                        name="option_chai_underly_446b55_idx",
+                    )
+                ],
+            },
+        ),
+    ]
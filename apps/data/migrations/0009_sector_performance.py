@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0008_optionchainpartition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectorPerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('sector', models.CharField(max_length=100, unique=True)),
+                ('sector_index', models.CharField(blank=True, help_text='Sector index code, when one is mapped', max_length=20)),
+                ('stocks', models.IntegerField(default=0, help_text='Constituents in the universe')),
+                ('priced_stocks', models.IntegerField(default=0, help_text='Constituents with returns')),
+                ('return_1d', models.FloatField(blank=True, null=True)),
+                ('return_3d', models.FloatField(blank=True, null=True)),
+                ('return_7d', models.FloatField(blank=True, null=True)),
+                ('return_21d', models.FloatField(blank=True, null=True)),
+                ('advancers', models.IntegerField(default=0, help_text='Constituents up over 7 sessions')),
+                ('decliners', models.IntegerField(default=0, help_text='Constituents down over 7 sessions')),
+                ('breadth_pct', models.FloatField(blank=True, help_text='% of priced constituents up over 7 sessions', null=True)),
+                ('relative_strength', models.FloatField(blank=True, help_text="21-session return minus NIFTY's", null=True)),
+                ('source', models.CharField(help_text='HISTORICAL, TRENDLYNE or FIXTURE', max_length=20)),
+                ('as_of', models.DateTimeField(help_text='Refresh time')),
+            ],
+            options={
+                'db_table': 'sector_performance',
+                'ordering': ['sector'],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:57
+
+from datetime import datetime
+
+import apps.data.models
+from django.db import migrations, models
+
+# Formats found in stored expiries (Trendlyne exports, Breeze / Neo quotes);
+# kept here so the migration does not change with the application code
+EXPIRY_FORMATS = ('%Y-%m-%d', '%d-%b-%Y', '%d-%m-%Y', '%d/%m/%Y', '%d %b %Y', '%b %d, %Y', '%d%b%Y', '%d-%B-%Y')
+
+
+def _iso(text):
+    text = (text or '').strip()
+    if len(text) > 10 and text[4:5] == '-' and text[10] in 'T ':
+        text = text[:10]
+    for fmt in EXPIRY_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def expiries_to_iso(apps, schema_editor):
+    """
+    Rewrite every stored expiry as YYYY-MM-DD so the column can become a date.
+
+    Rows whose expiry is not a date cannot be matched to a contract and are
+    removed (the table is reloaded on every Trendlyne import).
+    """
+    ContractData = apps.get_model('data', 'ContractData')
+    # order_by(): Meta.ordering would add its columns to the DISTINCT
+    for raw in ContractData.objects.order_by().values_list('expiry', flat=True).distinct():
+        iso = _iso(raw)
+        if iso is None:
+            ContractData.objects.filter(expiry=raw).delete()
+        elif iso != raw:
+            ContractData.objects.filter(expiry=raw).update(expiry=iso)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0009_sector_performance'),
+    ]
+
+    operations = [
+        migrations.RunPython(expiries_to_iso, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='contractdata',
+            name='expiry',
+            field=apps.data.models.ExpiryDateField(),
+        ),
+        migrations.AddIndex(
+            model_name='contractdata',
+            index=models.Index(fields=['symbol', 'option_type', 'expiry'], name='contract_da_symbol_036469_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractdata',
+            index=models.Index(fields=['option_type', 'expiry', 'traded_contracts'], name='contract_da_option__6948ed_idx'),
+        ),
+    ]
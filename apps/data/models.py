@@ -4,12 +4,38 @@ Market data models for mCube Trading System
 
 from decimal import Decimal
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 from django.contrib.auth import get_user_model
 from apps.core.models import TimeStampedModel
+from apps.core.utils.date_utils import parse_expiry
 
 User = get_user_model()
 
 
+class ExpiryDescriptor(DeferredAttribute):
+    """Stores assigned expiry strings as dates, so instance.expiry is always a date"""
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = parse_expiry(value) or value
+
+
+class ExpiryDateField(models.DateField):
+    """
+    DateField that also takes the expiry strings of Trendlyne exports and the
+    broker APIs ('27-NOV-2025', '27-Nov-2025', '2025-11-27T06:00:00.000Z'),
+    in assignments and in filters.
+    """
+
+    descriptor_class = ExpiryDescriptor
+
+    def to_python(self, value):
+        if isinstance(value, str):
+            parsed = parse_expiry(value)
+            if parsed is not None:
+                return parsed
+        return super().to_python(value)
+
+
 class MarketData(TimeStampedModel):
     """Market data snapshot"""
 
@@ -69,6 +95,38 @@ class OptionChain(TimeStampedModel):
         return f"{self.underlying} {self.strike}{self.option_type} {self.expiry_date}"
 
 
+class OptionChainPartition(TimeStampedModel):
+    """
+    Catalog of option-chain history files
+
+    Each row points at one columnar file of the option-chain history store
+    (apps.data.services.option_chain_store), partitioned by underlying,
+    expiry and trade date. The chain data itself never enters the database.
+    """
+
+    underlying = models.CharField(max_length=50)
+    expiry_date = models.DateField()
+    trade_date = models.DateField()
+    path = models.CharField(max_length=500, unique=True, help_text="File path relative to the store root")
+
+    snapshots = models.IntegerField(default=0, help_text="Chain snapshots in the file")
+    rows = models.IntegerField(default=0, help_text="Strike rows in the file")
+    first_snapshot = models.DateTimeField()
+    last_snapshot = models.DateTimeField()
+    size_bytes = models.BigIntegerField(default=0)
+    is_compacted = models.BooleanField(default=False, help_text="Merged day file (vs one file per snapshot)")
+
+    class Meta:
+        db_table = 'option_chain_partition'
+        ordering = ['underlying', 'expiry_date', 'first_snapshot']
+        indexes = [
+            models.Index(fields=['underlying', 'expiry_date', 'trade_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.underlying} {self.expiry_date} {self.trade_date} ({self.snapshots} snapshots)"
+
+
 class Event(TimeStampedModel):
     """Economic/market event calendar"""
 
@@ -111,7 +169,7 @@ class ContractData(TimeStampedModel):
     strike_price = models.FloatField(null=True, blank=True)
     price = models.FloatField(null=True, blank=True)
     spot = models.FloatField(null=True, blank=True)
-    expiry = models.CharField(max_length=50)
+    expiry = ExpiryDateField()
     last_updated = models.CharField(max_length=50, null=True, blank=True)
     build_up = models.CharField(max_length=100, blank=True)
     lot_size = models.IntegerField(null=True, blank=True)
@@ -155,7 +213,12 @@ class ContractData(TimeStampedModel):
         db_table = 'contract_data'
         ordering = ['symbol', 'expiry', 'strike_price']
         indexes = [
+            # One chain: max pain, OI buildup, strike distribution
             models.Index(fields=['symbol', 'expiry', 'option_type']),
+            # Latest future / option of a symbol (order and position screens)
+            models.Index(fields=['symbol', 'option_type', 'expiry']),
+            # Futures screeners: expiry window plus volume threshold
+            models.Index(fields=['option_type', 'expiry', 'traded_contracts']),
         ]
 
     def __str__(self):
@@ -461,6 +524,43 @@ class TLStockData(TimeStampedModel):
         return f"{self.stock_name} ({self.nsecode})"
 
 
+class SectorPerformance(TimeStampedModel):
+    """
+    Sector performance snapshot
+
+    One row per sector (TLStockData.sector_name), rebuilt in one pass by
+    apps.data.services.sector_performance from the stored stock universe:
+    market-cap weighted returns over 1/3/7/21 sessions, breadth and relative
+    strength against NIFTY. The sector filter and Level 2 analysis read
+    these rows through an in-process cache instead of querying per symbol.
+    """
+
+    sector = models.CharField(max_length=100, unique=True)
+    sector_index = models.CharField(max_length=20, blank=True, help_text="Sector index code, when one is mapped")
+    stocks = models.IntegerField(default=0, help_text="Constituents in the universe")
+    priced_stocks = models.IntegerField(default=0, help_text="Constituents with returns")
+
+    return_1d = models.FloatField(null=True, blank=True)
+    return_3d = models.FloatField(null=True, blank=True)
+    return_7d = models.FloatField(null=True, blank=True)
+    return_21d = models.FloatField(null=True, blank=True)
+
+    advancers = models.IntegerField(default=0, help_text="Constituents up over 7 sessions")
+    decliners = models.IntegerField(default=0, help_text="Constituents down over 7 sessions")
+    breadth_pct = models.FloatField(null=True, blank=True, help_text="% of priced constituents up over 7 sessions")
+    relative_strength = models.FloatField(null=True, blank=True, help_text="21-session return minus NIFTY's")
+
+    source = models.CharField(max_length=20, help_text="HISTORICAL, TRENDLYNE or FIXTURE")
+    as_of = models.DateTimeField(help_text="Refresh time")
+
+    class Meta:
+        db_table = 'sector_performance'
+        ordering = ['sector']
+
+    def __str__(self):
+        return f"{self.sector} (21D {self.return_21d or 0:+.2f}%, breadth {self.breadth_pct or 0:.0f}%)"
+
+
 class NewsArticle(TimeStampedModel):
     """
     News articles and market updates for analysis
@@ -15,7 +15,15 @@ Usage:
 """
 
 from .base import BaseDataProvider, DataProviderException
-from .trendlyne import TrendlyneProvider
+
+
+def __getattr__(name):
+    # The Trendlyne provider pulls in pandas and selenium: load it on first use
+    if name == 'TrendlyneProvider':
+        from .trendlyne import TrendlyneProvider
+        return TrendlyneProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'BaseDataProvider',
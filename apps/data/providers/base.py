@@ -7,19 +7,27 @@ consistent interface and extensibility.
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, List
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import chromedriver_autoinstaller
+from typing import TYPE_CHECKING, Dict, Optional, List
 
-# Auto-install ChromeDriver
-chromedriver_autoinstaller.install()
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
 
 logger = logging.getLogger(__name__)
 
+# selenium and the ChromeDriver install run on the first browser session,
+# not when a worker imports the data tasks
+_chromedriver_installed = False
+
+
+def ensure_chromedriver():
+    """Install / locate a ChromeDriver matching the local Chrome (once per process)"""
+    global _chromedriver_installed
+    if not _chromedriver_installed:
+        import chromedriver_autoinstaller
+        chromedriver_autoinstaller.install()
+        _chromedriver_installed = True
+
 
 class DataProviderException(Exception):
     """Base exception for data provider errors"""
@@ -53,7 +61,7 @@ class BaseDataProvider(ABC):
         self.driver = None
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    def init_driver(self, download_dir: Optional[str] = None) -> webdriver.Chrome:
+    def init_driver(self, download_dir: Optional[str] = None) -> 'webdriver.Chrome':
         """
         Initialize Chrome WebDriver with enhanced stability
 
@@ -63,6 +71,10 @@ class BaseDataProvider(ABC):
         Returns:
             Configured Chrome WebDriver instance
         """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        ensure_chromedriver()
         chrome_options = Options()
 
         # Download configuration
@@ -217,10 +229,10 @@ class BaseWebScraper(BaseDataProvider):
 
     def wait_for_element(
         self,
-        by: By,
+        by: 'By',
         value: str,
         timeout: int = 15,
-        condition=EC.presence_of_element_located
+        condition=None
     ):
         """
         Wait for element to be present/clickable
@@ -229,7 +241,7 @@ class BaseWebScraper(BaseDataProvider):
             by: Selenium By locator type
             value: Locator value
             timeout: Maximum wait time in seconds
-            condition: Expected condition
+            condition: Expected condition (default: presence_of_element_located)
 
         Returns:
             WebElement if found
@@ -237,6 +249,10 @@ class BaseWebScraper(BaseDataProvider):
         Raises:
             DataProviderException: If element not found
         """
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        condition = condition or EC.presence_of_element_located
         try:
             wait = WebDriverWait(self.driver, timeout)
             element = wait.until(condition((by, value)))
@@ -276,6 +292,8 @@ class BaseWebScraper(BaseDataProvider):
                     return element
 
                 elif action == "click":
+                    from selenium.webdriver.support import expected_conditions as EC
+
                     element = self.wait_for_element(
                         by, value, timeout,
                         EC.element_to_be_clickable
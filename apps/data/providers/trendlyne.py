@@ -10,6 +10,10 @@ Features:
 - Analyst summaries
 - Broker reports
 
+The daily download (fetch_all_data) goes over HTTP with the session
+cookies (apps.data.providers.trendlyne_http); the Selenium flows below are
+the fallback for pages that need a browser.
+
 Usage:
     from apps.data.providers.trendlyne import TrendlyneProvider
 
@@ -19,21 +23,26 @@ Usage:
 
 import os
 import time
-import csv
-import re
-import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, Optional
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from datetime import datetime
+from typing import Dict
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from django.conf import settings
 
-from apps.core.models import CredentialStore
 from .base import BaseWebScraper, DataProviderException
+from .trendlyne_http import (
+    FORECASTER_SCREENERS,
+    TRENDLYNE_URL,
+    TrendlyneDownloader,
+    get_trendlyne_credentials,
+    is_stock_data,
+    parse_screener_table,
+    read_header,
+    rebuild_forecaster_index,
+    write_screener_csv,
+)
 
 
 class TrendlyneProvider(BaseWebScraper):
@@ -43,33 +52,11 @@ class TrendlyneProvider(BaseWebScraper):
     Handles all Trendlyne data fetching with enhanced reliability
     """
 
-    BASE_URL = "https://trendlyne.com"
+    BASE_URL = TRENDLYNE_URL
     FEATURES_URL = f"{BASE_URL}/features/"
 
     # Forecaster screener URLs
-    FORECASTER_URLS = {
-        "High Bullishness": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/consensus_highest_bullish-above-0/",
-        "High Bearishness": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/consensus_highest_bearish-above-0/",
-        "Highest Forward 12Mth Upside %": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/consensus_highest_upside-above-0/",
-        "Highest Forward Annual EPS Growth": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/eps_annual_growth-above-0/",
-        "Lowest Forward Annual EPS Growth": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/eps_annual_growth-below-0/",
-        "Highest Forward Annual Revenue Growth": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/revenue_annual_growth-above-0/",
-        "Highest 3Mth Analyst Upgrades": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/consensus_analyst_upgrade-above-0/",
-        "Highest Forward Annual Capex Growth": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/consensus_highest_capex-above-0/",
-        "Highest Dividend Yield": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/consensus_highest_dps-above-0/",
-        "Beat Annual Revenue Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/revenue-annual-surprise-above-0/",
-        "Missed Annual Revenue Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/revenue-annual-surprise-below-0/",
-        "Beat Quarter Revenue Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/revenue-quarter-surprise-above-0/",
-        "Missed Quarter Revenue Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/revenue-quarter-surprise-below-0/",
-        "Beat Annual Net Income Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/net-income-annual-surprise-above-0/",
-        "Missed Annual Net Income Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/net-income-annual-surprise-below-0/",
-        "Beat Quarter Net Income Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/net-income-quarter-surprise-above-0/",
-        "Missed Quarter Net Income Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/net-income-quarter-surprise-below-0/",
-        "Beat Annual EPS Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/eps-annual-surprise-above-0/",
-        "Missed Annual EPS Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/eps-annual-surprise-below-0/",
-        "Beat Quarter EPS Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/eps-quarter-surprise-above-0/",
-        "Missed Quarter EPS Estimates": f"{BASE_URL}/equity/consensus-estimates/dashboard/forecaster/eps-quarter-surprise-below-0/"
-    }
+    FORECASTER_URLS = {label: f"{TRENDLYNE_URL}{path}" for label, path in FORECASTER_SCREENERS.items()}
 
     def __init__(self, headless: bool = True, download_dir: str = None):
         """
@@ -98,16 +85,17 @@ class TrendlyneProvider(BaseWebScraper):
         Raises:
             DataProviderException: If credentials not found
         """
-        try:
-            creds = CredentialStore.objects.filter(service='trendlyne').first()
-            if not creds:
-                raise DataProviderException(
-                    "No Trendlyne credentials found in database. "
-                    "Please add credentials via Django admin."
-                )
-            return creds.username, creds.password
-        except Exception as e:
-            raise DataProviderException(f"Error retrieving credentials: {e}")
+        return get_trendlyne_credentials()
+
+    def set_download_dir(self, download_dir: str):
+        """Send the running browser's downloads to download_dir"""
+        self.download_dir = download_dir
+        os.makedirs(download_dir, exist_ok=True)
+        if self.driver:
+            self.driver.execute_cdp_cmd('Page.setDownloadBehavior', {
+                'behavior': 'allow',
+                'downloadPath': os.path.abspath(download_dir),
+            })
 
     def login(self) -> bool:
         """
@@ -535,13 +523,12 @@ class TrendlyneProvider(BaseWebScraper):
             file_path = os.path.join(download_dir, latest_file)
 
             # Validate the file has stock data columns (not F&O data)
-            import pandas as pd
             try:
-                df_check = pd.read_excel(file_path, nrows=5)
-                if 'SYMBOL' in df_check.columns and 'OPTION TYPE' in df_check.columns:
+                columns = read_header(file_path)
+                if 'SYMBOL' in columns and 'OPTION TYPE' in columns:
                     self.logger.error(f"File {latest_file} appears to be F&O data, not stock data")
                     raise DataProviderException("Downloaded file is F&O data, not stock data")
-                if 'Stock Name' not in df_check.columns and 'NSEcode' not in df_check.columns:
+                if not is_stock_data(columns):
                     self.logger.warning(f"File {latest_file} may not be valid stock data - missing expected columns")
             except DataProviderException:
                 raise
@@ -586,29 +573,20 @@ class TrendlyneProvider(BaseWebScraper):
                 self.driver.get(url)
                 time.sleep(2)
 
-                soup = BeautifulSoup(self.driver.page_source, 'html5lib')
-                table = soup.find("table", class_="trendlyne-screener-table")
+                table = parse_screener_table(self.driver.page_source)
 
                 if not table:
                     self.logger.warning(f"Table not found on {label}")
                     results[label] = {'success': False, 'error': 'Table not found'}
                     continue
 
-                headers = [th.text.strip() for th in table.find("thead").find_all("th")]
-                rows = []
-                for tr in table.find("tbody").find_all("tr"):
-                    row = [td.get_text(strip=True) for td in tr.find_all("td")]
-                    rows.append(row)
-
-                df = pd.DataFrame(rows, columns=headers)
-                safe_label = label.replace(" ", "_").replace("%", "pct").replace("/", "_")
-                file_path = os.path.join(output_dir, f"trendlyne_{safe_label}.csv")
-                df.to_csv(file_path, index=False)
+                headers, rows = table
+                filename = write_screener_csv(output_dir, label, headers, rows)
 
-                self.logger.info(f"✅ Saved {file_path}")
+                self.logger.info(f"✅ Saved {os.path.join(output_dir, filename)}")
                 results[label] = {
                     'success': True,
-                    'filename': f"trendlyne_{safe_label}.csv",
+                    'filename': filename,
                     'rows': len(rows)
                 }
 
@@ -616,6 +594,8 @@ class TrendlyneProvider(BaseWebScraper):
                 self.logger.error(f"Error fetching {label}: {e}")
                 results[label] = {'success': False, 'error': str(e)}
 
+        rebuild_forecaster_index(output_dir, results)
+
         return results
 
     def fetch_data(self, data_type: str, **kwargs) -> Dict:
@@ -642,6 +622,9 @@ class TrendlyneProvider(BaseWebScraper):
         """
         Fetch all available Trendlyne data
 
+        Downloads over HTTP with the saved session (TrendlyneDownloader); the
+        pooled browser is only started for pages that need it.
+
         Args:
             download_dir: Override default download directory
 
@@ -652,37 +635,13 @@ class TrendlyneProvider(BaseWebScraper):
             self.download_dir = download_dir
 
         try:
-            # Initialize driver and login
-            self.init_driver(download_dir=self.download_dir)
-
-            if not self.login():
-                return {
-                    'success': False,
-                    'error': 'Login failed'
-                }
-
-            results = {
-                'fno': self.fetch_fno_data(),
-                'market_snapshot': self.fetch_market_snapshot(),
-                'forecaster': self.fetch_forecaster_data(),
-            }
-
-            self.logger.info("✅ All Trendlyne data fetched successfully")
-
-            return {
-                'success': True,
-                'results': results,
-                'timestamp': datetime.now().isoformat()
-            }
-
+            return TrendlyneDownloader(download_dir=self.download_dir).fetch_all()
         except Exception as e:
             self.logger.error(f"Error in fetch_all_data: {e}")
             return {
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            self.cleanup()
 
 
 # Convenience function for backwards compatibility
@@ -0,0 +1,694 @@
+"""
+Trendlyne HTTP Downloader
+
+Downloads the daily Trendlyne files with plain HTTP requests instead of
+driving a browser: the F&O contracts export, the market snapshot
+(Stocks-data) export and the forecaster screener tables.
+
+Session: the cookies of a logged-in session are saved to
+settings.TRENDLYNE_COOKIE_PATH and reused by the next run. When they have
+expired the client logs in through the login form (CSRF token + the
+CredentialStore credentials). Only if that fails, or a page does not give
+its data without JavaScript, is the work handed to one long-lived headless
+browser (BrowserPool). The browser's cookies are then copied back to the
+HTTP session.
+
+The exports and the ~20 screeners are fetched concurrently
+(TRENDLYNE_HTTP_WORKERS) over one pooled connection. Export files are
+streamed to disk and checked by their first bytes and header row, so they
+are not re-opened with pandas just to validate them.
+
+Responses can be recorded (record_dir) and replayed offline by the local
+stub in apps.data.providers.trendlyne_stub.
+
+Usage:
+    from apps.data.providers.trendlyne_http import TrendlyneDownloader
+
+    result = TrendlyneDownloader(download_dir='apps/data/tldata').fetch_all()
+    result['results']['market_snapshot']['path']
+"""
+
+import atexit
+import csv
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from django.conf import settings
+
+from apps.core.constants import (
+    TRENDLYNE_BROWSER_IDLE_SECONDS,
+    TRENDLYNE_HTTP_RETRIES,
+    TRENDLYNE_HTTP_TIMEOUT,
+    TRENDLYNE_HTTP_WORKERS,
+)
+from .base import DataProviderException
+
+logger = logging.getLogger(__name__)
+
+TRENDLYNE_URL = "https://trendlyne.com"
+
+LOGIN_PATH = '/accounts/login/'
+FNO_PAGE_PATH = '/futures-options/contracts-excel-download/'
+
+# Market snapshot export, in the order they are tried
+SNAPSHOT_EXPORT_PATHS = (
+    '/research/data-downloader/download-stocks-data/?type=IND',
+    '/research/data-downloader/download-stocks-data/',
+    '/tools/data-downloader/download-stocks-data/?type=IND',
+    '/tools/data-downloader/download-stocks-data/',
+)
+
+# Forecaster screener pages
+_FORECASTER = '/equity/consensus-estimates/dashboard/forecaster'
+FORECASTER_SCREENERS = {
+    "High Bullishness": f"{_FORECASTER}/consensus_highest_bullish-above-0/",
+    "High Bearishness": f"{_FORECASTER}/consensus_highest_bearish-above-0/",
+    "Highest Forward 12Mth Upside %": f"{_FORECASTER}/consensus_highest_upside-above-0/",
+    "Highest Forward Annual EPS Growth": f"{_FORECASTER}/eps_annual_growth-above-0/",
+    "Lowest Forward Annual EPS Growth": f"{_FORECASTER}/eps_annual_growth-below-0/",
+    "Highest Forward Annual Revenue Growth": f"{_FORECASTER}/revenue_annual_growth-above-0/",
+    "Highest 3Mth Analyst Upgrades": f"{_FORECASTER}/consensus_analyst_upgrade-above-0/",
+    "Highest Forward Annual Capex Growth": f"{_FORECASTER}/consensus_highest_capex-above-0/",
+    "Highest Dividend Yield": f"{_FORECASTER}/consensus_highest_dps-above-0/",
+    "Beat Annual Revenue Estimates": f"{_FORECASTER}/revenue-annual-surprise-above-0/",
+    "Missed Annual Revenue Estimates": f"{_FORECASTER}/revenue-annual-surprise-below-0/",
+    "Beat Quarter Revenue Estimates": f"{_FORECASTER}/revenue-quarter-surprise-above-0/",
+    "Missed Quarter Revenue Estimates": f"{_FORECASTER}/revenue-quarter-surprise-below-0/",
+    "Beat Annual Net Income Estimates": f"{_FORECASTER}/net-income-annual-surprise-above-0/",
+    "Missed Annual Net Income Estimates": f"{_FORECASTER}/net-income-annual-surprise-below-0/",
+    "Beat Quarter Net Income Estimates": f"{_FORECASTER}/net-income-quarter-surprise-above-0/",
+    "Missed Quarter Net Income Estimates": f"{_FORECASTER}/net-income-quarter-surprise-below-0/",
+    "Beat Annual EPS Estimates": f"{_FORECASTER}/eps-annual-surprise-above-0/",
+    "Missed Annual EPS Estimates": f"{_FORECASTER}/eps-annual-surprise-below-0/",
+    "Beat Quarter EPS Estimates": f"{_FORECASTER}/eps-quarter-surprise-above-0/",
+    "Missed Quarter EPS Estimates": f"{_FORECASTER}/eps-quarter-surprise-below-0/",
+}
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+VIA_HTTP = 'http'
+VIA_BROWSER = 'browser'
+
+
+class SessionExpired(DataProviderException):
+    """The request was redirected to the login page"""
+    pass
+
+
+class NotAFile(DataProviderException):
+    """An export URL answered with a page instead of a file, or a page without its data"""
+    pass
+
+
+# ---------------------------------------------------------------- helpers
+
+
+def get_trendlyne_credentials() -> Tuple[str, str]:
+    """(username, password) of the Trendlyne account in CredentialStore"""
+    from apps.core.models import CredentialStore
+
+    try:
+        creds = CredentialStore.objects.filter(service='trendlyne').first()
+    except Exception as e:
+        raise DataProviderException(f"Error retrieving credentials: {e}")
+    if not creds:
+        raise DataProviderException(
+            "No Trendlyne credentials found in database. "
+            "Please add credentials via Django admin."
+        )
+    return creds.username, creds.password
+
+
+def forecaster_filename(label: str) -> str:
+    """CSV file name of a screener (as read by the forecaster index)"""
+    safe_label = label.replace(" ", "_").replace("%", "pct").replace("/", "_")
+    return f"trendlyne_{safe_label}.csv"
+
+
+def file_kind(head: bytes) -> Optional[str]:
+    """'xlsx', 'xls', 'csv' or 'html' from the first bytes of a response"""
+    if head.startswith(b'PK\x03\x04'):
+        return 'xlsx'
+    if head.startswith(b'\xd0\xcf\x11\xe0'):
+        return 'xls'
+    text = head.lstrip()[:512].lower()
+    if not text:
+        return None
+    if text.startswith((b'<!doctype', b'<html', b'<')):
+        return 'html'
+    return 'csv'
+
+
+def read_header(path) -> List[str]:
+    """Header row of an XLSX / CSV file, without loading the rest of it"""
+    path = str(path)
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+            return next(csv.reader(f), [])
+    if path.endswith('.xlsx'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            for row in workbook.active.iter_rows(max_row=1, values_only=True):
+                return [str(cell).strip() for cell in row if cell is not None]
+        finally:
+            workbook.close()
+    return []
+
+
+def is_stock_data(columns: List[str]) -> bool:
+    """Market snapshot header (not the F&O export)"""
+    if 'SYMBOL' in columns and 'OPTION TYPE' in columns:
+        return False
+    return 'Stock Name' in columns or 'NSEcode' in columns
+
+
+def parse_screener_table(html: str) -> Optional[Tuple[List[str], List[List[str]]]]:
+    """(headers, rows) of the screener table in a forecaster page, None if the page has none"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html5lib')
+    table = soup.find("table", class_="trendlyne-screener-table")
+    if not table or not table.find("thead") or not table.find("tbody"):
+        return None
+    headers = [th.text.strip() for th in table.find("thead").find_all("th")]
+    rows = [[td.get_text(strip=True) for td in tr.find_all("td")] for tr in table.find("tbody").find_all("tr")]
+    return headers, rows
+
+
+def write_screener_csv(output_dir, label: str, headers: List[str], rows: List[List[str]]) -> str:
+    """Save a screener table as the CSV the forecaster index reads. Returns the file name."""
+    filename = forecaster_filename(label)
+    path = os.path.join(output_dir, filename)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+    return filename
+
+
+def rebuild_forecaster_index(output_dir, results: Dict):
+    """Re-index the screeners just saved so deep dives do not parse the CSVs"""
+    from apps.data.services.forecaster_index import get_forecaster_index
+
+    index = get_forecaster_index()
+    if not any(r.get('success') for r in results.values()):
+        return
+    if os.path.realpath(output_dir) != os.path.realpath(index.directory):
+        return
+    try:
+        stats = index.rebuild()
+        logger.info(f"✅ Forecaster index: {stats['symbols']} symbols from {stats['files']} files")
+    except Exception as e:
+        logger.warning(f"Could not rebuild forecaster index: {e}")
+
+
+def _attachment_name(response) -> Optional[str]:
+    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', response.headers.get('Content-Disposition', ''))
+    return os.path.basename(match.group(1)) if match else None
+
+
+# ---------------------------------------------------------------- HTTP session
+
+
+class TrendlyneSession:
+    """
+    requests session holding the Trendlyne login cookies.
+
+    Safe to share between the download threads once authenticated (requests
+    are GETs; the cookie jar is only read).
+    """
+
+    def __init__(self, base_url: str = None, cookie_path=None, workers: int = TRENDLYNE_HTTP_WORKERS,
+                 timeout: float = TRENDLYNE_HTTP_TIMEOUT, record_dir=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.base_url = (base_url or settings.TRENDLYNE_BASE_URL).rstrip('/')
+        self.cookie_path = Path(cookie_path or settings.TRENDLYNE_COOKIE_PATH)
+        self.timeout = timeout
+        self.record_dir = Path(record_dir) if record_dir else None
+        self._record_lock = threading.Lock()
+
+        self.http = requests.Session()
+        self.http.headers['User-Agent'] = USER_AGENT
+        retry = Retry(total=TRENDLYNE_HTTP_RETRIES, backoff_factor=0.5,
+                      status_forcelist=(500, 502, 503, 504), allowed_methods=frozenset({'GET'}))
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(workers, 2), max_retries=retry)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+
+    def url(self, path: str) -> str:
+        return path if path.startswith(('http://', 'https://')) else f"{self.base_url}{path}"
+
+    # ---------------------------------------------------------------- cookies
+
+    def load_cookies(self) -> bool:
+        """Load the saved session cookies. Returns True if there were any."""
+        try:
+            cookies = json.loads(self.cookie_path.read_text())
+        except (OSError, ValueError):
+            return False
+        self.set_cookies(cookies)
+        return bool(cookies)
+
+    def save_cookies(self):
+        cookies = [
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+            for c in self.http.cookies
+        ]
+        try:
+            self.cookie_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path = self.cookie_path.with_suffix('.tmp')
+            # Created owner-only, the session is never readable by others
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as handle:
+                handle.write(json.dumps(cookies))
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.cookie_path)
+        except OSError as e:
+            logger.warning(f"Could not save Trendlyne cookies to {self.cookie_path}: {e}")
+
+    def set_cookies(self, cookies: List[Dict]):
+        """Install cookies given as dicts (saved file or selenium get_cookies())"""
+        host = urlparse(self.base_url).hostname
+        for cookie in cookies:
+            self.http.cookies.set(cookie['name'], cookie['value'],
+                                  domain=cookie.get('domain') or host, path=cookie.get('path') or '/')
+
+    # ---------------------------------------------------------------- requests
+
+    def get(self, path: str, stream: bool = False):
+        """GET path; SessionExpired if the session is not (or no longer) logged in"""
+        response = self.http.get(self.url(path), timeout=self.timeout, stream=stream)
+        if LOGIN_PATH in urlparse(response.url).path:
+            response.close()
+            raise SessionExpired(f"Redirected to login: {path}")
+        response.raise_for_status()
+        return response
+
+    def get_page(self, path: str) -> str:
+        response = self.get(path)
+        self._record(path, response, response.content)
+        return response.text
+
+    def is_authenticated(self) -> bool:
+        try:
+            self.get(FNO_PAGE_PATH).close()
+            return True
+        except SessionExpired:
+            return False
+
+    def login(self, username: str, password: str) -> bool:
+        """Log in through the login form. Returns True (and saves the cookies) on success."""
+        from bs4 import BeautifulSoup
+
+        page = self.http.get(self.url(LOGIN_PATH), timeout=self.timeout)
+        field = BeautifulSoup(page.text, 'html5lib').find('input', attrs={'name': 'csrfmiddlewaretoken'})
+        token = field.get('value') if field else self.http.cookies.get('csrftoken', '')
+
+        response = self.http.post(
+            self.url(LOGIN_PATH),
+            data={'login': username, 'password': password, 'csrfmiddlewaretoken': token, 'remember': 'on'},
+            headers={'Referer': self.url(LOGIN_PATH)},
+            timeout=self.timeout,
+        )
+        if response.ok and LOGIN_PATH not in urlparse(response.url).path:
+            logger.info("✅ Logged in to Trendlyne over HTTP")
+            self.save_cookies()
+            return True
+        logger.warning(f"Trendlyne HTTP login failed (status {response.status_code})")
+        return False
+
+    def download(self, path: str, directory, filename: str = None) -> Dict:
+        """
+        Stream an export to directory.
+
+        Args:
+            path: Export path or absolute URL
+            directory: Destination directory
+            filename: Stored name (extension replaced by the detected type);
+                default: the server's attachment name
+
+        Raises:
+            NotAFile: The URL answered with an HTML page
+            SessionExpired: Redirected to login
+        """
+        response = self.get(path, stream=True)
+        with response:
+            chunks = response.iter_content(chunk_size=1 << 16)
+            head = next(chunks, b'')
+            kind = file_kind(head)
+            if kind in (None, 'html'):
+                raise NotAFile(f"{path} returned {response.headers.get('Content-Type', 'no content')}, not a file")
+
+            name = filename or _attachment_name(response) or f"trendlyne_export.{kind}"
+            name = f"{os.path.splitext(name)[0]}.{kind}"
+            os.makedirs(directory, exist_ok=True)
+            target = os.path.join(directory, name)
+            tmp_path = f"{target}.part"
+            size = len(head)
+            with open(tmp_path, 'wb') as f:
+                f.write(head)
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, target)
+
+        self._record(path, response, Path(target).read_bytes() if self.record_dir else None)
+        return {'success': True, 'filename': name, 'path': target, 'bytes': size, 'kind': kind}
+
+    # ---------------------------------------------------------------- recording
+
+    def _record(self, path: str, response, body: Optional[bytes]):
+        """Save a response for the offline stub (record_dir/manifest.json + one file per response)"""
+        if not self.record_dir or body is None:
+            return
+        parsed = urlparse(self.url(path))
+        key = parsed.path + (f"?{parsed.query}" if parsed.query else '')
+        with self._record_lock:
+            self.record_dir.mkdir(parents=True, exist_ok=True)
+            manifest_path = self.record_dir / 'manifest.json'
+            manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+            entry = manifest.get(key) or {'file': f"{len(manifest) + 1:04d}.bin"}
+            entry.update({
+                'status': response.status_code,
+                'content_type': response.headers.get('Content-Type', ''),
+                'filename': _attachment_name(response),
+            })
+            (self.record_dir / entry['file']).write_bytes(body)
+            manifest[key] = entry
+            manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+
+
+# ---------------------------------------------------------------- browser fallback
+
+
+class BrowserPool:
+    """
+    One long-lived, logged-in headless browser for what HTTP cannot fetch.
+
+    The browser is started on first use, reused by later fallbacks (also by
+    later downloads in the same process) and closed after idle_seconds
+    without use. One caller drives it at a time.
+    """
+
+    def __init__(self, idle_seconds: float = TRENDLYNE_BROWSER_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._provider = None
+        self._last_used = 0.0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def session(self, download_dir=None):
+        """Logged-in TrendlyneProvider, locked for the duration of the block"""
+        with self._lock:
+            if self._provider is not None and time.monotonic() - self._last_used > self.idle_seconds:
+                self.close()
+            if self._provider is None:
+                self._start(download_dir)
+            if download_dir:
+                self._provider.set_download_dir(download_dir)
+            try:
+                yield self._provider
+            except Exception:
+                if not self._alive():
+                    self.close()
+                raise
+            finally:
+                self._last_used = time.monotonic()
+
+    def cookies(self) -> List[Dict]:
+        with self.session() as provider:
+            return provider.driver.get_cookies()
+
+    def fetch_page(self, url: str) -> str:
+        with self.session() as provider:
+            provider.driver.get(url)
+            time.sleep(2)
+            return provider.driver.page_source
+
+    def download(self, kind: str, download_dir) -> Dict:
+        """Click through an export page ('fno' or 'market_snapshot')"""
+        with self.session(download_dir) as provider:
+            if kind == 'fno':
+                return provider.fetch_fno_data(download_dir=download_dir)
+            return provider.fetch_market_snapshot(download_dir=download_dir)
+
+    def close(self):
+        with self._lock:
+            if self._provider is not None:
+                self._provider.cleanup()
+                self._provider = None
+
+    def _start(self, download_dir):
+        from .trendlyne import TrendlyneProvider
+
+        logger.info("Starting pooled Trendlyne browser (HTTP fallback)...")
+        provider = TrendlyneProvider(headless=True, download_dir=download_dir)
+        provider.init_driver(download_dir=provider.download_dir)
+        try:
+            provider.login()
+        except Exception:
+            provider.cleanup()
+            raise
+        self._provider = provider
+
+    def _alive(self) -> bool:
+        try:
+            self._provider.driver.current_url
+            return True
+        except Exception:
+            return False
+
+
+_browser_pool: Optional[BrowserPool] = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide fallback browser"""
+    global _browser_pool
+    if _browser_pool is None:
+        with _browser_pool_lock:
+            if _browser_pool is None:
+                _browser_pool = BrowserPool()
+                atexit.register(_browser_pool.close)
+    return _browser_pool
+
+
+# ---------------------------------------------------------------- downloader
+
+
+class TrendlyneDownloader:
+    """
+    Daily Trendlyne files over HTTP, with the pooled browser as fallback.
+
+    Results have the shape of TrendlyneProvider's (success / filename / path
+    / error) plus 'via' ('http' or 'browser').
+    """
+
+    def __init__(self, download_dir=None, forecaster_dir=None, base_url: str = None, cookie_path=None,
+                 workers: int = TRENDLYNE_HTTP_WORKERS, browser_fallback: bool = True,
+                 browser_pool: BrowserPool = None, credentials: Tuple[str, str] = None, record_dir=None):
+        self.download_dir = str(download_dir or os.path.join(settings.BASE_DIR, 'apps', 'data', 'tldata'))
+        self.forecaster_dir = str(forecaster_dir or os.path.join(self.download_dir, 'forecaster'))
+        self.workers = workers
+        self.browser_fallback = browser_fallback
+        self.credentials = credentials
+        self.session = TrendlyneSession(base_url=base_url, cookie_path=cookie_path, workers=workers,
+                                        record_dir=record_dir)
+        self._browser_pool = browser_pool
+
+    @property
+    def browser(self) -> BrowserPool:
+        return self._browser_pool or get_browser_pool()
+
+    # ---------------------------------------------------------------- session
+
+    def ensure_session(self) -> str:
+        """
+        Authenticate the HTTP session.
+
+        Returns:
+            'cookies' (saved cookies still valid), 'login' (HTTP form login) or 'browser'
+
+        Raises:
+            DataProviderException: Not logged in by any means
+        """
+        if self.session.load_cookies() and self.session.is_authenticated():
+            logger.info("Reusing saved Trendlyne session cookies")
+            return 'cookies'
+
+        username, password = self.credentials or get_trendlyne_credentials()
+        if self.session.login(username, password):
+            return 'login'
+
+        if not self.browser_fallback:
+            raise DataProviderException("Trendlyne login failed")
+        logger.info("HTTP login failed, logging in with the browser...")
+        self.session.set_cookies(self.browser.cookies())
+        if self.session.is_authenticated():
+            self.session.save_cookies()
+            return 'browser'
+        raise DataProviderException("Trendlyne login failed (HTTP and browser)")
+
+    # ---------------------------------------------------------------- downloads
+
+    def fetch_fno(self) -> Dict:
+        """F&O contracts export, saved as fno_data_<date>.<ext>"""
+        filename = f"fno_data_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        try:
+            page = self.session.get_page(FNO_PAGE_PATH)
+            href = self._download_link(page)
+            if not href:
+                raise NotAFile("No download link on the F&O page")
+            result = self.session.download(urljoin(self.session.url(FNO_PAGE_PATH), href),
+                                           self.download_dir, filename)
+            logger.info(f"✅ F&O data saved: {result['filename']}")
+            return dict(result, via=VIA_HTTP)
+        except Exception as e:
+            return self._fallback_download('fno', e)
+
+    def fetch_market_snapshot(self) -> Dict:
+        """Market snapshot (Stocks-data) export, with its header row"""
+        default_name = f"Stocks-data-IND-{datetime.now().strftime('%d-%b-%Y')}.xlsx"
+        error = None
+        for path in SNAPSHOT_EXPORT_PATHS:
+            try:
+                result = self.session.download(path, self.download_dir)
+                if not result['filename'].startswith('Stocks-data'):
+                    renamed = os.path.join(self.download_dir, f"{os.path.splitext(default_name)[0]}.{result['kind']}")
+                    os.replace(result['path'], renamed)
+                    result.update(filename=os.path.basename(renamed), path=renamed)
+                columns = read_header(result['path'])
+                if not is_stock_data(columns):
+                    os.remove(result['path'])
+                    raise NotAFile(f"{path} is not stock data (columns: {columns[:10]})")
+                logger.info(f"✅ Stock Data saved: {result['filename']}")
+                return dict(result, columns=columns, via=VIA_HTTP)
+            except Exception as e:
+                logger.debug(f"Snapshot export {path} failed: {e}")
+                error = e
+        return self._fallback_download('market_snapshot', error)
+
+    def fetch_screener(self, label: str, path: str) -> Dict:
+        """One forecaster screener table, saved as CSV"""
+        via = VIA_HTTP
+        try:
+            table = parse_screener_table(self.session.get_page(path))
+        except Exception as e:
+            if not self.browser_fallback:
+                logger.error(f"Error fetching {label}: {e}")
+                return {'success': False, 'error': str(e), 'via': via}
+            logger.debug(f"{label}: HTTP fetch failed ({e})")
+            table = None
+
+        try:
+            if table is None and self.browser_fallback:
+                logger.info(f"{label}: table not in the HTML, loading with the browser")
+                via = VIA_BROWSER
+                table = parse_screener_table(self.browser.fetch_page(self.session.url(path)))
+            if table is None:
+                return {'success': False, 'error': 'Table not found', 'via': via}
+
+            headers, rows = table
+            os.makedirs(self.forecaster_dir, exist_ok=True)
+            filename = write_screener_csv(self.forecaster_dir, label, headers, rows)
+            return {'success': True, 'filename': filename, 'rows': len(rows), 'via': via}
+        except Exception as e:
+            logger.error(f"Error fetching {label}: {e}")
+            return {'success': False, 'error': str(e), 'via': via}
+
+    def fetch_forecaster(self) -> Dict:
+        """All forecaster screeners, concurrently, then re-index them"""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='trendlyne') as pool:
+            futures = {label: pool.submit(self.fetch_screener, label, path)
+                       for label, path in FORECASTER_SCREENERS.items()}
+            results = {label: future.result() for label, future in futures.items()}
+        rebuild_forecaster_index(self.forecaster_dir, results)
+        return results
+
+    def fetch_all(self) -> Dict:
+        """
+        Log in (or reuse the session) and download F&O, market snapshot and
+        forecaster files concurrently.
+
+        Returns:
+            {'success', 'results': {'fno', 'market_snapshot', 'forecaster'}, 'auth', 'elapsed', 'timestamp'}
+        """
+        started = time.monotonic()
+        try:
+            auth = self.ensure_session()
+        except Exception as e:
+            logger.error(f"Trendlyne login failed: {e}")
+            return {'success': False, 'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='trendlyne') as pool:
+            fno = pool.submit(self.fetch_fno)
+            snapshot = pool.submit(self.fetch_market_snapshot)
+            screeners = {label: pool.submit(self.fetch_screener, label, path)
+                         for label, path in FORECASTER_SCREENERS.items()}
+            results = {
+                'fno': fno.result(),
+                'market_snapshot': snapshot.result(),
+                'forecaster': {label: future.result() for label, future in screeners.items()},
+            }
+        rebuild_forecaster_index(self.forecaster_dir, results['forecaster'])
+
+        elapsed = time.monotonic() - started
+        fetched = sum(1 for r in results['forecaster'].values() if r.get('success'))
+        logger.info(
+            f"✅ Trendlyne download in {elapsed:.1f}s: F&O {'ok' if results['fno'].get('success') else 'failed'}, "
+            f"snapshot {'ok' if results['market_snapshot'].get('success') else 'failed'}, "
+            f"screeners {fetched}/{len(FORECASTER_SCREENERS)}"
+        )
+        return {
+            'success': True,
+            'results': results,
+            'auth': auth,
+            'elapsed': round(elapsed, 2),
+            'timestamp': datetime.now().isoformat(),
+        }
+
+    # ---------------------------------------------------------------- internals
+
+    @staticmethod
+    def _download_link(html: str) -> Optional[str]:
+        from bs4 import BeautifulSoup
+
+        for link in BeautifulSoup(html, 'html5lib').find_all('a', href=True):
+            if 'download' in link.get_text(strip=True).lower():
+                return link['href']
+        return None
+
+    def _fallback_download(self, kind: str, error) -> Dict:
+        if not self.browser_fallback:
+            logger.error(f"{kind} download failed: {error}")
+            return {'success': False, 'error': str(error), 'via': VIA_HTTP}
+        logger.info(f"{kind}: HTTP download failed ({error}), using the browser")
+        try:
+            result = self.browser.download(kind, self.download_dir)
+        except Exception as e:
+            logger.error(f"{kind} browser download failed: {e}")
+            return {'success': False, 'error': str(e), 'via': VIA_BROWSER}
+        if result.get('success') and kind == 'market_snapshot':
+            result['columns'] = read_header(result['path'])
+        return dict(result, via=VIA_BROWSER)
@@ -0,0 +1,193 @@
+"""
+Trendlyne HTTP Stub
+
+Local HTTP server replaying Trendlyne responses behind a login form, so the
+HTTP downloader and the daily refresh can run offline (tests, development).
+Responses are given in code or loaded from a recording made with
+TrendlyneDownloader(record_dir=...): manifest.json maps each path (with its
+query string) to a status, content type, attachment name and body file.
+
+The server mimics what the downloader relies on: the login page carries a
+CSRF token, a correct POST sets a session cookie, and protected pages
+redirect to the login page without it.
+
+Usage:
+    from apps.data.providers.trendlyne_stub import TrendlyneStub
+
+    with TrendlyneStub.from_recording('recordings/trendlyne') as stub:
+        TrendlyneDownloader(base_url=stub.base_url, credentials=('stub', 'stub')).fetch_all()
+"""
+
+import json
+import secrets
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlparse
+
+from .trendlyne_http import LOGIN_PATH
+
+SESSION_COOKIE = 'sessionid'
+CSRF_TOKEN = 'stub-csrf-token'
+
+LOGIN_PAGE = (
+    '<html><body><form method="post" action="{path}">'
+    '<input type="hidden" name="csrfmiddlewaretoken" value="{token}">'
+    '<input type="text" name="login"><input type="password" name="password">'
+    '<button type="submit">Login</button></form></body></html>'
+)
+HOME_PAGE = '<html><body><a href="/accounts/logout/">Logout</a></body></html>'
+
+
+@dataclass
+class StubResponse:
+    """One replayed response"""
+    body: bytes
+    content_type: str = 'text/html; charset=utf-8'
+    status: int = 200
+    filename: Optional[str] = None  # Sent as the attachment name
+    login_required: bool = True
+
+
+class TrendlyneStub:
+    """Threaded local server; start() / stop() or use as a context manager."""
+
+    def __init__(self, responses: Dict[str, StubResponse], username: str = None, password: str = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            responses: {path or path?query: StubResponse}
+            username / password: Accepted credentials (None: any non-empty login)
+            port: 0 picks a free port
+        """
+        self.responses = dict(responses)
+        self.username = username
+        self.password = password
+        self.requests: List[Tuple[str, str]] = []  # (method, path) of every request
+        self.logins = 0
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_recording(cls, directory, **kwargs) -> 'TrendlyneStub':
+        directory = Path(directory)
+        manifest = json.loads((directory / 'manifest.json').read_text())
+        responses = {
+            path: StubResponse(
+                body=(directory / entry['file']).read_bytes(),
+                content_type=entry.get('content_type') or 'application/octet-stream',
+                status=entry.get('status', 200),
+                filename=entry.get('filename'),
+            )
+            for path, entry in manifest.items()
+        }
+        return cls(responses, **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'TrendlyneStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='trendlyne-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def expire_sessions(self):
+        """Invalidate every session cookie handed out so far"""
+        with self._lock:
+            self._sessions.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    # ---------------------------------------------------------------- handler
+
+    def _check_login(self, form: Dict[str, List[str]]) -> bool:
+        login = (form.get('login') or [''])[0]
+        password = (form.get('password') or [''])[0]
+        if (form.get('csrfmiddlewaretoken') or [''])[0] != CSRF_TOKEN:
+            return False
+        if self.username is None:
+            return bool(login)
+        return login == self.username and password == self.password
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _authenticated(self) -> bool:
+                for part in self.headers.get('Cookie', '').split(';'):
+                    name, _, value = part.strip().partition('=')
+                    if name == SESSION_COOKIE and value in stub._sessions:
+                        return True
+                return False
+
+            def _send(self, status: int, body: bytes = b'', content_type: str = 'text/html; charset=utf-8',
+                      headers: Dict[str, str] = None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _login_page(self):
+                page = LOGIN_PAGE.format(path=LOGIN_PATH, token=CSRF_TOKEN).encode()
+                self._send(200, page, headers={'Set-Cookie': f'csrftoken={CSRF_TOKEN}; Path=/'})
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append(('GET', self.path))
+                url = urlparse(self.path)
+                if url.path == LOGIN_PATH:
+                    return self._login_page()
+
+                response = stub.responses.get(self.path) or stub.responses.get(url.path)
+                if response is None and url.path == '/':
+                    response = StubResponse(HOME_PAGE.encode())
+                if response is None:
+                    return self._send(404, b'Not found')
+                if response.login_required and not self._authenticated():
+                    return self._send(302, headers={'Location': f"{LOGIN_PATH}?next={quote(self.path)}"})
+
+                headers = {}
+                if response.filename:
+                    headers['Content-Disposition'] = f'attachment; filename="{response.filename}"'
+                self._send(response.status, response.body, response.content_type, headers)
+
+            def do_POST(self):
+                with stub._lock:
+                    stub.requests.append(('POST', self.path))
+                if urlparse(self.path).path != LOGIN_PATH:
+                    return self._send(405, b'Method not allowed')
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode())
+                if not stub._check_login(form):
+                    return self._login_page()
+
+                token = secrets.token_hex(16)
+                with stub._lock:
+                    stub._sessions.add(token)
+                    stub.logins += 1
+                self._send(302, headers={'Location': '/', 'Set-Cookie': f'{SESSION_COOKIE}={token}; Path=/'})
+
+        return Handler
@@ -0,0 +1,323 @@
+"""
+Trendlyne Forecaster Index
+
+The forecaster screeners (High Bullishness, EPS / revenue beats and misses,
+...) are ~20 CSV files written by TrendlyneProvider.fetch_forecaster_data.
+Instead of parsing every file for every symbol, the index reads them once,
+keys each row by its exact NSE code and serves lookups from a dict.
+
+Rows are mapped to NSE codes through an NSE code column when the screener
+has one, otherwise through the 'Stock' name matched against TLStockData
+(stock_name or nsecode). Rows that cannot be mapped are kept under their
+upper-cased 'Stock' value.
+
+The built index is written as an Arrow IPC file (settings.FORECASTER_INDEX_PATH)
+together with the size / mtime of each source CSV, so a new process loads the
+snapshot instead of the CSVs. Lookups re-check the CSV mtimes (at most every
+FORECASTER_INDEX_CHECK_SECONDS) and rebuild the index when a file changed.
+
+Usage:
+    from apps.data.services.forecaster_index import get_forecaster_index
+
+    get_forecaster_index().lookup('RELIANCE')
+    # {'bullish_sentiment': {'trendlyne_High_Bullishness.csv': {...}}, 'bearish_sentiment': {}, ...}
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.constants import FORECASTER_INDEX_CHECK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Screener files by analysis category (file names as saved by TrendlyneProvider)
+FORECASTER_FILES = {
+    'bullish_sentiment': [
+        'trendlyne_High_Bullishness.csv',
+    ],
+    'bearish_sentiment': [
+        'trendlyne_High_Bearishness.csv',
+    ],
+    'earnings_surprises': [
+        'trendlyne_Beat_Annual_EPS_Estimates.csv',
+        'trendlyne_Missed_Annual_EPS_Estimates.csv',
+        'trendlyne_Beat_Quarter_EPS_Estimates.csv',
+        'trendlyne_Missed_Quarter_EPS_Estimates.csv',
+        'trendlyne_Beat_Annual_Revenue_Estimates.csv',
+        'trendlyne_Missed_Annual_Revenue_Estimates.csv',
+        'trendlyne_Beat_Quarter_Revenue_Estimates.csv',
+        'trendlyne_Missed_Quarter_Revenue_Estimates.csv',
+        'trendlyne_Beat_Annual_Net_Income_Estimates.csv',
+        'trendlyne_Missed_Annual_Net_Income_Estimates.csv',
+        'trendlyne_Beat_Quarter_Net_Income_Estimates.csv',
+        'trendlyne_Missed_Quarter_Net_Income_Estimates.csv',
+    ],
+    'growth_estimates': [
+        'trendlyne_Highest_Forward_12Mth_Upside_pct.csv',
+        'trendlyne_Highest_Forward_Annual_EPS_Growth.csv',
+        'trendlyne_Lowest_Forward_Annual_EPS_Growth.csv',
+        'trendlyne_Highest_Forward_Annual_Revenue_Growth.csv',
+        'trendlyne_Highest_Forward_Annual_Capex_Growth.csv',
+        'trendlyne_Highest_Dividend_Yield.csv',
+    ],
+    'analyst_activity': [
+        'trendlyne_Highest_3Mth_Analyst_Upgrades.csv',
+    ]
+}
+
+FILE_CATEGORIES = {
+    filename: category
+    for category, files in FORECASTER_FILES.items()
+    for filename in files
+}
+
+CODE_COLUMNS = ('NSE Code', 'NSEcode', 'NSE code', 'NSE Symbol', 'Symbol', 'SYMBOL')
+NAME_COLUMN = 'Stock'
+
+SCHEMA = pa.schema([
+    ('nse_code', pa.string()),
+    ('category', pa.string()),
+    ('filename', pa.string()),
+    ('record', pa.string()),  # JSON of the CSV row
+])
+
+# (filename, size, mtime_ns) of each source CSV present
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def empty_forecaster_data() -> Dict[str, Dict]:
+    """Forecaster result with every category and no matches."""
+    return {category: {} for category in FORECASTER_FILES}
+
+
+def _name_key(value) -> str:
+    return ' '.join(str(value).split()).upper() if value is not None and value == value else ''
+
+
+class ForecasterIndex:
+    """
+    Forecaster screener rows by NSE code, rebuilt when the CSVs change.
+
+    Entries are kept as (category, filename, record JSON) and decoded on
+    lookup, so loading the snapshot does not build thousands of dicts.
+    """
+
+    def __init__(self, directory=None, snapshot_path=None,
+                 check_interval: float = FORECASTER_INDEX_CHECK_SECONDS):
+        self.directory = Path(directory or settings.FORECASTER_DIR)
+        self.snapshot_path = Path(snapshot_path or settings.FORECASTER_INDEX_PATH)
+        self.check_interval = check_interval
+        self._entries: Dict[str, List[Tuple[str, str, str]]] = {}
+        self._signature: Optional[Signature] = None
+        self._checked_at = 0.0
+        self._stats: Dict = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- lookups
+
+    def lookup(self, symbol: str) -> Dict[str, Dict]:
+        """Forecaster rows of one NSE code, by category and file."""
+        self.refresh()
+        data = empty_forecaster_data()
+        for category, filename, record in self._entries.get(_name_key(symbol), ()):
+            data[category][filename] = json.loads(record)
+        return data
+
+    def get_row(self, symbol: str, filename: str) -> Optional[Dict]:
+        """Row of one NSE code in one screener file, or None."""
+        self.refresh()
+        for _, entry_file, record in self._entries.get(_name_key(symbol), ()):
+            if entry_file == filename:
+                return json.loads(record)
+        return None
+
+    def symbols(self) -> List[str]:
+        self.refresh()
+        return sorted(self._entries)
+
+    def stats(self) -> Dict:
+        self.refresh()
+        return dict(self._stats)
+
+    def version(self) -> str:
+        """Changes whenever a source CSV is added, removed or modified."""
+        self.refresh()
+        return hashlib.md5(repr(self._signature).encode()).hexdigest()
+
+    # ---------------------------------------------------------------- loading
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the index if a source CSV was added, removed or modified.
+
+        Returns True if the index was (re)loaded.
+        """
+        now = time.monotonic()
+        if not force and self._signature is not None and now - self._checked_at < self.check_interval:
+            return False
+
+        with self._lock:
+            if not force and self._signature is not None and now - self._checked_at < self.check_interval:
+                return False
+            signature = self._source_signature()
+            self._checked_at = time.monotonic()
+            if not force and signature == self._signature:
+                return False
+
+            if not force and self._load_snapshot(signature):
+                return True
+            self._build(signature)
+            return True
+
+    def rebuild(self) -> Dict:
+        """Re-read every CSV and rewrite the snapshot (after a Trendlyne download)."""
+        self.refresh(force=True)
+        return dict(self._stats)
+
+    def _source_signature(self) -> Signature:
+        signature = []
+        for filename in sorted(FILE_CATEGORIES):
+            try:
+                stat = os.stat(self.directory / filename)
+            except OSError:
+                continue
+            signature.append((filename, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def _build(self, signature: Signature):
+        started = time.perf_counter()
+        codes, names = self._stock_codes()
+        rows = {'nse_code': [], 'category': [], 'filename': [], 'record': []}
+        unmatched = 0
+
+        for filename, _, _ in signature:
+            try:
+                df = pd.read_csv(self.directory / filename)
+            except Exception as e:
+                logger.warning(f"Error reading {filename}: {e}")
+                continue
+
+            code_column = next((column for column in CODE_COLUMNS if column in df.columns), None)
+            if code_column is None and NAME_COLUMN not in df.columns:
+                logger.warning(f"{filename} has no '{NAME_COLUMN}' or NSE code column")
+                continue
+
+            seen = set()
+            for record in df.to_dict('records'):
+                code = _name_key(record.get(code_column)) if code_column else ''
+                if not code:
+                    name = _name_key(record.get(NAME_COLUMN))
+                    code = name if name in codes else names.get(name)
+                    if code is None:
+                        code = name
+                        unmatched += 1
+                # Keep the first row per symbol, as the old substring search did
+                if not code or code in seen:
+                    continue
+                seen.add(code)
+                rows['nse_code'].append(code)
+                rows['category'].append(FILE_CATEGORIES[filename])
+                rows['filename'].append(filename)
+                rows['record'].append(json.dumps(record, default=str))
+
+        table = pa.Table.from_pydict(rows, schema=SCHEMA)
+        self._install(table, signature, source='csv', unmatched=unmatched)
+        self._write_snapshot(table, signature, unmatched)
+        logger.info(f"Forecaster index built: {self._stats['rows']} rows, {self._stats['symbols']} symbols "
+                    f"from {len(signature)} files in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def _stock_codes(self):
+        """NSE codes and stock name -> NSE code from TLStockData."""
+        from apps.data.models import TLStockData
+
+        codes, names = set(), {}
+        try:
+            stocks = list(TLStockData.objects.exclude(nsecode__isnull=True).values_list('stock_name', 'nsecode'))
+        except Exception as e:
+            logger.warning(f"Could not load stock names for the forecaster index: {e}")
+            stocks = []
+        for stock_name, nsecode in stocks:
+            code = _name_key(nsecode)
+            if not code:
+                continue
+            codes.add(code)
+            if stock_name:
+                names.setdefault(_name_key(stock_name), code)
+        return codes, names
+
+    def _install(self, table: pa.Table, signature: Signature, source: str, unmatched: int):
+        columns = table.to_pydict()
+        entries: Dict[str, List[Tuple[str, str, str]]] = {}
+        for code, category, filename, record in zip(columns['nse_code'], columns['category'],
+                                                     columns['filename'], columns['record']):
+            entries.setdefault(code, []).append((category, filename, record))
+
+        self._entries = entries
+        self._signature = signature
+        self._stats = {
+            'source': source,
+            'files': len(signature),
+            'rows': table.num_rows,
+            'symbols': len(entries),
+            'unmatched_rows': unmatched,
+            'loaded_at': timezone.now().isoformat(),
+        }
+
+    def _load_snapshot(self, signature: Signature) -> bool:
+        if not self.snapshot_path.exists():
+            return False
+        try:
+            with pa.memory_map(str(self.snapshot_path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+            metadata = table.schema.metadata or {}
+            stored = tuple(tuple(item) for item in json.loads(metadata.get(b'signature', b'[]')))
+            if stored != signature:
+                return False
+            self._install(table, signature, source='snapshot',
+                          unmatched=int(metadata.get(b'unmatched_rows', b'0')))
+            return True
+        except Exception as e:
+            logger.warning(f"Could not load forecaster index snapshot {self.snapshot_path}: {e}")
+            return False
+
+    def _write_snapshot(self, table: pa.Table, signature: Signature, unmatched: int):
+        table = table.replace_schema_metadata({
+            'signature': json.dumps(signature),
+            'unmatched_rows': str(unmatched),
+        })
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            options = pa.ipc.IpcWriteOptions(compression='zstd')
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"Could not write forecaster index snapshot {self.snapshot_path}: {e}")
+
+
+_index: Optional[ForecasterIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_forecaster_index() -> ForecasterIndex:
+    """Process-wide forecaster index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ForecasterIndex()
+    return _index
@@ -0,0 +1,476 @@
+"""
+Option-Chain History Store
+
+Append-only history of option-chain snapshots kept outside the OLTP database.
+OptionChain / OptionChainQuote / NiftyOptionChain only hold the latest chain
+(they are cleared on every fetch); this store keeps every snapshot.
+
+Layout (settings.OPTION_CHAIN_STORE_DIR):
+
+    NIFTY/expiry=2025-01-30/date=2025-01-28/part-091503-120000.arrow   one per snapshot
+    NIFTY/expiry=2025-01-30/date=2025-01-27/chain.arrow                compacted day
+
+Files are Arrow IPC (columnar). Snapshot parts are written uncompressed;
+compaction merges a finished day into one file sorted by time and strike,
+compressed with settings.OPTION_CHAIN_STORE_COMPRESSION. Every file has a row
+in the OptionChainPartition catalog table, so lookups never list directories.
+
+Reads memory-map the files. Numeric columns of uncompressed files are
+exposed to NumPy without copying; compressed files are decoded once. The
+time x strike grid of read_history() is filled with a single scatter.
+
+Usage:
+    from apps.data.services.option_chain_store import get_option_chain_store
+
+    store = get_option_chain_store()
+    store.append_snapshot('NIFTY', expiry, rows)          # rows: list of dicts
+    history = store.read_history('NIFTY', expiry, option_type='CE', fields=('ltp', 'oi'))
+    history.values['oi']                                  # (times x strikes) array
+"""
+
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLOAT_COLUMNS = ('strike', 'ltp', 'bid', 'ask', 'iv', 'spot_price')
+INT_COLUMNS = ('volume', 'oi', 'oi_change')
+
+SCHEMA = pa.schema([
+    ('snapshot_time', pa.timestamp('ms', tz='UTC')),
+    ('option_type', pa.string()),
+    *((name, pa.float64()) for name in FLOAT_COLUMNS),
+    *((name, pa.int64()) for name in INT_COLUMNS),
+])
+
+COMPACTED_FILE = 'chain.arrow'
+
+
+@dataclass
+class ChainHistory:
+    """
+    Option-chain history of one expiry and option type as a time x strike grid.
+
+    Attributes:
+        underlying: e.g. NIFTY
+        expiry: Expiry date
+        option_type: 'CE' or 'PE'
+        times: datetime64[ms] (UTC) snapshot times, ascending
+        strikes: float64 strikes, ascending
+        values: {field: float64 array (len(times) x len(strikes)), NaN where
+            the strike was not quoted in that snapshot}
+        spot: float64 spot price per snapshot
+    """
+    underlying: str
+    expiry: date
+    option_type: str
+    times: np.ndarray
+    strikes: np.ndarray
+    values: Dict[str, np.ndarray]
+    spot: np.ndarray
+
+    def change(self, field: str = 'oi') -> np.ndarray:
+        """Change of a field between consecutive snapshots (first row NaN)."""
+        grid = self.values[field]
+        delta = np.full(grid.shape, np.nan)
+        delta[1:] = grid[1:] - grid[:-1]
+        return delta
+
+    def at(self, moment: datetime) -> Dict[str, np.ndarray]:
+        """Strike arrays of the last snapshot at or before `moment`."""
+        if timezone.is_aware(moment):
+            moment = timezone.make_naive(moment, dt_timezone.utc)
+        target = np.datetime64(moment, 'ms')
+        index = int(np.searchsorted(self.times, target, side='right')) - 1
+        if index < 0:
+            raise ValueError(f"No snapshot at or before {moment}")
+        return {field: grid[index] for field, grid in self.values.items()}
+
+
+def _trade_date(moment: datetime) -> date:
+    """Local trading day of a snapshot time."""
+    return timezone.localtime(moment).date() if timezone.is_aware(moment) else moment.date()
+
+
+def _to_float(value) -> float:
+    if value is None or value == '':
+        return np.nan
+    return float(value)
+
+
+def _to_int(value) -> int:
+    if value is None or value == '':
+        return 0
+    return int(float(value))
+
+
+def snapshot_table(rows: Iterable[Dict], snapshot_time: datetime, spot_price=None) -> pa.Table:
+    """
+    Build one snapshot table from chain rows.
+
+    Args:
+        rows: Dicts with strike, option_type ('CE'/'PE' or 'call'/'put') and any
+            of ltp, bid, ask, iv, volume, oi, oi_change, spot_price
+        snapshot_time: Time of the snapshot
+        spot_price: Spot for rows without their own
+
+    Returns:
+        pa.Table with SCHEMA, sorted by option type and strike
+    """
+    rows = list(rows)
+    option_types = [
+        'CE' if str(row.get('option_type', '')).upper() in ('CE', 'CALL') else 'PE' for row in rows
+    ]
+    columns = {
+        'snapshot_time': pa.array(
+            np.full(len(rows), int(snapshot_time.timestamp() * 1000), dtype='int64'),
+            type=pa.int64(),
+        ).cast(SCHEMA.field('snapshot_time').type),
+        'option_type': pa.array(option_types, type=pa.string()),
+    }
+    for name in FLOAT_COLUMNS:
+        values = [_to_float(row.get(name)) for row in rows]
+        if name == 'spot_price' and spot_price is not None:
+            values = [float(spot_price) if np.isnan(value) else value for value in values]
+        columns[name] = pa.array(np.array(values, dtype='float64'))
+    for name in INT_COLUMNS:
+        columns[name] = pa.array(np.array([_to_int(row.get(name)) for row in rows], dtype='int64'))
+
+    table = pa.table(columns, schema=SCHEMA)
+    return table.sort_by([('option_type', 'ascending'), ('strike', 'ascending')])
+
+
+def _write_arrow(table: pa.Table, path: Path, compression: Optional[str] = None):
+    """Write an Arrow IPC file atomically (temp file + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(str(temp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(temp_path, path)
+
+
+def _read_arrow(path: Path) -> pa.Table:
+    """Memory-map an Arrow IPC file."""
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+
+class OptionChainStore:
+    """
+    Partitioned Arrow files of option-chain snapshots with a DB catalog.
+    """
+
+    def __init__(self, root=None, compression: Optional[str] = 'default'):
+        self.root = Path(root or settings.OPTION_CHAIN_STORE_DIR)
+        self.compression = (
+            getattr(settings, 'OPTION_CHAIN_STORE_COMPRESSION', 'zstd')
+            if compression == 'default' else compression
+        )
+        self._lock = threading.Lock()
+
+    # ========== Paths ==========
+
+    @staticmethod
+    def partition_key(underlying: str, expiry: date, trade_date: date) -> str:
+        return f"{underlying.upper()}/expiry={expiry.isoformat()}/date={trade_date.isoformat()}"
+
+    def _absolute(self, relative: str) -> Path:
+        return self.root / relative
+
+    # ========== Write ==========
+
+    def append_snapshot(self, underlying: str, expiry: date, rows: Iterable[Dict],
+                        snapshot_time: Optional[datetime] = None, spot_price=None):
+        """
+        Append one chain snapshot as a new part file.
+
+        Args:
+            underlying: e.g. NIFTY
+            expiry: Expiry date of the chain
+            rows: Chain rows (see snapshot_table)
+            snapshot_time: Snapshot time (default: now)
+            spot_price: Spot for rows without their own
+
+        Returns:
+            OptionChainPartition or None when there were no rows
+        """
+        from apps.data.models import OptionChainPartition
+
+        snapshot_time = snapshot_time or timezone.now()
+        table = snapshot_table(rows, snapshot_time, spot_price)
+        if not table.num_rows:
+            return None
+
+        trade_date = _trade_date(snapshot_time)
+        local_time = timezone.localtime(snapshot_time) if timezone.is_aware(snapshot_time) else snapshot_time
+        relative = (
+            f"{self.partition_key(underlying, expiry, trade_date)}/"
+            f"part-{local_time:%H%M%S-%f}-{uuid.uuid4().hex[:6]}.arrow"
+        )
+        path = self._absolute(relative)
+        _write_arrow(table, path)
+
+        return OptionChainPartition.objects.create(
+            underlying=underlying.upper(),
+            expiry_date=expiry,
+            trade_date=trade_date,
+            path=relative,
+            snapshots=1,
+            rows=table.num_rows,
+            first_snapshot=snapshot_time,
+            last_snapshot=snapshot_time,
+            size_bytes=path.stat().st_size,
+            is_compacted=False,
+        )
+
+    def compact(self, underlying: str, expiry: date, trade_date: date):
+        """
+        Merge a day's part files (and any earlier compacted file) into one file.
+
+        Returns:
+            OptionChainPartition of the merged file, or None if there was nothing to merge
+        """
+        from apps.data.models import OptionChainPartition
+
+        with self._lock:
+            partitions = list(OptionChainPartition.objects.filter(
+                underlying=underlying.upper(), expiry_date=expiry, trade_date=trade_date
+            ))
+            parts = [p for p in partitions if not p.is_compacted]
+            if not parts:
+                return None
+
+            tables = [_read_arrow(self._absolute(p.path)) for p in partitions
+                      if self._absolute(p.path).exists()]
+            merged = pa.concat_tables(tables).sort_by([
+                ('snapshot_time', 'ascending'), ('option_type', 'ascending'), ('strike', 'ascending')
+            ])
+            relative = f"{self.partition_key(underlying, expiry, trade_date)}/{COMPACTED_FILE}"
+            path = self._absolute(relative)
+            _write_arrow(merged.combine_chunks(), path, compression=self.compression)
+
+            times = merged.column('snapshot_time')
+            with transaction.atomic():
+                OptionChainPartition.objects.filter(id__in=[p.id for p in partitions]).delete()
+                compacted = OptionChainPartition.objects.create(
+                    underlying=underlying.upper(),
+                    expiry_date=expiry,
+                    trade_date=trade_date,
+                    path=relative,
+                    snapshots=len(pc.unique(times)),
+                    rows=merged.num_rows,
+                    first_snapshot=pc.min(times).as_py(),
+                    last_snapshot=pc.max(times).as_py(),
+                    size_bytes=path.stat().st_size,
+                    is_compacted=True,
+                )
+
+            for part in parts:
+                try:
+                    self._absolute(part.path).unlink()
+                except FileNotFoundError:
+                    pass
+
+        logger.info(
+            f"Compacted {len(parts)} snapshots of {underlying} {expiry} on {trade_date} "
+            f"into {relative} ({compacted.size_bytes / 1024:.0f} KB)"
+        )
+        return compacted
+
+    def compact_all(self, before: Optional[date] = None) -> int:
+        """
+        Compact every day with part files, up to (excluding) `before` (default: today).
+
+        Returns:
+            int: Number of days compacted
+        """
+        from apps.data.models import OptionChainPartition
+
+        before = before or timezone.localdate()
+        days = (
+            OptionChainPartition.objects
+            .filter(is_compacted=False, trade_date__lt=before)
+            .values_list('underlying', 'expiry_date', 'trade_date')
+            .distinct()
+        )
+        compacted = 0
+        for underlying, expiry, trade_date in list(days):
+            if self.compact(underlying, expiry, trade_date):
+                compacted += 1
+        return compacted
+
+    # ========== Read ==========
+
+    def partitions(self, underlying: str, expiry: Optional[date] = None,
+                   start: Optional[date] = None, end: Optional[date] = None):
+        """Catalog rows for an underlying, optionally narrowed by expiry and trade dates."""
+        from apps.data.models import OptionChainPartition
+
+        queryset = OptionChainPartition.objects.filter(underlying=underlying.upper())
+        if expiry:
+            queryset = queryset.filter(expiry_date=expiry)
+        if start:
+            queryset = queryset.filter(trade_date__gte=start)
+        if end:
+            queryset = queryset.filter(trade_date__lte=end)
+        return queryset.order_by('first_snapshot')
+
+    def read_table(self, underlying: str, expiry: date, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None, columns: Optional[Sequence[str]] = None) -> pa.Table:
+        """
+        Snapshots of one expiry as a memory-mapped Arrow table.
+
+        Args:
+            underlying: e.g. NIFTY
+            expiry: Expiry date
+            start/end: Optional snapshot time bounds (inclusive)
+            columns: Columns to return (default: all)
+
+        Returns:
+            pa.Table (one chunk per file, in snapshot order)
+        """
+        partitions = self.partitions(
+            underlying, expiry,
+            start=_trade_date(start) if start else None,
+            end=_trade_date(end) if end else None,
+        )
+        tables = []
+        for partition in partitions:
+            path = self._absolute(partition.path)
+            if not path.exists():
+                logger.warning(f"Option chain file missing from store: {partition.path}")
+                continue
+            table = _read_arrow(path)
+            tables.append(table.select(list(columns)) if columns else table)
+
+        if not tables:
+            schema = pa.schema([SCHEMA.field(name) for name in columns]) if columns else SCHEMA
+            return schema.empty_table()
+
+        table = pa.concat_tables(tables)
+        if start or end:
+            times = table.column('snapshot_time')
+            mask = None
+            if start:
+                mask = pc.greater_equal(times, pa.scalar(start, type=times.type))
+            if end:
+                upper = pc.less_equal(times, pa.scalar(end, type=times.type))
+                mask = upper if mask is None else pc.and_(mask, upper)
+            table = table.filter(mask)
+        return table
+
+    def read_history(self, underlying: str, expiry: date, option_type: str = 'CE',
+                     fields: Sequence[str] = ('ltp', 'oi', 'iv'),
+                     start: Optional[datetime] = None, end: Optional[datetime] = None) -> ChainHistory:
+        """
+        Time x strike arrays of one expiry and option type.
+
+        Returns:
+            ChainHistory
+        """
+        table = self.read_table(underlying, expiry, start, end)
+        table = table.filter(pc.equal(table.column('option_type'), option_type))
+
+        times_ms = _numpy(table.column('snapshot_time').cast(pa.int64()))
+        strikes_col = _numpy(table.column('strike'))
+        times = np.unique(times_ms)
+        strikes = np.unique(strikes_col)
+        row = np.searchsorted(times, times_ms)
+        col = np.searchsorted(strikes, strikes_col)
+
+        values = {}
+        for field in fields:
+            grid = np.full((len(times), len(strikes)), np.nan)
+            grid[row, col] = _numpy(table.column(field)).astype('float64', copy=False)
+            values[field] = grid
+
+        spot = np.full(len(times), np.nan)
+        spot[row] = _numpy(table.column('spot_price'))
+
+        return ChainHistory(
+            underlying=underlying.upper(),
+            expiry=expiry,
+            option_type=option_type,
+            times=times.astype('datetime64[ms]'),
+            strikes=strikes,
+            values=values,
+            spot=spot,
+        )
+
+    def stats(self) -> Dict:
+        """Catalog totals per underlying."""
+        from django.db.models import Count, Max, Min, Sum
+        from apps.data.models import OptionChainPartition
+
+        rows = (
+            OptionChainPartition.objects.values('underlying')
+            .annotate(
+                files=Count('id'), snapshots=Sum('snapshots'), rows=Sum('rows'),
+                size_bytes=Sum('size_bytes'), expiries=Count('expiry_date', distinct=True),
+                first=Min('first_snapshot'), last=Max('last_snapshot'),
+            )
+            .order_by('underlying')
+        )
+        return {row.pop('underlying'): row for row in rows}
+
+
+def _numpy(column: pa.ChunkedArray) -> np.ndarray:
+    """
+    A chunked column as one NumPy array.
+
+    Compacted files are compressed by default (OPTION_CHAIN_STORE_COMPRESSION
+    'zstd'), so their columns are decoded into new arrays. Only with
+    compression set to None are single-chunk numeric columns without nulls
+    returned as views of the memory-mapped buffer.
+    """
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=False)
+    if column.num_chunks == 0:
+        return np.array([], dtype=column.type.to_pandas_dtype())
+    return np.concatenate([chunk.to_numpy(zero_copy_only=False) for chunk in column.chunks])
+
+
+def archive_option_chain(underlying: str, expiry: date, rows: List[Dict],
+                         snapshot_time: Optional[datetime] = None, spot_price=None):
+    """
+    Append a fetched chain to the history store if enabled.
+
+    Never raises: a failing archive must not break the live fetch.
+    """
+    if not getattr(settings, 'OPTION_CHAIN_STORE_ENABLED', False) or not rows:
+        return None
+    try:
+        return get_option_chain_store().append_snapshot(underlying, expiry, rows, snapshot_time, spot_price)
+    except Exception as e:
+        logger.warning(f"Could not archive {underlying} {expiry} option chain: {e}")
+        return None
+
+
+_store: Optional[OptionChainStore] = None
+_store_lock = threading.Lock()
+
+
+def get_option_chain_store() -> OptionChainStore:
+    """The process-wide store at settings.OPTION_CHAIN_STORE_DIR."""
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = OptionChainStore()
+    return _store
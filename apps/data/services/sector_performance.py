@@ -0,0 +1,436 @@
+"""
+Sector Performance
+
+Computes returns, breadth and relative strength of every sector in one pass
+over the stored stock universe and writes them to SectorPerformance (one row
+per sector). Screening code reads the rows through an in-process cache, so
+checking thousands of symbols against the sector filter is a dict lookup.
+
+A refresh makes two queries: the TLStockData universe (NSE code, sector,
+market cap, Trendlyne change %) and the daily cash closes in HistoricalPrice
+for the last SECTOR_HISTORY_DAYS days. Stock returns over 1/3/7/21 sessions
+come from the closes; stocks without enough history fall back to the
+Trendlyne day / week / month change % (1 / 7 / 21 sessions, no 3-session
+figure). Sector returns are market-cap weighted, breadth is the share of
+priced stocks up over SECTOR_BREADTH_WINDOW sessions and relative strength
+is the 21-session return minus the benchmark's (NIFTY closes, or the
+cap-weighted universe when the index has no history).
+
+Offline the same computation runs on a recorded JSON fixture (see
+record_fixture), which lists each stock's closes and Trendlyne figures.
+
+Usage:
+    from apps.data.services.sector_performance import refresh_sector_performance, get_sector_cache
+
+    refresh_sector_performance()            # Daily, after the Trendlyne import
+    cache = get_sector_cache()
+    cache.sector_for('TCS')                 # 'Software & Services'
+    cache.metrics_for_symbol('TCS').returns[21]
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.core.constants import (
+    SECTOR_BENCHMARK_SYMBOL,
+    SECTOR_BREADTH_WINDOW,
+    SECTOR_CACHE_CHECK_SECONDS,
+    SECTOR_HISTORY_DAYS,
+    SECTOR_RETURN_WINDOWS,
+)
+from apps.data.models import SectorPerformance, TLStockData
+
+logger = logging.getLogger(__name__)
+
+SOURCE_HISTORICAL = 'HISTORICAL'
+SOURCE_TRENDLYNE = 'TRENDLYNE'
+SOURCE_FIXTURE = 'FIXTURE'
+
+# Trendlyne change % columns used when a stock has too few closes, by session window
+TRENDLYNE_WINDOWS = {1: 'day_change_pct', 7: 'week_change_pct', 21: 'month_change_pct'}
+
+# Sector index by keyword in the Trendlyne sector name (first match wins)
+SECTOR_INDEX_KEYWORDS = (
+    ('BANK', 'BANKNIFTY'),
+    ('SOFTWARE', 'CNXIT'),
+    ('IT ', 'CNXIT'),
+    ('AUTO', 'CNXAUTO'),
+    ('PHARMA', 'CNXPHARMA'),
+    ('FMCG', 'CNXFMCG'),
+    ('FOOD', 'CNXFMCG'),
+    ('METAL', 'CNXMETAL'),
+    ('MINING', 'CNXMETAL'),
+    ('REALTY', 'CNXREALTY'),
+    ('REAL ESTATE', 'CNXREALTY'),
+    ('OIL', 'CNXENERGY'),
+    ('POWER', 'CNXENERGY'),
+    ('ENERGY', 'CNXENERGY'),
+    ('CONSTRUCTION', 'CNXINFRA'),
+    ('INFRA', 'CNXINFRA'),
+    ('FINANC', 'NIFTYFIN'),
+    ('INSURANCE', 'NIFTYFIN'),
+)
+
+
+def sector_index_for(sector: str) -> str:
+    """Sector index code of a Trendlyne sector name, or '' when none is mapped."""
+    name = f"{(sector or '').upper()} "
+    for keyword, index in SECTOR_INDEX_KEYWORDS:
+        if keyword in name:
+            return index
+    return ''
+
+
+@dataclass
+class SectorMetrics:
+    """Cached performance of one sector (returns in %, by session window)."""
+    sector: str
+    sector_index: str = ''
+    stocks: int = 0
+    priced_stocks: int = 0
+    returns: Dict[int, Optional[float]] = field(default_factory=dict)
+    advancers: int = 0
+    decliners: int = 0
+    breadth_pct: Optional[float] = None
+    relative_strength: Optional[float] = None
+    source: str = SOURCE_HISTORICAL
+    as_of: Optional[datetime] = None
+
+    def performance(self, days: int) -> Optional[float]:
+        return self.returns.get(days)
+
+    @classmethod
+    def from_row(cls, row: SectorPerformance) -> 'SectorMetrics':
+        return cls(
+            sector=row.sector,
+            sector_index=row.sector_index,
+            stocks=row.stocks,
+            priced_stocks=row.priced_stocks,
+            returns={days: getattr(row, f'return_{days}d') for days in SECTOR_RETURN_WINDOWS},
+            advancers=row.advancers,
+            decliners=row.decliners,
+            breadth_pct=row.breadth_pct,
+            relative_strength=row.relative_strength,
+            source=row.source,
+            as_of=row.as_of,
+        )
+
+    def to_row(self) -> SectorPerformance:
+        row = SectorPerformance(
+            sector=self.sector,
+            sector_index=self.sector_index,
+            stocks=self.stocks,
+            priced_stocks=self.priced_stocks,
+            advancers=self.advancers,
+            decliners=self.decliners,
+            breadth_pct=self.breadth_pct,
+            relative_strength=self.relative_strength,
+            source=self.source,
+            as_of=self.as_of,
+        )
+        for days in SECTOR_RETURN_WINDOWS:
+            setattr(row, f'return_{days}d', self.returns.get(days))
+        return row
+
+
+# ---------------------------------------------------------------- universe
+
+
+def load_universe(as_of: Optional[datetime] = None, history_days: int = SECTOR_HISTORY_DAYS) -> Dict:
+    """
+    Stock universe with daily closes, in fixture format (two queries).
+
+    Returns:
+        {'as_of': iso, 'benchmark': [closes], 'stocks': [{'nsecode', 'sector',
+         'market_cap', 'closes', 'day_change_pct', 'week_change_pct', 'month_change_pct'}]}
+    """
+    from apps.brokers.models import HistoricalPrice
+
+    as_of = as_of or timezone.now()
+    stocks = [
+        {
+            'nsecode': nsecode.upper(),
+            'sector': sector,
+            'market_cap': market_cap,
+            'closes': [],
+            'day_change_pct': day,
+            'week_change_pct': week,
+            'month_change_pct': month,
+        }
+        for nsecode, sector, market_cap, day, week, month in TLStockData.objects.exclude(
+            sector_name__isnull=True).exclude(sector_name='').exclude(nsecode__isnull=True).values_list(
+            'nsecode', 'sector_name', 'market_capitalization',
+            'day_change_pct', 'week_change_pct', 'month_change_pct').order_by()
+    ]
+
+    # Last close per code and date; intraday rows of the same day collapse into the last one
+    wanted = {stock['nsecode'] for stock in stocks} | {SECTOR_BENCHMARK_SYMBOL}
+    daily: Dict[str, Dict] = {}
+    for code, stamp, close in HistoricalPrice.objects.filter(
+            product_type='cash', datetime__gte=as_of - timedelta(days=history_days),
+            datetime__lte=as_of).values_list('stock_code', 'datetime', 'close').order_by('datetime'):
+        code = code.upper()
+        if code in wanted and close is not None:
+            daily.setdefault(code, {})[timezone.localtime(stamp).date() if timezone.is_aware(stamp) else stamp.date()] = float(close)
+
+    def closes(code):
+        by_date = daily.get(code, {})
+        return [by_date[day] for day in sorted(by_date)]
+
+    for stock in stocks:
+        stock['closes'] = closes(stock['nsecode'])
+    return {'as_of': as_of.isoformat(), 'benchmark': closes(SECTOR_BENCHMARK_SYMBOL), 'stocks': stocks}
+
+
+def record_fixture(path, as_of: Optional[datetime] = None) -> Dict:
+    """Write the current universe to a JSON fixture for offline refreshes."""
+    universe = load_universe(as_of=as_of)
+    Path(path).write_text(json.dumps(universe, default=str, indent=1))
+    return universe
+
+
+def load_fixture(path) -> Dict:
+    return json.loads(Path(path).read_text())
+
+
+# ---------------------------------------------------------------- computation
+
+
+def _window_returns(closes: List[float], windows=SECTOR_RETURN_WINDOWS) -> Dict[int, Optional[float]]:
+    """% return over each session window, None where the history is too short."""
+    returns = {}
+    for days in windows:
+        if len(closes) > days and closes[-1 - days]:
+            returns[days] = (closes[-1] / closes[-1 - days] - 1) * 100
+        else:
+            returns[days] = None
+    return returns
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return None if value is None or value == '' else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _weighted(values: np.ndarray, weights: np.ndarray) -> Optional[float]:
+    """Weighted mean ignoring NaN values, None when nothing is priced."""
+    mask = ~np.isnan(values)
+    if not mask.any():
+        return None
+    return float(np.average(values[mask], weights=weights[mask]))
+
+
+def compute_sector_metrics(universe: Dict, source: Optional[str] = None) -> Dict[str, SectorMetrics]:
+    """Metrics of every sector in universe (load_universe / fixture format)."""
+    as_of = universe.get('as_of')
+    as_of = datetime.fromisoformat(as_of) if isinstance(as_of, str) else (as_of or timezone.now())
+    if timezone.is_naive(as_of):
+        as_of = timezone.make_aware(as_of)
+
+    windows = tuple(SECTOR_RETURN_WINDOWS)
+    stocks = universe.get('stocks', [])
+    returns = np.full((len(stocks), len(windows)), np.nan)
+    weights = np.ones(len(stocks))
+    from_history = np.zeros(len(stocks), dtype=bool)
+
+    for i, stock in enumerate(stocks):
+        stock_returns = _window_returns(stock.get('closes') or [], windows)
+        for j, days in enumerate(windows):
+            value = stock_returns[days]
+            if value is not None:
+                from_history[i] = True
+            elif days in TRENDLYNE_WINDOWS:
+                value = _float(stock.get(TRENDLYNE_WINDOWS[days]))
+            if value is not None:
+                returns[i, j] = value
+        market_cap = _float(stock.get('market_cap'))
+        if market_cap and market_cap > 0:
+            weights[i] = market_cap
+
+    # Benchmark 21-session return: index closes, else the cap-weighted universe
+    long_window = windows.index(max(windows))
+    benchmark = _window_returns(universe.get('benchmark') or [], windows)[windows[long_window]]
+    if benchmark is None:
+        benchmark = _weighted(returns[:, long_window], weights)
+
+    breadth_window = windows.index(SECTOR_BREADTH_WINDOW)
+    by_sector: Dict[str, List[int]] = {}
+    for i, stock in enumerate(stocks):
+        by_sector.setdefault(stock['sector'], []).append(i)
+
+    metrics = {}
+    for sector, rows in by_sector.items():
+        rows = np.array(rows)
+        sector_returns = returns[rows]
+        breadth = sector_returns[:, breadth_window]
+        priced = int((~np.isnan(sector_returns).all(axis=1)).sum())
+        advancers = int((breadth > 0).sum())
+        decliners = int((breadth < 0).sum())
+        measured = advancers + decliners + int((breadth == 0).sum())
+        sector_return = {
+            days: _weighted(sector_returns[:, j], weights[rows]) for j, days in enumerate(windows)
+        }
+        long_return = sector_return[windows[long_window]]
+        metrics[sector] = SectorMetrics(
+            sector=sector,
+            sector_index=sector_index_for(sector),
+            stocks=len(rows),
+            priced_stocks=priced,
+            returns={days: round(value, 4) if value is not None else None for days, value in sector_return.items()},
+            advancers=advancers,
+            decliners=decliners,
+            breadth_pct=round(advancers * 100 / measured, 2) if measured else None,
+            relative_strength=(round(long_return - benchmark, 4)
+                               if long_return is not None and benchmark is not None else None),
+            source=source or (SOURCE_HISTORICAL if from_history[rows].any() else SOURCE_TRENDLYNE),
+            as_of=as_of,
+        )
+    return metrics
+
+
+def refresh_sector_performance(as_of: Optional[datetime] = None, fixture=None) -> Dict[str, SectorMetrics]:
+    """
+    Recompute every sector and replace the SectorPerformance rows.
+
+    Args:
+        as_of: Refresh time (default now); closes after it are ignored
+        fixture: Path of a recorded universe to use instead of the database
+
+    Returns:
+        {sector: SectorMetrics}
+    """
+    if fixture is not None:
+        universe = load_fixture(fixture)
+        if as_of is not None:
+            universe['as_of'] = as_of.isoformat()
+        metrics = compute_sector_metrics(universe, source=SOURCE_FIXTURE)
+    else:
+        metrics = compute_sector_metrics(load_universe(as_of=as_of))
+
+    with transaction.atomic():
+        SectorPerformance.objects.all().delete()
+        SectorPerformance.objects.bulk_create([item.to_row() for item in metrics.values()])
+
+    logger.info(f"Sector performance refreshed: {len(metrics)} sectors")
+    get_sector_cache().refresh(force=True)
+    return metrics
+
+
+# ---------------------------------------------------------------- cache
+
+
+def _symbol_key(symbol: str) -> str:
+    return (symbol or '').strip().upper()
+
+
+class SectorPerformanceCache:
+    """
+    Sector metrics and NSE code → sector map, reloaded when a newer snapshot appears.
+
+    The snapshot time (max as_of) is re-checked at most every check_interval
+    seconds; in between, lookups do not touch the database.
+    """
+
+    def __init__(self, check_interval: float = SECTOR_CACHE_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._metrics: Dict[str, SectorMetrics] = {}
+        self._by_index: Dict[str, SectorMetrics] = {}
+        self._sectors: Dict[str, str] = {}
+        self._as_of = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- lookups
+
+    def sector_for(self, symbol: str) -> Optional[str]:
+        """Trendlyne sector of an NSE code, or None."""
+        self.refresh()
+        return self._sectors.get(_symbol_key(symbol))
+
+    def metrics(self, sector: str) -> Optional[SectorMetrics]:
+        """Metrics of a sector, by sector name or sector index code."""
+        self.refresh()
+        return self._metrics.get(sector) or self._by_index.get(_symbol_key(sector))
+
+    def metrics_for_symbol(self, symbol: str) -> Optional[SectorMetrics]:
+        sector = self.sector_for(symbol)
+        return self._metrics.get(sector) if sector else None
+
+    def all(self) -> List[SectorMetrics]:
+        self.refresh()
+        return list(self._metrics.values())
+
+    @property
+    def as_of(self):
+        return self._as_of
+
+    # ---------------------------------------------------------------- loading
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if the stored snapshot is newer than the cached one. Returns True if reloaded."""
+        now = time.monotonic()
+        if not force and self._loaded and now - self._checked_at < self.check_interval:
+            return False
+
+        with self._lock:
+            if not force and self._loaded and now - self._checked_at < self.check_interval:
+                return False
+            as_of = SectorPerformance.objects.aggregate(as_of=Max('as_of'))['as_of']
+            self._checked_at = time.monotonic()
+            if not force and self._loaded and as_of == self._as_of:
+                return False
+            self._load(as_of)
+            return True
+
+    def _load(self, as_of):
+        metrics = {row.sector: SectorMetrics.from_row(row) for row in SectorPerformance.objects.all()}
+        by_index = {}
+        for item in sorted(metrics.values(), key=lambda m: m.stocks):
+            if item.sector_index:
+                by_index[item.sector_index] = item  # Largest sector wins a shared index
+        sectors = {
+            _symbol_key(nsecode): sector
+            for nsecode, sector in TLStockData.objects.filter(sector_name__in=list(metrics)).values_list(
+                'nsecode', 'sector_name').order_by()
+            if nsecode
+        } if metrics else {}
+
+        self._metrics, self._by_index, self._sectors = metrics, by_index, sectors
+        self._as_of = as_of
+        self._loaded = True
+        logger.debug(f"Sector cache loaded: {len(metrics)} sectors, {len(sectors)} symbols")
+
+    def clear(self):
+        with self._lock:
+            self._metrics, self._by_index, self._sectors = {}, {}, {}
+            self._as_of = None
+            self._loaded = False
+
+
+_cache: Optional[SectorPerformanceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_sector_cache() -> SectorPerformanceCache:
+    """Process-wide sector performance cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SectorPerformanceCache()
+    return _cache
@@ -0,0 +1,571 @@
+"""
+Trendlyne Export Cache
+
+The F&O and market snapshot exports are workbooks of 80+ columns. Each file
+is converted once into a typed Parquet file that keeps only the columns a
+model stores, keyed by the SHA-256 of its content; every loader then reads
+that file with column selection instead of parsing the workbook again.
+
+Conversion streams the sheet with openpyxl in read-only mode (CSV exports
+through the csv module), keeps the mapped columns and types them from the
+target model: CharField -> string, IntegerField -> int64, FloatField ->
+float64, DateField -> date32. Trendlyne's NA markers ('-', 'Export NA',
+'#N/A', ...), infinities and unparseable dates become nulls.
+
+Cache files live in settings.TRENDLYNE_PARQUET_DIR as <sha256>.parquet. The
+footer records the kind, the source header and a fingerprint of the schema,
+so a file converted under an older mapping is converted again.
+
+Usage:
+    from apps.data.services.trendlyne_parquet import convert_export, read_export
+
+    export = convert_export('tldata/fno_data_2025-11-14.xlsx', kind='fno')
+    rows = read_export(export.path, columns=['symbol', 'expiry', 'oi']).to_pylist()
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from django.conf import settings
+
+from apps.core.constants import TRENDLYNE_PARQUET_HASH_CHUNK, TRENDLYNE_PARQUET_KEEP_DAYS
+from apps.core.utils.date_utils import parse_expiry
+
+logger = logging.getLogger(__name__)
+
+# F&O export header -> ContractData field
+FNO_COLUMNS = {
+    'SYMBOL': 'symbol',
+    'OPTION TYPE': 'option_type',
+    'STRIKE PRICE': 'strike_price',
+    'PRICE': 'price',
+    'SPOT': 'spot',
+    'EXPIRY': 'expiry',
+    'LAST UPDATED': 'last_updated',
+    'BUILD UP': 'build_up',
+    'LOT SIZE': 'lot_size',
+    'DAY CHANGE': 'day_change',
+    '%DAY CHANGE': 'pct_day_change',
+    'OPEN PRICE': 'open_price',
+    'HIGH PRICE': 'high_price',
+    'LOW PRICE': 'low_price',
+    'PREV CLOSE PRICE': 'prev_close_price',
+    'OI': 'oi',
+    '%OI CHANGE': 'pct_oi_change',
+    'OI CHANGE': 'oi_change',
+    'PREV DAY OI': 'prev_day_oi',
+    'TRADED CONTRACTS': 'traded_contracts',
+    'TRADED CONTRACTS CHANGE%': 'traded_contracts_change_pct',
+    'SHARES TRADED': 'shares_traded',
+    '%VOLUME SHARES CHANGE': 'pct_volume_shares_change',
+    'PREV DAY VOL': 'prev_day_vol',
+    'BASIS': 'basis',
+    'COST OF CARRY (CoC)': 'cost_of_carry',
+    'IV': 'iv',
+    'PREV DAY IV': 'prev_day_iv',
+    '%IV CHANGE': 'pct_iv_change',
+    'DELTA': 'delta',
+    'VEGA': 'vega',
+    'GAMMA': 'gamma',
+    'THETA': 'theta',
+    'RHO': 'rho',
+}
+
+# Market snapshot header -> TLStockData field
+STOCK_COLUMNS = {
+    'Stock Name': 'stock_name',
+    'NSEcode': 'nsecode',
+    'BSEcode': 'bsecode',
+    'ISIN': 'isin',
+    'Industry Name': 'industry_name',
+    'sector_name': 'sector_name',
+    'Current Price': 'current_price',
+    'Market Capitalization': 'market_capitalization',
+    # Trendlyne Scores
+    'Trendlyne Durability Score': 'trendlyne_durability_score',
+    'Trendlyne Valuation Score': 'trendlyne_valuation_score',
+    'Trendlyne Momentum Score': 'trendlyne_momentum_score',
+    'DVM_classification_text': 'dvm_classification_text',
+    'Prev Day Trendlyne Durability Score': 'prev_day_trendlyne_durability_score',
+    'Prev Day Trendlyne Valuation Score': 'prev_day_trendlyne_valuation_score',
+    'Prev Day Trendlyne Momentum Score': 'prev_day_trendlyne_momentum_score',
+    'Prev Week Trendlyne Durability Score': 'prev_week_trendlyne_durability_score',
+    'Prev Week Trendlyne Valuation Score': 'prev_week_trendlyne_valuation_score',
+    'Prev Week Trendlyne Momentum Score': 'prev_week_trendlyne_momentum_score',
+    'Prev Month Trendlyne Durability Score': 'prev_month_trendlyne_durability_score',
+    'Prev Month Trendlyne Valuation Score': 'prev_month_trendlyne_valuation_score',
+    'Prev Month Trendlyne Momentum Score': 'prev_month_trendlyne_momentum_score',
+    'Normalized Momentum Score': 'normalized_momentum_score',
+    # Financial Metrics - Quarterly
+    'Operating Revenue Qtr': 'operating_revenue_qtr',
+    'Net Profit Qtr': 'net_profit_qtr',
+    'Revenue QoQ Growth %': 'revenue_qoq_growth_pct',
+    'Revenue Growth Qtr YoY %': 'revenue_growth_qtr_yoy_pct',
+    'Net Profit Qtr Growth YoY %': 'net_profit_qtr_growth_yoy_pct',
+    'Net Profit QoQ Growth %': 'net_profit_qoq_growth_pct',
+    'Operating Profit Margin Qtr %': 'operating_profit_margin_qtr_pct',
+    'Operating Profit Margin Qtr 4Qtr ago %': 'operating_profit_margin_qtr_1yr_ago_pct',
+    # Sector comparisons
+    'Sector Revenue Growth Qtr YoY %': 'sector_revenue_growth_qtr_yoy_pct',
+    'Sector Net Profit Growth Qtr YoY %': 'sector_net_profit_growth_qtr_yoy_pct',
+    'Sector Revenue Growth Qtr QoQ %': 'sector_revenue_growth_qtr_qoq_pct',
+    'Sector Net Profit Growth Qtr QoQ %': 'sector_net_profit_growth_qtr_qoq_pct',
+    # Financial Metrics - TTM & Annual
+    'Operating Revenue TTM': 'operating_revenue_ttm',
+    'Net profit TTM': 'net_profit_ttm',
+    'Operating Revenue Annual': 'operating_revenue_annual',
+    'Net Profit Annual': 'net_profit_annual',
+    'Revenue Growth Annual YoY %': 'revenue_growth_annual_yoy_pct',
+    'Net Profit Annual YoY Growth %': 'net_profit_annual_yoy_growth_pct',
+    'Sector Revenue Growth Annual YoY %': 'sector_revenue_growth_annual_yoy_pct',
+    # Cash Flow
+    'Cash from Financing Annual Activity': 'cash_from_financing_annual_activity',
+    'Cash from Investing Activity Annual': 'cash_from_investing_activity_annual',
+    'Cash from Operating Activity Annual': 'cash_from_operating_activity_annual',
+    'Net Cash Flow Annual': 'net_cash_flow_annual',
+    # Latest Results
+    'Latest financial result': 'latest_financial_result',
+    'Result Announced Date': 'result_announced_date',
+    # Valuation - P/E
+    'PE TTM Price to Earnings': 'pe_ttm_price_to_earnings',
+    'Forecaster Estimates 1Y forward PE': 'forecaster_estimates_1y_forward_pe',
+    'PE 3Yr Average': 'pe_3yr_average',
+    'PE 5Yr Average': 'pe_5yr_average',
+    '%Days traded below current PE Price to Earnings': 'pctdays_traded_below_current_pe_price_to_earnings',
+    'Sector PE TTM': 'sector_pe_ttm',
+    'Industry PE TTM': 'industry_pe_ttm',
+    # Valuation - PEG
+    'PEG TTM PE to Growth': 'peg_ttm_pe_to_growth',
+    'Forecaster Estimates 1Y forward PEG': 'forecaster_estimates_1y_forward_peg',
+    'Sector PEG TTM': 'sector_peg_ttm',
+    'Industry PEG TTM': 'industry_peg_ttm',
+    # Valuation - Price to Book
+    'Price to Book Value Adjusted': 'price_to_book_value',
+    '%Days traded below current Price to Book Value': 'pctdays_traded_below_current_price_to_book_value',
+    'Sector Price to Book TTM': 'sector_price_to_book_ttm',
+    'Industry Price to Book TTM': 'industry_price_to_book_ttm',
+    # EPS
+    'Basic EPS TTM': 'basic_eps_ttm',
+    'EPS TTM Growth %': 'eps_ttm_growth_pct',
+    # Returns & Quality
+    'ROE Annual %': 'roe_annual_pct',
+    'Sector Return on Equity ROE': 'sector_return_on_equity_roe',
+    'Industry Return on Equity ROE': 'industry_return_on_equity_roe',
+    'RoA Annual %': 'roa_annual_pct',
+    'Sector Return on Assets': 'sector_return_on_assets',
+    'Industry Return on Assets': 'industry_return_on_assets',
+    'Piotroski Score': 'piotroski_score',
+    # Technical Indicators
+    'Day MFI': 'day_mfi',
+    'Day RSI': 'day_rsi',
+    'Day MACD': 'day_macd',
+    'Day MACD Signal Line': 'day_macd_signal_line',
+    'Day ATR': 'day_atr',
+    'Day ADX': 'day_adx',
+    'Day ROC21': 'day_roc21',
+    'Day ROC125': 'day_roc125',
+    # Moving Averages - SMA
+    'Day SMA5': 'day5_sma',
+    'Day SMA30': 'day30_sma',
+    'Day SMA50': 'day50_sma',
+    'Day SMA100': 'day100_sma',
+    'Day SMA200': 'day200_sma',
+    # Moving Averages - EMA
+    'Day EMA12': 'day12_ema',
+    'Day EMA20': 'day20_ema',
+    'Day EMA50': 'day50_ema',
+    'Day EMA100': 'day100_ema',
+    # Beta
+    'Beta 1Month': 'beta_1month',
+    'Beta 3Month': 'beta_3month',
+    'Beta 1Year': 'beta_1year',
+    'Beta 3Year': 'beta_3year',
+    # Support & Resistance
+    'Standard Pivot point': 'pivot_point',
+    'Standard resistance R1': 'first_resistance_r1',
+    'Standard R1 to Price Diff %': 'first_resistance_r1_to_price_diff_pct',
+    'Standard resistance R2': 'second_resistance_r2',
+    'Standard R2 to Price Diff %': 'second_resistance_r2_to_price_diff_pct',
+    'Standard resistance R3': 'third_resistance_r3',
+    'Standard R3 to Price Diff %': 'third_resistance_r3_to_price_diff_pct',
+    'Standard resistance S1': 'first_support_s1',
+    'Standard S1 to Price Diff %': 'first_support_s1_to_price_diff_pct',
+    'Standard resistance S2': 'second_support_s2',
+    'Standard S2 to Price Diff %': 'second_support_s2_to_price_diff_pct',
+    'Standard resistance S3': 'third_support_s3',
+    'Standard S3 to Price Diff %': 'third_support_s3_to_price_diff_pct',
+    # Price Ranges & Changes
+    'Day Low': 'day_low',
+    'Day High': 'day_high',
+    'Day change %': 'day_change_pct',
+    'Week Low': 'week_low',
+    'Week High': 'week_high',
+    'Week change %': 'week_change_pct',
+    'Month Low': 'month_low',
+    'Month High': 'month_high',
+    'Month Change %': 'month_change_pct',
+    'Qtr Low': 'qtr_low',
+    'Qtr High': 'qtr_high',
+    'Qtr Change %': 'qtr_change_pct',
+    '1Yr Low': 'one_year_low',
+    '1Yr High': 'one_year_high',
+    '1Yr change %': 'one_year_change_pct',
+    '3Yr Low': 'three_year_low',
+    '3Yr High': 'three_year_high',
+    'three_year_changeP': 'three_year_changep',
+    '5Yr Low': 'five_year_low',
+    '5Yr High': 'five_year_high',
+    'five_year_changeP': 'five_year_changep',
+    '10Yr Low': 'ten_year_low',
+    '10Yr High': 'ten_year_high',
+    'ten_year_changeP': 'ten_year_changep',
+    # Volume Data
+    'Day Volume': 'day_volume',
+    'Week Volume Avg': 'week_volume_avg',
+    'Month Volume Avg': 'month_volume_avg',
+    '3Month Volume Avg': 'three_month_volume_avg',
+    '6Month Volume Avg': 'six_month_volume_avg',
+    'Consolidated end of day volume': 'consolidated_eod_volume',
+    'Consolidated previous end of day volume': 'consolidated_prev_eod_volume',
+    'Consolidated 5day average end of day volume': 'consolidated_5day_avg_eod_volume',
+    'Consolidated 30day average end of day volume': 'consolidated_30day_avg_eod_volume',
+    'Day volume multiple of week': 'day_volume_multiple_of_week',
+    'vol_day_times_vol_week_str': 'vol_day_times_vol_week_str',
+    'Consolidated day Volume': 'consolidated_day_volume',
+    'VWAP Day': 'vwap_day',
+    # Delivery Data  - note: missing some in model, we'll skip those
+    # 'Delivery Volume % end of day': 'delivery_volume_pct_eod',
+    # Holdings - Promoter
+    'Promoter holding latest %': 'promoter_holding_latest_pct',
+    'Promoter holding change QoQ %': 'promoter_holding_change_qoq_pct',
+    'Promoter holding change 4Qtr %': 'promoter_holding_change_4qtr_pct',
+    'Promoter holding change 8Qtr %': 'promoter_holding_change_8qtr_pct',
+    'Promoter holding pledge percentage % Qtr': 'promoter_pledge_pct_qtr',
+    'Promoter pledge change QoQ %': 'promoter_pledge_change_qoq_pct',
+    # Holdings - Mutual Funds
+    'MF holding current Qtr %': 'mf_holding_current_qtr_pct',
+    'MF holding change QoQ %': 'mf_holding_change_qoq_pct',
+    'MF holding change 1Month %': 'mf_holding_change_1month_pct',
+    'MF holding change 2Month %': 'mf_holding_change_2month_pct',
+    'MF holding change 3Month%': 'mf_holding_change_3month_pct',
+    'MF holding change 4Qtr %': 'mf_holding_change_4qtr_pct',
+    'MF holding change 8Qtr %': 'mf_holding_change_8qtr_pct',
+    # Holdings - FII
+    'FII holding current Qtr %': 'fii_holding_current_qtr_pct',
+    'FII holding change QoQ %': 'fii_holding_change_qoq_pct',
+    'FII holding change 4Qtr %': 'fii_holding_change_4qtr_pct',
+    'FII holding change 8Qtr %': 'fii_holding_change_8qtr_pct',
+    # Holdings - Institutional
+    'Institutional holding current Qtr %': 'institutional_holding_current_qtr_pct',
+    'Institutional holding change QoQ %': 'institutional_holding_change_qoq_pct',
+    'Institutional holding change 4Qtr %': 'institutional_holding_change_4qtr_pct',
+    'Institutional holding change 8Qtr %': 'institutional_holding_change_8qtr_pct',
+}
+
+KIND_FNO = 'fno'
+KIND_STOCK = 'stock'
+
+KIND_COLUMNS = {
+    KIND_FNO: FNO_COLUMNS,
+    KIND_STOCK: STOCK_COLUMNS,
+}
+
+# Trendlyne / Excel placeholders for a missing value (compared lower-cased)
+NA_VALUES = {'', 'nan', 'null', 'none', '-', 'na', 'n/a', 'export na', '#n/a', '#value!', '#div/0!', '#ref!'}
+
+_digests: Dict[Tuple[str, int, int], str] = {}
+_digests_lock = threading.Lock()
+_convert_lock = threading.Lock()
+
+
+@dataclass
+class TrendlyneExport:
+    """One converted export"""
+    path: Path  # Parquet file in the cache
+    kind: str
+    source: str  # File name it was converted from (first conversion)
+    sha256: str
+    rows: int
+    columns: List[str]  # Model fields present
+    header: List[str]  # Full header row of the source
+    cached: bool  # False when this call did the conversion
+
+    def read(self, columns: Optional[Iterable[str]] = None) -> pa.Table:
+        return read_export(self.path, columns)
+
+
+def _model(kind: str):
+    from apps.data.models import ContractData, TLStockData
+
+    return {KIND_FNO: ContractData, KIND_STOCK: TLStockData}[kind]
+
+
+def _arrow_type(model_field) -> pa.DataType:
+    from django.db import models
+
+    if isinstance(model_field, models.IntegerField):
+        return pa.int64()
+    if isinstance(model_field, (models.FloatField, models.DecimalField)):
+        return pa.float64()
+    if isinstance(model_field, models.DateField) and not isinstance(model_field, models.DateTimeField):
+        return pa.date32()
+    return pa.string()
+
+
+def export_schema(kind: str) -> pa.Schema:
+    """Typed columns of a kind, in mapping order (one column per model field)"""
+    fields = {f.name: f for f in _model(kind)._meta.fields}
+    columns, seen = [], set()
+    for name in KIND_COLUMNS[kind].values():
+        if name in fields and name not in seen:
+            seen.add(name)
+            columns.append(pa.field(name, _arrow_type(fields[name])))
+    return pa.schema(columns)
+
+
+def schema_fingerprint(kind: str) -> str:
+    """Changes whenever the mapping or the model types of a kind change"""
+    schema = export_schema(kind)
+    spec = json.dumps([sorted(KIND_COLUMNS[kind].items()), [(f.name, str(f.type)) for f in schema]])
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def detect_kind(header: List[str]) -> Optional[str]:
+    if 'SYMBOL' in header and 'OPTION TYPE' in header:
+        return KIND_FNO
+    if 'Stock Name' in header or 'NSEcode' in header:
+        return KIND_STOCK
+    return None
+
+
+def file_digest(path) -> str:
+    """SHA-256 of the file content (memoized on path, size and mtime)"""
+    stat = os.stat(path)
+    key = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if key in _digests:
+            return _digests[key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(TRENDLYNE_PARQUET_HASH_CHUNK), b''):
+            digest.update(chunk)
+    with _digests_lock:
+        _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+
+# ---------------------------------------------------------------- values
+
+def _na(text: str) -> bool:
+    return text.lower() in NA_VALUES
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        text = str(value).strip().replace(',', '')
+        if _na(text):
+            return None
+        try:
+            number = float(text.rstrip('%'))
+        except ValueError:
+            return None
+    return number if math.isfinite(number) else None
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    return int(round(number)) if number is not None else None
+
+
+def _to_text(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d') if value.time() == datetime.min.time() else value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        # Codes read as numbers (BSE code 500325.0)
+        return str(int(value)) if value.is_integer() else str(value)
+    text = str(value).strip()
+    return None if _na(text) else text
+
+
+def _to_date(value) -> Optional[date]:
+    return parse_expiry(value if isinstance(value, (datetime, date)) else _to_text(value))
+
+
+def _converter(name: str, arrow_type: pa.DataType):
+    if pa.types.is_date(arrow_type):
+        return _to_date
+    if pa.types.is_integer(arrow_type):
+        return _to_int
+    if pa.types.is_floating(arrow_type):
+        return _to_float
+    return _to_text
+
+
+# ---------------------------------------------------------------- conversion
+
+def _iter_rows(path: Path) -> Iterator[tuple]:
+    """Rows of the first sheet (header first), streamed"""
+    if path.suffix.lower() == '.csv':
+        with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+            yield from csv.reader(f)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _cache_dir() -> Path:
+    directory = Path(settings.TRENDLYNE_PARQUET_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _cached(path: Path, kind: Optional[str]) -> Optional[TrendlyneExport]:
+    """The cached conversion at path, if it exists and matches the current schema"""
+    try:
+        metadata = pq.read_metadata(path)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    info = {k.decode(): v.decode() for k, v in (metadata.metadata or {}).items() if k.startswith(b'trendlyne.')}
+    cached_kind = info.get('trendlyne.kind')
+    if cached_kind not in KIND_COLUMNS or (kind and kind != cached_kind):
+        return None
+    if info.get('trendlyne.schema') != schema_fingerprint(cached_kind):
+        return None
+    return TrendlyneExport(
+        path=path,
+        kind=cached_kind,
+        source=info.get('trendlyne.source', ''),
+        sha256=path.stem,
+        rows=metadata.num_rows,
+        columns=metadata.schema.to_arrow_schema().names,
+        header=json.loads(info.get('trendlyne.header', '[]')),
+        cached=True,
+    )
+
+
+def _convert(source: Path, target: Path, digest: str, kind: Optional[str]) -> TrendlyneExport:
+    started = time.perf_counter()
+    rows = _iter_rows(source)
+    header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+    kind = kind or detect_kind(header)
+    if kind not in KIND_COLUMNS:
+        raise ValueError(f"{source.name} is neither an F&O export nor a market snapshot (header: {header[:10]})")
+
+    # Column pruning: keep the first source column mapped to each model field
+    schema = export_schema(kind)
+    wanted = {f.name: f.type for f in schema}
+    selected: List[Tuple[int, str]] = []
+    for position, title in enumerate(header):
+        name = KIND_COLUMNS[kind].get(title)
+        if name in wanted:
+            selected.append((position, name))
+            del wanted[name]
+    converters = [(position, _converter(name, schema.field(name).type)) for position, name in selected]
+    values: List[list] = [[] for _ in selected]
+
+    for row in rows:
+        if not any(cell not in (None, '') for cell in row):
+            continue
+        for column, (position, convert) in zip(values, converters):
+            column.append(convert(row[position]) if position < len(row) else None)
+
+    fields = [schema.field(name) for _, name in selected]
+    table = pa.Table.from_arrays(
+        [pa.array(column, type=f.type) for column, f in zip(values, fields)], schema=pa.schema(fields),
+    ).replace_schema_metadata({
+        'trendlyne.kind': kind,
+        'trendlyne.schema': schema_fingerprint(kind),
+        'trendlyne.source': source.name,
+        'trendlyne.header': json.dumps(header),
+    })
+
+    partial = target.with_suffix(f'.{os.getpid()}.tmp')
+    pq.write_table(table, partial, compression=settings.TRENDLYNE_PARQUET_COMPRESSION)
+    os.replace(partial, target)
+    logger.info(f"Converted {source.name} ({kind}): {table.num_rows} rows, {len(selected)} of "
+                f"{len(header)} columns in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return TrendlyneExport(
+        path=target, kind=kind, source=source.name, sha256=digest, rows=table.num_rows,
+        columns=table.column_names, header=header, cached=False,
+    )
+
+
+def convert_export(source, kind: Optional[str] = None) -> TrendlyneExport:
+    """
+    Parquet conversion of an F&O / market snapshot export, done once per content.
+
+    Args:
+        source: XLSX or CSV export
+        kind: KIND_FNO / KIND_STOCK (None: detected from the header)
+    """
+    source = Path(source)
+    digest = file_digest(source)
+    target = _cache_dir() / f"{digest}.parquet"
+
+    export = _cached(target, kind) if target.exists() else None
+    if export:
+        os.utime(target)  # Keeps it out of prune_cache while in use
+        return export
+    with _convert_lock:
+        export = _cached(target, kind) if target.exists() else None
+        return export or _convert(source, target, digest, kind)
+
+
+def read_export(path, columns: Optional[Iterable[str]] = None) -> pa.Table:
+    """Converted export with only the given columns (those the file does not have are skipped)"""
+    if columns is None:
+        return pq.read_table(path)
+    present = set(pq.read_schema(path).names)
+    return pq.read_table(path, columns=[name for name in columns if name in present])
+
+
+def model_columns(kind: str) -> List[str]:
+    """Fields of a kind's model an export can fill"""
+    return export_schema(kind).names
+
+
+def prune_cache(keep_days: int = TRENDLYNE_PARQUET_KEEP_DAYS) -> int:
+    """Delete conversions not written for keep_days. Returns the number removed."""
+    directory = Path(settings.TRENDLYNE_PARQUET_DIR)
+    if not directory.exists():
+        return 0
+    cutoff = time.time() - keep_days * 86400
+    removed = 0
+    for path in directory.glob('*.parquet'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
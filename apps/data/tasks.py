@@ -2,13 +2,15 @@
 Celery tasks for automated data fetching and processing
 
 Schedule these tasks with Celery Beat for continuous data updates
+
+Every worker imports this module (task autodiscovery), so the Trendlyne
+provider (selenium), the CSV importers (pandas) and the forecaster index
+(pyarrow) are imported inside the tasks that use them.
 """
 
 from celery import shared_task
 from django.utils import timezone
 
-from .providers.trendlyne import get_all_trendlyne_data
-from .importers import TrendlyneDataImporter, ContractStockDataImporter
 from .broker_integration import ScheduledDataUpdater, MarketDataUpdater
 from .signals import SignalGenerator
 
@@ -39,6 +41,8 @@ def fetch_trendlyne_data(self):
     })
 
     try:
+        from .providers.trendlyne import get_all_trendlyne_data
+
         logger.step('fetching', "Calling Trendlyne API to fetch all data")
         success = get_all_trendlyne_data()
 
@@ -75,6 +79,9 @@ def import_trendlyne_data(self):
     logger.start("Starting Trendlyne data import from CSV files")
 
     try:
+        from .importers import TrendlyneDataImporter, ContractStockDataImporter
+        from .services.forecaster_index import get_forecaster_index
+
         importer = TrendlyneDataImporter()
         stock_importer = ContractStockDataImporter()
 
@@ -106,6 +113,12 @@ def import_trendlyne_data(self):
                    f"Forecaster data import complete",
                    context={'files_imported': len(forecaster_results)})
 
+        # Re-index the screener CSVs (deep dives look symbols up in the index)
+        forecaster_index = get_forecaster_index().rebuild()
+        logger.info('forecaster_index_complete',
+                   f"Forecaster index rebuilt",
+                   context={'symbols': forecaster_index['symbols'], 'rows': forecaster_index['rows']})
+
         logger.success("All Trendlyne data imported successfully", context={
             'market_snapshot_count': market_result.get('updated', 0),
             'fno_contracts_count': fno_result.get('updated', 0),
@@ -225,6 +238,119 @@ def update_post_market_data(self):
         return {"status": "error", "error": str(e)}
 
 
+@shared_task(name='apps.data.tasks.refresh_trading_calendar', bind=True)
+def refresh_trading_calendar(self):
+    """
+    Rebuild the trading calendar (Daily 8:15 AM, after SecurityMaster update)
+
+    Refreshes:
+    - Market holidays
+    - Listed expiries (SecurityMaster + NSE)
+    """
+    from apps.core.services.trading_calendar import refresh_trading_calendar as rebuild_calendar
+
+    logger = TaskLogger(
+        task_name='refresh_trading_calendar',
+        task_category='data',
+        task_id=self.request.id
+    )
+
+    logger.start("Refreshing trading calendar")
+
+    try:
+        calendar = rebuild_calendar(fetch_nse=True)
+
+        logger.success("Trading calendar refreshed", context={
+            'built_for': calendar.built_for.isoformat(),
+            'holidays': len(calendar.holidays),
+            'listed_underlyings': sorted(calendar.listed_expiries),
+        })
+
+        return {
+            "status": "success",
+            "next_nifty_expiry": calendar.next_expiry('NIFTY').isoformat(),
+            "timestamp": timezone.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.failure("Error refreshing trading calendar", error=e)
+        return {"status": "error", "error": str(e)}
+
+
+@shared_task(name='apps.data.tasks.compact_option_chain_store', bind=True)
+def compact_option_chain_store(self, include_today: bool = True):
+    """
+    Compact option-chain snapshot files (Mon-Fri 3:45 PM, after market close)
+
+    Merges each finished day's per-snapshot files into one compressed file.
+    """
+    from datetime import timedelta
+    from apps.data.services.option_chain_store import get_option_chain_store
+
+    logger = TaskLogger(
+        task_name='compact_option_chain_store',
+        task_category='data',
+        task_id=self.request.id
+    )
+
+    logger.start("Compacting option chain history store")
+
+    try:
+        before = timezone.localdate() + timedelta(days=1 if include_today else 0)
+        store = get_option_chain_store()
+        days = store.compact_all(before=before)
+
+        logger.success(f"Compacted {days} option chain days", context={
+            'before': before.isoformat(),
+            'store': store.stats(),
+        })
+
+        return {
+            "status": "success",
+            "days_compacted": days,
+            "timestamp": timezone.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.failure("Error compacting option chain store", error=e)
+        return {"status": "error", "error": str(e)}
+
+
+@shared_task(name='apps.data.tasks.refresh_sector_performance', bind=True)
+def refresh_sector_performance(self):
+    """
+    Recompute sector returns, breadth and relative strength (Daily 9:05 AM, after Trendlyne import)
+
+    Rebuilds the SectorPerformance table read by the sector filter.
+    """
+    from apps.data.services.sector_performance import refresh_sector_performance as refresh_sectors
+
+    logger = TaskLogger(
+        task_name='refresh_sector_performance',
+        task_category='data',
+        task_id=self.request.id
+    )
+
+    logger.start("Refreshing sector performance")
+
+    try:
+        metrics = refresh_sectors()
+
+        logger.success(f"Sector performance refreshed for {len(metrics)} sectors", context={
+            'sources': sorted({item.source for item in metrics.values()}),
+        })
+
+        return {
+            "status": "success",
+            "sectors": len(metrics),
+            "timestamp": timezone.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.failure("Error refreshing sector performance", error=e)
+        return {"status": "error", "error": str(e)}
+
+
 @shared_task(name='generate_daily_signals', bind=True)
 def generate_daily_signals(self, min_confidence: float = 70):
     """
@@ -0,0 +1,709 @@
+"""
+Data App Tests - Market Data Updater
+
+Tests for:
+1. Rate-limited, retried Breeze calls
+2. Concurrent per-symbol fan-out
+3. Batched ContractData / TLStockData upserts
+4. Option-chain history store (append, compaction, time x strike reads)
+5. Forecaster index (NSE code lookups, snapshot, reload on change)
+6. Sector performance (refresh, Trendlyne fallback, cached lookups, sector filter)
+7. Trendlyne HTTP downloader (local stub, cookie reuse, browser fallback, record / replay)
+8. Trendlyne export cache (Parquet conversion once per content hash, typed / pruned columns, loaders)
+9. ContractData expiry dates (string formats, data migration)
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.brokers.models import HistoricalPrice
+from apps.core.utils.rate_limiter import TokenBucket
+from apps.data.broker_integration import BreezeDataFetcher, MarketDataUpdater
+from apps.data.models import ContractData, OptionChainPartition, SectorPerformance, TLStockData
+from apps.data.providers.trendlyne_http import (
+    FNO_PAGE_PATH, FORECASTER_SCREENERS, SNAPSHOT_EXPORT_PATHS, TrendlyneDownloader, read_header,
+)
+from apps.data.providers.trendlyne_stub import StubResponse, TrendlyneStub
+from apps.data.services.forecaster_index import ForecasterIndex
+from apps.data.services.option_chain_store import OptionChainStore, archive_option_chain
+from apps.data.services.sector_performance import get_sector_cache, refresh_sector_performance, record_fixture
+
+
+class FakeBreeze:
+    """Breeze client double returning canned quotes and option chains"""
+
+    def __init__(self, delay=0.0, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})  # symbol -> number of transient failures
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _enter(self, symbol):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            if self.failures.get(symbol):
+                self.failures[symbol] -= 1
+                return False
+        return True
+
+    def get_quotes(self, stock_code, product_type, **kwargs):
+        if not self._enter(stock_code):
+            return {'Success': None, 'Status': 503, 'Error': 'Service unavailable'}
+        return {'Success': [{'ltp': 100.5, 'volume': 1000, 'open_interest': 5000, 'high': 101, 'low': 99}]}
+
+    def get_option_chain_quotes(self, stock_code, expiry_date, **kwargs):
+        if not self._enter(stock_code):
+            return {'Success': None, 'Status': 500, 'Error': 'Internal error'}
+        return {'Success': [
+            {'strike_price': strike, 'right': right, 'ltp': 10, 'open_interest': 100, 'iv': 15}
+            for strike in (100, 110) for right in ('Call', 'Put')
+        ]}
+
+
+def make_updater(breeze, max_workers=4):
+    fetcher = BreezeDataFetcher.__new__(BreezeDataFetcher)
+    fetcher.breeze = breeze
+    fetcher.rate_limiter = TokenBucket(rate=1000)
+    fetcher.retries = 2
+    fetcher.retry_delay = 0
+
+    updater = MarketDataUpdater.__new__(MarketDataUpdater)
+    updater.broker = 'breeze'
+    updater.fetcher = fetcher
+    updater.max_workers = max_workers
+    updater.upsert_batch_size = 3
+    return updater
+
+
+class BreezeFetcherTests(TestCase):
+    """Test rate limited, retried broker calls"""
+
+    def test_transient_failure_is_retried(self):
+        breeze = FakeBreeze(failures={'TCS': 2})
+        updater = make_updater(breeze)
+
+        quote = updater.fetcher.fetch_stock_quote('TCS')
+
+        self.assertEqual(quote['current_price'], 100.5)
+        self.assertEqual(breeze.calls, 3)
+
+    def test_gives_up_after_retries(self):
+        breeze = FakeBreeze(failures={'TCS': 5})
+        updater = make_updater(breeze)
+
+        self.assertIsNone(updater.fetcher.fetch_stock_quote('TCS'))
+        self.assertEqual(breeze.calls, 3)
+
+    def test_calls_wait_for_rate_limiter(self):
+        breeze = FakeBreeze()
+        updater = make_updater(breeze)
+        updater.fetcher.rate_limiter = TokenBucket(rate=20, capacity=1)
+
+        started = time.monotonic()
+        for _ in range(5):
+            updater.fetcher.fetch_stock_quote('TCS')
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+
+
+class MarketDataUpdaterTests(TestCase):
+    """Test concurrent fan-out and batched upserts"""
+
+    def test_fno_universe_fetched_concurrently(self):
+        breeze = FakeBreeze(delay=0.05)
+        updater = make_updater(breeze, max_workers=4)
+
+        stats = updater.update_fno_universe(['NIFTY', 'TCS', 'INFY', 'SBIN'], '28-OCT-2025')
+
+        self.assertGreater(breeze.max_active, 1)
+        self.assertEqual(stats['futures_updated'], 4)
+        self.assertEqual(stats['options_updated'], 16)
+        self.assertEqual(stats['failed'], 0)
+        self.assertIn('p95_ms', stats['latency'])
+        self.assertIn('cycle_seconds', stats)
+        self.assertEqual(ContractData.objects.count(), 20)
+
+    def test_upserts_update_existing_contracts(self):
+        ContractData.objects.create(symbol='TCS', expiry='28-OCT-2025', option_type='FUT',
+                                    strike_price=0, price=1)
+        updater = make_updater(FakeBreeze())
+
+        updater.update_fno_universe(['TCS'], '28-OCT-2025')
+        updater.update_fno_universe(['TCS'], '28-OCT-2025')
+
+        self.assertEqual(ContractData.objects.count(), 5)
+        self.assertEqual(ContractData.objects.get(option_type='FUT').price, 100.5)
+
+    def test_stock_universe_counts_failures(self):
+        updater = make_updater(FakeBreeze(failures={'INFY': 5}))
+
+        stats = updater.update_stock_universe(['TCS', 'INFY'])
+
+        self.assertEqual((stats['updated'], stats['failed']), (1, 1))
+        self.assertEqual(TLStockData.objects.get(nsecode='TCS').current_price, 100.5)
+
+    def test_failed_write_is_counted_and_the_cycle_continues(self):
+        from apps.data.broker_integration import upsert_stock_quotes
+
+        updater = make_updater(FakeBreeze(), max_workers=1)
+        updater.upsert_batch_size = 1
+        batches = []
+
+        def write(quotes):
+            batches.append([quote['symbol'] for quote in quotes])
+            if len(batches) == 2:
+                raise OperationalError('database is locked')
+            return upsert_stock_quotes(quotes)
+
+        with mock.patch('apps.data.broker_integration.upsert_stock_quotes', side_effect=write):
+            stats = updater.update_stock_universe(['TCS', 'INFY', 'SBIN'])
+
+        self.assertEqual(len(batches), 3)
+        self.assertEqual((stats['updated'], stats['failed']), (2, 1))
+        written = set(TLStockData.objects.values_list('nsecode', flat=True))
+        self.assertEqual(written, {'TCS', 'INFY', 'SBIN'} - set(batches[1]))
+
+
+class OptionChainStoreTests(TestCase):
+    """Test the partitioned option-chain history store"""
+
+    EXPIRY = date(2025, 1, 30)
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = OptionChainStore(root=self.root, compression='zstd')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def chain(self, step, strikes=(23900, 24000, 24100)):
+        rows = []
+        for strike in strikes:
+            rows.append({'strike': strike, 'option_type': 'CE', 'ltp': 100 + step, 'oi': 1000 * step + strike})
+            rows.append({'strike': strike, 'option_type': 'put', 'ltp': 50 - step, 'oi': 500 * step})
+        return rows
+
+    def append_day(self, day, snapshots=3):
+        start = datetime(day.year, day.month, day.day, 4, 0, tzinfo=dt_timezone.utc)
+        for step in range(snapshots):
+            self.store.append_snapshot('nifty', self.EXPIRY, self.chain(step), start + timedelta(minutes=5 * step),
+                                       spot_price=24000 + step)
+
+    def test_snapshots_are_catalogued_one_file_each(self):
+        self.append_day(date(2025, 1, 27))
+
+        partitions = OptionChainPartition.objects.filter(underlying='NIFTY')
+        self.assertEqual(partitions.count(), 3)
+        self.assertTrue(all(p.rows == 6 and not p.is_compacted for p in partitions))
+        self.assertIn('NIFTY/expiry=2025-01-30/date=2025-01-27/', partitions[0].path)
+
+    def test_history_grid_by_time_and_strike(self):
+        self.append_day(date(2025, 1, 27))
+        self.store.append_snapshot('NIFTY', self.EXPIRY, self.chain(3, strikes=(24000, 24200)),
+                                   datetime(2025, 1, 27, 5, 0, tzinfo=dt_timezone.utc))
+
+        history = self.store.read_history('NIFTY', self.EXPIRY, option_type='CE', fields=('ltp', 'oi'))
+
+        self.assertEqual(history.values['oi'].shape, (4, 4))
+        self.assertEqual(list(history.strikes), [23900, 24000, 24100, 24200])
+        self.assertEqual(list(history.values['ltp'][:, 1]), [100, 101, 102, 103])
+        self.assertTrue(np.isnan(history.values['oi'][0, 3]))
+        self.assertTrue(np.isnan(history.values['oi'][3, 0]))
+        self.assertEqual(list(history.spot[:3]), [24000, 24001, 24002])
+        self.assertEqual(history.change('oi')[1, 0], 1000)
+        self.assertEqual(history.at(datetime(2025, 1, 27, 4, 7, tzinfo=dt_timezone.utc))['ltp'][0], 101)
+
+    def test_compaction_merges_day_and_keeps_data(self):
+        self.append_day(date(2025, 1, 27))
+        self.append_day(date(2025, 1, 28), snapshots=2)
+        before = self.store.read_history('NIFTY', self.EXPIRY, option_type='PE')
+
+        self.assertEqual(self.store.compact_all(before=date(2025, 1, 28)), 1)
+        self.assertEqual(self.store.compact_all(before=date(2025, 1, 28)), 0)
+
+        compacted = OptionChainPartition.objects.get(trade_date=date(2025, 1, 27))
+        self.assertTrue(compacted.is_compacted)
+        self.assertEqual((compacted.snapshots, compacted.rows), (3, 18))
+        self.assertEqual(OptionChainPartition.objects.filter(trade_date=date(2025, 1, 28)).count(), 2)
+        self.assertEqual(len(list((self.store.root / compacted.path).parent.iterdir())), 1)
+
+        after = self.store.read_history('NIFTY', self.EXPIRY, option_type='PE')
+        np.testing.assert_array_equal(before.times, after.times)
+        np.testing.assert_array_equal(before.values['ltp'], after.values['ltp'])
+
+    def test_time_window_read(self):
+        self.append_day(date(2025, 1, 27))
+        self.append_day(date(2025, 1, 28))
+
+        table = self.store.read_table(
+            'NIFTY', self.EXPIRY,
+            start=datetime(2025, 1, 28, 4, 5, tzinfo=dt_timezone.utc),
+            end=datetime(2025, 1, 28, 4, 10, tzinfo=dt_timezone.utc),
+            columns=['snapshot_time', 'strike', 'ltp'],
+        )
+
+        self.assertEqual(table.num_rows, 12)
+        self.assertEqual(table.column_names, ['snapshot_time', 'strike', 'ltp'])
+
+    @override_settings(OPTION_CHAIN_STORE_ENABLED=False)
+    def test_archive_is_a_no_op_when_disabled(self):
+        self.assertIsNone(archive_option_chain('NIFTY', self.EXPIRY, self.chain(0)))
+        self.assertFalse(OptionChainPartition.objects.exists())
+
+
+class ForecasterIndexTests(TestCase):
+    """Test the forecaster screener index"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.snapshot = os.path.join(self.root, 'index', 'forecaster.arrow')
+        TLStockData.objects.create(stock_name='Tata Consultancy Services Ltd.', nsecode='TCS')
+        TLStockData.objects.create(stock_name='Reliance Industries Ltd.', nsecode='RELIANCE')
+        self.write('trendlyne_High_Bullishness.csv',
+                   'Stock,Bullishness\nTata Consultancy Services Ltd.,80\nRELIANCE,75\nUnlisted Co,60\n')
+        self.write('trendlyne_Beat_Quarter_EPS_Estimates.csv',
+                   'Stock,NSE Code,Surprise %\nTCS Limited,TCS,4.5\n')
+
+    def write(self, filename, content):
+        with open(os.path.join(self.root, filename), 'w') as f:
+            f.write(content)
+
+    def index(self):
+        return ForecasterIndex(directory=self.root, snapshot_path=self.snapshot, check_interval=0)
+
+    def test_lookup_by_exact_nse_code(self):
+        data = self.index().lookup('tcs')
+
+        self.assertEqual(data['bullish_sentiment']['trendlyne_High_Bullishness.csv']['Bullishness'], 80)
+        self.assertEqual(data['earnings_surprises']['trendlyne_Beat_Quarter_EPS_Estimates.csv']['Surprise %'], 4.5)
+        self.assertEqual(data['growth_estimates'], {})
+        # Name or code matched exactly, not as a substring
+        self.assertIn('trendlyne_High_Bullishness.csv', self.index().lookup('RELIANCE')['bullish_sentiment'])
+        self.assertEqual(self.index().lookup('TC')['bullish_sentiment'], {})
+
+    def test_snapshot_is_used_by_a_new_process(self):
+        first = self.index()
+        self.assertEqual(first.stats()['source'], 'csv')
+        self.assertTrue(os.path.exists(self.snapshot))
+
+        second = self.index()
+        self.assertEqual(second.stats()['source'], 'snapshot')
+        self.assertEqual(second.lookup('TCS'), first.lookup('TCS'))
+        self.assertEqual(second.stats()['unmatched_rows'], 1)
+
+    def test_reloads_when_a_file_changes(self):
+        index = self.index()
+        self.assertIsNone(index.get_row('INFY', 'trendlyne_High_Bullishness.csv'))
+
+        self.write('trendlyne_High_Bullishness.csv', 'Stock,Bullishness\nINFY,90\n')
+        os.utime(os.path.join(self.root, 'trendlyne_High_Bullishness.csv'), ns=(1, 1))
+
+        self.assertEqual(index.get_row('INFY', 'trendlyne_High_Bullishness.csv')['Bullishness'], 90)
+        self.assertEqual(index.lookup('RELIANCE')['bullish_sentiment'], {})
+        self.assertEqual(self.index().stats()['source'], 'snapshot')
+
+
+class SectorPerformanceTests(TestCase):
+    """Sector returns computed once per refresh and served from the cache"""
+
+    def setUp(self):
+        get_sector_cache().clear()
+        self.addCleanup(get_sector_cache().clear)
+        self.as_of = timezone.now()
+
+        TLStockData.objects.create(stock_name='TCS Ltd.', nsecode='TCS', sector_name='Software & Services',
+                                   market_capitalization=1000)
+        TLStockData.objects.create(stock_name='Infosys Ltd.', nsecode='INFY', sector_name='Software & Services',
+                                   market_capitalization=500)
+        # No price history: falls back to Trendlyne change %
+        TLStockData.objects.create(stock_name='HDFC Bank Ltd.', nsecode='HDFCBANK', sector_name='Banking Services',
+                                   market_capitalization=800, day_change_pct=0.5, week_change_pct=-2.0,
+                                   month_change_pct=-3.0)
+
+        self.closes = {
+            'TCS': [100 + i for i in range(25)],
+            'INFY': [200 - 0.5 * i for i in range(25)],
+            'NIFTY': [100 + 0.2 * i for i in range(25)],
+        }
+        HistoricalPrice.objects.bulk_create([
+            HistoricalPrice(stock_code=code, exchange_code='NSE', product_type='cash',
+                            datetime=self.as_of - timedelta(days=24 - i),
+                            open=close, high=close, low=close, close=close)
+            for code, closes in self.closes.items() for i, close in enumerate(closes)
+        ])
+
+    def change(self, code, days):
+        closes = self.closes[code]
+        return (closes[-1] / closes[-1 - days] - 1) * 100
+
+    def test_refresh_from_historical_prices(self):
+        metrics = refresh_sector_performance(as_of=self.as_of)
+
+        software = metrics['Software & Services']
+        expected_21d = (1000 * self.change('TCS', 21) + 500 * self.change('INFY', 21)) / 1500
+        self.assertAlmostEqual(software.returns[21], expected_21d, places=3)
+        self.assertAlmostEqual(software.relative_strength, expected_21d - self.change('NIFTY', 21), places=3)
+        self.assertEqual((software.advancers, software.decliners, software.breadth_pct), (1, 1, 50.0))
+        self.assertEqual((software.sector_index, software.source), ('CNXIT', 'HISTORICAL'))
+
+        banking = metrics['Banking Services']
+        self.assertEqual(banking.source, 'TRENDLYNE')
+        self.assertEqual((banking.returns[1], banking.returns[3], banking.returns[7]), (0.5, None, -2.0))
+        self.assertEqual(banking.decliners, 1)
+        self.assertEqual(SectorPerformance.objects.count(), 2)
+
+    def test_lookups_do_not_query_once_loaded(self):
+        refresh_sector_performance(as_of=self.as_of)
+        cache = get_sector_cache()
+        cache.refresh()
+
+        with self.assertNumQueries(0):
+            for _ in range(100):
+                self.assertEqual(cache.sector_for('tcs'), 'Software & Services')
+                self.assertEqual(cache.metrics_for_symbol('HDFCBANK').sector, 'Banking Services')
+                self.assertEqual(cache.metrics('CNXIT').sector, 'Software & Services')
+                self.assertIsNone(cache.sector_for('UNLISTED'))
+
+    def test_sector_filter_reads_the_cache(self):
+        from apps.strategies.filters.sector_filter import analyze_sector, get_strong_sectors
+
+        refresh_sector_performance(as_of=self.as_of)
+        get_sector_cache().refresh()
+
+        with self.assertNumQueries(0):
+            verdict = analyze_sector('TCS')
+            self.assertEqual(verdict['verdict'], 'STRONG_BULLISH')
+            self.assertTrue(verdict['allow_long'])
+            self.assertEqual(verdict['sector_index'], 'CNXIT')
+            # Trendlyne-only sector: the 1-session return stands in for the 3-session one
+            banking = analyze_sector('HDFCBANK')
+            self.assertEqual((banking['verdict'], banking['short_term_days']), ('MIXED', 1))
+            self.assertIn('1D: bullish', banking['reason'])
+            # No data for an unknown symbol
+            self.assertEqual(analyze_sector('UNLISTED')['verdict'], 'NO_DATA')
+            self.assertFalse(analyze_sector('UNLISTED')['allow_short'])
+            self.assertEqual([item['sector'] for item in get_strong_sectors()], ['Software & Services'])
+
+    def test_sector_filter_on_trendlyne_only_universe(self):
+        from apps.strategies.filters.sector_filter import analyze_sector, get_strong_sectors, get_weak_sectors
+
+        HistoricalPrice.objects.all().delete()
+        TLStockData.objects.create(stock_name='Axis Bank Ltd.', nsecode='AXISBANK', sector_name='Banking Services',
+                                   market_capitalization=400, day_change_pct=-0.8, week_change_pct=-1.5,
+                                   month_change_pct=-4.0)
+        TLStockData.objects.filter(nsecode='HDFCBANK').update(day_change_pct=-0.5)
+        TLStockData.objects.filter(nsecode='TCS').update(day_change_pct=1.2, week_change_pct=2.5,
+                                                         month_change_pct=6.0)
+        TLStockData.objects.filter(nsecode='INFY').update(day_change_pct=0.4, week_change_pct=1.0,
+                                                          month_change_pct=3.0)
+        refresh_sector_performance(as_of=self.as_of)
+        get_sector_cache().refresh()
+
+        banking = analyze_sector('AXISBANK')
+        self.assertEqual(banking['verdict'], 'STRONG_BEARISH')
+        self.assertEqual((banking['allow_long'], banking['allow_short']), (False, True))
+        self.assertEqual(banking['short_term_days'], 1)
+        self.assertAlmostEqual(float(banking['performance']['3d']), (800 * -0.5 + 400 * -0.8) / 1200, places=2)
+
+        software = analyze_sector('TCS')
+        self.assertEqual((software['verdict'], software['allow_long']), ('STRONG_BULLISH', True))
+        self.assertIn('1D: +', software['reason'])
+
+        self.assertEqual([item['sector'] for item in get_strong_sectors()], ['Software & Services'])
+        self.assertEqual([item['sector'] for item in get_weak_sectors()], ['Banking Services'])
+
+    def test_fixture_round_trip(self):
+        path = os.path.join(tempfile.mkdtemp(), 'sectors.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path), ignore_errors=True)
+        live = refresh_sector_performance(as_of=self.as_of)
+        record_fixture(path, as_of=self.as_of)
+
+        HistoricalPrice.objects.all().delete()
+        TLStockData.objects.all().delete()
+        offline = refresh_sector_performance(fixture=path)
+
+        self.assertEqual(offline['Software & Services'].source, 'FIXTURE')
+        self.assertEqual(offline['Software & Services'].returns, live['Software & Services'].returns)
+        self.assertEqual(offline['Banking Services'].returns, live['Banking Services'].returns)
+
+
+def _xlsx(rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class FakeBrowserPool:
+    """Browser fallback double recording what it was asked to do"""
+
+    def __init__(self, page=''):
+        self.page = page
+        self.pages = []
+        self.downloads = []
+
+    def fetch_page(self, url):
+        self.pages.append(url)
+        return self.page
+
+    def download(self, kind, download_dir):
+        self.downloads.append(kind)
+        return {'success': False, 'error': 'no browser in tests'}
+
+    def cookies(self):
+        return []
+
+
+class TrendlyneDownloaderTests(TestCase):
+    """HTTP downloads against the local stub, browser only as fallback"""
+
+    SCREENER = (
+        '<html><body><table class="trendlyne-screener-table"><thead><tr><th>Stock</th><th>Bullishness</th></tr>'
+        '</thead><tbody><tr><td>TCS</td><td>80</td></tr><tr><td>INFY</td><td>75</td></tr></tbody></table>'
+        '</body></html>'
+    )
+    JS_SCREENER = 'Highest Dividend Yield'  # Rendered by JavaScript: no table in the HTML
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.stub = TrendlyneStub(self.responses(), username='trader', password='secret').start()
+        self.addCleanup(self.stub.stop)
+        self.browser = FakeBrowserPool(page=self.SCREENER)
+
+    def responses(self, snapshot=True):
+        xlsx = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        responses = {
+            FNO_PAGE_PATH: StubResponse(b'<html><a href="/futures-options/export/contracts/">Download</a></html>'),
+            '/futures-options/export/contracts/': StubResponse(
+                _xlsx([['SYMBOL', 'OPTION TYPE', 'STRIKE PRICE'], ['NIFTY', 'CE', 25000]]), xlsx,
+                filename='contracts.xlsx'),
+            SNAPSHOT_EXPORT_PATHS[0]: StubResponse(
+                _xlsx([['Stock Name', 'NSEcode', 'Current Price'], ['TCS Ltd.', 'TCS', 4100]]), xlsx,
+                filename='Stocks-data-IND-18-Oct-2026.xlsx') if snapshot else StubResponse(b'<html>Upgrade</html>'),
+        }
+        for label, path in FORECASTER_SCREENERS.items():
+            page = '<html><div id="app"></div></html>' if label == self.JS_SCREENER else self.SCREENER
+            responses[path] = StubResponse(page.encode())
+        return responses
+
+    def downloader(self, base_url=None, **kwargs):
+        kwargs.setdefault('browser_pool', self.browser)
+        return TrendlyneDownloader(
+            download_dir=os.path.join(self.root, 'tldata'),
+            base_url=base_url or self.stub.base_url,
+            cookie_path=os.path.join(self.root, 'cookies.json'),
+            credentials=('trader', 'secret'),
+            **kwargs,
+        )
+
+    def test_fetch_all_over_http(self):
+        result = self.downloader().fetch_all()
+
+        self.assertTrue(result['success'])
+        self.assertEqual((result['auth'], self.stub.logins), ('login', 1))
+        fno, snapshot = result['results']['fno'], result['results']['market_snapshot']
+        self.assertTrue(fno['filename'].startswith('fno_data_'))
+        self.assertEqual(read_header(fno['path'])[:2], ['SYMBOL', 'OPTION TYPE'])
+        self.assertEqual(snapshot['filename'], 'Stocks-data-IND-18-Oct-2026.xlsx')
+        self.assertEqual(snapshot['columns'][:2], ['Stock Name', 'NSEcode'])
+
+        screeners = result['results']['forecaster']
+        self.assertTrue(all(r['success'] for r in screeners.values()))
+        self.assertEqual(screeners['High Bullishness']['rows'], 2)
+        # Only the JavaScript page went to the browser
+        self.assertEqual([label for label, r in screeners.items() if r['via'] == 'browser'], [self.JS_SCREENER])
+        self.assertEqual(len(self.browser.pages), 1)
+        self.assertEqual(self.browser.downloads, [])
+        with open(os.path.join(self.root, 'tldata', 'forecaster', 'trendlyne_High_Bullishness.csv')) as f:
+            self.assertEqual(f.read().splitlines(), ['Stock,Bullishness', 'TCS,80', 'INFY,75'])
+
+    def test_saved_cookies_are_reused(self):
+        self.assertEqual(self.downloader().ensure_session(), 'login')
+        self.assertEqual(self.downloader().ensure_session(), 'cookies')
+        self.assertEqual(self.stub.logins, 1)
+        # A live login: owner-only, and outside the checkout by default
+        self.assertEqual(os.stat(os.path.join(self.root, 'cookies.json')).st_mode & 0o777, 0o600)
+        self.assertNotIn(str(settings.BASE_DIR), str(settings.TRENDLYNE_COOKIE_PATH))
+
+        self.stub.expire_sessions()
+        self.assertEqual(self.downloader().ensure_session(), 'login')
+        self.assertEqual(self.stub.logins, 2)
+
+    def test_export_page_instead_of_file_falls_back_to_browser(self):
+        self.stub.responses = self.responses(snapshot=False)
+
+        downloader = self.downloader()
+        downloader.ensure_session()
+        result = downloader.fetch_market_snapshot()
+        self.assertEqual((result['success'], result['via']), (False, 'browser'))
+        self.assertEqual(self.browser.downloads, ['market_snapshot'])
+
+        downloader = self.downloader(browser_fallback=False)
+        downloader.ensure_session()
+        result = downloader.fetch_market_snapshot()
+        self.assertEqual((result['success'], result['via']), (False, 'http'))
+        self.assertEqual(self.browser.downloads, ['market_snapshot'])
+
+    def test_recorded_responses_replay_offline(self):
+        recording = os.path.join(self.root, 'recording')
+        live = self.downloader(record_dir=recording).fetch_all()
+
+        with TrendlyneStub.from_recording(recording) as replay:
+            shutil.rmtree(os.path.join(self.root, 'tldata'))
+            os.remove(os.path.join(self.root, 'cookies.json'))
+            offline = self.downloader(base_url=replay.base_url).fetch_all()
+
+        self.assertTrue(offline['results']['market_snapshot']['success'])
+        self.assertEqual(offline['results']['market_snapshot']['columns'], live['results']['market_snapshot']['columns'])
+        self.assertEqual(offline['results']['forecaster']['High Bearishness']['rows'], 2)
+        self.assertTrue(offline['results']['fno']['success'])
+
+
+class TrendlyneExportCacheTests(TestCase):
+    """Parquet conversion of the Trendlyne exports, once per content"""
+
+    FNO_HEADER = ['SYMBOL', 'OPTION TYPE', 'STRIKE PRICE', 'PRICE', 'EXPIRY', 'LAST UPDATED', 'BUILD UP',
+                  'LOT SIZE', 'OI', 'IV', 'NOT A FIELD']
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        override = override_settings(TRENDLYNE_PARQUET_DIR=os.path.join(self.root, 'parquet'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write(self, name, rows):
+        path = os.path.join(self.root, name)
+        with open(path, 'wb') as f:
+            f.write(_xlsx(rows))
+        return path
+
+    def fno_file(self, name='fno_data_2025-11-14.xlsx', oi=1200000):
+        return self.write(name, [
+            self.FNO_HEADER,
+            ['RELIANCE', 'CE', 1500, 42.5, datetime(2025, 11, 27), datetime(2025, 11, 14, 15, 30), 'Long Build Up',
+             500, oi, 18.2, 'x'],
+            ['TCS', 'FUT', '-', '4100.5', '27-Nov-2025', None, None, '175', 'Export NA', float('inf'), 'y'],
+            [None] * len(self.FNO_HEADER),
+        ])
+
+    def test_converts_once_per_content_with_pruned_typed_columns(self):
+        from apps.data.services import trendlyne_parquet
+
+        path = self.fno_file()
+        export = trendlyne_parquet.convert_export(path)
+        self.assertEqual((export.kind, export.rows, export.cached), ('fno', 2, False))
+        self.assertNotIn('NOT A FIELD', export.columns)
+        self.assertEqual(export.header, self.FNO_HEADER)
+
+        table = export.read()
+        self.assertEqual(str(table.schema.field('oi').type), 'int64')
+        self.assertEqual(str(table.schema.field('price').type), 'double')
+        self.assertEqual(str(table.schema.field('expiry').type), 'date32[day]')
+        self.assertEqual(table.column('expiry').to_pylist(), [date(2025, 11, 27), date(2025, 11, 27)])
+        self.assertEqual(table.column('oi').to_pylist(), [1200000, None])
+        self.assertEqual(table.column('iv').to_pylist(), [18.2, None])
+        self.assertEqual(table.column('strike_price').to_pylist(), [1500.0, None])
+        self.assertEqual(table.column('last_updated').to_pylist(), ['2025-11-14 15:30:00', None])
+
+        # Same content under another name: no second parse
+        copy = os.path.join(self.root, 'copy.xlsx')
+        shutil.copyfile(path, copy)
+        with mock.patch.object(trendlyne_parquet, '_convert', side_effect=AssertionError):
+            again = trendlyne_parquet.convert_export(copy)
+        self.assertTrue(again.cached)
+        self.assertEqual((again.path, again.header), (export.path, self.FNO_HEADER))
+
+        changed = trendlyne_parquet.convert_export(self.fno_file('fno_data_2025-11-15.xlsx', oi=1300000))
+        self.assertFalse(changed.cached)
+        self.assertNotEqual(changed.path, export.path)
+
+        columns = trendlyne_parquet.read_export(export.path, columns=['symbol', 'oi', 'delta'])
+        self.assertEqual(columns.column_names, ['symbol', 'oi'])
+
+    def test_stale_schema_is_converted_again(self):
+        from apps.data.services import trendlyne_parquet
+
+        path = self.fno_file()
+        first = trendlyne_parquet.convert_export(path)
+        with mock.patch.object(trendlyne_parquet, 'schema_fingerprint', return_value='older'):
+            self.assertFalse(trendlyne_parquet.convert_export(path).cached)
+        self.assertTrue(os.path.exists(first.path))
+
+    def test_fetcher_loads_models_from_conversion(self):
+        from apps.data.services.trendlyne_fetcher import TrendlyneDataFetcher
+
+        fetcher = TrendlyneDataFetcher()
+        self.assertEqual(fetcher._parse_and_save_fno_data(self.fno_file()), 2)
+        tcs = ContractData.objects.get(symbol='TCS')
+        self.assertEqual((tcs.expiry, tcs.lot_size, tcs.oi, tcs.build_up), (date(2025, 11, 27), 175, None, ''))
+
+        snapshot = self.write('Stocks-data-IND-14-Nov-2025.xlsx', [
+            ['Stock Name', 'NSEcode', 'BSEcode', 'Current Price', 'Market Capitalization', 'Day RSI', 'Unmapped'],
+            ['Reliance Industries', 'RELIANCE', 500325, 1500.5, 2030000.0, '-', 1],
+            [None, None, None, 10, 1, 1, 1],
+        ])
+        self.assertEqual(fetcher._parse_and_save_stock_data(snapshot), 1)
+        stock = TLStockData.objects.get(nsecode='RELIANCE')
+        self.assertEqual((stock.bsecode, stock.market_capitalization, stock.day_rsi), ('500325', 2030000, None))
+
+        # An F&O file is refused as a market snapshot
+        self.assertEqual(fetcher._parse_and_save_stock_data(self.fno_file()), 0)
+        self.assertEqual(TLStockData.objects.count(), 1)
+
+
+class ContractExpiryTests(TestCase):
+    """ContractData.expiry is a date that still accepts the export and broker formats"""
+
+    def test_strings_are_parsed_on_assignment_and_in_filters(self):
+        contract = ContractData.objects.create(symbol='TCS', option_type='FUTURE', expiry='28-OCT-2025')
+
+        self.assertEqual(contract.expiry, date(2025, 10, 28))
+        self.assertEqual(ContractData.objects.filter(expiry='28-Oct-2025').count(), 1)
+        self.assertEqual(ContractData.objects.filter(expiry__gte='2025-10-01').count(), 1)
+
+    def test_data_migration_updates_each_distinct_expiry_once(self):
+        import importlib
+
+        from django.db import connection
+        from django.db.migrations.loader import MigrationLoader
+        from django.test.utils import CaptureQueriesContext
+
+        migration = importlib.import_module('apps.data.migrations.0010_contractdata_expiry_date')
+        with override_settings(MIGRATION_MODULES={}):  # The test run may disable migrations
+            state = MigrationLoader(connection).project_state(('data', '0009_sector_performance'))
+        for symbol, strike, expiry in (('TCS', 1, '2025-11-27'), ('TCS', 2, '2025-11-27'),
+                                       ('INFY', 1, '2025-11-27'), ('INFY', 2, '2025-12-30')):
+            ContractData.objects.create(symbol=symbol, option_type='CE', strike_price=strike, expiry=expiry)
+
+        # The test table's column is already a date, so values come back decoded; every one is rewritten
+        with mock.patch.object(migration, '_iso', side_effect=lambda raw: str(raw)), \
+                CaptureQueriesContext(connection) as queries:
+            migration.expiries_to_iso(state.apps, None)
+
+        self.assertEqual(queries[0]['sql'], 'SELECT DISTINCT "contract_data"."expiry" FROM "contract_data"')
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE')]), 2)  # Per expiry, not per row
+        self.assertEqual(ContractData.objects.count(), 4)
@@ -0,0 +1,201 @@
+"""
+Fake LLM Server
+
+Local HTTP server speaking the parts of the vLLM (OpenAI-compatible) and
+Ollama APIs the LLM clients use, so the clients and the request scheduler
+can run offline (tests, development). Replies are produced by a function of
+the request and streamed a word at a time, optionally with a delay per word.
+The server records every chat request and the highest number of requests it
+was answering at once.
+
+Endpoints:
+    GET  /v1/models, POST /v1/chat/completions (JSON or server-sent events)
+    GET  /api/tags,  POST /api/chat (JSON or newline-delimited JSON)
+
+Usage:
+    from apps.llm.services.fake_llm_server import FakeLLMServer
+
+    with FakeLLMServer(token_delay=0.01) as server:
+        os.environ['VLLM_HOST'] = server.vllm_url
+        os.environ['OLLAMA_HOST'] = server.ollama_url
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+MODEL_NAME = 'fake-model'
+
+
+def echo_reply(payload: Dict) -> str:
+    """Default reply: the last user message, echoed"""
+    users = [m['content'] for m in payload.get('messages', []) if m.get('role') == 'user']
+    return f"Echo: {users[-1] if users else ''}"
+
+
+class FakeLLMServer:
+    """Threaded local server; start() / stop() or use as a context manager."""
+
+    def __init__(self, reply: Callable[[Dict], str] = echo_reply, token_delay: float = 0.0,
+                 fail_status: Optional[int] = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            reply: Response text for a request payload
+            token_delay: Seconds slept before each streamed word
+            fail_status: Answer every chat request with this HTTP status
+            port: 0 picks a free port
+        """
+        self.reply = reply
+        self.token_delay = token_delay
+        self.fail_status = fail_status
+        self.requests: List[Dict] = []  # Payload of every chat request
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def vllm_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def ollama_url(self) -> str:
+        return self.base_url
+
+    def start(self) -> 'FakeLLMServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-llm', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _words(self, payload: Dict):
+        words = self.reply(payload).split(' ')
+        for i, word in enumerate(words):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield word if i == len(words) - 1 else word + ' '
+
+    # ---------------------------------------------------------------- handler
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _start_stream(self, content_type: str):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == '/v1/models':
+                    return self._send(200, {'object': 'list', 'data': [{'id': MODEL_NAME, 'object': 'model'}]})
+                if self.path == '/api/tags':
+                    return self._send(200, {'models': [{'name': MODEL_NAME}]})
+                self._send(404, {'error': 'not found'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if self.path not in ('/v1/chat/completions', '/api/chat'):
+                    return self._send(404, {'error': 'not found'})
+
+                with server._lock:
+                    server.requests.append(payload)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    if server.fail_status:
+                        return self._send(server.fail_status, {'error': 'fake failure'})
+                    if self.path == '/api/chat':
+                        self._ollama_chat(payload)
+                    else:
+                        self._openai_chat(payload)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def _openai_chat(self, payload: Dict):
+                prompt_tokens = sum(len(m.get('content', '').split()) for m in payload.get('messages', []))
+                if not payload.get('stream'):
+                    text = ''.join(server._words(payload))
+                    completion_tokens = len(text.split())
+                    return self._send(200, {
+                        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                                     'finish_reason': 'stop'}],
+                        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                                  'total_tokens': prompt_tokens + completion_tokens},
+                    })
+
+                self._start_stream('text/event-stream')
+                completion_tokens = 0
+                for word in server._words(payload):
+                    completion_tokens += 1
+                    chunk = {'choices': [{'index': 0, 'delta': {'content': word}, 'finish_reason': None}]}
+                    self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                self._chunk(f"data: {json.dumps({'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n".encode())
+                if (payload.get('stream_options') or {}).get('include_usage'):
+                    usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                             'total_tokens': prompt_tokens + completion_tokens}
+                    self._chunk(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode())
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+            def _ollama_chat(self, payload: Dict):
+                prompt_tokens = sum(len(m.get('content', '').split()) for m in payload.get('messages', []))
+                final = {'model': payload.get('model'), 'done': True, 'done_reason': 'stop',
+                         'prompt_eval_count': prompt_tokens}
+                if not payload.get('stream', True):
+                    text = ''.join(server._words(payload))
+                    return self._send(200, dict(final, message={'role': 'assistant', 'content': text},
+                                                eval_count=len(text.split())))
+
+                self._start_stream('application/x-ndjson')
+                count = 0
+                for word in server._words(payload):
+                    count += 1
+                    line = {'model': payload.get('model'), 'message': {'role': 'assistant', 'content': word},
+                            'done': False}
+                    self._chunk((json.dumps(line) + '\n').encode())
+                self._chunk((json.dumps(dict(final, message={'role': 'assistant', 'content': ''},
+                                             eval_count=count)) + '\n').encode())
+                self._chunk(b"")
+
+        return Handler
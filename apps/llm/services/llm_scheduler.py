@@ -0,0 +1,444 @@
+"""
+LLM Request Scheduler
+
+Every chat request to the vLLM and Ollama servers goes through one
+scheduler per process instead of a blocking HTTP call per caller:
+
+- Requests wait in a priority queue per backend. Trade validation is
+  PRIORITY_HIGH, news analysis PRIORITY_LOW, so a burst of news prompts does
+  not delay a trade decision.
+- At most max_inflight requests run against a backend at once (the rest
+  queue). Both servers batch the requests that are running concurrently.
+- When slots free up, queued requests with the same model and system prompt
+  are dispatched together, so the server computes the shared prompt prefix
+  once (vLLM prefix caching) for all of them.
+- An identical request (same messages, model and sampling) that is already
+  queued or running is not sent again: the caller shares its result.
+- Responses are always streamed from the server; callers that want partial
+  output pass on_token or use stream().
+
+Usage:
+    from apps.llm.services.llm_scheduler import (
+        BACKEND_VLLM, PRIORITY_HIGH, LLMRequest, get_llm_scheduler,
+    )
+
+    scheduler = get_llm_scheduler()
+    request = LLMRequest(BACKEND_VLLM, model, messages, temperature=0.3, priority=PRIORITY_HIGH)
+    success, text, metadata = scheduler.chat(request)
+
+    for piece in scheduler.stream(request):
+        print(piece, end='')
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from apps.core.constants import (
+    LLM_OLLAMA_MAX_INFLIGHT,
+    LLM_REQUEST_TIMEOUT_SECONDS,
+    LLM_VLLM_MAX_INFLIGHT,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKEND_VLLM = 'vllm'
+BACKEND_OLLAMA = 'ollama'
+
+PRIORITY_HIGH = 0  # Trade validation, exits
+PRIORITY_NORMAL = 1  # Interactive chat, RAG answers
+PRIORITY_LOW = 2  # News and document analysis
+
+DEFAULT_MAX_INFLIGHT = {
+    BACKEND_VLLM: LLM_VLLM_MAX_INFLIGHT,
+    BACKEND_OLLAMA: LLM_OLLAMA_MAX_INFLIGHT,
+}
+
+
+class LLMBackendError(Exception):
+    """The model server answered with an error"""
+
+
+@dataclass
+class LLMRequest:
+    """One chat completion"""
+    backend: str
+    model: str
+    messages: List[Dict[str, str]]
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+    priority: int = PRIORITY_NORMAL
+
+    @property
+    def key(self) -> str:
+        """Identical requests share a key (priority does not change the answer)"""
+        payload = json.dumps([self.backend, self.model, self.messages, self.temperature, self.max_tokens],
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def prefix(self) -> Tuple[str, str]:
+        """Requests with the same prefix are dispatched together"""
+        system = self.messages[0]['content'] if self.messages and self.messages[0].get('role') == 'system' else ''
+        return self.model, system
+
+
+# ========== Transports ==========
+
+class _Transport:
+    """Streams one chat completion from a model server"""
+
+    def __init__(self, base_url: str, max_connections: int, timeout: float = LLM_REQUEST_TIMEOUT_SECONDS):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def chat(self, request: LLMRequest, on_token: Callable[[str], None]) -> Dict:
+        """Stream the completion into on_token; returns {'text', 'usage', 'finish_reason'}"""
+        raise NotImplementedError
+
+    def _post(self, path: str, payload: Dict, headers: Dict = None):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, headers=headers,
+                                     stream=True, timeout=self.timeout)
+        if response.status_code != 200:
+            body = response.text[:200]
+            response.close()
+            raise LLMBackendError(f"{response.status_code} - {body}")
+        return response
+
+
+class VLLMTransport(_Transport):
+    """OpenAI-compatible /chat/completions with server-sent events"""
+
+    def __init__(self, base_url: str, api_key: str = 'not-needed', **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.headers = {'Authorization': f'Bearer {api_key}'}
+
+    def chat(self, request: LLMRequest, on_token: Callable[[str], None]) -> Dict:
+        payload = {
+            'model': request.model,
+            'messages': request.messages,
+            'temperature': request.temperature,
+            'stream': True,
+            'stream_options': {'include_usage': True},
+        }
+        if request.max_tokens:
+            payload['max_tokens'] = request.max_tokens
+
+        pieces, usage, finish_reason = [], {}, None
+        with self._post('/chat/completions', payload, self.headers) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get('usage') or usage
+                for choice in chunk.get('choices') or []:
+                    piece = (choice.get('delta') or {}).get('content')
+                    if piece:
+                        pieces.append(piece)
+                        on_token(piece)
+                    finish_reason = choice.get('finish_reason') or finish_reason
+
+        return {
+            'text': ''.join(pieces),
+            'usage': {
+                'prompt_tokens': usage.get('prompt_tokens', 0),
+                'completion_tokens': usage.get('completion_tokens', 0),
+                'total_tokens': usage.get('total_tokens', 0),
+            },
+            'finish_reason': finish_reason,
+        }
+
+
+class OllamaTransport(_Transport):
+    """Ollama /api/chat with newline-delimited JSON chunks"""
+
+    def chat(self, request: LLMRequest, on_token: Callable[[str], None]) -> Dict:
+        payload = {
+            'model': request.model,
+            'messages': request.messages,
+            'stream': True,
+            'options': {'temperature': request.temperature},
+        }
+        if request.max_tokens:
+            payload['options']['num_predict'] = request.max_tokens
+
+        pieces, last = [], {}
+        with self._post('/api/chat', payload) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                last = json.loads(line)
+                if last.get('error'):
+                    raise LLMBackendError(last['error'])
+                piece = (last.get('message') or {}).get('content')
+                if piece:
+                    pieces.append(piece)
+                    on_token(piece)
+                if last.get('done'):
+                    break
+
+        prompt_tokens, completion_tokens = last.get('prompt_eval_count', 0), last.get('eval_count', 0)
+        return {
+            'text': ''.join(pieces),
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+            'finish_reason': last.get('done_reason'),
+        }
+
+
+# ========== Scheduler ==========
+
+class _Pending:
+    """A queued or running request and everyone waiting for it"""
+
+    def __init__(self, request: LLMRequest):
+        self.request = request
+        self.priority = request.priority  # Most urgent priority of everyone waiting
+        self.future: Future = Future()
+        self.pieces: List[str] = []
+        self.listeners: List[Callable[[str], None]] = []
+        self.enqueued = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def listen(self, on_token: Callable[[str], None]):
+        """Replay the pieces so far, then forward new ones"""
+        with self.lock:
+            for piece in self.pieces:
+                on_token(piece)
+            self.listeners.append(on_token)
+
+    def emit(self, piece: str):
+        with self.lock:
+            self.pieces.append(piece)
+            for listener in self.listeners:
+                listener(piece)
+
+
+class _Backend:
+    """Queue, in-flight cap and dispatcher thread of one model server"""
+
+    def __init__(self, name: str, transport: _Transport, max_inflight: int, scheduler: 'LLMScheduler'):
+        self.name = name
+        self.transport = transport
+        self.max_inflight = max_inflight
+        self.scheduler = scheduler
+        self.queue: List[Tuple[int, int, _Pending]] = []  # Heap of (priority, sequence, pending)
+        self.inflight = 0
+        self.condition = threading.Condition(scheduler._lock)
+        self.pool = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix=f'llm-{name}')
+        self.thread = threading.Thread(target=self._dispatch, name=f'llm-{name}-dispatch', daemon=True)
+        self.thread.start()
+
+    def _take_batch(self) -> List[_Pending]:
+        """Head of the queue plus the queued requests it can share a prefix with (lock held)"""
+        priority, _, first = heapq.heappop(self.queue)
+        batch = [first]
+        free = self.max_inflight - self.inflight - 1
+        if free > 0 and self.queue:
+            rest = []
+            for entry in sorted(self.queue):
+                pending = entry[2]
+                if free > 0 and entry[0] == priority and pending.request.prefix == first.request.prefix:
+                    batch.append(pending)
+                    free -= 1
+                else:
+                    rest.append(entry)
+            self.queue = rest
+            heapq.heapify(self.queue)
+        return batch
+
+    def promote(self, pending: _Pending, priority: int):
+        """Move a still-queued request up to a more urgent priority (lock held)"""
+        pending.priority = priority
+        for index, (_, sequence, queued) in enumerate(self.queue):
+            if queued is pending:
+                self.queue[index] = (priority, sequence, pending)
+                heapq.heapify(self.queue)
+                self.condition.notify_all()
+                return
+
+    def _dispatch(self):
+        stats = self.scheduler._stats
+        while True:
+            with self.condition:
+                while not self.scheduler._closed and (not self.queue or self.inflight >= self.max_inflight):
+                    self.condition.wait()
+                if self.scheduler._closed:
+                    return
+                batch = self._take_batch()
+                self.inflight += len(batch)
+                stats['batches'] += 1
+                stats['batched_requests'] += len(batch) - 1
+                stats['peak_inflight'][self.name] = max(stats['peak_inflight'].get(self.name, 0), self.inflight)
+            for pending in batch:
+                self.pool.submit(self._run, pending)
+
+    def _run(self, pending: _Pending):
+        started = time.perf_counter()
+        try:
+            result = self.transport.chat(pending.request, pending.emit)
+            error = None
+        except Exception as e:
+            result, error = None, e
+        finally:
+            with self.condition:
+                self.inflight -= 1
+                self.scheduler._pending.pop(pending.request.key, None)
+                self.scheduler._stats['failed' if error else 'completed'] += 1
+                self.condition.notify_all()
+
+        if error is not None:
+            pending.future.set_exception(error)
+            return
+        pending.future.set_result((result['text'], {
+            'model': pending.request.model,
+            'backend': self.name,
+            'processing_time_ms': int((time.perf_counter() - started) * 1000),
+            'queue_time_ms': int((started - pending.enqueued) * 1000),
+            'usage': result['usage'],
+            'finish_reason': result['finish_reason'],
+        }))
+
+
+class LLMScheduler:
+    """Queues, batches and deduplicates chat requests per backend."""
+
+    def __init__(self, max_inflight: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_inflight: {backend: concurrent requests} (default DEFAULT_MAX_INFLIGHT)
+        """
+        self.max_inflight = dict(DEFAULT_MAX_INFLIGHT, **(max_inflight or {}))
+        self._lock = threading.Lock()
+        self._backends: Dict[str, _Backend] = {}
+        self._pending: Dict[str, _Pending] = {}
+        self._sequence = itertools.count()
+        self._closed = False
+        self._stats = {'submitted': 0, 'deduplicated': 0, 'completed': 0, 'failed': 0,
+                       'batches': 0, 'batched_requests': 0, 'peak_inflight': {}}
+
+    def register(self, backend: str, transport: _Transport):
+        """Route backend's requests to transport (a backend already registered is kept)"""
+        with self._lock:
+            if backend not in self._backends:
+                self._backends[backend] = _Backend(
+                    backend, transport, self.max_inflight.get(backend, 1), self)
+
+    def is_registered(self, backend: str) -> bool:
+        return backend in self._backends
+
+    def submit(self, request: LLMRequest, on_token: Optional[Callable[[str], None]] = None) -> Future:
+        """
+        Queue a request.
+
+        Args:
+            on_token: Called with each piece of text as it is generated (on a scheduler thread)
+
+        Returns:
+            Future: resolves to (text, metadata); raises the backend's error
+        """
+        backend = self._backends.get(request.backend)
+        if backend is None:
+            raise LLMBackendError(f"No transport registered for {request.backend}")
+
+        key = request.key
+        with self._lock:
+            self._stats['submitted'] += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._stats['deduplicated'] += 1
+                if request.priority < pending.priority:
+                    backend.promote(pending, request.priority)
+            else:
+                pending = self._pending[key] = _Pending(request)
+                heapq.heappush(backend.queue, (request.priority, next(self._sequence), pending))
+                backend.condition.notify_all()
+            if on_token:
+                pending.listen(on_token)
+        return pending.future
+
+    def chat(self, request: LLMRequest, on_token: Optional[Callable[[str], None]] = None,
+             timeout: Optional[float] = None) -> Tuple[bool, str, Dict]:
+        """
+        Run a request and wait for it.
+
+        Returns:
+            Tuple[bool, str, Dict]: (success, response_text, metadata), like the LLM clients
+        """
+        try:
+            text, metadata = self.submit(request, on_token).result(timeout=timeout)
+            return True, text, dict(metadata)
+        except Exception as e:
+            error_msg = f"Error calling {request.backend}: {str(e)}"
+            logger.error(error_msg)
+            return False, "", {"error": error_msg}
+
+    def stream(self, request: LLMRequest) -> Iterator[str]:
+        """Pieces of the response as they are generated; raises if the request fails"""
+        done = object()
+        pieces = queue.Queue()
+        future = self.submit(request, on_token=pieces.put)
+        future.add_done_callback(lambda _: pieces.put(done))
+        while True:
+            piece = pieces.get()
+            if piece is done:
+                break
+            yield piece
+        future.result()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats, peak_inflight=dict(self._stats['peak_inflight']))
+            stats['queued'] = {name: len(backend.queue) for name, backend in self._backends.items()}
+            stats['inflight'] = {name: backend.inflight for name, backend in self._backends.items()}
+        return stats
+
+    def close(self):
+        """Stop the dispatchers; queued requests fail, running ones finish"""
+        with self._lock:
+            self._closed = True
+            backends = list(self._backends.values())
+            for backend in backends:
+                for _, _, pending in backend.queue:
+                    self._pending.pop(pending.request.key, None)
+                    pending.future.set_exception(LLMBackendError("Scheduler closed"))
+                backend.queue = []
+                backend.condition.notify_all()
+        for backend in backends:
+            backend.thread.join(timeout=5)
+            backend.pool.shutdown(wait=True)
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide scheduler shared by the LLM clients"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
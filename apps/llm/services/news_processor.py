@@ -18,13 +18,16 @@ Features:
 
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 from django.db import transaction
 from django.utils import timezone
 
+from apps.core.constants import LLM_NEWS_WORKERS
 from apps.data.models import NewsArticle, KnowledgeBase
+from apps.llm.services.llm_scheduler import PRIORITY_LOW
 from apps.llm.services.ollama_client import get_ollama_client, generate_embedding
 from apps.llm.services.vector_store import get_vector_store, COLLECTION_NEWS, COLLECTION_KNOWLEDGE
 
@@ -49,7 +52,8 @@ class NewsProcessor:
         url: Optional[str] = None,
         published_at: Optional[datetime] = None,
         symbols: Optional[List[str]] = None,
-        author: Optional[str] = None
+        author: Optional[str] = None,
+        analysis: Optional[Dict] = None
     ) -> Tuple[bool, Optional[NewsArticle], str]:
         """
         Process a single news article with LLM analysis
@@ -62,6 +66,7 @@ class NewsProcessor:
             published_at: Publication datetime
             symbols: Related stock symbols
             author: Article author
+            analysis: Result of analyze_article() if already run
 
         Returns:
             Tuple[bool, Optional[NewsArticle], str]: (success, article, message)
@@ -81,14 +86,11 @@ class NewsProcessor:
         try:
             logger.info(f"Processing article: {title[:50]}...")
 
-            # Step 1: Analyze sentiment
-            sentiment_result = self._analyze_sentiment(title, content)
-
-            # Step 2: Generate summary
-            summary = self._generate_summary(content)
-
-            # Step 3: Extract key insights
-            insights = self._extract_insights(content, symbols or [])
+            # Steps 1-3: Sentiment, summary and key insights
+            analysis = analysis or self.analyze_article(title, content, symbols)
+            sentiment_result = analysis['sentiment']
+            summary = analysis['summary']
+            insights = analysis['insights']
 
             # Step 4: Determine sentiment score and label
             sentiment_score = sentiment_result.get('score', 0.0)
@@ -103,7 +105,7 @@ class NewsProcessor:
                     url=url or '',
                     published_at=published_at or timezone.now(),
                     author=author or '',
-                    symbols=symbols or [],
+                    symbols_mentioned=symbols or [],
                     sentiment_score=sentiment_score,
                     sentiment_label=sentiment_label,
                     llm_summary=summary,
@@ -128,6 +130,19 @@ class NewsProcessor:
             logger.error(error_msg, exc_info=True)
             return False, None, error_msg
 
+    def analyze_article(self, title: str, content: str, symbols: Optional[List[str]] = None) -> Dict:
+        """
+        LLM analysis of an article (no database access)
+
+        Returns:
+            dict: {'sentiment': {...}, 'summary': str, 'insights': [str]}
+        """
+        return {
+            'sentiment': self._analyze_sentiment(title, content),
+            'summary': self._generate_summary(content),
+            'insights': self._extract_insights(content, symbols or []),
+        }
+
     def _analyze_sentiment(self, title: str, content: str) -> Dict:
         """Analyze sentiment of article using LLM"""
 
@@ -151,7 +166,8 @@ Consider:
 
         success, response, _ = self.llm_client.generate(
             prompt=prompt,
-            temperature=0.2
+            temperature=0.2,
+            priority=PRIORITY_LOW
         )
 
         if not success:
@@ -195,7 +211,8 @@ Summary:"""
 
         success, summary, _ = self.llm_client.generate(
             prompt=prompt,
-            temperature=0.3
+            temperature=0.3,
+            priority=PRIORITY_LOW
         )
 
         if not success:
@@ -223,7 +240,8 @@ Key Insights:
 
         success, response, _ = self.llm_client.generate(
             prompt=prompt,
-            temperature=0.3
+            temperature=0.3,
+            priority=PRIORITY_LOW
         )
 
         if not success:
@@ -277,7 +295,7 @@ Key Insights:
                     'title': article.title,
                     'source': article.source,
                     'published_at': article.published_at.isoformat(),
-                    'symbols': json.dumps(article.symbols),
+                    'symbols': json.dumps(article.symbols_mentioned),
                     'sentiment': article.sentiment_label,
                     'sentiment_score': article.sentiment_score,
                     'chunk_type': chunk['type'],
@@ -306,7 +324,7 @@ Key Insights:
                         embedding_id=chunk_id,
                         metadata={
                             'source': article.source,
-                            'symbols': article.symbols,
+                            'symbols': article.symbols_mentioned,
                             'sentiment': article.sentiment_label,
                             'chunk_type': chunk['type']
                         }
@@ -376,6 +394,9 @@ Key Insights:
         """
         Process multiple articles in batch
 
+        The LLM analysis of LLM_NEWS_WORKERS articles runs at once (the LLM
+        scheduler caps what reaches the server); articles are saved one by one.
+
         Args:
             articles: List of article dicts with title, content, source, etc.
 
@@ -388,9 +409,23 @@ Key Insights:
 
         logger.info(f"Processing {len(articles)} articles in batch")
 
-        for i, article_data in enumerate(articles, 1):
+        def analyze(article_data):
+            try:
+                return self.analyze_article(article_data['title'], article_data['content'],
+                                            article_data.get('symbols'))
+            except Exception as e:
+                logger.warning(f"Analysis of {article_data.get('title', 'Unknown')[:50]} failed: {e}")
+                return None
+
+        analyses = [None] * len(articles)
+        if articles and self.llm_client.is_enabled():
+            with ThreadPoolExecutor(max_workers=min(LLM_NEWS_WORKERS, len(articles)),
+                                    thread_name_prefix='news-llm') as pool:
+                analyses = list(pool.map(analyze, articles))
+
+        for i, (article_data, analysis) in enumerate(zip(articles, analyses), 1):
             try:
-                success, article, message = self.process_article(**article_data)
+                success, article, message = self.process_article(**article_data, analysis=analysis)
 
                 if success:
                     success_count += 1
@@ -7,15 +7,27 @@ This service handles communication with local Ollama LLM server for:
 - Trade validation
 - News analysis
 - Sentiment extraction
+
+Text generation goes through the shared LLM scheduler (llm_scheduler), which
+caps the requests in flight, serves trade validation before news analysis
+and answers identical prompts once.
 """
 
 import logging
 import os
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import requests
 import json
 
+from apps.llm.services.llm_scheduler import (
+    BACKEND_OLLAMA,
+    PRIORITY_NORMAL,
+    LLMRequest,
+    OllamaTransport,
+    get_llm_scheduler,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,6 +45,10 @@ class OllamaClient:
         self.host = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
         self.default_model = os.getenv('OLLAMA_MODEL', 'deepseek-coder:33b')
 
+        self.scheduler = get_llm_scheduler()
+        self.scheduler.register(BACKEND_OLLAMA, OllamaTransport(
+            self.host, max_connections=self.scheduler.max_inflight[BACKEND_OLLAMA]))
+
         # Verify connection
         self.enabled = self._check_connection()
 
@@ -61,7 +77,8 @@ class OllamaClient:
         system: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
-        stream: bool = False
+        priority: int = PRIORITY_NORMAL,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Tuple[bool, str, Dict]:
         """
         Generate text completion using Ollama
@@ -72,63 +89,30 @@ class OllamaClient:
             system: System prompt/context
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
-            stream: Whether to stream response
+            priority: Scheduler priority (llm_scheduler.PRIORITY_*)
+            on_token: Called with each piece of the response as it is generated
 
         Returns:
             Tuple[bool, str, Dict]: (success, response_text, metadata)
         """
-        if not self.enabled:
-            return False, "", {"error": "Ollama not enabled"}
-
-        model = model or self.default_model
-
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": stream,
-            "options": {
-                "temperature": temperature,
-            }
-        }
-
+        messages = []
         if system:
-            payload["system"] = system
-
-        if max_tokens:
-            payload["options"]["num_predict"] = max_tokens
-
-        try:
-            start_time = time.time()
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
 
-            response = requests.post(
-                f"{self.host}/api/generate",
-                json=payload,
-                timeout=300  # 5 minutes for long generations
-            )
-
-            if response.status_code != 200:
-                error_msg = f"Ollama API error: {response.status_code} - {response.text}"
-                logger.error(error_msg)
-                return False, "", {"error": error_msg}
-
-            result = response.json()
-            response_text = result.get('response', '')
-            processing_time = int((time.time() - start_time) * 1000)
+        success, response_text, metadata = self._run(messages, model, temperature, max_tokens, priority, on_token)
+        if success:
+            metadata.update(tokens_generated=metadata['usage']['completion_tokens'], done=True)
+            logger.info(f"Ollama generation successful ({metadata['processing_time_ms']}ms)")
+        return success, response_text, metadata
 
-            metadata = {
-                "model": model,
-                "processing_time_ms": processing_time,
-                "tokens_generated": len(response_text.split()),  # Rough estimate
-                "done": result.get('done', False)
-            }
+    def _run(self, messages, model, temperature, max_tokens, priority, on_token) -> Tuple[bool, str, Dict]:
+        if not self.enabled:
+            return False, "", {"error": "Ollama not enabled"}
 
-            logger.info(f"Ollama generation successful ({processing_time}ms)")
-            return True, response_text, metadata
-
-        except Exception as e:
-            error_msg = f"Error calling Ollama: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            return False, "", {"error": error_msg}
+        request = LLMRequest(BACKEND_OLLAMA, model or self.default_model, messages,
+                             temperature=temperature, max_tokens=max_tokens, priority=priority)
+        return self.scheduler.chat(request, on_token)
 
     def generate_embedding(
         self,
@@ -191,7 +175,9 @@ class OllamaClient:
         self,
         messages: List[Dict[str, str]],
         model: Optional[str] = None,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        priority: int = PRIORITY_NORMAL,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Tuple[bool, str, Dict]:
         """
         Chat completion with conversation history
@@ -200,56 +186,17 @@ class OllamaClient:
             messages: List of message dicts with 'role' and 'content'
             model: Model to use
             temperature: Sampling temperature
+            priority: Scheduler priority (llm_scheduler.PRIORITY_*)
+            on_token: Called with each piece of the response as it is generated
 
         Returns:
             Tuple[bool, str, Dict]: (success, response, metadata)
         """
-        if not self.enabled:
-            return False, "", {"error": "Ollama not enabled"}
-
-        model = model or self.default_model
-
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": False,
-            "options": {
-                "temperature": temperature
-            }
-        }
-
-        try:
-            start_time = time.time()
-
-            response = requests.post(
-                f"{self.host}/api/chat",
-                json=payload,
-                timeout=300
-            )
-
-            if response.status_code != 200:
-                error_msg = f"Ollama chat error: {response.status_code}"
-                logger.error(error_msg)
-                return False, "", {"error": error_msg}
-
-            result = response.json()
-            message = result.get('message', {})
-            response_text = message.get('content', '')
-            processing_time = int((time.time() - start_time) * 1000)
-
-            metadata = {
-                "model": model,
-                "processing_time_ms": processing_time,
-                "role": message.get('role', 'assistant')
-            }
-
-            logger.info(f"Chat response received ({processing_time}ms)")
-            return True, response_text, metadata
-
-        except Exception as e:
-            error_msg = f"Error in chat: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            return False, "", {"error": error_msg}
+        success, response_text, metadata = self._run(messages, model, temperature, None, priority, on_token)
+        if success:
+            metadata['role'] = 'assistant'
+            logger.info(f"Chat response received ({metadata['processing_time_ms']}ms)")
+        return success, response_text, metadata
 
     def extract_json_from_response(self, response: str) -> Optional[Dict]:
         """
@@ -20,6 +20,7 @@ from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 
 from apps.llm.services.ollama_client import get_ollama_client
+from apps.llm.services.llm_scheduler import PRIORITY_HIGH
 from apps.llm.services.rag_system import get_rag_system
 from apps.data.models import NewsArticle, InvestorCall
 
@@ -104,7 +105,8 @@ class TradeValidator:
             success, llm_response, _ = self.llm_client.generate(
                 prompt=prompt,
                 system="You are an expert stock market analyst and risk manager. Provide thorough, balanced trade analysis.",
-                temperature=0.3
+                temperature=0.3,
+                priority=PRIORITY_HIGH
             )
 
             if not success:
@@ -373,7 +375,8 @@ Note: This validation is based on general principles only, as no recent market d
 
         success, response, _ = self.llm_client.generate(
             prompt=prompt,
-            temperature=0.3
+            temperature=0.3,
+            priority=PRIORITY_HIGH
         )
 
         if not success:
@@ -467,7 +470,8 @@ SUGGESTED_ACTION: [Specific action to take]
 
         llm_success, llm_response, _ = self.llm_client.generate(
             prompt=prompt,
-            temperature=0.3
+            temperature=0.3,
+            priority=PRIORITY_HIGH
         )
 
         if not llm_success:
@@ -14,8 +14,6 @@ Features:
 import logging
 import os
 from typing import Dict, List, Optional, Tuple
-import chromadb
-from chromadb.config import Settings
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -42,6 +40,11 @@ class VectorStore:
             )
 
         try:
+            # chromadb (and its embedding stack) is imported on first use of
+            # the store, not by every process that imports this module
+            import chromadb
+            from chromadb.config import Settings
+
             # Initialize ChromaDB client with persistence
             self.client = chromadb.Client(Settings(
                 chroma_db_impl="duckdb+parquet",
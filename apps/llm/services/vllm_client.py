@@ -6,13 +6,26 @@ This service handles communication with vLLM server for:
 - Chat completions
 - Document analysis
 - Sentiment extraction
+
+Requests go through the shared LLM scheduler (llm_scheduler), which caps the
+requests in flight, batches requests with a common system prompt and answers
+identical prompts once.
 """
 
 import logging
 import os
-import time
-from typing import Dict, List, Optional, Tuple
-from openai import OpenAI
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from apps.llm.services.llm_scheduler import (
+    BACKEND_VLLM,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    LLMRequest,
+    VLLMTransport,
+    get_llm_scheduler,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,11 +46,9 @@ class VLLMClient:
         self.model = os.getenv('VLLM_MODEL', 'hugging-quants/Meta-Llama-3.1-70B-Instruct-AWQ-INT4')
         self.api_key = os.getenv('VLLM_API_KEY', 'not-needed')
 
-        # Initialize OpenAI client pointing to vLLM
-        self.client = OpenAI(
-            base_url=self.base_url,
-            api_key=self.api_key
-        )
+        self.scheduler = get_llm_scheduler()
+        self.scheduler.register(BACKEND_VLLM, VLLMTransport(
+            self.base_url, self.api_key, max_connections=self.scheduler.max_inflight[BACKEND_VLLM]))
 
         # Verify connection
         self.enabled = self._check_connection()
@@ -45,20 +56,14 @@ class VLLMClient:
     def _check_connection(self) -> bool:
         """Check if vLLM server is accessible"""
         try:
-            # Try a simple completion to verify connection
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": "Test"}
-                ],
-                max_tokens=5,
-                temperature=0.1
-            )
-            if response and response.choices:
+            # The model list is served without running the model
+            response = requests.get(f"{self.base_url}/models",
+                                    headers={"Authorization": f"Bearer {self.api_key}"}, timeout=5)
+            if response.status_code == 200:
                 logger.info(f"vLLM server connected at {self.base_url}")
                 logger.info(f"Model: {self.model}")
                 return True
+            logger.warning(f"vLLM server returned {response.status_code}")
             return False
         except Exception as e:
             logger.warning(f"vLLM server not accessible: {str(e)}")
@@ -73,7 +78,8 @@ class VLLMClient:
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = 1000,
-        stream: bool = False
+        priority: int = PRIORITY_NORMAL,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Tuple[bool, str, Dict]:
         """
         Chat completion with conversation history
@@ -82,7 +88,8 @@ class VLLMClient:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
-            stream: Whether to stream response (not implemented yet)
+            priority: Scheduler priority (llm_scheduler.PRIORITY_*)
+            on_token: Called with each piece of the response as it is generated
 
         Returns:
             Tuple[bool, str, Dict]: (success, response_text, metadata)
@@ -90,51 +97,42 @@ class VLLMClient:
         if not self.enabled:
             return False, "", {"error": "vLLM not enabled"}
 
-        try:
-            start_time = time.time()
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                stream=stream
-            )
-
-            processing_time = int((time.time() - start_time) * 1000)
-
-            if response.choices:
-                response_text = response.choices[0].message.content
-
-                metadata = {
-                    "model": self.model,
-                    "processing_time_ms": processing_time,
-                    "usage": {
-                        "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-                        "completion_tokens": response.usage.completion_tokens if response.usage else 0,
-                        "total_tokens": response.usage.total_tokens if response.usage else 0,
-                    },
-                    "finish_reason": response.choices[0].finish_reason
-                }
-
-                logger.info(f"vLLM chat successful ({processing_time}ms, {metadata['usage']['total_tokens']} tokens)")
-                return True, response_text, metadata
-            else:
-                error_msg = "No response from vLLM"
-                logger.error(error_msg)
-                return False, "", {"error": error_msg}
+        success, response_text, metadata = self.scheduler.chat(
+            self._request(messages, temperature, max_tokens, priority), on_token)
+        if success:
+            logger.info(f"vLLM chat successful ({metadata['processing_time_ms']}ms, "
+                        f"{metadata['usage']['total_tokens']} tokens)")
+        return success, response_text, metadata
 
-        except Exception as e:
-            error_msg = f"Error calling vLLM: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            return False, "", {"error": error_msg}
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = 1000,
+        priority: int = PRIORITY_NORMAL
+    ) -> Iterator[str]:
+        """
+        Chat completion as an iterator of response pieces
+
+        Raises:
+            RuntimeError: vLLM is not enabled
+            LLMBackendError / requests.RequestException: the request failed
+        """
+        if not self.enabled:
+            raise RuntimeError("vLLM not enabled")
+        return self.scheduler.stream(self._request(messages, temperature, max_tokens, priority))
+
+    def _request(self, messages, temperature, max_tokens, priority) -> LLMRequest:
+        return LLMRequest(BACKEND_VLLM, self.model, messages, temperature=temperature,
+                          max_tokens=max_tokens, priority=priority)
 
     def generate(
         self,
         prompt: str,
         system: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = 1000
+        max_tokens: Optional[int] = 1000,
+        priority: int = PRIORITY_NORMAL
     ) -> Tuple[bool, str, Dict]:
         """
         Generate text completion using vLLM
@@ -144,6 +142,7 @@ class VLLMClient:
             system: System prompt/context
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
+            priority: Scheduler priority (llm_scheduler.PRIORITY_*)
 
         Returns:
             Tuple[bool, str, Dict]: (success, response_text, metadata)
@@ -155,7 +154,7 @@ class VLLMClient:
 
         messages.append({"role": "user", "content": prompt})
 
-        return self.chat(messages, temperature=temperature, max_tokens=max_tokens)
+        return self.chat(messages, temperature=temperature, max_tokens=max_tokens, priority=priority)
 
     def analyze_sentiment(
         self,
@@ -183,7 +182,8 @@ Analyze the sentiment of the given text and respond ONLY with a JSON object in t
             prompt=text,
             system=system_prompt,
             temperature=0.1,
-            max_tokens=100
+            max_tokens=100,
+            priority=PRIORITY_LOW
         )
 
         if not success:
@@ -229,7 +229,8 @@ Focus on key financial facts, numbers, and important insights."""
             prompt=text,
             system=system_prompt,
             temperature=0.3,
-            max_tokens=int(max_length * 1.5)  # Roughly 1.5 tokens per word
+            max_tokens=int(max_length * 1.5),  # Roughly 1.5 tokens per word
+            priority=PRIORITY_LOW
         )
 
     def extract_insights(
@@ -256,7 +257,8 @@ Example: ["Insight 1", "Insight 2", "Insight 3"]"""
             prompt=text,
             system=system_prompt,
             temperature=0.3,
-            max_tokens=500
+            max_tokens=500,
+            priority=PRIORITY_LOW
         )
 
         if not success:
@@ -0,0 +1,191 @@
+"""
+LLM App Tests
+
+Tests for:
+1. LLM request scheduler (in-flight cap, deduplication, priorities, prefix batches, streaming)
+2. vLLM / Ollama clients and news batches through the scheduler, against a fake model server
+"""
+
+import os
+import threading
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.llm.services.fake_llm_server import MODEL_NAME, FakeLLMServer
+from apps.llm.services.llm_scheduler import (
+    BACKEND_OLLAMA,
+    BACKEND_VLLM,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    LLMRequest,
+    LLMScheduler,
+    OllamaTransport,
+    VLLMTransport,
+)
+
+
+def _request(text, system='', priority=PRIORITY_LOW, backend=BACKEND_VLLM):
+    messages = [{'role': 'system', 'content': system}] if system else []
+    return LLMRequest(backend, MODEL_NAME, messages + [{'role': 'user', 'content': text}], priority=priority)
+
+
+class LLMSchedulerTests(TestCase):
+    """Queueing, batching and deduplication in front of the fake server"""
+
+    def setUp(self):
+        self.server = FakeLLMServer(token_delay=0.01).start()
+        self.addCleanup(self.server.stop)
+        self.scheduler = LLMScheduler(max_inflight={BACKEND_VLLM: 2, BACKEND_OLLAMA: 1})
+        self.addCleanup(self.scheduler.close)
+        self.scheduler.register(BACKEND_VLLM, VLLMTransport(self.server.vllm_url, max_connections=2))
+        self.scheduler.register(BACKEND_OLLAMA, OllamaTransport(self.server.ollama_url, max_connections=1))
+
+    def test_caps_inflight_and_shares_identical_requests(self):
+        futures = [self.scheduler.submit(_request(f'headline {i} moved the stock')) for i in range(6)]
+        duplicates = [self.scheduler.submit(_request('headline 0 moved the stock')) for _ in range(3)]
+
+        results = [f.result(timeout=10) for f in futures + duplicates]
+
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertLessEqual(self.server.max_active, 2)
+        self.assertEqual(results[0][0], 'Echo: headline 0 moved the stock')
+        self.assertTrue(all(r == results[0] for r in results[6:]))
+        stats = self.scheduler.stats()
+        self.assertEqual(stats['deduplicated'], 3)
+        self.assertEqual(stats['completed'], 6)
+        self.assertEqual(stats['peak_inflight'][BACKEND_VLLM], 2)
+
+    def test_high_priority_overtakes_queued_news(self):
+        started = threading.Event()
+        blocker = self.scheduler.submit(_request('a long running news prompt', backend=BACKEND_OLLAMA),
+                                        on_token=lambda piece: started.set())
+        started.wait(timeout=10)
+        news = [self.scheduler.submit(_request(f'news {i}', backend=BACKEND_OLLAMA)) for i in range(3)]
+        trade = self.scheduler.submit(_request('validate trade', priority=PRIORITY_HIGH, backend=BACKEND_OLLAMA))
+
+        for future in [blocker, trade] + news:
+            future.result(timeout=10)
+
+        served = [r['messages'][-1]['content'] for r in self.server.requests]
+        self.assertEqual(served[:2], ['a long running news prompt', 'validate trade'])
+        self.assertEqual(served[2:], ['news 0', 'news 1', 'news 2'])
+
+    def test_high_priority_duplicate_promotes_the_queued_request(self):
+        started = threading.Event()
+        blocker = self.scheduler.submit(_request('a long running news prompt', backend=BACKEND_OLLAMA),
+                                        on_token=lambda piece: started.set())
+        started.wait(timeout=10)
+        news = [self.scheduler.submit(_request(f'news {i}', backend=BACKEND_OLLAMA)) for i in range(3)]
+        trade = self.scheduler.submit(_request('news 2', priority=PRIORITY_HIGH, backend=BACKEND_OLLAMA))
+
+        for future in [blocker, trade] + news:
+            future.result(timeout=10)
+
+        self.assertIs(trade, news[2])
+        served = [r['messages'][-1]['content'] for r in self.server.requests]
+        self.assertEqual(served, ['a long running news prompt', 'news 2', 'news 0', 'news 1'])
+
+    def test_queued_requests_with_the_same_system_prompt_are_dispatched_together(self):
+        backend = self.scheduler._backends[BACKEND_VLLM]
+        with self.scheduler._lock:  # Dispatcher held off while the queue is inspected
+            for seq, request in enumerate([_request('a1', 'sentiment'), _request('b1', 'summary'),
+                                           _request('a2', 'sentiment')]):
+                backend.queue.append((request.priority, seq, mock.Mock(request=request)))
+
+            batch = backend._take_batch()
+            remaining = [entry[2].request.messages[-1]['content'] for entry in backend.queue]
+            backend.queue = []
+
+        self.assertEqual([p.request.messages[-1]['content'] for p in batch], ['a1', 'a2'])
+        self.assertEqual(remaining, ['b1'])
+
+    def test_stream_yields_pieces_and_late_subscribers_get_a_replay(self):
+        self.server.reply = lambda payload: 'one two three four five'
+        pieces, late = [], []
+        stream = self.scheduler.stream(_request('stream me'))
+        pieces.append(next(stream))
+        self.scheduler.submit(_request('stream me'), on_token=late.append).result(timeout=10)
+        pieces.extend(stream)
+
+        self.assertEqual(''.join(pieces), 'one two three four five')
+        self.assertEqual(''.join(late), 'one two three four five')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_server_error_is_returned_like_the_clients(self):
+        self.server.fail_status = 500
+
+        success, text, metadata = self.scheduler.chat(_request('fails'))
+
+        self.assertFalse(success)
+        self.assertEqual(text, '')
+        self.assertIn('500', metadata['error'])
+        self.assertEqual(self.scheduler.stats()['failed'], 1)
+
+
+class LLMClientSchedulerTests(TestCase):
+    """The vLLM and Ollama clients talk to the fake server through a scheduler"""
+
+    def setUp(self):
+        self.server = FakeLLMServer().start()
+        self.addCleanup(self.server.stop)
+        self.scheduler = LLMScheduler()
+        self.addCleanup(self.scheduler.close)
+        for module in ('vllm_client', 'ollama_client'):
+            patcher = mock.patch(f'apps.llm.services.{module}.get_llm_scheduler', return_value=self.scheduler)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        env = mock.patch.dict(os.environ, {
+            'VLLM_HOST': self.server.vllm_url, 'VLLM_MODEL': MODEL_NAME,
+            'OLLAMA_HOST': self.server.ollama_url, 'OLLAMA_MODEL': MODEL_NAME,
+        })
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_vllm_client(self):
+        from apps.llm.services.vllm_client import VLLMClient
+
+        client = VLLMClient()
+        self.assertTrue(client.is_enabled())
+
+        self.server.reply = lambda payload: '{"label": "POSITIVE", "score": 0.6, "confidence": 0.8}'
+        success, sentiment, metadata = client.analyze_sentiment('Strong quarter')
+        self.assertTrue(success)
+        self.assertEqual(sentiment['label'], 'POSITIVE')
+        self.assertGreater(metadata['usage']['total_tokens'], 0)
+        self.assertEqual(self.server.requests[-1]['max_tokens'], 100)
+
+        self.server.reply = lambda payload: 'Prices rose sharply'
+        self.assertEqual(''.join(client.stream_chat([{'role': 'user', 'content': 'Why?'}])), 'Prices rose sharply')
+
+    def test_ollama_client(self):
+        from apps.llm.services.ollama_client import OllamaClient
+
+        client = OllamaClient()
+        success, text, metadata = client.generate('Is this trade sound?', system='You are a risk manager',
+                                                  priority=PRIORITY_HIGH)
+
+        self.assertTrue(success)
+        self.assertEqual(text, 'Echo: Is this trade sound?')
+        self.assertEqual(metadata['tokens_generated'], 5)
+        self.assertEqual(self.server.requests[-1]['messages'][0],
+                         {'role': 'system', 'content': 'You are a risk manager'})
+
+    def test_news_batch_analyses_articles_concurrently(self):
+        from apps.data.models import NewsArticle
+        from apps.llm.services.news_processor import NewsProcessor
+
+        self.server.reply = lambda payload: 'SENTIMENT: POSITIVE\nSCORE: 0.5\n- Margins improved'
+        self.server.token_delay = 0.005
+
+        with mock.patch('apps.llm.services.news_processor.get_vector_store'), \
+                mock.patch.object(NewsProcessor, '_store_embeddings', return_value=False):
+            processor = NewsProcessor()
+            articles = [{'title': f'Article {i}', 'content': f'Company {i} beat estimates', 'source': 'Test',
+                         'url': f'https://news.example.com/{i}', 'symbols': ['TCS']} for i in range(4)]
+            success, errors, _ = processor.batch_process_articles(articles)
+
+        self.assertEqual((success, errors), (4, 0))
+        self.assertEqual(len(self.server.requests), 12)
+        self.assertEqual(set(NewsArticle.objects.values_list('sentiment_label', flat=True)), {'POSITIVE'})
+        self.assertLessEqual(self.server.max_active, self.scheduler.max_inflight[BACKEND_OLLAMA])
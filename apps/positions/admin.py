@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Position, MonitorLog
+from .models import Position, MonitorLog, PositionRule
 
 
 @admin.register(Position)
@@ -47,3 +47,12 @@ class MonitorLogAdmin(admin.ModelAdmin):
     search_fields = ['position__instrument', 'message']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'created_at'
+
+
+@admin.register(PositionRule)
+class PositionRuleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'strategy_type', 'action', 'reason', 'priority', 'is_mandatory', 'is_active']
+    list_filter = ['action', 'strategy_type', 'is_active']
+    list_editable = ['priority', 'is_active']
+    search_fields = ['name', 'reason']
+    readonly_fields = ['created_at', 'updated_at']
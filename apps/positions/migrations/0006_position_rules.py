@@ -0,0 +1,104 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:16
+
+from django.db import migrations, models
+
+# The rules as of this migration (apps.core.constants.DEFAULT_POSITION_RULES);
+# kept here so the migration does not change with the application code
+SEED_RULES = [
+    {
+        'name': 'Stop-loss hit', 'strategy_type': '', 'action': 'EXIT',
+        'reason': 'STOP_LOSS', 'priority': 10, 'is_mandatory': True,
+        'conditions': [{'field': 'stop_loss_hit', 'op': 'eq', 'value': True}],
+    },
+    {
+        'name': 'Target hit', 'strategy_type': '', 'action': 'EXIT',
+        'reason': 'TARGET', 'priority': 20, 'is_mandatory': True,
+        'conditions': [{'field': 'target_hit', 'op': 'eq', 'value': True}],
+    },
+    {
+        'name': 'Thursday EOD exit at 50% profit', 'strategy_type': 'WEEKLY_NIFTY_STRANGLE',
+        'action': 'EXIT', 'reason': 'EOD_THURSDAY', 'priority': 30, 'is_mandatory': False,
+        'conditions': [
+            {'field': 'weekday', 'op': 'eq', 'value': 'THURSDAY'},
+            {'field': 'time', 'op': 'gte', 'value': '15:15'},
+            {'field': 'profit_pct', 'op': 'gte', 'value': 50},
+        ],
+    },
+    {
+        'name': 'EOD exit at 50% profit', 'strategy_type': 'LLM_VALIDATED_FUTURES',
+        'action': 'EXIT', 'reason': 'EOD', 'priority': 30, 'is_mandatory': False,
+        'conditions': [
+            {'field': 'time', 'op': 'gte', 'value': '15:15'},
+            {'field': 'profit_pct', 'op': 'gte', 'value': 50},
+        ],
+    },
+    {
+        'name': 'Expiry day exit', 'strategy_type': '', 'action': 'EXIT',
+        'reason': 'EXPIRY_DAY', 'priority': 40, 'is_mandatory': True,
+        'conditions': [
+            {'field': 'days_to_expiry', 'op': 'eq', 'value': 0},
+            {'field': 'time', 'op': 'gte', 'value': '15:20'},
+        ],
+    },
+    {
+        'name': 'Friday exit before weekend expiry', 'strategy_type': '', 'action': 'EXIT',
+        'reason': 'FRIDAY_EOD', 'priority': 50, 'is_mandatory': True,
+        'conditions': [
+            {'field': 'days_to_expiry', 'op': 'eq', 'value': 1},
+            {'field': 'weekday', 'op': 'eq', 'value': 'FRIDAY'},
+            {'field': 'time', 'op': 'gte', 'value': '15:15'},
+        ],
+    },
+    {
+        'name': 'Average futures at 1% adverse move', 'strategy_type': 'LLM_VALIDATED_FUTURES',
+        'action': 'AVERAGE', 'reason': 'AVERAGE_DOWN', 'priority': 100, 'is_mandatory': False,
+        'conditions': [
+            {'field': 'move_pct', 'op': 'lte', 'value': -1},
+            {'field': 'averaging_count', 'op': 'lt', 'value': 3},
+        ],
+    },
+]
+
+
+def seed_default_rules(apps, schema_editor):
+    PositionRule = apps.get_model('positions', 'PositionRule')
+    PositionRule.objects.bulk_create(PositionRule(**rule) for rule in SEED_RULES)
+
+
+def remove_default_rules(apps, schema_editor):
+    PositionRule = apps.get_model('positions', 'PositionRule')
+    PositionRule.objects.filter(name__in=[rule['name'] for rule in SEED_RULES]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('positions', '0005_make_stop_loss_target_optional'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('name', models.CharField(help_text='Rule name', max_length=100)),
+                ('strategy_type', models.CharField(blank=True, choices=[('WEEKLY_NIFTY_STRANGLE', 'Weekly Nifty Strangle'), ('LLM_VALIDATED_FUTURES', 'LLM Validated Futures')], help_text='Strategy this rule applies to (blank = all)', max_length=50)),
+                ('action', models.CharField(choices=[('EXIT', 'Exit position'), ('AVERAGE', 'Recommend averaging'), ('ALERT', 'Alert only')], default='EXIT', help_text='What happens when the rule fires', max_length=20)),
+                ('reason', models.CharField(help_text='Reason code reported when the rule fires (e.g. STOP_LOSS)', max_length=50)),
+                ('conditions', models.JSONField(default=list, help_text='ANDed conditions, e.g. [{"field": "profit_pct", "op": "gte", "value": 50}]')),
+                ('priority', models.IntegerField(default=100, help_text='Evaluation order (lower first)')),
+                ('is_mandatory', models.BooleanField(default=False, help_text='Mandatory exit (stop-loss, expiry)')),
+                ('is_active', models.BooleanField(default=True, help_text='Whether the rule is evaluated')),
+            ],
+            options={
+                'verbose_name': 'Position Rule',
+                'verbose_name_plural': 'Position Rules',
+                'db_table': 'position_rules',
+                'ordering': ['priority', 'id'],
+                'indexes': [models.Index(fields=['is_active', 'priority'], name='position_ru_is_acti_adad06_idx')],
+            },
+        ),
+        migrations.RunPython(seed_default_rules, remove_default_rules),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('positions', '0006_position_rules'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='position',
+            name='positions_account_09f9d1_idx',
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['account', 'status', 'strategy_type'], name='positions_account_789e8e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['status', 'exit_time'], name='positions_status_278ab0_idx'),
+        ),
+    ]
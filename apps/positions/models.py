@@ -8,6 +8,7 @@ CRITICAL: Enforces ONE POSITION PER ACCOUNT rule
 
 from decimal import Decimal
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 
 from apps.core.models import TimeStampedModel
@@ -16,6 +17,9 @@ from apps.core.constants import (
     POSITION_STATUS_CHOICES,
     POSITION_STATUS_ACTIVE,
     POSITION_STATUS_CLOSED,
+    RULE_ACTION_CHOICES,
+    RULE_ACTION_EXIT,
+    STRATEGY_CHOICES,
 )
 
 
@@ -260,8 +264,11 @@ class Position(TimeStampedModel):
         verbose_name_plural = 'Positions'
         ordering = ['-entry_time']
         indexes = [
-            models.Index(fields=['account', 'status']),
+            # One-position rule, P&L per account and per strategy
+            models.Index(fields=['account', 'status', 'strategy_type']),
             models.Index(fields=['status', 'expiry_date']),
+            # Closed positions by exit time (daily / weekly P&L, learning metrics)
+            models.Index(fields=['status', 'exit_time']),
         ]
 
     def __str__(self):
@@ -369,6 +376,10 @@ class Position(TimeStampedModel):
 
         self.save()
 
+        # Add the outcome to the learning aggregates right away
+        from apps.analytics.services.learning_engine import LearningEngine
+        LearningEngine().analyze_closed_trade(self)
+
     def is_stop_loss_hit(self) -> bool:
         """
         Check if stop-loss is hit
@@ -475,3 +486,89 @@ class MonitorLog(TimeStampedModel):
 
     def __str__(self):
         return f"{self.check_type} - {self.result} - {self.position}"
+
+
+class PositionRule(TimeStampedModel):
+    """
+    Exit / averaging rule
+
+    Rules are data: a list of conditions on position fields, ANDed together,
+    evaluated over the whole active book by
+    apps.positions.services.rule_engine. Adding or changing a rule needs no
+    change to the monitoring tasks.
+
+    Fields:
+        name: Rule name (shown in alerts and logs)
+        strategy_type: Strategy the rule applies to (blank = all strategies)
+        action: EXIT, AVERAGE or ALERT
+        reason: Reason code reported when the rule fires (exit_reason on close)
+        conditions: [{"field": "profit_pct", "op": "gte", "value": 50}, ...]
+            A condition may compare against another field: {"field": "price",
+            "op": "lte", "ref": "stop_loss"}
+        priority: Lower runs first; the first EXIT rule that fires wins
+        is_mandatory: Exit regardless of other considerations (SL, expiry)
+    """
+
+    name = models.CharField(
+        max_length=100,
+        help_text="Rule name"
+    )
+
+    strategy_type = models.CharField(
+        max_length=50,
+        choices=STRATEGY_CHOICES,
+        blank=True,
+        help_text="Strategy this rule applies to (blank = all)"
+    )
+
+    action = models.CharField(
+        max_length=20,
+        choices=RULE_ACTION_CHOICES,
+        default=RULE_ACTION_EXIT,
+        help_text="What happens when the rule fires"
+    )
+
+    reason = models.CharField(
+        max_length=50,
+        help_text="Reason code reported when the rule fires (e.g. STOP_LOSS)"
+    )
+
+    conditions = models.JSONField(
+        default=list,
+        help_text='ANDed conditions, e.g. [{"field": "profit_pct", "op": "gte", "value": 50}]'
+    )
+
+    priority = models.IntegerField(
+        default=100,
+        help_text="Evaluation order (lower first)"
+    )
+
+    is_mandatory = models.BooleanField(
+        default=False,
+        help_text="Mandatory exit (stop-loss, expiry)"
+    )
+
+    is_active = models.BooleanField(
+        default=True,
+        help_text="Whether the rule is evaluated"
+    )
+
+    class Meta:
+        db_table = 'position_rules'
+        verbose_name = 'Position Rule'
+        verbose_name_plural = 'Position Rules'
+        ordering = ['priority', 'id']
+        indexes = [
+            models.Index(fields=['is_active', 'priority']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_action_display()}, {self.strategy_type or 'all strategies'})"
+
+    def clean(self):
+        from apps.positions.services.rule_engine import compile_rule
+
+        try:
+            compile_rule(self)
+        except ValueError as e:
+            raise ValidationError({'conditions': str(e)})
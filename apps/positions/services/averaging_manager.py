@@ -3,7 +3,7 @@ Averaging Manager
 
 Manages averaging (adding to position) for futures positions when they move against us.
 
-Averaging Rules (from design doc):
+Averaging Rules (from design doc; the trigger is an AVERAGE PositionRule):
 - Maximum 3 averaging attempts per position
 - Trigger: Position down by 1% from entry
 - Action: Add equal quantity at current price
@@ -18,6 +18,7 @@ Averaging Sequence:
 Important: Averaging is ONLY for futures, NOT for options
 """
 
+import copy
 import logging
 from decimal import Decimal
 from typing import Dict, Tuple
@@ -26,7 +27,9 @@ from datetime import datetime
 from django.utils import timezone
 from django.db import transaction
 
+from apps.core.constants import RULE_ACTION_AVERAGE
 from apps.positions.models import Position
+from apps.positions.services.rule_engine import evaluate_rules
 from apps.accounts.models import BrokerAccount
 from apps.alerts.services.telegram_client import send_telegram_notification
 
@@ -38,11 +41,11 @@ def should_average_position(position: Position, current_price: Decimal) -> Dict:
     Determine if a position should be averaged
 
     Checks:
-    1. Strategy allows averaging (futures only)
-    2. Not exceeded max averaging attempts (max 3)
-    3. Loss threshold reached (1% from entry)
-    4. Margin available for averaging
-    5. Position still active
+    1. Position still active
+    2. Strategy allows averaging (futures only)     \
+    3. Not exceeded max averaging attempts (max 3)   > AVERAGE rules (rule_engine)
+    4. Loss threshold reached (1% from entry)       /
+    5. Margin available for averaging
 
     Args:
         position: Position instance
@@ -62,19 +65,7 @@ def should_average_position(position: Position, current_price: Decimal) -> Dict:
     logger.info(f"AVERAGING CHECK - Position {position.id}")
     logger.info(f"=" * 80)
 
-    # Check 1: Strategy allows averaging (futures only)
-    if position.strategy_type not in ['LLM_VALIDATED_FUTURES', 'ICICI_FUTURES']:
-        reason = "Averaging not allowed for this strategy (futures only)"
-        logger.warning(f"❌ {reason}")
-        return {
-            'should_average': False,
-            'reason': reason,
-            'loss_pct': Decimal('0'),
-            'current_avg_count': position.averaging_count,
-            'max_avg_count': 3
-        }
-
-    # Check 2: Position status
+    # Check 1: Position status
     if position.status != 'ACTIVE':
         reason = f"Position not active (status: {position.status})"
         logger.warning(f"❌ {reason}")
@@ -86,23 +77,8 @@ def should_average_position(position: Position, current_price: Decimal) -> Dict:
             'max_avg_count': 3
         }
 
-    # Check 3: Not exceeded max averaging attempts
-    max_attempts = 3  # From design doc (can be made configurable via StrategyConfig)
+    max_attempts = 3  # From design doc (the averaging rule's averaging_count condition)
     current_count = position.averaging_count
-
-    if current_count >= max_attempts:
-        reason = f"Maximum averaging attempts reached ({current_count}/{max_attempts})"
-        logger.warning(f"❌ {reason}")
-        return {
-            'should_average': False,
-            'reason': reason,
-            'loss_pct': Decimal('0'),
-            'current_avg_count': current_count,
-            'max_avg_count': max_attempts
-        }
-
-    # Check 4: Calculate loss percentage from entry
-    # Loss is negative when position is losing money
     entry_price = position.entry_price
 
     if position.direction == 'LONG':
@@ -119,14 +95,16 @@ def should_average_position(position: Position, current_price: Decimal) -> Dict:
     logger.info(f"  Entry Price: ₹{entry_price:,.2f}")
     logger.info(f"  Current Price: ₹{current_price:,.2f}")
     logger.info(f"  Loss %: {loss_pct:.2f}%")
-    logger.info(f"  Averaging Count: {current_count}/{max_attempts}")
+    logger.info(f"  Averaging Count: {current_count}")
     logger.info("")
 
-    # Check if loss threshold reached (1% from design doc)
-    loss_threshold = Decimal('-1.0')  # -1% loss
+    # Checks 2-4: strategy, attempts and loss threshold are AVERAGE rules (PositionRule)
+    candidate = copy.copy(position)
+    candidate.current_price = current_price
+    fired = evaluate_rules([candidate], actions=[RULE_ACTION_AVERAGE]).averaging.get(position.pk)
 
-    if loss_pct > loss_threshold:
-        reason = f"Loss {loss_pct:.2f}% not reached threshold ({loss_threshold:.2f}%)"
+    if fired is None:
+        reason = f"No averaging rule matched (loss {loss_pct:.2f}%, {current_count} averages so far)"
         logger.info(f"✅ {reason}")
         return {
             'should_average': False,
@@ -159,10 +137,7 @@ def should_average_position(position: Position, current_price: Decimal) -> Dict:
         }
 
     # All checks passed - averaging should be done
-    reason = (
-        f"Loss threshold breached ({loss_pct:.2f}% < {loss_threshold:.2f}%), "
-        f"averaging attempt {current_count + 1}/{max_attempts}"
-    )
+    reason = f"{fired.message}, averaging attempt {current_count + 1}"
     logger.warning(f"⚠️ AVERAGING TRIGGERED: {reason}")
     logger.info(f"=" * 80)
 
@@ -23,89 +23,33 @@ Put Delta: +0.35
 Net Delta = (-0.40 × 2500) + (+0.35 × 2500) = -1000 + 875 = -125
 
 Target: Net delta close to 0 (delta-neutral)
+
+Deltas are Black-Scholes greeks computed for the whole book in one pass by
+apps.positions.services.portfolio_greeks; alerts are sent when a position's
+delta crosses the threshold, not on every check while it stays beyond it.
 """
 
 import logging
 from decimal import Decimal
-from typing import Dict, Optional
-from datetime import datetime
+from typing import Dict
 
 from django.utils import timezone
 
 from apps.positions.models import Position
+from apps.positions.services.portfolio_greeks import (
+    EVENT_DELTA_BREACH,
+    EVENT_DELTA_RESTORED,
+    MarketSnapshot,
+    PortfolioGreeks,
+    StrangleGreeks,
+    strangle_greeks,
+    update_portfolio_greeks,
+)
 from apps.alerts.services.telegram_client import send_telegram_notification
 
 logger = logging.getLogger(__name__)
 
 
-def calculate_option_delta(
-    spot_price: Decimal,
-    strike_price: Decimal,
-    option_type: str,
-    days_to_expiry: int,
-    volatility: Decimal
-) -> Decimal:
-    """
-    Calculate delta for an option
-
-    This is a simplified approximation. For production, use proper
-    options pricing libraries (e.g., py_vollib, mibian).
-
-    Args:
-        spot_price: Current underlying spot price
-        strike_price: Option strike price
-        option_type: 'CALL' or 'PUT'
-        days_to_expiry: Days remaining to expiry
-        volatility: Implied volatility (as percentage, e.g., 14.5)
-
-    Returns:
-        Decimal: Delta value (-1.0 to +1.0)
-
-    TODO: Replace with proper Black-Scholes delta calculation using py_vollib
-    """
-
-    # Simplified delta approximation based on moneyness ratio
-    # Moneyness = spot / strike (measures how far ITM/OTM the option is)
-    # For production, replace with Black-Scholes delta using py_vollib library
-
-    moneyness = float(spot_price / strike_price)
-
-    if option_type == 'CALL':
-        # Call delta approximation (higher when ITM, lower when OTM)
-        # Long call: 0 to +1, Short call: 0 to -1
-        if moneyness > 1.02:  # Deep ITM (spot >> strike, very likely to exercise)
-            delta = Decimal('0.70')  # High delta, moves almost 1:1 with spot
-        elif moneyness > 1.00:  # ATM (spot ≈ strike, 50-50 chance)
-            delta = Decimal('0.50')  # Standard ATM delta
-        elif moneyness > 0.98:  # Slightly OTM (spot < strike)
-            delta = Decimal('0.40')
-        elif moneyness > 0.95:  # OTM (spot << strike)
-            delta = Decimal('0.25')  # Lower delta, less price sensitivity
-        else:  # Deep OTM (very unlikely to be exercised)
-            delta = Decimal('0.10')  # Very low delta
-
-        # For short call (sold), delta is negative (we benefit when price drops)
-        return -delta
-
-    else:  # PUT
-        # Put delta approximation (negative for long, positive for short)
-        # Long put: 0 to -1, Short put: 0 to +1
-        if moneyness < 0.98:  # Deep ITM (spot << strike, very likely to exercise)
-            delta = Decimal('-0.70')  # High negative delta
-        elif moneyness < 1.00:  # ATM (spot ≈ strike)
-            delta = Decimal('-0.50')  # Standard ATM delta for puts
-        elif moneyness < 1.02:  # Slightly OTM (spot > strike)
-            delta = Decimal('-0.40')
-        elif moneyness < 1.05:  # OTM (spot >> strike)
-            delta = Decimal('-0.25')  # Lower delta, less sensitive
-        else:  # Deep OTM (very unlikely to be exercised)
-            delta = Decimal('-0.10')  # Very low delta
-
-        # For short put (sold), delta is positive (we benefit when price rises)
-        # Negate the long put delta to get short put delta
-        return -delta
-
-
 def calculate_strangle_delta(position: Position, current_spot: Decimal, vix: Decimal) -> Dict:
     """
     Calculate net delta for a short strangle position
@@ -113,7 +57,7 @@ def calculate_strangle_delta(position: Position, current_spot: Decimal, vix: Dec
     Args:
         position: Position instance (short strangle)
         current_spot: Current Nifty spot price
-        vix: Current India VIX
+        vix: Current India VIX (used as the IV of both legs)
 
     Returns:
         dict: {
@@ -125,59 +69,87 @@ def calculate_strangle_delta(position: Position, current_spot: Decimal, vix: Dec
             'details': dict
         }
     """
+    snapshot = MarketSnapshot(spot=float(current_spot), vix=float(vix))
+    row = strangle_greeks([position], snapshot).positions[0]
+    return _delta_data(row, snapshot)
 
-    logger.debug(f"Calculating delta for position {position.id}...")
-
-    # Days to expiry
-    days_to_expiry = (position.expiry_date - timezone.now().date()).days
-
-    # Calculate individual option deltas
-    call_delta = calculate_option_delta(
-        spot_price=current_spot,
-        strike_price=position.call_strike,
-        option_type='CALL',
-        days_to_expiry=days_to_expiry,
-        volatility=vix
-    )
-
-    put_delta = calculate_option_delta(
-        spot_price=current_spot,
-        strike_price=position.put_strike,
-        option_type='PUT',
-        days_to_expiry=days_to_expiry,
-        volatility=vix
-    )
-
-    # Net delta = (call_delta × quantity) + (put_delta × quantity)
-    net_delta = (call_delta * position.quantity) + (put_delta * position.quantity)
-    net_delta_absolute = abs(net_delta)
-
-    logger.debug(f"Delta Calculation:")
-    logger.debug(f"  Call Strike: {position.call_strike}, Delta: {call_delta:.4f}")
-    logger.debug(f"  Put Strike: {position.put_strike}, Delta: {put_delta:.4f}")
-    logger.debug(f"  Quantity: {position.quantity}")
-    logger.debug(f"  Net Delta: {net_delta:.2f}")
 
+def _delta_data(row: StrangleGreeks, snapshot: MarketSnapshot) -> Dict:
     return {
-        'call_delta': call_delta,
-        'put_delta': put_delta,
-        'net_delta': net_delta,
-        'net_delta_absolute': net_delta_absolute,
-        'quantity': position.quantity,
+        'call_delta': Decimal(str(row.call_delta)),
+        'put_delta': Decimal(str(row.put_delta)),
+        'net_delta': row.net_delta,
+        'net_delta_absolute': abs(row.net_delta),
+        'quantity': row.units,
         'details': {
-            'call_strike': float(position.call_strike),
-            'put_strike': float(position.put_strike),
-            'spot_price': float(current_spot),
-            'days_to_expiry': days_to_expiry,
-            'vix': float(vix)
+            'call_strike': float(row.call_strike),
+            'put_strike': float(row.put_strike),
+            'spot_price': snapshot.spot,
+            'days_to_expiry': (row.expiry_date - timezone.localdate()).days,
+            'vix': snapshot.vix,
+            'gamma': row.gamma,
+            'vega': row.vega,
+            'theta': row.theta,
         }
     }
 
 
+def send_delta_alerts(result: PortfolioGreeks) -> int:
+    """
+    Send one Telegram alert per delta state change (breach or back in range).
+
+    Returns:
+        int: Alerts sent
+    """
+    sent = 0
+    spot = Decimal(str(result.snapshot.spot))
+    for row in result.events:
+        if row.event == EVENT_DELTA_BREACH:
+            recommendation = generate_adjustment_recommendation(
+                net_delta=row.net_delta,
+                call_delta=Decimal(str(row.call_delta)),
+                put_delta=Decimal(str(row.put_delta)),
+                quantity=row.units,
+                current_spot=spot,
+                call_strike=row.call_strike,
+                put_strike=row.put_strike
+            )
+            message = (
+                f"⚠️ DELTA ALERT - Position {row.position_id}\n\n"
+                f"Net Delta: {row.net_delta:.2f}\n"
+                f"Threshold: {result.threshold:.2f}\n"
+                f"Spot: ₹{spot:,.0f}\n\n"
+                f"Call: {row.call_strike}CE (Δ={row.call_delta:.4f})\n"
+                f"Put: {row.put_strike}PE (Δ={row.put_delta:.4f})\n\n"
+                f"RECOMMENDATION:\n{recommendation}"
+            )
+            notification_type = 'WARNING'
+        elif row.event == EVENT_DELTA_RESTORED:
+            message = (
+                f"✅ DELTA BACK IN RANGE - Position {row.position_id}\n\n"
+                f"Net Delta: {row.net_delta:.2f} (was {row.old_delta:.2f})\n"
+                f"Threshold: {result.threshold:.2f}\n"
+                f"Spot: ₹{spot:,.0f}"
+            )
+            notification_type = 'INFO'
+        else:
+            continue
+
+        try:
+            send_telegram_notification(message=message, notification_type=notification_type)
+            sent += 1
+        except Exception as e:
+            logger.error(f"Failed to send delta alert for position {row.position_id}: {e}", exc_info=True)
+    return sent
+
+
 def monitor_delta(position: Position, delta_threshold: Decimal = Decimal('300')) -> Dict:
     """
     Monitor delta for a strangle position and generate alerts/recommendations
 
+    Prices the position from a live snapshot (update_portfolio_greeks) and
+    alerts only when its delta moves across the threshold.
+
     Args:
         position: Position instance (short strangle)
         delta_threshold: Alert threshold for absolute net delta (default: 300)
@@ -191,106 +163,36 @@ def monitor_delta(position: Position, delta_threshold: Decimal = Decimal('300'))
             'alert_sent': bool
         }
     """
-
-    logger.info(f"=" * 80)
-    logger.info(f"DELTA MONITORING: Position {position.id}")
-    logger.info(f"=" * 80)
-
     try:
-        # Get current market data
-        # TODO: Fetch real-time spot price and VIX from broker
-        current_spot = Decimal('24000')  # Placeholder
-        vix = Decimal('14.5')  # Placeholder
-
-        # Calculate delta
-        delta_data = calculate_strangle_delta(position, current_spot, vix)
-
-        net_delta = delta_data['net_delta']
-        net_delta_abs = delta_data['net_delta_absolute']
-        call_delta = delta_data['call_delta']
-        put_delta = delta_data['put_delta']
-
-        logger.info(f"Current Spot: ₹{current_spot:,.2f}")
-        logger.info(f"VIX: {vix:.2f}")
-        logger.info("")
-        logger.info(f"Delta Components:")
-        logger.info(f"  Call ({position.call_strike}CE): {call_delta:.4f}")
-        logger.info(f"  Put ({position.put_strike}PE): {put_delta:.4f}")
-        logger.info(f"  Quantity: {position.quantity}")
-        logger.info("")
-        logger.info(f"Net Delta: {net_delta:.2f}")
-        logger.info(f"Absolute Delta: {net_delta_abs:.2f}")
-        logger.info(f"Threshold: {delta_threshold:.2f}")
-        logger.info("")
-
-        # Update position with current delta
-        position.current_delta = net_delta
-        position.save(update_fields=['current_delta'])
-
-        # Check if threshold exceeded
-        delta_exceeded = net_delta_abs > delta_threshold
+        result = update_portfolio_greeks(threshold=delta_threshold, positions=[position])
+        if not result.positions:
+            raise ValueError(f"Position {position.id} has no strikes or expiry to price")
+        row = result.positions[0]
+        delta_data = _delta_data(row, result.snapshot)
 
         recommendation = None
-        alert_sent = False
-
-        if delta_exceeded:
-            logger.warning(f"⚠️ DELTA THRESHOLD EXCEEDED!")
-            logger.warning(f"   Net Delta: {net_delta:.2f}")
-            logger.warning(f"   Threshold: {delta_threshold:.2f}")
-            logger.warning("")
-
-            # Generate adjustment recommendation
+        if row.breached:
             recommendation = generate_adjustment_recommendation(
-                net_delta=net_delta,
-                call_delta=call_delta,
-                put_delta=put_delta,
-                quantity=position.quantity,
-                current_spot=current_spot,
-                call_strike=position.call_strike,
-                put_strike=position.put_strike
+                net_delta=row.net_delta,
+                call_delta=delta_data['call_delta'],
+                put_delta=delta_data['put_delta'],
+                quantity=row.units,
+                current_spot=Decimal(str(result.snapshot.spot)),
+                call_strike=row.call_strike,
+                put_strike=row.put_strike
             )
-
-            logger.warning(f"RECOMMENDATION:")
-            logger.warning(f"{recommendation}")
-            logger.warning("")
-
-            # Send alert
-            try:
-                alert_message = (
-                    f"⚠️ DELTA ALERT - Position {position.id}\n\n"
-                    f"Net Delta: {net_delta:.2f}\n"
-                    f"Threshold: {delta_threshold:.2f}\n"
-                    f"Spot: ₹{current_spot:,.0f}\n\n"
-                    f"Call: {position.call_strike}CE (Δ={call_delta:.4f})\n"
-                    f"Put: {position.put_strike}PE (Δ={put_delta:.4f})\n\n"
-                    f"RECOMMENDATION:\n{recommendation}"
-                )
-
-                send_telegram_notification(
-                    message=alert_message,
-                    notification_type='WARNING'
-                )
-
-                alert_sent = True
-                logger.info(f"✅ Alert sent via Telegram")
-
-            except Exception as e:
-                logger.error(f"Failed to send delta alert: {e}", exc_info=True)
-
-        else:
-            logger.info(f"✅ Delta within acceptable range")
-
-        logger.info(f"=" * 80)
+            logger.warning(f"Position {position.id}: net delta {row.net_delta:.2f} over {result.threshold:.2f}")
 
         return {
-            'delta_exceeded': delta_exceeded,
-            'net_delta': net_delta,
-            'net_delta_absolute': net_delta_abs,
-            'threshold': delta_threshold,
-            'call_delta': call_delta,
-            'put_delta': put_delta,
+            'delta_exceeded': row.breached,
+            'net_delta': row.net_delta,
+            'net_delta_absolute': delta_data['net_delta_absolute'],
+            'threshold': result.threshold,
+            'call_delta': delta_data['call_delta'],
+            'put_delta': delta_data['put_delta'],
             'recommendation': recommendation,
-            'alert_sent': alert_sent,
+            'alert_sent': send_delta_alerts(result) > 0,
+            'event': row.event,
             'details': delta_data['details']
         }
 
@@ -306,6 +208,7 @@ def monitor_delta(position: Position, delta_threshold: Decimal = Decimal('300'))
             'put_delta': Decimal('0'),
             'recommendation': None,
             'alert_sent': False,
+            'event': None,
             'details': {'error': str(e)}
         }
 
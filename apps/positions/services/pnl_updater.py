@@ -1,103 +1,233 @@
 """
 P&L Updater Service
 
-Updates P&L for all active positions by fetching fresh prices from broker APIs
+Updates P&L for all active positions by fetching fresh prices from broker APIs,
+and sends the Telegram P&L alerts for positions whose new price took them
+across an alert threshold (profit > 5%, loss > 3%).
+
+Quotes come from the broker integrations (apps.brokers.integrations), one per
+contract held:
+- Strangles: the LTP of each option leg (Breeze option quote), sent as
+  option_mark_key(...) marks, so the position is marked at call + put premium
+- Futures: the futures LTP (Kotak accounts through get_ltp_from_neo, ICICI
+  accounts through a Breeze futures quote), sent as an instrument mark
+
+Strangles and futures are marked separately, so a futures LTP on an index is
+never read as the combined premium of a strangle on the same index.
 """
 
 import logging
 from decimal import Decimal
-from django.utils import timezone
+from typing import Dict, Hashable, List, Optional
+
+from apps.core.constants import BROKER_KOTAK
 
 logger = logging.getLogger(__name__)
 
 
-def update_all_position_pnl():
+def send_pnl_alerts(result):
     """
-    Update P&L for all active positions by fetching fresh prices
+    Telegram alerts for positions whose P&L crossed an alert threshold in this mark
 
-    Fetches current market prices from broker APIs and recalculates
-    unrealized P&L for all active positions.
+    Args:
+        result: MarkResult from apply_marks()
 
     Returns:
-        dict: Summary of update operation
+        int: Alerts sent
     """
+    from apps.alerts.services.telegram_client import send_telegram_notification
+    from apps.positions.services.position_updates import EVENT_LOSS_ALERT, EVENT_PROFIT_ALERT
+
+    alerts_sent = 0
+
+    # Alert on large profit (>5%) or large loss (>3%)
+    for change in result.crossed(EVENT_PROFIT_ALERT):
+        send_telegram_notification(
+            f"🎉 PROFIT ALERT\n\n"
+            f"Position #{change.position_id}\n"
+            f"Instrument: {change.instrument}\n"
+            f"P&L: ₹{change.pnl:,.0f} ({change.pnl_pct:.2f}%)",
+            notification_type='SUCCESS'
+        )
+        alerts_sent += 1
+    for change in result.crossed(EVENT_LOSS_ALERT):
+        send_telegram_notification(
+            f"⚠️ LOSS ALERT\n\n"
+            f"Position #{change.position_id}\n"
+            f"Instrument: {change.instrument}\n"
+            f"P&L: ₹{change.pnl:,.0f} ({change.pnl_pct:.2f}%)",
+            notification_type='WARNING'
+        )
+        alerts_sent += 1
+    return alerts_sent
+
+
+def _is_strangle(position) -> bool:
+    return bool(position.call_strike and position.put_strike)
+
+
+def _ltp(value) -> Optional[Decimal]:
+    """Positive LTP as Decimal, None for a missing / zero quote"""
     try:
-        from apps.positions.models import Position
-
-        updated_count = 0
-        total_pnl = Decimal('0')
-
-        # Get all active positions
-        positions = Position.objects.filter(status='ACTIVE')
-
-        for position in positions:
-            try:
-                # Fetch current price from broker API
-                current_price = fetch_current_price(position)
-
-                if current_price:
-                    # Update position with new price
-                    position.current_price = current_price
-                    position.updated_at = timezone.now()
+        ltp = Decimal(str(value))
+    except (ArithmeticError, TypeError, ValueError):
+        return None
+    return ltp if ltp > 0 else None
 
-                    # Calculate unrealized P&L
-                    unrealized_pnl = position.calculate_unrealized_pnl()
-                    position.unrealized_pnl = unrealized_pnl
 
-                    position.save()
+def _breeze_ltp(client, **params) -> Optional[Decimal]:
+    """LTP of one contract from a Breeze quote"""
+    resp = client.get_quotes(**params)
+    if not resp or resp.get('Status') != 200 or not resp.get('Success'):
+        error = (resp or {}).get('Error', 'empty response')
+        raise ValueError(f"Breeze quote failed for {params.get('stock_code')}: {error}")
+    return _ltp(resp['Success'][0].get('ltp'))
 
-                    total_pnl += unrealized_pnl or Decimal('0')
-                    updated_count += 1
 
-            except Exception as e:
-                logger.error(f"Error updating P&L for position {position.id}: {e}")
-                continue
+def fetch_option_ltp(client, underlying: str, expiry, strike, option_type: str) -> Optional[Decimal]:
+    """
+    LTP of one option leg
 
-        logger.info(f"Updated P&L for {updated_count} positions. Total P&L: ₹{total_pnl}")
+    Args:
+        client: Breeze client (get_breeze_client())
+        underlying: e.g. 'NIFTY'
+        expiry: Expiry date
+        strike: Strike price
+        option_type: 'CE' or 'PE'
+    """
+    return _breeze_ltp(
+        client,
+        stock_code=underlying,
+        exchange_code='NFO',
+        product_type='options',
+        expiry_date=expiry.strftime('%d-%b-%Y'),
+        right='call' if option_type.upper() == 'CE' else 'put',
+        strike_price=format(Decimal(str(strike)).normalize(), 'f'),  # 25000.00 -> '25000'
+    )
+
+
+def fetch_futures_ltp(client, position) -> Optional[Decimal]:
+    """LTP of the futures contract a position holds, through its account's broker (client: Breeze)"""
+    if position.account.broker == BROKER_KOTAK:
+        from apps.brokers.integrations.neo import get_ltp_from_neo
+
+        symbol = f"{position.instrument}{position.expiry_date:%y%b}FUT".upper()  # e.g. NIFTY26JANFUT
+        return _ltp(get_ltp_from_neo(symbol))
+
+    return _breeze_ltp(
+        client,
+        stock_code=position.instrument,
+        exchange_code='NFO',
+        product_type='futures',
+        expiry_date=position.expiry_date.strftime('%d-%b-%Y'),
+        right='others',
+        strike_price='',
+    )
+
+
+def fetch_marks(positions) -> Dict[Hashable, Decimal]:
+    """
+    Live marks for positions, one quote per contract however many positions hold it
 
-        return {
-            'success': True,
-            'positions_updated': updated_count,
-            'total_pnl': float(total_pnl)
-        }
+    Strangle legs are keyed by option_mark_key(...), futures by instrument
+    (mark strangles and futures with separate apply_marks() calls). Contracts
+    whose quote fails are left out, so their positions keep the stored price.
+    Neo quotes are served through Breeze too, so without a Breeze session
+    nothing is quoted (one warning per run).
+    """
+    from apps.brokers.integrations.breeze import get_breeze_client
+    from apps.positions.services.position_updates import option_mark_key
 
+    if not positions:
+        return {}
+    try:
+        client = get_breeze_client()
     except Exception as e:
-        logger.error(f"Error in update_all_position_pnl: {e}")
-        return {
-            'success': False,
-            'error': str(e)
-        }
+        logger.warning(f"No broker quotes, positions keep their stored prices: {e}")
+        return {}
+
+    marks = {}
+    quoted = {}  # Contract -> LTP (None when the quote failed)
+    for position in positions:
+        if _is_strangle(position):
+            contracts = [
+                (('OPT', position.instrument, position.expiry_date, strike, option_type),
+                 option_mark_key(position.instrument, strike, option_type),
+                 lambda strike=strike, option_type=option_type: fetch_option_ltp(
+                     client, position.instrument, position.expiry_date, strike, option_type))
+                for strike, option_type in ((position.call_strike, 'CE'), (position.put_strike, 'PE'))
+            ]
+        else:
+            contracts = [(('FUT', position.account.broker, position.instrument, position.expiry_date),
+                          position.instrument, lambda: fetch_futures_ltp(client, position))]
+
+        for contract, mark_key, fetch in contracts:
+            if contract not in quoted:
+                try:
+                    quoted[contract] = fetch()
+                except Exception as e:
+                    logger.warning(f"Quote failed for {position.instrument} {contract[-2:]}: {e}")
+                    quoted[contract] = None
+            if quoted[contract] is not None:
+                marks[mark_key] = quoted[contract]
+    return marks
+
+
+def _merge(results: List):
+    """One MarkResult out of several apply_marks() results"""
+    from apps.positions.services.position_updates import MarkResult
+
+    merged = MarkResult()
+    for result in results:
+        merged.changes.extend(result.changes)
+        merged.unchanged += result.unchanged
+        merged.unpriced.extend(result.unpriced)
+        merged.written += result.written
+    return merged
 
 
-def fetch_current_price(position):
+def update_all_position_pnl():
     """
-    Fetch current market price for a position from broker API
+    Update P&L for all active positions by fetching fresh prices
 
-    Args:
-        position: Position object
+    Fetches current market prices from broker APIs, recalculates unrealized
+    P&L for all active positions and sends P&L alerts for the positions the
+    new prices took across an alert threshold.
 
     Returns:
-        Decimal: Current market price, or None if fetch fails
+        dict: Summary of update operation
     """
     try:
-        account = position.account
+        from apps.positions.models import Position
+        from apps.positions.services.position_updates import apply_marks
 
-        if account.broker == 'KOTAK':
-            # Fetch from Kotak Neo
-            from apps.brokers.kotak_neo import get_quote
-            quote = get_quote(position.instrument)
-            return Decimal(str(quote.get('ltp', position.current_price)))
+        # Get all active positions
+        positions = list(Position.objects.filter(status='ACTIVE').select_related('account'))
+        strangles = [position for position in positions if _is_strangle(position)]
+        futures = [position for position in positions if not _is_strangle(position)]
 
-        elif account.broker == 'BREEZE':
-            # Fetch from ICICI Breeze
-            from apps.brokers.breeze import get_quote
-            quote = get_quote(position.instrument)
-            return Decimal(str(quote.get('ltp', position.current_price)))
+        # Recalculate unrealized P&L and write changed rows; strangles from leg
+        # marks only, futures from instrument marks only
+        result = _merge([apply_marks(fetch_marks(group), positions=group) for group in (strangles, futures) if group])
+        alerts_sent = send_pnl_alerts(result)
+        total_pnl = sum((position.unrealized_pnl or Decimal('0') for position in positions), Decimal('0'))
 
-        else:
-            logger.warning(f"Unknown broker: {account.broker}")
-            return position.current_price
+        logger.info(f"Updated P&L for {result.written} positions. Total P&L: ₹{total_pnl}")
+
+        return {
+            'success': True,
+            'positions_updated': result.written,
+            'total_pnl': float(total_pnl),
+            'alerts_sent': alerts_sent,
+            'events': [
+                {'position_id': change.position_id, 'events': change.events}
+                for change in result.events
+            ],
+        }
 
     except Exception as e:
-        logger.error(f"Error fetching price for {position.instrument}: {e}")
-        return position.current_price  # Return existing price as fallback
+        logger.error(f"Error in update_all_position_pnl: {e}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
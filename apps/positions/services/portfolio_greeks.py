@@ -0,0 +1,375 @@
+"""
+Portfolio Greeks for Short Strangles
+
+Computes call, put and net delta (plus gamma, vega and theta) of every open
+strangle from one market snapshot in a single numpy pass, instead of pricing
+each position separately:
+
+1. One snapshot: spot, India VIX and the stored option chain IVs for the
+   expiries in the book (one query, one quote call, VIX is cached).
+2. One array pass: both legs of every position go through Black-Scholes
+   together; strike IV from the chain, falling back to VIX.
+3. One write: current_delta of changed, still-active positions is updated
+   with one UPDATE per batch (CASE on the primary key).
+4. Events only on state changes: a position whose |net delta| moves above
+   the threshold raises DELTA_BREACH, one moving back inside raises
+   DELTA_RESTORED. The previous state is the stored current_delta, so a
+   position that stays breached is not re-alerted on every run.
+
+Greeks are position greeks in units (quantity x lot_size) for the short side:
+a short call has negative delta, a short put positive delta. Vega is per 1
+vol point, theta per calendar day.
+
+Usage:
+    from apps.positions.services.portfolio_greeks import update_portfolio_greeks
+
+    result = update_portfolio_greeks(threshold=300)
+    result.net_delta, result.breached
+    for row in result.events:
+        ...
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Case, DecimalField, Value, When
+from django.utils import timezone
+
+from apps.core.constants import (
+    KOTAK_STRANGLE_PARAMS,
+    MARKET_CLOSE_TIME,
+    POSITION_GREEKS_DEFAULT_VOLATILITY,
+    POSITION_GREEKS_RISK_FREE_RATE,
+    POSITION_STATUS_ACTIVE,
+    POSITION_UPDATE_BATCH_SIZE,
+    STRATEGY_KOTAK_STRANGLE,
+)
+from apps.core.utils.option_math import black_scholes_d1_d2, norm_cdf, norm_pdf
+from apps.positions.models import Position
+
+logger = logging.getLogger(__name__)
+
+EVENT_DELTA_BREACH = 'DELTA_BREACH'
+EVENT_DELTA_RESTORED = 'DELTA_RESTORED'
+
+DELTA_PLACES = Decimal('0.0001')
+SECONDS_PER_YEAR = 365 * 24 * 3600
+MIN_YEARS = 1e-6  # Floor for time to expiry (expiry day after the close)
+
+# Columns needed to price a strangle
+GREEK_FIELDS = (
+    'id', 'account_id', 'instrument', 'status', 'quantity', 'lot_size',
+    'call_strike', 'put_strike', 'expiry_date', 'current_delta',
+)
+
+
+@dataclass
+class MarketSnapshot:
+    """Spot, India VIX and chain IVs (in %) used for one pricing pass."""
+    spot: float
+    vix: Optional[float] = None
+    iv: Dict[Tuple[date, Decimal, str], float] = field(default_factory=dict)
+    as_of: Optional[datetime] = None
+    source: str = 'manual'
+
+    def volatility(self, expiry: date, strike, option_type: str) -> float:
+        """IV in % for one leg: chain IV, else VIX, else the default."""
+        value = self.iv.get((expiry, Decimal(str(strike)).quantize(Decimal('0.01')), option_type))
+        return value or self.vix or POSITION_GREEKS_DEFAULT_VOLATILITY
+
+
+@dataclass
+class StrangleGreeks:
+    """Greeks of one short strangle."""
+    position_id: int
+    account_id: int
+    instrument: str
+    call_strike: Decimal
+    put_strike: Decimal
+    expiry_date: date
+    units: int
+    call_delta: float  # Per unit, short call (<= 0)
+    put_delta: float  # Per unit, short put (>= 0)
+    net_delta: Decimal  # Position delta in units
+    old_delta: Decimal
+    gamma: float
+    vega: float
+    theta: float
+    breached: bool = False
+    event: Optional[str] = None
+
+
+@dataclass
+class PortfolioGreeks:
+    """Outcome of strangle_greeks() / update_portfolio_greeks()."""
+    snapshot: MarketSnapshot
+    threshold: Decimal
+    positions: List[StrangleGreeks] = field(default_factory=list)
+    skipped: List[int] = field(default_factory=list)  # Active strangles without strikes or expiry
+    written: int = 0
+
+    @property
+    def events(self) -> List[StrangleGreeks]:
+        return [row for row in self.positions if row.event]
+
+    @property
+    def breached(self) -> List[StrangleGreeks]:
+        return [row for row in self.positions if row.breached]
+
+    @property
+    def net_delta(self) -> Decimal:
+        return sum((row.net_delta for row in self.positions), Decimal('0')).quantize(DELTA_PLACES)
+
+    def totals(self) -> Dict[str, float]:
+        return {
+            'net_delta': float(self.net_delta),
+            'gamma': sum(row.gamma for row in self.positions),
+            'vega': sum(row.vega for row in self.positions),
+            'theta': sum(row.theta for row in self.positions),
+        }
+
+
+def option_greeks(spot, strike, years, volatility, is_call,
+                  rate: float = POSITION_GREEKS_RISK_FREE_RATE) -> Dict[str, np.ndarray]:
+    """
+    Vectorized Black-Scholes greeks of long options, per unit.
+
+    Args:
+        spot, strike, years, volatility: Broadcastable arrays (years to expiry,
+            annualized volatility as a fraction)
+        is_call: Boolean array, True for calls
+        rate: Annualized risk-free rate
+
+    Returns:
+        dict: delta, gamma, vega (per 1 vol point), theta (per day)
+    """
+    spot, strike, years, volatility, is_call = np.broadcast_arrays(
+        np.asarray(spot, dtype=float), np.asarray(strike, dtype=float), np.asarray(years, dtype=float),
+        np.asarray(volatility, dtype=float), np.asarray(is_call, dtype=bool),
+    )
+    years = np.maximum(years, MIN_YEARS)
+    volatility = np.maximum(volatility, 1e-4)
+    sqrt_t = np.sqrt(years)
+    vol_sqrt = volatility * sqrt_t
+    d1, d2 = black_scholes_d1_d2(spot, strike, years, volatility, rate)
+    pdf = norm_pdf(d1)
+    discounted = rate * strike * np.exp(-rate * years)
+    decay = -spot * pdf * volatility / (2.0 * sqrt_t)
+
+    return {
+        'delta': np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0),
+        'gamma': pdf / (spot * vol_sqrt),
+        'vega': spot * pdf * sqrt_t / 100,
+        'theta': np.where(is_call, decay - discounted * norm_cdf(d2), decay + discounted * norm_cdf(-d2)) / 365,
+    }
+
+
+def years_to_expiry(expiry_dates: Sequence[date], now: Optional[datetime] = None) -> np.ndarray:
+    """Years from now to the market close of each expiry date."""
+    now = now or timezone.now()
+    close = time.fromisoformat(MARKET_CLOSE_TIME)
+    tz = timezone.get_current_timezone()
+    seconds = {
+        expiry: (timezone.make_aware(datetime.combine(expiry, close), tz) - now).total_seconds()
+        for expiry in set(expiry_dates)
+    }
+    return np.array([seconds[expiry] for expiry in expiry_dates], dtype=float) / SECONDS_PER_YEAR
+
+
+def load_snapshot(underlying: str = 'NIFTY', expiries: Optional[Iterable[date]] = None,
+                  spot=None, vix=None, live: bool = True) -> MarketSnapshot:
+    """
+    Take one market snapshot for pricing the book.
+
+    Chain IVs (and a fallback spot) come from the stored OptionChain in one
+    query. Spot is the live index quote and VIX the cached India VIX when
+    live is True; a failed broker call falls back to the stored chain.
+
+    Args:
+        underlying: Chain underlying
+        expiries: Only load chain rows of these expiries (the book's)
+        spot, vix: Use these instead of fetching
+        live: Fetch spot / VIX from the broker when not given
+
+    Raises:
+        ValueError: No spot price available
+    """
+    from apps.data.models import OptionChain
+
+    rows = OptionChain.objects.filter(underlying=underlying).order_by()
+    if expiries is not None:
+        rows = rows.filter(expiry_date__in=set(expiries))
+
+    iv = {}
+    chain_spot, as_of = None, None
+    for expiry, strike, option_type, strike_iv, row_spot, snapshot_time in rows.values_list(
+            'expiry_date', 'strike', 'option_type', 'iv', 'spot_price', 'snapshot_time'):
+        if strike_iv:
+            iv[(expiry, strike.quantize(Decimal('0.01')), option_type)] = float(strike_iv)
+        if row_spot and (as_of is None or snapshot_time > as_of):
+            chain_spot, as_of = row_spot, snapshot_time
+
+    source = 'manual' if spot is not None else 'chain'
+    if live and spot is None:
+        try:
+            from apps.brokers.integrations.breeze import get_nifty_quote
+            spot = Decimal(str(get_nifty_quote().get('ltp') or 0)) or None
+            source, as_of = 'live', timezone.now()
+        except Exception as e:
+            logger.warning(f"Live {underlying} quote unavailable, using stored chain spot: {e}")
+    if live and vix is None:
+        try:
+            from apps.brokers.integrations.breeze import get_india_vix
+            vix = get_india_vix()
+        except Exception as e:
+            logger.warning(f"India VIX unavailable, using chain IVs only: {e}")
+
+    spot = spot if spot is not None else chain_spot
+    if not spot:
+        raise ValueError(f"No {underlying} spot price: live quote failed and no stored option chain")
+    return MarketSnapshot(
+        spot=float(spot),
+        vix=float(vix) if vix else None,
+        iv=iv,
+        as_of=as_of or timezone.now(),
+        source=source,
+    )
+
+
+def strangle_greeks(positions: Sequence[Position], snapshot: MarketSnapshot,
+                    threshold=KOTAK_STRANGLE_PARAMS['delta_rebalance_threshold'],
+                    now: Optional[datetime] = None) -> PortfolioGreeks:
+    """
+    Price every strangle in one array pass (no database access).
+
+    Args:
+        positions: Active strangles (need strikes, expiry, quantity, lot size)
+        snapshot: Market snapshot
+        threshold: Alert level for |net delta| in units
+        now: Pricing time (default: now)
+    """
+    threshold = Decimal(str(threshold))
+    result = PortfolioGreeks(snapshot=snapshot, threshold=threshold)
+    book = []
+    for position in positions:
+        if position.call_strike and position.put_strike and position.expiry_date:
+            book.append(position)
+        else:
+            result.skipped.append(position.pk)
+    if not book:
+        return result
+
+    # Legs laid out as [calls..., puts...]
+    count = len(book)
+    strikes = np.array([float(p.call_strike) for p in book] + [float(p.put_strike) for p in book])
+    vols = np.array(
+        [snapshot.volatility(p.expiry_date, p.call_strike, 'CE') for p in book]
+        + [snapshot.volatility(p.expiry_date, p.put_strike, 'PE') for p in book]
+    ) / 100
+    years = np.tile(years_to_expiry([p.expiry_date for p in book], now), 2)
+    is_call = np.arange(2 * count) < count
+    greeks = option_greeks(snapshot.spot, strikes, years, vols, is_call)
+
+    # Short legs: flip signs, then sum the two legs of each position
+    units = np.array([p.quantity * p.lot_size for p in book], dtype=float)
+    delta = -greeks['delta']
+    net_delta = (delta[:count] + delta[count:]) * units
+    gamma, vega, theta = (-(greeks[name][:count] + greeks[name][count:]) * units for name in ('gamma', 'vega', 'theta'))
+
+    for i, position in enumerate(book):
+        net = Decimal(str(round(float(net_delta[i]), 4)))
+        old = position.current_delta or Decimal('0')
+        breached = abs(net) > threshold
+        was_breached = abs(old) > threshold
+        event = None
+        if breached and not was_breached:
+            event = EVENT_DELTA_BREACH
+        elif was_breached and not breached:
+            event = EVENT_DELTA_RESTORED
+        result.positions.append(StrangleGreeks(
+            position_id=position.pk,
+            account_id=position.account_id,
+            instrument=position.instrument,
+            call_strike=position.call_strike,
+            put_strike=position.put_strike,
+            expiry_date=position.expiry_date,
+            units=int(units[i]),
+            call_delta=round(float(delta[i]), 4),
+            put_delta=round(float(delta[count + i]), 4),
+            net_delta=net,
+            old_delta=old,
+            gamma=float(gamma[i]),
+            vega=float(vega[i]),
+            theta=float(theta[i]),
+            breached=breached,
+            event=event,
+        ))
+    return result
+
+
+def _write(rows: List[StrangleGreeks]) -> int:
+    """Write current_delta of still-active positions, one UPDATE per batch."""
+    written = 0
+    now = timezone.now()
+    delta_field = DecimalField(max_digits=10, decimal_places=4)
+    with transaction.atomic():
+        for start in range(0, len(rows), POSITION_UPDATE_BATCH_SIZE):
+            batch = rows[start:start + POSITION_UPDATE_BATCH_SIZE]
+            written += Position.objects.filter(
+                pk__in=[row.position_id for row in batch], status=POSITION_STATUS_ACTIVE,
+            ).update(
+                current_delta=Case(*(When(pk=row.position_id, then=Value(row.net_delta)) for row in batch),
+                                   output_field=delta_field),
+                updated_at=now,
+            )
+    return written
+
+
+def update_portfolio_greeks(threshold=KOTAK_STRANGLE_PARAMS['delta_rebalance_threshold'],
+                            snapshot: Optional[MarketSnapshot] = None,
+                            positions: Optional[Iterable[Position]] = None,
+                            write: bool = True) -> PortfolioGreeks:
+    """
+    Price all active strangles from one snapshot and persist their net delta.
+
+    Args:
+        threshold: Alert level for |net delta| in units
+        snapshot: Market snapshot (default: load_snapshot() for the book's expiries)
+        positions: Strangles to price (default: all active, loaded in one query).
+            current_delta of the instances is updated in place.
+        write: Save changed deltas (False for previews)
+
+    Returns:
+        PortfolioGreeks
+    """
+    if positions is None:
+        positions = Position.objects.filter(
+            status=POSITION_STATUS_ACTIVE, strategy_type=STRATEGY_KOTAK_STRANGLE,
+        ).only(*GREEK_FIELDS).order_by()
+    positions = [p for p in positions if p.status == POSITION_STATUS_ACTIVE]
+    if not positions:
+        return PortfolioGreeks(snapshot=snapshot or MarketSnapshot(spot=0.0), threshold=Decimal(str(threshold)))
+
+    if snapshot is None:
+        underlying = positions[0].instrument
+        snapshot = load_snapshot(underlying, expiries={p.expiry_date for p in positions if p.expiry_date})
+
+    result = strangle_greeks(positions, snapshot, threshold)
+    changed = [row for row in result.positions if row.net_delta != row.old_delta]
+    if write and changed:
+        result.written = _write(changed)
+
+    by_id = {p.pk: p for p in positions}
+    for row in changed:
+        by_id[row.position_id].current_delta = row.net_delta
+
+    logger.info(
+        f"Priced {len(result.positions)} strangles at spot {snapshot.spot:,.2f} ({snapshot.source}): "
+        f"net delta {result.net_delta}, {len(result.breached)} over {result.threshold}, {len(result.events)} events"
+    )
+    return result
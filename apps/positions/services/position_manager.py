@@ -201,10 +201,13 @@ def update_position_price(
     """
 
     try:
+        from apps.positions.services.position_updates import apply_marks
+
         old_price = position.current_price
         old_pnl = position.unrealized_pnl
 
-        position.update_current_price(current_price)
+        # Same path as the bulk monitors (one UPDATE, threshold events logged)
+        apply_marks({position.instrument: current_price}, positions=[position])
 
         logger.debug(
             f"Price updated for {position.instrument}: "
@@ -0,0 +1,225 @@
+"""
+Bulk Position Mark-to-Market
+
+Applies a batch of price marks to every active position in one pass:
+current price, unrealized P&L, stop-loss / target state and P&L alert
+thresholds. Changed rows are written with one UPDATE per batch (CASE on
+the primary key, restricted to rows still ACTIVE so a position closed in
+the meantime is never overwritten).
+
+The result lists the positions whose price or P&L changed and, separately,
+the ones that crossed a threshold since the previous mark. Monitors and
+alerting act on those events instead of rescanning every position.
+
+Marks are keyed by instrument (combined premium for strangles), or by
+option leg for strangles: option_mark_key(underlying, strike, 'CE' / 'PE').
+A strangle with both leg marks is marked at call + put premium.
+
+Usage:
+    from apps.positions.services.position_updates import apply_marks, option_mark_key
+
+    result = apply_marks({'RELIANCE': Decimal('2510.50'),
+                          option_mark_key('NIFTY', 25000, 'CE'): Decimal('42.10'),
+                          option_mark_key('NIFTY', 23000, 'PE'): Decimal('38.00')})
+    for change in result.crossed(EVENT_STOP_LOSS):
+        ...
+"""
+
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, Value, When
+from django.utils import timezone
+
+from apps.core.constants import (
+    DIRECTION_LONG,
+    DIRECTION_SHORT,
+    POSITION_LOSS_ALERT_PCT,
+    POSITION_PROFIT_ALERT_PCT,
+    POSITION_STATUS_ACTIVE,
+    POSITION_UPDATE_BATCH_SIZE,
+)
+from apps.positions.models import Position
+
+logger = logging.getLogger(__name__)
+
+EVENT_STOP_LOSS = 'STOP_LOSS'
+EVENT_TARGET = 'TARGET'
+EVENT_PROFIT_ALERT = 'PROFIT_ALERT'
+EVENT_LOSS_ALERT = 'LOSS_ALERT'
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+
+# Columns needed to mark a position
+MARK_FIELDS = (
+    'id', 'account_id', 'instrument', 'direction', 'status', 'quantity', 'lot_size',
+    'entry_price', 'current_price', 'stop_loss', 'target', 'call_strike', 'put_strike',
+    'premium_collected', 'entry_value', 'unrealized_pnl',
+)
+
+
+def option_mark_key(underlying: str, strike, option_type: str) -> Tuple[str, Decimal, str]:
+    """Mark key of one option leg, e.g. option_mark_key('NIFTY', 25000, 'CE')."""
+    return (underlying.upper(), Decimal(str(strike)).quantize(CENT), option_type.upper())
+
+
+@dataclass
+class PositionChange:
+    """Price / P&L change of one position, with the thresholds it crossed."""
+    position_id: int
+    account_id: int
+    instrument: str
+    direction: str
+    old_price: Decimal
+    price: Decimal
+    old_pnl: Decimal
+    pnl: Decimal
+    pnl_pct: Decimal
+    events: List[str] = field(default_factory=list)
+
+
+@dataclass
+class MarkResult:
+    """Outcome of apply_marks()."""
+    changes: List[PositionChange] = field(default_factory=list)
+    unchanged: int = 0
+    unpriced: List[int] = field(default_factory=list)  # Active positions without a mark or a stored price
+    written: int = 0
+
+    @property
+    def events(self) -> List[PositionChange]:
+        return [change for change in self.changes if change.events]
+
+    def crossed(self, event: str) -> List[PositionChange]:
+        return [change for change in self.changes if event in change.events]
+
+    @property
+    def total_unrealized_pnl(self) -> Decimal:
+        return sum((change.pnl for change in self.changes), ZERO)
+
+
+def _pnl(position: Position, price: Decimal) -> Decimal:
+    """Unrealized P&L at price (same rules as Position.calculate_unrealized_pnl)."""
+    if position.direction == DIRECTION_LONG:
+        per_unit = price - position.entry_price
+    elif position.direction == DIRECTION_SHORT:
+        per_unit = position.entry_price - price
+    else:  # NEUTRAL (strangle): premium collected minus current premium
+        per_unit = position.premium_collected - price
+    return (per_unit * position.quantity * position.lot_size).quantize(CENT)
+
+
+def _flags(position: Position, price: Decimal, pnl: Decimal) -> set:
+    """Thresholds position is beyond at price (Position.is_stop_loss_hit / is_target_hit rules)."""
+    flags = set()
+    long = position.direction == DIRECTION_LONG
+    if position.stop_loss is not None and (price <= position.stop_loss if long else price >= position.stop_loss):
+        flags.add(EVENT_STOP_LOSS)
+    if position.target is not None and (price >= position.target if long else price <= position.target):
+        flags.add(EVENT_TARGET)
+    if position.entry_value:
+        pct = pnl * 100 / position.entry_value
+        if pct > POSITION_PROFIT_ALERT_PCT:
+            flags.add(EVENT_PROFIT_ALERT)
+        elif pct < -POSITION_LOSS_ALERT_PCT:
+            flags.add(EVENT_LOSS_ALERT)
+    return flags
+
+
+def _mark_price(position: Position, marks: Dict[Hashable, Decimal]) -> Optional[Decimal]:
+    price = marks.get(position.instrument)
+    if price is None and position.call_strike and position.put_strike:
+        call = marks.get(option_mark_key(position.instrument, position.call_strike, 'CE'))
+        put = marks.get(option_mark_key(position.instrument, position.put_strike, 'PE'))
+        if call is not None and put is not None:
+            price = Decimal(str(call)) + Decimal(str(put))
+    return Decimal(str(price)).quantize(CENT) if price is not None else None
+
+
+def _write(changed: List[Position]) -> int:
+    """Write current_price / unrealized_pnl of still-active positions, one UPDATE per batch."""
+    written = 0
+    now = timezone.now()
+    money = DecimalField(max_digits=15, decimal_places=2)
+    with transaction.atomic():
+        for start in range(0, len(changed), POSITION_UPDATE_BATCH_SIZE):
+            batch = changed[start:start + POSITION_UPDATE_BATCH_SIZE]
+            written += Position.objects.filter(
+                pk__in=[position.pk for position in batch], status=POSITION_STATUS_ACTIVE,
+            ).update(
+                current_price=Case(*(When(pk=p.pk, then=Value(p.current_price)) for p in batch), output_field=money),
+                unrealized_pnl=Case(*(When(pk=p.pk, then=Value(p.unrealized_pnl)) for p in batch), output_field=money),
+                updated_at=now,
+            )
+    return written
+
+
+def apply_marks(marks: Optional[Dict[Hashable, Decimal]] = None,
+                positions: Optional[Iterable[Position]] = None,
+                write: bool = True) -> MarkResult:
+    """
+    Mark active positions to market and report threshold crossings.
+
+    Positions without a mark are re-valued at their stored price (which also
+    corrects a stale unrealized P&L).
+
+    Args:
+        marks: {instrument or option_mark_key(...): price}
+        positions: Positions to mark (default: all active, loaded in one query).
+            Instances are updated in place.
+        write: Save changed rows (False for what-if / dashboard previews)
+
+    Returns:
+        MarkResult
+    """
+    marks = marks or {}
+    if positions is None:
+        positions = Position.objects.filter(status=POSITION_STATUS_ACTIVE).only(*MARK_FIELDS).order_by()
+
+    result = MarkResult()
+    changed = []
+    for position in positions:
+        if position.status != POSITION_STATUS_ACTIVE:
+            continue
+        old_price = position.current_price
+        price = _mark_price(position, marks)
+        if price is None:
+            price = old_price
+        if not price:
+            result.unpriced.append(position.pk)
+            continue
+
+        old_pnl = position.unrealized_pnl
+        pnl = _pnl(position, price)
+        if price == old_price and pnl == old_pnl:
+            result.unchanged += 1
+            continue
+
+        crossed = _flags(position, price, pnl) - (_flags(position, old_price, _pnl(position, old_price)) if old_price else set())
+        result.changes.append(PositionChange(
+            position_id=position.pk,
+            account_id=position.account_id,
+            instrument=position.instrument,
+            direction=position.direction,
+            old_price=old_price,
+            price=price,
+            old_pnl=old_pnl,
+            pnl=pnl,
+            pnl_pct=(pnl * 100 / position.entry_value).quantize(CENT) if position.entry_value else ZERO,
+            events=sorted(crossed),
+        ))
+        position.current_price = price
+        position.unrealized_pnl = pnl
+        changed.append(position)
+
+    if write and changed:
+        result.written = _write(changed)
+
+    if result.events:
+        logger.info(f"Marked {len(result.changes)} positions, {len(result.events)} crossed thresholds: " + ", ".join(
+            f"#{change.position_id} {'/'.join(change.events)}" for change in result.events))
+    return result
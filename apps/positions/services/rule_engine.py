@@ -0,0 +1,343 @@
+"""
+Declarative Exit / Averaging Rule Engine
+
+Exit and averaging conditions are data (PositionRule rows, per strategy).
+Each rule is compiled once into a vectorized predicate over the columns of
+the active book; one evaluation loads the book in one query, builds the
+columns once and runs every rule over all positions at once, so a check is
+O(rules) array operations instead of O(positions x rules) method calls and
+queries.
+
+Fields available to conditions (one value per position):
+    price, entry_price, stop_loss, target, quantity, lot_size, averaging_count,
+    pnl (unrealized), pnl_pct (of entry value), move_pct (favourable move % of
+    entry price, or of premium for strangles), profit_pct (move_pct for
+    strangles, pnl_pct otherwise), net_delta, abs_delta, days_to_expiry,
+    stop_loss_hit, target_hit, strategy_type, direction, instrument
+and to the whole book (evaluation time, IST):
+    time ("HH:MM"), weekday ("THURSDAY" or 0-6)
+
+Operators: lt, lte, gt, gte, eq, ne, in, not_in. A condition compares with a
+constant ("value") or another field ("ref"). Missing values (no stop-loss,
+no expiry) never match.
+
+With no rules stored, DEFAULT_POSITION_RULES apply.
+
+Usage:
+    from apps.positions.services.rule_engine import evaluate_rules
+
+    evaluation = evaluate_rules()
+    for position_id, fired in evaluation.exits.items():
+        close_position(..., exit_reason=fired.reason)
+"""
+
+import logging
+import operator
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from django.utils import timezone
+
+from apps.core.constants import (
+    DEFAULT_POSITION_RULES,
+    DIRECTION_LONG,
+    DIRECTION_SHORT,
+    POSITION_STATUS_ACTIVE,
+    RULE_ACTION_AVERAGE,
+    RULE_ACTION_EXIT,
+)
+from apps.positions.models import Position, PositionRule
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY']
+
+OPERATORS = {
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'in': lambda column, values: np.isin(column, list(values)),
+    'not_in': lambda column, values: ~np.isin(column, list(values)),
+}
+
+# Per-position columns, plus book-wide scalars (time, weekday)
+FIELDS = (
+    'price', 'entry_price', 'stop_loss', 'target', 'quantity', 'lot_size', 'averaging_count',
+    'pnl', 'pnl_pct', 'move_pct', 'profit_pct', 'net_delta', 'abs_delta', 'days_to_expiry',
+    'stop_loss_hit', 'target_hit', 'strategy_type', 'direction', 'instrument',
+    'time', 'weekday',
+)
+TEXT_FIELDS = ('strategy_type', 'direction', 'instrument')
+
+# Columns needed to evaluate rules
+RULE_FIELDS = (
+    'id', 'account_id', 'strategy_type', 'instrument', 'direction', 'status', 'quantity', 'lot_size',
+    'entry_price', 'current_price', 'stop_loss', 'target', 'premium_collected', 'entry_value',
+    'unrealized_pnl', 'current_delta', 'expiry_date', 'averaging_count',
+)
+
+
+@dataclass
+class CompiledRule:
+    """A rule with its conditions turned into one array predicate."""
+    rule: PositionRule
+    predicate: Callable[[Dict[str, np.ndarray]], np.ndarray]
+    conditions: List[Dict]
+
+
+@dataclass
+class FiredRule:
+    """A rule that matched one position."""
+    position_id: int
+    instrument: str
+    rule_id: Optional[int]
+    name: str
+    action: str
+    reason: str
+    priority: int
+    is_mandatory: bool
+    price: Decimal
+    details: str  # Matched conditions with the position's values
+
+    @property
+    def message(self) -> str:
+        return f"{self.name}: {self.instrument} ({self.details})"
+
+
+@dataclass
+class RuleEvaluation:
+    """Outcome of evaluate_rules()."""
+    fired: List[FiredRule] = field(default_factory=list)
+    positions: int = 0
+    rules: int = 0
+    invalid: Dict[str, str] = field(default_factory=dict)  # Rule name -> compile error
+
+    @property
+    def exits(self) -> Dict[int, FiredRule]:
+        """First (highest priority) EXIT rule fired per position."""
+        exits = {}
+        for fired in self.fired:
+            if fired.action == RULE_ACTION_EXIT:
+                exits.setdefault(fired.position_id, fired)
+        return exits
+
+    @property
+    def averaging(self) -> Dict[int, FiredRule]:
+        """First AVERAGE rule fired per position that is not also exiting."""
+        exits = self.exits
+        averaging = {}
+        for fired in self.fired:
+            if fired.action == RULE_ACTION_AVERAGE and fired.position_id not in exits:
+                averaging.setdefault(fired.position_id, fired)
+        return averaging
+
+    def for_action(self, action: str) -> List[FiredRule]:
+        return [fired for fired in self.fired if fired.action == action]
+
+    def for_position(self, position_id: int) -> List[FiredRule]:
+        return [fired for fired in self.fired if fired.position_id == position_id]
+
+
+def _normalize(field_name: str, value):
+    """Condition constant in column units (time in minutes, weekday as 0-6), element-wise for lists."""
+    if isinstance(value, (list, tuple)):
+        return [_normalize(field_name, item) for item in value]
+    if field_name == 'time' and isinstance(value, str):
+        hours, minutes = value.split(':')
+        return int(hours) * 60 + int(minutes)
+    if field_name == 'weekday' and isinstance(value, str):
+        return WEEKDAYS.index(value.upper())
+    return value
+
+
+def compile_rule(rule: PositionRule) -> CompiledRule:
+    """
+    Validate a rule and build its predicate.
+
+    Raises:
+        ValueError: Unknown field / operator or malformed condition
+    """
+    conditions = rule.conditions or []
+    if not isinstance(conditions, list) or not conditions:
+        raise ValueError("conditions must be a non-empty list")
+
+    checks = []
+    for condition in conditions:
+        if not isinstance(condition, dict):
+            raise ValueError(f"condition must be an object: {condition!r}")
+        name, op = condition.get('field'), condition.get('op')
+        if name not in FIELDS:
+            raise ValueError(f"unknown field {name!r} (available: {', '.join(FIELDS)})")
+        if op not in OPERATORS:
+            raise ValueError(f"unknown operator {op!r} (available: {', '.join(OPERATORS)})")
+        ref = condition.get('ref')
+        if ref is not None:
+            if ref not in FIELDS:
+                raise ValueError(f"unknown ref field {ref!r}")
+        elif 'value' not in condition:
+            raise ValueError(f"condition on {name!r} needs a value or a ref")
+        try:
+            value = _normalize(name, condition.get('value'))
+        except (ValueError, AttributeError):
+            raise ValueError(f"invalid {name} value {condition.get('value')!r}")
+        if op in ('in', 'not_in') and ref is None and not isinstance(value, (list, tuple)):
+            raise ValueError(f"{op} needs a list value")
+        checks.append((name, OPERATORS[op], ref, value))
+
+    def predicate(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        matched = np.ones(columns['_count'], dtype=bool)
+        for name, compare, ref, value in checks:
+            other = columns[ref] if ref is not None else value
+            matched &= np.asarray(compare(columns[name], other), dtype=bool)
+        return matched
+
+    return CompiledRule(rule=rule, predicate=predicate, conditions=conditions)
+
+
+def default_rules() -> List[PositionRule]:
+    """Unsaved PositionRule instances of DEFAULT_POSITION_RULES."""
+    return [PositionRule(**definition) for definition in DEFAULT_POSITION_RULES]
+
+
+def load_rules() -> List[PositionRule]:
+    """Active rules in priority order (built-in defaults when none are stored)."""
+    if not PositionRule.objects.exists():
+        return default_rules()
+    return list(PositionRule.objects.filter(is_active=True).order_by('priority', 'id'))
+
+
+def book_columns(positions: Sequence[Position], now: datetime) -> Dict[str, np.ndarray]:
+    """Column arrays of the book, one entry per position."""
+    def numbers(attr):
+        return np.array([np.nan if getattr(p, attr) is None else float(getattr(p, attr)) for p in positions],
+                        dtype=float)
+
+    price, entry = numbers('current_price'), numbers('entry_price')
+    stop, target, premium = numbers('stop_loss'), numbers('target'), numbers('premium_collected')
+    pnl, entry_value, delta = numbers('unrealized_pnl'), numbers('entry_value'), numbers('current_delta')
+    direction = np.array([p.direction for p in positions], dtype=object)
+    long, short = direction == DIRECTION_LONG, direction == DIRECTION_SHORT
+    neutral = ~(long | short)
+    today = now.date()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        move_pct = np.where(long, price - entry, np.where(short, entry - price, premium - price)) \
+            / np.where(neutral, premium, entry) * 100
+        pnl_pct = pnl / entry_value * 100
+    # Same rules as Position.is_stop_loss_hit / is_target_hit (NaN never matches)
+    stop_loss_hit = np.where(long, price <= stop, price >= stop)
+    target_hit = np.where(long, price >= target, price <= target)
+
+    return {
+        '_count': len(positions),
+        'price': price,
+        'entry_price': entry,
+        'stop_loss': stop,
+        'target': target,
+        'quantity': numbers('quantity'),
+        'lot_size': numbers('lot_size'),
+        'averaging_count': numbers('averaging_count'),
+        'pnl': pnl,
+        'pnl_pct': pnl_pct,
+        'move_pct': move_pct,
+        'profit_pct': np.where(neutral, move_pct, pnl_pct),
+        'net_delta': delta,
+        'abs_delta': np.abs(delta),
+        'days_to_expiry': np.array([np.nan if p.expiry_date is None else (p.expiry_date - today).days
+                                    for p in positions], dtype=float),
+        'stop_loss_hit': stop_loss_hit,
+        'target_hit': target_hit,
+        'strategy_type': np.array([p.strategy_type for p in positions], dtype=object),
+        'direction': direction,
+        'instrument': np.array([p.instrument for p in positions], dtype=object),
+        'time': now.hour * 60 + now.minute,
+        'weekday': now.weekday(),
+    }
+
+
+def _details(compiled: CompiledRule, columns: Dict[str, np.ndarray], index: int) -> str:
+    def show(name):
+        value = columns[name]
+        value = value[index] if isinstance(value, np.ndarray) else value
+        if name == 'time':
+            return f"{value // 60:02d}:{value % 60:02d}"
+        if name == 'weekday':
+            return WEEKDAYS[value]
+        if isinstance(value, (float, np.floating)):
+            return f"{value:,.2f}"
+        return str(value)
+
+    parts = []
+    for condition in compiled.conditions:
+        name, ref = condition['field'], condition.get('ref')
+        target = show(ref) if ref else condition['value']
+        parts.append(f"{name}={show(name)} {condition['op']} {target}")
+    return ', '.join(parts)
+
+
+def evaluate_rules(positions: Optional[Iterable[Position]] = None,
+                   rules: Optional[Iterable[PositionRule]] = None,
+                   now: Optional[datetime] = None,
+                   actions: Optional[Sequence[str]] = None) -> RuleEvaluation:
+    """
+    Evaluate rules over the active book in one pass.
+
+    Args:
+        positions: Positions to check (default: all active, loaded in one
+            query). Pass freshly marked instances to evaluate a price tick
+            without reloading.
+        rules: Rules to apply (default: load_rules())
+        now: Evaluation time (default: now, in IST)
+        actions: Only evaluate rules with these actions
+
+    Returns:
+        RuleEvaluation: Fired rules in priority order
+    """
+    now = timezone.localtime(now) if now else timezone.localtime()
+    if positions is None:
+        positions = Position.objects.filter(status=POSITION_STATUS_ACTIVE).only(*RULE_FIELDS).order_by()
+    positions = [p for p in positions if p.status == POSITION_STATUS_ACTIVE]
+    rules = [rule for rule in (load_rules() if rules is None else rules)
+             if rule.is_active and (actions is None or rule.action in actions)]
+
+    evaluation = RuleEvaluation(positions=len(positions), rules=len(rules))
+    if not positions or not rules:
+        return evaluation
+
+    columns = book_columns(positions, now)
+    for rule in sorted(rules, key=lambda r: r.priority):
+        try:
+            compiled = compile_rule(rule)
+        except ValueError as e:
+            evaluation.invalid[rule.name] = str(e)
+            logger.error(f"Skipping invalid position rule '{rule.name}': {e}")
+            continue
+
+        matched = compiled.predicate(columns)
+        if rule.strategy_type:
+            matched &= columns['strategy_type'] == rule.strategy_type
+        for index in np.flatnonzero(matched):
+            position = positions[index]
+            evaluation.fired.append(FiredRule(
+                position_id=position.pk,
+                instrument=position.instrument,
+                rule_id=rule.pk,
+                name=rule.name,
+                action=rule.action,
+                reason=rule.reason,
+                priority=rule.priority,
+                is_mandatory=rule.is_mandatory,
+                price=position.current_price,
+                details=_details(compiled, columns, index),
+            ))
+
+    if evaluation.fired:
+        logger.info(f"Rules fired on {len({f.position_id for f in evaluation.fired})} of {len(positions)} positions: "
+                    + ', '.join(f"#{f.position_id} {f.reason}" for f in evaluation.fired))
+    return evaluation
@@ -4,7 +4,7 @@ Position Monitoring Celery Tasks
 Automated tasks for position monitoring and management:
 - Monitor all active positions (every 10 seconds)
 - Update position P&L (every 15 seconds)
-- Check exit conditions (every 30 seconds)
+- Check exit conditions (every 30 seconds, PositionRule rules over the whole book)
 """
 
 import logging
@@ -14,9 +14,12 @@ from django.utils import timezone
 from datetime import datetime
 
 from apps.positions.models import Position
-from apps.positions.services.position_manager import update_position_price, close_position
-from apps.positions.services.exit_manager import should_exit_position, check_exit_conditions
+from apps.positions.services.position_manager import close_position
+from apps.positions.services.pnl_updater import send_pnl_alerts, update_all_position_pnl
+from apps.positions.services.position_updates import EVENT_STOP_LOSS, EVENT_TARGET, apply_marks
+from apps.positions.services.rule_engine import evaluate_rules
 from apps.alerts.services.telegram_client import send_telegram_notification
+from apps.core.constants import RULE_ACTION_EXIT
 
 logger = logging.getLogger(__name__)
 
@@ -29,37 +32,31 @@ def monitor_all_positions():
     Scheduled: Every 10 seconds during market hours
 
     Workflow:
-    1. Get all active positions
-    2. Update current prices from broker
-    3. Update position P&L
-    4. Log any significant changes
+    1. Mark all active positions in one pass (one query, one UPDATE)
+    2. Update position P&L
+    3. Log positions that crossed stop-loss / target since the last mark
+    4. Send P&L threshold alerts
     """
     try:
-        # Get all active positions
-        active_positions = Position.objects.filter(status='ACTIVE')
+        # TODO: Fetch actual current prices from broker API
+        # For now, re-values positions at their stored current_price
+        result = apply_marks()
 
-        if not active_positions.exists():
-            return {'success': True, 'positions_monitored': 0}
+        for change in result.crossed(EVENT_STOP_LOSS) + result.crossed(EVENT_TARGET):
+            logger.warning(
+                f"Position {change.position_id} ({change.instrument}) crossed "
+                f"{'/'.join(change.events)} at ₹{change.price:,.2f}"
+            )
 
-        monitored_count = 0
-
-        for position in active_positions:
-            try:
-                # TODO: Fetch actual current price from broker API
-                # For now, keeping existing current_price
-                current_price = position.current_price
-
-                # Update position price and P&L
-                update_position_price(position, current_price)
-
-                monitored_count += 1
-
-            except Exception as e:
-                logger.error(f"Error monitoring position {position.id}: {e}")
+        # Whichever task marks a position first reports its crossings
+        alerts_sent = send_pnl_alerts(result)
 
         return {
             'success': True,
-            'positions_monitored': monitored_count,
+            'positions_monitored': len(result.changes) + result.unchanged,
+            'positions_updated': result.written,
+            'events': len(result.events),
+            'alerts_sent': alerts_sent,
             'timestamp': timezone.now().isoformat()
         }
 
@@ -76,68 +73,20 @@ def update_position_pnl():
     Scheduled: Every 15 seconds
 
     Workflow:
-    1. Get all active positions
-    2. Calculate unrealized P&L
-    3. Update position records
-    4. Send alerts for significant P&L changes
+    1. Fetch one broker quote per contract held (strangle legs, futures)
+    2. Recalculate unrealized P&L of all active positions and write changed rows in one UPDATE
+    3. Send alerts for positions the new prices took across a P&L threshold
+       (not on every run while they stay beyond it)
     """
     try:
-        active_positions = Position.objects.filter(status='ACTIVE')
-
-        if not active_positions.exists():
-            return {'success': True, 'positions_updated': 0}
-
-        updated_count = 0
-        alerts_sent = 0
-
-        for position in active_positions:
-            try:
-                # Calculate P&L
-                if position.direction == 'LONG':
-                    pnl = (position.current_price - position.entry_price) * position.quantity
-                elif position.direction == 'SHORT':
-                    pnl = (position.entry_price - position.current_price) * position.quantity
-                else:  # NEUTRAL (strangle)
-                    # For strangle, P&L is premium collected minus current premium value
-                    # TODO: Fetch actual current premium from broker
-                    pnl = position.premium_collected  # Placeholder
-
-                # Update unrealized P&L
-                position.unrealized_pnl = pnl
-                position.save(update_fields=['unrealized_pnl'])
-
-                # Check if P&L crosses significant thresholds
-                pnl_pct = (pnl / position.entry_value * Decimal('100')) if position.entry_value > 0 else Decimal('0')
-
-                # Alert on large profit (>5%) or large loss (>3%)
-                if pnl_pct > 5:
-                    send_telegram_notification(
-                        f"🎉 PROFIT ALERT\n\n"
-                        f"Position #{position.id}\n"
-                        f"Instrument: {position.instrument}\n"
-                        f"P&L: ₹{pnl:,.0f} ({pnl_pct:.2f}%)",
-                        notification_type='SUCCESS'
-                    )
-                    alerts_sent += 1
-                elif pnl_pct < -3:
-                    send_telegram_notification(
-                        f"⚠️ LOSS ALERT\n\n"
-                        f"Position #{position.id}\n"
-                        f"Instrument: {position.instrument}\n"
-                        f"P&L: ₹{pnl:,.0f} ({pnl_pct:.2f}%)",
-                        notification_type='WARNING'
-                    )
-                    alerts_sent += 1
-
-                updated_count += 1
-
-            except Exception as e:
-                logger.error(f"Error updating P&L for position {position.id}: {e}")
+        result = update_all_position_pnl()
+        if not result['success']:
+            return {'success': False, 'message': result['error']}
 
         return {
             'success': True,
-            'positions_updated': updated_count,
-            'alerts_sent': alerts_sent
+            'positions_updated': result['positions_updated'],
+            'alerts_sent': result['alerts_sent']
         }
 
     except Exception as e:
@@ -153,65 +102,63 @@ def check_exit_conditions():
     Scheduled: Every 30 seconds
 
     Workflow:
-    1. Get all active positions
-    2. Check stop-loss and target conditions
-    3. Execute exit if conditions met
-    4. Send notifications
+    1. Evaluate the exit rules (PositionRule) over the whole active book in one pass
+    2. Close each position whose highest-priority exit rule fired
+    3. Send notifications
     """
     try:
-        active_positions = Position.objects.filter(status='ACTIVE')
+        evaluation = evaluate_rules(actions=[RULE_ACTION_EXIT])
 
-        if not active_positions.exists():
+        if not evaluation.positions:
             return {'success': True, 'positions_checked': 0}
 
-        checked_count = 0
+        exits = evaluation.exits
+        positions = Position.objects.in_bulk(list(exits))
         exits_executed = 0
 
-        for position in active_positions:
+        for position_id, fired in exits.items():
+            position = positions.get(position_id)
+            if position is None or position.status != 'ACTIVE':
+                continue
+            exit_type = 'MANDATORY' if fired.is_mandatory else 'CONDITIONAL'
             try:
-                current_time = timezone.now()
+                logger.warning(f"⚠️ Exit condition triggered for position {position.id}: {fired.message}")
 
-                # Check exit conditions
-                should_exit, reason, exit_type = should_exit_position(position, current_time)
+                # Close position
+                success, closed_position, message = close_position(
+                    position=position,
+                    exit_price=position.current_price,
+                    exit_reason=fired.reason
+                )
 
-                if should_exit:
-                    logger.warning(f"⚠️ Exit condition triggered for position {position.id}: {reason}")
-
-                    # Close position
-                    success, closed_position, message = close_position(
-                        position=position,
-                        exit_price=position.current_price,
-                        exit_reason=reason
+                if success:
+                    send_telegram_notification(
+                        f"✅ AUTO-EXIT EXECUTED\n\n"
+                        f"Position: #{position.id}\n"
+                        f"Instrument: {position.instrument}\n"
+                        f"Reason: {fired.name} ({fired.details})\n"
+                        f"Exit Type: {exit_type}\n"
+                        f"P&L: ₹{closed_position.realized_pnl:,.0f}",
+                        notification_type='SUCCESS' if closed_position.realized_pnl > 0 else 'WARNING'
+                    )
+                    exits_executed += 1
+                else:
+                    send_telegram_notification(
+                        f"❌ AUTO-EXIT FAILED\n\n"
+                        f"Position: #{position.id}\n"
+                        f"Reason: {fired.reason}\n"
+                        f"Error: {message}",
+                        notification_type='ERROR'
                     )
-
-                    if success:
-                        send_telegram_notification(
-                            f"✅ AUTO-EXIT EXECUTED\n\n"
-                            f"Position: #{position.id}\n"
-                            f"Instrument: {position.instrument}\n"
-                            f"Reason: {reason}\n"
-                            f"Exit Type: {exit_type}\n"
-                            f"P&L: ₹{closed_position.realized_pnl:,.0f}",
-                            notification_type='SUCCESS' if closed_position.realized_pnl > 0 else 'WARNING'
-                        )
-                        exits_executed += 1
-                    else:
-                        send_telegram_notification(
-                            f"❌ AUTO-EXIT FAILED\n\n"
-                            f"Position: #{position.id}\n"
-                            f"Reason: {reason}\n"
-                            f"Error: {message}",
-                            notification_type='ERROR'
-                        )
-
-                checked_count += 1
 
             except Exception as e:
-                logger.error(f"Error checking exit for position {position.id}: {e}")
+                logger.error(f"Error exiting position {position.id}: {e}")
 
         return {
             'success': True,
-            'positions_checked': checked_count,
+            'positions_checked': evaluation.positions,
+            'rules_evaluated': evaluation.rules,
+            'exits_triggered': len(exits),
             'exits_executed': exits_executed
         }
 
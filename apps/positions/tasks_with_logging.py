@@ -18,7 +18,8 @@ from datetime import datetime
 
 from apps.positions.models import Position
 from apps.positions.services.position_manager import update_position_price, close_position
-from apps.positions.services.exit_manager import should_exit_position, check_exit_conditions
+from apps.positions.services.rule_engine import evaluate_rules
+from apps.core.constants import RULE_ACTION_EXIT
 from apps.alerts.services.telegram_client import send_telegram_notification
 
 # Import TaskLogger
@@ -251,10 +252,9 @@ def check_exit_conditions(self):
     Scheduled: Every 30 seconds
 
     Workflow:
-    1. Get all active positions
-    2. Check stop-loss and target conditions
-    3. Execute exit if conditions met
-    4. Send notifications
+    1. Evaluate the exit rules (PositionRule) over the whole active book in one pass
+    2. Close each position whose highest-priority exit rule fired
+    3. Send notifications
     """
     task_logger = TaskLogger(
         task_name='check_exit_conditions',
@@ -263,113 +263,101 @@ def check_exit_conditions(self):
     )
 
     try:
-        active_positions = Position.objects.filter(status='ACTIVE')
+        evaluation = evaluate_rules(actions=[RULE_ACTION_EXIT])
 
-        if not active_positions.exists():
+        if not evaluation.positions:
             task_logger.info('no_positions', "No active positions to check for exit")
             return {'success': True, 'positions_checked': 0}
 
-        task_logger.start(f"Checking exit conditions for {active_positions.count()} positions")
+        task_logger.start(f"Checked {evaluation.rules} exit rules over {evaluation.positions} positions",
+                          context={'invalid_rules': evaluation.invalid} if evaluation.invalid else None)
 
-        checked_count = 0
+        exits = evaluation.exits
+        positions = Position.objects.in_bulk(list(exits))
         exits_executed = 0
         exit_details = []
 
-        for position in active_positions:
+        for position_id, fired in exits.items():
+            position = positions.get(position_id)
+            if position is None or position.status != 'ACTIVE':
+                continue
+            reason = fired.reason
+            exit_type = 'MANDATORY' if fired.is_mandatory else 'CONDITIONAL'
             try:
-                current_time = timezone.now()
-
-                # Check exit conditions
-                should_exit, reason, exit_type = should_exit_position(position, current_time)
-
-                task_logger.debug(
-                    f'exit_check_pos_{position.id}',
-                    f"Exit check for position {position.id}: should_exit={should_exit}",
+                task_logger.warning(
+                    f'exit_triggered_pos_{position.id}',
+                    f"Exit condition triggered for position {position.id}: {fired.message}",
                     context={
                         'position_id': position.id,
-                        'instrument': position.instrument,
-                        'should_exit': should_exit,
+                        'rule': fired.name,
                         'reason': reason,
                         'exit_type': exit_type
                     }
                 )
 
-                if should_exit:
-                    task_logger.warning(
-                        f'exit_triggered_pos_{position.id}',
-                        f"Exit condition triggered for position {position.id}: {reason}",
+                # Close position
+                success, closed_position, message = close_position(
+                    position=position,
+                    exit_price=position.current_price,
+                    exit_reason=reason
+                )
+
+                if success:
+                    task_logger.info(
+                        f'exit_success_pos_{position.id}',
+                        f"Position {position.id} closed successfully",
                         context={
                             'position_id': position.id,
-                            'reason': reason,
-                            'exit_type': exit_type
+                            'realized_pnl': float(closed_position.realized_pnl),
+                            'exit_reason': reason
                         }
                     )
 
-                    # Close position
-                    success, closed_position, message = close_position(
-                        position=position,
-                        exit_price=position.current_price,
-                        exit_reason=reason
+                    send_telegram_notification(
+                        f"✅ AUTO-EXIT EXECUTED\n\n"
+                        f"Position: #{position.id}\n"
+                        f"Instrument: {position.instrument}\n"
+                        f"Reason: {fired.name} ({fired.details})\n"
+                        f"Exit Type: {exit_type}\n"
+                        f"P&L: ₹{closed_position.realized_pnl:,.0f}",
+                        notification_type='SUCCESS' if closed_position.realized_pnl > 0 else 'WARNING'
                     )
-
-                    if success:
-                        task_logger.info(
-                            f'exit_success_pos_{position.id}',
-                            f"Position {position.id} closed successfully",
-                            context={
-                                'position_id': position.id,
-                                'realized_pnl': float(closed_position.realized_pnl),
-                                'exit_reason': reason
-                            }
-                        )
-
-                        send_telegram_notification(
-                            f"✅ AUTO-EXIT EXECUTED\n\n"
-                            f"Position: #{position.id}\n"
-                            f"Instrument: {position.instrument}\n"
-                            f"Reason: {reason}\n"
-                            f"Exit Type: {exit_type}\n"
-                            f"P&L: ₹{closed_position.realized_pnl:,.0f}",
-                            notification_type='SUCCESS' if closed_position.realized_pnl > 0 else 'WARNING'
-                        )
-                        exits_executed += 1
-                        exit_details.append({
+                    exits_executed += 1
+                    exit_details.append({
+                        'position_id': position.id,
+                        'reason': reason,
+                        'pnl': float(closed_position.realized_pnl)
+                    })
+                else:
+                    task_logger.error(
+                        f'exit_failed_pos_{position.id}',
+                        f"Failed to close position {position.id}",
+                        context={
                             'position_id': position.id,
-                            'reason': reason,
-                            'pnl': float(closed_position.realized_pnl)
-                        })
-                    else:
-                        task_logger.error(
-                            f'exit_failed_pos_{position.id}',
-                            f"Failed to close position {position.id}",
-                            context={
-                                'position_id': position.id,
-                                'error_message': message
-                            }
-                        )
-
-                        send_telegram_notification(
-                            f"❌ AUTO-EXIT FAILED\n\n"
-                            f"Position: #{position.id}\n"
-                            f"Reason: {reason}\n"
-                            f"Error: {message}",
-                            notification_type='ERROR'
-                        )
-
-                checked_count += 1
+                            'error_message': message
+                        }
+                    )
+
+                    send_telegram_notification(
+                        f"❌ AUTO-EXIT FAILED\n\n"
+                        f"Position: #{position.id}\n"
+                        f"Reason: {reason}\n"
+                        f"Error: {message}",
+                        notification_type='ERROR'
+                    )
 
             except Exception as e:
                 task_logger.error(
-                    f'exit_check_error_pos_{position.id}',
-                    f"Error checking exit for position {position.id}",
+                    f'exit_error_pos_{position.id}',
+                    f"Error exiting position {position.id}",
                     error=e,
                     context={'position_id': position.id}
                 )
 
         task_logger.success(
-            f"Exit conditions checked for {checked_count} positions, {exits_executed} exits executed",
+            f"Exit conditions checked for {evaluation.positions} positions, {exits_executed} exits executed",
             context={
-                'positions_checked': checked_count,
+                'positions_checked': evaluation.positions,
                 'exits_executed': exits_executed,
                 'exit_details': exit_details
             }
@@ -377,7 +365,7 @@ def check_exit_conditions(self):
 
         return {
             'success': True,
-            'positions_checked': checked_count,
+            'positions_checked': evaluation.positions,
             'exits_executed': exits_executed,
             'exit_details': exit_details
         }
@@ -0,0 +1,352 @@
+"""
+Positions App Tests - Mark-to-Market
+
+Tests for:
+1. Bulk price / P&L updates, threshold crossing events and P&L alerts
+2. Vectorized portfolio greeks and delta threshold events
+3. Declarative exit / averaging rules evaluated over the whole book
+"""
+
+import os
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import BrokerAccount
+from apps.positions.models import Position, PositionRule
+from apps.positions.services.exit_manager import check_exit_conditions
+from apps.positions.services.position_updates import (
+    EVENT_LOSS_ALERT,
+    EVENT_PROFIT_ALERT,
+    EVENT_STOP_LOSS,
+    EVENT_TARGET,
+    apply_marks,
+    option_mark_key,
+)
+from apps.positions.services.portfolio_greeks import (
+    EVENT_DELTA_BREACH,
+    EVENT_DELTA_RESTORED,
+    MarketSnapshot,
+    option_greeks,
+    update_portfolio_greeks,
+)
+from apps.positions.services.rule_engine import evaluate_rules
+from apps.strategies.services import greeks_calculator
+
+
+class ApplyMarksTests(TestCase):
+    """Test the bulk mark-to-market service"""
+
+    def setUp(self):
+        self.account = BrokerAccount.objects.create(
+            broker='KOTAK', account_number='MTM001', account_name='Marks',
+            allocated_capital=Decimal('5000000'), max_daily_loss=Decimal('100000'),
+            max_weekly_loss=Decimal('250000'),
+        )
+        self.strangle = self.make_position(
+            instrument='NIFTY', direction='NEUTRAL', quantity=2, lot_size=75,
+            entry_price=Decimal('80'), current_price=Decimal('80'), premium_collected=Decimal('80'),
+            call_strike=Decimal('25000'), put_strike=Decimal('23000'),
+            stop_loss=Decimal('160'), target=Decimal('20'), entry_value=Decimal('120000'),
+        )
+        self.future = self.make_position(
+            instrument='RELIANCE', direction='LONG', quantity=1, lot_size=250,
+            entry_price=Decimal('2500'), current_price=Decimal('2500'),
+            stop_loss=Decimal('2450'), target=Decimal('2600'), entry_value=Decimal('625000'),
+        )
+
+    def make_position(self, **fields):
+        return Position.objects.create(
+            account=self.account, strategy_type='WEEKLY_NIFTY_STRANGLE', expiry_date=date(2025, 1, 30),
+            margin_used=Decimal('100000'), **fields,
+        )
+
+    def test_marks_update_pnl_in_one_write(self):
+        marks = {
+            option_mark_key('NIFTY', 25000, 'CE'): Decimal('30'),
+            option_mark_key('NIFTY', 23000, 'PE'): Decimal('25.50'),
+            'RELIANCE': Decimal('2520'),
+        }
+        with self.assertNumQueries(4):  # SELECT, then one UPDATE (inside a savepoint under TestCase)
+            result = apply_marks(marks)
+
+        self.assertEqual(result.written, 2)
+        self.strangle.refresh_from_db()
+        self.future.refresh_from_db()
+        self.assertEqual(self.strangle.current_price, Decimal('55.50'))
+        self.assertEqual(self.strangle.unrealized_pnl, Decimal('3675.00'))  # (80 - 55.5) * 2 * 75
+        self.assertEqual(self.future.unrealized_pnl, Decimal('5000.00'))
+        self.assertEqual(result.events, [])
+
+        # Same marks again: nothing to write
+        result = apply_marks(marks)
+        self.assertEqual((result.written, result.unchanged), (0, 2))
+
+    def test_threshold_crossings_are_reported_once(self):
+        result = apply_marks({'NIFTY': Decimal('170'), 'RELIANCE': Decimal('2610')})
+        events = {change.instrument: change.events for change in result.changes}
+        self.assertEqual(events['NIFTY'], [EVENT_LOSS_ALERT, EVENT_STOP_LOSS])
+        self.assertEqual(events['RELIANCE'], [EVENT_TARGET])
+        self.assertEqual([c.position_id for c in result.crossed(EVENT_STOP_LOSS)], [self.strangle.pk])
+
+        # Still beyond the thresholds on the next mark: no new events
+        result = apply_marks({'NIFTY': Decimal('175'), 'RELIANCE': Decimal('2620')})
+        self.assertEqual(result.events, [])
+
+        # Back inside, then across the profit threshold
+        apply_marks({'NIFTY': Decimal('80')})
+        result = apply_marks({'NIFTY': Decimal('30')})
+        self.assertEqual(result.changes[0].events, [EVENT_PROFIT_ALERT])
+
+    def test_closed_positions_are_not_overwritten(self):
+        positions = list(Position.objects.filter(status='ACTIVE'))
+        self.future.close_position(Decimal('2510'))
+
+        result = apply_marks({'RELIANCE': Decimal('2550'), 'NIFTY': Decimal('70')}, positions=positions)
+
+        self.assertEqual(result.written, 1)
+        self.future.refresh_from_db()
+        self.assertEqual(self.future.unrealized_pnl, Decimal('0.00'))
+        self.assertEqual(self.future.current_price, Decimal('2500'))
+
+    def quote_patches(self, quotes, futures=None):
+        """Broker clients answering from quotes: {(stock_code, right, strike): ltp}, Neo futures by symbol"""
+        calls = []
+
+        def get_quotes(**params):
+            calls.append(params)
+            ltp = quotes.get((params['stock_code'], params['right'], params['strike_price']))
+            return {'Status': 200, 'Success': [{'ltp': ltp}]} if ltp is not None else {'Status': 500, 'Error': 'No data'}
+
+        breeze = mock.Mock(get_quotes=mock.Mock(side_effect=get_quotes))
+        return calls, (
+            mock.patch('apps.brokers.integrations.breeze.get_breeze_client', return_value=breeze),
+            mock.patch('apps.brokers.integrations.neo.get_ltp_from_neo',
+                       side_effect=lambda symbol: (futures or {}).get(symbol)),
+        )
+
+    def test_broker_price_crossing_sends_telegram_alert(self):
+        from apps.positions.tasks import update_position_pnl
+
+        futures = {'RELIANCE25JANFUT': 2640.0}  # +5.6% of entry value
+        legs = {('NIFTY', 'call', '25000'): 42, ('NIFTY', 'put', '23000'): 38}  # Unchanged premium
+        _, (breeze, neo) = self.quote_patches(legs, futures)
+        with breeze, neo, mock.patch('apps.alerts.services.telegram_client.send_telegram_notification') as telegram:
+            result = update_position_pnl()
+
+            self.assertEqual(result, {'success': True, 'positions_updated': 1, 'alerts_sent': 1})
+            message = telegram.call_args.args[0]
+            self.assertIn('PROFIT ALERT', message)
+            self.assertIn('RELIANCE', message)
+            self.future.refresh_from_db()
+            self.assertEqual(self.future.current_price, Decimal('2640'))
+
+            # Still beyond the threshold on the next update: no repeat
+            futures['RELIANCE25JANFUT'] = 2650.0
+            self.assertEqual(update_position_pnl()['alerts_sent'], 0)
+            self.assertEqual(telegram.call_count, 1)
+
+    def test_strangle_marked_from_its_legs_not_the_index_future(self):
+        from apps.positions.services.pnl_updater import update_all_position_pnl
+
+        icici = BrokerAccount.objects.create(
+            broker='ICICI', account_number='MTM002', account_name='Futures',
+            allocated_capital=Decimal('5000000'), max_daily_loss=Decimal('100000'),
+            max_weekly_loss=Decimal('250000'),
+        )
+        index_future = Position.objects.create(
+            account=icici, strategy_type='LLM_VALIDATED_FUTURES', instrument='NIFTY', direction='LONG',
+            quantity=1, lot_size=75, expiry_date=date(2025, 1, 30), entry_price=Decimal('24000'),
+            current_price=Decimal('24000'), entry_value=Decimal('1800000'), margin_used=Decimal('100000'),
+        )
+        quotes = {('NIFTY', 'others', ''): 24100, ('NIFTY', 'call', '25000'): 30, ('NIFTY', 'put', '23000'): 25}
+        calls, (breeze, neo) = self.quote_patches(quotes, {'RELIANCE25JANFUT': 2500.0})
+        with breeze, neo, mock.patch('apps.alerts.services.telegram_client.send_telegram_notification') as telegram:
+            result = update_all_position_pnl()
+
+        self.strangle.refresh_from_db()
+        index_future.refresh_from_db()
+        self.assertEqual(self.strangle.current_price, Decimal('55'))  # Call + put, not the 24100 future
+        self.assertEqual(index_future.current_price, Decimal('24100'))
+        self.assertEqual((result['positions_updated'], result['alerts_sent']), (2, 0))
+        telegram.assert_not_called()
+        self.assertIn({'stock_code': 'NIFTY', 'exchange_code': 'NFO', 'product_type': 'options',
+                       'expiry_date': '30-Jan-2025', 'right': 'call', 'strike_price': '25000'}, calls)
+        self.assertEqual(len(calls), 3)  # One quote per contract
+
+
+class PortfolioGreeksTests(TestCase):
+    """Test the one-pass strangle greeks and delta events"""
+
+    def setUp(self):
+        self.account = BrokerAccount.objects.create(
+            broker='KOTAK', account_number='GRK001', account_name='Greeks',
+            allocated_capital=Decimal('5000000'), max_daily_loss=Decimal('100000'),
+            max_weekly_loss=Decimal('250000'),
+        )
+        self.expiry = timezone.localdate() + timedelta(days=7)
+        self.balanced = self.make_strangle(Decimal('25000'), Decimal('23000'))
+        self.skewed = self.make_strangle(Decimal('24000'), Decimal('22500'))
+
+    def make_strangle(self, call_strike, put_strike):
+        return Position.objects.create(
+            account=self.account, strategy_type='WEEKLY_NIFTY_STRANGLE', instrument='NIFTY',
+            direction='NEUTRAL', quantity=10, lot_size=75, expiry_date=self.expiry,
+            entry_price=Decimal('80'), current_price=Decimal('80'), premium_collected=Decimal('80'),
+            call_strike=call_strike, put_strike=put_strike, margin_used=Decimal('100000'), entry_value=Decimal('60000'),
+        )
+
+    def test_vectorized_greeks_match_scalar_model(self):
+        greeks = option_greeks(24000, [25000, 23000], [0.05, 0.05], [0.14, 0.16], [True, False])
+
+        self.assertAlmostEqual(greeks['delta'][0], greeks_calculator.calculate_call_delta(24000, 25000, 0.05, 0.065, 0.14), places=6)
+        self.assertAlmostEqual(greeks['delta'][1], greeks_calculator.calculate_put_delta(24000, 23000, 0.05, 0.065, 0.16), places=6)
+        self.assertAlmostEqual(greeks['gamma'][0], greeks_calculator.calculate_gamma(24000, 25000, 0.05, 0.065, 0.14), places=9)
+        self.assertAlmostEqual(greeks['vega'][1], greeks_calculator.calculate_vega(24000, 23000, 0.05, 0.065, 0.16), places=6)
+        self.assertAlmostEqual(greeks['theta'][0], greeks_calculator.calculate_call_theta(24000, 25000, 0.05, 0.065, 0.14), places=6)
+        self.assertAlmostEqual(greeks['theta'][1], greeks_calculator.calculate_put_theta(24000, 23000, 0.05, 0.065, 0.16), places=6)
+
+    def test_live_greeks_do_not_load_the_backtest_engine(self):
+        script = (
+            "import sys, django; django.setup(); "
+            "import apps.positions.services.portfolio_greeks; "
+            "sys.exit('apps.analytics.services.backtest' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'mcube_ai.settings'})
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_book_priced_and_written_in_one_pass(self):
+        snapshot = MarketSnapshot(spot=24000, vix=14.5, iv={(self.expiry, Decimal('25000.00'), 'CE'): 12.0})
+        with self.assertNumQueries(4):  # SELECT, then one UPDATE (inside a savepoint under TestCase)
+            result = update_portfolio_greeks(threshold=300, snapshot=snapshot)
+
+        self.assertEqual(result.written, 2)
+        rows = {row.position_id: row for row in result.positions}
+        balanced, skewed = rows[self.balanced.pk], rows[self.skewed.pk]
+        self.assertLess(balanced.call_delta, 0)
+        self.assertGreater(balanced.put_delta, 0)
+        self.assertLess(skewed.net_delta, -300)  # At-the-money call: net short delta
+        self.assertLess(abs(balanced.net_delta), 300)
+        self.assertGreater(skewed.theta, 0)  # Short options collect time decay
+        self.assertEqual([row.position_id for row in result.events], [self.skewed.pk])
+        self.assertEqual(skewed.event, EVENT_DELTA_BREACH)
+
+        self.skewed.refresh_from_db()
+        self.assertEqual(self.skewed.current_delta, skewed.net_delta)
+
+        # Lower chain IV on the call leg means a smaller call delta than VIX alone
+        without_iv = update_portfolio_greeks(threshold=300, snapshot=MarketSnapshot(spot=24000, vix=14.5), write=False)
+        vix_only = {row.position_id: row for row in without_iv.positions}[self.balanced.pk]
+        self.assertLess(abs(balanced.call_delta), abs(vix_only.call_delta))
+
+    def test_events_only_on_state_change(self):
+        snapshot = MarketSnapshot(spot=24000, vix=14.5)
+        self.assertEqual(len(update_portfolio_greeks(threshold=300, snapshot=snapshot).events), 1)
+
+        # Still breached: stored delta already beyond the threshold
+        self.assertEqual(update_portfolio_greeks(threshold=300, snapshot=MarketSnapshot(spot=24020, vix=14.5)).events, [])
+
+        # Market falls back towards the put side: skewed strangle is balanced again
+        result = update_portfolio_greeks(threshold=300, snapshot=MarketSnapshot(spot=23350, vix=14.5))
+        events = {row.position_id: row.event for row in result.events}
+        self.assertEqual(events.get(self.skewed.pk), EVENT_DELTA_RESTORED)
+
+
+class RuleEngineTests(TestCase):
+    """Test the declarative exit / averaging rules"""
+
+    def setUp(self):
+        self.account = BrokerAccount.objects.create(
+            broker='ICICI', account_number='RUL001', account_name='Rules',
+            allocated_capital=Decimal('5000000'), max_daily_loss=Decimal('100000'),
+            max_weekly_loss=Decimal('250000'),
+        )
+        self.thursday_close = timezone.make_aware(datetime(2025, 1, 30, 15, 20))
+        self.strangle = self.make_position(
+            strategy_type='WEEKLY_NIFTY_STRANGLE', instrument='NIFTY', direction='NEUTRAL',
+            entry_price=Decimal('80'), current_price=Decimal('30'), premium_collected=Decimal('80'),
+            call_strike=Decimal('25000'), put_strike=Decimal('23000'), stop_loss=Decimal('160'),
+            expiry_date=date(2025, 2, 6),
+        )
+        self.stopped = self.make_position(
+            instrument='RELIANCE', direction='LONG', entry_price=Decimal('2500'), current_price=Decimal('2440'),
+            stop_loss=Decimal('2450'), target=Decimal('2600'),
+        )
+        self.losing = self.make_position(
+            instrument='TCS', direction='SHORT', entry_price=Decimal('4000'), current_price=Decimal('4050'),
+            averaging_count=1,
+        )
+
+    def make_position(self, **fields):
+        fields.setdefault('strategy_type', 'LLM_VALIDATED_FUTURES')
+        fields.setdefault('expiry_date', date(2025, 2, 27))
+        return Position.objects.create(
+            account=self.account, quantity=1, lot_size=50, margin_used=Decimal('100000'),
+            entry_value=Decimal('200000'), **fields,
+        )
+
+    def test_default_rules_over_the_book_in_one_pass(self):
+        with self.assertNumQueries(2):  # Stored rules check, then the active book
+            evaluation = evaluate_rules(now=self.thursday_close)
+
+        exits = evaluation.exits
+        self.assertEqual(exits[self.stopped.pk].reason, 'STOP_LOSS')
+        self.assertTrue(exits[self.stopped.pk].is_mandatory)
+        self.assertEqual(exits[self.strangle.pk].reason, 'EOD_THURSDAY')  # 62.5% of premium captured
+        self.assertIn('profit_pct=62.50 gte 50', exits[self.strangle.pk].details)
+        self.assertNotIn(self.losing.pk, exits)
+        self.assertEqual(list(evaluation.averaging), [self.losing.pk])  # Short, 1.25% against us
+
+        # Before 15:15 the strangle is held
+        morning = evaluate_rules(now=self.thursday_close.replace(hour=11))
+        self.assertNotIn(self.strangle.pk, morning.exits)
+
+    def test_stored_rules_replace_defaults(self):
+        PositionRule.objects.create(
+            name='Wide stop', action='EXIT', reason='WIDE_STOP', priority=5,
+            conditions=[{'field': 'direction', 'op': 'in', 'value': ['LONG', 'SHORT']},
+                        {'field': 'price', 'op': 'gte', 'ref': 'entry_price'}],
+        )
+        PositionRule.objects.create(
+            name='Broken', action='EXIT', reason='BROKEN', conditions=[{'field': 'spot', 'op': 'gt', 'value': 1}],
+        )
+
+        evaluation = evaluate_rules(now=self.thursday_close)
+
+        self.assertEqual({f.position_id: f.reason for f in evaluation.fired}, {self.losing.pk: 'WIDE_STOP'})
+        self.assertIn('Broken', evaluation.invalid)
+        with self.assertRaises(ValidationError):
+            PositionRule(name='Broken', reason='X', conditions=[{'field': 'price', 'op': 'near', 'value': 1}]).clean()
+
+    def test_list_values_are_normalized_per_element(self):
+        PositionRule.objects.create(
+            name='Late week', action='ALERT', reason='LATE_WEEK',
+            conditions=[{'field': 'weekday', 'op': 'in', 'value': ['thursday', 'FRIDAY']},
+                        {'field': 'time', 'op': 'not_in', 'value': ['09:15', '15:30']},
+                        {'field': 'instrument', 'op': 'eq', 'value': 'RELIANCE'}],
+        )
+        PositionRule.objects.create(
+            name='Bad day', action='ALERT', reason='BAD_DAY',
+            conditions=[{'field': 'weekday', 'op': 'in', 'value': ['THURSDAY', 'FUNDAY']}],
+        )
+
+        evaluation = evaluate_rules(now=self.thursday_close)
+
+        self.assertEqual([(f.position_id, f.reason) for f in evaluation.fired], [(self.stopped.pk, 'LATE_WEEK')])
+        self.assertIn('Bad day', evaluation.invalid)
+        self.assertFalse(evaluate_rules(now=self.thursday_close.replace(day=28)).fired)  # Tuesday
+
+    def test_exit_manager_uses_rules(self):
+        result = check_exit_conditions(self.stopped, now=self.thursday_close)
+        self.assertEqual((result['should_exit'], result['exit_reason'], result['is_mandatory']), (True, 'STOP_LOSS', True))
+        self.assertEqual(result['exit_price'], Decimal('2440'))
+
+        self.assertFalse(check_exit_conditions(self.losing, now=self.thursday_close)['should_exit'])
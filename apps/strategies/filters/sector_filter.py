@@ -14,17 +14,19 @@ Rationale:
 Sector tailwinds/headwinds significantly impact individual stock performance.
 Trading against the sector is fighting the tide. We only trade when the sector
 provides a clear, sustained directional bias.
+
+Sector returns are read from the sector performance cache
+(apps.data.services.sector_performance), refreshed once a day for the whole
+universe, so screening many symbols does not query per symbol. Sectors priced
+from the Trendlyne change % alone have no 3-session return; for them the
+short timeframe is the 1-session return.
 """
 
 import logging
 from decimal import Decimal
-from typing import Dict, List
-from datetime import datetime, timedelta
-
-from django.utils import timezone
+from typing import Dict, List, Optional, Tuple
 
-from apps.data.models import TLStockData
-from apps.brokers.models import HistoricalPrice
+from apps.data.services.sector_performance import get_sector_cache, sector_index_for
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +45,9 @@ SECTOR_INDEX_MAP = {
     'FINANCE': 'NIFTYFIN',
 }
 
+# Short timeframe: the 3-session return, else the 1-session one (Trendlyne-only sectors)
+SHORT_TERM_WINDOWS = (3, 1)
+
 
 def get_stock_sector(symbol: str) -> str:
     """
@@ -52,33 +57,10 @@ def get_stock_sector(symbol: str) -> str:
         symbol: Stock symbol (e.g., 'RELIANCE', 'TCS')
 
     Returns:
-        str: Sector name (e.g., 'ENERGY', 'IT')
-
-    TODO: Query from TLStockData model or maintain separate sector mapping
+        str: Trendlyne sector name (e.g., 'Software & Services'), 'UNKNOWN' if not in the universe
     """
 
-    # Placeholder implementation
-    # TODO: Query from TLStockData model
-
-    logger.debug(f"Fetching sector for {symbol}...")
-
-    # Sample sector mapping
-    sector_map = {
-        'RELIANCE': 'ENERGY',
-        'TCS': 'IT',
-        'INFY': 'IT',
-        'HDFCBANK': 'BANKING',
-        'ICICIBANK': 'BANKING',
-        'BHARTIARTL': 'TELECOM',
-        'ITC': 'FMCG',
-        'HINDUNILVR': 'FMCG',
-        'MARUTI': 'AUTO',
-        'TATAMOTORS': 'AUTO',
-        'SUNPHARMA': 'PHARMA',
-        'DRREDDY': 'PHARMA',
-    }
-
-    sector = sector_map.get(symbol, 'UNKNOWN')
+    sector = get_sector_cache().sector_for(symbol) or 'UNKNOWN'
 
     logger.debug(f"{symbol} → {sector}")
 
@@ -90,54 +72,77 @@ def get_sector_index(sector: str) -> str:
     Get sector index symbol for a sector
 
     Args:
-        sector: Sector name (e.g., 'IT', 'BANKING')
+        sector: Sector name (e.g., 'IT', 'Banking Services')
 
     Returns:
         str: Sector index symbol (e.g., 'CNXIT', 'BANKNIFTY')
     """
 
-    sector_index = SECTOR_INDEX_MAP.get(sector, 'NIFTY')
+    sector_index = SECTOR_INDEX_MAP.get(sector) or sector_index_for(sector) or 'NIFTY'
 
     logger.debug(f"Sector {sector} → Index {sector_index}")
 
     return sector_index
 
 
-def get_performance(index_symbol: str, days: int) -> Decimal:
+def get_performance(sector: str, days: int) -> Optional[Decimal]:
     """
-    Get performance (% change) of an index over N days
+    Get performance (% change) of a sector over N sessions
+
+    Read from the sector performance cache (see
+    apps.data.services.sector_performance), no query per call.
 
     Args:
-        index_symbol: Index symbol (e.g., 'CNXIT', 'BANKNIFTY')
-        days: Number of days to look back
+        sector: Sector name or sector index symbol (e.g., 'CNXIT', 'BANKNIFTY')
+        days: Number of sessions to look back (1, 3, 7 or 21)
 
     Returns:
-        Decimal: Percentage change (e.g., 2.5 for +2.5%, -1.8 for -1.8%)
-
-    TODO: Query from HistoricalPrice model or broker API
+        Decimal: Percentage change (e.g., 2.5 for +2.5%, -1.8 for -1.8%), None if not available
     """
 
-    logger.debug(f"Calculating {days}D performance for {index_symbol}...")
+    metrics = get_sector_cache().metrics(sector)
+    value = metrics.performance(days) if metrics else None
+    performance = Decimal(str(round(value, 2))) if value is not None else None
 
-    # Placeholder implementation
-    # TODO: Query actual historical data
+    logger.debug(f"{sector} {days}D performance: {performance}")
 
-    # Mock data - simulate different scenarios
-    if days == 3:
-        # 3-day performance
-        performance = Decimal('1.2')
-    elif days == 7:
-        # 7-day performance
-        performance = Decimal('2.5')
-    elif days == 21:
-        # 21-day performance
-        performance = Decimal('4.8')
-    else:
-        performance = Decimal('0.0')
+    return performance
 
-    logger.debug(f"{index_symbol} {days}D performance: {performance:+.2f}%")
 
-    return performance
+def get_short_term_performance(sector: str) -> Tuple[Optional[Decimal], int]:
+    """
+    Short-timeframe performance of a sector
+
+    Returns:
+        tuple: (% change, sessions it covers), the first of SHORT_TERM_WINDOWS
+        available; (None, 3) if none is
+    """
+
+    for days in SHORT_TERM_WINDOWS:
+        performance = get_performance(sector, days=days)
+        if performance is not None:
+            return performance, days
+    return None, SHORT_TERM_WINDOWS[0]
+
+
+def _no_data(symbol: str, sector: str, sector_index: str) -> Dict:
+    """Verdict when the sector has no cached performance (blocks the trade)."""
+    reason = f'No sector performance data for {symbol} ({sector})'
+    logger.warning(f"❌ NO_DATA - {reason}")
+    return {
+        'verdict': 'NO_DATA',
+        'allow_long': False,
+        'allow_short': False,
+        'reason': reason,
+        'performance': {
+            '3d': Decimal('0'),
+            '7d': Decimal('0'),
+            '21d': Decimal('0')
+        },
+        'short_term_days': SHORT_TERM_WINDOWS[0],
+        'sector': sector,
+        'sector_index': sector_index
+    }
 
 
 def analyze_sector(symbol: str) -> Dict:
@@ -149,22 +154,24 @@ def analyze_sector(symbol: str) -> Dict:
     - For SHORT: ALL timeframes (3D, 7D, 21D) must be NEGATIVE
     - Mixed signals → DON'T TRADE (wait for clarity)
 
-    This is a NON-NEGOTIABLE filter.
+    This is a NON-NEGOTIABLE filter. When the sector has no 3-session return
+    (Trendlyne change % only) the 1-session return stands in for it.
 
     Args:
         symbol: Stock symbol to analyze
 
     Returns:
         dict: {
-            'verdict': str,  # 'STRONG_BULLISH', 'STRONG_BEARISH', 'MIXED'
+            'verdict': str,  # 'STRONG_BULLISH', 'STRONG_BEARISH', 'MIXED', 'NO_DATA'
             'allow_long': bool,
             'allow_short': bool,
             'reason': str,
             'performance': {
-                '3d': Decimal,
+                '3d': Decimal,  # Short timeframe, see short_term_days
                 '7d': Decimal,
                 '21d': Decimal
             },
+            'short_term_days': int,  # 3, or 1 when the sector has no 3-session return
             'sector': str,
             'sector_index': str
         }
@@ -188,11 +195,14 @@ def analyze_sector(symbol: str) -> Dict:
         logger.info("Multi-Timeframe Performance:")
         logger.info("-" * 80)
 
-        perf_3d = get_performance(sector_index, days=3)
-        perf_7d = get_performance(sector_index, days=7)
-        perf_21d = get_performance(sector_index, days=21)
+        perf_3d, short_days = get_short_term_performance(sector)
+        perf_7d = get_performance(sector, days=7)
+        perf_21d = get_performance(sector, days=21)
+        if perf_3d is None or perf_7d is None or perf_21d is None:
+            return _no_data(symbol, sector, sector_index)
+        short = f'{short_days}D'
 
-        logger.info(f"  3-Day:  {perf_3d:+.2f}%")
+        logger.info(f"  {short + ':':<7} {perf_3d:+.2f}%")
         logger.info(f"  7-Day:  {perf_7d:+.2f}%")
         logger.info(f"  21-Day: {perf_21d:+.2f}%")
         logger.info("")
@@ -208,7 +218,7 @@ def analyze_sector(symbol: str) -> Dict:
             allow_short = False
             reason = (
                 f'All timeframes positive - strong sector tailwind '
-                f'(3D: +{perf_3d:.1f}%, 7D: +{perf_7d:.1f}%, 21D: +{perf_21d:.1f}%)'
+                f'({short}: +{perf_3d:.1f}%, 7D: +{perf_7d:.1f}%, 21D: +{perf_21d:.1f}%)'
             )
             logger.info(f"✅ {verdict}")
             logger.info(f"   → LONG positions allowed")
@@ -222,7 +232,7 @@ def analyze_sector(symbol: str) -> Dict:
             allow_short = True
             reason = (
                 f'All timeframes negative - strong sector headwind '
-                f'(3D: {perf_3d:.1f}%, 7D: {perf_7d:.1f}%, 21D: {perf_21d:.1f}%)'
+                f'({short}: {perf_3d:.1f}%, 7D: {perf_7d:.1f}%, 21D: {perf_21d:.1f}%)'
             )
             logger.info(f"✅ {verdict}")
             logger.info(f"   → SHORT positions allowed")
@@ -238,9 +248,9 @@ def analyze_sector(symbol: str) -> Dict:
             # Identify which timeframes are mixed
             mixed_details = []
             if perf_3d > 0:
-                mixed_details.append("3D: bullish")
+                mixed_details.append(f"{short}: bullish")
             else:
-                mixed_details.append("3D: bearish")
+                mixed_details.append(f"{short}: bearish")
 
             if perf_7d > 0:
                 mixed_details.append("7D: bullish")
@@ -271,6 +281,7 @@ def analyze_sector(symbol: str) -> Dict:
                 '7d': perf_7d,
                 '21d': perf_21d
             },
+            'short_term_days': short_days,
             'sector': sector,
             'sector_index': sector_index
         }
@@ -289,6 +300,7 @@ def analyze_sector(symbol: str) -> Dict:
                 '7d': Decimal('0'),
                 '21d': Decimal('0')
             },
+            'short_term_days': SHORT_TERM_WINDOWS[0],
             'sector': 'UNKNOWN',
             'sector_index': 'UNKNOWN'
         }
@@ -309,11 +321,14 @@ def get_strong_sectors(min_performance: Decimal = Decimal('2.0')) -> List[Dict]:
 
     strong_sectors = []
 
-    # Scan all sector indices
-    for sector, sector_index in SECTOR_INDEX_MAP.items():
-        perf_3d = get_performance(sector_index, days=3)
-        perf_7d = get_performance(sector_index, days=7)
-        perf_21d = get_performance(sector_index, days=21)
+    # Scan all cached sectors
+    for metrics in get_sector_cache().all():
+        sector, sector_index = metrics.sector, get_sector_index(metrics.sector)
+        perf_3d, short_days = get_short_term_performance(sector)
+        perf_7d = get_performance(sector, days=7)
+        perf_21d = get_performance(sector, days=21)
+        if perf_3d is None or perf_7d is None or perf_21d is None:
+            continue
 
         # Check if all timeframes positive and meet minimum threshold
         if perf_3d > 0 and perf_7d > 0 and perf_21d >= min_performance:
@@ -324,12 +339,13 @@ def get_strong_sectors(min_performance: Decimal = Decimal('2.0')) -> List[Dict]:
                     '3d': perf_3d,
                     '7d': perf_7d,
                     '21d': perf_21d
-                }
+                },
+                'short_term_days': short_days
             })
 
             logger.info(
                 f"  ✅ {sector} ({sector_index}): "
-                f"3D: +{perf_3d:.1f}%, 7D: +{perf_7d:.1f}%, 21D: +{perf_21d:.1f}%"
+                f"{short_days}D: +{perf_3d:.1f}%, 7D: +{perf_7d:.1f}%, 21D: +{perf_21d:.1f}%"
             )
 
     logger.info(f"Found {len(strong_sectors)} strong sectors")
@@ -352,11 +368,14 @@ def get_weak_sectors(max_performance: Decimal = Decimal('-2.0')) -> List[Dict]:
 
     weak_sectors = []
 
-    # Scan all sector indices
-    for sector, sector_index in SECTOR_INDEX_MAP.items():
-        perf_3d = get_performance(sector_index, days=3)
-        perf_7d = get_performance(sector_index, days=7)
-        perf_21d = get_performance(sector_index, days=21)
+    # Scan all cached sectors
+    for metrics in get_sector_cache().all():
+        sector, sector_index = metrics.sector, get_sector_index(metrics.sector)
+        perf_3d, short_days = get_short_term_performance(sector)
+        perf_7d = get_performance(sector, days=7)
+        perf_21d = get_performance(sector, days=21)
+        if perf_3d is None or perf_7d is None or perf_21d is None:
+            continue
 
         # Check if all timeframes negative and meet minimum threshold
         if perf_3d < 0 and perf_7d < 0 and perf_21d <= max_performance:
@@ -367,12 +386,13 @@ def get_weak_sectors(max_performance: Decimal = Decimal('-2.0')) -> List[Dict]:
                     '3d': perf_3d,
                     '7d': perf_7d,
                     '21d': perf_21d
-                }
+                },
+                'short_term_days': short_days
             })
 
             logger.info(
                 f"  ✅ {sector} ({sector_index}): "
-                f"3D: {perf_3d:.1f}%, 7D: {perf_7d:.1f}%, 21D: {perf_21d:.1f}%"
+                f"{short_days}D: {perf_3d:.1f}%, 7D: {perf_7d:.1f}%, 21D: {perf_21d:.1f}%"
             )
 
     logger.info(f"Found {len(weak_sectors)} weak sectors")
@@ -171,23 +171,13 @@ class NiftyDataFetcher:
             list: List of NiftyOptionChain model objects
         """
         try:
-            from apps.brokers.integrations.breeze import get_breeze_client, get_next_nifty_expiry
+            from apps.brokers.integrations.breeze import get_breeze_client
             from apps.brokers.models import NiftyOptionChain
+            from apps.core.services.trading_calendar import get_trading_calendar
             from datetime import datetime
 
-            # Get current weekly expiry from NSE (handles holidays)
-            try:
-                expiry_str = get_next_nifty_expiry(next_expiry=False)
-            except Exception as e:
-                logger.warning(f"Could not fetch expiry from NSE: {e}, using fallback")
-                # Fallback: Calculate next Tuesday (NIFTY expiries are on Tuesdays as of 2025)
-                from datetime import date, timedelta
-                today = date.today()
-                days_until_tuesday = (1 - today.weekday()) % 7
-                if days_until_tuesday == 0 and datetime.now().hour >= 15:  # After 3 PM on Tuesday
-                    days_until_tuesday = 7
-                expiry = today + timedelta(days=days_until_tuesday)
-                expiry_str = expiry.strftime('%d-%b-%Y').upper()
+            # Current weekly expiry from the trading calendar (holiday-adjusted)
+            expiry_str = get_trading_calendar().next_expiry('NIFTY').strftime('%d-%b-%Y').upper()
 
             logger.info(f"Fetching option chain for expiry: {expiry_str}")
 
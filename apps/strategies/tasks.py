@@ -21,13 +21,16 @@ from apps.strategies.strategies.icici_futures import (
     screen_futures_opportunities,
     execute_icici_futures_entry
 )
-from apps.positions.services.delta_monitor import monitor_delta
+from apps.positions.services.delta_monitor import send_delta_alerts
+from apps.positions.services.portfolio_greeks import update_portfolio_greeks
+from apps.positions.services.rule_engine import evaluate_rules
 from apps.positions.services.averaging_manager import (
     should_average_position,
     get_averaging_recommendation
 )
 from apps.positions.services.exit_manager import should_exit_position
 from apps.alerts.services.telegram_client import send_telegram_notification
+from apps.core.constants import RULE_ACTION_AVERAGE
 
 logger = logging.getLogger(__name__)
 
@@ -204,7 +207,9 @@ def monitor_all_strangle_deltas(delta_threshold=300):
 
     Scheduled: Every 15 minutes during market hours (configurable via UI)
 
-    Checks delta for all strangles and sends alerts if |delta| > delta_threshold
+    Prices every active strangle from one spot/VIX/chain snapshot in a single
+    pass, stores the net deltas in one write and alerts only the positions
+    whose delta crossed delta_threshold (either way) since the last check.
 
     Args:
         delta_threshold: Alert if |Net Delta| exceeds this value (default: 300)
@@ -213,37 +218,24 @@ def monitor_all_strangle_deltas(delta_threshold=300):
     logger.info(f"Delta Threshold: {delta_threshold}")
 
     try:
-        # Get all active strangle positions
-        strangle_positions = Position.objects.filter(
-            status='ACTIVE',
-            strategy_type='WEEKLY_NIFTY_STRANGLE'
-        )
+        result = update_portfolio_greeks(threshold=delta_threshold)
 
-        if not strangle_positions.exists():
+        if not result.positions:
             logger.info("ℹ️ No active strangle positions to monitor")
             return {'success': True, 'positions_monitored': 0}
 
-        monitored_count = 0
-        alerts_sent = 0
-
-        for position in strangle_positions:
-            try:
-                delta_result = monitor_delta(position, delta_threshold=Decimal(str(delta_threshold)))
+        alerts_sent = send_delta_alerts(result)
 
-                if delta_result['delta_exceeded']:
-                    alerts_sent += 1
-
-                monitored_count += 1
-
-            except Exception as e:
-                logger.error(f"Error monitoring delta for position {position.id}: {e}")
-
-        logger.info(f"✅ Monitored {monitored_count} positions, {alerts_sent} alerts sent")
+        logger.info(f"✅ Monitored {len(result.positions)} positions, {len(result.breached)} over threshold, "
+                    f"{alerts_sent} alerts sent")
 
         return {
             'success': True,
-            'positions_monitored': monitored_count,
-            'alerts_sent': alerts_sent
+            'positions_monitored': len(result.positions),
+            'positions_breached': len(result.breached),
+            'alerts_sent': alerts_sent,
+            'net_delta': float(result.net_delta),
+            'spot': result.snapshot.spot,
         }
 
     except Exception as e:
@@ -324,28 +316,26 @@ def check_futures_averaging():
     Scheduled: Every 10 minutes during market hours
 
     Workflow:
-    1. Get all active futures positions
-    2. Check if averaging needed (1% loss trigger)
+    1. Evaluate the AVERAGE rules (PositionRule) over all active positions in one pass
+    2. Check margin and build the preview for the matched positions
     3. Send recommendation via Telegram
     4. Wait for manual approval to execute averaging
     """
     logger.info("CELERY TASK: Futures Averaging Check")
 
     try:
-        # Get all active futures positions
-        futures_positions = Position.objects.filter(
-            status='ACTIVE',
-            strategy_type='LLM_VALIDATED_FUTURES'
-        )
+        # One pass of the AVERAGE rules over the whole book; only matches are checked further
+        evaluation = evaluate_rules(actions=[RULE_ACTION_AVERAGE])
+        candidates = Position.objects.filter(pk__in=list(evaluation.averaging)).select_related('account')
 
-        if not futures_positions.exists():
+        if not evaluation.positions:
             logger.info("ℹ️ No active futures positions to check")
             return {'success': True, 'positions_checked': 0}
 
-        checked_count = 0
+        checked_count = evaluation.positions
         averaging_recommendations = 0
 
-        for position in futures_positions:
+        for position in candidates:
             try:
                 # Get current price
                 # TODO: Fetch actual current price from broker
@@ -378,8 +368,6 @@ def check_futures_averaging():
                     send_telegram_notification(message, notification_type='WARNING')
                     averaging_recommendations += 1
 
-                checked_count += 1
-
             except Exception as e:
                 logger.error(f"Error checking averaging for position {position.id}: {e}")
 
@@ -817,10 +817,9 @@ def fetch_nifty_price():
 
 
 def check_if_expiry_day(trading_date):
-    """Check if today is expiry day"""
-    # TODO: Implement actual expiry day check
-    # Weekly expiry is Thursday
-    return trading_date.weekday() == 3  # Thursday
+    """Check if today is NIFTY expiry day"""
+    from apps.core.services.trading_calendar import get_trading_calendar
+    return get_trading_calendar().is_expiry_day('NIFTY', trading_date)
 
 
 def fetch_position_current_price(position):
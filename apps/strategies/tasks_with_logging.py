@@ -24,13 +24,16 @@ from apps.strategies.strategies.icici_futures import (
     screen_futures_opportunities,
     execute_icici_futures_entry
 )
-from apps.positions.services.delta_monitor import monitor_delta
+from apps.positions.services.delta_monitor import send_delta_alerts
+from apps.positions.services.portfolio_greeks import update_portfolio_greeks
+from apps.positions.services.rule_engine import evaluate_rules
 from apps.positions.services.averaging_manager import (
     should_average_position,
     get_averaging_recommendation
 )
 from apps.positions.services.exit_manager import should_exit_position
 from apps.alerts.services.telegram_client import send_telegram_notification
+from apps.core.constants import RULE_ACTION_AVERAGE
 
 # Import TaskLogger
 from apps.core.utils.task_logger import TaskLogger
@@ -249,7 +252,9 @@ def monitor_all_strangle_deltas(self, delta_threshold=300):
 
     Scheduled: Every 15 minutes during market hours (configurable via UI)
 
-    Checks delta for all strangles and sends alerts if |delta| > delta_threshold
+    Prices every active strangle from one spot/VIX/chain snapshot in a single
+    pass, stores the net deltas in one write and alerts only the positions
+    whose delta crossed delta_threshold (either way) since the last check.
 
     Args:
         delta_threshold: Alert if |Net Delta| exceeds this value (default: 300)
@@ -263,59 +268,37 @@ def monitor_all_strangle_deltas(self, delta_threshold=300):
     task_logger.start(f"Monitoring delta for all strangles (threshold: {delta_threshold})")
 
     try:
-        # Get all active strangle positions
-        strangle_positions = Position.objects.filter(
-            status='ACTIVE',
-            strategy_type='WEEKLY_NIFTY_STRANGLE'
-        )
+        result = update_portfolio_greeks(threshold=delta_threshold)
 
-        if not strangle_positions.exists():
+        if not result.positions:
             task_logger.info('no_strangles', "No active strangle positions to monitor")
             return {'success': True, 'positions_monitored': 0}
 
-        task_logger.step('monitoring', f"Monitoring delta for {strangle_positions.count()} strangles")
-
-        monitored_count = 0
-        alerts_sent = 0
-
-        for position in strangle_positions:
-            try:
-                delta_result = monitor_delta(position, delta_threshold=Decimal(str(delta_threshold)))
+        task_logger.step('monitoring', f"Priced {len(result.positions)} strangles at spot {result.snapshot.spot:,.2f}",
+                         context={'source': result.snapshot.source, 'totals': result.totals()})
 
-                task_logger.debug(f'delta_pos_{position.id}',
-                                f"Delta monitored for position {position.id}",
+        for row in result.events:
+            task_logger.warning(f'delta_{row.event.lower()}_pos_{row.position_id}',
+                                f"Delta {row.event} for position {row.position_id}",
                                 context={
-                                    'position_id': position.id,
-                                    'current_delta': float(position.current_delta),
-                                    'delta_exceeded': delta_result['delta_exceeded']
+                                    'position_id': row.position_id,
+                                    'current_delta': float(row.net_delta),
+                                    'previous_delta': float(row.old_delta),
+                                    'threshold': delta_threshold
                                 })
 
-                if delta_result['delta_exceeded']:
-                    task_logger.warning(f'delta_alert_pos_{position.id}',
-                                      f"Delta alert for position {position.id}",
-                                      context={
-                                          'position_id': position.id,
-                                          'current_delta': float(position.current_delta),
-                                          'threshold': delta_threshold
-                                      })
-                    alerts_sent += 1
-
-                monitored_count += 1
-
-            except Exception as e:
-                task_logger.error(f'delta_error_pos_{position.id}',
-                                f"Error monitoring delta for position {position.id}",
-                                error=e,
-                                context={'position_id': position.id})
+        alerts_sent = send_delta_alerts(result)
 
         task_logger.success(f"Delta monitoring complete", context={
-            'positions_monitored': monitored_count,
+            'positions_monitored': len(result.positions),
+            'positions_breached': len(result.breached),
             'alerts_sent': alerts_sent
         })
 
         return {
             'success': True,
-            'positions_monitored': monitored_count,
+            'positions_monitored': len(result.positions),
+            'positions_breached': len(result.breached),
             'alerts_sent': alerts_sent
         }
 
@@ -408,8 +391,8 @@ def check_futures_averaging(self):
     Scheduled: Every 10 minutes during market hours
 
     Workflow:
-    1. Get all active futures positions
-    2. Check if averaging needed (1% loss trigger)
+    1. Evaluate the AVERAGE rules (PositionRule) over all active positions in one pass
+    2. Check margin and build the preview for the matched positions
     3. Send recommendation via Telegram
     4. Wait for manual approval to execute averaging
     """
@@ -422,22 +405,20 @@ def check_futures_averaging(self):
     task_logger.start("Checking futures positions for averaging opportunities")
 
     try:
-        # Get all active futures positions
-        futures_positions = Position.objects.filter(
-            status='ACTIVE',
-            strategy_type='LLM_VALIDATED_FUTURES'
-        )
+        # One pass of the AVERAGE rules over the whole book; only matches are checked further
+        evaluation = evaluate_rules(actions=[RULE_ACTION_AVERAGE])
+        candidates = Position.objects.filter(pk__in=list(evaluation.averaging)).select_related('account')
 
-        if not futures_positions.exists():
+        if not evaluation.positions:
             task_logger.info('no_futures', "No active futures positions to check")
             return {'success': True, 'positions_checked': 0}
 
-        task_logger.step('checking', f"Checking {futures_positions.count()} futures positions")
+        task_logger.step('checking', f"{len(evaluation.averaging)} of {evaluation.positions} positions matched an averaging rule")
 
-        checked_count = 0
+        checked_count = evaluation.positions
         averaging_recommendations = 0
 
-        for position in futures_positions:
+        for position in candidates:
             try:
                 # Get current price
                 # TODO: Fetch actual current price from broker
@@ -484,8 +465,6 @@ def check_futures_averaging(self):
                     send_telegram_notification(message, notification_type='WARNING')
                     averaging_recommendations += 1
 
-                checked_count += 1
-
             except Exception as e:
                 task_logger.error(f'avg_error_pos_{position.id}',
                                 f"Error checking averaging for position {position.id}",
@@ -6,7 +6,9 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Q
-from apps.trading.models import TradeSuggestion, AutoTradeConfig, TradeSuggestionLog, PositionSize
+from apps.trading.models import (
+    TradeSuggestion, AutoTradeConfig, TradeSuggestionLog, PositionSize, AnalysisJob, AnalysisJobItem
+)
 
 
 @admin.register(TradeSuggestion)
@@ -464,3 +466,26 @@ class PositionSizeAdmin(admin.ModelAdmin):
 
     def has_add_permission(self, request):
         return False
+
+
+class AnalysisJobItemInline(admin.TabularInline):
+    model = AnalysisJobItem
+    extra = 0
+    fields = ['index', 'symbol', 'expiry', 'status', 'from_cache', 'duration_ms', 'created_at']
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    """Admin interface for analysis jobs (futures screens, strangles, deep-dives)"""
+
+    list_display = ['id', 'kind', 'user', 'status', 'completed_items', 'total_items', 'failed_items',
+                    'created_at', 'finished_at']
+    list_filter = ['kind', 'status', 'created_at']
+    readonly_fields = ['user', 'kind', 'status', 'params', 'total_items', 'completed_items', 'failed_items',
+                       'result', 'error', 'is_cancelled', 'cancel_reason', 'created_at', 'started_at', 'finished_at']
+    inlines = [AnalysisJobItemInline]
+
+    def has_add_permission(self, request):
+        return False
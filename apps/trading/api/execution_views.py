@@ -118,22 +118,34 @@ def get_execution_progress(request, suggestion_id):
                 'error': 'No execution found'
             })
 
-        # For now, return basic progress
-        # In future, this can be enhanced with detailed batch info
+        from apps.core.utils.event_stream import ExecutionEventStream
+
+        try:
+            since = int(request.GET.get('since', 0))
+        except (TypeError, ValueError):
+            since = 0
+
+        # Progress comes from the execution event stream published by the
+        # batch execution engine
+        stream, events = ExecutionEventStream.read(
+            OrderExecutionControl.progress_key_for(suggestion_id), since=since
+        )
+        leg_progress = stream.get('leg_progress') or {}
+        total_batches = stream['total_batches'] or control.total_batches
+
         return JsonResponse({
             'success': True,
             'progress': {
-                'batches_completed': control.batches_completed,
-                'total_batches': control.total_batches,
-                'call_orders': control.batches_completed,  # Simplified for now
-                'put_orders': control.batches_completed,   # Simplified for now
-                'current_batch': {
-                    'batch_num': control.batches_completed + 1,
-                    'lots': None,
-                    'quantity': None
-                },
-                'is_cancelled': control.is_cancelled
-            }
+                'batches_completed': stream['batches_completed'],
+                'total_batches': total_batches,
+                'call_orders': leg_progress.get('CALL', 0),
+                'put_orders': leg_progress.get('PUT', 0),
+                'current_batch': stream['current_batch'],
+                'is_cancelled': control.is_cancelled or stream['is_cancelled'],
+                'is_complete': stream['is_complete'],
+                'is_success': stream['is_success']
+            },
+            'events': events
         })
 
     except Exception as e:
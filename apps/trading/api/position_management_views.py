@@ -684,19 +684,23 @@ def close_live_position(request):
         # Generate progress tracking key
         progress_key = f"close_progress_{request.user.id}_{broker}_{symbol.replace('/', '_')}"
 
+        # Progress is published to an execution event stream; the progress
+        # endpoint returns the snapshot plus events newer than the client's cursor
+        from apps.core.utils.event_stream import ExecutionEventStream
+        progress_stream = ExecutionEventStream(progress_key)
+
         def update_progress(batches_completed, total_batches, current_batch=None, log_message=None, log_type='info', is_complete=False, is_success=False, is_cancelled=False):
-            progress = {
-                'batches_completed': batches_completed,
-                'total_batches': total_batches,
-                'current_batch': current_batch,
-                'is_cancelled': is_cancelled,
-                'is_complete': is_complete,
-                'is_success': is_success,
-                'last_log_message': log_message,
-                'last_log_type': log_type
-            }
-            cache.set(progress_key, progress, 600)
-            return progress
+            progress_stream.update(
+                batches_completed=batches_completed,
+                total_batches=total_batches,
+                current_batch=current_batch,
+                is_cancelled=is_cancelled,
+                is_complete=is_complete,
+                is_success=is_success
+            )
+            if log_message:
+                progress_stream.publish('progress', log_message, log_type)
+            return progress_stream.snapshot
 
         if broker == 'neo':
             return _close_neo_position(symbol, abs_quantity, direction, product, cancellation_key, progress_key, update_progress)
@@ -731,7 +735,6 @@ def _close_neo_position(symbol, abs_quantity, direction, product, cancellation_k
         transaction_type=transaction_type,
         product=product if product in ['NRML', 'MIS', 'CNC'] else 'NRML',
         batch_size=10,
-        delay_seconds=10,
         position_type='OPTION',
         cancellation_key=cancellation_key,
         progress_key=progress_key
@@ -1042,8 +1045,11 @@ def get_close_position_progress(request, broker, symbol):
         - broker: 'breeze' or 'neo'
         - symbol: Trading symbol
 
+    GET params:
+        - since: Last event sequence number the client has seen (default 0)
+
     Returns:
-        JSON with progress information
+        JSON with progress snapshot and events newer than `since`
     """
     if not request.user.is_authenticated:
         return JsonResponse({
@@ -1052,22 +1058,21 @@ def get_close_position_progress(request, broker, symbol):
         }, status=401)
 
     try:
+        from apps.core.utils.event_stream import ExecutionEventStream
+
         progress_key = f"close_progress_{request.user.id}_{broker}_{symbol.replace('/', '_')}"
 
-        progress = cache.get(progress_key, {
-            'batches_completed': 0,
-            'total_batches': 0,
-            'current_batch': None,
-            'is_cancelled': False,
-            'is_complete': False,
-            'is_success': False,
-            'last_log_message': None,
-            'last_log_type': None
-        })
+        try:
+            since = int(request.GET.get('since', 0))
+        except (TypeError, ValueError):
+            since = 0
+
+        progress, events = ExecutionEventStream.read(progress_key, since=since)
 
         return JsonResponse({
             'success': True,
-            'progress': progress
+            'progress': progress,
+            'events': events
         })
 
     except Exception as e:
@@ -1528,22 +1528,34 @@ def get_execution_progress(request, suggestion_id):
                 'error': 'No execution found'
             })
 
-        # For now, return basic progress
-        # In future, this can be enhanced with detailed batch info
+        from apps.core.utils.event_stream import ExecutionEventStream
+
+        try:
+            since = int(request.GET.get('since', 0))
+        except (TypeError, ValueError):
+            since = 0
+
+        # Progress comes from the execution event stream published by the
+        # batch execution engine
+        stream, events = ExecutionEventStream.read(
+            OrderExecutionControl.progress_key_for(suggestion_id), since=since
+        )
+        leg_progress = stream.get('leg_progress') or {}
+        total_batches = stream['total_batches'] or control.total_batches
+
         return JsonResponse({
             'success': True,
             'progress': {
-                'batches_completed': control.batches_completed,
-                'total_batches': control.total_batches,
-                'call_orders': control.batches_completed,  # Simplified for now
-                'put_orders': control.batches_completed,   # Simplified for now
-                'current_batch': {
-                    'batch_num': control.batches_completed + 1,
-                    'lots': None,
-                    'quantity': None
-                },
-                'is_cancelled': control.is_cancelled
-            }
+                'batches_completed': stream['batches_completed'],
+                'total_batches': total_batches,
+                'call_orders': leg_progress.get('CALL', 0),
+                'put_orders': leg_progress.get('PUT', 0),
+                'current_batch': stream['current_batch'],
+                'is_cancelled': control.is_cancelled or stream['is_cancelled'],
+                'is_complete': stream['is_complete'],
+                'is_success': stream['is_success']
+            },
+            'events': events
         })
 
     except Exception as e:
@@ -2483,20 +2495,23 @@ def close_live_position(request):
         # Generate progress tracking key
         progress_key = f"close_progress_{request.user.id}_{broker}_{symbol.replace('/', '_')}"
 
-        # Initialize progress in cache
+        # Progress is published to an execution event stream; the progress
+        # endpoint returns the snapshot plus events newer than the client's cursor
+        from apps.core.utils.event_stream import ExecutionEventStream
+        progress_stream = ExecutionEventStream(progress_key)
+
         def update_progress(batches_completed, total_batches, current_batch=None, log_message=None, log_type='info', is_complete=False, is_success=False, is_cancelled=False):
-            progress = {
-                'batches_completed': batches_completed,
-                'total_batches': total_batches,
-                'current_batch': current_batch,
-                'is_cancelled': is_cancelled,
-                'is_complete': is_complete,
-                'is_success': is_success,
-                'last_log_message': log_message,
-                'last_log_type': log_type
-            }
-            cache.set(progress_key, progress, 600)
-            return progress
+            progress_stream.update(
+                batches_completed=batches_completed,
+                total_batches=total_batches,
+                current_batch=current_batch,
+                is_cancelled=is_cancelled,
+                is_complete=is_complete,
+                is_success=is_success
+            )
+            if log_message:
+                progress_stream.publish('progress', log_message, log_type)
+            return progress_stream.snapshot
 
         logger.info(f"Created cancellation key: {cancellation_key}")
         logger.info(f"Created progress key: {progress_key}")
@@ -2521,8 +2536,7 @@ def close_live_position(request):
                 total_quantity=abs_quantity,
                 transaction_type=transaction_type,
                 product=product if product in ['NRML', 'MIS', 'CNC'] else 'NRML',
-                batch_size=10,  # 10 lots per batch
-                delay_seconds=10,  # 10 second delay between batches
+                batch_size=10,  # 10 lots per batch; advances on fill confirmations
                 position_type='OPTION',  # Will work for futures too
                 cancellation_key=cancellation_key,  # Pass cancellation key
                 progress_key=progress_key  # Pass progress key for tracking
@@ -2949,8 +2963,11 @@ def get_close_position_progress(request, broker, symbol):
         - broker: 'breeze' or 'neo'
         - symbol: Trading symbol
 
+    GET params:
+        - since: Last event sequence number the client has seen (default 0)
+
     Returns:
-        JSON with progress information
+        JSON with progress snapshot and events newer than `since`
     """
     if not request.user.is_authenticated:
         return JsonResponse({
@@ -2959,24 +2976,21 @@ def get_close_position_progress(request, broker, symbol):
         }, status=401)
 
     try:
-        # Generate the progress key
+        from apps.core.utils.event_stream import ExecutionEventStream
+
         progress_key = f"close_progress_{request.user.id}_{broker}_{symbol.replace('/', '_')}"
 
-        # Get progress from cache
-        progress = cache.get(progress_key, {
-            'batches_completed': 0,
-            'total_batches': 0,
-            'current_batch': None,
-            'is_cancelled': False,
-            'is_complete': False,
-            'is_success': False,
-            'last_log_message': None,
-            'last_log_type': None
-        })
+        try:
+            since = int(request.GET.get('since', 0))
+        except (TypeError, ValueError):
+            since = 0
+
+        progress, events = ExecutionEventStream.read(progress_key, since=since)
 
         return JsonResponse({
             'success': True,
-            'progress': progress
+            'progress': progress,
+            'events': events
         })
 
     except Exception as e:
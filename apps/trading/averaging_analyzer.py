@@ -318,11 +318,10 @@ class AveragingAnalyzer:
                     expiry_dt = recent_quote.expiry_date
                     logger.info(f"Using existing expiry {expiry_dt} for {symbol} from database")
                 else:
-                    # Only for NIFTY/BANKNIFTY, try to get expiry from NSE
+                    # Only for NIFTY/BANKNIFTY, take the futures expiry from the trading calendar
                     if symbol.upper() in ['NIFTY', 'BANKNIFTY']:
-                        from apps.brokers.integrations.breeze import get_next_nifty_expiry
-                        expiry_str = get_next_nifty_expiry()
-                        expiry_dt = datetime.strptime(expiry_str, '%d-%b-%Y').date()
+                        from apps.core.services.trading_calendar import get_trading_calendar
+                        expiry_dt = get_trading_calendar().next_expiry(symbol, kind='monthly')
                     else:
                         logger.error(f"No expiry date provided and no recent futures data found for {symbol}")
                         return None
@@ -4,14 +4,12 @@ Trendlyne Data Aggregator for Deep-Dive Analysis
 This module aggregates all available Trendlyne data for comprehensive analysis
 """
 
-import os
 import logging
-import pandas as pd
 from typing import Dict, Optional, List
 from datetime import datetime
 
-from django.conf import settings
 from apps.data.models import TLStockData, ContractStockData, ContractData
+from apps.data.services.forecaster_index import get_forecaster_index
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +27,6 @@ class TrendlyneDataAggregator:
 
     def __init__(self, symbol: str):
         self.symbol = symbol
-        self.forecaster_dir = os.path.join(settings.BASE_DIR, 'apps', 'data', 'tldata', 'forecaster')
 
     def fetch_all_data(self) -> Dict:
         """
@@ -100,84 +97,17 @@ class TrendlyneDataAggregator:
 
     def get_forecaster_data(self) -> Dict:
         """
-        Load all forecaster CSV files and check if symbol appears in them
+        Forecaster screener rows of this symbol (exact NSE code match)
 
         Returns:
             dict: Forecaster data organized by category
         """
-        forecaster_data = {
-            'bullish_sentiment': {},
-            'bearish_sentiment': {},
-            'earnings_surprises': {},
-            'growth_estimates': {},
-            'analyst_activity': {}
-        }
-
-        # Define forecaster files and their categories
-        forecaster_files = {
-            'bullish_sentiment': [
-                'trendlyne_High_Bullishness.csv',
-            ],
-            'bearish_sentiment': [
-                'trendlyne_High_Bearishness.csv',
-            ],
-            'earnings_surprises': [
-                'trendlyne_Beat_Annual_EPS_Estimates.csv',
-                'trendlyne_Missed_Annual_EPS_Estimates.csv',
-                'trendlyne_Beat_Quarter_EPS_Estimates.csv',
-                'trendlyne_Missed_Quarter_EPS_Estimates.csv',
-                'trendlyne_Beat_Annual_Revenue_Estimates.csv',
-                'trendlyne_Missed_Annual_Revenue_Estimates.csv',
-                'trendlyne_Beat_Quarter_Revenue_Estimates.csv',
-                'trendlyne_Missed_Quarter_Revenue_Estimates.csv',
-                'trendlyne_Beat_Annual_Net_Income_Estimates.csv',
-                'trendlyne_Missed_Annual_Net_Income_Estimates.csv',
-                'trendlyne_Beat_Quarter_Net_Income_Estimates.csv',
-                'trendlyne_Missed_Quarter_Net_Income_Estimates.csv',
-            ],
-            'growth_estimates': [
-                'trendlyne_Highest_Forward_12Mth_Upside_pct.csv',
-                'trendlyne_Highest_Forward_Annual_EPS_Growth.csv',
-                'trendlyne_Lowest_Forward_Annual_EPS_Growth.csv',
-                'trendlyne_Highest_Forward_Annual_Revenue_Growth.csv',
-                'trendlyne_Highest_Forward_Annual_Capex_Growth.csv',
-                'trendlyne_Highest_Dividend_Yield.csv',
-            ],
-            'analyst_activity': [
-                'trendlyne_Highest_3Mth_Analyst_Upgrades.csv',
-            ]
-        }
-
-        for category, files in forecaster_files.items():
+        forecaster_data = get_forecaster_index().lookup(self.symbol)
+        for category, files in forecaster_data.items():
             for filename in files:
-                filepath = os.path.join(self.forecaster_dir, filename)
-                if os.path.exists(filepath):
-                    try:
-                        df = pd.read_csv(filepath)
-                        # Check if symbol appears in this file
-                        if 'Stock' in df.columns:
-                            stock_row = df[df['Stock'].str.upper().str.contains(self.symbol.upper(), na=False)]
-                            if not stock_row.empty:
-                                forecaster_data[category][filename] = stock_row.to_dict('records')[0]
-                                logger.info(f"✅ Found {self.symbol} in {filename}")
-                    except Exception as e:
-                        logger.warning(f"Error reading {filename}: {e}")
-
+                logger.info(f"✅ Found {self.symbol} in {filename}")
         return forecaster_data
 
     def get_stock_from_forecaster_file(self, filename: str) -> Optional[Dict]:
         """Get stock data from a specific forecaster file"""
-        filepath = os.path.join(self.forecaster_dir, filename)
-        if not os.path.exists(filepath):
-            return None
-
-        try:
-            df = pd.read_csv(filepath)
-            if 'Stock' in df.columns:
-                stock_row = df[df['Stock'].str.upper().str.contains(self.symbol.upper(), na=False)]
-                if not stock_row.empty:
-                    return stock_row.to_dict('records')[0]
-        except Exception as e:
-            logger.error(f"Error reading {filename}: {e}")
-
-        return None
+        return get_forecaster_index().get_row(self.symbol, filename)
@@ -14,7 +14,6 @@ Comprehensive Futures Analysis with Breeze API Integration
 """
 
 import logging
-import pandas as pd
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 from typing import Dict, List, Tuple, Optional
@@ -515,12 +515,41 @@ class ValuationDeepDive:
         }
 
 
-def calculate_support_resistance(symbol: str) -> Dict:
+SUPPORT_RESISTANCE_DAYS = 30  # Candle window of calculate_support_resistance
+
+
+def recent_cash_prices(symbols: List[str], days: int = SUPPORT_RESISTANCE_DAYS) -> Dict[str, List]:
+    """
+    Last `days` days of cash candles per symbol, newest first (at most `days` each), in one query
+
+    Returns:
+        dict: {symbol: [HistoricalPrice, ...]} (symbols without candles are missing)
+    """
+    from apps.brokers.models import HistoricalPrice
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+
+    prices: Dict[str, List] = {}
+    for price in HistoricalPrice.objects.filter(
+        stock_code__in=list(symbols),
+        product_type='cash',
+        datetime__gte=start_date,
+        datetime__lte=end_date
+    ).order_by('stock_code', '-datetime'):
+        rows = prices.setdefault(price.stock_code, [])
+        if len(rows) < days:
+            rows.append(price)
+    return prices
+
+
+def calculate_support_resistance(symbol: str, prices: Optional[List] = None) -> Dict:
     """
     Calculate support and resistance levels using pivot points and historical data
 
     Args:
         symbol: Stock code/symbol
+        prices: Candles already loaded with recent_cash_prices (None: query them)
 
     Returns:
         dict: Support and resistance levels
@@ -532,21 +561,11 @@ def calculate_support_resistance(symbol: str) -> Dict:
             }
     """
     try:
-        from apps.brokers.models import HistoricalPrice
-
-        # Get last 30 days of historical data
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-
-        # Fetch historical prices
-        prices = HistoricalPrice.objects.filter(
-            stock_code=symbol,
-            product_type='cash',
-            datetime__gte=start_date,
-            datetime__lte=end_date
-        ).order_by('-datetime')[:30]
+        # Last 30 days of historical data, newest first
+        if prices is None:
+            prices = recent_cash_prices([symbol]).get(symbol, [])
 
-        if not prices.exists():
+        if not prices:
             logger.warning(f"No historical price data found for {symbol}")
             return {
                 'success': False,
@@ -556,7 +575,7 @@ def calculate_support_resistance(symbol: str) -> Dict:
             }
 
         # Get high, low, close from most recent data
-        latest = prices.first()
+        latest = prices[0]
         high = float(latest.high or 0)
         low = float(latest.low or 0)
         close = float(latest.close or 0)
@@ -637,12 +656,14 @@ def calculate_support_resistance(symbol: str) -> Dict:
         }
 
 
-def analyze_sector_strength(symbol: str) -> Dict:
+def analyze_sector_strength(symbol: str, stock_data=None, query: bool = True) -> Dict:
     """
     Analyze sector strength for a given stock
 
     Args:
         symbol: Stock code/symbol
+        stock_data: TLStockData row already loaded
+        query: Look the row up when stock_data is None (False: it is known to be missing)
 
     Returns:
         dict: Sector strength analysis
@@ -656,9 +677,11 @@ def analyze_sector_strength(symbol: str) -> Dict:
     """
     try:
         from apps.data.models import TLStockData
+        from apps.data.services.sector_performance import get_sector_cache
 
         # Try to find stock data (TLStockData uses 'nsecode' field)
-        stock_data = TLStockData.objects.filter(nsecode=symbol).first()
+        if stock_data is None and query:
+            stock_data = TLStockData.objects.filter(nsecode=symbol).first()
 
         if not stock_data:
             logger.warning(f"No TLStockData found for {symbol}")
@@ -715,6 +738,23 @@ def analyze_sector_strength(symbol: str) -> Dict:
         if stock_profit_growth > sector_profit_growth:
             score += 10
 
+        # Sector price momentum (cached sector performance, no query per symbol)
+        momentum = get_sector_cache().metrics(stock_data.sector_name) if stock_data.sector_name else None
+        relative_strength = momentum.relative_strength if momentum else None
+        breadth = momentum.breadth_pct if momentum else None
+
+        if relative_strength is not None:
+            if relative_strength > 2:
+                score += 10
+            elif relative_strength < -2:
+                score -= 10
+
+        if breadth is not None:
+            if breadth >= 60:
+                score += 5
+            elif breadth <= 40:
+                score -= 5
+
         # Cap score at 0-100
         score = max(0, min(100, score))
 
@@ -737,7 +777,10 @@ def analyze_sector_strength(symbol: str) -> Dict:
                 'sector_roe': round(sector_roe, 2),
                 'stock_vs_sector_revenue': round(stock_revenue_growth - sector_revenue_growth, 2),
                 'stock_vs_sector_profit': round(stock_profit_growth - sector_profit_growth, 2),
-                'outperforming_sector': stock_revenue_growth > sector_revenue_growth and stock_profit_growth > sector_profit_growth
+                'outperforming_sector': stock_revenue_growth > sector_revenue_growth and stock_profit_growth > sector_profit_growth,
+                'sector_return_21d': momentum.performance(21) if momentum else None,
+                'sector_breadth_pct': breadth,
+                'sector_relative_strength': relative_strength
             }
         }
 
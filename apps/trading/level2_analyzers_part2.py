@@ -57,9 +57,6 @@ class InstitutionalBehaviorAnalyzer:
         Returns:
             dict: Institutional behavior analysis
         """
-        # Check data freshness before analysis
-        freshness_result = ensure_data_freshness()
-
         if not stock_data:
             return self._empty_analysis("No stock data available")
 
@@ -395,9 +392,6 @@ class TechnicalDeepDive:
         Returns:
             dict: Technical analysis
         """
-        # Check data freshness before analysis
-        freshness_result = ensure_data_freshness()
-
         if not stock_data:
             return self._empty_analysis("No stock data available")
 
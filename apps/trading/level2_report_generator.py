@@ -8,12 +8,11 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from apps.trading.data_aggregator import TrendlyneDataAggregator
-from apps.trading.level2_analyzers import FinancialPerformanceAnalyzer, ValuationDeepDive
-from apps.trading.level2_analyzers_part2 import (
-    InstitutionalBehaviorAnalyzer,
-    TechnicalDeepDive,
-    RiskAssessment
+from django.core.cache import cache
+
+from apps.core.constants import LEVEL2_REPORT_CACHE_SECONDS
+from apps.trading.services.level2_pipeline import (
+    Level2Context, check_freshness_in_background, load_context, run_analyzers, with_level1,
 )
 
 logger = logging.getLogger(__name__)
@@ -24,10 +23,12 @@ class Level2ReportGenerator:
     Generate comprehensive Level 2 deep-dive analysis reports
 
     This class orchestrates all Level 2 analyzers and produces
-    actionable trading reports.
+    actionable trading reports. Data loading, concurrency and the report
+    cache live in apps.trading.services.level2_pipeline.
     """
 
-    def __init__(self, symbol: str, expiry_date: str, level1_results: Dict):
+    def __init__(self, symbol: str, expiry_date: str, level1_results: Dict,
+                 context: Optional[Level2Context] = None):
         """
         Initialize report generator
 
@@ -35,49 +36,51 @@ class Level2ReportGenerator:
             symbol: Stock symbol
             expiry_date: Futures expiry date
             level1_results: Level 1 analysis results
+            context: Data already loaded by the pipeline (None: load it)
         """
         self.symbol = symbol
         self.expiry_date = expiry_date
         self.level1_results = level1_results
-        self.aggregator = TrendlyneDataAggregator(symbol)
+        self.context = context
 
-    def generate_report(self) -> Dict:
+    def generate_report(self, use_cache: bool = True, concurrent: bool = True) -> Dict:
         """
         Generate comprehensive Level 2 deep-dive report
 
+        Args:
+            use_cache: Reuse the report of an unchanged data version
+            concurrent: Run the independent analyzers in parallel
+
         Returns:
             dict: Complete analysis report
         """
-        logger.info(f"Generating Level 2 deep-dive report for {self.symbol}")
+        context = self.context
+        if context is None:
+            check_freshness_in_background()
+            context = load_context(self.symbol, self.expiry_date)
 
-        # Fetch all data
-        data = self.aggregator.fetch_all_data()
+        report = cache.get(context.cache_key) if use_cache else None
+        if report is not None:
+            logger.info(f"Level 2 report for {self.symbol} reused (data unchanged)")
+            return with_level1(report, self.level1_results)
 
-        # Run all analyses
-        fundamental = FinancialPerformanceAnalyzer().analyze(
-            data['fundamentals'],
-            data['forecaster']
-        )
-
-        valuation = ValuationDeepDive().analyze(data['fundamentals'])
+        logger.info(f"Generating Level 2 deep-dive report for {self.symbol}")
+        report = self.build_report(context, run_analyzers(context, concurrent=concurrent))
+        cache.set(context.cache_key, report, LEVEL2_REPORT_CACHE_SECONDS)
 
-        institutional = InstitutionalBehaviorAnalyzer().analyze(
-            data['fundamentals'],
-            data['contract_stock']
-        )
+        logger.info(f"✅ Level 2 report generated for {self.symbol}")
 
-        technical = TechnicalDeepDive().analyze(data['fundamentals'])
+        return report
 
-        risk = RiskAssessment().analyze(
-            data['fundamentals'],
-            {
-                'fundamental': fundamental,
-                'technical': technical
-            }
-        )
+    def build_report(self, context: Level2Context, analyses: Dict) -> Dict:
+        """Report sections from the analyzer results"""
+        fundamental = analyses['fundamental']
+        valuation = analyses['valuation']
+        institutional = analyses['institutional']
+        technical = analyses['technical']
+        risk = analyses['risk']
 
-        # Generate comprehensive report
-        report = {
+        return {
             'metadata': {
                 'symbol': self.symbol,
                 'expiry_date': self.expiry_date,
@@ -85,7 +88,8 @@ class Level2ReportGenerator:
                 'level1_score': self.level1_results.get('composite_score', 0),
                 'level1_direction': self.level1_results.get('direction', 'NEUTRAL'),
                 'level1_verdict': self.level1_results.get('verdict', 'UNKNOWN'),
-                'data_completeness': data['data_completeness']
+                'data_completeness': context.data_completeness,
+                'data_version': context.version
             },
 
             'executive_summary': self.generate_executive_summary(
@@ -97,11 +101,13 @@ class Level2ReportGenerator:
                 'valuation_analysis': valuation,
                 'institutional_behavior': institutional,
                 'technical_analysis': technical,
-                'risk_assessment': risk
+                'risk_assessment': risk,
+                'support_resistance': analyses['support_resistance'],
+                'sector_strength': analyses['sector_strength']
             },
 
             'trading_recommendation': self.generate_trading_recommendation(
-                fundamental, valuation, institutional, technical, risk, data['fundamentals']
+                fundamental, valuation, institutional, technical, risk, context.stock
             ),
 
             'decision_matrix': self.create_decision_matrix(
@@ -109,10 +115,6 @@ class Level2ReportGenerator:
             )
         }
 
-        logger.info(f"✅ Level 2 report generated for {self.symbol}")
-
-        return report
-
     def generate_executive_summary(
         self,
         fundamental: Dict,
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trading', '0004_orderexecutioncontrol'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('FUTURES_SCREEN', 'Futures Screen'), ('NIFTY_STRANGLE', 'Nifty Strangle'), ('DEEP_DIVE', 'Level 2 Deep-Dive')], max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed'), ('CANCELLED', 'Cancelled')], default='PENDING', max_length=10)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='Request parameters')),
+                ('total_items', models.IntegerField(default=0)),
+                ('completed_items', models.IntegerField(default=0, help_text='Items finished (including errors and cache hits)')),
+                ('failed_items', models.IntegerField(default=0)),
+                ('result', models.JSONField(blank=True, help_text='Final response, same shape as the synchronous endpoint', null=True)),
+                ('error', models.TextField(blank=True)),
+                ('is_cancelled', models.BooleanField(default=False)),
+                ('cancel_reason', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analysis_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalysisJobItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.IntegerField(help_text='Position in the job (stable sort order)')),
+                ('symbol', models.CharField(max_length=50)),
+                ('expiry', models.CharField(blank=True, max_length=20)),
+                ('snapshot_version', models.CharField(blank=True, help_text='Input data version the result was computed from', max_length=32)),
+                ('status', models.CharField(choices=[('SUCCESS', 'Success'), ('ERROR', 'Error'), ('CANCELLED', 'Cancelled')], max_length=10)),
+                ('from_cache', models.BooleanField(default=False)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('duration_ms', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='trading.analysisjob')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['symbol', 'expiry', 'snapshot_version'], name='trading_ana_symbol_ce3b84_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='analysisjob',
+            index=models.Index(fields=['user', '-created_at'], name='trading_ana_user_id_ab6a2f_idx'),
+        ),
+    ]
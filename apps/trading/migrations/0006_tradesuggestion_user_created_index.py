@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0005_analysisjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tradesuggestion',
+            index=models.Index(fields=['user', '-created_at'], name='trading_tra_user_id_21c195_idx'),
+        ),
+    ]
@@ -133,6 +133,8 @@ class TradeSuggestion(models.Model):
             models.Index(fields=['user', 'status']),
             models.Index(fields=['strategy', 'status']),
             models.Index(fields=['created_at']),
+            # A user's suggestions, newest first
+            models.Index(fields=['user', '-created_at']),
         ]
 
     def __str__(self):
@@ -366,6 +368,11 @@ class OrderExecutionControl(models.Model):
         self.last_heartbeat = timezone.now()
         self.save()
 
+    @staticmethod
+    def progress_key_for(suggestion_id):
+        """Cache key of the execution event stream for a suggestion"""
+        return f"strangle_execution_{suggestion_id}"
+
 
 class PositionSize(models.Model):
     """
@@ -454,3 +461,100 @@ class PositionSize(models.Model):
             'max_profit': float(self.max_profit),
             'risk_reward': float(self.risk_reward_ratio),
         }
+
+
+class AnalysisJob(models.Model):
+    """
+    A long-running analysis (futures screen, strangle, deep-dive) submitted
+    from a web view and run by the job runner (apps/trading/services/analysis_jobs.py).
+    Per-item results are stored as AnalysisJobItem rows as they finish.
+    """
+
+    KIND_CHOICES = [
+        ('FUTURES_SCREEN', 'Futures Screen'),
+        ('NIFTY_STRANGLE', 'Nifty Strangle'),
+        ('DEEP_DIVE', 'Level 2 Deep-Dive'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='analysis_jobs', null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    params = models.JSONField(default=dict, blank=True, help_text='Request parameters')
+
+    # Progress
+    total_items = models.IntegerField(default=0)
+    completed_items = models.IntegerField(default=0, help_text='Items finished (including errors and cache hits)')
+    failed_items = models.IntegerField(default=0)
+
+    # Outcome
+    result = models.JSONField(null=True, blank=True, help_text='Final response, same shape as the synchronous endpoint')
+    error = models.TextField(blank=True)
+
+    # Cancellation
+    is_cancelled = models.BooleanField(default=False)
+    cancel_reason = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job #{self.id} - {self.status} ({self.completed_items}/{self.total_items})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('COMPLETED', 'FAILED', 'CANCELLED')
+
+    def should_continue(self):
+        """Re-read the cancel flag (set from another process)"""
+        return not AnalysisJob.objects.filter(id=self.id, is_cancelled=True).exists()
+
+
+class AnalysisJobItem(models.Model):
+    """
+    Result of one unit of an AnalysisJob (one contract, one strangle run).
+
+    Rows double as the result cache: a SUCCESS row for the same kind, symbol,
+    expiry and data snapshot version is reused instead of re-running the analysis.
+    """
+
+    STATUS_CHOICES = [
+        ('SUCCESS', 'Success'),
+        ('ERROR', 'Error'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+
+    job = models.ForeignKey(AnalysisJob, on_delete=models.CASCADE, related_name='items')
+    index = models.IntegerField(help_text='Position in the job (stable sort order)')
+    symbol = models.CharField(max_length=50)
+    expiry = models.CharField(max_length=20, blank=True)
+    snapshot_version = models.CharField(max_length=32, blank=True, help_text='Input data version the result was computed from')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    from_cache = models.BooleanField(default=False)
+    result = models.JSONField(null=True, blank=True)
+    duration_ms = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['symbol', 'expiry', 'snapshot_version']),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.job_id} {self.symbol} {self.expiry} - {self.status}"
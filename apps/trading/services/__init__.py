@@ -3,8 +3,10 @@ Trading Services Package
 Contains position sizing, trade approval, and other trading-related services
 """
 
+from .trade_suggestions import FuturesSuggestionFormatter, OptionsSuggestionFormatter, TradeSuggestionService
+
 # Import services - some may fail if dependencies are not available
-__all__ = []
+__all__ = ['TradeSuggestionService', 'OptionsSuggestionFormatter', 'FuturesSuggestionFormatter']
 
 try:
     from .position_sizer import PositionSizer
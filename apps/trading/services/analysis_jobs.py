@@ -0,0 +1,450 @@
+"""
+Analysis Jobs - Long Analyses Off the Request Thread
+
+Web views submit a job and return its id immediately. The job fans out one
+unit per contract (a Celery group joined by a chord callback that builds the
+final response); every unit stores its result as an AnalysisJobItem as soon
+as it finishes, so the progress endpoint and the live feed topic
+'analysis:<job_id>' stream partial results while the rest are still running.
+
+Kinds:
+- FUTURES_SCREEN: one item per volume-qualified futures contract
+- NIFTY_STRANGLE: one item (the strangle run, which fetches a live chain)
+- DEEP_DIVE: one item (Level 2 report for a contract that passed Level 1)
+
+Cacheable kinds reuse a finished item for the same (kind, symbol, expiry,
+data snapshot version) for ANALYSIS_RESULT_CACHE_MINUTES, so re-running a
+screen only analyzes contracts whose input data changed.
+
+Cancellation sets a flag on the job; items that have not started yet see it
+and finish immediately, the callback then marks the job CANCELLED.
+
+Executors (settings.ANALYSIS_JOB_EXECUTOR):
+- 'celery': tasks on the Celery workers (falls back to 'thread' if the broker is down)
+- 'thread': in-process thread pool (runserver without a worker)
+- 'inline': the calling thread (tests, management commands)
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from apps.core.constants import (
+    ANALYSIS_JOB_THREADS,
+    ANALYSIS_PROGRESS_MAX_ITEMS,
+    ANALYSIS_RESULT_CACHE_MINUTES,
+)
+from apps.trading.models import AnalysisJob, AnalysisJobItem
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobKind:
+    """How to run one item of a job kind and how to combine the item results."""
+
+    run_item: Callable[[AnalysisJob, Dict], Dict]
+    finalize: Callable[[AnalysisJob, List[AnalysisJobItem]], Dict]
+    error_result: Callable[[Dict, str], Dict] = lambda item, error: {'success': False, 'error': error}
+    cacheable: bool = False
+
+
+def _json_safe(value):
+    """Same encoding JsonResponse applies (dates to ISO strings, Decimals to strings)."""
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+# ========== Data Snapshot Version ==========
+
+def data_snapshot_version(symbol: str, expiry: str = '') -> str:
+    """
+    Version of the stored input data of a symbol.
+
+    Changes whenever contract, stock or Trendlyne rows of the symbol are
+    added, removed or updated, or new candles arrive.
+    """
+    return data_snapshot_versions([(symbol, expiry)])[(symbol, expiry)]
+
+
+def data_snapshot_versions(keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+    """data_snapshot_version of many (symbol, expiry) pairs, with one grouped query per table."""
+    from apps.brokers.models import HistoricalPrice
+    from apps.data.models import ContractData, ContractStockData, TLStockData
+
+    symbols = sorted({symbol for symbol, _ in keys})
+    tables = []
+    for model, symbol_field, changed_field in (
+        (ContractData, 'symbol', 'updated_at'),
+        (ContractStockData, 'nse_code', 'updated_at'),
+        (TLStockData, 'nsecode', 'updated_at'),
+        (HistoricalPrice, 'stock_code', 'datetime'),
+    ):
+        rows = model.objects.filter(**{f'{symbol_field}__in': symbols}).order_by().values(symbol_field).annotate(
+            rows=Count('id'), changed=Max(changed_field))
+        tables.append({row[symbol_field]: (row['rows'], row['changed']) for row in rows})
+
+    versions = {}
+    for symbol, expiry in keys:
+        parts = [symbol, expiry]
+        for table in tables:
+            parts.extend(table.get(symbol, (0, None)))
+        versions[(symbol, expiry)] = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return versions
+
+
+def _cached_item(kind: str, symbol: str, expiry: str, version: str) -> Optional[AnalysisJobItem]:
+    return AnalysisJobItem.objects.filter(
+        job__kind=kind, symbol=symbol, expiry=expiry, snapshot_version=version, status='SUCCESS',
+        created_at__gte=timezone.now() - timedelta(minutes=ANALYSIS_RESULT_CACHE_MINUTES),
+    ).order_by('-id').first()
+
+
+# ========== Running ==========
+
+def run_job_item(job_id: int, index: int) -> Dict:
+    """
+    Run one item of a job and store its result (never raises).
+
+    Returns:
+        dict: {'index', 'status', 'from_cache'} (the result itself is in the DB)
+    """
+    job = AnalysisJob.objects.get(id=job_id)
+    item = job.params['items'][index]
+    kind = JOB_KINDS[job.kind]
+    symbol, expiry = item.get('symbol', ''), item.get('expiry', '')
+
+    AnalysisJob.objects.filter(id=job_id, status='PENDING').update(status='RUNNING', started_at=timezone.now())
+
+    started = time.monotonic()
+    from_cache = False
+    version = ''
+    if not job.should_continue():
+        status, result = 'CANCELLED', None
+    else:
+        try:
+            if kind.cacheable:
+                version = data_snapshot_version(symbol, expiry)
+                cached = None if job.params.get('refresh') else _cached_item(job.kind, symbol, expiry, version)
+                if cached:
+                    result, from_cache = cached.result, True
+                else:
+                    result = kind.run_item(job, item)
+                    # The run may have refreshed the data it read (e.g. a Trendlyne download)
+                    version = data_snapshot_version(symbol, expiry)
+            else:
+                result = kind.run_item(job, item)
+            status = 'SUCCESS'
+        except Exception as e:
+            logger.error(f"Analysis job #{job_id} item {symbol} failed: {e}", exc_info=True)
+            status, result = 'ERROR', kind.error_result(item, str(e))
+
+    AnalysisJobItem.objects.create(
+        job_id=job_id, index=index, symbol=symbol, expiry=expiry, snapshot_version=version,
+        status=status, from_cache=from_cache, result=_json_safe(result),
+        duration_ms=int((time.monotonic() - started) * 1000),
+    )
+    AnalysisJob.objects.filter(id=job_id).update(
+        completed_items=F('completed_items') + 1,
+        failed_items=F('failed_items') + (1 if status == 'ERROR' else 0),
+    )
+    return {'index': index, 'status': status, 'from_cache': from_cache}
+
+
+def finalize_job(job_id: int) -> str:
+    """
+    Combine the item results into the job result (chord callback).
+
+    Returns:
+        str: Final job status
+    """
+    job = AnalysisJob.objects.get(id=job_id)
+    items = list(job.items.order_by('index'))
+
+    if job.is_cancelled:
+        job.status = 'CANCELLED'
+    else:
+        try:
+            job.result = _json_safe(JOB_KINDS[job.kind].finalize(job, items))
+            job.status = 'COMPLETED'
+        except Exception as e:
+            logger.error(f"Analysis job #{job_id} failed to finalize: {e}", exc_info=True)
+            job.status = 'FAILED'
+            job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    logger.info(f"Analysis job #{job_id} {job.status}: {len(items)}/{job.total_items} items")
+    return job.status
+
+
+def _run_items_locally(job_id: int, total: int, pool: Optional[ThreadPoolExecutor] = None):
+    def run(index):
+        try:
+            return run_job_item(job_id, index)
+        finally:
+            if pool:
+                close_old_connections()
+
+    try:
+        if pool:
+            wait([pool.submit(run, index) for index in range(total)])
+        else:
+            for index in range(total):
+                run(index)
+        finalize_job(job_id)
+    except Exception as e:
+        logger.error(f"Analysis job #{job_id} failed: {e}", exc_info=True)
+        AnalysisJob.objects.filter(id=job_id).update(status='FAILED', error=str(e), finished_at=timezone.now())
+    finally:
+        if pool:
+            close_old_connections()
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=ANALYSIS_JOB_THREADS, thread_name_prefix='analysis-job')
+    return _pool
+
+
+def _dispatch_celery(job: AnalysisJob):
+    from celery import chord
+    from apps.trading.tasks import finalize_analysis_job, run_analysis_item
+
+    chord(
+        run_analysis_item.s(job.id, index) for index in range(job.total_items)
+    )(finalize_analysis_job.s(job.id))
+
+
+def _dispatch(job: AnalysisJob):
+    executor = getattr(settings, 'ANALYSIS_JOB_EXECUTOR', 'celery')
+
+    if executor == 'celery':
+        try:
+            _dispatch_celery(job)
+            return
+        except Exception as e:
+            logger.warning(f"Celery unavailable for analysis job #{job.id} ({e}), running in-process")
+            executor = 'thread'
+
+    if executor == 'inline':
+        _run_items_locally(job.id, job.total_items)
+    else:
+        # The coordinator waits for the items, so it cannot take a pool slot itself
+        threading.Thread(
+            target=_run_items_locally, args=(job.id, job.total_items, _get_pool()),
+            name=f"analysis-job-{job.id}", daemon=True,
+        ).start()
+
+
+def submit_job(kind: str, user, items: List[Dict], params: Optional[Dict] = None,
+               refresh: bool = False) -> AnalysisJob:
+    """
+    Create a job and start it.
+
+    Args:
+        kind: One of JOB_KINDS
+        user: Requesting user (owner of the job and of saved suggestions)
+        items: One dict per unit of work, with at least 'symbol' (and 'expiry')
+        params: Extra parameters the kind's finalize step needs
+        refresh: Ignore cached item results
+
+    Returns:
+        AnalysisJob
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown analysis job kind: {kind}")
+
+    job = AnalysisJob.objects.create(
+        user=user, kind=kind, total_items=len(items),
+        params=_json_safe({**(params or {}), 'items': items, 'refresh': refresh}),
+    )
+    logger.info(f"Submitted {kind} job #{job.id} with {len(items)} items")
+    _dispatch(job)
+    job.refresh_from_db()
+    return job
+
+
+def cancel_job(job: AnalysisJob, reason: str = 'User cancelled') -> AnalysisJob:
+    """Stop a job: items not yet started are skipped; finished items are kept."""
+    if not job.is_finished:
+        AnalysisJob.objects.filter(id=job.id).update(is_cancelled=True, cancel_reason=reason, status='CANCELLED')
+        job.refresh_from_db()
+        logger.info(f"Analysis job #{job.id} cancelled: {reason}")
+    return job
+
+
+# ========== Progress ==========
+
+def job_progress(job: AnalysisJob, since: int = 0) -> Dict:
+    """
+    Job state plus item results newer than `since` (cursor: item 'seq').
+
+    The final 'result' (same shape as the synchronous endpoint used to return)
+    is included once the job has finished.
+    """
+    items = list(job.items.filter(id__gt=since).order_by('id')[:ANALYSIS_PROGRESS_MAX_ITEMS])
+    return {
+        'success': True,
+        'job_id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'total': job.total_items,
+        'completed': job.completed_items,
+        'failed': job.failed_items,
+        'is_cancelled': job.is_cancelled,
+        'is_complete': job.is_finished,
+        'items': [
+            {
+                'seq': item.id,
+                'index': item.index,
+                'symbol': item.symbol,
+                'expiry': item.expiry,
+                'status': item.status,
+                'from_cache': item.from_cache,
+                'duration_ms': item.duration_ms,
+                'result': item.result,
+            }
+            for item in items
+        ],
+        'last_seq': items[-1].id if items else since,
+        'result': job.result if job.is_finished else None,
+        'error': job.error or None,
+    }
+
+
+def job_submitted_response(job: AnalysisJob, **extra) -> Dict:
+    """Response body of a view that submitted a job."""
+    from django.urls import reverse
+
+    return {
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'total': job.total_items,
+        'progress_url': reverse('trading:analysis_job_progress', args=[job.id]),
+        'cancel_url': reverse('trading:cancel_analysis_job', args=[job.id]),
+        'live_topic': f'analysis:{job.id}',
+        **extra,
+    }
+
+
+# ========== Kinds ==========
+
+def _analyze_futures_item(job: AnalysisJob, item: Dict) -> Dict:
+    from apps.data.models import ContractData
+    from apps.trading.services.futures_screening import analyze_futures_contract
+
+    contract = ContractData.objects.get(id=item['contract_id'])
+    return analyze_futures_contract(contract)
+
+
+def _futures_error_result(item: Dict, error: str) -> Dict:
+    from apps.trading.services.futures_screening import error_result
+
+    return error_result(item['symbol'], item['expiry'], error)
+
+
+def _finalize_futures_screen(job: AnalysisJob, items: List[AnalysisJobItem]) -> Dict:
+    from apps.trading.services.futures_screening import build_screen_response
+
+    return build_screen_response(
+        job.user, [item.result for item in items if item.status != 'CANCELLED'],
+        job.params.get('this_month_volume'), job.params.get('next_month_volume'),
+    )
+
+
+def _run_strangle_item(job: AnalysisJob, item: Dict) -> Dict:
+    from apps.trading.views.algorithm_views import run_nifty_strangle_analysis
+
+    return run_nifty_strangle_analysis(job.user)
+
+
+def _finalize_single(job: AnalysisJob, items: List[AnalysisJobItem]) -> Dict:
+    if not items or items[0].result is None:
+        return {'success': False, 'error': 'Analysis did not run'}
+    return items[0].result
+
+
+def _set_deep_dive_progress(analysis_id: int, message: str, progress: int):
+    from apps.data.models import DeepDiveAnalysis
+
+    DeepDiveAnalysis.objects.filter(id=analysis_id).update(
+        report={'status': 'PROCESSING', 'message': message, 'progress': progress}
+    )
+
+
+def _run_deep_dive_item(job: AnalysisJob, item: Dict) -> Dict:
+    from apps.data.trendlyne import get_all_trendlyne_data
+    from apps.trading.level2_report_generator import Level2ReportGenerator
+
+    symbol = item['symbol']
+    logger.info(f"Step 1/3: Fetching fresh Trendlyne data for {symbol}...")
+    _set_deep_dive_progress(item['analysis_id'], 'Downloading latest Trendlyne data...', 33)
+    try:
+        get_all_trendlyne_data()
+    except Exception as e:
+        logger.warning(f"Trendlyne data fetch failed: {e}. Proceeding with existing data.")
+
+    logger.info(f"Step 2/3: Analyzing {symbol} across all dimensions...")
+    _set_deep_dive_progress(item['analysis_id'], 'Running comprehensive multi-factor analysis...', 66)
+    return Level2ReportGenerator(symbol, item['expiry'], item.get('level1_results', {})).generate_report()
+
+
+def _finalize_deep_dive(job: AnalysisJob, items: List[AnalysisJobItem]) -> Dict:
+    from apps.data.models import DeepDiveAnalysis
+
+    item = items[0] if items else None
+    deep_dive = DeepDiveAnalysis.objects.get(id=job.params['items'][0]['analysis_id'])
+
+    if item is None or item.status != 'SUCCESS':
+        error = (item.result or {}).get('error', 'Unknown error') if item else 'Analysis did not run'
+        deep_dive.report = {'status': 'FAILED', 'error': error, 'message': f'Analysis failed: {error[:200]}'}
+        deep_dive.save()
+        return {'success': False, 'analysis_id': deep_dive.id, 'error': error}
+
+    logger.info(f"Step 3/3: Finalizing report for {deep_dive.symbol}...")
+    report = dict(item.result)
+    report['status'] = 'COMPLETED'
+    report['completed_at'] = timezone.now().isoformat()
+    report['from_cache'] = item.from_cache
+
+    deep_dive.report = report
+    deep_dive.conviction_score = report['executive_summary']['conviction_score']
+    deep_dive.risk_grade = report['detailed_analysis']['risk_assessment'].get('risk_grade', 'UNKNOWN')
+    deep_dive.save()
+
+    logger.info(f"Deep-dive analysis completed for {deep_dive.symbol} (ID: {deep_dive.id}): "
+                f"conviction {deep_dive.conviction_score}/100, risk {deep_dive.risk_grade}")
+    return {
+        'success': True,
+        'analysis_id': deep_dive.id,
+        'conviction_score': deep_dive.conviction_score,
+        'risk_grade': deep_dive.risk_grade,
+    }
+
+
+JOB_KINDS: Dict[str, JobKind] = {
+    'FUTURES_SCREEN': JobKind(_analyze_futures_item, _finalize_futures_screen,
+                              error_result=_futures_error_result, cacheable=True),
+    'NIFTY_STRANGLE': JobKind(_run_strangle_item, _finalize_single),
+    'DEEP_DIVE': JobKind(_run_deep_dive_item, _finalize_deep_dive, cacheable=True),
+}
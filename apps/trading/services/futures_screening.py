@@ -0,0 +1,461 @@
+"""
+Futures Screening - Volume-Qualified Contract Analysis
+
+The building blocks of the futures algorithm trigger, split so the analysis
+can fan out one task per contract (see analysis_jobs.py):
+
+1. select_volume_qualified_futures() picks the contracts
+2. analyze_futures_contract() runs the 9-step analysis for one contract
+3. build_screen_response() sorts the results, saves TradeSuggestions for
+   PASS contracts (real Breeze margin, 50% rule) and builds the response
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from apps.core.utils.date_utils import parse_expiry
+
+logger = logging.getLogger(__name__)
+
+
+def select_volume_qualified_futures(this_month_volume: int, next_month_volume: int):
+    """
+    Futures contracts passing the volume filter, highest volume first.
+
+    - This month contracts: traded contracts >= this_month_volume
+    - Next month contracts: traded contracts >= next_month_volume
+    """
+    from django.db.models import Q
+    from apps.data.models import ContractData
+
+    today = datetime.now().date()
+    this_month_end = today + timedelta(days=30)
+    next_month_start = today + timedelta(days=30)
+    next_month_end = today + timedelta(days=60)
+
+    return ContractData.objects.filter(
+        option_type='FUTURE',
+        expiry__gte=today,
+        expiry__lte=next_month_end
+    ).filter(
+        Q(expiry__lte=this_month_end, traded_contracts__gte=this_month_volume) |
+        Q(expiry__gte=next_month_start, expiry__lte=next_month_end, traded_contracts__gte=next_month_volume)
+    ).order_by('-traded_contracts')  # Order by volume descending
+
+
+def _format_expiry(expiry) -> str:
+    expiry_date = parse_expiry(expiry)
+    return expiry_date.strftime('%d-%b-%Y') if expiry_date else expiry
+
+
+def _iso_expiry(expiry) -> str:
+    expiry_date = parse_expiry(expiry)
+    return expiry_date.isoformat() if expiry_date else expiry
+
+
+def analyze_futures_contract(contract) -> Dict:
+    """
+    Run the comprehensive analysis for one contract.
+
+    Never raises: failures come back as an 'ERROR' verdict so one bad
+    contract does not sink the whole screen.
+
+    Returns:
+        dict: Result row (symbol, expiry, composite_score, direction, verdict,
+            metrics, execution_log, ...) as listed in 'all_contracts'
+    """
+    from apps.trading.futures_analyzer import comprehensive_futures_analysis
+
+    try:
+        logger.info(f"Analyzing {contract.symbol} (expiry: {contract.expiry})")
+
+        analysis_result = comprehensive_futures_analysis(
+            stock_symbol=contract.symbol,
+            expiry_date=contract.expiry.isoformat(),
+            contract=contract
+        )
+
+        # Extract metrics regardless of pass/fail
+        metrics = analysis_result.get('metrics', {})
+        success = analysis_result.get('success', False)
+
+        # Build explanation using execution log
+        explanation_parts = []
+        execution_log = analysis_result.get('execution_log', [])
+
+        # Extract key analysis points (both pass and fail)
+        for log in execution_log:
+            if log['action'] == 'Open Interest Analysis' and log['status'] != 'SKIP':
+                explanation_parts.append(f"OI: {log['message']}")
+            elif log['action'] == 'Sector Strength' and log['status'] != 'SKIP':
+                explanation_parts.append(f"Sector: {log['message']}")
+            elif log['action'] == 'Multi-Factor Technical Analysis' and log['status'] != 'SKIP':
+                explanation_parts.append(f"Technical: {log['message']}")
+            elif log['action'] == 'DMA Analysis' and log['status'] != 'SKIP':
+                explanation_parts.append(f"DMA: {log['message']}")
+            elif log['action'] == 'Composite Scoring & Verdict':
+                explanation_parts.append(f"Final: {log['message']}")
+
+        return {
+            'symbol': contract.symbol,
+            'expiry': _format_expiry(contract.expiry),
+            'expiry_date': contract.expiry.isoformat(),
+            'composite_score': analysis_result.get('composite_score', 0),
+            'direction': analysis_result.get('direction', 'NEUTRAL'),
+            'verdict': analysis_result.get('verdict', 'FAIL'),
+            'success': success,
+            'spot_price': metrics.get('spot_price', 0),
+            'futures_price': metrics.get('futures_price', 0),
+            'basis': metrics.get('basis', 0),
+            'basis_pct': metrics.get('basis_pct', 0),
+            'volume': contract.traded_contracts,
+            'lot_size': contract.lot_size,
+            'explanation': explanation_parts,
+            'execution_log': execution_log,
+            'metrics': metrics,
+            'scores': analysis_result.get('scores', {}),
+            'sr_data': metrics.get('sr_details', None),  # Support/Resistance data
+            'breach_risks': analysis_result.get('breach_risks', None),  # Breach risk calculations
+            'error': analysis_result.get('error', None) if not success else None
+        }
+
+    except Exception as e:
+        logger.error(f"Error analyzing {contract.symbol}: {e}")
+        return error_result(contract.symbol, contract.expiry, str(e),
+                            volume=contract.traded_contracts, lot_size=contract.lot_size)
+
+
+def error_result(symbol: str, expiry: str, error: str, volume=0, lot_size=0) -> Dict:
+    """Result row for a contract whose analysis failed."""
+    return {
+        'symbol': symbol,
+        'expiry': _format_expiry(expiry),
+        'expiry_date': _iso_expiry(expiry),
+        'composite_score': 0,
+        'direction': 'NEUTRAL',
+        'verdict': 'ERROR',
+        'success': False,
+        'spot_price': 0,
+        'futures_price': 0,
+        'basis': 0,
+        'basis_pct': 0,
+        'volume': volume,
+        'lot_size': lot_size,
+        'explanation': [f"Analysis failed: {error[:200]}"],
+        'execution_log': [],
+        'metrics': {},
+        'scores': {},
+        'error': error
+    }
+
+
+def sort_analyzed_results(analyzed_results: List[Dict]) -> List[Dict]:
+    """Sort by verdict priority (PASS first, then FAIL, then ERROR) and then by score."""
+    def sort_key(contract):
+        verdict = contract['verdict']
+        score = contract['composite_score']
+
+        # Priority: PASS=0, FAIL=1, ERROR=2 (lower is better)
+        priority = 0 if verdict == 'PASS' else (1 if verdict == 'FAIL' else 2)
+
+        # Return tuple: (priority, negative_score) so PASS comes first, then sorted by score descending
+        return (priority, -score)
+
+    return sorted(analyzed_results, key=sort_key)
+
+
+def build_screen_response(user, analyzed_results: List[Dict], this_month_volume: int,
+                          next_month_volume: int) -> Dict:
+    """
+    Sort results, save suggestions for PASS contracts and build the response.
+
+    Returns:
+        dict: {
+            'success': bool,
+            'all_contracts': [...],     # All analyzed contracts sorted by score
+            'total_analyzed', 'total_passed', 'total_failed', 'total_errors': int,
+            'execution_summary': [...],
+            'volume_filters': {...},
+            'suggestion_ids': [...]     # IDs of saved TradeSuggestion records
+        }
+    """
+    analyzed_results = sort_analyzed_results(analyzed_results)
+    execution_summary = [
+        {
+            'symbol': r['symbol'],
+            'status': r['verdict'],
+            'score': r['composite_score'],
+            'success': r['success'],
+            **({'error': r['error']} if r['verdict'] == 'ERROR' else {}),
+        }
+        for r in analyzed_results
+    ]
+
+    if not analyzed_results:
+        return {
+            'success': False,
+            'error': 'No contracts could be analyzed',
+            'execution_summary': execution_summary,
+            'total_analyzed': 0
+        }
+
+    # Count passed contracts
+    passed_results = [r for r in analyzed_results if r['verdict'] == 'PASS']
+
+    logger.info(f"Analysis complete: {len(analyzed_results)} contracts analyzed, {len(passed_results)} passed")
+
+    # Save trade suggestions for PASS results with real Breeze margin
+    suggestion_ids = save_futures_suggestions(user, passed_results) if passed_results else []
+
+    return {
+        'success': True,
+        'all_contracts': analyzed_results,  # All contracts sorted by score
+        'total_analyzed': len(analyzed_results),
+        'total_passed': len(passed_results),
+        'total_failed': len([r for r in analyzed_results if r['verdict'] == 'FAIL']),
+        'total_errors': len([r for r in analyzed_results if r['verdict'] == 'ERROR']),
+        'execution_summary': execution_summary,
+        'volume_filters': {
+            'this_month': this_month_volume,
+            'next_month': next_month_volume
+        },
+        'suggestion_ids': suggestion_ids  # IDs of saved suggestions
+    }
+
+
+def save_futures_suggestions(user, passed_results: List[Dict]) -> List:
+    """
+    Save a TradeSuggestion with real position sizing for every PASS result.
+
+    Uses the 50% margin rule: recommended position = 50% of available F&O
+    margin, the rest reserved for averaging. Stop loss 2%, target 4%.
+
+    Returns:
+        list: Suggestion ids (None where saving failed, to keep indices aligned)
+    """
+    suggestion_ids = []
+    from apps.trading.models import TradeSuggestion
+    from django.utils import timezone
+    from apps.trading.position_sizer import PositionSizer
+    from apps.brokers.integrations.breeze import get_breeze_client
+    from apps.data.models import ContractData
+    import json
+    from datetime import date, datetime, timedelta
+    from decimal import Decimal
+
+    # Helper to serialize dates and decimals for JSON
+    def json_serial(obj):
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if isinstance(obj, Decimal):
+            return float(obj)
+        raise TypeError(f"Type {type(obj)} not serializable")
+
+    # Initialize Breeze client for margin fetching
+    try:
+        breeze = get_breeze_client()
+    except Exception as e:
+        logger.warning(f"Could not initialize Breeze client for position sizing: {e}")
+        breeze = None
+
+    # Fetch available F&O margin from Breeze API (same logic as verify_future_trade)
+    available_margin = 5000000  # Default 50 lakh
+    if breeze:
+        try:
+            margin_response = breeze.get_margin(exchange_code="NFO")
+            if margin_response and margin_response.get('Status') == 200:
+                margin_data = margin_response.get('Success', {})
+                cash_limit = float(margin_data.get('cash_limit', 0))
+                block_by_trade = float(margin_data.get('block_by_trade', 0))
+                available_margin = cash_limit - block_by_trade
+                logger.info(f"Available F&O margin from Breeze: ₹{available_margin:,.0f}")
+            else:
+                logger.warning("Could not fetch F&O margin, using default: ₹50,00,000")
+        except Exception as e:
+            logger.warning(f"Error fetching F&O margin: {e}, using default")
+    else:
+        logger.warning("Breeze client not available, using default margin: ₹50,00,000")
+
+    # Save ALL PASS results with real position sizing (not just top 3)
+    # This allows the collapsible UI to work for all passed contracts
+    for result in passed_results:
+        try:
+            symbol = result['symbol']
+            expiry_date_str = result['expiry_date']
+            direction = result['direction']
+            futures_price = Decimal(str(result['futures_price']))
+            spot_price = Decimal(str(result['spot_price']))
+            composite_score = result['composite_score']
+
+            # Get contract details
+            contract = ContractData.objects.filter(
+                symbol=symbol,
+                option_type='FUTURE',
+                expiry=expiry_date_str
+            ).first()
+
+            if not contract:
+                continue
+
+            lot_size = contract.lot_size
+            expiry_dt = datetime.strptime(expiry_date_str, '%Y-%m-%d')
+
+            # Format expiry for Breeze API
+            expiry_breeze = expiry_dt.strftime('%d-%b-%Y').upper()
+
+            # Calculate position sizing using same logic as verify_future_trade
+            # Step 1: Get margin per lot from Breeze API
+            margin_per_lot = 0
+            if breeze:
+                try:
+                    # Estimate quantity for margin call (1 lot)
+                    quantity = lot_size
+                    action = 'buy' if direction == 'LONG' else 'sell'
+
+                    margin_resp = breeze.get_margin(
+                        exchange_code='NFO',
+                        product_type='futures',
+                        stock_code=symbol,
+                        quantity=str(quantity),
+                        price='0',  # Market price
+                        action=action,
+                        expiry_date=expiry_breeze,
+                        right='others',
+                        strike_price='0'
+                    )
+
+                    if margin_resp and margin_resp.get('Status') == 200:
+                        margin_data_resp = margin_resp.get('Success', {})
+                        margin_per_lot = float(margin_data_resp.get('total', 0))
+                        logger.info(f"Breeze margin for {symbol}: ₹{margin_per_lot:,.0f} per lot")
+                    else:
+                        # Fallback: Estimate 17% of contract value
+                        margin_per_lot = float(futures_price * lot_size) * 0.17
+                        logger.warning(f"Margin API failed for {symbol}, estimating: ₹{margin_per_lot:,.0f}")
+                except Exception as e:
+                    logger.warning(f"Error fetching margin for {symbol}: {e}")
+                    margin_per_lot = float(futures_price * lot_size) * 0.17
+            else:
+                # Fallback: Estimate 17% of contract value
+                margin_per_lot = float(futures_price * lot_size) * 0.17
+
+            # Step 2: Apply 50% rule for initial position
+            # Initial position should use 50% of available margin
+            # Remaining 50% is reserved for averaging (2 more positions)
+            safe_margin = available_margin * 0.5
+
+            # Step 3: Calculate recommended lots to use 50% margin
+            recommended_lots = max(1, int(safe_margin / margin_per_lot)) if margin_per_lot > 0 else 1
+
+            # Step 4: Calculate max lots possible with full available margin (for slider limit)
+            max_lots_possible = int(available_margin / margin_per_lot) if margin_per_lot > 0 else 1
+
+            # Step 5: Calculate position metrics
+            margin_required = Decimal(str(margin_per_lot * recommended_lots))
+            margin_per_lot_decimal = Decimal(str(margin_per_lot))
+            margin_available_decimal = Decimal(str(available_margin))
+
+            # Calculate margin utilization
+            margin_utilization = 0
+            if available_margin > 0:
+                margin_utilization = (margin_required / margin_available_decimal) * 100
+
+            logger.info(f"Position sizing for {symbol}: {recommended_lots} lots (50% of ₹{available_margin:,.0f} = ₹{margin_required:,.0f}, {margin_utilization:.1f}% used)")
+
+            # Build position sizing data for saving
+            position_sizing_data = {
+                'position': {
+                    'recommended_lots': recommended_lots,
+                    'total_margin_required': float(margin_required),
+                    'entry_value': float(futures_price * lot_size * recommended_lots),
+                    'margin_utilization_percent': float(margin_utilization)
+                },
+                'margin_data': {
+                    'available_margin': available_margin,
+                    'used_margin': float(margin_required),
+                    'total_margin': available_margin,
+                    'margin_per_lot': margin_per_lot,
+                    'max_lots_possible': max_lots_possible,
+                    'futures_price': float(futures_price),
+                    'source': 'Breeze API' if breeze else 'Estimated'
+                },
+                'stop_loss': 0,  # Will be calculated below
+                'target': 0,  # Will be calculated below
+                'direction': direction
+            }
+
+            # Calculate stop loss and target
+            if direction == 'LONG':
+                stop_loss_price = futures_price * Decimal('0.98')
+                target_price = futures_price * Decimal('1.04')
+            elif direction == 'SHORT':
+                stop_loss_price = futures_price * Decimal('1.02')
+                target_price = futures_price * Decimal('0.96')
+            else:
+                stop_loss_price = futures_price * Decimal('0.98')
+                target_price = futures_price * Decimal('1.02')
+
+            # Update position_sizing_data with stop loss and target
+            position_sizing_data['stop_loss'] = float(stop_loss_price)
+            position_sizing_data['target'] = float(target_price)
+
+            # Calculate max profit and loss
+            max_loss_value = abs(futures_price - stop_loss_price) * lot_size * recommended_lots
+            max_profit_value = abs(target_price - futures_price) * lot_size * recommended_lots
+
+            # Convert data to JSON-safe format
+            # Use .get() for all keys to avoid KeyError
+            algorithm_reasoning_safe = json.loads(
+                json.dumps({
+                    'metrics': result.get('metrics', {}),
+                    'execution_log': result.get('execution_log', []),
+                    'composite_score': composite_score,
+                    'scores': result.get('scores', {}),
+                    'explanation': result.get('explanation', ''),
+                    'sr_data': result.get('sr_data'),
+                    'breach_risks': result.get('breach_risks')
+                }, default=json_serial)
+            )
+
+            logger.info(f"About to create suggestion for {symbol}: lots={recommended_lots}, margin={margin_required}, score={composite_score}")
+
+            suggestion = TradeSuggestion.objects.create(
+                user=user,
+                strategy='icici_futures',
+                suggestion_type='FUTURES',
+                instrument=symbol,
+                direction=direction.upper(),
+                # Market Data
+                spot_price=spot_price,
+                expiry_date=expiry_dt.date(),
+                days_to_expiry=(expiry_dt.date() - datetime.now().date()).days,
+                # Position Sizing (with real Breeze margin - 50% rule)
+                recommended_lots=recommended_lots,
+                margin_required=margin_required,
+                margin_available=margin_available_decimal,
+                margin_per_lot=margin_per_lot_decimal,
+                margin_utilization=Decimal(str(margin_utilization)),
+                # Risk Metrics
+                max_profit=max_profit_value,
+                max_loss=max_loss_value,
+                breakeven_upper=target_price if direction == 'LONG' else None,
+                breakeven_lower=stop_loss_price if direction == 'LONG' else None,
+                # Complete Data (includes real position sizing with 50% rule)
+                algorithm_reasoning=algorithm_reasoning_safe,
+                position_details=json.loads(json.dumps(position_sizing_data, default=json_serial)),
+                # Expiry: 24 hours from now
+                expires_at=timezone.now() + timedelta(hours=24)
+            )
+
+            suggestion_ids.append(suggestion.id)
+            logger.info(f"Saved futures suggestion #{suggestion.id} for {symbol}")
+
+        except Exception as e:
+            logger.error(f"Error saving suggestion for {result.get('symbol')}: {e}")
+            import traceback
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            suggestion_ids.append(None)  # Append None to keep indices aligned
+            continue
+
+    return suggestion_ids
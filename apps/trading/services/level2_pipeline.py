@@ -0,0 +1,257 @@
+"""
+Level 2 Report Pipeline
+
+A Level 2 report reads the symbol's TLStockData, ContractStockData and
+contract rows, its forecaster screener rows and its recent candles. The
+pipeline loads them once into a Level2Context (for a watchlist: one query
+per table for all symbols) and the analyzers work on that context instead
+of querying on their own. The analyzers that do not depend on each other
+run concurrently; risk, which needs the fundamental and technical results,
+runs after them.
+
+Finished reports are memoized in the Django cache by (symbol, expiry, data
+version) for LEVEL2_REPORT_CACHE_SECONDS. The data version combines the
+symbol's stored-data snapshot (analysis_jobs.data_snapshot_version), the
+forecaster index version and the sector snapshot time, so a cached report
+is never older than its inputs. The Level 1 fields of the metadata are
+filled per call.
+
+The Trendlyne freshness check runs in the background, at most every
+LEVEL2_FRESHNESS_CHECK_SECONDS, instead of inline before a report.
+
+Usage:
+    from apps.trading.services.level2_pipeline import generate_reports
+
+    reports = generate_reports([
+        {'symbol': 'RELIANCE', 'expiry': '2025-11-27', 'level1_results': {...}},
+        {'symbol': 'TCS', 'expiry': '2025-11-27'},
+    ])
+    # {'RELIANCE': {...report...}, 'TCS': {...}}
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from apps.core.constants import (
+    LEVEL2_ANALYZER_WORKERS,
+    LEVEL2_BATCH_WORKERS,
+    LEVEL2_CONTRACTS_PER_SYMBOL,
+    LEVEL2_FRESHNESS_CHECK_SECONDS,
+    LEVEL2_REPORT_CACHE_SECONDS,
+)
+from apps.trading.level2_analyzers import (
+    FinancialPerformanceAnalyzer,
+    ValuationDeepDive,
+    analyze_sector_strength,
+    calculate_support_resistance,
+    recent_cash_prices,
+)
+from apps.trading.level2_analyzers_part2 import (
+    InstitutionalBehaviorAnalyzer,
+    RiskAssessment,
+    TechnicalDeepDive,
+)
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_PREFIX = 'level2_report:'
+
+
+@dataclass
+class Level2Context:
+    """Everything the Level 2 analyzers read for one symbol"""
+    symbol: str
+    expiry: str
+    stock: Optional[object] = None  # TLStockData
+    contract_stock: Optional[object] = None  # ContractStockData
+    contracts: List = field(default_factory=list)  # ContractData, latest expiry / highest OI first
+    forecaster: Dict = field(default_factory=dict)  # Forecaster rows by category and file
+    prices: List = field(default_factory=list)  # Cash candles, newest first
+    version: str = ''  # Data version of all of the above
+
+    @property
+    def data_completeness(self) -> Dict:
+        return {
+            'fundamentals': self.stock is not None,
+            'contract_stock': self.contract_stock is not None,
+            'forecaster': len(self.forecaster) > 0,
+            'contracts': len(self.contracts) > 0,
+        }
+
+    @property
+    def cache_key(self) -> str:
+        return f"{REPORT_CACHE_PREFIX}{self.symbol}:{self.expiry}:{self.version}"
+
+
+# ========== Loading ==========
+
+def load_contexts(keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Level2Context]:
+    """
+    Contexts of many (symbol, expiry) pairs, with one query per table for all of them.
+    """
+    from apps.data.models import ContractData, ContractStockData, TLStockData
+    from apps.data.services.forecaster_index import get_forecaster_index
+    from apps.data.services.sector_performance import get_sector_cache
+    from apps.trading.services.analysis_jobs import data_snapshot_versions
+
+    symbols = sorted({symbol for symbol, _ in keys})
+
+    stocks, contract_stocks, contracts = {}, {}, {}
+    for row in TLStockData.objects.filter(nsecode__in=symbols).order_by('id'):
+        stocks.setdefault(row.nsecode, row)
+    for row in ContractStockData.objects.filter(nse_code__in=symbols).order_by('id'):
+        contract_stocks.setdefault(row.nse_code, row)
+    for row in ContractData.objects.filter(symbol__in=symbols).annotate(rank=Window(
+        RowNumber(), partition_by=[F('symbol')], order_by=[F('expiry').desc(), F('oi').desc()],
+    )).filter(rank__lte=LEVEL2_CONTRACTS_PER_SYMBOL).order_by('symbol', 'rank'):
+        contracts.setdefault(row.symbol, []).append(row)
+    prices = recent_cash_prices(symbols)
+
+    # Loaded here so the analyzer threads only read memory
+    forecaster_index = get_forecaster_index()
+    forecaster = {symbol: forecaster_index.lookup(symbol) for symbol in symbols}
+    sectors = get_sector_cache()
+    sectors.refresh()
+    inputs = f"{forecaster_index.version()}|{sectors.as_of}"
+
+    snapshots = data_snapshot_versions(list(keys))
+    return {
+        (symbol, expiry): Level2Context(
+            symbol=symbol,
+            expiry=expiry,
+            stock=stocks.get(symbol),
+            contract_stock=contract_stocks.get(symbol),
+            contracts=contracts.get(symbol, []),
+            forecaster=forecaster[symbol],
+            prices=prices.get(symbol, []),
+            version=hashlib.md5(f"{snapshots[(symbol, expiry)]}|{inputs}".encode()).hexdigest(),
+        )
+        for symbol, expiry in keys
+    }
+
+
+def load_context(symbol: str, expiry: str) -> Level2Context:
+    return load_contexts([(symbol, expiry)])[(symbol, expiry)]
+
+
+# ========== Analyzers ==========
+
+# Analyzers that only need the context, run concurrently
+ANALYZERS: Dict[str, Callable[[Level2Context], Dict]] = {
+    'fundamental': lambda c: FinancialPerformanceAnalyzer().analyze(c.stock, c.forecaster),
+    'valuation': lambda c: ValuationDeepDive().analyze(c.stock),
+    'institutional': lambda c: InstitutionalBehaviorAnalyzer().analyze(c.stock, c.contract_stock),
+    'technical': lambda c: TechnicalDeepDive().analyze(c.stock),
+    'support_resistance': lambda c: calculate_support_resistance(c.symbol, c.prices),
+    'sector_strength': lambda c: analyze_sector_strength(c.symbol, c.stock, query=False),
+}
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=LEVEL2_ANALYZER_WORKERS, thread_name_prefix='level2')
+    return _pool
+
+
+def run_analyzers(context: Level2Context, concurrent: bool = True) -> Dict[str, Dict]:
+    """
+    Results of every analyzer for one context, plus 'risk'.
+
+    Args:
+        concurrent: Run the independent analyzers on the shared pool (False: in this thread)
+    """
+    if concurrent:
+        futures = {name: _get_pool().submit(analyzer, context) for name, analyzer in ANALYZERS.items()}
+        results = {name: future.result() for name, future in futures.items()}
+    else:
+        results = {name: analyzer(context) for name, analyzer in ANALYZERS.items()}
+
+    results['risk'] = RiskAssessment().analyze(context.stock, {
+        'fundamental': results['fundamental'],
+        'technical': results['technical'],
+    })
+    return results
+
+
+# ========== Reports ==========
+
+def with_level1(report: Dict, level1_results: Optional[Dict]) -> Dict:
+    """Copy of a (cached) report with the caller's Level 1 results in the metadata"""
+    level1_results = level1_results or {}
+    report = dict(report)
+    report['metadata'] = dict(report['metadata'],
+                              level1_score=level1_results.get('composite_score', 0),
+                              level1_direction=level1_results.get('direction', 'NEUTRAL'),
+                              level1_verdict=level1_results.get('verdict', 'UNKNOWN'))
+    return report
+
+
+def check_freshness_in_background():
+    """ensure_data_freshness on a daemon thread, at most once per LEVEL2_FRESHNESS_CHECK_SECONDS"""
+    from apps.trading.level2_analyzers_part2 import ensure_data_freshness
+
+    if not cache.add('level2_freshness_checked', True, LEVEL2_FRESHNESS_CHECK_SECONDS):
+        return
+
+    def check():
+        try:
+            ensure_data_freshness()
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=check, name='level2-freshness', daemon=True).start()
+
+
+def generate_reports(items: List[Dict], workers: int = LEVEL2_BATCH_WORKERS, use_cache: bool = True) -> Dict[str, Dict]:
+    """
+    Level 2 reports of a watchlist in one call.
+
+    Args:
+        items: [{'symbol', 'expiry', 'level1_results' (optional)}]
+        workers: Reports built at once
+        use_cache: Reuse reports whose data version is unchanged
+
+    Returns:
+        dict: {symbol: report}, or {symbol: {'success': False, 'error': ...}} for a failed symbol
+    """
+    from apps.trading.level2_report_generator import Level2ReportGenerator
+
+    if not items:
+        return {}
+
+    started = time.perf_counter()
+    check_freshness_in_background()
+
+    keys = [(item['symbol'], item['expiry']) for item in items]
+    contexts = load_contexts(keys)
+
+    def build(item):
+        generator = Level2ReportGenerator(item['symbol'], item['expiry'], item.get('level1_results') or {},
+                                          context=contexts[(item['symbol'], item['expiry'])])
+        try:
+            return generator.generate_report(use_cache=use_cache, concurrent=False)
+        except Exception as e:
+            logger.error(f"Level 2 report for {item['symbol']} failed: {e}", exc_info=True)
+            return {'success': False, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items))), thread_name_prefix='level2-batch') as pool:
+        reports = dict(zip([item['symbol'] for item in items], pool.map(build, items)))
+
+    logger.info(f"Level 2 batch: {len(reports)} reports in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return reports
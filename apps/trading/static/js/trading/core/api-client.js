@@ -140,6 +140,40 @@ const ApiClient = (function() {
         }
     }
 
+    // Wait for an analysis job submitted by a trigger endpoint.
+    // Polls the job's progress_url, passes each finished contract to onItem and
+    // resolves with the job result (same shape the endpoint used to return).
+    async function waitForJob(submitted, options = {}) {
+        const intervalMs = options.intervalMs || 1500;
+        let since = 0;
+
+        while (true) {
+            const progress = await get(`${submitted.progress_url}?since=${since}`);
+            if (!progress || !progress.success) {
+                return { success: false, error: progress?.error || 'Lost track of the analysis job' };
+            }
+
+            (progress.items || []).forEach(item => options.onItem && options.onItem(item, progress));
+            since = progress.last_seq;
+            if (options.onProgress) {
+                options.onProgress(progress);
+            }
+
+            if (progress.is_complete) {
+                if (progress.status === 'CANCELLED') {
+                    return { success: false, cancelled: true, error: 'Analysis cancelled' };
+                }
+                return progress.result || { success: false, error: progress.error || 'Analysis failed' };
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    }
+
+    // Cancel an analysis job (contracts already analyzed are kept)
+    function cancelJob(submitted) {
+        return post(submitted.cancel_url, {});
+    }
+
     // Handle authentication errors (Breeze/Neo session)
     function handleAuthError(data, requestType) {
         // Use the centralized BrokerAuth module
@@ -232,6 +266,8 @@ const ApiClient = (function() {
         get,
         handleAuthError,
         retryPendingRequest,
+        waitForJob,
+        cancelJob,
         endpoints
     };
 })();
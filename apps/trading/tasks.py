@@ -0,0 +1,27 @@
+"""
+Trading Celery Tasks
+
+Units of the analysis jobs submitted from the trading views
+(apps/trading/services/analysis_jobs.py):
+- run_analysis_item: one contract / one run, result stored as it finishes
+- finalize_analysis_job: chord callback building the final response
+"""
+
+import logging
+from celery import shared_task
+
+from apps.trading.services.analysis_jobs import finalize_job, run_job_item
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='apps.trading.tasks.run_analysis_item')
+def run_analysis_item(job_id, index):
+    """Analyze one item of an analysis job (never raises, so the chord always completes)"""
+    return run_job_item(job_id, index)
+
+
+@shared_task(name='apps.trading.tasks.finalize_analysis_job')
+def finalize_analysis_job(item_results, job_id):
+    """Combine the item results of an analysis job (chord callback)"""
+    return finalize_job(job_id)
@@ -0,0 +1,120 @@
+"""
+Trading App Tests - Analysis Jobs
+
+Kept out of tests.py so it imports without the trade suggestion services.
+
+Tests for:
+1. Analysis jobs (per-contract items, result cache, cancellation)
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from apps.trading.models import AnalysisJob
+
+
+@override_settings(ANALYSIS_JOB_EXECUTOR='inline')
+class AnalysisJobTests(TestCase):
+    """Analysis jobs: per-contract items, result cache, cancellation and progress"""
+
+    def setUp(self):
+        from apps.data.models import ContractData
+
+        self.user = User.objects.create_user(username='jobuser', password='testpass123')
+        self.contracts = [
+            ContractData.objects.create(symbol=symbol, option_type='FUTURE', expiry='2025-12-30',
+                                        traded_contracts=5000, lot_size=500)
+            for symbol in ('RELIANCE', 'TCS', 'INFY')
+        ]
+
+    def _submit(self, **kwargs):
+        from apps.trading.services.analysis_jobs import submit_job
+
+        return submit_job('FUTURES_SCREEN', self.user, items=[
+            {'contract_id': c.id, 'symbol': c.symbol, 'expiry': c.expiry} for c in self.contracts
+        ], params={'this_month_volume': 1000, 'next_month_volume': 800}, **kwargs)
+
+    @staticmethod
+    def _fake_analysis(contract):
+        return {'symbol': contract.symbol, 'expiry': contract.expiry, 'expiry_date': contract.expiry,
+                'composite_score': len(contract.symbol) * 10, 'direction': 'NEUTRAL', 'verdict': 'FAIL',
+                'success': True, 'error': None}
+
+    def test_futures_screen_job(self):
+        from apps.trading.services.analysis_jobs import job_progress
+
+        with mock.patch('apps.trading.services.futures_screening.analyze_futures_contract',
+                        side_effect=self._fake_analysis) as analyze:
+            job = self._submit()
+
+        job.refresh_from_db()
+        self.assertEqual(analyze.call_count, 3)
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual((job.completed_items, job.failed_items), (3, 0))
+        self.assertEqual(job.result['total_analyzed'], 3)
+        self.assertEqual([r['symbol'] for r in job.result['all_contracts']], ['RELIANCE', 'INFY', 'TCS'])
+
+        progress = job_progress(job)
+        self.assertTrue(progress['is_complete'])
+        self.assertEqual([item['symbol'] for item in progress['items']], ['RELIANCE', 'TCS', 'INFY'])
+        self.assertEqual(job_progress(job, since=progress['items'][1]['seq'])['items'][0]['symbol'], 'INFY')
+
+    def test_unchanged_data_reuses_results(self):
+        with mock.patch('apps.trading.services.futures_screening.analyze_futures_contract',
+                        side_effect=self._fake_analysis) as analyze:
+            self._submit()
+            self.contracts[1].traded_contracts = 6000
+            self.contracts[1].save()
+            job = self._submit()
+
+        # Only the contract whose data changed is analyzed again
+        self.assertEqual(analyze.call_count, 4)
+        self.assertEqual({item.symbol: item.from_cache for item in job.items.all()},
+                         {'RELIANCE': True, 'TCS': False, 'INFY': True})
+
+        with mock.patch('apps.trading.services.futures_screening.analyze_futures_contract',
+                        side_effect=self._fake_analysis) as analyze:
+            self._submit(refresh=True)
+        self.assertEqual(analyze.call_count, 3)
+
+    def test_failed_contract_does_not_fail_job(self):
+        def analyze(contract):
+            if contract.symbol == 'TCS':
+                raise ValueError('no candles')
+            return self._fake_analysis(contract)
+
+        with mock.patch('apps.trading.services.futures_screening.analyze_futures_contract', side_effect=analyze):
+            job = self._submit()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual(job.failed_items, 1)
+        self.assertEqual(job.result['total_errors'], 1)
+        self.assertEqual(job.result['all_contracts'][-1]['verdict'], 'ERROR')
+
+    def test_cancel_skips_remaining_items(self):
+        from apps.trading.services.analysis_jobs import cancel_job
+
+        def analyze(contract):
+            cancel_job(AnalysisJob.objects.get())
+            return self._fake_analysis(contract)
+
+        with mock.patch('apps.trading.services.futures_screening.analyze_futures_contract', side_effect=analyze):
+            job = self._submit()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'CANCELLED')
+        self.assertIsNone(job.result)
+        self.assertEqual(list(job.items.values_list('status', flat=True)), ['SUCCESS', 'CANCELLED', 'CANCELLED'])
+
+    def test_data_snapshot_version(self):
+        from apps.trading.services.analysis_jobs import data_snapshot_version
+
+        version = data_snapshot_version('TCS', '2025-12-30')
+        self.assertEqual(version, data_snapshot_version('TCS', '2025-12-30'))
+        self.assertNotEqual(version, data_snapshot_version('TCS', '2026-01-27'))
+
+        self.contracts[1].save()
+        self.assertNotEqual(version, data_snapshot_version('TCS', '2025-12-30'))
@@ -0,0 +1,96 @@
+"""
+Trading App Tests - Level 2 Pipeline
+
+Tests for:
+1. Level 2 pipeline (shared data load, report cache by data version, watchlist batch)
+"""
+
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+
+class Level2PipelineTests(TestCase):
+    """Level 2 pipeline: shared data load, report cache by data version, watchlist batch"""
+
+    SYMBOLS = ('RELIANCE', 'TCS', 'INFY')
+
+    def setUp(self):
+        from django.core.cache import cache
+        from apps.data.models import ContractData, ContractStockData, TLStockData
+
+        cache.clear()
+        for target in ('apps.trading.services.level2_pipeline', 'apps.trading.level2_report_generator'):
+            freshness = mock.patch(f'{target}.check_freshness_in_background')
+            freshness.start()
+            self.addCleanup(freshness.stop)
+        self.stocks = {
+            symbol: TLStockData.objects.create(
+                nsecode=symbol, stock_name=symbol.title(), current_price=1000 + i, roe_annual_pct=18.0,
+                day_rsi=55.0, day50_sma=990.0, day200_sma=950.0, sector_name='IT')
+            for i, symbol in enumerate(self.SYMBOLS)
+        }
+        fno_metrics = {f.name: 0 for f in ContractStockData._meta.fields
+                       if f.name.startswith('fno_') or f.name == 'annualized_volatility'}
+        for symbol in self.SYMBOLS:
+            ContractStockData.objects.create(stock_name=symbol, nse_code=symbol, current_price=1000,
+                                             industry_name='IT', **dict(fno_metrics, fno_pcr_oi=0.9))
+            for expiry, oi in (('2025-12-30', 100), ('2026-01-27', 50)):
+                ContractData.objects.create(symbol=symbol, option_type='FUTURE', expiry=expiry, oi=oi, lot_size=500)
+
+    def _items(self, symbols):
+        return [{'symbol': symbol, 'expiry': '2025-12-30', 'level1_results': {'composite_score': 70}}
+                for symbol in symbols]
+
+    def test_batch_loads_each_table_once(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.trading.services.level2_pipeline import generate_reports
+
+        generate_reports(self._items(self.SYMBOLS[:1]))  # Sector cache loads on first use
+        with CaptureQueriesContext(connection) as one:
+            generate_reports(self._items(self.SYMBOLS[:1]), use_cache=False)
+        with CaptureQueriesContext(connection) as three:
+            reports = generate_reports(self._items(self.SYMBOLS), use_cache=False)
+
+        self.assertEqual(len(three), len(one))
+        self.assertEqual(set(reports), set(self.SYMBOLS))
+        report = reports['TCS']
+        self.assertEqual(report['metadata']['level1_score'], 70)
+        self.assertTrue(report['metadata']['data_completeness']['contract_stock'])
+        self.assertIn('sector_strength', report['detailed_analysis'])
+        self.assertEqual(report['detailed_analysis']['sector_strength']['sector'], 'IT')
+        self.assertIn('conviction_score', report['executive_summary'])
+
+    def test_report_reused_until_data_changes(self):
+        from apps.trading import level2_report_generator
+        from apps.trading.level2_report_generator import Level2ReportGenerator
+
+        with mock.patch.object(level2_report_generator, 'run_analyzers',
+                               wraps=level2_report_generator.run_analyzers) as run:
+            first = Level2ReportGenerator('TCS', '2025-12-30', {'composite_score': 70}).generate_report()
+            again = Level2ReportGenerator('TCS', '2025-12-30', {'composite_score': 40}).generate_report()
+            self.assertEqual(run.call_count, 1)
+            self.assertEqual(again['metadata']['level1_score'], 40)
+            self.assertEqual(again['executive_summary'], first['executive_summary'])
+
+            Level2ReportGenerator('TCS', '2026-01-27', {}).generate_report()
+            self.assertEqual(run.call_count, 2)
+
+            self.stocks['TCS'].day_rsi = 75.0
+            self.stocks['TCS'].save()
+            Level2ReportGenerator('TCS', '2025-12-30', {}).generate_report()
+            self.assertEqual(run.call_count, 3)
+
+    def test_concurrent_and_sequential_analyzers_agree(self):
+        from apps.trading.services.level2_pipeline import load_context, run_analyzers
+
+        context = load_context('INFY', '2025-12-30')
+        self.assertEqual([c.expiry for c in context.contracts], [date(2026, 1, 27), date(2025, 12, 30)])
+        concurrent = run_analyzers(context)
+        sequential = run_analyzers(context, concurrent=False)
+        self.assertEqual(set(concurrent), {'fundamental', 'valuation', 'institutional', 'technical',
+                                           'support_resistance', 'sector_strength', 'risk'})
+        self.assertEqual(concurrent['technical'], sequential['technical'])
+        self.assertEqual(concurrent['risk'], sequential['risk'])
@@ -14,6 +14,8 @@ urlpatterns = [
     path('view-trades/', views.view_trades, name='view_trades'),  # View active positions
     path('trigger/futures/', views.trigger_futures_algorithm, name='trigger_futures'),
     path('trigger/strangle/', views.trigger_nifty_strangle, name='trigger_strangle'),
+    path('jobs/<int:job_id>/', views.analysis_job_progress, name='analysis_job_progress'),
+    path('jobs/<int:job_id>/cancel/', views.cancel_analysis_job, name='cancel_analysis_job'),
     path('trigger/verify/', views.verify_future_trade, name='verify_trade'),
     path('trigger/get-contracts/', views.get_contracts, name='get_contracts'),
     path('trigger/start-trendlyne-fetch/', views.start_trendlyne_fetch, name='start_trendlyne_fetch'),
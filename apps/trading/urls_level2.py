@@ -5,6 +5,7 @@ URL Configuration for Level 2 Deep-Dive Analysis API
 from django.urls import path
 from apps.trading.views_level2 import (
     FuturesDeepDiveView,
+    DeepDiveBatchView,
     DeepDiveStatusView,
     DeepDiveDecisionView,
     TradeCloseView,
@@ -18,6 +19,9 @@ urlpatterns = [
     # Generate deep-dive analysis (async with fresh data)
     path('futures/deep-dive/', FuturesDeepDiveView.as_view(), name='futures-deep-dive'),
 
+    # Reports for a whole watchlist (stored data, cached per data version)
+    path('futures/deep-dive/batch/', DeepDiveBatchView.as_view(), name='futures-deep-dive-batch'),
+
     # Status checking (for polling)
     path('deep-dive/<int:analysis_id>/status/', DeepDiveStatusView.as_view(), name='deep-dive-status'),
 
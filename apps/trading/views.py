@@ -458,11 +458,11 @@ def manual_triggers(request):
     # Using OR logic: (this month >= 1000) OR (next month >= 800)
     futures_contracts = ContractData.objects.filter(
         option_type='FUTURE',  # Futures only (stored as 'FUTURE' in DB)
-        expiry__gte=str(today),
-        expiry__lte=str(next_month_end)
+        expiry__gte=today,
+        expiry__lte=next_month_end
     ).filter(
-        Q(expiry__lte=str(this_month_end), traded_contracts__gte=1000) |  # This month >= 1000
-        Q(expiry__gte=str(next_month_start), expiry__lte=str(next_month_end), traded_contracts__gte=800)  # Next month >= 800
+        Q(expiry__lte=this_month_end, traded_contracts__gte=1000) |  # This month >= 1000
+        Q(expiry__gte=next_month_start, expiry__lte=next_month_end, traded_contracts__gte=800)  # Next month >= 800
     ).order_by('symbol', 'expiry').values(
         'symbol',
         'expiry',
@@ -474,7 +474,7 @@ def manual_triggers(request):
     # Format contracts as "SYMBOL - DD-MMM-YYYY (Volume: X)"
     contract_list = []
     for contract in futures_contracts:
-        expiry_date = datetime.strptime(contract['expiry'], '%Y-%m-%d').strftime('%d-%b-%Y')
+        expiry_date = contract['expiry'].strftime('%d-%b-%Y')
         display_name = f"{contract['symbol']} - {expiry_date}"
         contract_value = f"{contract['symbol']}|{contract['expiry']}"  # value format: SYMBOL|YYYY-MM-DD
 
@@ -560,11 +560,11 @@ def get_contracts(request):
         # Get futures contracts that meet volume criteria
         futures_contracts = ContractData.objects.filter(
             option_type='FUTURE',
-            expiry__gte=str(today),
-            expiry__lte=str(next_month_end)
+            expiry__gte=today,
+            expiry__lte=next_month_end
         ).filter(
-            Q(expiry__lte=str(this_month_end), traded_contracts__gte=this_month_volume) |
-            Q(expiry__gte=str(next_month_start), expiry__lte=str(next_month_end), traded_contracts__gte=next_month_volume)
+            Q(expiry__lte=this_month_end, traded_contracts__gte=this_month_volume) |
+            Q(expiry__gte=next_month_start, expiry__lte=next_month_end, traded_contracts__gte=next_month_volume)
         ).order_by('symbol', 'expiry').values(
             'symbol',
             'expiry',
@@ -576,7 +576,7 @@ def get_contracts(request):
         # Format contracts
         contract_list = []
         for contract in futures_contracts:
-            expiry_date = datetime.strptime(contract['expiry'], '%Y-%m-%d').strftime('%d-%b-%Y')
+            expiry_date = contract['expiry'].strftime('%d-%b-%Y')
             display_name = f"{contract['symbol']} - {expiry_date}"
             contract_value = f"{contract['symbol']}|{contract['expiry']}"
 
@@ -634,11 +634,11 @@ def trigger_futures_algorithm(request):
 
         futures_contracts = ContractData.objects.filter(
             option_type='FUTURE',
-            expiry__gte=str(today),
-            expiry__lte=str(next_month_end)
+            expiry__gte=today,
+            expiry__lte=next_month_end
         ).filter(
-            Q(expiry__lte=str(this_month_end), traded_contracts__gte=this_month_volume) |
-            Q(expiry__gte=str(next_month_start), expiry__lte=str(next_month_end), traded_contracts__gte=next_month_volume)
+            Q(expiry__lte=this_month_end, traded_contracts__gte=this_month_volume) |
+            Q(expiry__gte=next_month_start, expiry__lte=next_month_end, traded_contracts__gte=next_month_volume)
         ).order_by('-traded_contracts')  # Order by volume descending
 
         contract_count = futures_contracts.count()
@@ -670,7 +670,7 @@ def trigger_futures_algorithm(request):
 
                 analysis_result = comprehensive_futures_analysis(
                     stock_symbol=contract.symbol,
-                    expiry_date=contract.expiry,
+                    expiry_date=contract.expiry.isoformat(),
                     contract=contract
                 )
 
@@ -682,8 +682,7 @@ def trigger_futures_algorithm(request):
                 success = analysis_result.get('success', False)
 
                 # Format expiry
-                expiry_dt = datetime.strptime(contract.expiry, '%Y-%m-%d')
-                expiry_formatted = expiry_dt.strftime('%d-%b-%Y')
+                expiry_formatted = contract.expiry.strftime('%d-%b-%Y')
 
                 # Build explanation using execution log
                 explanation_parts = []
@@ -706,7 +705,7 @@ def trigger_futures_algorithm(request):
                 analyzed_results.append({
                     'symbol': contract.symbol,
                     'expiry': expiry_formatted,
-                    'expiry_date': contract.expiry,
+                    'expiry_date': contract.expiry.isoformat(),
                     'composite_score': composite_score,
                     'direction': direction,
                     'verdict': verdict,
@@ -737,16 +736,12 @@ def trigger_futures_algorithm(request):
                 logger.error(f"Error analyzing {contract.symbol}: {e}")
 
                 # Add failed contract to results
-                try:
-                    expiry_dt = datetime.strptime(contract.expiry, '%Y-%m-%d')
-                    expiry_formatted = expiry_dt.strftime('%d-%b-%Y')
-                except:
-                    expiry_formatted = contract.expiry
+                expiry_formatted = contract.expiry.strftime('%d-%b-%Y')
 
                 analyzed_results.append({
                     'symbol': contract.symbol,
                     'expiry': expiry_formatted,
-                    'expiry_date': contract.expiry,
+                    'expiry_date': contract.expiry.isoformat(),
                     'composite_score': 0,
                     'direction': 'NEUTRAL',
                     'verdict': 'ERROR',
@@ -35,6 +35,8 @@ from .suggestion_views import (
 from .algorithm_views import (
     trigger_futures_algorithm,
     trigger_nifty_strangle,
+    analysis_job_progress,
+    cancel_analysis_job,
 )
 
 from .verification_views import (
@@ -78,6 +80,8 @@ __all__ = [
     # Algorithm views
     'trigger_futures_algorithm',
     'trigger_nifty_strangle',
+    'analysis_job_progress',
+    'cancel_analysis_job',
 
     # Verification views
     'verify_future_trade',
@@ -6,11 +6,14 @@ This module contains views for triggering automated trading algorithms:
 - Nifty options strangle strategy with delta-based strike selection
 
 Both algorithms integrate with Breeze API for real-time market data and margin calculations.
+They run as analysis jobs (apps/trading/services/analysis_jobs.py): the trigger
+returns a job id at once and the results stream back through the job
+progress endpoint (or the live feed topic 'analysis:<job_id>').
 """
 
 import logging
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.http import JsonResponse
 
 logger = logging.getLogger(__name__)
@@ -26,10 +29,11 @@ def trigger_futures_algorithm(request):
     - This month contracts: volume >= threshold (default 1000)
     - Next month contracts: volume >= threshold (default 800)
 
-    For each contract that passes volume filter:
+    For each contract that passes volume filter (one parallel job item each):
     1. Runs comprehensive 9-step technical analysis
     2. Calculates composite score from multiple factors
     3. Determines trading direction (LONG/SHORT/NEUTRAL)
+    When all contracts are done:
     4. Fetches real margin requirements from Breeze API
     5. Calculates position sizing with 50% margin rule
     6. Saves trade suggestions to database
@@ -38,43 +42,38 @@ def trigger_futures_algorithm(request):
         {
             "this_month_volume": 1000,  # Volume threshold for current month contracts
             "next_month_volume": 800,   # Volume threshold for next month contracts
-            "confirmed": false          # User confirmation if >15 contracts found
+            "confirmed": false,         # User confirmation if >15 contracts found
+            "refresh": false            # Re-analyze contracts with a cached result
         }
 
     Returns:
         JsonResponse: {
             'success': bool,
-            'all_contracts': [...],     # All analyzed contracts sorted by score
-            'total_analyzed': int,
-            'total_passed': int,
-            'total_failed': int,
-            'total_errors': int,
-            'execution_summary': [...],
-            'volume_filters': {...},
-            'suggestion_ids': [...]     # IDs of saved TradeSuggestion records
+            'job_id': int,
+            'status': 'PENDING',
+            'total': int,               # Contracts submitted
+            'progress_url': str,        # GET: per-contract results as they finish
+            'cancel_url': str,          # POST: stop the job
+            'live_topic': str           # Live feed topic streaming the same results
         }
 
+        The finished job's 'result' has the shape this endpoint used to return:
+        all_contracts, total_analyzed, total_passed, total_failed,
+        total_errors, execution_summary, volume_filters, suggestion_ids.
+
     Error Responses:
         - 400: Invalid request body or no contracts match criteria
-        - 401: Breeze authentication required
-        - 500: Internal server error during analysis
-
-    Side Effects:
-        - Creates TradeSuggestion records for PASS contracts
-        - Fetches real-time margin data from Breeze API
-        - Logs analysis results for each contract
+        - 500: Internal server error while submitting
 
     Notes:
         - Uses 50% margin rule: recommended position = 50% of available margin
         - Remaining 50% reserved for averaging (2 additional positions)
         - Applies stop loss (2%) and target (4%) based on direction
-        - Breeze API required for margin and futures price data
+        - Contracts whose input data is unchanged reuse their recent analysis
     """
     import json
-    from apps.trading.futures_analyzer import comprehensive_futures_analysis
-    from apps.data.models import ContractData
-    from django.db.models import Q
-    from datetime import datetime, timedelta
+    from apps.trading.services.analysis_jobs import job_submitted_response, submit_job
+    from apps.trading.services.futures_screening import select_volume_qualified_futures
 
     try:
         # Parse volume thresholds from request
@@ -86,21 +85,8 @@ def trigger_futures_algorithm(request):
         logger.info(f"Manual trigger: Futures algorithm with volume filters (this_month≥{this_month_volume}, next_month≥{next_month_volume})")
 
         # Get filtered contracts based on volume criteria
-        today = datetime.now().date()
-        this_month_end = today + timedelta(days=30)
-        next_month_start = today + timedelta(days=30)
-        next_month_end = today + timedelta(days=60)
-
-        futures_contracts = ContractData.objects.filter(
-            option_type='FUTURE',
-            expiry__gte=str(today),
-            expiry__lte=str(next_month_end)
-        ).filter(
-            Q(expiry__lte=str(this_month_end), traded_contracts__gte=this_month_volume) |
-            Q(expiry__gte=str(next_month_start), expiry__lte=str(next_month_end), traded_contracts__gte=next_month_volume)
-        ).order_by('-traded_contracts')  # Order by volume descending
-
-        contract_count = futures_contracts.count()
+        futures_contracts = list(select_volume_qualified_futures(this_month_volume, next_month_volume))
+        contract_count = len(futures_contracts)
 
         if contract_count == 0:
             return JsonResponse({
@@ -119,407 +105,68 @@ def trigger_futures_algorithm(request):
                 'message': f'Found {contract_count} contracts to analyze. This may take a while (estimated {contract_count * 3} seconds). Do you want to proceed?'
             })
 
-        # Run comprehensive analysis on all contracts (no limit)
-        analyzed_results = []
-        execution_summary = []
-
-        for contract in futures_contracts:  # Analyze ALL contracts
-            try:
-                logger.info(f"Analyzing {contract.symbol} (expiry: {contract.expiry})")
-
-                analysis_result = comprehensive_futures_analysis(
-                    stock_symbol=contract.symbol,
-                    expiry_date=contract.expiry,
-                    contract=contract
-                )
-
-                # Extract metrics regardless of pass/fail
-                metrics = analysis_result.get('metrics', {})
-                composite_score = analysis_result.get('composite_score', 0)
-                direction = analysis_result.get('direction', 'NEUTRAL')
-                verdict = analysis_result.get('verdict', 'FAIL')
-                success = analysis_result.get('success', False)
-
-                # Format expiry
-                expiry_dt = datetime.strptime(contract.expiry, '%Y-%m-%d')
-                expiry_formatted = expiry_dt.strftime('%d-%b-%Y')
-
-                # Build explanation using execution log
-                explanation_parts = []
-                execution_log = analysis_result.get('execution_log', [])
-
-                # Extract key analysis points (both pass and fail)
-                for log in execution_log:
-                    if log['action'] == 'Open Interest Analysis' and log['status'] != 'SKIP':
-                        explanation_parts.append(f"OI: {log['message']}")
-                    elif log['action'] == 'Sector Strength' and log['status'] != 'SKIP':
-                        explanation_parts.append(f"Sector: {log['message']}")
-                    elif log['action'] == 'Multi-Factor Technical Analysis' and log['status'] != 'SKIP':
-                        explanation_parts.append(f"Technical: {log['message']}")
-                    elif log['action'] == 'DMA Analysis' and log['status'] != 'SKIP':
-                        explanation_parts.append(f"DMA: {log['message']}")
-                    elif log['action'] == 'Composite Scoring & Verdict':
-                        explanation_parts.append(f"Final: {log['message']}")
-
-                # Add to results regardless of pass/fail
-                analyzed_results.append({
-                    'symbol': contract.symbol,
-                    'expiry': expiry_formatted,
-                    'expiry_date': contract.expiry,
-                    'composite_score': composite_score,
-                    'direction': direction,
-                    'verdict': verdict,
-                    'success': success,
-                    'spot_price': metrics.get('spot_price', 0),
-                    'futures_price': metrics.get('futures_price', 0),
-                    'basis': metrics.get('basis', 0),
-                    'basis_pct': metrics.get('basis_pct', 0),
-                    'volume': contract.traded_contracts,
-                    'lot_size': contract.lot_size,
-                    'explanation': explanation_parts,
-                    'execution_log': execution_log,
-                    'metrics': metrics,
-                    'scores': analysis_result.get('scores', {}),
-                    'sr_data': metrics.get('sr_details', None),  # Support/Resistance data
-                    'breach_risks': analysis_result.get('breach_risks', None),  # Breach risk calculations
-                    'error': analysis_result.get('error', None) if not success else None
-                })
-
-                execution_summary.append({
-                    'symbol': contract.symbol,
-                    'status': verdict,
-                    'score': composite_score,
-                    'success': success
-                })
-
-            except Exception as e:
-                logger.error(f"Error analyzing {contract.symbol}: {e}")
-
-                # Add failed contract to results
-                try:
-                    expiry_dt = datetime.strptime(contract.expiry, '%Y-%m-%d')
-                    expiry_formatted = expiry_dt.strftime('%d-%b-%Y')
-                except:
-                    expiry_formatted = contract.expiry
-
-                analyzed_results.append({
-                    'symbol': contract.symbol,
-                    'expiry': expiry_formatted,
-                    'expiry_date': contract.expiry,
-                    'composite_score': 0,
-                    'direction': 'NEUTRAL',
-                    'verdict': 'ERROR',
-                    'success': False,
-                    'spot_price': 0,
-                    'futures_price': 0,
-                    'basis': 0,
-                    'basis_pct': 0,
-                    'volume': contract.traded_contracts,
-                    'lot_size': contract.lot_size,
-                    'explanation': [f"Analysis failed: {str(e)[:200]}"],
-                    'execution_log': [],
-                    'metrics': {},
-                    'scores': {},
-                    'error': str(e)
-                })
-
-                execution_summary.append({
-                    'symbol': contract.symbol,
-                    'status': 'ERROR',
-                    'error': str(e),
-                    'score': 0,
-                    'success': False
-                })
-                continue
+        # Analyze ALL contracts (no limit), one job item per contract
+        job = submit_job(
+            'FUTURES_SCREEN',
+            request.user,
+            items=[
+                {'contract_id': contract.id, 'symbol': contract.symbol, 'expiry': contract.expiry}
+                for contract in futures_contracts
+            ],
+            params={'this_month_volume': this_month_volume, 'next_month_volume': next_month_volume},
+            refresh=bool(body.get('refresh', False)),
+        )
 
-        # Sort by verdict priority (PASS first, then FAIL, then ERROR) and then by score
-        def sort_key(contract):
-            verdict = contract['verdict']
-            score = contract['composite_score']
+        return JsonResponse(job_submitted_response(job, contract_count=contract_count))
 
-            # Priority: PASS=0, FAIL=1, ERROR=2 (lower is better)
-            priority = 0 if verdict == 'PASS' else (1 if verdict == 'FAIL' else 2)
+    except Exception as e:
+        logger.error(f"Error in trigger_futures_algorithm: {e}", exc_info=True)
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
 
-            # Return tuple: (priority, negative_score) so PASS comes first, then sorted by score descending
-            return (priority, -score)
 
-        analyzed_results.sort(key=sort_key)
+@login_required
+@require_GET
+def analysis_job_progress(request, job_id):
+    """
+    Progress and results of an analysis job.
 
-        # Count passed contracts
-        passed_results = [r for r in analyzed_results if r['verdict'] == 'PASS']
+    GET params:
+        since: Last 'seq' already received (only newer item results are returned)
 
-        if not analyzed_results:
-            return JsonResponse({
-                'success': False,
-                'error': 'No contracts could be analyzed',
-                'execution_summary': execution_summary,
-                'total_analyzed': 0
-            })
+    Returns:
+        JsonResponse: status, total/completed/failed counts, new 'items'
+        (per-contract results), 'last_seq' and, once finished, 'result'
+    """
+    from apps.trading.models import AnalysisJob
+    from apps.trading.services.analysis_jobs import job_progress
 
-        logger.info(f"Analysis complete: {len(analyzed_results)} contracts analyzed, {len(passed_results)} passed")
-
-        # Save trade suggestions for top 3 PASS results with real Breeze margin
-        suggestion_ids = []
-        if passed_results:
-            from apps.trading.models import TradeSuggestion
-            from django.utils import timezone
-            from apps.trading.position_sizer import PositionSizer
-            from apps.brokers.integrations.breeze import get_breeze_client
-            from apps.data.models import ContractData
-            import json
-            from datetime import date, datetime, timedelta
-            from decimal import Decimal
+    job = AnalysisJob.objects.filter(id=job_id, user=request.user).first()
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Job not found'}, status=404)
 
-            # Helper to serialize dates and decimals for JSON
-            def json_serial(obj):
-                if isinstance(obj, (datetime, date)):
-                    return obj.isoformat()
-                if isinstance(obj, Decimal):
-                    return float(obj)
-                raise TypeError(f"Type {type(obj)} not serializable")
-
-            # Initialize Breeze client for margin fetching
-            try:
-                breeze = get_breeze_client()
-            except Exception as e:
-                logger.warning(f"Could not initialize Breeze client for position sizing: {e}")
-                breeze = None
-
-            # Fetch available F&O margin from Breeze API (same logic as verify_future_trade)
-            available_margin = 5000000  # Default 50 lakh
-            if breeze:
-                try:
-                    margin_response = breeze.get_margin(exchange_code="NFO")
-                    if margin_response and margin_response.get('Status') == 200:
-                        margin_data = margin_response.get('Success', {})
-                        cash_limit = float(margin_data.get('cash_limit', 0))
-                        block_by_trade = float(margin_data.get('block_by_trade', 0))
-                        available_margin = cash_limit - block_by_trade
-                        logger.info(f"Available F&O margin from Breeze: ₹{available_margin:,.0f}")
-                    else:
-                        logger.warning("Could not fetch F&O margin, using default: ₹50,00,000")
-                except Exception as e:
-                    logger.warning(f"Error fetching F&O margin: {e}, using default")
-            else:
-                logger.warning("Breeze client not available, using default margin: ₹50,00,000")
+    try:
+        since = int(request.GET.get('since', 0))
+    except ValueError:
+        since = 0
+    return JsonResponse(job_progress(job, since=since))
 
-            # Save ALL PASS results with real position sizing (not just top 3)
-            # This allows the collapsible UI to work for all passed contracts
-            for result in passed_results:
-                try:
-                    symbol = result['symbol']
-                    expiry_date_str = result['expiry_date']
-                    direction = result['direction']
-                    futures_price = Decimal(str(result['futures_price']))
-                    spot_price = Decimal(str(result['spot_price']))
-                    composite_score = result['composite_score']
-
-                    # Get contract details
-                    contract = ContractData.objects.filter(
-                        symbol=symbol,
-                        option_type='FUTURE',
-                        expiry=expiry_date_str
-                    ).first()
-
-                    if not contract:
-                        continue
-
-                    lot_size = contract.lot_size
-                    expiry_dt = datetime.strptime(expiry_date_str, '%Y-%m-%d')
-
-                    # Format expiry for Breeze API
-                    expiry_breeze = expiry_dt.strftime('%d-%b-%Y').upper()
-
-                    # Calculate position sizing using same logic as verify_future_trade
-                    # Step 1: Get margin per lot from Breeze API
-                    margin_per_lot = 0
-                    if breeze:
-                        try:
-                            # Estimate quantity for margin call (1 lot)
-                            quantity = lot_size
-                            action = 'buy' if direction == 'LONG' else 'sell'
-
-                            margin_resp = breeze.get_margin(
-                                exchange_code='NFO',
-                                product_type='futures',
-                                stock_code=symbol,
-                                quantity=str(quantity),
-                                price='0',  # Market price
-                                action=action,
-                                expiry_date=expiry_breeze,
-                                right='others',
-                                strike_price='0'
-                            )
-
-                            if margin_resp and margin_resp.get('Status') == 200:
-                                margin_data_resp = margin_resp.get('Success', {})
-                                margin_per_lot = float(margin_data_resp.get('total', 0))
-                                logger.info(f"Breeze margin for {symbol}: ₹{margin_per_lot:,.0f} per lot")
-                            else:
-                                # Fallback: Estimate 17% of contract value
-                                margin_per_lot = float(futures_price * lot_size) * 0.17
-                                logger.warning(f"Margin API failed for {symbol}, estimating: ₹{margin_per_lot:,.0f}")
-                        except Exception as e:
-                            logger.warning(f"Error fetching margin for {symbol}: {e}")
-                            margin_per_lot = float(futures_price * lot_size) * 0.17
-                    else:
-                        # Fallback: Estimate 17% of contract value
-                        margin_per_lot = float(futures_price * lot_size) * 0.17
-
-                    # Step 2: Apply 50% rule for initial position
-                    # Initial position should use 50% of available margin
-                    # Remaining 50% is reserved for averaging (2 more positions)
-                    safe_margin = available_margin * 0.5
-
-                    # Step 3: Calculate recommended lots to use 50% margin
-                    recommended_lots = max(1, int(safe_margin / margin_per_lot)) if margin_per_lot > 0 else 1
-
-                    # Step 4: Calculate max lots possible with full available margin (for slider limit)
-                    max_lots_possible = int(available_margin / margin_per_lot) if margin_per_lot > 0 else 1
-
-                    # Step 5: Calculate position metrics
-                    margin_required = Decimal(str(margin_per_lot * recommended_lots))
-                    margin_per_lot_decimal = Decimal(str(margin_per_lot))
-                    margin_available_decimal = Decimal(str(available_margin))
-
-                    # Calculate margin utilization
-                    margin_utilization = 0
-                    if available_margin > 0:
-                        margin_utilization = (margin_required / margin_available_decimal) * 100
-
-                    logger.info(f"Position sizing for {symbol}: {recommended_lots} lots (50% of ₹{available_margin:,.0f} = ₹{margin_required:,.0f}, {margin_utilization:.1f}% used)")
-
-                    # Build position sizing data for saving
-                    position_sizing_data = {
-                        'position': {
-                            'recommended_lots': recommended_lots,
-                            'total_margin_required': float(margin_required),
-                            'entry_value': float(futures_price * lot_size * recommended_lots),
-                            'margin_utilization_percent': float(margin_utilization)
-                        },
-                        'margin_data': {
-                            'available_margin': available_margin,
-                            'used_margin': float(margin_required),
-                            'total_margin': available_margin,
-                            'margin_per_lot': margin_per_lot,
-                            'max_lots_possible': max_lots_possible,
-                            'futures_price': float(futures_price),
-                            'source': 'Breeze API' if breeze else 'Estimated'
-                        },
-                        'stop_loss': 0,  # Will be calculated below
-                        'target': 0,  # Will be calculated below
-                        'direction': direction
-                    }
 
-                    # Calculate stop loss and target
-                    if direction == 'LONG':
-                        stop_loss_price = futures_price * Decimal('0.98')
-                        target_price = futures_price * Decimal('1.04')
-                    elif direction == 'SHORT':
-                        stop_loss_price = futures_price * Decimal('1.02')
-                        target_price = futures_price * Decimal('0.96')
-                    else:
-                        stop_loss_price = futures_price * Decimal('0.98')
-                        target_price = futures_price * Decimal('1.02')
-
-                    # Update position_sizing_data with stop loss and target
-                    position_sizing_data['stop_loss'] = float(stop_loss_price)
-                    position_sizing_data['target'] = float(target_price)
-
-                    # Calculate max profit and loss
-                    max_loss_value = abs(futures_price - stop_loss_price) * lot_size * recommended_lots
-                    max_profit_value = abs(target_price - futures_price) * lot_size * recommended_lots
-
-                    # Convert data to JSON-safe format
-                    # Use .get() for all keys to avoid KeyError
-                    algorithm_reasoning_safe = json.loads(
-                        json.dumps({
-                            'metrics': result.get('metrics', {}),
-                            'execution_log': result.get('execution_log', []),
-                            'composite_score': composite_score,
-                            'scores': result.get('scores', {}),
-                            'explanation': result.get('explanation', ''),
-                            'sr_data': result.get('sr_data'),
-                            'breach_risks': result.get('breach_risks')
-                        }, default=json_serial)
-                    )
-
-                    logger.info(f"About to create suggestion for {symbol}: lots={recommended_lots}, margin={margin_required}, score={composite_score}")
-
-                    suggestion = TradeSuggestion.objects.create(
-                        user=request.user,
-                        strategy='icici_futures',
-                        suggestion_type='FUTURES',
-                        instrument=symbol,
-                        direction=direction.upper(),
-                        # Market Data
-                        spot_price=spot_price,
-                        expiry_date=expiry_dt.date(),
-                        days_to_expiry=(expiry_dt.date() - datetime.now().date()).days,
-                        # Position Sizing (with real Breeze margin - 50% rule)
-                        recommended_lots=recommended_lots,
-                        margin_required=margin_required,
-                        margin_available=margin_available_decimal,
-                        margin_per_lot=margin_per_lot_decimal,
-                        margin_utilization=Decimal(str(margin_utilization)),
-                        # Risk Metrics
-                        max_profit=max_profit_value,
-                        max_loss=max_loss_value,
-                        breakeven_upper=target_price if direction == 'LONG' else None,
-                        breakeven_lower=stop_loss_price if direction == 'LONG' else None,
-                        # Complete Data (includes real position sizing with 50% rule)
-                        algorithm_reasoning=algorithm_reasoning_safe,
-                        position_details=json.loads(json.dumps(position_sizing_data, default=json_serial)),
-                        # Expiry: 24 hours from now
-                        expires_at=timezone.now() + timedelta(hours=24)
-                    )
-
-                    suggestion_ids.append(suggestion.id)
-                    logger.info(f"Saved futures suggestion #{suggestion.id} for {symbol}")
-
-                except Exception as e:
-                    logger.error(f"Error saving suggestion for {result.get('symbol')}: {e}")
-                    import traceback
-                    logger.error(f"Traceback: {traceback.format_exc()}")
-                    suggestion_ids.append(None)  # Append None to keep indices aligned
-                    continue
-
-        # Prepare response - return ALL analyzed results
-        response_data = {
-            'success': True,
-            'all_contracts': analyzed_results,  # All contracts sorted by score
-            'total_analyzed': len(analyzed_results),
-            'total_passed': len(passed_results),
-            'total_failed': len([r for r in analyzed_results if r['verdict'] == 'FAIL']),
-            'total_errors': len([r for r in analyzed_results if r['verdict'] == 'ERROR']),
-            'execution_summary': execution_summary,
-            'volume_filters': {
-                'this_month': this_month_volume,
-                'next_month': next_month_volume
-            },
-            'suggestion_ids': suggestion_ids  # IDs of saved suggestions
-        }
+@login_required
+@require_POST
+def cancel_analysis_job(request, job_id):
+    """Cancel an analysis job; results of contracts already analyzed are kept."""
+    from apps.trading.models import AnalysisJob
+    from apps.trading.services.analysis_jobs import cancel_job
 
-        return JsonResponse(response_data)
+    job = AnalysisJob.objects.filter(id=job_id, user=request.user).first()
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Job not found'}, status=404)
 
-    except Exception as e:
-        from apps.brokers.exceptions import BreezeAuthenticationError
-
-        # Check if it's an authentication error
-        if isinstance(e, BreezeAuthenticationError):
-            logger.warning(f"Breeze authentication failed: {e}")
-            return JsonResponse({
-                'success': False,
-                'auth_required': True,
-                'error': str(e),
-                'message': 'Breeze session expired. Please re-login to continue.'
-            })
-
-        logger.error(f"Error in trigger_futures_algorithm: {e}", exc_info=True)
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        })
+    job = cancel_job(job, reason=f'Cancelled by {request.user.username}')
+    return JsonResponse({'success': True, 'job_id': job.id, 'status': job.status})
 
 
 @login_required
@@ -548,8 +195,10 @@ def trigger_nifty_strangle(request):
 
     Request Body: None required (POST only)
 
-    Returns:
-        JsonResponse: {
+    Runs as a single-item analysis job; returns the job id (see
+    trigger_futures_algorithm). The finished job's 'result' is:
+
+        {
             'success': bool,
             'strangle': {
                 'strategy': 'Short Strangle (Delta-Based)',
@@ -623,6 +272,28 @@ def trigger_nifty_strangle(request):
         - Strategy is market-neutral (sells both call and put)
         - Exit target: 50% profit or expiry, whichever comes first
     """
+    from apps.trading.services.analysis_jobs import job_submitted_response, submit_job
+
+    try:
+        job = submit_job('NIFTY_STRANGLE', request.user, items=[{'symbol': 'NIFTY'}])
+        return JsonResponse(job_submitted_response(job))
+    except Exception as e:
+        logger.error(f"Error in trigger_nifty_strangle: {e}", exc_info=True)
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+
+def run_nifty_strangle_analysis(user):
+    """
+    Run the Nifty strangle algorithm for a user (body of trigger_nifty_strangle).
+
+    Called by the analysis job runner.
+
+    Returns:
+        dict: Response body ('success', 'strangle' or 'error', ...)
+    """
     try:
         from apps.brokers.integrations.breeze import (
             fetch_and_save_nifty_option_chain_all_expiries,
@@ -644,10 +315,10 @@ def trigger_nifty_strangle(request):
         ).first()
 
         if not account:
-            return JsonResponse({
+            return {
                 'success': False,
                 'error': 'No active Kotak broker account found'
-            })
+            }
 
         logger.info("Manual trigger: Nifty strangle strategy with real Breeze data")
 
@@ -696,18 +367,18 @@ def trigger_nifty_strangle(request):
 
             # Check if authentication error
             if isinstance(e, BreezeAuthenticationError) or 'Session key is expired' in str(e):
-                return JsonResponse({
+                return {
                     'success': False,
                     'auth_required': True,
                     'error': 'Breeze session expired. Please re-authenticate.',
                     'execution_log': execution_log
-                })
+                }
 
-            return JsonResponse({
+            return {
                 'success': False,
                 'error': f'Could not fetch Nifty price: {str(e)}',
                 'execution_log': execution_log
-            })
+            }
 
         try:
             vix = get_india_vix()
@@ -724,12 +395,12 @@ def trigger_nifty_strangle(request):
 
             # Check if authentication error
             if isinstance(e, BreezeAuthenticationError) or 'Session key is expired' in str(e):
-                return JsonResponse({
+                return {
                     'success': False,
                     'auth_required': True,
                     'error': 'Breeze session expired. Please re-authenticate.',
                     'execution_log': execution_log
-                })
+                }
 
             # Use default VIX value and continue
             vix = Decimal('15.0')
@@ -753,11 +424,11 @@ def trigger_nifty_strangle(request):
             })
         except Exception as e:
             logger.error(f"Failed to select expiry: {e}")
-            return JsonResponse({
+            return {
                 'success': False,
                 'error': f'Could not select expiry: {str(e)}',
                 'execution_log': execution_log
-            })
+            }
 
         # STEP 3.5: Validate market conditions (NO TRADE DAY checks)
         try:
@@ -788,7 +459,7 @@ def trigger_nifty_strangle(request):
             # If NO TRADE DAY, stop here and return the report with market data
             if not validation_report['trade_allowed']:
                 logger.warning(f"NO TRADE DAY detected: {validation_report['verdict_reason']}")
-                return JsonResponse({
+                return {
                     'success': False,
                     'error': f'NO TRADE DAY: {validation_report["verdict_reason"]}',
                     'execution_log': execution_log,
@@ -801,7 +472,7 @@ def trigger_nifty_strangle(request):
                         'expiry_date': expiry_date.strftime('%Y-%m-%d'),
                         'days_to_expiry': days_to_expiry
                     }
-                })
+                }
 
         except Exception as e:
             logger.warning(f"Market validation failed: {e}, continuing anyway")
@@ -908,11 +579,11 @@ def trigger_nifty_strangle(request):
 
         except Exception as e:
             logger.error(f"Failed to calculate strikes: {e}", exc_info=True)
-            return JsonResponse({
+            return {
                 'success': False,
                 'error': f'Strike calculation failed: {str(e)}',
                 'execution_log': execution_log
-            })
+            }
 
         # STEP 5.5: Check for psychological levels and adjust strikes if needed
         try:
@@ -1190,11 +861,11 @@ def trigger_nifty_strangle(request):
                 else:
                     # If adjusted strikes don't exist, we have a problem
                     logger.error(f"Adjusted strikes CE {call_strike}, PE {put_strike} not available in database!")
-                    return JsonResponse({
+                    return {
                         'success': False,
                         'error': f'Cannot find safe strikes. Database has CE {final_psych_check["original_call"]}, PE {final_psych_check["original_put"]} but adjusted strikes CE {call_strike}, PE {put_strike} not available.',
                         'execution_log': execution_log
-                    })
+                    }
 
             logger.info(f"Final SAFE strikes: CE {call_strike}, PE {put_strike}")
 
@@ -1221,11 +892,11 @@ def trigger_nifty_strangle(request):
 
         except Exception as e:
             logger.error(f"Failed to get option premiums: {e}")
-            return JsonResponse({
+            return {
                 'success': False,
                 'error': f'Could not fetch option premiums: {str(e)}',
                 'execution_log': execution_log
-            })
+            }
 
         # STEP 6: Calculate margins and risk
         try:
@@ -1329,7 +1000,7 @@ def trigger_nifty_strangle(request):
                 ]
 
             # Calculate position sizing
-            sizer = StranglePositionSizer(request.user)
+            sizer = StranglePositionSizer(user)
             position_sizing = sizer.calculate_strangle_position_size(
                 call_strike=call_strike,
                 put_strike=put_strike,
@@ -1372,12 +1043,12 @@ def trigger_nifty_strangle(request):
 
             # Check if authentication error
             if isinstance(e, BreezeAuthenticationError) or 'Session key is expired' in str(e):
-                return JsonResponse({
+                return {
                     'success': False,
                     'auth_required': True,
                     'error': 'Breeze session expired. Please re-authenticate.',
                     'execution_log': execution_log
-                })
+                }
 
             # Check if it's a margin fetch error
             if 'Margin not found' in str(e):
@@ -1475,7 +1146,7 @@ def trigger_nifty_strangle(request):
 
         # Build TradeSuggestion with position sizing data if available
         suggestion_kwargs = {
-            'user': request.user,
+            'user': user,
             'strategy': 'kotak_strangle',
             'suggestion_type': 'OPTIONS',
             'instrument': 'NIFTY',
@@ -1523,15 +1194,15 @@ def trigger_nifty_strangle(request):
 
         suggestion = TradeSuggestion.objects.create(**suggestion_kwargs)
 
-        logger.info(f"Saved trade suggestion #{suggestion.id} for {request.user.username}")
+        logger.info(f"Saved trade suggestion #{suggestion.id} for {user.username}")
 
         # Add suggestion_id to response
         explanation['suggestion_id'] = suggestion.id
 
-        return JsonResponse({
+        return {
             'success': True,
             'strangle': explanation
-        })
+        }
 
     except Exception as e:
         from apps.brokers.exceptions import BreezeAuthenticationError
@@ -1539,15 +1210,15 @@ def trigger_nifty_strangle(request):
 
         # Check if authentication error
         if isinstance(e, BreezeAuthenticationError) or 'Session key is expired' in str(e):
-            return JsonResponse({
+            return {
                 'success': False,
                 'auth_required': True,
                 'error': 'Breeze session expired. Please re-authenticate.',
                 'execution_log': execution_log if 'execution_log' in locals() else []
-            })
+            }
 
-        return JsonResponse({
+        return {
             'success': False,
             'error': str(e),
             'execution_log': execution_log if 'execution_log' in locals() else []
-        })
+        }
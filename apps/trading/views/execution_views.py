@@ -389,13 +389,13 @@ def execute_strangle_orders(request):
     """
     Execute Nifty Strangle orders in batches via Kotak Neo API.
 
-    Places strangle orders (Call SELL + Put SELL) in batches of 20 lots
-    with 20-second delays between batches to comply with Neo API rate limits.
+    Places strangle orders (Call SELL + Put SELL) in batches of up to 20 lots,
+    paced by the Neo order rate limit and advancing on fill confirmations.
 
     Batch Execution Logic:
-        - Max 20 lots per order (Neo API limit)
-        - 20 second delay between batches
-        - Sequential execution (not parallel)
+        - Max 20 lots per order (Neo API limit), capped by exchange freeze quantity
+        - Next batch starts once both legs' fills are confirmed on the order feed
+        - CALL and PUT child orders of a batch are placed concurrently
         - Continues even if some batches fail
         - Returns detailed batch-by-batch results
 
@@ -455,7 +455,7 @@ def execute_strangle_orders(request):
 
     Neo API Rate Limits:
         - 20 lots max per order
-        - 20 second minimum delay between orders
+        - Order rate limited by a shared token bucket (NEO_ORDER_RATE_PER_SECOND)
         - This function handles batching automatically
 
     Notes:
@@ -602,14 +602,26 @@ def execute_strangle_orders(request):
 
         logger.info(f"[NEO SYMBOLS] Call: {neo_call_symbol}, Put: {neo_put_symbol}, Lot Size: {lot_size}")
 
-        # Place orders in batches (max 20 lots per order, 20 sec delays - Neo API limits)
+        # Place orders in batches (max 20 lots per order, capped by freeze limits).
+        # Batches advance on fill confirmations; the confirmation modal follows
+        # progress via the execution event stream and can cancel through
+        # OrderExecutionControl.
+        from apps.trading.models import OrderExecutionControl
+
+        def execution_cancelled():
+            return OrderExecutionControl.objects.filter(
+                suggestion_id=suggestion.id,
+                is_cancelled=True
+            ).exists()
+
         batch_result = place_strangle_orders_in_batches(
             call_symbol=neo_call_symbol,
             put_symbol=neo_put_symbol,
             total_lots=total_lots,
             batch_size=20,
-            delay_seconds=20,
-            product='NRML'
+            product='NRML',
+            progress_key=OrderExecutionControl.progress_key_for(suggestion.id),
+            cancel_check=execution_cancelled
         )
 
         # Create Position and Order records if successful
@@ -143,11 +143,11 @@ def manual_triggers(request):
     # Using OR logic: (this month >= 1000) OR (next month >= 800)
     futures_contracts = ContractData.objects.filter(
         option_type='FUTURE',  # Futures only (stored as 'FUTURE' in DB)
-        expiry__gte=str(today),
-        expiry__lte=str(next_month_end)
+        expiry__gte=today,
+        expiry__lte=next_month_end
     ).filter(
-        Q(expiry__lte=str(this_month_end), traded_contracts__gte=1000) |  # This month
-        Q(expiry__gte=str(next_month_start), expiry__lte=str(next_month_end), traded_contracts__gte=800)  # Next month
+        Q(expiry__lte=this_month_end, traded_contracts__gte=1000) |  # This month
+        Q(expiry__gte=next_month_start, expiry__lte=next_month_end, traded_contracts__gte=800)  # Next month
     ).order_by('symbol', 'expiry').values(
         'symbol',
         'expiry',
@@ -159,7 +159,7 @@ def manual_triggers(request):
     # Format contracts for template display
     contract_list = []
     for contract in futures_contracts:
-        expiry_date = datetime.strptime(contract['expiry'], '%Y-%m-%d').strftime('%d-%b-%Y')
+        expiry_date = contract['expiry'].strftime('%d-%b-%Y')
         display_name = f"{contract['symbol']} - {expiry_date}"
         contract_value = f"{contract['symbol']}|{contract['expiry']}"  # Format: SYMBOL|YYYY-MM-DD
 
@@ -243,11 +243,11 @@ def get_contracts(request):
         # Get futures contracts that meet volume criteria
         futures_contracts = ContractData.objects.filter(
             option_type='FUTURE',
-            expiry__gte=str(today),
-            expiry__lte=str(next_month_end)
+            expiry__gte=today,
+            expiry__lte=next_month_end
         ).filter(
-            Q(expiry__lte=str(this_month_end), traded_contracts__gte=this_month_volume) |
-            Q(expiry__gte=str(next_month_start), expiry__lte=str(next_month_end), traded_contracts__gte=next_month_volume)
+            Q(expiry__lte=this_month_end, traded_contracts__gte=this_month_volume) |
+            Q(expiry__gte=next_month_start, expiry__lte=next_month_end, traded_contracts__gte=next_month_volume)
         ).order_by('symbol', 'expiry').values(
             'symbol',
             'expiry',
@@ -259,7 +259,7 @@ def get_contracts(request):
         # Format contracts
         contract_list = []
         for contract in futures_contracts:
-            expiry_date = datetime.strptime(contract['expiry'], '%Y-%m-%d').strftime('%d-%b-%Y')
+            expiry_date = contract['expiry'].strftime('%d-%b-%Y')
             display_name = f"{contract['symbol']} - {expiry_date}"
             contract_value = f"{contract['symbol']}|{contract['expiry']}"
 
@@ -1,11 +1,11 @@
 """
 API Views for Level 2 Deep-Dive Analysis
 
-Includes automatic fresh Trendlyne data fetching before analysis
+Includes automatic fresh Trendlyne data fetching before analysis (run by the
+analysis job runner, not in the request thread)
 """
 
 import logging
-import threading
 from datetime import datetime
 
 from django.db import models
@@ -15,9 +15,10 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
+from apps.core.constants import LEVEL2_BATCH_MAX_SYMBOLS
 from apps.data.models import DeepDiveAnalysis
-from apps.trading.level2_report_generator import Level2ReportGenerator
-from apps.data.trendlyne import get_all_trendlyne_data
+from apps.trading.services.analysis_jobs import submit_job
+from apps.trading.services.level2_pipeline import generate_reports
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +37,10 @@ class FuturesDeepDiveView(APIView):
         "level1_results": {...}  # Full Level 1 results
     }
 
-    Returns immediately with analysis_id and status='processing'
-    Frontend should poll /api/trading/deep-dive/{id}/status/ for completion
+    Returns immediately with analysis_id, job_id and status='processing'
+    Frontend should poll /api/trading/deep-dive/{id}/status/ for completion.
+    The analysis runs as an analysis job (fresh Trendlyne fetch + Level 2
+    report); an unchanged data snapshot reuses the last report.
     """
 
     permission_classes = [IsAuthenticated]
@@ -80,18 +83,19 @@ class FuturesDeepDiveView(APIView):
 
             logger.info(f"Created analysis record (ID: {deep_dive.id}) with PROCESSING status")
 
-            # Start background analysis task
-            analysis_thread = threading.Thread(
-                target=self._run_analysis_with_fresh_data,
-                args=(deep_dive.id, symbol, expiry_date, level1_results),
-                daemon=True
-            )
-            analysis_thread.start()
+            # Fetch fresh data and analyze on the job runner
+            job = submit_job('DEEP_DIVE', request.user, items=[{
+                'symbol': symbol,
+                'expiry': expiry_date,
+                'analysis_id': deep_dive.id,
+                'level1_results': level1_results,
+            }], refresh=bool(request.data.get('refresh', False)))
 
             # Return immediately with analysis ID
             return Response({
                 'success': True,
                 'analysis_id': deep_dive.id,
+                'job_id': job.id,
                 'status': 'PROCESSING',
                 'message': 'Deep-dive analysis initiated. Fetching fresh Trendlyne data...',
                 'estimated_time': '60-120 seconds',
@@ -105,79 +109,60 @@ class FuturesDeepDiveView(APIView):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _run_analysis_with_fresh_data(self, analysis_id, symbol, expiry_date, level1_results):
-        """
-        Background task: Fetch fresh data and run analysis
-
-        This runs in a separate thread to avoid blocking the API response
-        """
-        try:
-            logger.info(f"[Thread] Starting background analysis for {symbol} (ID: {analysis_id})")
-
-            # Get the analysis record
-            deep_dive = DeepDiveAnalysis.objects.get(id=analysis_id)
-
-            # Step 1: Fetch fresh Trendlyne data
-            logger.info(f"[Thread] Step 1/3: Fetching fresh Trendlyne data for {symbol}...")
-            deep_dive.report = {
-                'status': 'PROCESSING',
-                'message': 'Downloading latest Trendlyne data...',
-                'progress': 33
-            }
-            deep_dive.save()
-
-            try:
-                # Fetch all Trendlyne data
-                get_all_trendlyne_data()
-                logger.info(f"[Thread] ✅ Fresh Trendlyne data downloaded successfully")
-            except Exception as e:
-                logger.warning(f"[Thread] ⚠️  Trendlyne data fetch failed: {e}. Proceeding with existing data.")
 
-            # Step 2: Generate comprehensive analysis
-            logger.info(f"[Thread] Step 2/3: Analyzing {symbol} across all dimensions...")
-            deep_dive.report = {
-                'status': 'PROCESSING',
-                'message': 'Running comprehensive multi-factor analysis...',
-                'progress': 66
-            }
-            deep_dive.save()
+class DeepDiveBatchView(APIView):
+    """
+    Level 2 reports for a whole watchlist in one call
 
-            report_generator = Level2ReportGenerator(symbol, expiry_date, level1_results)
-            report = report_generator.generate_report()
+    POST /api/trading/futures/deep-dive/batch/
+    Body:
+    {
+        "items": [
+            {"symbol": "RELIANCE", "expiry_date": "2024-01-25", "level1_results": {...}},
+            {"symbol": "TCS", "expiry_date": "2024-01-25"}
+        ],
+        "refresh": false  # true: ignore cached reports
+    }
 
-            # Step 3: Save final report
-            logger.info(f"[Thread] Step 3/3: Finalizing report...")
+    Uses the stored data (no Trendlyne download). Reports whose data is
+    unchanged come from the report cache; the rest are built on a bounded
+    worker pool.
+    """
 
-            # Extract key metrics
-            conviction_score = report['executive_summary']['conviction_score']
-            risk_grade = report['detailed_analysis']['risk_assessment'].get('risk_grade', 'UNKNOWN')
+    permission_classes = [IsAuthenticated]
 
-            # Mark as complete
-            report['status'] = 'COMPLETED'
-            report['completed_at'] = datetime.now().isoformat()
+    def post(self, request):
+        items = request.data.get('items') or []
+        if not items or any(not item.get('symbol') or not item.get('expiry_date') for item in items):
+            return Response({
+                'success': False,
+                'error': 'items with symbol and expiry_date are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > LEVEL2_BATCH_MAX_SYMBOLS:
+            return Response({
+                'success': False,
+                'error': f'At most {LEVEL2_BATCH_MAX_SYMBOLS} symbols per batch'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            deep_dive.report = report
-            deep_dive.conviction_score = conviction_score
-            deep_dive.risk_grade = risk_grade
-            deep_dive.save()
+        try:
+            reports = generate_reports([{
+                'symbol': item['symbol'],
+                'expiry': item['expiry_date'],
+                'level1_results': item.get('level1_results', {}),
+            } for item in items], use_cache=not request.data.get('refresh', False))
 
-            logger.info(f"[Thread] ✅ Deep-dive analysis completed for {symbol} (ID: {analysis_id})")
-            logger.info(f"[Thread] Conviction Score: {conviction_score}/100, Risk: {risk_grade}")
+            return Response({
+                'success': True,
+                'count': len(reports),
+                'reports': reports
+            })
 
         except Exception as e:
-            logger.error(f"[Thread] ❌ Error in background analysis: {e}", exc_info=True)
-
-            # Mark as failed
-            try:
-                deep_dive = DeepDiveAnalysis.objects.get(id=analysis_id)
-                deep_dive.report = {
-                    'status': 'FAILED',
-                    'error': str(e),
-                    'message': f'Analysis failed: {str(e)[:200]}'
-                }
-                deep_dive.save()
-            except Exception as save_error:
-                logger.error(f"[Thread] Failed to update error status: {save_error}")
+            logger.error(f"Error generating deep-dive batch: {e}", exc_info=True)
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 class DeepDiveStatusView(APIView):
@@ -3,6 +3,10 @@ ASGI config for mcube_ai project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the live dashboard feed (/system/api/live/, Server-Sent Events) through
+this application, e.g. ``uvicorn mcube_ai.asgi:application``: under ASGI an
+open stream does not hold a worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +17,21 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mcube_ai.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    """Django ASGI application with lifespan handling for the live feed hub."""
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            from apps.core.services.live_feed import get_live_feed_hub
+
+            get_live_feed_hub().close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
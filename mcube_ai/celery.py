@@ -32,6 +32,12 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # This will look for tasks.py in each app
 app.autodiscover_tasks()
 
+# Wall time, DB queries, cache reads and broker time of every task
+# (apps.core.services.telemetry; shown on /metrics)
+from apps.core.services.telemetry import connect_celery_signals  # noqa: E402
+
+connect_celery_signals()
+
 
 # =============================================================================
 # DYNAMIC SCHEDULE LOADING
@@ -53,6 +59,12 @@ def load_beat_schedule():
     # MARKET DATA TASKS
     # =========================================================================
 
+    'refresh-trading-calendar-daily': {
+        'task': 'apps.data.tasks.refresh_trading_calendar',
+        'schedule': crontab(hour=8, minute=15),  # 8:15 AM daily (after SecurityMaster update)
+        'options': {'queue': 'data'},
+    },
+
     'fetch-trendlyne-data-daily': {
         'task': 'apps.data.tasks.fetch_trendlyne_data',
         'schedule': crontab(hour=8, minute=30),  # 8:30 AM daily
@@ -65,6 +77,12 @@ def load_beat_schedule():
         'options': {'queue': 'data'},
     },
 
+    'refresh-sector-performance-daily': {
+        'task': 'apps.data.tasks.refresh_sector_performance',
+        'schedule': crontab(hour=9, minute=5),  # 9:05 AM daily (after Trendlyne import)
+        'options': {'queue': 'data'},
+    },
+
     'update-pre-market-data': {
         'task': 'apps.data.tasks.update_pre_market_data',
         'schedule': crontab(hour=8, minute=30, day_of_week='1-5'),  # Mon-Fri 8:30 AM
@@ -87,6 +105,12 @@ def load_beat_schedule():
         'options': {'queue': 'data'},
     },
 
+    'compact-option-chain-store': {
+        'task': 'apps.data.tasks.compact_option_chain_store',
+        'schedule': crontab(hour=15, minute=45, day_of_week='1-5'),  # Mon-Fri 3:45 PM
+        'options': {'queue': 'data'},
+    },
+
     # =========================================================================
     # NOTE: Strangle strategy tasks are now configured via TradingScheduleConfig
     # Use Django admin to configure task timings
@@ -175,6 +199,16 @@ def load_beat_schedule():
         'schedule': crontab(hour=18, minute=0, day_of_week='5'),  # Friday 6:00 PM
         'options': {'queue': 'reports'},
     },
+
+    # =========================================================================
+    # MAINTENANCE TASKS
+    # =========================================================================
+
+    'archive-old-logs': {
+        'task': 'apps.core.tasks.archive_old_logs',
+        'schedule': crontab(minute=20),  # Hourly; batched so it never holds the write lock for long
+        'options': {'queue': 'reports'},
+    },
 }
 
     # Load dynamic schedule from database
@@ -201,6 +235,7 @@ app.conf.task_routes = {
     'apps.positions.tasks.*': {'queue': 'monitoring'},
     'apps.risk.tasks.*': {'queue': 'risk'},
     'apps.analytics.tasks.*': {'queue': 'reports'},
+    'apps.core.tasks.*': {'queue': 'reports'},
 }
 
 
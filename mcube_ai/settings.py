@@ -84,6 +84,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.TelemetryMiddleware',  # First, so it times the whole request
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -116,6 +117,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'mcube_ai.wsgi.application'
+ASGI_APPLICATION = 'mcube_ai.asgi.application'  # Serves the live feed (SSE) without tying up threads
 
 
 # Database
@@ -125,9 +127,42 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Seconds a connection waits for the write lock before 'database is locked'
+            'timeout': env.int('SQLITE_BUSY_TIMEOUT', default=20),
+        },
+    }
+}
+
+# Cache
+# Django's per-process memory cache; the telemetry subclass also counts hits
+# and misses per request / task (apps.core.services.telemetry).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'apps.core.services.telemetry.LocMemCache',
     }
 }
 
+# SQLite is shared by the web server, Celery workers, the background-task
+# runner and the Telegram bot. These pragmas are applied to every new
+# connection (apps.core.utils.db.configure_sqlite_connection):
+# - WAL lets readers run while one process writes
+# - synchronous=NORMAL is durable across application crashes in WAL mode
+# - cache_size (negative = KiB) and mmap_size keep hot pages in memory
+# Set SQLITE_TUNING=False to keep SQLite's defaults.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+} if env.bool('SQLITE_TUNING', default=True) else {}
+
+# Batch task-log and other hot-loop writes into one transaction per flush
+# (apps.core.services.write_queue). Off by default: writes run immediately.
+DB_WRITE_QUEUE_ENABLED = env.bool('DB_WRITE_QUEUE_ENABLED', default=False)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -234,6 +269,74 @@ OLLAMA_MODEL = 'deepseek-r1:7b'  # DeepSeek R1 7B model
 # LLM models directory (for downloaded GGUF files)
 LLM_MODELS_DIR = BASE_DIR / 'llm_models'
 
+# Option-chain history store (apps.data.services.option_chain_store): every
+# fetched chain snapshot is appended as an Arrow file under this directory.
+# Compaction merges a finished day into one file; with compression None the
+# merged files stay memory-mappable without decoding.
+OPTION_CHAIN_STORE_ENABLED = env.bool('OPTION_CHAIN_STORE_ENABLED', default=True)
+OPTION_CHAIN_STORE_DIR = Path(env('OPTION_CHAIN_STORE_DIR', default=str(BASE_DIR / 'data_store' / 'option_chains')))
+OPTION_CHAIN_STORE_COMPRESSION = env('OPTION_CHAIN_STORE_COMPRESSION', default='zstd') or None
+
+# Trendlyne forecaster screeners (apps.data.services.forecaster_index): the CSVs
+# are indexed by NSE code once and the index is kept as an Arrow snapshot so a
+# new process does not re-parse them. The index reloads when a CSV changes.
+FORECASTER_DIR = Path(env('FORECASTER_DIR', default=str(BASE_DIR / 'apps' / 'data' / 'tldata' / 'forecaster')))
+FORECASTER_INDEX_PATH = Path(env('FORECASTER_INDEX_PATH', default=str(BASE_DIR / 'data_store' / 'forecaster_index.arrow')))
+
+# Trendlyne downloads (apps.data.providers.trendlyne_http): exports are fetched
+# over HTTP with the session cookies kept in TRENDLYNE_COOKIE_PATH; a pooled
+# headless browser is only used when a page needs JavaScript. Point
+# TRENDLYNE_BASE_URL at a local stub (manage.py trendlyne_download --stub) to
+# run offline. The cookies are a live login, so they are kept outside the
+# checkout, in a directory only the user can read.
+TRENDLYNE_BASE_URL = env('TRENDLYNE_BASE_URL', default='https://trendlyne.com')
+TRENDLYNE_COOKIE_PATH = Path(env('TRENDLYNE_COOKIE_PATH', default=str(Path.home() / '.mcube_ai' / 'trendlyne_cookies.json')))
+
+# Trendlyne export cache (apps.data.services.trendlyne_parquet): every F&O /
+# market snapshot workbook is converted once, by content hash, into a typed
+# Parquet file holding the model columns; the loaders read those files.
+TRENDLYNE_PARQUET_DIR = Path(env('TRENDLYNE_PARQUET_DIR', default=str(BASE_DIR / 'data_store' / 'trendlyne_parquet')))
+TRENDLYNE_PARQUET_COMPRESSION = env('TRENDLYNE_PARQUET_COMPRESSION', default='zstd') or None
+
+# Request / task telemetry (apps.core.services.telemetry): every process keeps
+# latency, DB and cache histograms in memory and writes a snapshot to
+# TELEMETRY_DIR, so /metrics on the web server also shows the Celery workers.
+# /metrics is served to staff users, and to scrapers sending
+# "Authorization: Bearer <TELEMETRY_METRICS_TOKEN>" when a token is set.
+TELEMETRY_ENABLED = env.bool('TELEMETRY_ENABLED', default=True)
+TELEMETRY_DIR = Path(env('TELEMETRY_DIR', default=str(BASE_DIR / 'data_store' / 'telemetry')))
+TELEMETRY_METRICS_TOKEN = env('TELEMETRY_METRICS_TOKEN', default='')
+
+# Log lifecycle (apps.core.services.log_lifecycle): BkLog / MonitorLog rows past
+# their retention window are summarised per task and hour into LogRollup and
+# moved to gzipped JSON-lines files under LOG_ARCHIVE_DIR, one per table and day.
+LOG_ARCHIVE_DIR = Path(env('LOG_ARCHIVE_DIR', default=str(BASE_DIR / 'data_store' / 'log_archive')))
+
+# Benchmark history for `manage.py bench` (runs, baseline, regression checks)
+BENCHMARK_HISTORY_PATH = Path(env('BENCHMARK_HISTORY_PATH', default=str(BASE_DIR / 'benchmarks' / 'history.json')))
+
+
+# Where long analyses triggered from web views run (apps.trading.services.analysis_jobs):
+# 'celery' fans out one task per contract to the workers (falls back to threads
+# if the broker is down), 'thread' uses an in-process pool, 'inline' runs in
+# the calling thread (tests, management commands).
+ANALYSIS_JOB_EXECUTOR = env('ANALYSIS_JOB_EXECUTOR', default='celery')
+
+# =============================================================================
+# BROKER SIMULATOR
+# =============================================================================
+
+# When on, get_breeze_client() and the Kotak Neo client return simulated
+# clients backed by one in-process exchange (apps.brokers.integrations.simulator):
+# no network, configurable order latency / rejects, optional replay of a
+# recorded session. Never enable alongside live trading.
+BROKER_SIMULATOR = env.bool('BROKER_SIMULATOR', default=False)
+BROKER_SIMULATOR_OPTIONS = {
+    'latency_ms': env.float('BROKER_SIMULATOR_LATENCY_MS', default=None),  # None: SIMULATOR_* constants
+    'reject_rate': env.float('BROKER_SIMULATOR_REJECT_RATE', default=None),
+    'seed': env.int('BROKER_SIMULATOR_SEED', default=None),
+    'session': env('BROKER_SIMULATOR_SESSION', default=''),  # JSONL session loaded at startup
+}
 
 # =============================================================================
 # MARKET DATA CONFIGURATION
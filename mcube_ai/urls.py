@@ -19,12 +19,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
-from apps.core.views import home_page
+from apps.core.views import home_page, metrics
 
 urlpatterns = [
     # Home page
     path('', home_page, name='home'),
 
+    # Prometheus scrape endpoint
+    path('metrics', metrics, name='metrics'),
+
     # Admin interface
     path('admin/', admin.site.urls),
 
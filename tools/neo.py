@@ -33,7 +33,6 @@ Usage:
 
 from typing import Dict, List, Optional
 from datetime import datetime
-import pandas as pd
 import re
 import logging
 import time
@@ -435,6 +434,8 @@ class NeoAPI(BrokerInterface if isinstance(BrokerInterface, type) else object):
             if not positions:
                 return 0.0
             
+            import pandas as pd  # only needed here; keeps pandas out of web startup
+
             df = pd.DataFrame(positions)
             
             # Calculate P&L